@@ -356,7 +356,9 @@ ext_data = dict(
               "sources" : []},
     _hamilton_filter = {"name" : "statsmodels/tsa/regime_switching/_hamilton_filter.c",
               "depends" : [],
-              "include_dirs": [],
+              "include_dirs": npymath_info['include_dirs'],
+              "libraries": npymath_info['libraries'],
+              "library_dirs": npymath_info['library_dirs'],
               "sources" : []},
     _kim_smoother = {"name" : "statsmodels/tsa/regime_switching/_kim_smoother.c",
               "depends" : [],
@@ -387,6 +389,11 @@ statespace_ext_data = dict(
               "libraries": npymath_info['libraries'],
               "library_dirs": npymath_info['library_dirs'],
               "sources": []},
+    _batch_filter = {"name" : "statsmodels/tsa/statespace/_batch_filter.c",
+              "include_dirs": ['statsmodels/src'] + npymath_info['include_dirs'],
+              "libraries": npymath_info['libraries'],
+              "library_dirs": npymath_info['library_dirs'],
+              "sources": []},
     _kalman_filter_conventional = {"name" : "statsmodels/tsa/statespace/_filters/_conventional.c",
               "filename": "_conventional",
               "include_dirs": ['statsmodels/src'] + npymath_info['include_dirs'],
@@ -405,6 +412,24 @@ statespace_ext_data = dict(
               "libraries": npymath_info['libraries'],
               "library_dirs": npymath_info['library_dirs'],
               "sources": []},
+    _kalman_filter_square_root = {"name" : "statsmodels/tsa/statespace/_filters/_square_root.c",
+              "filename": "_square_root",
+              "include_dirs": ['statsmodels/src'] + npymath_info['include_dirs'],
+              "libraries": npymath_info['libraries'],
+              "library_dirs": npymath_info['library_dirs'],
+              "sources": []},
+    _kalman_filter_chandrasekhar = {"name" : "statsmodels/tsa/statespace/_filters/_chandrasekhar.c",
+              "filename": "_chandrasekhar",
+              "include_dirs": ['statsmodels/src'] + npymath_info['include_dirs'],
+              "libraries": npymath_info['libraries'],
+              "library_dirs": npymath_info['library_dirs'],
+              "sources": []},
+    _kalman_filter_univariate_diffuse = {"name" : "statsmodels/tsa/statespace/_filters/_univariate_diffuse.c",
+              "filename": "_univariate_diffuse",
+              "include_dirs": ['statsmodels/src'] + npymath_info['include_dirs'],
+              "libraries": npymath_info['libraries'],
+              "library_dirs": npymath_info['library_dirs'],
+              "sources": []},
     _kalman_smoother = {"name" : "statsmodels/tsa/statespace/_kalman_smoother.c",
               "include_dirs": ['statsmodels/src'] + npymath_info['include_dirs'],
               "libraries": npymath_info['libraries'],
@@ -434,6 +459,12 @@ statespace_ext_data = dict(
               "libraries": npymath_info['libraries'],
               "library_dirs": npymath_info['library_dirs'],
               "sources": []},
+    _kalman_smoother_univariate_diffuse = {"name" : "statsmodels/tsa/statespace/_smoothers/_univariate_diffuse.c",
+              "filename": "_univariate_diffuse",
+              "include_dirs": ['statsmodels/src'] + npymath_info['include_dirs'],
+              "libraries": npymath_info['libraries'],
+              "library_dirs": npymath_info['library_dirs'],
+              "sources": []},
     _kalman_simulation_smoother = {"name" : "statsmodels/tsa/statespace/_simulation_smoother.c",
               "filename": "_simulation_smoother",
               "include_dirs": ['statsmodels/src'] + npymath_info['include_dirs'],
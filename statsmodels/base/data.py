@@ -9,6 +9,7 @@ from pandas import DataFrame, Series, isnull
 from statsmodels.tools.decorators import (resettable_cache, cache_readonly,
                                           cache_writable)
 import statsmodels.tools.data as data_util
+from statsmodels.tools import _sparse
 from statsmodels.tools.sm_exceptions import MissingDataError
 
 
@@ -61,6 +62,9 @@ class ModelData(object):
         if 'formula' in kwargs:
             self.formula = kwargs.pop('formula')
         if missing != 'none':
+            if _sparse.issparse(exog):
+                raise NotImplementedError("missing='%s' is not supported "
+                                          "for sparse exog" % missing)
             arrays, nan_idx = self.handle_missing(endog, exog, missing,
                                                   **kwargs)
             self.missing_row_idx = nan_idx
@@ -128,11 +132,12 @@ class ModelData(object):
         else:
             # detect where the constant is
             check_implicit = False
-            const_idx = np.where(self.exog.ptp(axis=0) == 0)[0].squeeze()
+            const_idx = np.where(_sparse.col_ptp(self.exog) == 0)[0].squeeze()
             self.k_constant = const_idx.size
+            exog_mean = _sparse.col_mean(self.exog)
 
             if self.k_constant == 1:
-                if self.exog[:, const_idx].mean() != 0:
+                if exog_mean[const_idx] != 0:
                     self.const_idx = const_idx
                 else:
                     # we only have a zero column and no other constant
@@ -142,7 +147,7 @@ class ModelData(object):
                 # look for ones
                 values = []  # keep values if we need != 0
                 for idx in const_idx:
-                    value = self.exog[:, idx].mean()
+                    value = exog_mean[idx]
                     if value == 1:
                         self.k_constant = 1
                         self.const_idx = idx
@@ -167,11 +172,15 @@ class ModelData(object):
             if check_implicit:
                 # look for implicit constant
                 # Compute rank of augmented matrix
-                augmented_exog = np.column_stack(
+                if _sparse.issparse(self.exog):
+                    implicit = _sparse.implicit_constant(self.exog)
+                else:
+                    augmented_exog = np.column_stack(
                             (np.ones(self.exog.shape[0]), self.exog))
-                rank_augm = np_matrix_rank(augmented_exog)
-                rank_orig = np_matrix_rank(self.exog)
-                self.k_constant = int(rank_orig == rank_augm)
+                    rank_augm = np_matrix_rank(augmented_exog)
+                    rank_orig = np_matrix_rank(self.exog)
+                    implicit = rank_orig == rank_augm
+                self.k_constant = int(implicit)
                 self.const_idx = None
 
 
@@ -393,13 +402,15 @@ class ModelData(object):
         return endog.squeeze()
 
     def _get_xarr(self, exog):
+        if _sparse.issparse(exog):
+            return _sparse.asformat_exog(exog)
         if data_util._is_structured_ndarray(exog):
             exog = data_util.struct_to_ndarray(exog)
         return np.asarray(exog)
 
     def _check_integrity(self):
         if self.exog is not None:
-            if len(self.exog) != len(self.endog):
+            if self.exog.shape[0] != len(self.endog):
                 raise ValueError("endog and exog matrices are different sizes")
 
     def wrap_output(self, obj, how='columns', names=None):
@@ -466,7 +477,8 @@ class PandasData(ModelData):
     def _convert_endog_exog(self, endog, exog=None):
         #TODO: remove this when we handle dtype systematically
         endog = np.asarray(endog)
-        exog = exog if exog is None else np.asarray(exog)
+        if exog is not None and not _sparse.issparse(exog):
+            exog = np.asarray(exog)
         if endog.dtype == object or exog is not None and exog.dtype == object:
             raise ValueError("Pandas data cast to numpy dtype of object. "
                              "Check input data with np.asarray(data).")
@@ -577,7 +589,10 @@ def _make_endog_names(endog):
 
 
 def _make_exog_names(exog):
-    exog_var = exog.var(0)
+    if _sparse.issparse(exog):
+        exog_var = _sparse.col_ptp(exog)
+    else:
+        exog_var = exog.var(0)
     if (exog_var == 0).any():
         # assumes one constant in first or last position
         # avoid exception if more than one constant
@@ -609,6 +624,8 @@ def handle_data_class_factory(endog, exog):
         klass = PandasData
     elif data_util._is_using_patsy(endog, exog):
         klass = PatsyData
+    elif data_util._is_using_sparse(endog, exog):
+        klass = ModelData
     # keep this check last
     elif data_util._is_using_ndarray(endog, exog):
         klass = ModelData
@@ -5,6 +5,7 @@ from scipy import stats
 from statsmodels.base.data import handle_data
 from statsmodels.tools.data import _is_using_pandas
 from statsmodels.tools.tools import recipr, nan_dot
+from statsmodels.tools import _sparse
 from statsmodels.stats.contrast import ContrastResults, WaldTestResults
 from statsmodels.tools.decorators import resettable_cache, cache_readonly
 import statsmodels.base.wrapper as wrap
@@ -811,7 +812,7 @@ class Results(object):
                     import warnings
                     warnings.warn("nan rows have been dropped", ValueWarning)
 
-        if exog is not None:
+        if exog is not None and not _sparse.issparse(exog):
             exog = np.asarray(exog)
             if exog.ndim == 1 and (self.model.exog.ndim == 1 or
                                    self.model.exog.shape[1] == 1):
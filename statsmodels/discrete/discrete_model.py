@@ -34,6 +34,7 @@ from statsmodels.tools.sm_exceptions import PerfectSeparationError
 from statsmodels.tools.numdiff import (approx_fprime, approx_hess,
                                        approx_hess_cs, approx_fprime_cs)
 import statsmodels.base.model as base
+from statsmodels.tools import _sparse
 from statsmodels.base.data import handle_data  # for mnlogit
 import statsmodels.regression.linear_model as lm
 import statsmodels.base.wrapper as wrap
@@ -162,9 +163,9 @@ class DiscreteModel(base.LikelihoodModel):
         and should contain any preprocessing that needs to be done for a model.
         """
         # assumes constant
-        self.df_model = float(np_matrix_rank(self.exog) - 1)
-        self.df_resid = (float(self.exog.shape[0] -
-                         np_matrix_rank(self.exog)))
+        rank = _sparse.matrix_rank(self.exog)
+        self.df_model = float(rank - 1)
+        self.df_resid = (float(self.exog.shape[0] - rank))
 
     def cdf(self, X):
         """
@@ -180,7 +181,8 @@ class DiscreteModel(base.LikelihoodModel):
 
     def _check_perfect_pred(self, params, *args):
         endog = self.endog
-        fittedvalues = self.cdf(np.dot(self.exog, params[:self.exog.shape[1]]))
+        fittedvalues = self.cdf(_sparse.dot(self.exog,
+                                            params[:self.exog.shape[1]]))
         if (self.raise_on_perfect_prediction and
                 np.allclose(fittedvalues - endog, 0)):
             msg = "Perfect separation detected, results not available"
@@ -428,9 +430,9 @@ class BinaryModel(DiscreteModel):
         if exog is None:
             exog = self.exog
         if not linear:
-            return self.cdf(np.dot(exog, params))
+            return self.cdf(_sparse.dot(exog, params))
         else:
-            return np.dot(exog, params)
+            return _sparse.dot(exog, params)
 
     def fit_regularized(self, start_params=None, method='l1',
             maxiter='defined_by_method', full_output=1, disp=1, callback=None,
@@ -759,9 +761,9 @@ class CountModel(DiscreteModel):
                 offset = 0
 
         if not linear:
-            return np.exp(np.dot(exog, params[:exog.shape[1]]) + exposure + offset) # not cdf
+            return np.exp(_sparse.dot(exog, params[:exog.shape[1]]) + exposure + offset) # not cdf
         else:
-            return np.dot(exog, params[:exog.shape[1]]) + exposure + offset
+            return _sparse.dot(exog, params[:exog.shape[1]]) + exposure + offset
 
     def _derivative_predict(self, params, exog=None, transform='dydx'):
         """
@@ -951,7 +953,7 @@ class Poisson(CountModel):
         """
         offset = getattr(self, "offset", 0)
         exposure = getattr(self, "exposure", 0)
-        XB = np.dot(self.exog, params) + offset + exposure
+        XB = _sparse.dot(self.exog, params) + offset + exposure
         endog = self.endog
         return np.sum(-np.exp(XB) +  endog*XB - gammaln(endog+1))
 
@@ -979,7 +981,7 @@ class Poisson(CountModel):
         """
         offset = getattr(self, "offset", 0)
         exposure = getattr(self, "exposure", 0)
-        XB = np.dot(self.exog, params) + offset + exposure
+        XB = _sparse.dot(self.exog, params) + offset + exposure
         endog = self.endog
         #np.sum(stats.poisson.logpmf(endog, np.exp(XB)))
         return -np.exp(XB) +  endog*XB - gammaln(endog+1)
@@ -1109,8 +1111,8 @@ class Poisson(CountModel):
         offset = getattr(self, "offset", 0)
         exposure = getattr(self, "exposure", 0)
         X = self.exog
-        L = np.exp(np.dot(X,params) + offset + exposure)
-        return np.dot(self.endog - L, X)
+        L = np.exp(_sparse.dot(X, params) + offset + exposure)
+        return _sparse.dot(X.T, self.endog - L)
 
     def score_obs(self, params):
         """
@@ -1139,8 +1141,8 @@ class Poisson(CountModel):
         offset = getattr(self, "offset", 0)
         exposure = getattr(self, "exposure", 0)
         X = self.exog
-        L = np.exp(np.dot(X,params) + offset + exposure)
-        return (self.endog - L)[:,None] * X
+        L = np.exp(_sparse.dot(X, params) + offset + exposure)
+        return _sparse.scale_rows(X, self.endog - L)
 
     def hessian(self, params):
         """
@@ -1169,8 +1171,8 @@ class Poisson(CountModel):
         offset = getattr(self, "offset", 0)
         exposure = getattr(self, "exposure", 0)
         X = self.exog
-        L = np.exp(np.dot(X,params) + exposure + offset)
-        return -np.dot(L*X.T, X)
+        L = np.exp(_sparse.dot(X, params) + exposure + offset)
+        return -_sparse.xtwx(X, L)
 
 class Logit(BinaryModel):
     __doc__ = """
@@ -1258,7 +1260,7 @@ class Logit(BinaryModel):
         """
         q = 2*self.endog - 1
         X = self.exog
-        return np.sum(np.log(self.cdf(q*np.dot(X,params))))
+        return np.sum(np.log(self.cdf(q*_sparse.dot(X, params))))
 
     def loglikeobs(self, params):
         """
@@ -1286,7 +1288,7 @@ class Logit(BinaryModel):
         """
         q = 2*self.endog - 1
         X = self.exog
-        return np.log(self.cdf(q*np.dot(X,params)))
+        return np.log(self.cdf(q*_sparse.dot(X, params)))
 
     def score(self, params):
         """
@@ -1310,8 +1312,8 @@ class Logit(BinaryModel):
 
         y = self.endog
         X = self.exog
-        L = self.cdf(np.dot(X,params))
-        return np.dot(y - L,X)
+        L = self.cdf(_sparse.dot(X, params))
+        return _sparse.dot(X.T, y - L)
 
     def score_obs(self, params):
         """
@@ -1338,8 +1340,8 @@ class Logit(BinaryModel):
 
         y = self.endog
         X = self.exog
-        L = self.cdf(np.dot(X, params))
-        return (y - L)[:,None] * X
+        L = self.cdf(_sparse.dot(X, params))
+        return _sparse.scale_rows(X, y - L)
 
     def hessian(self, params):
         """
@@ -1361,8 +1363,8 @@ class Logit(BinaryModel):
         .. math:: \\frac{\\partial^{2}\\ln L}{\\partial\\beta\\partial\\beta^{\\prime}}=-\\sum_{i}\\Lambda_{i}\\left(1-\\Lambda_{i}\\right)x_{i}x_{i}^{\\prime}
         """
         X = self.exog
-        L = self.cdf(np.dot(X,params))
-        return -np.dot(L*(1-L)*X.T,X)
+        L = self.cdf(_sparse.dot(X, params))
+        return -_sparse.xtwx(X, L*(1-L))
 
     def fit(self, start_params=None, method='newton', maxiter=35,
             full_output=1, disp=1, callback=None, **kwargs):
@@ -2405,7 +2407,8 @@ class DiscreteResults(base.LikelihoodModelResults):
 
     @cache_readonly
     def fittedvalues(self):
-        return np.dot(self.model.exog, self.params[:self.model.exog.shape[1]])
+        return _sparse.dot(self.model.exog,
+                           self.params[:self.model.exog.shape[1]])
 
     @cache_readonly
     def aic(self):
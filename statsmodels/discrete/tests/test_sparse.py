@@ -0,0 +1,54 @@
+"""
+Tests for discrete models with a scipy.sparse design matrix
+"""
+import numpy as np
+from numpy.testing import assert_allclose
+from scipy import sparse
+
+from statsmodels.tools.grouputils import dummy_sparse
+from statsmodels.discrete.discrete_model import Logit, Poisson
+
+
+class CheckSparseDiscrete(object):
+
+    @classmethod
+    def setup_class(cls):
+        rs = np.random.RandomState(97531)
+        nobs = 1000
+        groups = rs.randint(0, 10, size=nobs)
+        dummies = dummy_sparse(groups)[:, 1:]
+        exog = sparse.hstack([sparse.csr_matrix(np.ones((nobs, 1))), dummies,
+                              sparse.csr_matrix(rs.randn(nobs, 2))]).tocsr()
+        exog_dense = exog.toarray()
+        linpred = 0.2 + 0.4 * exog_dense[:, -2] - 0.3 * exog_dense[:, -1]
+        endog = cls.simulate(rs, linpred)
+        cls.res1 = cls.model_class(endog, exog_dense).fit(disp=0)
+        cls.res2 = cls.model_class(endog, exog).fit(disp=0)
+
+    def test_attributes(self):
+        res1, res2 = self.res1, self.res2
+        for attr in ['params', 'bse', 'llf', 'llnull', 'prsquared', 'aic',
+                     'bic']:
+            assert_allclose(getattr(res2, attr), getattr(res1, attr),
+                            rtol=1e-7, err_msg=attr)
+        assert_allclose(res2.fittedvalues, res1.fittedvalues, rtol=1e-7)
+        exog = res2.model.exog[:5]
+        assert_allclose(res2.predict(exog), res1.predict(exog.toarray()),
+                        rtol=1e-7)
+
+
+class TestSparseLogit(CheckSparseDiscrete):
+    model_class = Logit
+
+    @classmethod
+    def simulate(cls, rs, linpred):
+        prob = 1 / (1 + np.exp(-linpred))
+        return (rs.rand(len(linpred)) < prob).astype(float)
+
+
+class TestSparsePoisson(CheckSparseDiscrete):
+    model_class = Poisson
+
+    @classmethod
+    def simulate(cls, rs, linpred):
+        return rs.poisson(np.exp(linpred))
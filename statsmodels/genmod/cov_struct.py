@@ -1,4 +1,4 @@
-from statsmodels.compat.python import iterkeys, itervalues, zip, range
+from statsmodels.compat.python import zip, range
 from statsmodels.stats.correlation_tools import cov_nearest
 import numpy as np
 import pandas as pd
@@ -56,6 +56,9 @@ class CovStruct(object):
         """
         self.model = model
 
+        # endog stacked by cluster size, see `_size_group_arrays`
+        self._size_endog = None
+
     def update(self, params):
         """
         Updates the association parameter values based on the current
@@ -172,6 +175,99 @@ class CovStruct(object):
         soln = [spl.cho_solve(vco, x) for x in rhs]
         return soln
 
+    def covariance_matrix_solve_batch(self, expval, index, stdev, rhs):
+        """
+        Solves the matrix equations for all clusters of the same size.
+
+        Parameters
+        ----------
+        expval: array-like
+           n_clust x m array with the expected values of endog, one row
+           per cluster.
+        index: array-like
+           The indices of the n_clust clusters.
+        stdev : array-like
+            n_clust x m array with the standard deviations of endog.
+        rhs : list/tuple of array-like
+            A set of right-hand sides, each either a n_clust x m or a
+            n_clust x m x p array.
+
+        Returns
+        -------
+        soln : list/tuple of array-like
+            The solutions to the matrix equations, with the same shapes
+            as the right-hand sides.
+
+        Notes
+        -----
+        Returns None if the solver fails.
+
+        This is used by GEE if `fit` is called with `batched=True`.
+        The default implementation calls `covariance_matrix_solve` for
+        each cluster. Subclasses can reimplement it to solve the systems
+        for all clusters at once with broadcast array operations.
+        """
+
+        soln = [np.empty_like(x) for x in rhs]
+        for j, i in enumerate(index):
+            rslt = self.covariance_matrix_solve(expval[j], i, stdev[j],
+                                                [x[j] for x in rhs])
+            if rslt is None:
+                return None
+            for y, x in zip(soln, rslt):
+                y[j] = x
+        return soln
+
+    def _cho_solve_batch(self, vmat, expval, index, stdev, rhs):
+        """
+        Solves the systems for a stack of n_clust x m x m covariance
+        matrices.  Falls back to the per-cluster solver, which conditions
+        covariance matrices that are not SPD, if any of them cannot be
+        factorized.
+        """
+        try:
+            np.linalg.cholesky(vmat)
+        except np.linalg.LinAlgError:
+            return CovStruct.covariance_matrix_solve_batch(
+                self, expval, index, stdev, rhs)
+
+        self.cov_adjust.extend([0] * len(index))
+
+        soln = []
+        for x in rhs:
+            if x.ndim == 2:
+                soln.append(np.linalg.solve(vmat, x[:, :, None])[:, :, 0])
+            else:
+                soln.append(np.linalg.solve(vmat, x))
+        return soln
+
+    def _size_group_arrays(self):
+        """
+        Yields the cluster indices, and the n_clust x m arrays of endog
+        and fitted means, for the clusters of each size m.
+
+        The stacked means of the batched GEE engine are used if it is
+        active, otherwise the means of the clusters are stacked.
+        """
+        model = self.model
+        if model._size_groups is not None:
+            for index, rows in model._size_groups:
+                expval, _ = model.cached_means.batch(rows)
+                yield index, model.endog[rows], expval
+            return
+
+        if self._size_endog is None:
+            sizes = np.array([len(y) for y in model.endog_li])
+            self._size_endog = []
+            for m in np.unique(sizes):
+                index = np.flatnonzero(sizes == m)
+                endog = np.array([model.endog_li[i] for i in index])
+                self._size_endog.append((index, endog))
+
+        for index, endog in self._size_endog:
+            expval = np.array([model.cached_means[i][0] for i in index])
+            yield index, endog, expval
+
     def summary(self):
         """
         Returns a text summary of the current estimate of the
@@ -203,9 +299,21 @@ class Independence(CovStruct):
                 rslt.append(x / v[:, None])
         return rslt
 
+    def covariance_matrix_solve_batch(self, expval, index, stdev, rhs):
+        v = stdev ** 2
+        rslt = []
+        for x in rhs:
+            if x.ndim == 2:
+                rslt.append(x / v)
+            else:
+                rslt.append(x / v[:, :, None])
+        return rslt
+
     update.__doc__ = CovStruct.update.__doc__
     covariance_matrix.__doc__ = CovStruct.covariance_matrix.__doc__
     covariance_matrix_solve.__doc__ = CovStruct.covariance_matrix_solve.__doc__
+    covariance_matrix_solve_batch.__doc__ = (
+        CovStruct.covariance_matrix_solve_batch.__doc__)
 
     def summary(self):
         return ("Observations within a cluster are modeled "
@@ -215,6 +323,13 @@ class Independence(CovStruct):
 class Exchangeable(CovStruct):
     """
     An exchangeable working dependence structure.
+
+    Notes
+    -----
+    The dependence parameter is updated in closed form for all clusters
+    of the same size at once, also if GEE is fit with `batched=False`.
+    The update runs in a single process, there is no `n_jobs` option as
+    for `GlobalOddsRatio`.
     """
 
     def __init__(self):
@@ -226,34 +341,30 @@ class Exchangeable(CovStruct):
 
     def update(self, params):
 
-        endog = self.model.endog_li
-
         nobs = self.model.nobs
 
         varfunc = self.model.family.variance
 
-        cached_means = self.model.cached_means
-
         has_weights = self.model.weights is not None
         weights_li = self.model.weights
 
         residsq_sum, scale = 0, 0
         fsum1, fsum2, n_pairs = 0., 0., 0.
-        for i in range(self.model.num_group):
-            expval, _ = cached_means[i]
+        # clusters of the same size are processed together
+        for index, endog, expval in self._size_group_arrays():
             stdev = np.sqrt(varfunc(expval))
-            resid = (endog[i] - expval) / stdev
-            f = weights_li[i] if has_weights else 1.
+            resid = (endog - expval) / stdev
+            f = weights_li[index] if has_weights else np.ones(len(index))
 
-            ssr = np.sum(resid * resid)
-            scale += f * ssr
-            fsum1 += f * len(endog[i])
+            ssr = np.sum(resid * resid, 1)
+            scale += np.dot(f, ssr)
+            ngrp = endog.shape[1]
+            fsum1 += f.sum() * ngrp
 
-            residsq_sum += f * (resid.sum() ** 2 - ssr) / 2
-            ngrp = len(resid)
+            residsq_sum += np.dot(f, resid.sum(1) ** 2 - ssr) / 2
             npr = 0.5 * ngrp * (ngrp - 1)
-            fsum2 += f * npr
-            n_pairs += npr
+            fsum2 += f.sum() * npr
+            n_pairs += npr * len(index)
 
         ddof = self.model.ddof_scale
         scale /= (fsum1 * (nobs - ddof) / float(nobs))
@@ -289,9 +400,28 @@ class Exchangeable(CovStruct):
 
         return rslt
 
+    def covariance_matrix_solve_batch(self, expval, index, stdev, rhs):
+
+        k = expval.shape[1]
+        c = self.dep_params / (1. - self.dep_params)
+        c /= 1. + self.dep_params * (k - 1)
+
+        rslt = []
+        for x in rhs:
+            sd = stdev if x.ndim == 2 else stdev[:, :, None]
+            x1 = x / sd
+            y = x1 / (1. - self.dep_params)
+            y -= c * x1.sum(1)[:, None]
+            y /= sd
+            rslt.append(y)
+
+        return rslt
+
     update.__doc__ = CovStruct.update.__doc__
     covariance_matrix.__doc__ = CovStruct.covariance_matrix.__doc__
     covariance_matrix_solve.__doc__ = CovStruct.covariance_matrix_solve.__doc__
+    covariance_matrix_solve_batch.__doc__ = (
+        CovStruct.covariance_matrix_solve_batch.__doc__)
 
     def summary(self):
         return ("The correlation between two observations in the " +
@@ -347,6 +477,10 @@ class Nested(CovStruct):
     regression of the products r*r', for standardized residuals r and
     r' in the same group, on a vector of indicators defining which
     variance components are shared by r and r'.
+
+    The products are computed for all clusters of the same size at once,
+    also if GEE is fit with `batched=False`. The update runs in a single
+    process, there is no `n_jobs` option as for `GlobalOddsRatio`.
     """
 
     def initialize(self, model):
@@ -410,6 +544,11 @@ class Nested(CovStruct):
 
         self.designx = np.concatenate(designx, axis=0)
         self.ilabels = ilabels
+        self._ilabels_batch = {}
+
+        # Position of the first pair of each cluster in designx
+        npairs = np.array([len(x) for x in designx])
+        self._pair_offsets = np.r_[0, np.cumsum(npairs)[:-1]]
 
         svd = np.linalg.svd(self.designx, 0)
         self.designx_u = svd[0]
@@ -418,33 +557,28 @@ class Nested(CovStruct):
 
     def update(self, params):
 
-        endog = self.model.endog_li
-
         nobs = self.model.nobs
         dim = len(params)
 
         if self.designx is None:
             self._compute_design(self.model)
 
-        cached_means = self.model.cached_means
-
         varfunc = self.model.family.variance
 
-        dvmat = []
+        # Products are placed at the positions of the pairs in designx,
+        # which is ordered by cluster.
+        dvmat = np.zeros(self.designx.shape[0])
         scale = 0.
-        for i in range(self.model.num_group):
-
-            expval, _ = cached_means[i]
-
+        for index, endog, expval in self._size_group_arrays():
             stdev = np.sqrt(varfunc(expval))
-            resid = (endog[i] - expval) / stdev
+            resid = (endog - expval) / stdev
 
-            ix1, ix2 = np.tril_indices(len(resid), -1)
-            dvmat.append(resid[ix1] * resid[ix2])
+            ix1, ix2 = np.tril_indices(endog.shape[1], -1)
+            pos = self._pair_offsets[index][:, None] + np.arange(len(ix1))
+            dvmat[pos] = resid[:, ix1] * resid[:, ix2]
 
             scale += np.sum(resid ** 2)
 
-        dvmat = np.concatenate(dvmat)
         scale /= (nobs - dim)
 
         # Use least squares regression to estimate the variance
@@ -472,8 +606,30 @@ class Nested(CovStruct):
         vmat /= self.scale
         return vmat, True
 
+    def covariance_matrix_solve_batch(self, expval, index, stdev, rhs):
+
+        n_clust, dim = expval.shape
+
+        if self.dep_params is None:
+            vmat = np.tile(np.eye(dim), (n_clust, 1, 1))
+        else:
+            # The label matrices of the clusters are stacked only once
+            ilabel = self._ilabels_batch.get(dim)
+            if ilabel is None or ilabel.shape[0] != n_clust:
+                ilabel = np.array([self.ilabels[i] for i in index])
+                self._ilabels_batch[dim] = ilabel
+
+            c = np.r_[self.scale, np.cumsum(self.vcomp_coeff)]
+            vmat = c[ilabel]
+            vmat /= self.scale
+        vmat *= stdev[:, :, None] * stdev[:, None, :]
+
+        return self._cho_solve_batch(vmat, expval, index, stdev, rhs)
+
     update.__doc__ = CovStruct.update.__doc__
     covariance_matrix.__doc__ = CovStruct.covariance_matrix.__doc__
+    covariance_matrix_solve_batch.__doc__ = (
+        CovStruct.covariance_matrix_solve_batch.__doc__)
 
     def summary(self):
         """
@@ -619,9 +775,30 @@ class Stationary(CovStruct):
         r[0:self.max_lag] = self.dep_params
         return [stationary_solve(r, x) for x in rhs]
 
+    def covariance_matrix_solve_batch(self, expval, index, stdev, rhs):
+
+        if not self.grid:
+            return super(Stationary, self).covariance_matrix_solve_batch(
+                expval, index, stdev, rhs)
+
+        # The Toeplitz matrix is the same for all clusters of the same
+        # size, all right hand sides are solved together.
+        from statsmodels.tools.linalg import stationary_solve
+        n_clust, dim = expval.shape
+        r = np.zeros(dim)
+        r[0:self.max_lag] = self.dep_params[0:dim]
+        soln = []
+        for x in rhs:
+            x1 = np.rollaxis(x, 1).reshape(dim, -1)
+            y = stationary_solve(r, x1).reshape((dim, n_clust) + x.shape[2:])
+            soln.append(np.rollaxis(y, 0, 2))
+        return soln
+
     update.__doc__ = CovStruct.update.__doc__
     covariance_matrix.__doc__ = CovStruct.covariance_matrix.__doc__
     covariance_matrix_solve.__doc__ = CovStruct.covariance_matrix_solve.__doc__
+    covariance_matrix_solve_batch.__doc__ = (
+        CovStruct.covariance_matrix_solve_batch.__doc__)
 
     def summary(self):
 
@@ -670,12 +847,14 @@ class Autoregressive(CovStruct):
         super(Autoregressive, self).__init__()
 
         # The function for determining distances based on time
+        self._default_dist = dist_func is None
         if dist_func is None:
             self.dist_func = lambda x, y: np.abs(x - y).sum()
         else:
             self.dist_func = dist_func
 
         self.designx = None
+        self._designx_b = None
 
         # The autocorrelation parameter
         self.dep_params = 0.
@@ -691,7 +870,9 @@ class Autoregressive(CovStruct):
         time = self.model.time_li
 
         # Only need to compute this once
-        if self.designx is not None:
+        if self.model._size_groups is not None:
+            designx = self._designx_batch()
+        elif self.designx is not None:
             designx = self.designx
         else:
             designx = []
@@ -721,7 +902,16 @@ class Autoregressive(CovStruct):
         wts /= wts.sum()
 
         residmat = []
-        for i in range(self.model.num_group):
+        for index, rows in self.model._iter_size_groups():
+            expval, _ = cached_means.batch(rows)
+            stdev = np.sqrt(scale * varfunc(expval))
+            resid = (self.model.endog[rows] - expval) / stdev
+
+            j1, j2 = np.tril_indices(rows.shape[1], -1)
+            residmat.append(np.column_stack((resid[:, j1].ravel(),
+                                             resid[:, j2].ravel())))
+
+        for i in self.model._iter_loop_groups():
 
             expval, _ = cached_means[i]
             stdev = np.sqrt(scale * varfunc(expval))
@@ -732,7 +922,10 @@ class Autoregressive(CovStruct):
                 for j2 in range(j1):
                     residmat.append([resid[j1], resid[j2]])
 
-        residmat = np.array(residmat)
+        if self.model._size_groups is not None:
+            residmat = np.concatenate(residmat)
+        else:
+            residmat = np.array(residmat)
 
         # Need to minimize this
         def fitfunc(a):
@@ -748,7 +941,7 @@ class Autoregressive(CovStruct):
             b_ctr /= 2
             f_ctr = fitfunc(b_ctr)
             if b_ctr < 1e-8:
-                self.dep_params = 0
+                self.dep_params = 0.
                 return
 
         # Right bracket point
@@ -763,6 +956,29 @@ class Autoregressive(CovStruct):
         from scipy.optimize import brent
         self.dep_params = brent(fitfunc, brack=[b_lft, b_ctr, b_rgt])
 
+    def _designx_batch(self):
+        """
+        Distances between all pairs of observations within a cluster,
+        ordered by cluster size as used with the batched GEE engine.
+        """
+        if self._designx_b is not None:
+            return self._designx_b
+
+        time = self.model._time_batch
+        designx = [np.zeros(0)]
+        for index, rows in self.model._size_groups:
+            j1, j2 = np.tril_indices(rows.shape[1], -1)
+            t1, t2 = time[rows[:, j1]], time[rows[:, j2]]
+            if self._default_dist:
+                designx.append(np.abs(t1 - t2).sum(2).ravel())
+            else:
+                designx.append(np.array(
+                    [self.dist_func(x1, x2) for x1, x2 in
+                     zip(t1.reshape(-1, time.shape[1]),
+                         t2.reshape(-1, time.shape[1]))]))
+        self._designx_b = np.concatenate(designx)
+        return self._designx_b
+
     def covariance_matrix(self, endog_expval, index):
         ngrp = len(endog_expval)
         if self.dep_params == 0:
@@ -813,13 +1029,13 @@ class Autoregressive(CovStruct):
                 flatten = True
             x1 = x / stdev[:, None]
 
-            z0 = np.zeros((1, x.shape[1]))
-            rhs1 = np.concatenate((x[1:, :], z0), axis=0)
-            rhs2 = np.concatenate((z0, x[0:-1, :]), axis=0)
+            z0 = np.zeros((1, x1.shape[1]))
+            rhs1 = np.concatenate((x1[1:, :], z0), axis=0)
+            rhs2 = np.concatenate((z0, x1[0:-1, :]), axis=0)
 
-            y = c0 * x + c2 * rhs1 + c2 * rhs2
-            y[0, :] = c1 * x[0, :] + c2 * x[1, :]
-            y[-1, :] = c1 * x[-1, :] + c2 * x[-2, :]
+            y = c0 * x1 + c2 * rhs1 + c2 * rhs2
+            y[0, :] = c1 * x1[0, :] + c2 * x1[1, :]
+            y[-1, :] = c1 * x1[-1, :] + c2 * x1[-2, :]
 
             y /= stdev[:, None]
 
@@ -830,9 +1046,42 @@ class Autoregressive(CovStruct):
 
         return soln
 
+    def covariance_matrix_solve_batch(self, expval, index, stdev, rhs):
+
+        k = expval.shape[1]
+        soln = []
+        for x in rhs:
+            sd = stdev if x.ndim == 2 else stdev[:, :, None]
+
+            if k == 1:
+                soln.append(x / sd ** 2)
+                continue
+
+            # The same tri-diagonal inverse as in covariance_matrix_solve,
+            # applied along the second axis.
+            x1 = x / sd
+            if k == 2:
+                y = x1 - self.dep_params * x1[:, ::-1]
+                y /= (1. - self.dep_params ** 2)
+            else:
+                c0 = (1. + self.dep_params ** 2) / (1. - self.dep_params ** 2)
+                c1 = 1. / (1. - self.dep_params ** 2)
+                c2 = -self.dep_params / (1. - self.dep_params ** 2)
+                y = c0 * x1
+                y[:, :-1] += c2 * x1[:, 1:]
+                y[:, 1:] += c2 * x1[:, :-1]
+                y[:, 0] = c1 * x1[:, 0] + c2 * x1[:, 1]
+                y[:, -1] = c1 * x1[:, -1] + c2 * x1[:, -2]
+            y /= sd
+            soln.append(y)
+
+        return soln
+
     update.__doc__ = CovStruct.update.__doc__
     covariance_matrix.__doc__ = CovStruct.covariance_matrix.__doc__
     covariance_matrix_solve.__doc__ = CovStruct.covariance_matrix_solve.__doc__
+    covariance_matrix_solve_batch.__doc__ = (
+        CovStruct.covariance_matrix_solve_batch.__doc__)
 
     def summary(self):
 
@@ -879,6 +1128,16 @@ class GlobalOddsRatio(CategoricalCovStruct):
     Estimate the global odds ratio for a GEE with ordinal or nominal
     data.
 
+    Parameters
+    ----------
+    endog_type : str
+        Either "ordinal" or "nominal".
+    n_jobs : int
+        Number of processes used to accumulate the pairwise tables when
+        updating the odds ratio. The clusters are split into `n_jobs`
+        shards whose partial tables are added up. Requires joblib,
+        -1 uses all cores.
+
     References
     ----------
     PJ Heagerty and S Zeger. "Marginal Regression Models for Clustered
@@ -898,14 +1157,19 @@ class GlobalOddsRatio(CategoricalCovStruct):
     pairs (a,b), where endog_li[i][a:b] is the subvector of binary
     indicators derived from the same ordinal value.
 
-    `cpp` is a dictionary where cpp[group] is a map from cut-point
+    `cpp` is a list where cpp[group] is a map from cut-point
     pairs (c,c') to the indices of all between-subject pairs derived
-    from the given cut points.
+    from the given cut points. Clusters with the same number of subjects
+    share the same map.
+
+    The pairwise tables are computed for all clusters of the same size
+    at once, without forming the matrices of joint probabilities.
     """
 
-    def __init__(self, endog_type):
+    def __init__(self, endog_type, n_jobs=1):
         super(GlobalOddsRatio, self).__init__()
         self.endog_type = endog_type
+        self.n_jobs = n_jobs
         self.dep_params = 0.
 
     def initialize(self, model):
@@ -917,25 +1181,27 @@ class GlobalOddsRatio(CategoricalCovStruct):
                           "cov_struct, using unweighted covariance estimate",
                           NotImplementedWarning)
 
-        # Need to restrict to between-subject pairs
-        cpp = []
-        for v in model.endog_li:
+        ncut = self._ncut
+        self._keys = [(k2, k1) for k1 in range(ncut) for k2 in range(k1 + 1)]
 
-            # Number of subjects in this group
-            m = int(len(v) / self._ncut)
+        # Need to restrict to between-subject pairs. The pairs only depend
+        # on the number of subjects in a cluster, clusters of the same size
+        # share the index arrays.
+        sizes = np.array([len(v) for v in model.endog_li]) // ncut
+        pair_index = {}
+        cpp_size = {}
+        for m in np.unique(sizes):
             i1, i2 = np.tril_indices(m, -1)
+            ia = np.array([i1 * ncut + k1 for (k2, k1) in self._keys])
+            ib = np.array([i2 * ncut + k2 for (k2, k1) in self._keys])
+            pair_index[m] = (ia, ib)
+            cpp_size[m] = {ky: np.column_stack((ia[j], ib[j]))
+                           for j, ky in enumerate(self._keys)}
+        self.cpp = [cpp_size[m] for m in sizes]
 
-            cpp1 = {}
-            for k1 in range(self._ncut):
-                for k2 in range(k1 + 1):
-                    jj = np.zeros((len(i1), 2), dtype=np.int64)
-                    jj[:, 0] = i1 * self._ncut + k1
-                    jj[:, 1] = i2 * self._ncut + k2
-                    cpp1[(k2, k1)] = jj
-
-            cpp.append(cpp1)
-
-        self.cpp = cpp
+        # cluster indices grouped by the number of subjects
+        self._size_index = [(np.flatnonzero(sizes == m),) + pair_index[m]
+                            for m in np.unique(sizes) if m > 1]
 
         # Initialize the dependence parameters
         self.crude_or = self.observed_crude_oddsratio()
@@ -985,33 +1251,34 @@ class GlobalOddsRatio(CategoricalCovStruct):
         will generally be greater than the stratified OR.
         """
 
-        cpp = self.cpp
         endog = self.model.endog_li
+        values = [np.array([endog[i] for i in index])
+                  for index, _, _ in self._size_index]
+        tables = self._pair_tables(values, 1.)
 
-        # Storage for the contingency tables for each (c,c')
-        tables = {}
-        for ii in iterkeys(cpp[0]):
-            tables[ii] = np.zeros((2, 2), dtype=np.float64)
-
-        # Get the observed crude OR
-        for i in range(len(endog)):
+        return self.pooled_odds_ratio(list(tables))
 
-            # The observed joint values for the current cluster
-            yvec = endog[i]
-            endog_11 = np.outer(yvec, yvec)
-            endog_10 = np.outer(yvec, 1. - yvec)
-            endog_01 = np.outer(1. - yvec, yvec)
-            endog_00 = np.outer(1. - yvec, 1. - yvec)
-
-            cpp1 = cpp[i]
-            for ky in iterkeys(cpp1):
-                ix = cpp1[ky]
-                tables[ky][1, 1] += endog_11[ix[:, 0], ix[:, 1]].sum()
-                tables[ky][1, 0] += endog_10[ix[:, 0], ix[:, 1]].sum()
-                tables[ky][0, 1] += endog_01[ix[:, 0], ix[:, 1]].sum()
-                tables[ky][0, 0] += endog_00[ix[:, 0], ix[:, 1]].sum()
+    def _pair_tables(self, values, current_or):
+        """
+        The 2x2 tables of all between-subject pairs for each pair of cut
+        points, summed over clusters.
 
-        return self.pooled_odds_ratio(list(itervalues(tables)))
+        `values` contains one array of stacked clusters for each cluster
+        size in `_size_index`. The clusters are split into `n_jobs` shards
+        and the partial tables of the shards are added up.
+        """
+        pairs = [(ia, ib) for _, ia, ib in self._size_index]
+        n_jobs = self.n_jobs
+        if n_jobs == 1:
+            return _odds_ratio_tables(values, pairs, current_or)
+
+        from statsmodels.tools.parallel import parallel_func
+        parallel, p_func, n_jobs = parallel_func(_odds_ratio_tables, n_jobs,
+                                                 verbose=0)
+        shards = [np.array_split(v, n_jobs) for v in values]
+        partial = parallel(p_func([sh[j] for sh in shards], pairs, current_or)
+                           for j in range(n_jobs))
+        return sum(partial)
 
     def get_eyy(self, endog_expval, index):
         """
@@ -1051,36 +1318,18 @@ class GlobalOddsRatio(CategoricalCovStruct):
         params.
         """
 
-        cpp = self.cpp
         cached_means = self.model.cached_means
 
         # This will happen if all the clusters have only
         # one observation
-        if len(cpp[0]) == 0:
+        if len(self._size_index) == 0:
             return
 
-        tables = {}
-        for ii in cpp[0]:
-            tables[ii] = np.zeros((2, 2), dtype=np.float64)
-
-        for i in range(self.model.num_group):
-
-            endog_expval, _ = cached_means[i]
-
-            emat_11 = self.get_eyy(endog_expval, i)
-            emat_10 = endog_expval[:, None] - emat_11
-            emat_01 = -emat_11 + endog_expval
-            emat_00 = 1. - (emat_11 + emat_10 + emat_01)
+        values = [np.array([cached_means[i][0] for i in index])
+                  for index, _, _ in self._size_index]
+        tables = self._pair_tables(values, self.dep_params)
 
-            cpp1 = cpp[i]
-            for ky in iterkeys(cpp1):
-                ix = cpp1[ky]
-                tables[ky][1, 1] += emat_11[ix[:, 0], ix[:, 1]].sum()
-                tables[ky][1, 0] += emat_10[ix[:, 0], ix[:, 1]].sum()
-                tables[ky][0, 1] += emat_01[ix[:, 0], ix[:, 1]].sum()
-                tables[ky][0, 0] += emat_00[ix[:, 0], ix[:, 1]].sum()
-
-        cor_expval = self.pooled_odds_ratio(list(itervalues(tables)))
+        cor_expval = self.pooled_odds_ratio(list(tables))
 
         self.dep_params *= self.crude_or / cor_expval
         if not np.isfinite(self.dep_params):
@@ -1096,6 +1345,60 @@ class GlobalOddsRatio(CategoricalCovStruct):
         return "Global odds ratio: %.3f\n" % self.dep_params
 
 
+def _odds_ratio_tables(values, pairs, current_or):
+    """
+    Sum of the 2x2 tables of joint probabilities of binary indicators
+
+    Parameters
+    ----------
+    values : list of ndarray
+        Each element is a n_clusters x dim array with the marginal
+        probabilities, or the observed binary indicators, of clusters of
+        the same size.
+    pairs : list of tuples
+        Pairs of index arrays `(ia, ib)` for the clusters in `values`.
+        Row j of `ia` and `ib` holds the positions of the between-subject
+        pairs for the j-th pair of cut points.
+    current_or : float
+        The global odds ratio defining the joint probabilities. The joint
+        probabilities are the products of the marginal ones if it is 1.
+
+    Returns
+    -------
+    tables : ndarray
+        Array of shape (n_cut_pairs, 2, 2), ``tables[j, 1, 1]`` is the sum
+        of P(Y_a = 1, Y_b = 1) over all pairs (a, b) for cut pair j.
+    """
+    tables = None
+    for v, (ia, ib) in zip(values, pairs):
+        if len(v) == 0:
+            continue
+        ea = v[:, ia]
+        eb = v[:, ib]
+        pprod = ea * eb
+        if current_or == 1.0:
+            p11 = pprod
+        else:
+            psum = ea + eb
+            pfac = np.sqrt((1. + psum * (current_or - 1.)) ** 2 +
+                           4 * current_or * (1. - current_or) * pprod)
+            p11 = 1. + psum * (current_or - 1.) - pfac
+            p11 /= 2. * (current_or - 1)
+        t11 = p11.sum((0, 2))
+        sa = ea.sum((0, 2))
+        sb = eb.sum((0, 2))
+        tab = np.empty((len(t11), 2, 2))
+        tab[:, 1, 1] = t11
+        tab[:, 1, 0] = sa - t11
+        tab[:, 0, 1] = sb - t11
+        tab[:, 0, 0] = ea.shape[0] * ea.shape[2] - sa - sb + t11
+        tables = tab if tables is None else tables + tab
+    if tables is None:
+        n_keys = len(pairs[0][0]) if pairs else 0
+        tables = np.zeros((n_keys, 2, 2))
+    return tables
+
+
 class OrdinalIndependence(CategoricalCovStruct):
     """
     An independence covariance structure for ordinal models.
@@ -304,6 +304,15 @@ _gee_fit_doc = """
         scaled by this value.  Default is 1, Stata uses N / (N - g),
         where N is the total sample size and g is the average group
         size.
+    batched : bool
+        If True, clusters of the same size are processed together with
+        stacked array operations instead of looping over the clusters.
+        This is much faster for data with many small clusters and gives
+        the same results up to floating point accuracy.  The working
+        covariance solves are vectorized for the Independence,
+        Exchangeable, Autoregressive, Nested and Stationary (grid)
+        dependence structures, other structures are solved cluster by
+        cluster.
 
     Returns
     -------
@@ -456,6 +465,8 @@ class GEE(base.Model):
          'example': _gee_example})
 
     cached_means = None
+    _size_groups = None
+    _size_groups_cache = None
 
     def __init__(self, endog, exog, groups, time=None, family=None,
                  cov_struct=None, missing='none', offset=None,
@@ -699,6 +710,77 @@ class GEE(base.Model):
             return [np.array(array[self.group_indices[k], :])
                     for k in self.group_labels]
 
+    def _setup_batch(self):
+        """
+        Stack the row indices of clusters with the same size.
+
+        Sets `_size_groups` to a list of pairs ``(index, rows)``, one for
+        each distinct cluster size m, where `index` holds the positions
+        of the clusters in `group_labels` and `rows` is the len(index) x m
+        array with their row positions in `endog` and `exog`.
+        """
+        if self._size_groups_cache is not None:
+            self._size_groups = self._size_groups_cache
+            return
+
+        # stable sort keeps the order of the observations within clusters
+        group_ix = np.unique(self.groups, return_inverse=True)[1]
+        order = np.argsort(group_ix, kind='mergesort')
+        sizes = np.bincount(group_ix)
+        starts = np.r_[0, np.cumsum(sizes)[:-1]]
+
+        size_groups = []
+        for size in np.unique(sizes):
+            index = np.flatnonzero(sizes == size)
+            rows = order[starts[index][:, None] + np.arange(size)]
+            size_groups.append((index, rows))
+        self._size_groups = self._size_groups_cache = size_groups
+        self._cluster_rows = [self.group_indices[k] for k in self.group_labels]
+
+        # time_li is also used if time was not provided, align it with
+        # the rows of the data
+        self._time_batch = np.empty((len(self.endog), self.time.shape[1]))
+        self._time_batch[order] = np.concatenate(self.time_li)
+
+    def _batch_arrays(self):
+        """
+        Yields the arrays used by the batched engine for each cluster size.
+
+        These are the cluster indices, the n_clust x m arrays of fitted
+        means, residuals and standard deviations, the n_clust x m x p
+        derivatives of the mean with respect to the parameters, and the
+        cluster weights.  Nothing is yielded if the batched engine is not
+        used.
+        """
+        if self._size_groups is None:
+            return
+
+        expval, lpr = self.cached_means.expval, self.cached_means.lpr
+        resid = self.endog - expval
+        dmat = self.mean_deriv(self.exog, lpr)
+        sdev = np.sqrt(self.family.variance(expval))
+        for index, rows in self._size_groups:
+            f = (self.weights_li[index] if self.weights is not None
+                 else np.ones(len(index)))
+            yield index, expval[rows], resid[rows], dmat[rows], sdev[rows], f
+
+    def _iter_size_groups(self):
+        """
+        Size groups of the batched engine, empty if it is not used.
+        """
+        if self._size_groups is None:
+            return []
+        return self._size_groups
+
+    def _iter_loop_groups(self):
+        """
+        Cluster indices for the per-cluster loops, empty if the batched
+        engine is used.
+        """
+        if self._size_groups is not None:
+            return range(0)
+        return range(self.num_group)
+
     def estimate_scale(self):
         """
         Returns an estimate of the scale parameter at the current
@@ -716,7 +798,20 @@ class GEE(base.Model):
 
         scale = 0.
         fsum = 0.
-        for i in range(self.num_group):
+        for index, rows in self._iter_size_groups():
+
+            expval, _ = cached_means.batch(rows)
+
+            f = (self.weights_li[index] if self.weights is not None
+                 else np.ones(len(index)))
+
+            sdev = np.sqrt(varfunc(expval))
+            resid = (self.endog[rows] - expval) / sdev
+
+            scale += np.dot(f, np.sum(resid ** 2, 1))
+            fsum += f.sum() * rows.shape[1]
+
+        for i in self._iter_loop_groups():
 
             if len(endog[i]) == 0:
                 continue
@@ -810,7 +905,19 @@ class GEE(base.Model):
         varfunc = self.family.variance
 
         bmat, score = 0, 0
-        for i in range(self.num_group):
+        for index, expval, resid, dmat, sdev, f in self._batch_arrays():
+
+            rslt = self.cov_struct.covariance_matrix_solve_batch(
+                expval, index, sdev, (dmat, resid))
+            if rslt is None:
+                return None, None
+            vinv_d, vinv_resid = tuple(rslt)
+
+            fdmat = f[:, None, None] * dmat
+            bmat += np.tensordot(fdmat, vinv_d, axes=([0, 1], [0, 1]))
+            score += np.tensordot(fdmat, vinv_resid, axes=([0, 1], [0, 1]))
+
+        for i in self._iter_loop_groups():
 
             expval, lpr = cached_means[i]
             resid = endog[i] - expval
@@ -849,6 +956,14 @@ class GEE(base.Model):
 
         linkinv = self.family.link.inverse
 
+        if self._size_groups is not None:
+            lpr = np.dot(self.exog, mean_params)
+            if self._offset_exposure is not None:
+                lpr += self._offset_exposure
+            self.cached_means = _ClusterMeans(linkinv(lpr), lpr,
+                                              self._cluster_rows)
+            return
+
         self.cached_means = []
 
         for i in range(self.num_group):
@@ -891,7 +1006,20 @@ class GEE(base.Model):
         # Calculate the naive (model-based) and robust (sandwich)
         # covariances.
         bmat, cmat = 0, 0
-        for i in range(self.num_group):
+        for index, expval, resid, dmat, sdev, f in self._batch_arrays():
+
+            rslt = self.cov_struct.covariance_matrix_solve_batch(
+                expval, index, sdev, (dmat, resid))
+            if rslt is None:
+                return None, None, None, None
+            vinv_d, vinv_resid = tuple(rslt)
+
+            fdmat = f[:, None, None] * dmat
+            bmat += np.tensordot(fdmat, vinv_d, axes=([0, 1], [0, 1]))
+            dvinv_resid = np.einsum('ijk,ij->ik', fdmat, vinv_resid)
+            cmat += np.dot(dvinv_resid.T, dvinv_resid)
+
+        for i in self._iter_loop_groups():
 
             expval, lpr = cached_means[i]
             resid = endog[i] - expval
@@ -932,7 +1060,30 @@ class GEE(base.Model):
         scale = self.estimate_scale()
 
         bcm = 0
-        for i in range(self.num_group):
+        for index, expval, resid, dmat, sdev, f in self._batch_arrays():
+
+            rslt = self.cov_struct.covariance_matrix_solve_batch(
+                expval, index, sdev, (dmat,))
+            if rslt is None:
+                return None
+            vinv_d = rslt[0]
+            vinv_d /= scale
+
+            hmat = np.dot(vinv_d, cov_naive)
+            hmat = np.einsum('ijk,ilk->ilj', hmat, dmat)
+
+            dim = resid.shape[1]
+            aresid = np.linalg.solve(np.eye(dim) - hmat,
+                                     resid[:, :, None])[:, :, 0]
+            rslt = self.cov_struct.covariance_matrix_solve_batch(
+                expval, index, sdev, (aresid,))
+            if rslt is None:
+                return None
+            srt = rslt[0]
+            srt = f[:, None] * np.einsum('ijk,ij->ik', dmat, srt) / scale
+            bcm += np.dot(srt.T, srt)
+
+        for i in self._iter_loop_groups():
 
             expval, lpr = cached_means[i]
             resid = endog[i] - expval
@@ -1059,9 +1210,15 @@ class GEE(base.Model):
 
     def fit(self, maxiter=60, ctol=1e-6, start_params=None,
             params_niter=1, first_dep_update=0,
-            cov_type='robust', ddof_scale=None, scaling_factor=1.):
+            cov_type='robust', ddof_scale=None, scaling_factor=1.,
+            batched=False):
         # Docstring attached below
 
+        if batched:
+            self._setup_batch()
+        else:
+            self._size_groups = None
+
         # Subtract this number from the total sample size when
         # normalizing the scale parameter estimate.
         if ddof_scale is None:
@@ -1228,56 +1385,60 @@ class GEE(base.Model):
         full_p = self.constraint.lhs.shape[1]
         mean_params0 = np.r_[mean_params, np.zeros(full_p - red_p)]
 
-        # Get the score vector under the full model.
-        save_exog_li = self.exog_li
-        self.exog_li = self.constraint.exog_fulltrans_li
+        # Get the score vector under the full model.  The data and cached
+        # means of the full model are swapped in, and restored on every
+        # exit path.
         import copy
+        save_exog_li = self.exog_li
         save_cached_means = copy.deepcopy(self.cached_means)
-        self.update_cached_means(mean_params0)
-        _, score = self._update_mean_params()
+        self.exog_li = self.constraint.exog_fulltrans_li
+        self.exog = self.constraint.exog_fulltrans
+        try:
+            self.update_cached_means(mean_params0)
+            _, score = self._update_mean_params()
 
-        if score is None:
-            warnings.warn("Singular matrix encountered in GEE score test",
-                          ConvergenceWarning)
-            return None, None
+            if score is None:
+                warnings.warn("Singular matrix encountered in GEE score test",
+                              ConvergenceWarning)
+                return None, None
 
-        _, ncov1, cmat = self._covmat()
-        scale = self.estimate_scale()
-        cmat = cmat / scale ** 2
-        score2 = score[red_p:] / scale
-
-        amat = np.linalg.inv(ncov1)
-
-        bmat_11 = cmat[0:red_p, 0:red_p]
-        bmat_22 = cmat[red_p:, red_p:]
-        bmat_12 = cmat[0:red_p, red_p:]
-        amat_11 = amat[0:red_p, 0:red_p]
-        amat_12 = amat[0:red_p, red_p:]
-
-        score_cov = bmat_22 - np.dot(amat_12.T,
-                                     np.linalg.solve(amat_11, bmat_12))
-        score_cov -= np.dot(bmat_12.T,
-                            np.linalg.solve(amat_11, amat_12))
-        score_cov += np.dot(amat_12.T,
-                            np.dot(np.linalg.solve(amat_11, bmat_11),
-                                   np.linalg.solve(amat_11, amat_12)))
-
-        from scipy.stats.distributions import chi2
-        score_statistic = np.dot(score2,
-                                 np.linalg.solve(score_cov, score2))
-        score_df = len(score2)
-        score_pvalue = 1 - chi2.cdf(score_statistic, score_df)
-        self.score_test_results = {"statistic": score_statistic,
-                                   "df": score_df,
-                                   "p-value": score_pvalue}
+            _, ncov1, cmat = self._covmat()
+            scale = self.estimate_scale()
+            cmat = cmat / scale ** 2
+            score2 = score[red_p:] / scale
+
+            amat = np.linalg.inv(ncov1)
+
+            bmat_11 = cmat[0:red_p, 0:red_p]
+            bmat_22 = cmat[red_p:, red_p:]
+            bmat_12 = cmat[0:red_p, red_p:]
+            amat_11 = amat[0:red_p, 0:red_p]
+            amat_12 = amat[0:red_p, red_p:]
+
+            score_cov = bmat_22 - np.dot(amat_12.T,
+                                         np.linalg.solve(amat_11, bmat_12))
+            score_cov -= np.dot(bmat_12.T,
+                                np.linalg.solve(amat_11, amat_12))
+            score_cov += np.dot(amat_12.T,
+                                np.dot(np.linalg.solve(amat_11, bmat_11),
+                                       np.linalg.solve(amat_11, amat_12)))
+
+            from scipy.stats.distributions import chi2
+            score_statistic = np.dot(score2,
+                                     np.linalg.solve(score_cov, score2))
+            score_df = len(score2)
+            score_pvalue = 1 - chi2.cdf(score_statistic, score_df)
+            self.score_test_results = {"statistic": score_statistic,
+                                       "df": score_df,
+                                       "p-value": score_pvalue}
+        finally:
+            self.exog_li = save_exog_li
+            self.cached_means = save_cached_means
+            self.exog = self.constraint.restore_exog()
 
         mean_params = self.constraint.unpack_param(mean_params)
         bcov = self.constraint.unpack_cov(bcov)
 
-        self.exog_li = save_exog_li
-        self.cached_means = save_cached_means
-        self.exog = self.constraint.restore_exog()
-
         return mean_params, bcov
 
     def _update_assoc(self, params):
@@ -1324,6 +1485,32 @@ class GEE(base.Model):
         return margeff
 
 
+class _ClusterMeans(object):
+    """
+    Fitted means and linear predictor of all observations.
+
+    Indexing with a cluster position returns the ``(expval, lpr)`` pair
+    of that cluster, as for the list of cached means that is used when
+    GEE loops over the clusters.
+    """
+
+    def __init__(self, expval, lpr, cluster_rows):
+        self.expval = expval
+        self.lpr = lpr
+        self.cluster_rows = cluster_rows
+
+    def __len__(self):
+        return len(self.cluster_rows)
+
+    def __getitem__(self, i):
+        rows = self.cluster_rows[i]
+        return self.expval[rows], self.lpr[rows]
+
+    def batch(self, rows):
+        """(expval, lpr) as n_clust x m arrays for stacked row indices"""
+        return self.expval[rows], self.lpr[rows]
+
+
 class GEEResults(base.LikelihoodModelResults):
 
     __doc__ = (
@@ -1976,11 +2163,12 @@ class OrdinalGEE(GEE):
 
     def fit(self, maxiter=60, ctol=1e-6, start_params=None,
             params_niter=1, first_dep_update=0,
-            cov_type='robust'):
+            cov_type='robust', batched=False):
 
         rslt = super(OrdinalGEE, self).fit(maxiter, ctol, start_params,
                                            params_niter, first_dep_update,
-                                           cov_type=cov_type)
+                                           cov_type=cov_type,
+                                           batched=batched)
 
         rslt = rslt._results   # use unwrapped instance
         res_kwds = dict(((k, getattr(rslt, k)) for k in rslt._props))
@@ -2308,11 +2496,12 @@ class NominalGEE(GEE):
 
     def fit(self, maxiter=60, ctol=1e-6, start_params=None,
             params_niter=1, first_dep_update=0,
-            cov_type='robust'):
+            cov_type='robust', batched=False):
 
         rslt = super(NominalGEE, self).fit(maxiter, ctol, start_params,
                                            params_niter, first_dep_update,
-                                           cov_type=cov_type)
+                                           cov_type=cov_type,
+                                           batched=batched)
         if rslt is None:
             warnings.warn("GEE updates did not converge",
                           ConvergenceWarning)
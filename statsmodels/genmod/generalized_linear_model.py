@@ -27,6 +27,7 @@ import statsmodels.base.model as base
 import statsmodels.regression.linear_model as lm
 import statsmodels.base.wrapper as wrap
 import statsmodels.regression._tools as reg_tools
+from statsmodels.tools import _sparse
 
 
 from statsmodels.graphics._regressionplots_doc import (
@@ -293,11 +294,18 @@ class GLM(base.LikelihoodModel):
                         'params' : [np.inf],
                         'deviance' : [np.inf]}
 
-        self.pinv_wexog = np.linalg.pinv(self.exog)
-        self.normalized_cov_params = np.dot(self.pinv_wexog,
-                                            np.transpose(self.pinv_wexog))
+        if _sparse.issparse(self.exog):
+            # avoid a dense pinv of a sparse design matrix
+            self.pinv_wexog = None
+            ncp, _, rank = _sparse.pinv_normal(self.exog)
+            self.normalized_cov_params = ncp
+            self.df_model = rank - 1
+        else:
+            self.pinv_wexog = np.linalg.pinv(self.exog)
+            self.normalized_cov_params = np.dot(self.pinv_wexog,
+                                                np.transpose(self.pinv_wexog))
 
-        self.df_model = np_matrix_rank(self.exog) - 1
+            self.df_model = np_matrix_rank(self.exog) - 1
 
 
         if (self.freq_weights is not None) and \
@@ -361,7 +369,7 @@ class GLM(base.LikelihoodModel):
         """
         Evaluate the log-likelihood for a generalized linear model.
         """
-        lin_pred = np.dot(self.exog, params) + self._offset_exposure
+        lin_pred = _sparse.dot(self.exog, params) + self._offset_exposure
         expval = self.family.link.inverse(lin_pred)
         if scale is None:
             scale = self.estimate_scale(expval)
@@ -385,11 +393,14 @@ class GLM(base.LikelihoodModel):
         -------
         score_obs : ndarray, 2d
             The first derivative of the loglikelihood function evaluated at
-            params for each observation.
+            params for each observation. If exog is a scipy.sparse matrix,
+            then score_obs is a sparse matrix in the same format.
 
         """
 
         score_factor = self.score_factor(params, scale=scale)
+        if _sparse.issparse(self.exog):
+            return _sparse.scale_rows(self.exog, score_factor)
         return score_factor[:, None] * self.exog
 
 
@@ -412,6 +423,9 @@ class GLM(base.LikelihoodModel):
             the sum of `score_obs`
 
         """
+        if _sparse.issparse(self.exog):
+            score_factor = self.score_factor(params, scale=scale)
+            return self.exog.T.dot(score_factor)
         return self.score_obs(params, scale=scale).sum(0)
 
 
@@ -531,7 +545,7 @@ class GLM(base.LikelihoodModel):
         """
 
         factor = self.hessian_factor(params, scale=scale, observed=observed)
-        hess = -np.dot(self.exog.T * factor, self.exog)
+        hess = -_sparse.xtwx(self.exog, factor)
         return hess
 
 
@@ -774,7 +788,7 @@ class GLM(base.LikelihoodModel):
         if exog is None:
             exog = self.exog
 
-        linpred = np.dot(exog, params) + offset + exposure
+        linpred = _sparse.dot(exog, params) + offset + exposure
         if linear:
             return linpred
         else:
@@ -975,7 +989,7 @@ class GLM(base.LikelihoodModel):
             mu = self.family.starting_mu(self.endog)
             lin_pred = self.family.predict(mu)
         else:
-            lin_pred = np.dot(wlsexog, start_params) + self._offset_exposure
+            lin_pred = _sparse.dot(wlsexog, start_params) + self._offset_exposure
             mu = self.family.fitted(lin_pred)
         dev = self.family.deviance(self.endog, mu, self.freq_weights)
         if np.isnan(dev):
@@ -1001,7 +1015,7 @@ class GLM(base.LikelihoodModel):
             wlsendog = (lin_pred + self.family.link.deriv(mu) * (self.endog-mu)
                         - self._offset_exposure)
             wls_results = reg_tools._MinimalWLS(wlsendog, wlsexog, self.weights).fit(method='lstsq')
-            lin_pred = np.dot(self.exog, wls_results.params) + self._offset_exposure
+            lin_pred = _sparse.dot(self.exog, wls_results.params) + self._offset_exposure
             mu = self.family.fitted(lin_pred)
             history = self._update_history(wls_results, mu, history)
             self.scale = self.estimate_scale(mu)
@@ -620,6 +620,36 @@ class TestGEE(object):
             if cov_type == "bias_reduced":
                 assert_allclose(result.cov_robust_bc.shape, np.r_[4, 4])
 
+    def test_constraint_singular_score(self):
+        # The data of the reduced model are restored when the score test
+        # fails
+        np.random.seed(6432)
+        n = 200
+        exog = np.random.normal(size=(n, 4))
+        endog = exog[:, 0] + exog[:, 1] + exog[:, 2]
+        endog += 3 * np.random.normal(size=n)
+        group = np.kron(np.arange(n / 4), np.ones(4))
+        L = np.array([[1., -1, 0, 0]])
+        R = np.array([0., ])
+        model = GEE(endog, exog, group, cov_struct=Independence(),
+                    constraint=(L, R))
+        model.fit()
+        exog_li = model.exog_li
+        cached_means = [x[0].copy() for x in model.cached_means]
+
+        def fail(*args):
+            return None
+        model.cov_struct.covariance_matrix_solve = fail
+        model.cov_struct.covariance_matrix_solve_batch = fail
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            rslt = model._handle_constraint(np.zeros(3), np.eye(3))
+        assert_equal(rslt, (None, None))
+        assert_(model.exog_li is exog_li)
+        assert_equal(model.exog, exog)
+        for x, y in zip(model.cached_means, cached_means):
+            assert_allclose(x[0], y)
+
     def test_linear(self):
         # library(gee)
 
@@ -1659,6 +1689,105 @@ def test_missing():
     assert_almost_equal(res.params.values, res2.params.values)
 
 
+def test_batched():
+    # clusters of equal size are processed together, compare with the
+    # cluster by cluster loop
+    np.random.seed(3424)
+    n_groups = 60
+    sizes = np.random.randint(1, 6, n_groups)
+    groups = np.repeat(np.arange(n_groups), sizes)
+    # interleave the clusters
+    ii = np.random.permutation(len(groups))
+    groups = groups[ii]
+    n = len(groups)
+    time = np.zeros(n)
+    for g in range(n_groups):
+        jj = np.flatnonzero(groups == g)
+        time[jj] = np.arange(len(jj))
+    exog = np.column_stack((np.ones(n), np.random.normal(size=(n, 2))))
+    re = np.random.normal(size=n_groups)[groups]
+    lin_pred = 0.5 * exog[:, 1] - 0.2 * exog[:, 2] + 0.5 * re
+    weights = np.random.uniform(0.5, 2, size=n_groups)[groups]
+    dep_data = np.random.randint(0, 2, size=n)
+
+    endogs = {Gaussian: lin_pred + np.random.normal(size=n),
+              Poisson: np.random.poisson(np.exp(lin_pred)),
+              Binomial: (np.random.uniform(size=n) <
+                         1 / (1 + np.exp(-lin_pred))).astype(np.float64)}
+
+    for family in Gaussian, Poisson, Binomial:
+        endog = endogs[family]
+        for cov_struct in (Independence, Exchangeable, Autoregressive,
+                           Nested, Stationary):
+            for w in None, weights:
+                kwds = {}
+                if cov_struct is Nested:
+                    kwds['dep_data'] = dep_data
+                if cov_struct is Stationary:
+                    args = (1, True)
+                else:
+                    args = ()
+                results = []
+                for batched in False, True:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore")
+                        mod = GEE(endog, exog, groups, time=time,
+                                  family=family(), weights=w,
+                                  cov_struct=cov_struct(*args), **kwds)
+                        results.append(mod.fit(batched=batched,
+                                               cov_type='bias_reduced'))
+                res1, res2 = results
+                assert_allclose(res2.params, res1.params, rtol=1e-6)
+                assert_allclose(res2.bse, res1.bse, rtol=1e-6)
+                assert_allclose(res2.scale, res1.scale, rtol=1e-6)
+                assert_allclose(res2.cov_naive, res1.cov_naive, rtol=1e-6)
+                dep_params = res1.model.cov_struct.dep_params
+                if dep_params is not None:
+                    assert_allclose(res2.model.cov_struct.dep_params,
+                                    dep_params, rtol=1e-5, atol=1e-7)
+
+
+def test_global_odds_ratio_tables():
+    # compare the pairwise tables with a direct computation from the
+    # joint probability matrices of each cluster
+    np.random.seed(432)
+    n_groups = 40
+    sizes = np.random.randint(1, 6, n_groups)
+    groups = np.repeat(np.arange(n_groups), sizes)
+    n = len(groups)
+    exog = np.random.normal(size=(n, 2))
+    endog = np.digitize(exog[:, 0] + np.random.normal(size=n), [-1, 0, 1])
+
+    for endog_type, model in ("ordinal", OrdinalGEE), ("nominal", NominalGEE):
+        cs = GlobalOddsRatio(endog_type)
+        mod = model(endog, exog, groups, cov_struct=cs)
+        mod.update_cached_means(np.zeros(mod.exog.shape[1]))
+        cs.dep_params = 1.7
+
+        tables = {ky: np.zeros((2, 2)) for ky in cs._keys}
+        for i in range(mod.num_group):
+            expval, _ = mod.cached_means[i]
+            emat_11 = cs.get_eyy(expval, i)
+            for ky, ix in cs.cpp[i].items():
+                e11 = emat_11[ix[:, 0], ix[:, 1]]
+                ea, eb = expval[ix[:, 0]], expval[ix[:, 1]]
+                tables[ky] += [[(1 - ea - eb + e11).sum(), (eb - e11).sum()],
+                               [(ea - e11).sum(), e11.sum()]]
+
+        values = [np.array([mod.cached_means[i][0] for i in index])
+                  for index, _, _ in cs._size_index]
+        tables2 = cs._pair_tables(values, cs.dep_params)
+        assert_allclose(tables2, [tables[ky] for ky in cs._keys],
+                        rtol=1e-12)
+
+        # sharded computation, falls back to one job without joblib
+        cs.n_jobs = 3
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            tables3 = cs._pair_tables(values, cs.dep_params)
+        assert_allclose(tables3, tables2, rtol=1e-12)
+
+
 if __name__ == "__main__":
 
     import nose
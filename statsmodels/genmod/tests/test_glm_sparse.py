@@ -0,0 +1,75 @@
+"""
+Tests for GLM with a scipy.sparse design matrix
+"""
+import numpy as np
+from numpy.testing import assert_allclose
+from scipy import sparse
+
+from statsmodels.tools.grouputils import dummy_sparse
+from statsmodels.genmod.generalized_linear_model import GLM
+from statsmodels.genmod import families
+
+
+def test_sparse_glm():
+    rs = np.random.RandomState(1357)
+    nobs = 1000
+    groups = rs.randint(0, 20, size=nobs)
+    exog = sparse.hstack([dummy_sparse(groups),
+                          sparse.csr_matrix(rs.randn(nobs, 2))]).tocsr()
+    exog_dense = exog.toarray()
+    linpred = 0.5 + 0.2 * exog_dense[:, -2] - 0.3 * exog_dense[:, -1]
+    endogs = [(families.Gaussian(), linpred + rs.randn(nobs)),
+              (families.Poisson(), rs.poisson(np.exp(linpred))),
+              (families.Binomial(),
+               (rs.rand(nobs) < 1 / (1 + np.exp(-linpred))).astype(float))]
+    for family, endog in endogs:
+        res1 = GLM(endog, exog_dense, family=family).fit()
+        res2 = GLM(endog, exog, family=family).fit()
+        for attr in ['params', 'bse', 'llf', 'deviance', 'pearson_chi2',
+                     'df_model', 'df_resid']:
+            assert_allclose(getattr(res2, attr), getattr(res1, attr),
+                            rtol=1e-7, err_msg=attr)
+        assert_allclose(res2.predict(exog[:5]),
+                        res1.predict(exog_dense[:5]), rtol=1e-7)
+        res2.summary()
+
+
+def test_sparse_glm_score_obs():
+    rs = np.random.RandomState(1357)
+    nobs = 200
+    groups = rs.randint(0, 5, size=nobs)
+    for fmt in ['csr', 'csc', 'coo']:
+        exog = sparse.hstack([dummy_sparse(groups),
+                              sparse.csr_matrix(rs.randn(nobs, 2))],
+                             format=fmt)
+        exog_dense = exog.toarray()
+        endog = rs.poisson(np.exp(0.2 * exog_dense[:, -1]))
+        mod1 = GLM(endog, exog_dense, family=families.Poisson())
+        mod2 = GLM(endog, exog, family=families.Poisson())
+        params = mod1.fit().params
+        score_obs = mod2.score_obs(params)
+        assert sparse.issparse(score_obs)
+        assert_allclose(score_obs.toarray(), mod1.score_obs(params),
+                        rtol=1e-10)
+        assert_allclose(np.asarray(score_obs.sum(0)).ravel(),
+                        mod2.score(params), atol=1e-8)
+
+
+def test_sparse_glm_robust():
+    rs = np.random.RandomState(2468)
+    nobs = 500
+    groups = rs.randint(0, 10, size=nobs)
+    clusters = rs.randint(0, 50, size=nobs)
+    exog = sparse.hstack([dummy_sparse(groups),
+                          sparse.csr_matrix(rs.randn(nobs, 2))]).tocsr()
+    exog_dense = exog.toarray()
+    endog = rs.poisson(np.exp(0.2 * exog_dense[:, -1]))
+    freq_weights = rs.randint(1, 4, size=nobs)
+    cov_types = [('HC0', {}), ('cluster', {'groups': clusters})]
+    for cov_type, cov_kwds in cov_types:
+        kwds = dict(family=families.Poisson(), freq_weights=freq_weights)
+        res1 = GLM(endog, exog_dense, **kwds).fit(cov_type=cov_type,
+                                                  cov_kwds=cov_kwds)
+        res2 = GLM(endog, exog, **kwds).fit(cov_type=cov_type,
+                                            cov_kwds=cov_kwds)
+        assert_allclose(res2.bse, res1.bse, rtol=1e-7, err_msg=cov_type)
@@ -16,6 +16,7 @@ except ImportError:
     has_joblib = False
 
 from . import kernels
+from ._kernel_tree import gaussian_kernel_sums
 
 
 kernel_func = dict(wangryzin=kernels.wang_ryzin,
@@ -63,14 +64,15 @@ def _compute_subset(class_type, data, bw, co, do, n_cvars, ix_ord,
         from .kernel_density import KDEMultivariate
         var_type = class_vars[0]
         sub_model = KDEMultivariate(sub_data, var_type, bw=bw,
-                        defaults=EstimatorSettings(efficient=False))
+                        defaults=EstimatorSettings(efficient=False, n_jobs=1))
     elif class_type == 'KDEMultivariateConditional':
         from .kernel_density import KDEMultivariateConditional
         k_dep, dep_type, indep_type = class_vars
         endog = sub_data[:, :k_dep]
         exog = sub_data[:, k_dep:]
         sub_model = KDEMultivariateConditional(endog, exog, dep_type,
-            indep_type, bw=bw, defaults=EstimatorSettings(efficient=False))
+            indep_type, bw=bw,
+            defaults=EstimatorSettings(efficient=False, n_jobs=1))
     elif class_type == 'KernelReg':
         from .kernel_regression import KernelReg
         var_type, k_vars, reg_type = class_vars
@@ -78,7 +80,8 @@ def _compute_subset(class_type, data, bw, co, do, n_cvars, ix_ord,
         exog = _adjust_shape(sub_data[:, 1:], k_vars)
         sub_model = KernelReg(endog=endog, exog=exog, reg_type=reg_type,
                               var_type=var_type, bw=bw,
-                              defaults=EstimatorSettings(efficient=False))
+                              defaults=EstimatorSettings(efficient=False,
+                                                         n_jobs=1))
     else:
         raise ValueError("class_type not recognized, should be one of " \
                  "{KDEMultivariate, KDEMultivariateConditional, KernelReg}")
@@ -516,3 +519,235 @@ def gpke(bw, data, data_predict, var_type, ckertype='gaussian',
         return dens.sum(axis=0)
     else:
         return dens
+
+
+def _gpke_loo_block(bw, data, var_type, weights, kertypes, num_levels,
+                    start, stop):
+    """
+    Returns the leave-one-out kernel sums for the observations start:stop.
+
+    Called from ``gpke_loo``.  Needs to be outside of it in order for joblib
+    to be able to pickle it.
+    """
+    nobs = data.shape[0]
+    rows = np.arange(start, stop)
+    Kval = np.ones((stop - start, nobs))
+    dist = np.zeros((stop - start, nobs))
+    n_gaussian = 0
+    for ii, vtype in enumerate(var_type):
+        Xi = data[None, :, ii]
+        x = data[rows, ii][:, None]
+        if kertypes[vtype] == 'gaussian':
+            # Only one exponential for the product of the Gaussian kernels
+            dist += ((Xi - x) / bw[ii])**2
+            n_gaussian += 1
+        elif num_levels[ii] is not None:
+            # `aitchison_aitken` flattens its arguments
+            shape = Kval.shape
+            Kval *= kernel_func[kertypes[vtype]](
+                bw[ii], np.broadcast_to(Xi, shape).ravel(),
+                np.broadcast_to(x, shape).ravel(),
+                num_levels=np.repeat(num_levels[ii][rows], nobs)
+            ).reshape(shape)
+        else:
+            Kval *= kernel_func[kertypes[vtype]](bw[ii], Xi, x)
+    if n_gaussian > 0:
+        Kval *= (2 * np.pi)**(-0.5 * n_gaussian) * np.exp(-0.5 * dist)
+
+    Kval[np.arange(stop - start), rows] = 0
+    return np.dot(Kval, weights)
+
+
+def gpke_loo(bw, data, var_type, weights=None, ckertype='gaussian',
+             okertype='wangryzin', ukertype='aitchisonaitken', n_jobs=1,
+             max_block=2**20):
+    r"""
+    Returns the leave-one-out non-normalized Generalized Product Kernel
+    Estimator at each observation
+
+    Parameters
+    ----------
+    bw: 1-D ndarray
+        The user-specified bandwidth parameters.
+    data: 2-D ndarray
+        The training data.
+    var_type: str
+        The variable type (continuous, ordered, unordered).
+    weights: 1-D or 2-D ndarray, optional
+        Weights of the observations, shaped (nobs,) or (nobs, n_channels).
+        Default is a weight of one for each observation.
+    ckertype: str, optional
+        The kernel used for the continuous variables.
+    okertype: str, optional
+        The kernel used for the ordered discrete variables.
+    ukertype: str, optional
+        The kernel used for the unordered discrete variables.
+    n_jobs: int, optional
+        The number of jobs used by ``joblib.Parallel`` to compute the blocks
+        of the kernel matrix, if there is more than one block and joblib is
+        installed.  Default is 1.
+    max_block: int, optional
+        The maximum number of elements of the kernel matrix that are
+        computed at once.
+
+    Returns
+    -------
+    dens: 1-D or 2-D ndarray
+        The weighted sums of the kernels over all of the other observations,
+        shaped (nobs,) or (nobs, n_channels).  Without weights, observation
+        `i` has the same result as `gpke` with the data without observation
+        `i`.
+
+    Notes
+    -----
+    The matrix of the product kernels between all of the observations is
+    computed in blocks of rows, the diagonal is set to zero, and each block
+    is multiplied by the weights.  This avoids copying the data without each
+    observation, as with `LeaveOneOut`.
+
+    The unordered kernels use the number of levels in the data without the
+    observation, as in `gpke`.
+    """
+    bw = np.asarray(bw)
+    nobs = data.shape[0]
+    squeeze = weights is None or np.ndim(weights) == 1
+    if weights is None:
+        weights = np.ones(nobs)
+    weights = np.asarray(weights, dtype=float).reshape(nobs, -1)
+
+    kertypes = dict(c=ckertype, o=okertype, u=ukertype)
+    num_levels = []
+    for ii, vtype in enumerate(var_type):
+        if kertypes[vtype] == 'aitchisonaitken':
+            _, inverse, counts = np.unique(data[:, ii], return_inverse=True,
+                                           return_counts=True)
+            num_levels.append(len(counts) - (counts[inverse] == 1))
+        else:
+            num_levels.append(None)
+
+    block_size = max(1, max_block // nobs)
+    bounds = [(start, min(start + block_size, nobs))
+              for start in range(0, nobs, block_size)]
+    if has_joblib and n_jobs != 1 and len(bounds) > 1:
+        res = joblib.Parallel(n_jobs=n_jobs)(
+            joblib.delayed(_gpke_loo_block)(bw, data, var_type, weights,
+                                            kertypes, num_levels, *bound)
+            for bound in bounds)
+    else:
+        res = [_gpke_loo_block(bw, data, var_type, weights, kertypes,
+                               num_levels, *bound)
+               for bound in bounds]
+
+    iscontinuous = np.array([c == 'c' for c in var_type])
+    dens = np.concatenate(res) / np.prod(bw[iscontinuous])
+    if squeeze:
+        return dens[:, 0]
+    return dens
+
+
+def _discrete_groups(data):
+    """
+    Returns the distinct rows of `data` and the group of each row.
+    """
+    if data.shape[1] == 0:
+        return data[:1], np.zeros(data.shape[0], dtype=int)
+    order = np.lexsort(data.T[::-1])
+    data_sorted = data[order]
+    first = np.ones(data.shape[0], dtype=bool)
+    first[1:] = np.any(np.diff(data_sorted, axis=0) != 0, axis=1)
+    groups = np.empty(data.shape[0], dtype=int)
+    groups[order] = np.cumsum(first) - 1
+    return data_sorted[first], groups
+
+
+def gpke_tree(bw, data, data_predict, var_type, tol, weights=None,
+              okertype='wangryzin', ukertype='aitchisonaitken'):
+    r"""
+    Returns the approximate non-normalized Generalized Product Kernel
+    Estimator at many points, with Gaussian kernels for the continuous
+    variables
+
+    Parameters
+    ----------
+    bw: 1-D ndarray
+        The user-specified bandwidth parameters.
+    data: 2-D ndarray
+        The training data.
+    data_predict: 2-D ndarray
+        The evaluation points.
+    var_type: str
+        The variable type (continuous, ordered, unordered).  Must contain at
+        least one continuous variable.
+    tol: float
+        The relative tolerance of the approximation, between 0 and 1.
+    weights: 1-D or 2-D ndarray, optional
+        Weights of the training points, shaped (nobs,) or
+        (nobs, n_channels).  Default is a weight of one for each point.
+    okertype: str, optional
+        The kernel used for the ordered discrete variables.
+    ukertype: str, optional
+        The kernel used for the unordered discrete variables.
+
+    Returns
+    -------
+    dens: 1-D or 2-D ndarray
+        The weighted sums of the kernels at each evaluation point, shaped
+        (n_predict,) or (n_predict, n_channels).  Without weights, these are
+        the same as the results of `gpke` for each point.
+
+    Notes
+    -----
+    The product of the Gaussian kernels of the continuous variables is summed
+    with the dual-tree algorithm of `gaussian_kernel_sums`, with one tree for
+    each combination of the values of the discrete variables in the training
+    data.  The kernels of the discrete variables are then evaluated exactly
+    between these combinations and the evaluation points.  The error of the
+    sums is at most `tol` times the sum of the continuous kernels alone times
+    the largest absolute weight.
+    """
+    if not 0 < tol < 1:
+        raise ValueError('The tolerance must be between 0 and 1.')
+    iscontinuous = np.array([c == 'c' for c in var_type])
+    if not np.any(iscontinuous):
+        raise ValueError('Tree-based evaluation requires at least one'
+                         ' continuous variable.')
+    nobs = data.shape[0]
+    n_predict = data_predict.shape[0]
+    squeeze = weights is None or np.ndim(weights) == 1
+    if weights is None:
+        weights = np.ones(nobs)
+    weights = np.asarray(weights, dtype=float).reshape(nobs, -1)
+    n_channels = weights.shape[1]
+
+    # Each combination of the discrete values in the training data has its
+    # own tree, whose sums of the continuous kernels are multiplied by the
+    # exact kernels of the discrete variables at the evaluation points
+    values, groups = _discrete_groups(data[:, ~iscontinuous])
+    bw_cont = bw[iscontinuous]
+    data_cont = data[:, iscontinuous] / bw_cont
+    predict_cont = data_predict[:, iscontinuous] / bw_cont
+    kertypes = dict(o=okertype, u=ukertype)
+    discrete = np.nonzero(~iscontinuous)[0]
+    num_levels = [np.unique(data[:, ii]).size for ii in discrete]
+    order = np.argsort(groups, kind='mergesort')
+    bounds = np.r_[0, np.cumsum(np.bincount(groups))]
+    dens = np.zeros((n_predict, n_channels))
+    for group in range(values.shape[0]):
+        index = order[bounds[group]:bounds[group + 1]]
+        Kval = np.ones(n_predict)
+        for jj, ii in enumerate(discrete):
+            kwargs = {}
+            if kertypes[var_type[ii]] == 'aitchisonaitken':
+                # The number of levels is a property of the full training
+                # data
+                kwargs['num_levels'] = num_levels[jj]
+            func = kernel_func[kertypes[var_type[ii]]]
+            Kval *= func(bw[ii], np.repeat(values[group, jj], n_predict),
+                         data_predict[:, ii], **kwargs)
+        dens += Kval[:, None] * gaussian_kernel_sums(
+            data_cont[index], weights[index], predict_cont, tol=tol)
+    dens *= (2 * np.pi)**(-0.5 * iscontinuous.sum()) / np.prod(bw_cont)
+
+    if squeeze:
+        return dens[:, 0]
+    return dens
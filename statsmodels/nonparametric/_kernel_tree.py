@@ -0,0 +1,254 @@
+r"""
+Dual-tree approximation of sums of Gaussian kernels
+
+The sums
+
+.. math:: S_{c}(x_{q}) = \sum_{r} w_{rc} \exp(-\|x_{q} - x_{r}\|^{2} / 2)
+
+over the reference points :math:`x_{r}` are approximated for all query
+points :math:`x_{q}` at once with the dual-tree algorithm of Gray and Moore
+(2003).  KD-trees are built on the reference and on the query points, and
+pairs of nodes are visited from the roots down.  If the kernel varies little
+between all of the points of a pair of nodes, the contribution of the
+reference node to every point of the query node is approximated by the
+midpoint of the bounds on the kernel; otherwise both nodes are split, and
+pairs of leaves that cannot be approximated are summed exactly.
+
+The traversal is breadth-first, so that the work for all of the pairs of
+nodes on a level of the trees is vectorized.
+
+References
+----------
+Gray, A. G., and A. W. Moore. "Nonparametric density estimation: Toward
+    computational tractability." Proceedings of the 2003 SIAM International
+    Conference on Data Mining, pp. 203-211. (2003)
+"""
+from __future__ import division
+from statsmodels.compat.python import range
+
+import numpy as np
+
+
+class _KernelTree(object):
+    """
+    Balanced KD-tree with node statistics, stored level by level
+
+    Every node is split at the median of its widest dimension until the
+    leaves contain at most `leafsize` points, so that all of the leaves are
+    on the same level.  The children of node `i` are `2 * i + 1` and
+    `2 * i + 2`, and the points of each node are contiguous in `points`.
+
+    Parameters
+    ----------
+    points : 2-D ndarray
+        The points, shaped (nobs, k_vars).
+    weights : 2-D ndarray, optional
+        The weights of the points, shaped (nobs, n_channels), of which the
+        sums are computed for each node.
+    leafsize : int, optional
+        The maximum number of points in a leaf.
+    """
+    def __init__(self, points, weights=None, leafsize=32):
+        points = np.asarray(points, dtype=float)
+        nobs, k_vars = points.shape
+        depth = 0
+        while nobs > leafsize * 2**depth:
+            depth += 1
+        n_nodes = 2**(depth + 1) - 1
+        n_internal = 2**depth - 1
+
+        # Partition the points
+        perm = np.arange(nobs)
+        start = np.zeros(n_nodes, dtype=int)
+        end = np.zeros(n_nodes, dtype=int)
+        end[0] = nobs
+        for i in range(n_internal):
+            s, e = start[i], end[i]
+            m = (s + e) // 2
+            segment = perm[s:e]
+            x = points[segment]
+            dim = np.argmax(x.max(axis=0) - x.min(axis=0))
+            perm[s:e] = segment[np.argpartition(x[:, dim], m - s)]
+            start[2 * i + 1], end[2 * i + 1] = s, m
+            start[2 * i + 2], end[2 * i + 2] = m, e
+
+        self.depth = depth
+        self.perm = perm
+        self.points = points[perm]
+        self.counts = end - start
+        self.leaves = np.arange(n_internal, n_nodes)
+
+        # Bounding boxes and sums of the weights, from the leaves up
+        leaf_start = start[self.leaves]
+        self.lo = np.empty((n_nodes, k_vars))
+        self.hi = np.empty((n_nodes, k_vars))
+        self.lo[self.leaves] = np.minimum.reduceat(self.points, leaf_start)
+        self.hi[self.leaves] = np.maximum.reduceat(self.points, leaf_start)
+        self.weights = None
+        self.sums = None
+        if weights is not None:
+            self.weights = np.asarray(weights, dtype=float)[perm]
+            self.sums = np.empty((n_nodes, self.weights.shape[1]))
+            self.sums[self.leaves] = np.add.reduceat(self.weights, leaf_start)
+        for level in range(depth - 1, -1, -1):
+            ix = np.arange(2**level - 1, 2**(level + 1) - 1)
+            left, right = 2 * ix + 1, 2 * ix + 2
+            self.lo[ix] = np.minimum(self.lo[left], self.lo[right])
+            self.hi[ix] = np.maximum(self.hi[left], self.hi[right])
+            if weights is not None:
+                self.sums[ix] = self.sums[left] + self.sums[right]
+
+        # The points of each leaf, padded with -1
+        leaf_counts = self.counts[self.leaves]
+        self.leaf_index = -np.ones((len(self.leaves), leaf_counts.max()),
+                                   dtype=int)
+        mask = np.arange(leaf_counts.max()) < leaf_counts[:, None]
+        self.leaf_index[mask] = np.arange(nobs)
+
+
+def _bincount(x, weights, minlength):
+    # Column-wise np.bincount for 2-D weights
+    return np.column_stack([np.bincount(x, weights=weights[:, c],
+                                        minlength=minlength)
+                            for c in range(weights.shape[1])])
+
+
+def _exact_sums(tree_q, tree_r, pair_q, pair_r, out, max_block):
+    # Exact sums for pairs of leaves, in blocks of about `max_block` pairs of
+    # points
+    leaf_q = pair_q - tree_q.leaves[0]
+    leaf_r = pair_r - tree_r.leaves[0]
+    size_q = tree_q.leaf_index.shape[1]
+    size_r = tree_r.leaf_index.shape[1]
+    n_block = max(1, max_block // (size_q * size_r))
+    for b in range(0, len(pair_q), n_block):
+        ix_q = tree_q.leaf_index[leaf_q[b:b + n_block]]
+        ix_r = tree_r.leaf_index[leaf_r[b:b + n_block]]
+        # Squared distances from the inner products, relative to a corner of
+        # the query leaf to avoid cancellation
+        corner = tree_q.lo[pair_q[b:b + n_block]][:, None, :]
+        x_q = tree_q.points[ix_q] - corner
+        x_r = tree_r.points[ix_r] - corner
+        dist = ((x_q**2).sum(axis=-1)[:, :, None] +
+                (x_r**2).sum(axis=-1)[:, None, :] -
+                2 * np.matmul(x_q, x_r.transpose(0, 2, 1)))
+        kernel = np.exp(-0.5 * np.maximum(dist, 0))
+        kernel *= (ix_r >= 0)[:, None, :]
+        sums = np.matmul(kernel, tree_r.weights[ix_r])
+        valid = ix_q >= 0
+        out += _bincount(ix_q[valid], sums[valid], out.shape[0])
+
+
+def gaussian_kernel_sums(points, weights, points_predict, tol=1e-6,
+                         leafsize=32, max_block=2**20):
+    r"""
+    Approximate sums of (non-normalized) Gaussian kernels
+
+    Parameters
+    ----------
+    points : 2-D ndarray
+        The reference points, shaped (nobs, k_vars), already scaled by the
+        bandwidths.
+    weights : 2-D ndarray
+        The weights of the reference points, shaped (nobs, n_channels).
+    points_predict : 2-D ndarray
+        The query points, shaped (n_predict, k_vars), already scaled by the
+        bandwidths.
+    tol : float, optional
+        The relative tolerance.  Default is 1e-6.
+    leafsize : int, optional
+        The maximum number of points in the leaves of the trees.
+    max_block : int, optional
+        The maximum number of pairs of points for which the kernel is
+        evaluated at once.
+
+    Returns
+    -------
+    sums : 2-D ndarray
+        The sums :math:`\sum_{r} w_{rc} \exp(-\|x_{q} - x_{r}\|^{2} / 2)`,
+        shaped (n_predict, n_channels).
+
+    Notes
+    -----
+    The contribution of a reference node `R` to a query node `Q` is
+    approximated if :math:`(K_{max} - K_{min}) / 2 \leq tol \cdot L_{Q} / n`,
+    where :math:`K_{max}` and :math:`K_{min}` are the bounds on the kernel
+    between the points of the nodes, `n` is the number of reference points
+    and :math:`L_{Q}` is a lower bound on the unweighted sum of the kernels
+    for all of the points in `Q`.  The error of each sum is then at most
+    `tol` times the unweighted sum of the kernels times the largest absolute
+    weight; in particular the relative error of the unweighted sums is at
+    most `tol`.
+    """
+    points = np.asarray(points, dtype=float)
+    points_predict = np.asarray(points_predict, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    n_ref = points.shape[0]
+    n_channels = weights.shape[1]
+
+    tree_r = _KernelTree(points, weights, leafsize=leafsize)
+    tree_q = _KernelTree(points_predict, leafsize=leafsize)
+    n_nodes_q = 2**(tree_q.depth + 1) - 1
+
+    approx = np.zeros((n_nodes_q, n_channels))
+    exact = np.zeros((points_predict.shape[0], n_channels))
+
+    level_q = level_r = 0
+    pair_q = np.zeros(1, dtype=int)
+    pair_r = np.zeros(1, dtype=int)
+    # Lower bounds on the kernel sums of the query nodes on the current
+    # level from the pairs that have already been approximated
+    lower_done = np.zeros(1)
+    while len(pair_q) > 0:
+        # Bounds on the kernel between the points of each pair of nodes
+        lo_q, hi_q = tree_q.lo[pair_q], tree_q.hi[pair_q]
+        lo_r, hi_r = tree_r.lo[pair_r], tree_r.hi[pair_r]
+        dist_min = np.maximum(np.maximum(lo_r - hi_q, lo_q - hi_r), 0)
+        dist_max = np.maximum(hi_r - lo_q, hi_q - lo_r)
+        kernel_max = np.exp(-0.5 * (dist_min**2).sum(axis=1))
+        kernel_min = np.exp(-0.5 * (dist_max**2).sum(axis=1))
+
+        # Lower bounds on the kernel sums of the query nodes
+        local_q = pair_q - (2**level_q - 1)
+        lower_min = tree_r.counts[pair_r] * kernel_min
+        lower = lower_done + np.bincount(local_q, weights=lower_min,
+                                         minlength=len(lower_done))
+
+        # Approximate the pairs for which the kernel varies little
+        prune = kernel_max - kernel_min <= 2 * tol * lower[local_q] / n_ref
+        if np.any(prune):
+            kernel_mid = 0.5 * (kernel_max[prune] + kernel_min[prune])
+            contrib = kernel_mid[:, None] * tree_r.sums[pair_r[prune]]
+            approx += _bincount(pair_q[prune], contrib, n_nodes_q)
+            lower_done += np.bincount(local_q[prune],
+                                      weights=lower_min[prune],
+                                      minlength=len(lower_done))
+            pair_q, pair_r = pair_q[~prune], pair_r[~prune]
+
+        # Sum pairs of leaves exactly, or split the nodes
+        split_q = level_q < tree_q.depth
+        split_r = level_r < tree_r.depth
+        if not (split_q or split_r):
+            _exact_sums(tree_q, tree_r, pair_q, pair_r, exact, max_block)
+            break
+        if split_q:
+            pair_q = np.c_[2 * pair_q + 1, 2 * pair_q + 2].ravel()
+            pair_r = np.repeat(pair_r, 2)
+            lower_done = np.repeat(lower_done, 2)
+            level_q += 1
+        if split_r:
+            pair_r = np.c_[2 * pair_r + 1, 2 * pair_r + 2].ravel()
+            pair_q = np.repeat(pair_q, 2)
+            level_r += 1
+
+    # Push the approximations down to the leaves of the query tree
+    for level in range(tree_q.depth):
+        ix = np.arange(2**level - 1, 2**(level + 1) - 1)
+        approx[2 * ix + 1] += approx[ix]
+        approx[2 * ix + 2] += approx[ix]
+    exact += np.repeat(approx[tree_q.leaves], tree_q.counts[tree_q.leaves],
+                       axis=0)
+
+    sums = np.empty_like(exact)
+    sums[tree_q.perm] = exact
+    return sums
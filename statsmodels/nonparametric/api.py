@@ -1,4 +1,5 @@
 from .kde import KDEUnivariate
+from .kde_binned import KDEBinned, KDESketch
 from .smoothers_lowess import lowess
 from . import bandwidths
 
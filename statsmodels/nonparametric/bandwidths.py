@@ -1,7 +1,6 @@
 from __future__ import division
 
 import numpy as np
-from scipy.stats import scoreatpercentile as sap
 from statsmodels.sandbox.nonparametric import kernels
 
 #from scipy.stats import norm
@@ -16,9 +15,9 @@ def _select_sigma(X):
     """
 #    normalize = norm.ppf(.75) - norm.ppf(.25)
     normalize = 1.349
-#    IQR = np.subtract.reduce(percentile(X, [75,25],
-#                             axis=axis), axis=axis)/normalize
-    IQR = (sap(X, 75) - sap(X, 25))/normalize
+    # np.percentile partitions instead of sorting, which matters for large
+    # samples
+    IQR = np.subtract.reduce(np.percentile(X, [75, 25], axis=0))/normalize
     return np.minimum(np.std(X, axis=0, ddof=1), IQR)
 
 
@@ -118,6 +118,8 @@ class KDEUnivariate(object):
             computationally efficient. However, only the Gaussian kernel
             is implemented. If FFT is False, then a 'nobs' x 'gridsize'
             intermediate array is created.
+        weights : array or None
+            Optional weights of the observations.
         gridsize : int
             If gridsize is None, max(len(X), 50) is used.
         cut : float
@@ -138,9 +140,6 @@ class KDEUnivariate(object):
             if kernel != "gau":
                 msg = "Only gaussian kernel is available for fft"
                 raise NotImplementedError(msg)
-            if weights is not None:
-                msg = "Weights are not implemented for fft"
-                raise NotImplementedError(msg)
             density, grid, bw = kdensityfft(endog, kernel=kernel, bw=bw,
                     adjust=adjust, weights=weights, gridsize=gridsize,
                     clip=clip, cut=cut)
@@ -154,9 +153,10 @@ class KDEUnivariate(object):
         self.kernel = kernel_switch[kernel](h=bw) # we instantiate twice,
                                                 # should this passed to funcs?
         # put here to ensure empty cache after re-fit with new options
-        self.kernel.weights = weights
         if weights is not None:
-            self.kernel.weights /= weights.sum()
+            weights = np.asarray(weights, dtype=float)
+            weights = weights / weights.sum()
+        self.kernel.weights = weights
         self._cache = resettable_cache()
 
     @cache_readonly
@@ -252,17 +252,93 @@ class KDEUnivariate(object):
         return stats.mstats.mquantiles(self.endog, np.linspace(0,1,
                     gridsize))
 
-    def evaluate(self, point):
+    def evaluate(self, point, method='exact'):
         """
-        Evaluate density at a single point.
+        Evaluate density at points.
 
         Parameters
         ----------
-        point : float
-            Point at which to evaluate the density.
+        point : float or array-like
+            Points at which to evaluate the density.
+        method : str, optional
+            'exact' (default) sums the kernels over the sorted observations
+            within the domain of the kernel of each point. 'grid' interpolates
+            the fitted `density` linearly between the points of `support`,
+            and only evaluates the points outside of the support exactly.
+
+        Returns
+        -------
+        density : float or ndarray
+            The density at the points, with the shape of `point`.
         """
         _checkisfit(self)
-        return self.kernel.density(self.endog, point)
+        point = np.asarray(point, dtype=float)
+        points = point.ravel()
+        kern = self.kernel
+        if method == 'grid':
+            # the support is a regular grid, so that the intervals are found
+            # without a search
+            support = self.support
+            outside = (points < support[0]) | (points > support[-1])
+            inside = ~outside
+            u = ((points[inside] - support[0]) /
+                 (support[-1] - support[0]) * (len(support) - 1))
+            ix = np.minimum(u.astype(int), len(support) - 2)
+            rem = u - ix
+            density = np.empty(len(points))
+            density[inside] = ((1 - rem) * self.density[ix] +
+                               rem * self.density[ix + 1])
+            density[outside] = _kernel_sums_sorted(self.endog, kern.weights,
+                                                   kern, points[outside])
+        elif method == 'exact':
+            density = _kernel_sums_sorted(self.endog, kern.weights, kern,
+                                          points)
+        else:
+            raise ValueError("method must be 'exact' or 'grid'")
+        if point.ndim == 0:
+            return density[0]
+        return density.reshape(point.shape)
+
+def _kernel_sums_sorted(X, weights, kern, points, max_block=2**20):
+    # Kernel density at the points, summing only over the observations in
+    # the domain of the kernel, in blocks of about `max_block` pairs
+    X = np.asarray(X, dtype=float).ravel()
+    order = np.argsort(X)
+    X = X[order]
+    if weights is None:
+        weights = np.ones(len(X))
+    else:
+        weights = np.asarray(weights, dtype=float)[order]
+    h = kern.h
+
+    if kern.domain is None:
+        lower = np.zeros(len(points), dtype=int)
+        upper = np.ones(len(points), dtype=int) * len(X)
+    else:
+        lower = np.searchsorted(X, points + h * kern.domain[0], 'left')
+        upper = np.searchsorted(X, points + h * kern.domain[1], 'right')
+    counts = upper - lower
+    ends = np.cumsum(counts)
+    starts = ends - counts
+
+    density = np.zeros(len(points))
+    start = 0
+    while start < len(points):
+        end = max(np.searchsorted(ends, starts[start] + max_block, 'right'),
+                  start + 1)
+        n_pairs = ends[end - 1] - starts[start]
+        ix_point = np.repeat(np.arange(end - start), counts[start:end])
+        ix_obs = (np.arange(n_pairs) -
+                  np.repeat(starts[start:end] - starts[start] -
+                            lower[start:end], counts[start:end]))
+        u = (X[ix_obs] - points[start:end][ix_point]) / h
+        k = kern(u)
+        if kern.domain is not None:
+            k[(u < kern.domain[0]) | (u > kern.domain[1])] = 0
+        density[start:end] = np.bincount(ix_point, weights=k * weights[ix_obs],
+                                         minlength=end - start)
+        start = end
+    return density / (h * weights.sum())
 
 
 #### Kernel Density Estimator Functions ####
@@ -403,7 +479,6 @@ def kdensityfft(X, kernel="gau", bw="normal_reference", weights=None, gridsize=N
         "silverman" - .9 * A * nobs ** (-1/5.), where A is min(std(X),IQR/1.34)
         If a float is given, it is the bandwidth.
     weights : array or None
-        WEIGHTS ARE NOT CURRENTLY IMPLEMENTED.
         Optional  weights. If the X value is clipped, then this weight is
         also dropped.
     gridsize : int
@@ -430,9 +505,9 @@ def kdensityfft(X, kernel="gau", bw="normal_reference", weights=None, gridsize=N
 
     Notes
     -----
-    Only the default kernel is implemented. Weights aren't implemented yet.
-    This follows Silverman (1982) with changes suggested by Jones and Lotwick
-    (1984). However, the discretization step is replaced by linear binning
+    Only the default kernel is implemented. The weights are binned with
+    weighted linear binning. This follows Silverman (1982) with changes
+    suggested by Jones and Lotwick (1984). However, the discretization step is replaced by linear binning
     of Fan and Marron (1994). This should be extended to accept the parts
     that are dependent only on the data to speed things up for
     cross-validation.
@@ -451,8 +526,19 @@ def kdensityfft(X, kernel="gau", bw="normal_reference", weights=None, gridsize=N
         Series C. 31.2, 93-9.
     """
     X = np.asarray(X)
-    X = X[np.logical_and(X>clip[0], X<clip[1])] # won't work for two columns.
-                                                # will affect underlying data?
+    clip_x = np.logical_and(X>clip[0], X<clip[1])
+    X = X[clip_x] # won't work for two columns.
+                  # will affect underlying data?
+
+    if weights is None:
+        q = len(X)
+    else:
+        weights = np.asarray(weights, dtype=float)
+        if len(weights) != len(clip_x):
+            msg = "The length of the weights must be the same as the given X."
+            raise ValueError(msg)
+        weights = weights[clip_x]
+        q = weights.sum()
 
     # Get kernel object corresponding to selection
     kern = kernel_switch[kernel]()
@@ -491,7 +577,7 @@ def kdensityfft(X, kernel="gau", bw="normal_reference", weights=None, gridsize=N
 #    binned /= (nobs)*delta**2 # normalize binned to sum to 1/delta
 
 #NOTE: THE ABOVE IS WRONG, JUST TRY WITH LINEAR BINNING
-    binned = fast_linbin(X,a,b,gridsize)/(delta*nobs)
+    binned = fast_linbin(X, a, b, gridsize, weights=weights)/(delta*q)
 
     # step 2 compute FFT of the weights, using Munro (1976) FFT convention
     y = forrt(binned)
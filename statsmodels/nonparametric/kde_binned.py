@@ -0,0 +1,623 @@
+"""
+Binned Multivariate Kernel Density Estimators
+
+The data are linearly binned on a regular grid and the binned weights are
+convolved with the product kernel evaluated at the grid offsets, using the
+FFT.  The cost is linear in the number of observations and almost linear in
+the number of grid points, so that densities of millions of observations in
+two or three dimensions are computed in seconds.
+
+`KDESketch` keeps only the binned weights of a univariate data stream on a
+fixed grid, which are updated batch by batch, merged and discounted, so that
+the memory does not grow with the number of observations.
+
+References
+----------
+Wand, M. P. (1994) `Fast computation of multivariate kernel estimators`.
+    Journal of Computational and Graphical Statistics. 3.4, 433-445.
+Wand, M. P. and M. C. Jones. (1995) Kernel Smoothing. Chapman and Hall.
+Fan, J. and J.S. Marron. (1994) `Fast implementations of nonparametric
+    curve estimators`. Journal of Computational and Graphical Statistics.
+    3.1, 35-56.
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+from __future__ import absolute_import, division
+from statsmodels.compat.python import range, string_types
+
+import itertools
+
+import numpy as np
+from scipy import signal, stats
+
+from . import bandwidths
+from .kde import kernel_switch
+from .linbin import fast_linbin, fast_linbin_nd
+
+# Default number of grid points of each variable, by the number of variables
+_default_gridsize = {1: 512, 2: 256, 3: 64, 4: 32}
+
+# Support of the kernels, in units of the bandwidth, used for those without
+# a bounded domain
+_unbounded_support = 8.
+
+
+def _check_fit(self):
+    if not hasattr(self, 'density'):
+        raise ValueError("Call fit to fit the density first")
+
+
+def _kernel_lags(kern, bw, delta, gridsize):
+    # Scaled kernel at the offsets between the points of a regular grid,
+    # truncated to the domain of the kernel and to the size of the grid
+    if kern.domain is None:
+        support_kernel = _unbounded_support
+    else:
+        support_kernel = np.max(np.abs(kern.domain))
+    n_lags = min(gridsize - 1, int(np.ceil(support_kernel * bw / delta)))
+    u = np.arange(-n_lags, n_lags + 1) * delta / bw
+    values = kern(u) / bw
+    if kern.domain is not None:
+        values[(u < kern.domain[0]) | (u > kern.domain[1])] = 0
+    return values
+
+
+def _kernel_cdf(kern, u):
+    # Cumulative distribution function of the kernel
+    if kern.domain is None:
+        return stats.norm.cdf(u)
+    t = np.linspace(kern.domain[0], kern.domain[1], 4097)
+    values = kern(t)
+    cdf = np.r_[0, np.cumsum(values[1:] + values[:-1])]
+    return np.interp(u, t, cdf / cdf[-1], left=0, right=1)
+
+
+def kdensity_binned(X, kernel="gau", bw="normal_reference", weights=None,
+                    gridsize=None, adjust=1, cut=3):
+    """
+    Binned multivariate kernel density estimator on a regular grid
+
+    Parameters
+    ----------
+    X : array-like
+        The data, shaped (nobs,) or (nobs, k_vars), with at most four
+        variables.
+    kernel : str
+        The kernel, used for each variable of a product kernel.  Can be any
+        of the kernels of `KDEUnivariate`: "biw", "cos", "cos2", "epa",
+        "gau", "tri", "triw" or "uni".
+    bw : str, float or array-like
+        The bandwidth of each variable, or the name of a rule of thumb of
+        `bandwidths.select_bandwidth` ("scott", "silverman" or
+        "normal_reference").  The rules are applied to each variable, with
+        the rate ``nobs**(-1/(k_vars + 4))`` of the multivariate normal
+        reference rule.
+    weights : array-like, optional
+        The weights of the observations.  Default is equal weights.
+    gridsize : int or sequence of int, optional
+        The number of grid points of each variable.  Default is 512, 256, 64
+        or 32 for one to four variables.
+    adjust : float
+        An adjustment factor for the bandwidth.  Bandwidth becomes
+        ``bw * adjust``.
+    cut : float
+        The grid extends `cut` bandwidths beyond the smallest and largest
+        observations of each variable.
+
+    Returns
+    -------
+    density : ndarray
+        The density at the grid points, shaped `gridsize`.
+    support : list of ndarray
+        The grid points of each variable.
+    bw : ndarray
+        The bandwidth of each variable.
+
+    Notes
+    -----
+    The data are linearly binned with `fast_linbin_nd`, and the binned
+    weights are convolved with the kernel evaluated at the offsets between
+    the grid points with `scipy.signal.fftconvolve`.  The kernel is
+    truncated to its domain, or to 8 bandwidths for the Gaussian kernel, and
+    to the size of the grid.  The error of the binning approximation is of
+    the order of the squared ratio of the grid spacing to the bandwidth.
+    """
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X[:, None]
+    nobs, k_vars = X.shape
+    if k_vars > 4:
+        raise ValueError('At most four variables are supported.')
+    if kernel not in kernel_switch:
+        raise ValueError('Kernel %s not understood' % kernel)
+    kern = kernel_switch[kernel]()
+
+    if weights is None:
+        weights = np.ones(nobs)
+    else:
+        weights = np.asarray(weights, dtype=float)
+        if weights.shape != (nobs,):
+            msg = "The length of the weights must be the same as the given X."
+            raise ValueError(msg)
+
+    try:
+        bw = np.ones(k_vars) * np.asarray(bw, dtype=float)
+    except (TypeError, ValueError):
+        # Univariate rules of thumb with the multivariate rate
+        rate = nobs**(1. / 5 - 1. / (k_vars + 4))
+        bw = np.array([bandwidths.select_bandwidth(X[:, s], bw, kern) * rate
+                       for s in range(k_vars)])
+    bw = bw * adjust
+
+    if gridsize is None:
+        gridsize = _default_gridsize[k_vars]
+    gridsize = np.ones(k_vars, dtype=int) * np.asarray(gridsize, dtype=int)
+    if np.any(gridsize < 2):
+        raise ValueError('The grid must have at least two points for each'
+                         ' variable.')
+
+    # 1. Bin the data
+    a = X.min(axis=0) - cut * bw
+    b = X.max(axis=0) + cut * bw
+    support = [np.linspace(a[s], b[s], gridsize[s]) for s in range(k_vars)]
+    delta = (b - a) / (gridsize - 1)
+    binned = fast_linbin_nd(np.ascontiguousarray(X), weights, a, b, gridsize)
+
+    # 2. Product kernel at the offsets between the grid points
+    kernel_grid = np.ones([1] * k_vars)
+    for s in range(k_vars):
+        values = _kernel_lags(kern, bw[s], delta[s], gridsize[s])
+        shape = [1] * k_vars
+        shape[s] = len(values)
+        kernel_grid = kernel_grid * values.reshape(shape)
+
+    # 3. Convolution
+    density = signal.fftconvolve(binned, kernel_grid, mode='same')
+    # Remove the round-off error of the FFT where the density is zero
+    density = np.maximum(density, 0) / weights.sum()
+
+    return density, support, bw
+
+
+def _interpolate(support, values, points):
+    # Multilinear interpolation on a regular grid, zero outside of the grid
+    n_points, k_vars = points.shape
+    result = np.zeros(n_points)
+    inside = np.ones(n_points, dtype=bool)
+    for s in range(k_vars):
+        inside &= (points[:, s] >= support[s][0])
+        inside &= (points[:, s] <= support[s][-1])
+    points = points[inside]
+
+    index = []
+    rem = []
+    for s in range(k_vars):
+        delta = (support[s][-1] - support[s][0]) / (len(support[s]) - 1)
+        u = (points[:, s] - support[s][0]) / delta
+        ix = np.minimum(u.astype(int), len(support[s]) - 2)
+        index.append(ix)
+        rem.append(u - ix)
+
+    interpolated = np.zeros(len(points))
+    for corner in itertools.product([0, 1], repeat=k_vars):
+        weight = np.ones(len(points))
+        for s in range(k_vars):
+            weight *= rem[s] if corner[s] else 1 - rem[s]
+        interpolated += weight * values[tuple(index[s] + corner[s]
+                                              for s in range(k_vars))]
+    result[inside] = interpolated
+    return result
+
+
+class KDEBinned(object):
+    """
+    Binned Multivariate Kernel Density Estimator
+
+    Kernel density estimator on a regular grid for up to four continuous
+    variables, with product kernels, computed from linearly binned data with
+    the FFT.
+
+    Parameters
+    ----------
+    data : array-like
+        The data, shaped (nobs,) or (nobs, k_vars), with at most four
+        variables.
+
+    Notes
+    -----
+    The cost of `fit` is linear in the number of observations and almost
+    linear in the number of grid points, so that `KDEBinned` is suitable for
+    large samples, where `KDEMultivariate` is too slow.  It does not support
+    discrete variables or bandwidth selection by cross-validation.
+
+    See Also
+    --------
+    KDEUnivariate, KDEMultivariate
+    kdensity_binned
+
+    Examples
+    --------
+    >>> import statsmodels.api as sm
+    >>> np.random.seed(1234)
+    >>> data = np.random.normal(size=(100000, 2))
+    >>> dens = sm.nonparametric.KDEBinned(data)
+    >>> dens.fit(kernel='epa', gridsize=128)
+    >>> dens.evaluate([[0, 0], [1, 0.5]])
+    """
+
+    def __init__(self, data):
+        data = np.asarray(data, dtype=float)
+        if data.ndim == 1:
+            data = data[:, None]
+        if data.ndim != 2 or data.shape[1] > 4:
+            raise ValueError('The data must have at most four variables.')
+        self.data = data
+        self.nobs, self.k_vars = data.shape
+
+    def fit(self, kernel="gau", bw="normal_reference", weights=None,
+            gridsize=None, adjust=1, cut=3):
+        """
+        Compute the density on the grid.
+
+        Parameters
+        ----------
+        kernel : str
+            The kernel, used for each variable of a product kernel.  Choices
+            are:
+
+            - "biw" for biweight
+            - "cos" for cosine
+            - "cos2" for an alternative cosine
+            - "epa" for Epanechnikov
+            - "gau" for Gaussian.
+            - "tri" for triangular
+            - "triw" for triweight
+            - "uni" for uniform
+
+        bw : str, float or array-like
+            The bandwidth of each variable, or the name of a rule of thumb:
+            "scott", "silverman" or "normal_reference" (see
+            `kdensity_binned`).
+        weights : array-like, optional
+            The weights of the observations.  Default is equal weights.
+        gridsize : int or sequence of int, optional
+            The number of grid points of each variable.  Default is 512, 256,
+            64 or 32 for one to four variables.
+        adjust : float
+            An adjustment factor for the bandwidth.  Bandwidth becomes
+            ``bw * adjust``.
+        cut : float
+            The grid extends `cut` bandwidths beyond the smallest and largest
+            observations of each variable.
+
+        Returns
+        -------
+        self : KDEBinned
+            The instance, with the attributes `density`, `support` and `bw`.
+        """
+        if isinstance(bw, string_types):
+            self.bw_method = bw
+        else:
+            self.bw_method = "user-given"
+        self.density, self.support, self.bw = kdensity_binned(
+            self.data, kernel=kernel, bw=bw, weights=weights,
+            gridsize=gridsize, adjust=adjust, cut=cut)
+        self.kernel = kernel
+        return self
+
+    def evaluate(self, points):
+        """
+        Evaluate the density at arbitrary points.
+
+        Parameters
+        ----------
+        points : array-like
+            The points, shaped (n_points, k_vars), or (n_points,) for a
+            single variable.
+
+        Returns
+        -------
+        density : ndarray
+            The density at the points, interpolated multilinearly between
+            the grid points.  The density is zero outside of the grid.
+        """
+        _check_fit(self)
+        points = np.asarray(points, dtype=float)
+        if self.k_vars == 1:
+            points = points.reshape(-1, 1)
+        else:
+            points = np.atleast_2d(points)
+        if points.shape[1] != self.k_vars:
+            raise ValueError('The points must have %d variables.'
+                             % self.k_vars)
+        return _interpolate(self.support, self.density, points)
+
+
+_rule_constants = {"scott": 1.059, "silverman": .9}
+
+
+class KDESketch(object):
+    """
+    Mergeable Binned Kernel Density Sketch of a Data Stream
+
+    The observations are linearly binned on a fixed regular grid as they
+    arrive, and the kernel density estimate is computed from the binned
+    weights when it is needed.  The memory is proportional to `gridsize`,
+    whatever the number of observations.
+
+    Parameters
+    ----------
+    lower, upper : float
+        The first and last grid points.  The weight of the observations
+        outside of the grid is kept in `weight_below` and `weight_above`.
+    gridsize : int, optional
+        The number of grid points.  Default is 512.
+    kernel : str, optional
+        The kernel, any of the kernels of `KDEUnivariate`.  Default is "gau".
+    bw : str or float, optional
+        The bandwidth, or the name of a rule of thumb: "scott", "silverman"
+        or "normal_reference".  The rules use the weighted standard deviation
+        and interquartile range of the sketch, and the effective number of
+        observations, and are at least the grid spacing.
+    decay : float, optional
+        The factor by which the weights of the previous observations are
+        discounted with every new observation, in (0, 1].  Default is 1, no
+        discounting.  The effective window is then about
+        ``1 / (1 - decay)`` observations.
+
+    Attributes
+    ----------
+    support : ndarray
+        The grid points.
+    counts : ndarray
+        The (discounted) binned weights.
+    weight_below, weight_above : float
+        The (discounted) weight of the observations below and above the grid.
+    nobs : int
+        The number of observations in all of the updates.
+
+    Notes
+    -----
+    Updating the sketch with a batch and merging sketches with the same grid
+    are exact: the sketch of a sequence of observations does not depend on
+    how it was split into batches or into sketches that are merged.  With
+    `decay`, the result of an update does not depend on the batches either,
+    since each observation is discounted by ``decay**age``.  Use `discount`
+    for time-based discounting, and merge the sketches of the last few
+    periods for a sliding window.
+
+    See Also
+    --------
+    KDEUnivariate, KDEBinned
+
+    Examples
+    --------
+    >>> sketch = KDESketch(0, 1000, gridsize=1024, decay=0.9999)
+    >>> for batch in stream:
+    ...     sketch.update(batch)
+    ...     median, p99 = sketch.quantile([0.5, 0.99])
+    """
+
+    def __init__(self, lower, upper, gridsize=512, kernel="gau",
+                 bw="normal_reference", decay=1.):
+        if not lower < upper:
+            raise ValueError('lower must be smaller than upper.')
+        if gridsize < 2:
+            raise ValueError('The grid must have at least two points.')
+        if not 0 < decay <= 1:
+            raise ValueError('decay must be in (0, 1].')
+        if kernel not in kernel_switch:
+            raise ValueError('Kernel %s not understood' % kernel)
+        self.lower = float(lower)
+        self.upper = float(upper)
+        self.gridsize = int(gridsize)
+        self.kernel = kernel
+        self.bw_method = bw
+        self.decay = decay
+        self.support = np.linspace(self.lower, self.upper, self.gridsize)
+        self.counts = np.zeros(self.gridsize)
+        self.weight_below = 0.
+        self.weight_above = 0.
+        self.nobs = 0
+        # Sums of w, w * x, w * x**2 and w**2, with x relative to the center
+        # of the grid
+        self._moments = np.zeros(4)
+
+    def update(self, batch, weights=None):
+        """
+        Add a batch of observations.
+
+        Parameters
+        ----------
+        batch : array-like
+            The observations, in the order in which they arrived.  nan are
+            ignored.
+        weights : array-like, optional
+            The weights of the observations.  Default is one for each
+            observation.
+
+        Returns
+        -------
+        self : KDESketch
+        """
+        batch = np.asarray(batch, dtype=float).ravel()
+        n_batch = len(batch)
+        if weights is None:
+            weights = np.ones(n_batch)
+        else:
+            weights = np.asarray(weights, dtype=float).ravel()
+            if len(weights) != n_batch:
+                raise ValueError('The length of the weights must be the same'
+                                 ' as the given batch.')
+        if self.decay < 1:
+            self.discount(self.decay**n_batch)
+            weights = weights * self.decay**np.arange(n_batch - 1, -1, -1)
+        valid = ~np.isnan(batch)
+        batch, weights = batch[valid], weights[valid]
+
+        self.counts += fast_linbin(np.ascontiguousarray(batch), self.lower,
+                                   self.upper, self.gridsize,
+                                   weights=weights)
+        self.weight_below += weights[batch < self.lower].sum()
+        self.weight_above += weights[batch > self.upper].sum()
+        x = batch - 0.5 * (self.lower + self.upper)
+        self._moments += [weights.sum(), np.dot(weights, x),
+                          np.dot(weights, x**2), np.dot(weights, weights)]
+        self.nobs += n_batch
+        return self
+
+    def merge(self, other):
+        """
+        Add the observations of another sketch with the same grid.
+
+        Parameters
+        ----------
+        other : KDESketch
+            The other sketch, which is not modified.
+
+        Returns
+        -------
+        self : KDESketch
+        """
+        if (self.lower != other.lower or self.upper != other.upper or
+                self.gridsize != other.gridsize):
+            raise ValueError('Only sketches with the same grid can be'
+                             ' merged.')
+        self.counts += other.counts
+        self.weight_below += other.weight_below
+        self.weight_above += other.weight_above
+        self._moments += other._moments
+        self.nobs += other.nobs
+        return self
+
+    def discount(self, factor):
+        """
+        Multiply the weights of all of the previous observations by a factor.
+
+        Parameters
+        ----------
+        factor : float
+            The discount factor, for instance ``0.5**(elapsed / half_life)``
+            for time-based exponential decay.
+
+        Returns
+        -------
+        self : KDESketch
+        """
+        self.counts *= factor
+        self.weight_below *= factor
+        self.weight_above *= factor
+        self._moments[:3] *= factor
+        self._moments[3] *= factor**2
+        return self
+
+    @property
+    def weight(self):
+        """The total (discounted) weight of the observations."""
+        return self._moments[0]
+
+    @property
+    def bw(self):
+        """
+        The bandwidth, given or computed with the rule of thumb.
+        """
+        if self.weight <= 0:
+            raise ValueError('The sketch is empty.')
+        if not isinstance(self.bw_method, string_types):
+            return float(self.bw_method)
+        method = self.bw_method.lower()
+        if method == "normal_reference":
+            constant = kernel_switch[self.kernel]().normal_reference_constant
+        elif method in _rule_constants:
+            constant = _rule_constants[method]
+        else:
+            raise ValueError("Bandwidth %s not understood" % self.bw_method)
+
+        total, first, second, squares = self._moments
+        std = np.sqrt(max(second / total - (first / total)**2, 0))
+        # The interquartile range of the binned weights
+        cdf = np.cumsum(self.counts) + self.weight_below
+        iqr = np.diff(np.interp([0.25 * total, 0.75 * total], cdf,
+                                self.support))[0]
+        sigma = min(std, iqr / 1.349) if iqr > 0 else std
+        nobs_effective = total**2 / squares
+        delta = self.support[1] - self.support[0]
+        return max(constant * sigma * nobs_effective**(-0.2), delta)
+
+    @property
+    def density(self):
+        """
+        The density at the grid points.
+        """
+        bw = self.bw
+        delta = self.support[1] - self.support[0]
+        kern = kernel_switch[self.kernel]()
+        values = _kernel_lags(kern, bw, delta, self.gridsize)
+        density = signal.fftconvolve(self.counts, values, mode='same')
+        # Remove the round-off error of the FFT where the density is zero
+        return np.maximum(density, 0) / self.weight
+
+    @property
+    def cdf(self):
+        """
+        The cumulative distribution function at the grid points.
+
+        The observations below the grid are included.
+        """
+        bw = self.bw
+        kern = kernel_switch[self.kernel]()
+        lags = np.arange(-(self.gridsize - 1), self.gridsize)
+        delta = self.support[1] - self.support[0]
+        values = _kernel_cdf(kern, lags * delta / bw)
+        cdf = signal.fftconvolve(self.counts, values, mode='same')
+        cdf = (cdf + self.weight_below) / self.weight
+        # Round-off error of the FFT
+        return np.clip(np.maximum.accumulate(cdf), 0, 1)
+
+    def evaluate(self, points):
+        """
+        Evaluate the density at points.
+
+        Parameters
+        ----------
+        points : array-like
+            The points.
+
+        Returns
+        -------
+        density : ndarray
+            The density, interpolated linearly between the grid points, and
+            zero outside of the grid.
+        """
+        points = np.asarray(points, dtype=float)
+        density = _interpolate([self.support], self.density,
+                               points.reshape(-1, 1))
+        return density.reshape(points.shape)
+
+    def quantile(self, q):
+        """
+        Quantiles of the density.
+
+        Parameters
+        ----------
+        q : float or array-like
+            The probabilities.
+
+        Returns
+        -------
+        quantiles : float or ndarray
+            The quantiles, interpolated linearly between the grid points.
+            nan for the probabilities outside of the range of the `cdf` on
+            the grid.
+        """
+        q = np.asarray(q, dtype=float)
+        cdf = self.cdf
+        # Grid points where the cdf increases
+        keep = np.r_[True, np.diff(cdf) > 0]
+        quantiles = np.interp(q, cdf[keep], self.support[keep])
+        quantiles = np.where((q < cdf[0]) | (q > cdf[-1]), np.nan,
+                             quantiles)
+        if q.ndim == 0:
+            return quantiles[()]
+        return quantiles
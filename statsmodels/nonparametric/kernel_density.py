@@ -35,7 +35,7 @@ import numpy as np
 
 from . import kernels
 from ._kernel_base import GenericKDE, EstimatorSettings, gpke, \
-    LeaveOneOut, _adjust_shape
+    gpke_loo, LeaveOneOut, _adjust_shape, gpke_tree
 
 
 __all__ = ['KDEMultivariate', 'KDEMultivariateConditional', 'EstimatorSettings']
@@ -139,6 +139,8 @@ class KDEMultivariate(GenericKDE):
         func: callable, optional
             Function to transform the likelihood values (before summing); for
             the log likelihood, use ``func=np.log``.  Default is ``f(x) = x``.
+            It is applied to the array of the likelihood values of all
+            observations.
 
         Notes
         -----
@@ -153,16 +155,12 @@ class KDEMultivariate(GenericKDE):
         .. math:: K_{h}(X_{i},X_{j}) =
             \prod_{s=1}^{q}h_{s}^{-1}k\left(\frac{X_{is}-X_{js}}{h_{s}}\right)
         """
-        LOO = LeaveOneOut(self.data)
-        L = 0
-        for i, X_not_i in enumerate(LOO):
-            f_i = gpke(bw, data=-X_not_i, data_predict=-self.data[i, :],
-                       var_type=self.var_type)
-            L += func(f_i)
+        f = gpke_loo(bw, self.data, self.var_type, n_jobs=self.n_jobs)
+        L = func(f).sum()
 
         return -L
 
-    def pdf(self, data_predict=None):
+    def pdf(self, data_predict=None, tol=None):
         r"""
         Evaluate the probability density function.
 
@@ -170,6 +168,11 @@ class KDEMultivariate(GenericKDE):
         ----------
         data_predict: array_like, optional
             Points to evaluate at.  If unspecified, the training data is used.
+        tol: float, optional
+            If given, the density is approximated with a dual-tree algorithm,
+            with a relative error of at most `tol` for the kernels of the
+            continuous variables.  Requires at least one continuous variable.
+            Default is to evaluate the density exactly.
 
         Returns
         -------
@@ -183,12 +186,32 @@ class KDEMultivariate(GenericKDE):
 
         .. math:: K_{h}(X_{i},X_{j}) =
             \prod_{s=1}^{q}h_{s}^{-1}k\left(\frac{X_{is}-X_{js}}{h_{s}}\right)
+
+        The approximation with `tol` builds KD-trees on the training data and
+        on the evaluation points, and approximates the contributions of groups
+        of training points that are far enough from groups of evaluation
+        points (see Gray and Moore, 2003).  This is faster than the exact
+        evaluation for large samples.  The kernels of the discrete variables
+        are evaluated exactly.  The error of the density is at most `tol`
+        times the density of the continuous variables alone, which is the
+        density itself if all of the variables are continuous.
+
+        References
+        ----------
+        Gray, A. G., and A. W. Moore. "Nonparametric density estimation:
+            Toward computational tractability." Proceedings of the 2003 SIAM
+            International Conference on Data Mining, pp. 203-211. (2003)
         """
         if data_predict is None:
             data_predict = self.data
         else:
             data_predict = _adjust_shape(data_predict, self.k_vars)
 
+        if tol is not None:
+            pdf_est = gpke_tree(self.bw, self.data, data_predict,
+                                self.var_type, tol)
+            return np.squeeze(pdf_est) / self.nobs
+
         pdf_est = []
         for i in range(np.shape(data_predict)[0]):
             pdf_est.append(gpke(self.bw, data=self.data,
@@ -452,6 +475,8 @@ class KDEMultivariateConditional(GenericKDE):
         func: callable, optional
             Function to transform the likelihood values (before summing); for
             the log likelihood, use ``func=np.log``.  Default is ``f(x) = x``.
+            It is applied to the array of the likelihood values of all
+            observations.
 
         Returns
         -------
@@ -463,18 +488,11 @@ class KDEMultivariateConditional(GenericKDE):
         Similar to ``KDE.loo_likelihood`, but substitute ``f(y|x)=f(x,y)/f(x)``
         for ``f(x)``.
         """
-        yLOO = LeaveOneOut(self.data)
-        xLOO = LeaveOneOut(self.exog).__iter__()
-        L = 0
-        for i, Y_j in enumerate(yLOO):
-            X_not_i = next(xLOO)
-            f_yx = gpke(bw, data=-Y_j, data_predict=-self.data[i, :],
-                        var_type=(self.dep_type + self.indep_type))
-            f_x = gpke(bw[self.k_dep:], data=-X_not_i,
-                       data_predict=-self.exog[i, :],
-                       var_type=self.indep_type)
-            f_i = f_yx / f_x
-            L += func(f_i)
+        f_yx = gpke_loo(bw, self.data, self.dep_type + self.indep_type,
+                        n_jobs=self.n_jobs)
+        f_x = gpke_loo(bw[self.k_dep:], self.exog, self.indep_type,
+                       n_jobs=self.n_jobs)
+        L = func(f_yx / f_x).sum()
 
         return -L
 
@@ -32,14 +32,17 @@ from __future__ import division
 # TODO: make default behavior efficient=True above a certain n_obs
 
 from statsmodels.compat.python import range, string_types, next
+from statsmodels.compat.scipy import NumpyVersion
 import copy
+import itertools
 
 import numpy as np
 from scipy import optimize
 from scipy.stats.mstats import mquantiles
 
 from ._kernel_base import GenericKDE, EstimatorSettings, gpke, \
-    LeaveOneOut, _get_type_pos, _adjust_shape, _compute_min_std_IQR
+    gpke_loo, LeaveOneOut, _get_type_pos, _adjust_shape, \
+    _compute_min_std_IQR, gpke_tree
 
 
 
@@ -306,17 +309,37 @@ class KernelReg(GenericKDE):
         where :math:`g_{-i}(X_{i})` is the leave-one-out estimator of g(X)
         and :math:`h` is the vector of bandwidths
 
-        """
-        LOO_X = LeaveOneOut(self.exog)
-        LOO_Y = LeaveOneOut(self.endog).__iter__()
-        L = 0
-        for ii, X_not_i in enumerate(LOO_X):
-            Y = next(LOO_Y)
-            G = func(bw, endog=Y, exog=-X_not_i,
-                     data_predict=-self.exog[ii, :])[0]
-            L += (self.endog[ii] - G) ** 2
+        For the local constant and local linear estimators, the
+        leave-one-out sums of the kernels are computed for all observations
+        at once with `gpke_loo`, in parallel if ``n_jobs != 1``.
 
-        # Note: There might be a way to vectorize this. See p.72 in [1]
+        """
+        endog = self.endog[:, 0]
+        if func == self._est_loc_constant:
+            weights = np.column_stack((np.ones(self.nobs), endog))
+            sums = gpke_loo(bw, self.exog, self.var_type, weights=weights,
+                            n_jobs=self.n_jobs)
+            G = sums[:, 1] / sums[:, 0]
+        elif func == self._est_loc_linear:
+            # Center the continuous variables to reduce the cancellation in
+            # the sums
+            iscontinuous = np.array([c == 'c' for c in self.var_type])
+            exog = self.exog - np.where(iscontinuous,
+                                        self.exog.mean(axis=0), 0)
+            sums = gpke_loo(bw, exog, self.var_type,
+                            weights=self._loc_linear_weights(exog),
+                            n_jobs=self.n_jobs)
+            G = self._loc_linear_from_sums(sums, exog)[0]
+        else:
+            LOO_X = LeaveOneOut(self.exog)
+            LOO_Y = LeaveOneOut(self.endog).__iter__()
+            G = np.empty(self.nobs)
+            for ii, X_not_i in enumerate(LOO_X):
+                Y = next(LOO_Y)
+                G[ii] = func(bw, endog=Y, exog=-X_not_i,
+                             data_predict=-self.exog[ii, :])[0]
+
+        L = ((endog - G) ** 2).sum()
         return L / self.nobs
 
     def r_squared(self):
@@ -344,7 +367,7 @@ class KernelReg(GenericKDE):
                    ((Yhat - Y_bar)**2).sum(axis=0)
         return R2_numer / R2_denom
 
-    def fit(self, data_predict=None):
+    def fit(self, data_predict=None, tol=None):
         """
         Returns the mean and marginal effects at the `data_predict` points.
 
@@ -353,6 +376,13 @@ class KernelReg(GenericKDE):
         data_predict : array_like, optional
             Points at which to return the mean and marginal effects.  If not
             given, ``data_predict == exog``.
+        tol : float, optional
+            If given, the sums of the kernels in the estimates are
+            approximated with a dual-tree algorithm,
+            with a relative error of at most `tol` for the kernels of the
+            continuous variables (see `KDEMultivariate.pdf`).  Requires at
+            least one continuous variable.  Default is to compute the
+            estimates exactly.
 
         Returns
         -------
@@ -368,6 +398,9 @@ class KernelReg(GenericKDE):
         else:
             data_predict = _adjust_shape(data_predict, self.k_vars)
 
+        if tol is not None:
+            return self._fit_tree(data_predict, tol)
+
         N_data_predict = np.shape(data_predict)[0]
         mean = np.empty((N_data_predict,))
         mfx = np.empty((N_data_predict, self.k_vars))
@@ -380,6 +413,113 @@ class KernelReg(GenericKDE):
 
         return mean, mfx
 
+    def _fit_tree(self, data_predict, tol):
+        """
+        Approximate mean and marginal effects, from the sums of the kernels
+        of `_est_loc_constant` or `_est_loc_linear` weighted by products of
+        the training data, which are computed with `gpke_tree`.
+        """
+        nobs, k_vars = self.exog.shape
+        endog = self.endog[:, 0]
+        iscontinuous = np.array([c == 'c' for c in self.var_type])
+
+        # Center the continuous variables to reduce the cancellation in the
+        # expansions below
+        center = np.where(iscontinuous, self.exog.mean(axis=0), 0)
+        exog = self.exog - center
+        data_predict = data_predict - center
+
+        if self.reg_type == 'lc':
+            # The product over the continuous variables of the differences in
+            # the derivative of the Gaussian kernel is expanded into a sum
+            # over the subsets of the continuous variables
+            bw_cont = self.bw[iscontinuous]
+            u = exog[:, iscontinuous] / bw_cont
+            u_predict = data_predict[:, iscontinuous] / bw_cont
+            subsets = np.array(list(itertools.product(
+                [False, True], repeat=iscontinuous.sum())))
+            weights = np.column_stack(
+                [u[:, subset].prod(axis=1) for subset in subsets])
+            coefs = np.column_stack(
+                [(-u_predict[:, ~subset]).prod(axis=1)
+                 for subset in subsets])
+            weights = np.column_stack((weights, weights * endog[:, None]))
+            sums = gpke_tree(self.bw, exog, data_predict, self.var_type, tol,
+                             weights=weights)
+            n_subsets = len(subsets)
+
+            G_denom = sums[:, 0]
+            G_numer = sums[:, n_subsets]
+            factor = np.prod(2. / bw_cont)
+            d_fx = -factor * (coefs * sums[:, :n_subsets]).sum(axis=1)
+            d_mx = -factor * (coefs * sums[:, n_subsets:]).sum(axis=1)
+            d_fx /= float(nobs)
+            d_mx /= float(nobs)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = G_numer / G_denom
+                B_x = (G_numer * d_fx - G_denom * d_mx) / (G_denom**2)
+            mfx = np.repeat(B_x[:, None], k_vars, axis=1)
+        else:
+            sums = gpke_tree(self.bw, exog, data_predict, self.var_type, tol,
+                             weights=self._loc_linear_weights(exog))
+            mean, mfx = self._loc_linear_from_sums(sums, data_predict)
+
+        return mean, mfx
+
+    def _loc_linear_weights(self, exog):
+        """
+        Returns the weights of the sums of the kernels from which
+        `_est_loc_linear` is computed at many points at once: 1, y, X, X * y
+        and the products of the columns of X.
+        """
+        nobs, k_vars = exog.shape
+        endog = self.endog[:, 0]
+        ix_upper = np.triu_indices(k_vars)
+        return np.column_stack((
+            np.ones(nobs), endog, exog, exog * endog[:, None],
+            exog[:, ix_upper[0]] * exog[:, ix_upper[1]]))
+
+    def _loc_linear_from_sums(self, sums, data_predict):
+        """
+        Returns the local linear mean and marginal effects at `data_predict`
+        from the sums of the kernels weighted by `_loc_linear_weights`.  The
+        estimates are nan where the sum of the kernels is zero.
+        """
+        n_predict, k_vars = data_predict.shape
+        ix_upper = np.triu_indices(k_vars)
+        S = sums[:, 0]
+        S_y = sums[:, 1]
+        S_x = sums[:, 2:2 + k_vars]
+        S_xy = sums[:, 2 + k_vars:2 + 2 * k_vars]
+        S_xx = np.empty((n_predict, k_vars, k_vars))
+        S_xx[:, ix_upper[0], ix_upper[1]] = sums[:, 2 + 2 * k_vars:]
+        S_xx[:, ix_upper[1], ix_upper[0]] = sums[:, 2 + 2 * k_vars:]
+
+        # The matrices M and V of `_est_loc_linear`
+        x = data_predict
+        M = np.empty((n_predict, k_vars + 1, k_vars + 1))
+        M[:, 0, 0] = S
+        M[:, 0, 1:] = S_x - x * S[:, None]
+        M[:, 1:, 0] = M[:, 0, 1:]
+        M[:, 1:, 1:] = (S_xx - x[:, :, None] * S_x[:, None, :] -
+                        S_x[:, :, None] * x[:, None, :] +
+                        x[:, :, None] * x[:, None, :] * S[:, None, None])
+        V = np.empty((n_predict, k_vars + 1, 1))
+        V[:, 0, 0] = S_y
+        V[:, 1:, 0] = S_xy - x * S_y[:, None]
+
+        if NumpyVersion(np.__version__) >= '1.14.0':
+            mean_mfx = np.matmul(np.linalg.pinv(M), V)
+        else:
+            mean_mfx = np.array([np.dot(np.linalg.pinv(M[i]), V[i])
+                                 for i in range(n_predict)])
+        mean = mean_mfx[:, 0, 0]
+        mfx = mean_mfx[:, 1:, 0]
+        empty = S == 0
+        mean[empty] = np.nan
+        mfx[empty] = np.nan
+        return mean, mfx
+
     def sig_test(self, var_pos, nboot=50, nested_res=25, pivot=False):
         """
         Significance test for the variables in the regression.
@@ -14,25 +14,143 @@ ctypedef np.int_t INT
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.cdivision(True)
-def fast_linbin(np.ndarray[DOUBLE] X, double a, double b, int M, int trunc=1):
+def fast_linbin(np.ndarray[DOUBLE] X, double a, double b, int M, int trunc=1,
+                weights=None):
     """
     Linear Binning as described in Fan and Marron (1994)
+
+    Parameters
+    ----------
+    X : ndarray
+        The data.
+    a, b : float
+        The first and last grid points.
+    M : int
+        The number of grid points, at least 2.
+    trunc : int
+        If 1, observations outside of the grid are dropped, otherwise their
+        weight is assigned to the nearest end of the grid.
+    weights : ndarray, optional
+        The weights of the observations.  Default is one for each
+        observation.
+
+    Returns
+    -------
+    gcnts : ndarray
+        The binned weights at the `M` grid points.
     """
     cdef:
         Py_ssize_t i, li_i
-        int nobs = X.shape[0]
+        Py_ssize_t nobs = X.shape[0]
         double delta = (b - a)/(M - 1)
+        double lxi, rem, w = 1
+        bint weighted = weights is not None
         np.ndarray[DOUBLE] gcnts = np.zeros(M, np.float)
-        np.ndarray[DOUBLE] lxi = (X - a)/delta
-        np.ndarray[INT] li = lxi.astype(int)
-        np.ndarray[DOUBLE] rem = lxi - li
+        np.ndarray[DOUBLE] wts
 
+    if weighted:
+        wts = np.asarray(weights, dtype=np.float64)
+        if wts.shape[0] != nobs:
+            raise ValueError("The length of the weights must be the same as "
+                             "the given X.")
 
     for i in range(nobs):
-        li_i = li[i]
-        if li_i > 1 and li_i < M:
-            gcnts[li_i] = gcnts[li_i] + 1 - rem[i]
-            gcnts[li_i+1] = gcnts[li_i+1] + rem[i]
-        if li_i > M and trunc == 0:
-            gcnts[M] = gcnts[M] + 1
+        if weighted:
+            w = wts[i]
+        lxi = (X[i] - a)/delta
+        if lxi >= 0 and lxi < M - 1:
+            li_i = <Py_ssize_t> lxi
+            rem = lxi - li_i
+            gcnts[li_i] = gcnts[li_i] + (1 - rem) * w
+            gcnts[li_i+1] = gcnts[li_i+1] + rem * w
+        elif lxi == M - 1:
+            gcnts[M-1] = gcnts[M-1] + w
+        elif trunc == 0:
+            # nan is dropped
+            if lxi < 0:
+                gcnts[0] = gcnts[0] + w
+            elif lxi > M - 1:
+                gcnts[M-1] = gcnts[M-1] + w
     return gcnts
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def fast_linbin_nd(np.ndarray[DOUBLE, ndim=2] X, np.ndarray[DOUBLE] weights,
+                   np.ndarray[DOUBLE] a, np.ndarray[DOUBLE] b, M):
+    """
+    Weighted linear binning of multivariate data on a regular grid
+
+    Parameters
+    ----------
+    X : ndarray
+        The data, shaped (nobs, k_vars).
+    weights : ndarray
+        The weights of the observations, shaped (nobs,).
+    a, b : ndarray
+        The first and last grid points of each variable.
+    M : sequence of int
+        The number of grid points of each variable, at least 2.
+
+    Returns
+    -------
+    gcnts : ndarray
+        The binned weights, shaped `M`.  Observations outside of the grid
+        are dropped.
+
+    Notes
+    -----
+    Each observation distributes its weight to the `2**k_vars` corners of its
+    grid cell, in proportion to the volume of the part of the cell opposite
+    to each corner (Wand, 1994).
+
+    References
+    ----------
+    Wand, M. P. (1994) `Fast computation of multivariate kernel estimators`.
+        Journal of Computational and Graphical Statistics. 3.4, 433-445.
+    """
+    cdef:
+        Py_ssize_t i, s, corner, index
+        Py_ssize_t nobs = X.shape[0]
+        Py_ssize_t k_vars = X.shape[1]
+        np.ndarray[np.intp_t] shape = np.asarray(M, dtype=np.intp)
+        np.ndarray[DOUBLE] delta = (b - a) / (shape - 1.)
+        np.ndarray[np.intp_t] strides = np.ones(k_vars, dtype=np.intp)
+        np.ndarray[np.intp_t] li = np.zeros(k_vars, dtype=np.intp)
+        np.ndarray[DOUBLE] rem = np.zeros(k_vars)
+        np.ndarray[DOUBLE] gcnts = np.zeros(np.prod(shape))
+        double lxi, w
+        bint inside
+
+    # Strides of the flattened (C-ordered) grid
+    for s in range(k_vars - 2, -1, -1):
+        strides[s] = strides[s + 1] * shape[s + 1]
+
+    for i in range(nobs):
+        inside = True
+        for s in range(k_vars):
+            lxi = (X[i, s] - a[s]) / delta[s]
+            # Also drops nan
+            if not (lxi >= 0 and lxi <= shape[s] - 1):
+                inside = False
+                break
+            li[s] = <Py_ssize_t> lxi
+            if li[s] == shape[s] - 1:
+                li[s] = li[s] - 1
+            rem[s] = lxi - li[s]
+        if not inside:
+            continue
+
+        for corner in range(1 << k_vars):
+            w = weights[i]
+            index = 0
+            for s in range(k_vars):
+                if (corner >> s) & 1:
+                    w = w * rem[s]
+                    index = index + (li[s] + 1) * strides[s]
+                else:
+                    w = w * (1 - rem[s])
+                    index = index + li[s] * strides[s]
+            gcnts[index] = gcnts[index] + w
+    return gcnts.reshape(shape)
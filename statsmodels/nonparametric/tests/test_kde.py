@@ -5,6 +5,7 @@ from nose.tools import raises
 import numpy as np
 from statsmodels.distributions.mixture_rvs import mixture_rvs
 from statsmodels.nonparametric.kde import KDEUnivariate as KDE
+from statsmodels.nonparametric.kde import kernel_switch, _kernel_sums_sorted
 import statsmodels.sandbox.nonparametric.kernels as kernels
 from scipy import stats
 
@@ -43,9 +44,9 @@ class TestKDEExceptions(object):
     def test_check_is_fit_exception(self):
         self.kde.evaluate(0)
 
-    @raises(NotImplementedError)
-    def test_non_weighted_fft_exception(self):
-        self.kde.fit(kernel="gau", gridsize=50, weights=self.weights_200, fft=True,
+    @raises(ValueError)
+    def test_wrong_weight_length_fft_exception(self):
+        self.kde.fit(kernel="gau", gridsize=50, weights=self.weights_100, fft=True,
                     bw="silverman")
 
     @raises(ValueError)
@@ -309,6 +310,83 @@ class T_estKDEWPar(CheckKDEWeights):
     res_kernel_name = "x_par_wd"
 
 
+class TestKDEWeightsFFT(object):
+
+    @classmethod
+    def setupClass(cls):
+        cls.weights = np.linspace(1, 100, 200)
+        cls.kde = KDE(Xi)
+        cls.kde.fit(kernel="gau", weights=cls.weights, fft=True,
+                    bw="silverman")
+        cls.kde_exact = KDE(Xi)
+        cls.kde_exact.fit(kernel="gau", weights=cls.weights, fft=False,
+                          bw="silverman")
+
+    def test_density(self):
+        # the binning error is of the order of (delta / bw)**2
+        kde_vals = self.kde_exact.evaluate(self.kde.support)
+        npt.assert_allclose(self.kde.density, kde_vals,
+                            atol=1e-3 * kde_vals.max())
+
+    def test_weights_unchanged(self):
+        npt.assert_equal(self.weights, np.linspace(1, 100, 200))
+
+
+class TestKDEEvaluate(object):
+
+    @classmethod
+    def setupClass(cls):
+        np.random.seed(12345)
+        cls.x = np.random.normal(size=300)
+        cls.weights = np.random.uniform(size=300)
+        cls.points = np.linspace(-6, 6, 101)
+
+    def test_evaluate_exact(self):
+        for kernel in sorted(kernel_switch):
+            for weights in [None, self.weights]:
+                kde = KDE(self.x)
+                kde.fit(kernel=kernel, weights=weights, fft=False)
+                kern = kde.kernel
+                w = np.ones(300) if weights is None else weights
+                u = (self.x[:, None] - self.points) / kern.h
+                k = kern(u)
+                if kern.domain is not None:
+                    k[(u < kern.domain[0]) | (u > kern.domain[1])] = 0
+                expected = np.dot(w, k) / w.sum() / kern.h
+                npt.assert_allclose(kde.evaluate(self.points), expected,
+                                    rtol=1e-12, atol=1e-15)
+
+    def test_evaluate_grid(self):
+        kde = KDE(self.x)
+        kde.fit(weights=self.weights)
+        kde_exact = KDE(self.x)
+        kde_exact.fit(weights=self.weights, fft=False)
+        expected = kde_exact.evaluate(self.points)
+        # the default is exact also after the FFT fit
+        npt.assert_allclose(kde.evaluate(self.points), expected, rtol=1e-12)
+        for res in [kde, kde_exact]:
+            npt.assert_allclose(res.evaluate(self.points, method='grid'),
+                                expected, atol=1e-3 * expected.max())
+            npt.assert_allclose(res.evaluate(res.support, method='grid'),
+                                res.density, rtol=1e-12)
+        # outside of the support the kernels are summed directly
+        far = [kde.support[0] - 1, kde.support[-1] + 1]
+        npt.assert_allclose(kde.evaluate(far, method='grid'),
+                            kde_exact.evaluate(far), rtol=1e-12)
+        npt.assert_raises(ValueError, kde.evaluate, 0., method='fft')
+
+    def test_evaluate_shape(self):
+        kde = KDE(self.x)
+        kde.fit(kernel="epa", fft=False)
+        npt.assert_(np.isscalar(kde.evaluate(0.5)))
+        npt.assert_equal(kde.evaluate(np.zeros((2, 3))).shape, (2, 3))
+        npt.assert_equal(kde.evaluate(100.), 0)
+        # blocks of pairs
+        npt.assert_allclose(_kernel_sums_sorted(self.x, None, kde.kernel,
+                                                self.points, max_block=50),
+                            kde.evaluate(self.points), rtol=1e-12)
+
+
 class TestKdeRefit():
     np.random.seed(12345)
     data1 = np.random.randn(100) * 100
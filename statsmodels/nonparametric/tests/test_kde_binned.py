@@ -0,0 +1,179 @@
+import numpy as np
+import numpy.testing as npt
+from nose.tools import raises
+from scipy import stats
+
+from statsmodels.nonparametric import bandwidths
+from statsmodels.nonparametric.kde import kernel_switch, KDEUnivariate
+from statsmodels.nonparametric.kde_binned import (KDEBinned, KDESketch,
+                                                  kdensity_binned)
+from statsmodels.nonparametric.linbin import fast_linbin_nd
+
+
+def _kde_product(data, points, kernel, bw, weights):
+    # Direct evaluation of the product kernel density
+    kern = kernel_switch[kernel]()
+    u = (points[:, None, :] - data[None, :, :]) / bw
+    k = kern(u)
+    if kern.domain is not None:
+        k[(u < kern.domain[0]) | (u > kern.domain[1])] = 0
+    return (k.prod(axis=-1) * weights).sum(axis=1) / weights.sum() / bw.prod()
+
+
+class TestKDEBinned(object):
+
+    @classmethod
+    def setupClass(cls):
+        np.random.seed(12345)
+        cls.data = np.random.normal(size=(1000, 2)) * [1, 2]
+        cls.weights = np.random.uniform(size=1000)
+        cls.points = np.random.normal(size=(30, 2))
+
+    def test_direct(self):
+        for kernel in ['gau', 'epa', 'biw', 'cos']:
+            kde = KDEBinned(self.data).fit(kernel=kernel, gridsize=400)
+            expected = _kde_product(self.data, self.points, kernel, kde.bw,
+                                    np.ones(1000))
+            npt.assert_allclose(kde.evaluate(self.points), expected,
+                                atol=1e-3 * expected.max())
+
+    def test_weights(self):
+        kde = KDEBinned(self.data).fit(weights=self.weights, bw=[0.3, 0.5],
+                                       gridsize=400)
+        npt.assert_equal(kde.bw, [0.3, 0.5])
+        expected = _kde_product(self.data, self.points, 'gau', kde.bw,
+                                self.weights)
+        npt.assert_allclose(kde.evaluate(self.points), expected,
+                            atol=1e-3 * expected.max())
+
+    def test_integral(self):
+        kde = KDEBinned(self.data).fit(kernel='triw', gridsize=[200, 100])
+        npt.assert_equal(kde.density.shape, (200, 100))
+        cell = np.prod([s[1] - s[0] for s in kde.support])
+        npt.assert_allclose(kde.density.sum() * cell, 1, rtol=1e-4)
+
+    def test_univariate(self):
+        x = self.data[:, 0]
+        kde_univ = KDEUnivariate(x)
+        kde_univ.fit(kernel='epa', fft=False)
+        kde = KDEBinned(x).fit(kernel='epa', bw=kde_univ.bw, gridsize=2048)
+        npt.assert_allclose(kde.evaluate(kde_univ.support),
+                            kde_univ.density, atol=1e-4)
+
+    def test_trivariate(self):
+        np.random.seed(12345)
+        data = np.random.normal(size=(500, 3))
+        density, support, bw = kdensity_binned(data, gridsize=64)
+        npt.assert_equal(density.shape, (64, 64, 64))
+        points = np.random.normal(size=(10, 3))
+        expected = _kde_product(data, points, 'gau', bw, np.ones(500))
+        kde = KDEBinned(data).fit(gridsize=64)
+        npt.assert_allclose(kde.evaluate(points), expected,
+                            atol=1e-2 * expected.max())
+
+    def test_outside(self):
+        kde = KDEBinned(self.data).fit()
+        npt.assert_equal(kde.evaluate([[100, 0], [0, -100]]), 0)
+
+    @raises(ValueError)
+    def test_five_variables(self):
+        KDEBinned(np.random.normal(size=(10, 5)))
+
+    @raises(ValueError)
+    def test_not_fit(self):
+        KDEBinned(self.data).evaluate(self.points)
+
+
+def test_linbin_nd():
+    np.random.seed(12345)
+    x = np.random.uniform(size=(500, 2))
+    w = np.random.uniform(size=500)
+    a, b = np.zeros(2), np.ones(2)
+    counts = fast_linbin_nd(x, w, a, b, [11, 21])
+    npt.assert_equal(counts.shape, (11, 21))
+    npt.assert_allclose(counts.sum(), w.sum())
+    # Linear binning preserves the means
+    grid = np.meshgrid(np.linspace(0, 1, 11), np.linspace(0, 1, 21),
+                       indexing='ij')
+    for s in range(2):
+        npt.assert_allclose((counts * grid[s]).sum(), (w * x[:, s]).sum())
+    # Observations outside of the grid are dropped
+    counts = fast_linbin_nd(x + 0.5, w, a, b, [11, 21])
+    npt.assert_allclose(counts.sum(), w[(x < 0.5).all(axis=1)].sum())
+
+
+class TestKDESketch(object):
+
+    @classmethod
+    def setupClass(cls):
+        np.random.seed(12345)
+        cls.x = np.random.lognormal(size=3000)
+        cls.weights = np.random.uniform(size=3000)
+        cls.sketch = KDESketch(0, 25, gridsize=1024)
+        for batch in np.array_split(cls.x, 5):
+            cls.sketch.update(batch)
+
+    def test_density(self):
+        sketch = self.sketch
+        npt.assert_equal(sketch.nobs, 3000)
+        npt.assert_allclose(sketch.weight, 3000)
+        bw = sketch.bw
+        points = np.linspace(0.2, 10, 50)
+        expected = stats.norm.pdf((points[:, None] - self.x) / bw).mean(1) / bw
+        npt.assert_allclose(sketch.evaluate(points), expected,
+                            atol=1e-3 * expected.max())
+        cdf = stats.norm.cdf((sketch.support[:, None] - self.x) / bw).mean(1)
+        npt.assert_allclose(sketch.cdf, cdf, atol=1e-4)
+        q = [0.25, 0.5, 0.9]
+        npt.assert_allclose(np.interp(sketch.quantile(q), sketch.support,
+                                      cdf), q, atol=1e-4)
+        npt.assert_(np.isnan(sketch.quantile(1)))
+
+    def test_merge(self):
+        x1, x2 = self.x[:1000], self.x[1000:]
+        sketch = KDESketch(0, 25, gridsize=1024).update(x1)
+        sketch.merge(KDESketch(0, 25, gridsize=1024).update(x2))
+        npt.assert_allclose(sketch.counts, self.sketch.counts, rtol=1e-12)
+        npt.assert_allclose(sketch.density, self.sketch.density, rtol=1e-10,
+                            atol=1e-14)
+        npt.assert_equal(sketch.weight_above, self.sketch.weight_above)
+        npt.assert_equal(sketch.weight_above, (self.x > 25).sum())
+
+    def test_decay(self):
+        decay = 0.999
+        sketch = KDESketch(0, 25, gridsize=256, kernel='epa', decay=decay)
+        for batch, w in zip(np.array_split(self.x, 7),
+                            np.array_split(self.weights, 7)):
+            sketch.update(batch, weights=w)
+        # Each observation is discounted by decay**age
+        w = self.weights * decay**np.arange(2999, -1, -1)
+        expected = KDESketch(0, 25, gridsize=256, kernel='epa')
+        expected.update(self.x, weights=w)
+        npt.assert_allclose(sketch.counts, expected.counts, rtol=1e-10)
+        npt.assert_allclose(sketch.bw, expected.bw, rtol=1e-10)
+        npt.assert_allclose(sketch.quantile(0.5), expected.quantile(0.5),
+                            rtol=1e-10)
+
+    def test_discount(self):
+        sketch = KDESketch(0, 25, gridsize=1024).merge(self.sketch)
+        sketch.discount(0.5)
+        npt.assert_allclose(sketch.weight, 1500)
+        npt.assert_allclose(sketch.density, self.sketch.density, rtol=1e-10,
+                            atol=1e-14)
+
+    def test_bw(self):
+        sketch = KDESketch(0, 25, gridsize=1024, bw=0.3).merge(self.sketch)
+        npt.assert_equal(sketch.bw, 0.3)
+        # The rule of thumb for the binned data
+        bw = bandwidths.bw_silverman(self.x[self.x < 25])
+        sketch = KDESketch(0, 25, gridsize=1024, bw='silverman')
+        sketch.update(self.x[self.x < 25])
+        npt.assert_allclose(sketch.bw, bw, rtol=1e-2)
+
+    @raises(ValueError)
+    def test_merge_grid(self):
+        KDESketch(0, 25, gridsize=512).merge(self.sketch)
+
+    @raises(ValueError)
+    def test_empty(self):
+        KDESketch(0, 1).density
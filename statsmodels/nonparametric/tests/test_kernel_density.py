@@ -5,6 +5,8 @@ import numpy.testing.decorators as dec
 from unittest import TestCase
 
 import statsmodels.api as sm
+from statsmodels.nonparametric._kernel_base import (gpke, gpke_loo,
+                                                    LeaveOneOut)
 nparam = sm.nonparametric
 
 
@@ -262,6 +264,77 @@ class TestKDEMultivariate(KDETestBase):
                                                           n_sub=100))
         npt.assert_equal(dens.bw, bw_user)
 
+    def test_pdf_tree(self):
+        dens = nparam.KDEMultivariate(data=[self.c1, self.o, self.c2],
+                                      var_type='coc', bw='normal_reference')
+        data_predict = np.column_stack((self.c1, self.o2, self.c3))[:10]
+        npt.assert_allclose(dens.pdf(tol=1e-12), dens.pdf(), rtol=1e-10)
+        npt.assert_allclose(dens.pdf(data_predict, tol=1e-12),
+                            dens.pdf(data_predict), rtol=1e-10)
+
+    def test_pdf_tree_tolerance(self):
+        np.random.seed(12345)
+        data = np.random.normal(size=(2000, 2))
+        dens = nparam.KDEMultivariate(data=data, var_type='cc',
+                                      bw='normal_reference')
+        pdf = dens.pdf()
+        for tol in [1e-2, 1e-4]:
+            pdf_tree = dens.pdf(tol=tol)
+            assert np.all(np.abs(pdf_tree - pdf) <= tol * pdf)
+            assert np.any(pdf_tree != pdf)
+
+    def test_pdf_tree_discrete(self):
+        # Several discrete variables with many combinations of their values
+        np.random.seed(12345)
+        nobs = 1000
+        data = np.column_stack((
+            np.random.normal(size=nobs), np.random.binomial(9, 0.5, nobs),
+            np.random.randint(0, 6, nobs), np.random.normal(size=nobs),
+            np.random.poisson(2, nobs)))
+        dens = nparam.KDEMultivariate(data=data, var_type='couco',
+                                      bw='normal_reference')
+        data_predict = data[:50] + [0.1, 1, 0, -0.1, 0]
+        npt.assert_allclose(dens.pdf(tol=1e-12), dens.pdf(), rtol=1e-10)
+        npt.assert_allclose(dens.pdf(data_predict, tol=1e-12),
+                            dens.pdf(data_predict), rtol=1e-10)
+        pdf = dens.pdf()
+        pdf_tree = dens.pdf(tol=1e-3)
+        assert np.all(np.abs(pdf_tree - pdf) <= 1e-3 * pdf)
+
+    def test_pdf_tree_invalid(self):
+        dens = nparam.KDEMultivariate(data=[self.o, self.o2], var_type='oo',
+                                      bw='normal_reference')
+        npt.assert_raises(ValueError, dens.pdf, tol=1e-6)
+        dens = nparam.KDEMultivariate(data=[self.c1], var_type='c',
+                                      bw='normal_reference')
+        npt.assert_raises(ValueError, dens.pdf, tol=0)
+        npt.assert_raises(ValueError, dens.pdf, tol=1)
+
+    def test_loo_likelihood(self):
+        # Compare with the leave-one-out loop, including an unordered level
+        # that only has one observation
+        u = np.random.binomial(2, 0.5, size=(60, 1))
+        u[0] = 5
+        bw = np.array([0.5, 0.4, 0.3, 0.8])
+        dens = nparam.KDEMultivariate(data=[self.c1, self.o, u, self.c2],
+                                      var_type='couc', bw=bw)
+        loo = LeaveOneOut(dens.data)
+        desired = 0
+        for i, X_not_i in enumerate(loo):
+            desired += np.log(gpke(bw, data=-X_not_i,
+                                   data_predict=-dens.data[i, :],
+                                   var_type='couc'))
+        npt.assert_allclose(dens.loo_likelihood(bw, func=np.log), -desired)
+
+    def test_gpke_loo_blocks(self):
+        data = np.column_stack((self.c1, self.o, self.c2))
+        bw = np.array([0.5, 0.4, 0.8])
+        weights = np.column_stack((np.ones(60), self.c3))
+        desired = gpke_loo(bw, data, 'coc', weights=weights)
+        actual = gpke_loo(bw, data, 'coc', weights=weights, max_block=500)
+        npt.assert_allclose(actual, desired)
+        npt.assert_allclose(actual[:, 0], gpke_loo(bw, data, 'coc'))
+
 
 class TestKDEMultivariateConditional(KDETestBase):
     @dec.slow
@@ -354,6 +427,22 @@ class TestKDEMultivariateConditional(KDETestBase):
         expected = [0.83378885, 0.97684477, 0.90655143, 0.79393161, 0.43629083]
         npt.assert_allclose(sm_result, expected, atol=0, rtol=1e-5)
 
+    def test_loo_likelihood(self):
+        bw = np.array([0.5, 0.3, 0.4, 0.8])
+        dens = nparam.KDEMultivariateConditional(
+            endog=[self.c1, self.o2], exog=[self.o, self.c2], dep_type='co',
+            indep_type='oc', bw=bw)
+        xloo = LeaveOneOut(dens.exog).__iter__()
+        desired = 0
+        for i, Y_j in enumerate(LeaveOneOut(dens.data)):
+            X_not_i = next(xloo)
+            f_yx = gpke(bw, data=-Y_j, data_predict=-dens.data[i, :],
+                        var_type='cooc')
+            f_x = gpke(bw[2:], data=-X_not_i, data_predict=-dens.exog[i, :],
+                       var_type='oc')
+            desired += np.log(f_yx / f_x)
+        npt.assert_allclose(dens.loo_likelihood(bw, func=np.log), -desired)
+
     @dec.slow
     def test_continuous_cvml_efficient(self):
         nobs = 500
@@ -330,6 +330,41 @@ class TestKernelReg(KernelRegressionTestBase):
         # Bandwidth
         npt.assert_equal(model.bw, bw_user)
 
+    def test_fit_tree(self):
+        # Shifted continuous and discrete variables
+        exog = [self.c1 + 100, self.o, self.c2]
+        for reg_type in ['lc', 'll']:
+            model = nparam.KernelReg(endog=[self.y2], exog=exog,
+                                     reg_type=reg_type, var_type='coc',
+                                     bw=[0.5, 0.3, 0.8])
+            mean, mfx = model.fit()
+            mean_tree, mfx_tree = model.fit(tol=1e-12)
+            npt.assert_allclose(mean_tree, mean, rtol=1e-8)
+            npt.assert_allclose(mfx_tree, mfx, rtol=1e-6, atol=1e-8)
+
+            data_predict = np.column_stack(exog)[::10] + 0.1
+            mean, mfx = model.fit(data_predict)
+            mean_tree, mfx_tree = model.fit(data_predict, tol=1e-12)
+            npt.assert_allclose(mean_tree, mean, rtol=1e-8)
+            npt.assert_allclose(mfx_tree, mfx, rtol=1e-6, atol=1e-8)
+
+    def test_cv_loo(self):
+        bw = np.array([0.5, 0.3, 0.8])
+        exog = np.column_stack((self.c1 + 100, self.o, self.c2))
+        for reg_type in ['lc', 'll']:
+            model = nparam.KernelReg(endog=[self.y2], exog=exog,
+                                     reg_type=reg_type, var_type='coc',
+                                     bw=bw)
+            func = model.est[reg_type]
+            desired = 0
+            for i in range(model.nobs):
+                G = func(bw, endog=np.delete(model.endog, i, axis=0),
+                         exog=np.delete(model.exog, i, axis=0),
+                         data_predict=model.exog[i])[0]
+                desired += (model.endog[i, 0] - G)**2
+            npt.assert_allclose(model.cv_loo(bw, func),
+                                desired / model.nobs)
+
 
 if __name__ == "__main__":
     import nose
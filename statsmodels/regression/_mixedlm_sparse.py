@@ -0,0 +1,619 @@
+"""
+Likelihood engine for MixedLM based on cross-products of the data.
+
+In the profile parameterization the marginal covariance of the data in a
+group is ``V = I + Z G Z'``, where ``G = Lambda Lambda'`` is the covariance
+matrix of the random effects of the group.  Following lme4, the profiled
+log-likelihood and its gradient are computed from the cross-products
+``Z'Z``, ``Z'X`` and ``Z'y`` and a factorization of
+
+    M = Lambda' Z'Z Lambda + I,
+
+using ``log|V| = log|M|`` and ``V^{-1} = I - Z Lambda M^{-1} Lambda' Z'``.
+
+The cross-products are computed once.  Groups with the same layout of the
+random effects design are stacked and processed together with dense
+linear algebra on arrays of shape (n_groups, q, q).  Groups with many
+random effects columns, for example crossed variance components in a model
+with a single group, are factorized with a sparse LU decomposition.
+
+The derivative of V with respect to the j-th covariance parameter is
+``Z E_j Z'``, where E_j has ones at the positions of the parameter in the
+random effects covariance matrix.  The score and the Hessian only need
+``W = Z'V^{-1}Z``, ``Z'V^{-1}r`` and ``Z'V^{-1}X`` at the nonzero entries
+of the E_j, which are handled as one list of entries for all parameters.
+
+References
+----------
+Bates, D., Maechler, M., Bolker, B. and Walker, S. (2015).  Fitting linear
+    mixed-effects models using lme4.  Journal of Statistical Software,
+    67(1), 1-48.
+"""
+import numpy as np
+from scipy import sparse
+from scipy.sparse import linalg as splinalg
+
+
+def _cov_sqrt(cov):
+    """
+    Returns a matrix L with ``L L' = cov``.
+
+    The Cholesky factor is used if it exists, otherwise a square root is
+    obtained from the eigen decomposition with negative eigenvalues set to
+    zero.
+    """
+    if cov.shape[0] == 0:
+        return cov
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        evals, evecs = np.linalg.eigh(cov)
+        return evecs * np.sqrt(np.clip(evals, 0, np.inf))
+
+
+def _dv_entries(k_re, col_vc):
+    """
+    Nonzero entries of the matrices E_j with dV/dQ_j = Z E_j Z'.
+
+    Parameters
+    ----------
+    k_re : int
+        Number of correlated random effects.
+    col_vc : ndarray
+        Index of the variance component of each remaining column.
+
+    Returns
+    -------
+    rows, cols, par : ndarray
+        E_j[rows[e], cols[e]] = 1 for all entries e with par[e] == j.  The
+        parameters are ordered as the lower triangle of cov_re followed by
+        the variance components.
+    """
+    rows, cols, par = [], [], []
+    j = 0
+    for j1 in range(k_re):
+        for j2 in range(j1 + 1):
+            rows.append(j1)
+            cols.append(j2)
+            par.append(j)
+            if j1 != j2:
+                rows.append(j2)
+                cols.append(j1)
+                par.append(j)
+            j += 1
+    ix = np.arange(k_re, k_re + len(col_vc))
+    rows = np.concatenate((rows, ix)).astype(np.int64)
+    cols = np.concatenate((cols, ix)).astype(np.int64)
+    par = np.concatenate((par, j + col_vc)).astype(np.int64)
+    return rows, cols, par
+
+
+def _indicator(par, n_par):
+    ind = np.zeros((len(par), n_par))
+    ind[np.arange(len(par)), par] = 1
+    return ind
+
+
+def _score_sums(w_ent, s, sx, entries, n_par):
+    """
+    Sums over stacked groups of trace(W E_j), s' E_j s and S' E_j S.
+
+    `w_ent` holds the elements ``W[cols[e], rows[e]]`` of the entries,
+    `s` and `sx` are Z'V^{-1}r and Z'V^{-1}X.
+    """
+    rows, cols, par = entries
+    tw = np.bincount(par, weights=w_ent.sum(0), minlength=n_par)
+    ss = np.bincount(par, weights=(s[:, rows] * s[:, cols]).sum(0),
+                     minlength=n_par)
+    k_fe = sx.shape[2]
+    sxx = np.zeros((n_par, k_fe, k_fe))
+    np.add.at(sxx, par, np.einsum('gek,gel->ekl', sx[:, rows], sx[:, cols]))
+    return tw, ss, sxx
+
+
+def _hessian_sums(w, s, sx, entries, n_par):
+    """
+    Sums over stacked groups of the pairwise terms of the Hessian.
+
+    Returns
+    -------
+    trace : ndarray
+        trace(E_a W E_b W)
+    srs : ndarray
+        s' E_a W E_b s
+    sxs : ndarray
+        S' E_a s, n_par x k_fe
+    sxx2 : ndarray
+        ``sxx2[a, b] = S' E_a W E_b S``, n_par x n_par x k_fe x k_fe
+    """
+    rows, cols, par = entries
+    ind = _indicator(par, n_par)
+    # kmat[g, e1, e2] = W[cols[e1], rows[e2]]
+    kmat = w[:, cols[:, None], rows[None, :]]
+
+    trace = np.dot(ind.T, np.dot((kmat * np.swapaxes(kmat, 1, 2)).sum(0),
+                                 ind))
+    sr, sc = s[:, rows], s[:, cols]
+    srs = np.dot(ind.T, np.dot(np.einsum('ge,gef,gf->ef', sr, kmat, sc),
+                               ind))
+
+    sxr, sxc = sx[:, rows], sx[:, cols]
+    sxs = np.dot(ind.T, np.einsum('gek,ge->ek', sxr, sc))
+
+    k_fe = sx.shape[2]
+    sxx2 = np.zeros((n_par, n_par, k_fe, k_fe))
+    for b in range(n_par):
+        sel = par == b
+        y = np.matmul(kmat[:, :, sel], sxc[:, sel])
+        sxx2[:, b] = np.tensordot(ind.T, np.einsum('gek,gel->ekl', sxr, y),
+                                  1)
+    return trace, srs, sxs, sxx2
+
+
+class _StackedGroups(object):
+    """
+    Groups with the same random effects layout, stacked as dense arrays.
+
+    Parameters
+    ----------
+    ztz, ztx, zty : ndarray
+        Cross-products of the groups with shapes (n_groups, q, q),
+        (n_groups, q, k_fe) and (n_groups, q).
+    xtx, xty, yty, nobs : ndarray
+        Cross-products of the fixed effects design and the response and
+        the number of observations of the groups.
+    k_re : int
+        Number of columns for the correlated random effects.
+    col_vc : ndarray
+        Index of the variance component for the remaining q - k_re
+        columns.
+    """
+
+    def __init__(self, ztz, ztx, zty, xtx, xty, yty, nobs, k_re, col_vc):
+        self.ztz = ztz
+        self.ztx = ztx
+        self.zty = zty
+        self.xtx = xtx
+        self.xty = xty
+        self.yty = yty
+        self.nobs = nobs
+        self.k_re = k_re
+        self.col_vc = col_vc
+        self.entries = _dv_entries(k_re, col_vc)
+
+    def factor(self, cov_sqrt, vc_sqrt):
+        k_re = self.k_re
+        q = self.ztz.shape[1]
+        lam = np.zeros((q, q))
+        lam[:k_re, :k_re] = cov_sqrt
+        ix = np.arange(k_re, q)
+        lam[ix, ix] = vc_sqrt[self.col_vc]
+        self.lam = lam
+
+        self.p = np.matmul(lam.T, self.ztz)
+        mat = np.matmul(self.p, lam)
+        mat[:, np.arange(q), np.arange(q)] += 1
+        self.minv = np.linalg.inv(mat)
+        logdet = np.linalg.slogdet(mat)[1].sum()
+
+        self.a = np.matmul(lam.T, self.ztx)
+        self.mia = np.matmul(self.minv, self.a)
+
+        xmx = np.einsum('gqi,gqj->ij', self.a, self.mia)
+        b = np.dot(self.zty, lam)
+        xmy = np.einsum('gqi,gq->i', self.mia, b)
+        return logdet, xmx, xmy
+
+    def _solve_resid(self, fe_params):
+        # Z'r, Lambda' Z'r and M^{-1} Lambda' Z'r
+        ztr = self.zty - np.dot(self.ztx, fe_params)
+        c = np.dot(ztr, self.lam)
+        return ztr, c, np.einsum('gij,gj->gi', self.minv, c)
+
+    def quad(self, fe_params):
+        _, c, mic = self._solve_resid(fe_params)
+        return np.sum(c * mic)
+
+    def _gls(self, fe_params):
+        # Z'V^{-1}r, Z'V^{-1}X and Z'V^{-1}Z
+        ztr, _, mic = self._solve_resid(fe_params)
+        pt = np.swapaxes(self.p, 1, 2)
+        s = ztr - np.einsum('gij,gj->gi', pt, mic)
+        sx = self.ztx - np.matmul(pt, self.mia)
+        w = self.ztz - np.matmul(pt, np.matmul(self.minv, self.p))
+        return s, sx, w
+
+    def score_sums(self, fe_params, n_par):
+        s, sx, w = self._gls(fe_params)
+        rows, cols, _ = self.entries
+        return _score_sums(w[:, cols, rows], s, sx, self.entries, n_par)
+
+    def hessian_sums(self, fe_params, n_par):
+        s, sx, w = self._gls(fe_params)
+        rows, cols, _ = self.entries
+        return (_score_sums(w[:, cols, rows], s, sx, self.entries, n_par) +
+                _hessian_sums(w, s, sx, self.entries, n_par))
+
+    def group_terms(self, fe_params):
+        """
+        W entries, Z'V^{-1}r, X'V^{-1}r, r'V^{-1}r and nobs by group
+        """
+        s, _, w = self._gls(fe_params)
+        _, c, mic = self._solve_resid(fe_params)
+        rows, cols, _ = self.entries
+        xtr = self.xty - np.dot(self.xtx, fe_params)
+        xvr = xtr - np.einsum('gqk,gq->gk', self.a, mic)
+        rtr = (self.yty - 2 * np.dot(self.xty, fe_params) +
+               np.dot(np.dot(self.xtx, fe_params), fe_params))
+        rvr = rtr - (c * mic).sum(1)
+        return w[:, cols, rows], s, xvr, rvr, self.nobs
+
+
+class _SparseGroup(object):
+    """
+    A group with a large random effects design, factorized as sparse
+    matrix.
+
+    Parameters
+    ----------
+    exog_re : ndarray or sparse matrix
+        The random effects design of the group, nobs_g x q.
+    exog, endog : ndarray
+        The fixed effects design and the response of the group.
+    k_re : int
+        Number of columns for the correlated random effects.
+    col_vc : ndarray
+        Index of the variance component for the remaining q - k_re
+        columns.
+    chunksize : int
+        Number of right hand sides solved together when computing
+        elements of ``Z'V^{-1}Z``.
+    """
+
+    def __init__(self, exog_re, exog, endog, k_re, col_vc, chunksize=256):
+        z = sparse.csc_matrix(exog_re)
+        self.ztz = z.T.dot(z).tocsc()
+        self.ztx = np.asarray(z.T.dot(exog))
+        self.zty = np.asarray(z.T.dot(endog)).ravel()
+        self.xtx = np.dot(exog.T, exog)[None]
+        self.xty = np.dot(exog.T, endog)[None]
+        self.yty = np.dot(endog, endog)[None]
+        self.nobs = np.array([len(endog)])
+        self.k_re = k_re
+        self.col_vc = col_vc
+        self.chunksize = chunksize
+        self.entries = _dv_entries(k_re, col_vc)
+
+    def factor(self, cov_sqrt, vc_sqrt):
+        k_re = self.k_re
+        blocks = [sparse.diags(vc_sqrt[self.col_vc], 0)]
+        if k_re > 0:
+            blocks.insert(0, sparse.csc_matrix(cov_sqrt))
+        lam = sparse.block_diag(blocks, format='csc')
+        self.lam = lam
+
+        self.p = lam.T.dot(self.ztz).tocsc()
+        q = self.ztz.shape[0]
+        mat = (self.p.dot(lam) + sparse.eye(q)).tocsc()
+        self.lu = splinalg.splu(mat)
+        # M is positive definite and the factor L has a unit diagonal
+        logdet = np.sum(np.log(np.abs(self.lu.U.diagonal())))
+
+        self.a = np.asarray(lam.T.dot(self.ztx))
+        self.mia = self._solve(self.a)
+        xmx = np.dot(self.a.T, self.mia)
+        xmy = np.dot(self.mia.T, lam.T.dot(self.zty))
+        return logdet, xmx, xmy
+
+    def _solve(self, rhs):
+        if rhs.size == 0:
+            return np.zeros(rhs.shape)
+        return self.lu.solve(np.asarray(rhs, dtype=np.float64))
+
+    def _solve_resid(self, fe_params):
+        ztr = self.zty - np.dot(self.ztx, fe_params)
+        c = self.lam.T.dot(ztr)
+        return ztr, c, self._solve(c)
+
+    def quad(self, fe_params):
+        _, c, mic = self._solve_resid(fe_params)
+        return np.dot(c, mic)
+
+    def _gls_resid(self, fe_params):
+        ztr, _, mic = self._solve_resid(fe_params)
+        pt = self.p.T
+        s = ztr - pt.dot(mic)
+        sx = self.ztx - pt.dot(self.mia)
+        return s, sx
+
+    def _w_entries(self):
+        # W[cols[e], rows[e]] solving for the distinct rows in chunks
+        rows, cols, _ = self.entries
+        pt = self.p.T.tocsr()
+        w_ent = np.asarray(self.ztz[cols, rows]).ravel()
+        urows = np.unique(rows)
+        for start in range(0, len(urows), self.chunksize):
+            chunk = urows[start:start + self.chunksize]
+            y = self._solve(self.p[:, chunk].toarray())
+            ii = np.flatnonzero(np.in1d(rows, chunk))
+            pos = np.searchsorted(chunk, rows[ii])
+            prod = pt[cols[ii]].multiply(y[:, pos].T)
+            w_ent[ii] -= np.asarray(prod.sum(1)).ravel()
+        return w_ent
+
+    def _w_dense(self):
+        q = self.ztz.shape[0]
+        w = self.ztz.toarray()
+        pt = self.p.T
+        for start in range(0, q, self.chunksize):
+            pc = self.p[:, start:start + self.chunksize].toarray()
+            w[:, start:start + pc.shape[1]] -= pt.dot(self._solve(pc))
+        return w
+
+    def score_sums(self, fe_params, n_par):
+        s, sx = self._gls_resid(fe_params)
+        return _score_sums(self._w_entries()[None], s[None], sx[None],
+                           self.entries, n_par)
+
+    def hessian_sums(self, fe_params, n_par):
+        s, sx = self._gls_resid(fe_params)
+        w = self._w_dense()[None]
+        s, sx = s[None], sx[None]
+        rows, cols, _ = self.entries
+        return (_score_sums(w[:, cols, rows], s, sx, self.entries, n_par) +
+                _hessian_sums(w, s, sx, self.entries, n_par))
+
+    def group_terms(self, fe_params):
+        s, _ = self._gls_resid(fe_params)
+        _, c, mic = self._solve_resid(fe_params)
+        xtr = self.xty[0] - np.dot(self.xtx[0], fe_params)
+        xvr = xtr - np.dot(self.a.T, mic)
+        rtr = (self.yty[0] - 2 * np.dot(self.xty[0], fe_params) +
+               np.dot(np.dot(self.xtx[0], fe_params), fe_params))
+        rvr = rtr - np.dot(c, mic)
+        return (self._w_entries()[None], s[None], xvr[None],
+                np.array([rvr]), self.nobs)
+
+
+class SparseLikelihood(object):
+    """
+    Profiled likelihood, score and Hessian of a MixedLM from
+    cross-products.
+
+    Parameters
+    ----------
+    model : MixedLM instance
+        The model.
+    max_dense : int
+        Groups with more than `max_dense` random effects columns are
+        factorized as sparse matrices, all other groups are stacked by
+        their random effects layout and factorized as dense matrices.
+
+    Notes
+    -----
+    The factorization is cached for the last value of the covariance
+    parameters, so that the fixed effects, the log-likelihood and the
+    score at the same parameters share a single factorization.
+
+    For a sparse group the score needs the elements of ``Z'V^{-1}Z`` at
+    the positions of the covariance parameters, i.e. one solve with the
+    sparse factorization for each random effects column.  The Hessian
+    needs ``Z'V^{-1}Z`` as dense matrix.
+    """
+
+    def __init__(self, model, max_dense=500):
+        self.model = model
+        self.k_fe, self.k_re, self.k_vc = model.k_fe, model.k_re, model.k_vc
+        self.n_par = model.k_re2 + model.k_vc
+
+        exog, endog = model.exog, model.endog
+        self.xtx = np.dot(exog.T, exog)
+        self.xty = np.dot(exog.T, endog)
+
+        if self.k_vc == 0:
+            self.blocks = [self._stack_re()]
+        else:
+            self.blocks = self._setup_blocks(max_dense)
+        self._key = None
+
+    def _stack_re(self):
+        # All groups have the layout of exog_re, cross-products are
+        # group sums of the rows
+        model = self.model
+        rows = [model.row_indices[group] for group in model.group_labels]
+        ix = np.concatenate(rows)
+        starts = np.cumsum([0] + [len(r) for r in rows[:-1]])
+        z = model.exog_re[ix]
+        exog = model.exog[ix]
+        endog = model.endog[ix]
+
+        def gsum(x):
+            return np.add.reduceat(x, starts)
+
+        return _StackedGroups(gsum(z[:, :, None] * z[:, None, :]),
+                              gsum(z[:, :, None] * exog[:, None, :]),
+                              gsum(z * endog[:, None]),
+                              gsum(exog[:, :, None] * exog[:, None, :]),
+                              gsum(exog * endog[:, None]),
+                              gsum(endog ** 2),
+                              np.array([len(r) for r in rows]),
+                              self.k_re, np.zeros(0, dtype=np.int64))
+
+    def _setup_blocks(self, max_dense):
+        model = self.model
+        layouts = {}
+        blocks = []
+        for group_ix, group in enumerate(model.group_labels):
+            col_vc = [np.repeat(j, model.exog_vc[ky][group].shape[1])
+                      for j, ky in enumerate(model._vc_names)
+                      if group in model.exog_vc[ky]]
+            col_vc = np.concatenate(col_vc + [np.zeros(0, dtype=np.int64)])
+            col_vc = col_vc.astype(np.int64)
+
+            ex_r = model._aex_r[group_ix]
+            exog = model.exog_li[group_ix]
+            endog = model.endog_li[group_ix]
+            if ex_r.shape[1] > max_dense:
+                blocks.append(_SparseGroup(ex_r, exog, endog, self.k_re,
+                                           col_vc))
+                continue
+            if sparse.issparse(ex_r):
+                ex_r = ex_r.toarray()
+            key = (ex_r.shape[1], col_vc.tobytes())
+            cross = layouts.setdefault(key, ([], [], [], [], [], [], [],
+                                             col_vc))
+            cross[0].append(np.dot(ex_r.T, ex_r))
+            cross[1].append(np.dot(ex_r.T, exog))
+            cross[2].append(np.dot(ex_r.T, endog))
+            cross[3].append(np.dot(exog.T, exog))
+            cross[4].append(np.dot(exog.T, endog))
+            cross[5].append(np.dot(endog, endog))
+            cross[6].append(len(endog))
+
+        for cross in layouts.values():
+            arrays = [np.array(x) for x in cross[:-1]]
+            blocks.append(_StackedGroups(*arrays, k_re=self.k_re,
+                                         col_vc=cross[-1]))
+        return blocks
+
+    def _update(self, cov_re, vcomp):
+        cov_re = np.asarray(cov_re, dtype=np.float64)
+        vcomp = np.asarray(vcomp, dtype=np.float64)
+        key = (cov_re.tobytes(), vcomp.tobytes())
+        if key == self._key:
+            return
+
+        cov_sqrt = _cov_sqrt(cov_re)
+        vc_sqrt = np.sqrt(np.clip(vcomp, 0, np.inf))
+        logdet, xmx, xmy = 0., 0., 0.
+        for block in self.blocks:
+            ld, xx, xy = block.factor(cov_sqrt, vc_sqrt)
+            logdet += ld
+            xmx = xmx + xx
+            xmy = xmy + xy
+
+        self.logdet = logdet
+        self.xvx = self.xtx - xmx
+        self.xvy = self.xty - xmy
+        self._key = key
+
+    def get_fe_params(self, cov_re, vcomp):
+        """
+        GLS estimate of the fixed effects parameters.
+        """
+        self._update(cov_re, vcomp)
+        if self.k_fe == 0:
+            return np.array([])
+        return np.linalg.solve(self.xvx, self.xvy)
+
+    def quad_form(self, cov_re, vcomp, fe_params):
+        """
+        The quadratic form r' V^{-1} r of the residuals r.
+        """
+        self._update(cov_re, vcomp)
+        model = self.model
+        resid = model.endog - np.dot(model.exog, fe_params)
+        qf = np.dot(resid, resid)
+        for block in self.blocks:
+            qf -= block.quad(fe_params)
+        return qf
+
+    def loglike_terms(self, cov_re, vcomp, fe_params):
+        """
+        Returns log|V|, r' V^{-1} r and X' V^{-1} X summed over the groups.
+        """
+        qf = self.quad_form(cov_re, vcomp, fe_params)
+        return self.logdet, qf, self.xvx
+
+    def score_terms(self, cov_re, vcomp, fe_params):
+        """
+        Returns the sums over the groups that enter the score.
+
+        Returns
+        -------
+        dlv : ndarray
+            trace(V^{-1} dV/dQ_j) for each covariance parameter Q_j.
+        rvavr : ndarray
+            r' V^{-1} dV/dQ_j V^{-1} r for each covariance parameter.
+        xtax : list of ndarray
+            X' V^{-1} dV/dQ_j V^{-1} X for each covariance parameter.
+        rvir : float
+            r' V^{-1} r
+        xtvir : ndarray
+            X' V^{-1} r
+        xtvix : ndarray
+            X' V^{-1} X
+        """
+        rvir = self.quad_form(cov_re, vcomp, fe_params)
+
+        dlv, rvavr, xtax = 0., 0., 0.
+        for block in self.blocks:
+            tw, ss, sxx = block.score_sums(fe_params, self.n_par)
+            dlv = dlv + tw
+            rvavr = rvavr + ss
+            xtax = xtax + sxx
+
+        xtvir = self.xvy - np.dot(self.xvx, fe_params)
+        return dlv, rvavr, list(xtax), rvir, xtvir, self.xvx
+
+    def hessian_terms(self, cov_re, vcomp, fe_params):
+        """
+        Returns the sums over the groups that enter the Hessian.
+
+        Returns
+        -------
+        xtvix : ndarray
+            X' V^{-1} X
+        rvir : float
+            r' V^{-1} r
+        xvavr : ndarray
+            X' V^{-1} dV/dQ_j V^{-1} r in row j.
+        rvavr : ndarray
+            r' V^{-1} dV/dQ_j V^{-1} r
+        rvavavr : ndarray
+            r' V^{-1} dV/dQ_a V^{-1} dV/dQ_b V^{-1} r
+        vava : ndarray
+            trace(V^{-1} dV/dQ_a V^{-1} dV/dQ_b)
+        xtax : list of ndarray
+            X' V^{-1} dV/dQ_j V^{-1} X for each covariance parameter.
+        xvavax : ndarray
+            X' V^{-1} dV/dQ_a V^{-1} dV/dQ_b V^{-1} X in element [a, b].
+        """
+        rvir = self.quad_form(cov_re, vcomp, fe_params)
+
+        n_par = self.n_par
+        rvavr, xtax = 0., 0.
+        vava, rvavavr, xvavr, xvavax = 0., 0., 0., 0.
+        for block in self.blocks:
+            (_, ss, sxx, trace, srs, sxs,
+             sxx2) = block.hessian_sums(fe_params, n_par)
+            rvavr = rvavr + ss
+            xtax = xtax + sxx
+            vava = vava + trace
+            rvavavr = rvavavr + srs
+            xvavr = xvavr + sxs
+            xvavax = xvavax + sxx2
+
+        return (self.xvx, rvir, xvavr, rvavr, rvavavr, vava, list(xtax),
+                xvavax)
+
+    def score_groups(self, cov_re, vcomp, fe_params, scale):
+        """
+        Score contributions of the groups for the log-likelihood with
+        covariance ``scale * V``.
+
+        Returns an array with one row per group and columns for the
+        fixed effects, the covariance parameters and the scale.
+        """
+        self._update(cov_re, vcomp)
+        scores = []
+        for block in self.blocks:
+            w_ent, s, xvr, rvr, nobs = block.group_terms(fe_params)
+            rows, cols, par = block.entries
+            ind = _indicator(par, self.n_par)
+            tw = np.dot(w_ent, ind)
+            ss = np.dot(s[:, rows] * s[:, cols], ind)
+            scores.append(np.column_stack((
+                xvr / scale, -0.5 * tw + 0.5 * ss / scale,
+                -0.5 * nobs / scale + 0.5 * rvr / scale ** 2)))
+        return np.concatenate(scores, 0)
@@ -1,6 +1,7 @@
 from collections import namedtuple
 import numpy as np
 from statsmodels.tools.tools import Bunch
+from statsmodels.tools import _sparse
 
 _MinimalWLSModel = namedtuple('_MinimalWLSModel', ['weights'])
 
@@ -46,7 +47,7 @@ class _MinimalWLS(object):
         if np.isscalar(weights):
             self.wexog = w_half * exog
         else:
-            self.wexog = w_half[:, None] * exog
+            self.wexog = _sparse.scale_rows(exog, w_half)
 
     def fit(self, method='pinv'):
         """
@@ -78,11 +79,18 @@ class _MinimalWLS(object):
         -----
         Does not perform and checks on the input data
 
+        If exog is a scipy.sparse matrix, then the normal equations are
+        solved for all methods.
+
         See Also
         --------
         statsmodels.regression.linear_model.WLS
         """
-        if method == 'pinv':
+        if _sparse.issparse(self.wexog):
+            xtx = _sparse.xtwx(self.wexog)
+            params = np.linalg.lstsq(xtx, self.wexog.T.dot(self.wendog),
+                                     rcond=-1)[0]
+        elif method == 'pinv':
             pinv_wexog = np.linalg.pinv(self.wexog)
             params = pinv_wexog.dot(self.wendog)
         elif method == 'qr':
@@ -0,0 +1,289 @@
+"""
+Linear regression with absorbed high-dimensional fixed effects.
+
+The fixed effects of one or several categorical variables are swept out of
+`endog` and `exog` with the method of alternating projections, i.e. the
+group means of each grouping are subtracted in turn until the transformed
+data do not change anymore. Each sweep only needs group sums computed with
+`np.bincount`, so the cost per iteration is linear in the number of
+observations and no dummy variables are created.
+
+Author: statsmodels developers
+License: BSD-3
+
+References
+----------
+Guimaraes, P. and Portugal, P. (2010). A simple feasible procedure to fit
+    models with high-dimensional fixed effects. Stata Journal, 10(4),
+    628-649.
+Gaure, S. (2013). OLS with multiple high dimensional category variables.
+    Computational Statistics & Data Analysis, 66, 8-18.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from statsmodels.compat.numpy import np_matrix_rank
+from statsmodels.tools.grouputils import Grouping, group_sums
+from statsmodels.tools.sm_exceptions import ConvergenceWarning
+from statsmodels.regression.linear_model import WLS
+
+
+def absorb_demean(x, groups, weights=None, tol=1e-8, maxiter=1000):
+    """
+    Sweep out the fixed effects of several groupings by alternating projections
+
+    Parameters
+    ----------
+    x : ndarray
+        1-d or 2-d array with observations in rows.
+    groups : list of ndarray
+        Integer group labels ``0, ..., n_groups - 1`` for each grouping, each
+        of length nobs.
+    weights : ndarray, optional
+        Observation weights. Weighted group means are used if provided.
+    tol : float
+        Convergence tolerance. Iterations stop when the largest change in a
+        sweep is smaller than `tol` times the largest absolute value of the
+        corresponding column of `x`.
+    maxiter : int
+        Maximum number of sweeps over all groupings.
+
+    Returns
+    -------
+    x_demeaned : ndarray
+        `x` with the (weighted) fixed effects removed, same shape as `x`.
+    n_iter : int
+        Number of sweeps.
+    converged : bool
+        False if `maxiter` was reached before convergence.
+
+    Notes
+    -----
+    With a single grouping the within transformation is exact after one
+    sweep.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    is_1d = (x.ndim == 1)
+    x_dm = x.reshape(x.shape[0], -1).copy()
+    if weights is None:
+        weights = np.ones(x_dm.shape[0])
+    else:
+        weights = np.ones(x_dm.shape[0]) * weights
+
+    group_weights = [np.bincount(group, weights=weights) for group in groups]
+    scale = np.max(np.abs(x_dm), 0)
+    scale[scale == 0] = 1.
+
+    converged = True
+    n_iter = 0
+    for n_iter in range(1, maxiter + 1):
+        change = np.zeros(x_dm.shape[1])
+        for group, wsum in zip(groups, group_weights):
+            means = group_sums(weights[:, None] * x_dm, group).T
+            means /= wsum[:, None]
+            x_dm -= means[group]
+            change = np.maximum(change, np.max(np.abs(means), 0))
+        if len(groups) == 1 or np.all(change <= tol * scale):
+            break
+    else:
+        converged = False
+
+    if is_1d:
+        x_dm = x_dm[:, 0]
+    return x_dm, n_iter, converged
+
+
+def _absorbed_df(groups, n_groups):
+    """
+    Number of linearly independent fixed effects
+
+    Redundant levels between the first two groupings are counted exactly
+    from the connected components of their bipartite graph, each further
+    grouping is assumed to have one redundant level.
+    """
+    df = n_groups[0]
+    if len(groups) > 1:
+        g0, g1 = groups[0], groups[1]
+        nobs = len(g0)
+        n_nodes = n_groups[0] + n_groups[1]
+        adj = sparse.coo_matrix((np.ones(nobs), (g0, g1 + n_groups[0])),
+                                shape=(n_nodes, n_nodes))
+        n_components = connected_components(adj, directed=False)[0]
+        df += n_groups[1] - n_components
+    for n_g in n_groups[2:]:
+        df += n_g - 1
+    return df
+
+
+class AbsorbingLS(WLS):
+    __doc__ = """
+    Linear regression with absorbed fixed effects
+
+    Estimates the slope parameters of a linear model with additive fixed
+    effects for one or several high-dimensional categorical variables. The
+    fixed effects are not estimated, they are removed from `endog` and
+    `exog` with the method of alternating projections.
+
+    Parameters
+    ----------
+    endog : array-like
+        1-d endogenous response variable.
+    exog : array-like
+        A nobs x k array of explanatory variables. It should not include a
+        constant, which is absorbed by the fixed effects.
+    absorb : array-like
+        A nobs x k_absorb array or DataFrame, or a 1-d array, with the labels
+        of the categorical variables whose fixed effects are absorbed. Labels
+        can be of any type that can be factorized by pandas.
+    weights : array-like, optional
+        Observation weights as in `WLS`.
+    tol : float
+        Convergence tolerance of the alternating projections, see
+        `absorb_demean`.
+    maxiter : int
+        Maximum number of iterations of the alternating projections.
+    %(extra_params)s
+
+    Attributes
+    ----------
+    n_groups_absorb : list
+        Number of levels for each absorbed variable.
+    df_absorb : int
+        Number of linearly independent fixed effects, subtracted from the
+        residual degrees of freedom.
+    n_iter : int
+        Number of alternating projection sweeps.
+    converged : bool
+        Whether the alternating projections converged.
+
+    Notes
+    -----
+    `wendog` and `wexog` hold the whitened within transformed data, and
+    `wresid` are the within residuals. The `predict` method, `fittedvalues`
+    and `resid` use the original `exog` and do not include the fixed effects.
+    `rsquared` is the within R-squared and `fvalue` tests that all slope
+    parameters are zero.
+
+    Cluster robust standard errors are available with
+    ``fit(cov_type='cluster', cov_kwds={'groups': groups})``. If `groups` is
+    not provided, then the first absorbed variable is used as cluster. The
+    small sample correction does not count the absorbed fixed effects, which
+    is appropriate if they are nested within the clusters.
+
+    The degrees of freedom of the fixed effects are exact for one and two
+    absorbed variables. For additional variables one redundant level each
+    is assumed.
+
+    Examples
+    --------
+    >>> mod = AbsorbingLS(y, x, absorb=df[['customer', 'store', 'week']])
+    >>> res = mod.fit(cov_type='cluster')
+    """ % {'extra_params': """missing : str
+        Available options are 'none', 'drop', and 'raise'. If 'none', no nan
+        checking is done. If 'drop', any observations with nans are dropped.
+        If 'raise', an error is raised. Default is 'none.'"""}
+
+    def __init__(self, endog, exog, absorb, weights=1., missing='none',
+                 tol=1e-8, maxiter=1000, **kwargs):
+        self.tol = tol
+        self.maxiter = maxiter
+        # 2-d extra arrays are nobs x nobs in the missing data handling,
+        # rows of absorb are dropped in initialize instead
+        self.absorb = _factorize_absorb(absorb)
+        super(AbsorbingLS, self).__init__(endog, exog, weights=weights,
+                                          missing=missing, **kwargs)
+        self._init_keys.extend(['absorb', 'tol', 'maxiter'])
+
+    def initialize(self):
+        if self.data.const_idx is not None:
+            raise ValueError('exog contains a constant, which is absorbed '
+                             'by the fixed effects')
+        # implicit constants are collinear with the fixed effects
+        self.k_constant = self.data.k_constant = 0
+
+        missing_row_idx = getattr(self.data, 'missing_row_idx', None)
+        if missing_row_idx:
+            self.absorb = np.delete(self.absorb, missing_row_idx, axis=0)
+        absorb = self.absorb
+        if absorb.shape[0] != self.endog.shape[0]:
+            raise ValueError('absorb must have the same number of rows as '
+                             'endog')
+        # labels are factorized again, missing='drop' can remove levels
+        grouping = Grouping(pd.MultiIndex.from_arrays(absorb.T.tolist()))
+        self._groups = [np.asarray(labels) for labels in grouping.labels]
+        self.n_groups_absorb = [int(group.max()) + 1
+                                for group in self._groups]
+        self.df_absorb = _absorbed_df(self._groups, self.n_groups_absorb)
+
+        weights = getattr(self, 'weights', 1.)
+        data = np.column_stack((self.endog, self.exog))
+        data_dm, n_iter, converged = absorb_demean(
+            data, self._groups, weights=weights, tol=self.tol,
+            maxiter=self.maxiter)
+        self.n_iter = n_iter
+        self.converged = converged
+        if not converged:
+            warnings.warn('Alternating projections did not converge in %d '
+                          'iterations' % n_iter, ConvergenceWarning)
+
+        self.wendog = self.whiten(data_dm[:, 0])
+        self.wexog = self.whiten(data_dm[:, 1:])
+        self.nobs = float(self.wexog.shape[0])
+
+        # the fixed effects are not part of the rank of wexog
+        self.rank = np_matrix_rank(self.wexog)
+        self._df_model = float(self.rank)
+        self._df_resid = self.nobs - self.rank - self.df_absorb
+
+    def fit(self, method="pinv", cov_type='nonrobust', cov_kwds=None,
+            use_t=None, **kwargs):
+        """
+        Full fit of the model.
+
+        Parameters
+        ----------
+        method : str, optional
+            "pinv" or "qr", see `RegressionModel.fit`.
+        cov_type : str, optional
+            See `regression.linear_model.RegressionResults` for a description
+            of the available covariance estimators.
+        cov_kwds : dict or None, optional
+            Keywords for the covariance estimator. If cov_type is 'cluster'
+            and `groups` is not provided, then the clusters are given by the
+            first absorbed variable.
+        use_t : bool, optional
+            Flag indicating to use the Student's t distribution when
+            computing p-values.
+
+        Returns
+        -------
+        results : RegressionResultsWrapper
+        """
+        if cov_type == 'cluster':
+            cov_kwds = {} if cov_kwds is None else dict(cov_kwds)
+            if 'groups' not in cov_kwds:
+                cov_kwds['groups'] = self._groups[0]
+        return super(AbsorbingLS, self).fit(method=method, cov_type=cov_type,
+                                            cov_kwds=cov_kwds, use_t=use_t,
+                                            **kwargs)
+
+
+def _factorize_absorb(absorb):
+    """integer codes for the columns of absorb, nobs x k_absorb array"""
+    if isinstance(absorb, pd.Series):
+        absorb = absorb.to_frame()
+    if isinstance(absorb, pd.DataFrame):
+        columns = [absorb.iloc[:, i].values for i in range(absorb.shape[1])]
+    else:
+        absorb = np.asarray(absorb)
+        if absorb.ndim == 1:
+            absorb = absorb[:, None]
+        columns = [absorb[:, i] for i in range(absorb.shape[1])]
+    codes = np.column_stack([pd.factorize(col)[0] for col in columns])
+    if (codes < 0).any():
+        raise ValueError('absorb contains missing values')
+    return codes
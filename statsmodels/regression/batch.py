@@ -0,0 +1,351 @@
+"""
+Least squares for many response variables sharing the same design.
+
+The whitened design matrix is factorized once and the estimates, their
+standard errors and the goodness of fit statistics for all columns of a
+2-d `endog` are computed with array operations, without creating a model
+and results instance for each response.
+
+Author: statsmodels developers
+License: BSD-3
+"""
+import numpy as np
+from scipy import stats
+
+from statsmodels.tools.decorators import (resettable_cache, cache_readonly,
+                                          cache_writable)
+import statsmodels.base.wrapper as wrap
+from statsmodels.regression.linear_model import OLS
+
+
+class BatchRegressionResults(object):
+    """
+    Results for a set of linear regressions with a common design matrix
+
+    Parameters
+    ----------
+    model : RegressionModel instance
+        Model with 2-d `endog` of shape (nobs, k_endog).
+    params : ndarray
+        Array of shape (k_exog, k_endog), each column contains the
+        parameters for the corresponding column of endog.
+    normalized_cov_params : ndarray
+        (k_exog, k_exog) normalized covariance of the parameters, shared by
+        all regressions.
+    cov_type : str
+        'nonrobust', 'HC0', 'HC1', 'HC2' or 'HC3'.
+    use_t : bool, optional
+        Flag indicating to use the Student's t distribution when computing
+        p-values. The default is True for nonrobust and False for the
+        heteroscedasticity robust covariances, as in `RegressionResults`.
+
+    Attributes
+    ----------
+    params : ndarray
+        (k_exog, k_endog) estimated parameters
+    bse, tvalues, pvalues : ndarray
+        (k_exog, k_endog) inferential statistics of the parameters
+    ssr, scale, rsquared, rsquared_adj, fvalue, f_pvalue, llf, aic, bic :
+        ndarray of length k_endog with one value per regression
+    resid, wresid, fittedvalues : ndarray
+        (nobs, k_endog) arrays
+
+    Notes
+    -----
+    The definitions of all statistics are the same as in
+    `RegressionResults` for a single response variable.
+
+    See Also
+    --------
+    statsmodels.regression.linear_model.RegressionResults
+    """
+
+    def __init__(self, model, params, normalized_cov_params,
+                 cov_type='nonrobust', use_t=None):
+        self.model = model
+        self.params = params
+        self.normalized_cov_params = normalized_cov_params
+        self._cache = resettable_cache()
+
+        self.k_endog = params.shape[1]
+        self.k_constant = model.k_constant
+        self.df_model = model.df_model
+        self.df_resid = model.df_resid
+
+        cov_type_ = cov_type.upper()
+        if cov_type == 'nonrobust':
+            description = ('Standard Errors assume that the covariance '
+                           'matrix of the errors is correctly specified.')
+            if use_t is None:
+                use_t = True
+        elif cov_type_ in ('HC0', 'HC1', 'HC2', 'HC3'):
+            description = ('Standard Errors are heteroscedasticity robust '
+                           '(' + cov_type + ')')
+            if use_t is None:
+                use_t = False
+        else:
+            raise ValueError('cov_type %s is not available for batch '
+                             'regressions' % cov_type)
+        self.cov_type = cov_type
+        self.use_t = use_t
+        self.cov_kwds = {'description': description, 'use_t': use_t}
+
+    @cache_readonly
+    def nobs(self):
+        return float(self.model.wexog.shape[0])
+
+    @cache_readonly
+    def fittedvalues(self):
+        return np.dot(self.model.exog, self.params)
+
+    @cache_readonly
+    def wresid(self):
+        return self.model.wendog - np.dot(self.model.wexog, self.params)
+
+    @cache_readonly
+    def resid(self):
+        return self.model.endog - self.fittedvalues
+
+    @cache_readonly
+    def ssr(self):
+        wresid = self.wresid
+        return (wresid * wresid).sum(0)
+
+    @cache_writable()
+    def scale(self):
+        return self.ssr / self.df_resid
+
+    @cache_readonly
+    def centered_tss(self):
+        model = self.model
+        weights = getattr(model, 'weights', None)
+        if weights is not None:
+            weights = np.ones(model.endog.shape[0]) * weights
+            mean = np.dot(weights, model.endog) / weights.sum()
+            return np.dot(weights, (model.endog - mean)**2)
+        else:
+            centered_endog = model.wendog - model.wendog.mean(0)
+            return (centered_endog * centered_endog).sum(0)
+
+    @cache_readonly
+    def uncentered_tss(self):
+        wendog = self.model.wendog
+        return (wendog * wendog).sum(0)
+
+    @cache_readonly
+    def ess(self):
+        if self.k_constant:
+            return self.centered_tss - self.ssr
+        else:
+            return self.uncentered_tss - self.ssr
+
+    @cache_readonly
+    def rsquared(self):
+        if self.k_constant:
+            return 1 - self.ssr / self.centered_tss
+        else:
+            return 1 - self.ssr / self.uncentered_tss
+
+    @cache_readonly
+    def rsquared_adj(self):
+        return 1 - (np.divide(self.nobs - self.k_constant, self.df_resid) *
+                    (1 - self.rsquared))
+
+    @cache_readonly
+    def mse_model(self):
+        return self.ess / self.df_model
+
+    @cache_readonly
+    def mse_resid(self):
+        return self.ssr / self.df_resid
+
+    @cache_readonly
+    def llf(self):
+        if not isinstance(self.model, OLS):
+            # GLS and WLS loglike are computed columnwise for 2-d endog
+            return self.model.loglike(self.params)
+        nobs2 = self.nobs / 2.0
+        llf = -np.log(self.ssr) * nobs2
+        llf -= (1 + np.log(np.pi / nobs2)) * nobs2
+        return llf
+
+    @cache_readonly
+    def aic(self):
+        return -2 * self.llf + 2 * (self.df_model + self.k_constant)
+
+    @cache_readonly
+    def bic(self):
+        return (-2 * self.llf + np.log(self.nobs) * (self.df_model +
+                                                     self.k_constant))
+
+    @cache_readonly
+    def _leverage(self):
+        wexog = self.model.wexog
+        return (np.dot(wexog, self.normalized_cov_params) * wexog).sum(1)
+
+    @cache_readonly
+    def het_scale(self):
+        """
+        (nobs, k_endog) squared residuals used in the HC covariances
+        """
+        cov_type = self.cov_type.upper()
+        wresid2 = self.wresid**2
+        if cov_type == 'HC0':
+            return wresid2
+        elif cov_type == 'HC1':
+            return self.nobs / self.df_resid * wresid2
+        elif cov_type == 'HC2':
+            return wresid2 / (1 - self._leverage)[:, None]
+        elif cov_type == 'HC3':
+            return wresid2 / ((1 - self._leverage)**2)[:, None]
+        return None
+
+    @cache_readonly
+    def _cov_params(self):
+        ncp = self.normalized_cov_params
+        k_exog = ncp.shape[0]
+        if self.cov_type == 'nonrobust':
+            return self.scale[:, None, None] * ncp
+
+        # sandwich for all responses at once, only the upper triangle of
+        # the outer products of the rows of pinv_wexog is formed
+        pinv_wexog = self.model.pinv_wexog
+        rows, cols = np.triu_indices(k_exog)
+        cov_vech = np.dot(pinv_wexog[rows] * pinv_wexog[cols],
+                          self.het_scale)
+        cov = np.zeros((self.k_endog, k_exog, k_exog))
+        cov[:, rows, cols] = cov_vech.T
+        cov[:, cols, rows] = cov_vech.T
+        return cov
+
+    def cov_params(self):
+        """
+        Covariance of the parameters for each regression
+
+        Returns
+        -------
+        cov : ndarray
+            Array of shape (k_endog, k_exog, k_exog) with the covariance
+            matrix of the parameters of regression ``i`` in ``cov[i]``.
+        """
+        return self._cov_params
+
+    @cache_readonly
+    def bse(self):
+        cov = self._cov_params
+        return np.sqrt(np.diagonal(cov, axis1=1, axis2=2)).T
+
+    @cache_readonly
+    def tvalues(self):
+        return self.params / self.bse
+
+    @cache_readonly
+    def pvalues(self):
+        if self.use_t:
+            return stats.t.sf(np.abs(self.tvalues), self.df_resid) * 2
+        else:
+            return stats.norm.sf(np.abs(self.tvalues)) * 2
+
+    def conf_int(self, alpha=.05):
+        """
+        Confidence intervals of the parameters
+
+        Parameters
+        ----------
+        alpha : float, optional
+            The `alpha` level for the confidence interval.
+
+        Returns
+        -------
+        lower, upper : ndarray
+            (k_exog, k_endog) arrays with the lower and upper limits.
+        """
+        if self.use_t:
+            q = stats.t.ppf(1 - alpha / 2., self.df_resid)
+        else:
+            q = stats.norm.ppf(1 - alpha / 2.)
+        params, bse = self.params, self.bse
+        return params - q * bse, params + q * bse
+
+    @cache_readonly
+    def fvalue(self):
+        if self.cov_type == 'nonrobust':
+            return self.mse_model / self.mse_resid
+
+        # Wald test that all slope parameters are zero, for each response
+        k_exog = self.params.shape[0]
+        idx = np.arange(k_exog)
+        if self.model.data.k_constant == 1:
+            const_idx = self.model.data.const_idx
+            if const_idx is None:
+                return np.nan * np.ones(self.k_endog)
+            idx = np.delete(idx, const_idx)
+        params = self.params[idx].T
+        cov = self._cov_params[:, idx[:, None], idx]
+        wald = (params * np.linalg.solve(cov, params[..., None])[..., 0])
+        return wald.sum(1) / len(idx)
+
+    @cache_readonly
+    def f_pvalue(self):
+        if self.cov_type == 'nonrobust':
+            df_num = self.df_model
+        else:
+            df_num = self.params.shape[0] - (self.model.data.k_constant == 1)
+        return stats.f.sf(self.fvalue, df_num, self.df_resid)
+
+    def get_results(self, idx):
+        """
+        Regression results for a single response variable
+
+        Parameters
+        ----------
+        idx : int
+            Column index of the response in endog.
+
+        Returns
+        -------
+        results : RegressionResultsWrapper
+            Full results instance, computed from the shared factorization
+            of the design matrix.
+        """
+        model = self.model
+        kwds = model._get_init_kwds()
+        # GLS recomputes the whitening matrix from sigma
+        kwds.pop('cholsigmainv', None)
+        endog = model.data.orig_endog
+        if hasattr(endog, 'iloc'):
+            endog = endog.iloc[:, idx]
+        else:
+            endog = model.endog[:, idx]
+        mod = model.__class__(endog, model.data.orig_exog, **kwds)
+        mod.pinv_wexog = model.pinv_wexog
+        mod.normalized_cov_params = model.normalized_cov_params
+        mod.wexog_singular_values = model.wexog_singular_values
+        mod.rank = model.rank
+        return mod.fit(cov_type=self.cov_type, use_t=self.use_t)
+
+
+class BatchRegressionResultsWrapper(wrap.ResultsWrapper):
+    _attrs = {
+        'params': 'columns_eq',
+        'bse': 'columns_eq',
+        'tvalues': 'columns_eq',
+        'pvalues': 'columns_eq',
+        'resid': 'rows',
+        'wresid': 'rows',
+        'fittedvalues': 'rows',
+        'ssr': ('generic_columns', 'ynames'),
+        'scale': ('generic_columns', 'ynames'),
+        'rsquared': ('generic_columns', 'ynames'),
+        'rsquared_adj': ('generic_columns', 'ynames'),
+        'fvalue': ('generic_columns', 'ynames'),
+        'f_pvalue': ('generic_columns', 'ynames'),
+        'llf': ('generic_columns', 'ynames'),
+        'aic': ('generic_columns', 'ynames'),
+        'bic': ('generic_columns', 'ynames'),
+    }
+    _wrap_attrs = _attrs
+    _methods = {}
+    _wrap_methods = _methods
+wrap.populate_wrapper(BatchRegressionResultsWrapper,
+                      BatchRegressionResults)
@@ -48,6 +48,7 @@ from scipy import optimize
 
 from statsmodels.compat.numpy import np_matrix_rank
 from statsmodels.tools.tools import add_constant, chain_dot, pinv_extended
+from statsmodels.tools import _sparse
 from statsmodels.tools.decorators import (resettable_cache,
                                           cache_readonly,
                                           cache_writable)
@@ -114,7 +115,7 @@ class RegressionModel(base.LikelihoodModel):
         """
         if self._df_model is None:
             if self.rank is None:
-                self.rank = np_matrix_rank(self.exog)
+                self._init_rank()
             self._df_model = float(self.rank - self.k_constant)
         return self._df_model
 
@@ -131,7 +132,7 @@ class RegressionModel(base.LikelihoodModel):
 
         if self._df_resid is None:
             if self.rank is None:
-                self.rank = np_matrix_rank(self.exog)
+                self._init_rank()
             self._df_resid = self.nobs - self.rank
         return self._df_resid
 
@@ -139,6 +140,34 @@ class RegressionModel(base.LikelihoodModel):
     def df_resid(self, value):
         self._df_resid = value
 
+    def _init_rank(self):
+        """
+        Compute the rank of the design matrix
+
+        For a sparse design matrix, the rank and the singular values are
+        taken from the eigenvalues of the cross-product of wexog and are
+        cached on the model.
+        """
+        if _sparse.issparse(self.wexog):
+            singular_values, rank = _sparse.singular_values_normal(self.wexog)
+            self.wexog_singular_values = singular_values
+            self.rank = rank
+        else:
+            self.rank = np_matrix_rank(self.exog)
+
+    def _init_sparse_normal(self):
+        """
+        Decompose the cross-product of a sparse wexog
+
+        The normalized covariance of the parameters, the singular values and
+        the rank are cached on the model, so that the decomposition is only
+        computed once.
+        """
+        ncp, singular_values, rank = _sparse.pinv_normal(self.wexog)
+        self.normalized_cov_params = ncp
+        self.wexog_singular_values = singular_values
+        self.rank = rank
+        return ncp
 
     def whiten(self, X):
         raise NotImplementedError("Subclasses should implement.")
@@ -154,9 +183,10 @@ class RegressionModel(base.LikelihoodModel):
         Parameters
         ----------
         method : str, optional
-            Can be "pinv", "qr".  "pinv" uses the Moore-Penrose pseudoinverse
-            to solve the least squares problem. "qr" uses the QR
-            factorization.
+            Can be "pinv", "qr" or "lsqr".  "pinv" uses the Moore-Penrose
+            pseudoinverse to solve the least squares problem. "qr" uses the
+            QR factorization. "lsqr" is only available for a sparse exog and
+            uses the iterative LSQR solver for the parameters.
         cov_type : str, optional
             See `regression.linear_model.RegressionResults` for a description
             of the available covariance estimators
@@ -182,8 +212,32 @@ class RegressionModel(base.LikelihoodModel):
         -----
         The fit method uses the pseudoinverse of the design/exogenous variables
         to solve the least squares minimization.
-        """
-        if method == "pinv":
+
+        If exog is a scipy.sparse matrix, then the design matrix is not
+        converted to a dense array. The normalized covariance of the
+        parameters is computed from the normal equations and the parameters
+        either from the normal equations, or with LSQR if method is "lsqr".
+        With "lsqr" the normalized covariance is only computed when it is
+        first needed, e.g. for the standard errors, and the rank only needs
+        the eigenvalues of the cross-product. Only the nonrobust and HC0 to
+        HC3 covariance types are supported in this case.
+        """
+        if _sparse.issparse(self.wexog):
+            self.pinv_wexog = None
+            if method == "lsqr":
+                # the normalized covariance is only computed when needed
+                from scipy.sparse.linalg import lsqr
+                beta = lsqr(self.wexog, self.wendog, atol=1e-14,
+                            btol=1e-14)[0]
+                if self.rank is None:
+                    self._init_rank()
+            else:
+                if getattr(self, 'normalized_cov_params', None) is None:
+                    self._init_sparse_normal()
+                beta = np.dot(self.normalized_cov_params,
+                              self.wexog.T.dot(self.wendog))
+
+        elif method == "pinv":
             if ((not hasattr(self, 'pinv_wexog')) or
                 (not hasattr(self, 'normalized_cov_params')) or
                 (not hasattr(self, 'rank'))):
@@ -222,17 +276,70 @@ class RegressionModel(base.LikelihoodModel):
         if self._df_resid is None:
             self.df_resid = self.nobs - self.rank
 
+        normalized_cov_params = getattr(self, 'normalized_cov_params', None)
         if isinstance(self, OLS):
             lfit = OLSResults(self, beta,
-                       normalized_cov_params=self.normalized_cov_params,
+                       normalized_cov_params=normalized_cov_params,
                        cov_type=cov_type, cov_kwds=cov_kwds, use_t=use_t)
         else:
             lfit = RegressionResults(self, beta,
-                       normalized_cov_params=self.normalized_cov_params,
+                       normalized_cov_params=normalized_cov_params,
                        cov_type=cov_type, cov_kwds=cov_kwds, use_t=use_t,
                        **kwargs)
         return RegressionResultsWrapper(lfit)
 
+    def fit_many(self, cov_type='nonrobust', use_t=None):
+        """
+        Fit a separate regression for each column of a 2-d endog
+
+        The (whitened) design matrix is factorized only once and all
+        regressions are estimated jointly with array operations.
+
+        Parameters
+        ----------
+        cov_type : str, optional
+            'nonrobust', 'HC0', 'HC1', 'HC2' or 'HC3'.
+        use_t : bool, optional
+            Flag indicating to use the Student's t distribution when computing
+            p-values.
+
+        Returns
+        -------
+        results : BatchRegressionResultsWrapper
+            Results with stacked params, bse, tvalues and pvalues of shape
+            (k_exog, k_endog) and one rsquared, ssr, fvalue, llf, ... per
+            column of endog.
+
+        See Also
+        --------
+        statsmodels.regression.batch.BatchRegressionResults
+        """
+        from statsmodels.regression.batch import (BatchRegressionResults,
+                                                 BatchRegressionResultsWrapper)
+        if self.wendog.ndim != 2:
+            raise ValueError("fit_many requires a 2-d endog")
+
+        if ((not hasattr(self, 'pinv_wexog')) or
+            (not hasattr(self, 'normalized_cov_params')) or
+            (not hasattr(self, 'rank'))):
+
+            self.pinv_wexog, singular_values = pinv_extended(self.wexog)
+            self.normalized_cov_params = np.dot(self.pinv_wexog,
+                                    np.transpose(self.pinv_wexog))
+            self.wexog_singular_values = singular_values
+            self.rank = np_matrix_rank(np.diag(singular_values))
+
+        params = np.dot(self.pinv_wexog, self.wendog)
+
+        if self._df_model is None:
+            self._df_model = float(self.rank - self.k_constant)
+        if self._df_resid is None:
+            self.df_resid = self.nobs - self.rank
+
+        res = BatchRegressionResults(self, params,
+                            normalized_cov_params=self.normalized_cov_params,
+                            cov_type=cov_type, use_t=use_t)
+        return BatchRegressionResultsWrapper(res)
 
     def predict(self, params, exog=None):
         """
@@ -259,7 +366,7 @@ class RegressionModel(base.LikelihoodModel):
         if exog is None:
             exog = self.exog
 
-        return np.dot(exog, params)
+        return _sparse.dot(exog, params)
 
     def get_distribution(self, params, scale, exog=None, dist_class=None):
         """
@@ -576,6 +683,8 @@ class WLS(RegressionModel):
         sqrt(weights)*X
         """
         #print(self.weights.var()))
+        if _sparse.issparse(X):
+            return _sparse.scale_rows(X, np.sqrt(self.weights))
         X = np.asarray(X)
         if X.ndim == 1:
             return X * np.sqrt(self.weights)
@@ -606,7 +715,8 @@ class WLS(RegressionModel):
         where :math:`W` is a diagonal matrix
         """
         nobs2 = self.nobs / 2.0
-        SSR = np.sum((self.wendog - np.dot(self.wexog,params))**2, axis=0)
+        SSR = np.sum((self.wendog - _sparse.dot(self.wexog, params))**2,
+                     axis=0)
         llf = -np.log(SSR) * nobs2      # concentrated likelihood
         llf -= (1+np.log(np.pi/nobs2))*nobs2  # with constant
         llf += 0.5 * np.sum(np.log(self.weights))
@@ -636,6 +746,57 @@ class WLS(RegressionModel):
 
         return self.weights
 
+    @classmethod
+    def fit_chunks(cls, chunks, cov_type='nonrobust', use_t=None,
+                   hasconst=None, missing='none'):
+        """
+        Fit the model from an iterable of data chunks with bounded memory
+
+        Parameters
+        ----------
+        chunks : iterable
+            Iterable of tuples ``(endog, exog)`` or, for WLS,
+            ``(endog, exog, weights)``, for example from a chunked file
+            reader. The iterable is consumed once.
+        cov_type : str
+            'nonrobust', 'HC0' or 'HC1'. The heteroscedasticity robust
+            covariances are computed in the same pass over the data.
+        use_t : bool, optional
+            Flag indicating to use the Student's t distribution when
+            computing p-values.
+        hasconst : None or bool
+            Indicates whether the design includes a user-supplied constant.
+            If None, an explicit constant column is detected over all
+            chunks.
+        missing : str
+            Available options are 'none' and 'drop'.
+
+        Returns
+        -------
+        results : RegressionResultsWrapper
+            Results with params, bse, rsquared, fvalue and the other
+            statistics that do not require the observations. Residuals and
+            fitted values are not available.
+
+        See Also
+        --------
+        statsmodels.regression.streaming.StreamingLS
+        """
+        from statsmodels.regression.streaming import StreamingLS
+
+        hc_moments = cov_type.upper() in ('HC0', 'HC1')
+        acc = StreamingLS(hasconst=hasconst, missing=missing,
+                          hc_moments=hc_moments)
+        for chunk in chunks:
+            if len(chunk) == 3 and cls is not OLS:
+                acc.partial_fit(chunk[0], chunk[1], weights=chunk[2])
+            elif len(chunk) == 2:
+                acc.partial_fit(chunk[0], chunk[1])
+            else:
+                raise ValueError("chunks for %s need to be tuples of "
+                                 "(endog, exog)" % cls.__name__)
+        return acc.fit(cov_type=cov_type, use_t=use_t)
+
 
 class OLS(WLS):
     __doc__ = """
@@ -706,7 +867,7 @@ class OLS(WLS):
         """
         nobs2 = self.nobs / 2.0
         nobs = float(self.nobs)
-        resid = self.endog - np.dot(self.exog, params)
+        resid = self.endog - _sparse.dot(self.exog, params)
         if hasattr(self, 'offset'):
             resid -= self.offset
         ssr = np.sum(resid**2)
@@ -1399,6 +1560,23 @@ class RegressionResults(base.LikelihoodModelResults):
         for key in kwargs:
             setattr(self, key, kwargs[key])
 
+    @property
+    def normalized_cov_params(self):
+        """
+        The normalized covariance of the parameters.
+
+        For a sparse design matrix fit with LSQR, it is computed on first
+        access.
+        """
+        if (self._normalized_cov_params is None and
+                _sparse.issparse(getattr(self.model, 'wexog', None))):
+            self._normalized_cov_params = self.model._init_sparse_normal()
+        return self._normalized_cov_params
+
+    @normalized_cov_params.setter
+    def normalized_cov_params(self, value):
+        self._normalized_cov_params = value
+
     def __str__(self):
         self.summary()
 
@@ -1552,7 +1730,7 @@ class RegressionResults(base.LikelihoodModelResults):
         if self._wexog_singular_values is not None:
             eigvals = self._wexog_singular_values ** 2
         else:
-            eigvals = np.linalg.linalg.eigvalsh(np.dot(self.model.wexog.T, self.model.wexog))
+            eigvals = np.linalg.linalg.eigvalsh(_sparse.xtwx(self.model.wexog))
         return np.sort(eigvals)[::-1]
 
     @cache_readonly
@@ -1567,6 +1745,10 @@ class RegressionResults(base.LikelihoodModelResults):
 
     #TODO: make these properties reset bse
     def _HCCM(self, scale):
+        if getattr(self.model, 'pinv_wexog', None) is None:
+            # sparse exog
+            return _sparse.sandwich_hc(self.model.wexog,
+                                       self.normalized_cov_params, scale)
         H = np.dot(self.model.pinv_wexog,
             scale[:,None]*self.model.pinv_wexog.T)
         return H
@@ -1600,10 +1782,7 @@ class RegressionResults(base.LikelihoodModelResults):
         See statsmodels.RegressionResults
         """
 
-        # probably could be optimized
-        h = np.diag(chain_dot(self.model.wexog,
-                              self.normalized_cov_params,
-                              self.model.wexog.T))
+        h = _sparse.leverage(self.model.wexog, self.normalized_cov_params)
         self.het_scale = self.wresid**2/(1-h)
         cov_HC2 = self._HCCM(self.het_scale)
         return cov_HC2
@@ -1614,9 +1793,7 @@ class RegressionResults(base.LikelihoodModelResults):
         """
         See statsmodels.RegressionResults
         """
-        h = np.diag(chain_dot(self.model.wexog,
-                              self.normalized_cov_params,
-                              self.model.wexog.T))
+        h = _sparse.leverage(self.model.wexog, self.normalized_cov_params)
         self.het_scale=(self.wresid/(1-h))**2
         cov_HC3 = self._HCCM(self.het_scale)
         return cov_HC3
@@ -175,26 +175,6 @@ def _dot(x, y):
 
 
 # From numpy, adapted to work with sparse and dense arrays.
-def _multi_dot_three(A, B, C):
-    """
-    Find best ordering for three arrays and do the multiplication.
-
-    Doing in manually instead of using dynamic programing is
-    approximately 15 times faster.
-    """
-    # cost1 = cost((AB)C)
-    cost1 = (A.shape[0] * A.shape[1] * B.shape[1] +  # (AB)
-             A.shape[0] * B.shape[1] * C.shape[1])   # (--)C
-    # cost2 = cost((AB)C)
-    cost2 = (B.shape[0] * B.shape[1] * C.shape[1] +  #  (BC)
-             A.shape[0] * A.shape[1] * C.shape[1])   # A(--)
-
-    if cost1 < cost2:
-        return _dot(_dot(A, B), C)
-    else:
-        return _dot(A, _dot(B, C))
-
-
 def _dotsum(x, y):
     """
     Returns sum(x * y), where '*' is the pointwise product, computed
@@ -591,6 +571,10 @@ class MixedLM(base.LikelihoodModel):
     >>> result = model.fit()
     """
 
+    # likelihood engine used by loglike and score, set in fit
+    _engine = None
+    _sparse_engine = None
+
     def __init__(self, endog, exog, groups, exog_re=None,
                  exog_vc=None, use_sqrt=True, missing='none',
                  **kwargs):
@@ -1154,6 +1138,9 @@ class MixedLM(base.LikelihoodModel):
         if self.k_fe == 0:
             return np.array([])
 
+        if self._engine is not None:
+            return self._engine.get_fe_params(cov_re, vcomp)
+
         if self.k_re == 0:
             cov_re_inv = np.empty((0,0))
         else:
@@ -1363,29 +1350,36 @@ class MixedLM(base.LikelihoodModel):
             likeval -= self.fe_pen.func(fe_params)
 
         xvx, qf = 0., 0.
-        for k, group in enumerate(self.group_labels):
+        if self._engine is not None:
+            ld, qf, xvx = self._engine.loglike_terms(cov_re, vcomp,
+                                                     fe_params)
+            likeval -= ld / 2.
 
-            vc_var = self._expand_vcomp(vcomp, group)
-            cov_aug_logdet = cov_re_logdet + np.sum(np.log(vc_var))
+        else:
+            for k, group in enumerate(self.group_labels):
 
-            exog = self.exog_li[k]
-            ex_r, ex2_r = self._aex_r[k], self._aex_r2[k]
-            solver = _smw_solver(1., ex_r, ex2_r, cov_re_inv, 1 / vc_var)
+                vc_var = self._expand_vcomp(vcomp, group)
+                cov_aug_logdet = cov_re_logdet + np.sum(np.log(vc_var))
 
-            resid = resid_all[self.row_indices[group]]
+                exog = self.exog_li[k]
+                ex_r, ex2_r = self._aex_r[k], self._aex_r2[k]
+                solver = _smw_solver(1., ex_r, ex2_r, cov_re_inv, 1 / vc_var)
 
-            # Part 1 of the log likelihood (for both ML and REML)
-            ld = _smw_logdet(1., ex_r, ex2_r, cov_re_inv, 1 / vc_var, cov_aug_logdet)
-            likeval -= ld / 2.
+                resid = resid_all[self.row_indices[group]]
 
-            # Part 2 of the log likelihood (for both ML and REML)
-            u = solver(resid)
-            qf += np.dot(resid, u)
+                # Part 1 of the log likelihood (for both ML and REML)
+                ld = _smw_logdet(1., ex_r, ex2_r, cov_re_inv, 1 / vc_var,
+                                 cov_aug_logdet)
+                likeval -= ld / 2.
 
-            # Adjustment for REML
-            if self.reml:
-                mat = solver(exog)
-                xvx += np.dot(exog.T, mat)
+                # Part 2 of the log likelihood (for both ML and REML)
+                u = solver(resid)
+                qf += np.dot(resid, u)
+
+                # Adjustment for REML
+                if self.reml:
+                    mat = solver(exog)
+                    xvx += np.dot(exog.T, mat)
 
         if self.reml:
             likeval -= (self.n_totobs - self.k_fe) * np.log(qf) / 2.
@@ -1562,57 +1556,64 @@ class MixedLM(base.LikelihoodModel):
         # resid' V^{-1} dV/dQ_jj V^{-1} resid (a scalar)
         rvavr = np.zeros(self.k_re2 + self.k_vc)
 
-        for group_ix, group in enumerate(self.group_labels):
+        if self._engine is not None:
+            (dlv, rvavr, xtax, rvir, xtvir,
+             xtvix) = self._engine.score_terms(cov_re, vcomp, fe_params)
+            score_re -= 0.5 * dlv[0:self.k_re2]
+            score_vc -= 0.5 * dlv[self.k_re2:]
 
-            vc_var = self._expand_vcomp(vcomp, group)
+        else:
+            for group_ix, group in enumerate(self.group_labels):
 
-            exog = self.exog_li[group_ix]
-            ex_r, ex2_r = self._aex_r[group_ix], self._aex_r2[group_ix]
-            solver = _smw_solver(1., ex_r, ex2_r, cov_re_inv, 1 / vc_var)
+                vc_var = self._expand_vcomp(vcomp, group)
 
-            # The residuals
-            resid = self.endog_li[group_ix]
-            if self.k_fe > 0:
-                expval = np.dot(exog, fe_params)
-                resid = resid - expval
+                exog = self.exog_li[group_ix]
+                ex_r, ex2_r = self._aex_r[group_ix], self._aex_r2[group_ix]
+                solver = _smw_solver(1., ex_r, ex2_r, cov_re_inv, 1 / vc_var)
 
-            if self.reml:
-                viexog = solver(exog)
-                xtvix += np.dot(exog.T, viexog)
+                # The residuals
+                resid = self.endog_li[group_ix]
+                if self.k_fe > 0:
+                    expval = np.dot(exog, fe_params)
+                    resid = resid - expval
 
-            # Contributions to the covariance parameter gradient
-            vir = solver(resid)
-            for jj, matl, matr, vsl, vsr, sym in self._gen_dV_dPar(ex_r, solver, group):
-                dlv[jj] = _dotsum(matr, vsl)
-                if not sym:
-                    dlv[jj] += _dotsum(matl, vsr)
+                if self.reml:
+                    viexog = solver(exog)
+                    xtvix += np.dot(exog.T, viexog)
 
-                ul = _dot(vir, matl)
-                ur = ul.T if sym else _dot(matr.T, vir)
-                ulr = np.dot(ul, ur)
-                rvavr[jj] += ulr
-                if not sym:
-                    rvavr[jj] += ulr.T
+                # Contributions to the covariance parameter gradient
+                vir = solver(resid)
+                for jj, matl, matr, vsl, vsr, sym in self._gen_dV_dPar(ex_r, solver, group):
+                    dlv[jj] = _dotsum(matr, vsl)
+                    if not sym:
+                        dlv[jj] += _dotsum(matl, vsr)
 
-                if self.reml:
-                    ul = _dot(viexog.T, matl)
-                    ur = ul.T if sym else _dot(matr.T, viexog)
+                    ul = _dot(vir, matl)
+                    ur = ul.T if sym else _dot(matr.T, vir)
                     ulr = np.dot(ul, ur)
-                    xtax[jj] += ulr
+                    rvavr[jj] += ulr
                     if not sym:
-                        xtax[jj] += ulr.T
+                        rvavr[jj] += ulr.T
 
-            # Contribution of log|V| to the covariance parameter
-            # gradient.
-            if self.k_re > 0:
-                score_re -= 0.5 * dlv[0:self.k_re2]
-            if self.k_vc > 0:
-                score_vc -= 0.5 * dlv[self.k_re2:]
+                    if self.reml:
+                        ul = _dot(viexog.T, matl)
+                        ur = ul.T if sym else _dot(matr.T, viexog)
+                        ulr = np.dot(ul, ur)
+                        xtax[jj] += ulr
+                        if not sym:
+                            xtax[jj] += ulr.T
+
+                # Contribution of log|V| to the covariance parameter
+                # gradient.
+                if self.k_re > 0:
+                    score_re -= 0.5 * dlv[0:self.k_re2]
+                if self.k_vc > 0:
+                    score_vc -= 0.5 * dlv[self.k_re2:]
 
-            rvir += np.dot(resid, vir)
+                rvir += np.dot(resid, vir)
 
-            if calc_fe:
-                xtvir += np.dot(exog.T, vir)
+                if calc_fe:
+                    xtvir += np.dot(exog.T, vir)
 
         fac = self.n_totobs
         if self.reml:
@@ -1682,6 +1683,16 @@ class MixedLM(base.LikelihoodModel):
         return score_fe, score_re, score_vc
 
 
+    def _get_sparse_engine(self):
+        """
+        Returns the likelihood engine based on cross-products of the data.
+        """
+        if self._sparse_engine is None:
+            from statsmodels.regression._mixedlm_sparse import (
+                SparseLikelihood)
+            self._sparse_engine = SparseLikelihood(self)
+        return self._sparse_engine
+
     def hessian(self, params):
         """
         Returns the model's Hessian matrix.
@@ -1712,105 +1723,26 @@ class MixedLM(base.LikelihoodModel):
         fe_params = params.fe_params
         vcomp = params.vcomp
         cov_re = params.cov_re
-        if self.k_re > 0:
-            cov_re_inv = np.linalg.inv(cov_re)
-        else:
-            cov_re_inv = np.empty((0, 0))
-
-        # Blocks for the fixed and random effects parameters.
-        hess_fe = 0.
-        hess_re = np.zeros((self.k_re2 + self.k_vc, self.k_re2 + self.k_vc))
-        hess_fere = np.zeros((self.k_re2 + self.k_vc, self.k_fe))
 
         fac = self.n_totobs
         if self.reml:
             fac -= self.exog.shape[1]
 
-        rvir = 0.
-        xtvix = 0.
-        xtax = [0.,] * (self.k_re2 + self.k_vc)
+        # The terms are computed from the stacked cross-products of the
+        # data for both engines, there is no loop over the groups.
+        engine = self._engine
+        if engine is None:
+            engine = self._get_sparse_engine()
+        (xtvix, rvir, hess_fere, B, rvavavr, vava, xtax,
+         xvavax) = engine.hessian_terms(cov_re, vcomp, fe_params)
+        hess_fe = 0.
+        D = 2 * rvavavr
+        hess_re = 0.5 * vava
         m = self.k_re2 + self.k_vc
-        B = np.zeros(m)
-        D = np.zeros((m, m))
         F = [[0.] * m for k in range(m)]
-        for k, group in enumerate(self.group_labels):
-
-            vc_var = self._expand_vcomp(vcomp, group)
-
-            exog = self.exog_li[k]
-            ex_r, ex2_r = self._aex_r[k], self._aex_r2[k]
-            solver = _smw_solver(1., ex_r, ex2_r, cov_re_inv, 1 / vc_var)
-
-            # The residuals
-            resid = self.endog_li[k]
-            if self.k_fe > 0:
-                expval = np.dot(exog, fe_params)
-                resid = resid - expval
-
-            viexog = solver(exog)
-            xtvix += np.dot(exog.T, viexog)
-            vir = solver(resid)
-            rvir += np.dot(resid, vir)
-
-            for jj1, matl1, matr1, vsl1, vsr1, sym1 in self._gen_dV_dPar(ex_r, solver, group):
-
-                ul = _dot(viexog.T, matl1)
-                ur = _dot(matr1.T, vir)
-                hess_fere[jj1, :] += np.dot(ul, ur)
-                if not sym1:
-                    ul = _dot(viexog.T, matr1)
-                    ur = _dot(matl1.T, vir)
-                    hess_fere[jj1, :] += np.dot(ul, ur)
-
-                if self.reml:
-                    ul = _dot(viexog.T, matl1)
-                    ur = ul if sym1 else np.dot(viexog.T, matr1)
-                    ulr = _dot(ul, ur.T)
-                    xtax[jj1] += ulr
-                    if not sym1:
-                        xtax[jj1] += ulr.T
-
-                ul = _dot(vir, matl1)
-                ur = ul if sym1 else _dot(vir, matr1)
-                B[jj1] += np.dot(ul, ur) * (1 if sym1 else 2)
-
-                # V^{-1} * dV/d_theta
-                E = [(vsl1, matr1)]
-                if not sym1:
-                    E.append((vsr1, matl1))
-
-                for jj2, matl2, matr2, vsl2, vsr2, sym2 in self._gen_dV_dPar(ex_r, solver, group, jj1):
-
-                    re = sum([_multi_dot_three(matr2.T, x[0], x[1].T) for x in E])
-                    vt = 2 * _dot(_multi_dot_three(vir[None, :], matl2, re), vir[:, None])
-
-                    if not sym2:
-                        le = sum([_multi_dot_three(matl2.T, x[0], x[1].T) for x in E])
-                        vt += 2 * _dot(_multi_dot_three(vir[None, :], matr2, le), vir[:, None])
-
-                    D[jj1, jj2] += vt
-                    if jj1 != jj2:
-                        D[jj2, jj1] += vt
-
-                    rt = _dotsum(vsl2, re.T) / 2
-                    if not sym2:
-                        rt += _dotsum(vsr2, le.T) / 2
-
-                    hess_re[jj1, jj2] += rt
-                    if jj1 != jj2:
-                        hess_re[jj2, jj1] += rt
-
-                    if self.reml:
-                        ev = sum([_dot(x[0], _dot(x[1].T, viexog)) for x in E])
-                        u1 = _dot(viexog.T, matl2)
-                        u2 = _dot(matr2.T, ev)
-                        um = np.dot(u1, u2)
-                        F[jj1][jj2] += um + um.T
-                        if not sym2:
-                            u1 = np.dot(viexog.T, matr2)
-                            u2 = np.dot(matl2.T, ev)
-                            um = np.dot(u1, u2)
-                            F[jj1][jj2] += um + um.T
+        for j1 in range(m):
+            for j2 in range(j1 + 1):
+                F[j1][j2] = xvavax[j2, j1] + xvavax[j2, j1].T
 
         hess_fe -= fac * xtvix / rvir
         hess_re = hess_re - 0.5 * fac * (D/rvir - np.outer(B, B) / rvir**2)
@@ -1837,6 +1769,63 @@ class MixedLM(base.LikelihoodModel):
 
         return hess
 
+    def _score_groups(self, fe_params, cov_re, vcomp, scale):
+        """
+        Returns the score contributions of the groups.
+
+        The scores are the derivatives of the log-likelihood of each
+        group with respect to the fixed effects, the covariance
+        parameters and the scale, in the parameterization where the
+        marginal covariance of a group is ``scale * V``, with cov_re
+        and vcomp the unscaled covariance parameters of V.
+
+        Returns
+        -------
+        scores : 2d ndarray
+            Array with one row per group.
+        """
+        if self._engine is not None:
+            return self._engine.score_groups(cov_re, vcomp, fe_params, scale)
+
+        if self.k_re > 0:
+            cov_re_inv = np.linalg.inv(cov_re)
+        else:
+            cov_re_inv = np.empty((0, 0))
+
+        m = self.k_re2 + self.k_vc
+        scores = np.zeros((self.n_groups, self.k_fe + m + 1))
+        for group_ix, group in enumerate(self.group_labels):
+
+            vc_var = self._expand_vcomp(vcomp, group)
+
+            exog = self.exog_li[group_ix]
+            ex_r, ex2_r = self._aex_r[group_ix], self._aex_r2[group_ix]
+            solver = _smw_solver(1., ex_r, ex2_r, cov_re_inv, 1 / vc_var)
+
+            resid = self.endog_li[group_ix] - np.dot(exog, fe_params)
+            vir = solver(resid)
+
+            dlv = np.zeros(m)
+            rvavr = np.zeros(m)
+            for jj, matl, matr, vsl, vsr, sym in self._gen_dV_dPar(ex_r, solver, group):
+                dlv[jj] += _dotsum(matr, vsl)
+                if not sym:
+                    dlv[jj] += _dotsum(matl, vsr)
+
+                ul = _dot(vir, matl)
+                ur = ul.T if sym else _dot(matr.T, vir)
+                ulr = np.dot(ul, ur)
+                rvavr[jj] += ulr
+                if not sym:
+                    rvavr[jj] += ulr.T
+
+            scores[group_ix, :self.k_fe] = np.dot(exog.T, vir) / scale
+            scores[group_ix, self.k_fe:-1] = -0.5 * dlv + 0.5 * rvavr / scale
+            scores[group_ix, -1] = (-0.5 * len(resid) / scale +
+                                    0.5 * np.dot(resid, vir) / scale**2)
+
+        return scores
+
 
     def get_scale(self, fe_params, cov_re, vcomp):
         """
@@ -1858,6 +1847,12 @@ class MixedLM(base.LikelihoodModel):
             The estimated error variance.
         """
 
+        if self._engine is not None:
+            qf = self._engine.quad_form(cov_re, vcomp, fe_params)
+            if self.reml:
+                return qf / (self.n_totobs - self.k_fe)
+            return qf / self.n_totobs
+
         try:
             cov_re_inv = np.linalg.inv(cov_re)
         except np.linalg.LinAlgError:
@@ -1892,7 +1887,8 @@ class MixedLM(base.LikelihoodModel):
 
     def fit(self, start_params=None, reml=True, niter_sa=0,
             do_cg=True, fe_pen=None, cov_pen=None, free=None,
-            full_output=False, method='bfgs', **kwargs):
+            full_output=False, method='bfgs', engine='loop',
+            cov_type='oim', **kwargs):
         """
         Fit a linear mixed model to the data.
 
@@ -1924,10 +1920,39 @@ class MixedLM(base.LikelihoodModel):
             If true, attach iteration history to results
         method : string
             Optimization method.
+        engine : string
+            The computation of the profile log-likelihood and its
+            gradient.  'loop' iterates over the groups.  'sparse'
+            computes the cross-products of the random effects design
+            with the data once and evaluates the likelihood from a
+            factorization of ``I + L' Z'Z L``, where ``L L'`` is the
+            random effects covariance.  Groups with the same random
+            effects layout are processed together, groups with many
+            random effects, e.g. crossed variance components in a
+            single group, use a sparse LU factorization.  'sparse' is
+            much faster for many groups and for crossed effects.
+        cov_type : string
+            The covariance matrix of the parameter estimates.  'oim'
+            uses the inverse of the observed information, i.e. of the
+            Hessian of the profile log-likelihood.  'opg' uses the
+            outer product of the score contributions of the groups,
+            which avoids the Hessian and is cheaper for models with
+            many covariance parameters.  'none' does not compute a
+            covariance matrix, all standard errors are nan.
 
         Returns
         -------
         A MixedLMResults instance.
+
+        Notes
+        -----
+        The Hessian is computed from the stacked cross-products of the
+        data for both engines, `engine` only affects the optimization.
+
+        The 'opg' covariance is based on the scores of the
+        log-likelihood, also if the model is fit by REML.  It is
+        asymptotically equivalent to 'oim' if the model is correctly
+        specified and the number of groups is large.
         """
 
         _allowed_kwargs = ['gtol', 'maxiter']
@@ -1942,6 +1967,15 @@ class MixedLM(base.LikelihoodModel):
         self.cov_pen = cov_pen
         self.fe_pen = fe_pen
 
+        if engine == 'sparse':
+            self._engine = self._get_sparse_engine()
+        elif engine == 'loop':
+            self._engine = None
+        else:
+            raise ValueError("engine must be 'loop' or 'sparse'")
+        if cov_type not in ['oim', 'opg', 'none']:
+            raise ValueError("cov_type must be 'oim', 'opg' or 'none'")
+
         self._freepat = free
 
         if full_output:
@@ -2018,25 +2052,40 @@ class MixedLM(base.LikelihoodModel):
             msg = "The MLE may be on the boundary of the parameter space."
             warnings.warn(msg, ConvergenceWarning)
 
-        # Compute the Hessian at the MLE.  Note that this is the
-        # Hessian with respect to the random effects covariance matrix
-        # (not its square root).  It is used for obtaining standard
-        # errors, not for optimization.
-        hess = self.hessian(params)
-        hess_diag = np.diag(hess)
+        k_params = self.k_fe + self.k_re2 + self.k_vc
         if free is not None:
-            pcov = np.zeros_like(hess)
             pat = self._freepat.get_packed(use_sqrt=False, has_fe=True)
             ii = np.flatnonzero(pat)
-            hess_diag = hess_diag[ii]
+        else:
+            ii = np.arange(k_params)
+
+        if cov_type == 'oim':
+            # Compute the Hessian at the MLE.  Note that this is the
+            # Hessian with respect to the random effects covariance
+            # matrix (not its square root).  It is used for obtaining
+            # standard errors, not for optimization.
+            hess = self.hessian(params)
+            hess_diag = np.diag(hess)[ii]
+            pcov = np.zeros_like(hess)
             if len(ii) > 0:
                 hess1 = hess[np.ix_(ii, ii)]
                 pcov[np.ix_(ii, ii)] = np.linalg.inv(-hess1)
+            if np.any(hess_diag >= 0):
+                msg = "The Hessian matrix at the estimated parameter values is not positive definite."
+                warnings.warn(msg, ConvergenceWarning)
+        elif cov_type == 'opg':
+            # The scale is a parameter of the group log-likelihoods,
+            # its score is in the last column.
+            scores = self._score_groups(fe_params, cov_re_unscaled,
+                                        vcomp_unscaled, scale)
+            jj = np.concatenate((ii, [k_params]))
+            opg = np.dot(scores[:, jj].T, scores[:, jj])
+            pcov = np.zeros((k_params, k_params))
+            if len(ii) > 0:
+                opgi = np.linalg.pinv(opg)
+                pcov[np.ix_(ii, ii)] = opgi[:-1, :-1]
         else:
-            pcov = np.linalg.inv(-hess)
-        if np.any(hess_diag >= 0):
-            msg = "The Hessian matrix at the estimated parameter values is not positive definite."
-            warnings.warn(msg, ConvergenceWarning)
+            pcov = np.nan * np.ones((k_params, k_params))
 
         # Prepare a results class instance
         params_packed = params.get_packed(use_sqrt=False, has_fe=True)
@@ -2058,6 +2107,7 @@ class MixedLM(base.LikelihoodModel):
         results.k_vc = self.k_vc
         results.use_sqrt = self.use_sqrt
         results.freepat = self._freepat
+        results.cov_type = cov_type
 
         return MixedLMResultsWrapper(results)
 
@@ -0,0 +1,486 @@
+"""
+Out-of-core least squares based on incremental sufficient statistics.
+
+The data are processed in chunks. For each chunk the whitened design and
+response ``[wexog, wendog]`` are folded into the upper triangular factor
+``R`` of their QR decomposition (TSQR). The factor has shape
+``(k_exog + 1, k_exog + 1)`` and contains everything needed for the
+parameter estimates, their covariance and the residual sum of squares, so
+memory does not depend on the number of observations.
+
+Heteroscedasticity robust covariances (HC0 and HC1) are obtained in the
+same pass by also accumulating the fourth order cross moments of
+``[wexog, wendog]``. This requires ``O(k_exog**4)`` memory and is therefore
+only done on request.
+
+Author: statsmodels developers
+License: BSD-3
+"""
+import numpy as np
+
+from statsmodels.compat.numpy import np_matrix_rank
+from statsmodels.tools.decorators import cache_readonly, cache_writable
+from statsmodels.tools.tools import pinv_extended
+from statsmodels.base.data import handle_data
+from statsmodels.regression.linear_model import (RegressionResults,
+                                                 RegressionResultsWrapper)
+
+
+class StreamingLS(object):
+    """
+    Accumulator for OLS and WLS fitted from data chunks
+
+    Parameters
+    ----------
+    hasconst : None or bool
+        Indicates whether the design includes a user-supplied constant. If
+        None, an explicit constant column is detected from the running
+        column-wise minimum and maximum over all chunks.
+    missing : str
+        Available options are 'none' and 'drop'. If 'drop', rows of a chunk
+        with any nan in endog, exog or weights are dropped.
+    hc_moments : bool
+        If True, fourth order moments are accumulated so that the HC0 and
+        HC1 heteroscedasticity robust covariances are available in `fit`.
+        This requires memory and time that grow with ``k_exog**4``.
+
+    Attributes
+    ----------
+    nobs : float
+        Number of observations accumulated so far.
+    k_exog : int
+        Number of columns of the design matrix.
+
+    Notes
+    -----
+    Chunks are combined by a QR decomposition of the stacked triangular
+    factors, which avoids the loss of precision of accumulating the cross
+    product ``X'X`` directly. The chunks do not need to be of equal size.
+
+    Names for the parameters and the response are taken from the first
+    chunk if it is a pandas object.
+
+    Examples
+    --------
+    >>> acc = StreamingLS()
+    >>> for endog, exog in chunks:
+    ...     acc.partial_fit(endog, exog)
+    >>> res = acc.fit()
+
+    See Also
+    --------
+    statsmodels.regression.linear_model.WLS.fit_chunks
+    """
+
+    def __init__(self, hasconst=None, missing='none', hc_moments=False):
+        if missing not in ('none', 'drop'):
+            raise ValueError("missing option %s not understood" % missing)
+        self.hasconst = hasconst
+        self.missing = missing
+        self.hc_moments = hc_moments
+
+        self.data = None
+        self.k_exog = None
+        self.nobs = 0.
+        self._weighted = False
+        self._r = None
+        self._sum_weights = 0.
+        self._sum_log_weights = 0.
+        self._mean_endog = 0.
+        self._m2_endog = 0.
+        self._exog_min = None
+        self._exog_max = None
+        self._hc_cross = None
+
+    @property
+    def model_name(self):
+        """Name of the equivalent full data model, 'OLS' or 'WLS'"""
+        return 'WLS' if self._weighted else 'OLS'
+
+    @property
+    def endog_names(self):
+        return self.data.ynames
+
+    @property
+    def exog_names(self):
+        return self.data.xnames
+
+    def _initialize(self, endog, exog):
+        # one row is enough to recover names, constant detection is done
+        # over all chunks in `fit`
+        self.data = handle_data(endog[:1], exog[:1], hasconst=False)
+        self.k_exog = k = exog.shape[1]
+        self._r = np.zeros((0, k + 1))
+        self._exog_min = np.inf * np.ones(k)
+        self._exog_max = -np.inf * np.ones(k)
+        if self.hc_moments:
+            self._set_hc_indices()
+            self._hc_cross = np.zeros((len(self._hc_xidx),
+                                       len(self._hc_rows)))
+
+    def _set_hc_indices(self):
+        k = self.k_exog
+        rows, cols = np.triu_indices(k + 1)
+        self._hc_rows, self._hc_cols = rows, cols
+        # positions of the exog-exog products in the upper triangle
+        self._hc_xidx = np.nonzero(cols < k)[0]
+
+    def partial_fit(self, endog, exog, weights=None):
+        """
+        Add a chunk of observations to the sufficient statistics
+
+        Parameters
+        ----------
+        endog : array-like
+            1-d endogenous response variable of the chunk.
+        exog : array-like
+            nobs_chunk x k_exog design matrix of the chunk.
+        weights : array-like, optional
+            1-d weights of the chunk as in WLS. If None, the weights are
+            one.
+
+        Returns
+        -------
+        self : StreamingLS
+            The updated accumulator.
+        """
+        if isinstance(endog, (list, tuple)):
+            endog = np.asarray(endog)
+        if isinstance(exog, (list, tuple)):
+            exog = np.asarray(exog)
+        if self.data is None:
+            exog_ = np.asarray(exog)
+            if exog_.ndim == 1:
+                exog = exog_[:, None]
+            self._initialize(endog, exog)
+
+        y = np.asarray(endog, dtype=np.float64).squeeze()
+        x = np.asarray(exog, dtype=np.float64)
+        y = np.atleast_1d(y)
+        if x.ndim == 1:
+            x = x[:, None]
+        if x.shape[1] != self.k_exog:
+            raise ValueError("exog has %d columns, expected %d"
+                             % (x.shape[1], self.k_exog))
+        if len(y) != len(x):
+            raise ValueError("endog and exog matrices are different sizes")
+
+        if weights is None:
+            w = np.ones(len(y))
+        else:
+            self._weighted = True
+            w = np.asarray(weights, dtype=np.float64)
+            if w.ndim == 0:
+                w = np.repeat(w, len(y))
+            w = w.ravel()
+            if len(w) != len(y):
+                raise ValueError('Weights must be scalar or same length as '
+                                 'design')
+
+        if self.missing == 'drop':
+            mask = np.isfinite(y) & np.isfinite(x).all(1) & np.isfinite(w)
+            if not mask.all():
+                y, x, w = y[mask], x[mask], w[mask]
+
+        if len(y) == 0:
+            return self
+
+        self._update(y, x, w)
+        return self
+
+    def _update(self, y, x, w):
+        w_half = np.sqrt(w)
+        z = w_half[:, None] * np.column_stack((x, y))
+
+        r = np.linalg.qr(np.vstack((self._r, z)), mode='r')
+        self._r = r[:self.k_exog + 1]
+
+        # weighted mean and centered sum of squares of endog, merged with
+        # the pairwise update of Chan, Golub and LeVeque
+        sum_w = w.sum()
+        mean = np.dot(w, y) / sum_w
+        m2 = np.dot(w, (y - mean)**2)
+        self._merge_moments(sum_w, mean, m2)
+
+        self.nobs += len(y)
+        self._sum_log_weights += np.log(w).sum()
+        np.minimum(self._exog_min, x.min(0), out=self._exog_min)
+        np.maximum(self._exog_max, x.max(0), out=self._exog_max)
+
+        if self.hc_moments:
+            u = z[:, self._hc_rows] * z[:, self._hc_cols]
+            self._hc_cross += np.dot(u[:, self._hc_xidx].T, u)
+
+    def _merge_moments(self, sum_w, mean, m2):
+        total = self._sum_weights + sum_w
+        delta = mean - self._mean_endog
+        self._m2_endog += m2 + delta**2 * self._sum_weights * sum_w / total
+        self._mean_endog += delta * sum_w / total
+        self._sum_weights = total
+
+    def merge(self, other):
+        """
+        Combine the sufficient statistics of another accumulator
+
+        Parameters
+        ----------
+        other : StreamingLS
+            Accumulator for a disjoint set of observations of the same
+            model, for example computed in a different process.
+
+        Returns
+        -------
+        self : StreamingLS
+            The updated accumulator.
+        """
+        if other.data is None:
+            return self
+        if self.data is None:
+            self.__dict__.update(other.__dict__)
+            self._r = other._r.copy()
+            self._exog_min = other._exog_min.copy()
+            self._exog_max = other._exog_max.copy()
+            if other._hc_cross is not None:
+                self._hc_cross = other._hc_cross.copy()
+            return self
+        if other.k_exog != self.k_exog:
+            raise ValueError("accumulators have different number of exog "
+                             "columns")
+        if self.hc_moments and not other.hc_moments:
+            raise ValueError("other accumulator does not have hc_moments")
+
+        r = np.linalg.qr(np.vstack((self._r, other._r)), mode='r')
+        self._r = r[:self.k_exog + 1]
+        if other._sum_weights > 0:
+            self._merge_moments(other._sum_weights, other._mean_endog,
+                                other._m2_endog)
+        self.nobs += other.nobs
+        self._weighted = self._weighted or other._weighted
+        self._sum_log_weights += other._sum_log_weights
+        np.minimum(self._exog_min, other._exog_min, out=self._exog_min)
+        np.maximum(self._exog_max, other._exog_max, out=self._exog_max)
+        if self.hc_moments:
+            self._hc_cross += other._hc_cross
+        return self
+
+    def _handle_constant(self):
+        data = self.data
+        if self.hasconst is not None:
+            data.k_constant = int(bool(self.hasconst))
+            data.const_idx = None
+            return
+
+        const = np.nonzero((self._exog_max == self._exog_min) &
+                           (self._exog_max != 0))[0]
+        if len(const) == 0:
+            data.k_constant = 0
+            data.const_idx = None
+        else:
+            ones = const[self._exog_max[const] == 1]
+            data.k_constant = 1
+            data.const_idx = ones[0] if len(ones) else const[0]
+
+    def fit(self, cov_type='nonrobust', use_t=None):
+        """
+        Compute the least squares results from the accumulated statistics
+
+        Parameters
+        ----------
+        cov_type : str
+            'nonrobust', 'HC0' or 'HC1'. The heteroscedasticity robust
+            covariances require that the accumulator was created with
+            ``hc_moments=True``.
+        use_t : bool, optional
+            Flag indicating to use the Student's t distribution when
+            computing p-values.
+
+        Returns
+        -------
+        results : RegressionResultsWrapper
+            Wraps a `StreamingRegressionResults` instance.
+        """
+        if self.data is None or self.nobs == 0:
+            raise ValueError("no observations have been added")
+        if cov_type.upper() in ('HC0', 'HC1'):
+            if not self.hc_moments:
+                raise ValueError("%s requires an accumulator created with "
+                                 "hc_moments=True" % cov_type)
+        elif cov_type != 'nonrobust':
+            raise ValueError("cov_type %s is not available for streaming "
+                             "fits" % cov_type)
+
+        self._handle_constant()
+        k = self.k_exog
+        r = self._r
+        if r.shape[0] < k + 1:
+            # fewer observations than columns
+            r = np.vstack((r, np.zeros((k + 1 - r.shape[0], k + 1))))
+        r_exog = r[:k, :k]
+        pinv_r, singular_values = pinv_extended(r_exog)
+        self.normalized_cov_params = np.dot(pinv_r, pinv_r.T)
+        self.wexog_singular_values = singular_values
+        self.rank = np_matrix_rank(np.diag(singular_values))
+        self.k_constant = self.data.k_constant
+        self.df_model = float(self.rank - self.k_constant)
+        self.df_resid = self.nobs - self.rank
+
+        params = np.dot(pinv_r, r[:k, k])
+
+        res = StreamingRegressionResults(self, params,
+                    normalized_cov_params=self.normalized_cov_params,
+                    cov_type=cov_type, use_t=use_t)
+        return RegressionResultsWrapper(res)
+
+
+class StreamingRegressionResults(RegressionResults):
+    """
+    Results for a least squares model fitted from sufficient statistics
+
+    Observation specific attributes such as residuals and fitted values
+    are not available because the data is not kept. All other attributes
+    are as in `RegressionResults`.
+
+    See Also
+    --------
+    statsmodels.regression.linear_model.RegressionResults
+    """
+
+    def _no_data(self):
+        raise AttributeError("observation level results are not "
+                             "available for streaming fits")
+
+    wresid = property(_no_data)
+    resid = property(_no_data)
+    fittedvalues = property(_no_data)
+    resid_pearson = property(_no_data)
+    cov_HC2 = property(_no_data)
+    cov_HC3 = property(_no_data)
+
+    def get_prediction(self, *args, **kwargs):
+        raise NotImplementedError("observation level results are not "
+                                  "available for streaming fits")
+
+    @cache_readonly
+    def nobs(self):
+        return self.model.nobs
+
+    @cache_readonly
+    def ssr(self):
+        # the residuals of the full data are orthogonal to the columns of
+        # the triangular factor, the remainder lives in the last column
+        model = self.model
+        k = model.k_exog
+        r = model._r
+        resid_r = r[:, k] - np.dot(r[:, :k], self.params)
+        return np.dot(resid_r, resid_r)
+
+    @cache_writable()
+    def scale(self):
+        return self.ssr / self.df_resid
+
+    @cache_readonly
+    def centered_tss(self):
+        return self.model._m2_endog
+
+    @cache_readonly
+    def uncentered_tss(self):
+        r_endog = self.model._r[:, -1]
+        return np.dot(r_endog, r_endog)
+
+    @cache_readonly
+    def llf(self):
+        nobs2 = self.nobs / 2.
+        llf = -np.log(self.ssr) * nobs2
+        llf -= (1 + np.log(np.pi / nobs2)) * nobs2
+        llf += 0.5 * self.model._sum_log_weights
+        return llf
+
+    def _hc_meat(self):
+        model = self.model
+        k = model.k_exog
+        coef = np.append(-self.params, 1)
+        rows, cols = model._hc_rows, model._hc_cols
+        vech_coef = coef[rows] * coef[cols] * np.where(rows == cols, 1., 2.)
+        meat_vech = np.dot(model._hc_cross, vech_coef)
+        meat = np.zeros((k, k))
+        xidx = model._hc_xidx
+        meat[rows[xidx], cols[xidx]] = meat_vech
+        meat[cols[xidx], rows[xidx]] = meat_vech
+        return meat
+
+    @cache_readonly
+    def cov_HC0(self):
+        """
+        See statsmodels.RegressionResults
+        """
+        ncp = self.normalized_cov_params
+        return np.dot(ncp, np.dot(self._hc_meat(), ncp))
+
+    @cache_readonly
+    def cov_HC1(self):
+        """
+        See statsmodels.RegressionResults
+        """
+        return self.nobs / self.df_resid * self.cov_HC0
+
+    def summary(self, yname=None, xname=None, title=None, alpha=.05):
+        """Summarize the Regression Results
+
+        Parameters
+        -----------
+        yname : string, optional
+            Default is `y`
+        xname : list of strings, optional
+            Default is `var_##` for ## in p the number of regressors
+        title : string, optional
+            Title for the top table. If not None, then this replaces the
+            default title
+        alpha : float
+            significance level for the confidence intervals
+
+        Returns
+        -------
+        smry : Summary instance
+            this holds the summary tables and text, which can be printed or
+            converted to various output formats.
+
+        Notes
+        -----
+        Residual diagnostics are not included since they require the full
+        data.
+        """
+        top_left = [('Dep. Variable:', None),
+                    ('Model:', [self.model.model_name]),
+                    ('Method:', ['Least Squares']),
+                    ('Date:', None),
+                    ('Time:', None),
+                    ('No. Observations:', None),
+                    ('Df Residuals:', None),
+                    ('Df Model:', None),
+                    ('Covariance Type:', [self.cov_type]),
+                    ]
+
+        top_right = [('R-squared:', ["%#8.3f" % self.rsquared]),
+                     ('Adj. R-squared:', ["%#8.3f" % self.rsquared_adj]),
+                     ('F-statistic:', ["%#8.4g" % self.fvalue]),
+                     ('Prob (F-statistic):', ["%#6.3g" % self.f_pvalue]),
+                     ('Log-Likelihood:', None),
+                     ('AIC:', ["%#8.4g" % self.aic]),
+                     ('BIC:', ["%#8.4g" % self.bic]),
+                     ('Cond. No.', ["%#8.3g" % self.condition_number]),
+                     ]
+
+        if title is None:
+            title = self.model.model_name + ' ' + "Regression Results"
+
+        from statsmodels.iolib.summary import Summary
+        smry = Summary()
+        smry.add_table_2cols(self, gleft=top_left, gright=top_right,
+                             yname=yname, xname=xname, title=title)
+        smry.add_table_params(self, yname=yname, xname=xname, alpha=alpha,
+                              use_t=self.use_t)
+
+        etext = ["[1] " + self.cov_kwds['description']]
+        etext.insert(0, "Warnings:")
+        smry.add_extra_txt(etext)
+        return smry
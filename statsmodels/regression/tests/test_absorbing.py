@@ -0,0 +1,138 @@
+"""
+Tests for linear regression with absorbed fixed effects
+"""
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal, assert_raises
+import pandas as pd
+
+from statsmodels.tools.tools import add_constant
+from statsmodels.regression.linear_model import OLS, WLS
+from statsmodels.regression.absorbing import AbsorbingLS, absorb_demean
+
+
+def _dummies(groups, drop_first=False):
+    dummies = (groups[:, None] == np.unique(groups)).astype(np.float64)
+    if drop_first:
+        dummies = dummies[:, 1:]
+    return dummies
+
+
+def _simulate(nobs, n_groups, seed):
+    rs = np.random.RandomState(seed)
+    groups = np.column_stack([rs.randint(0, n_g, size=nobs)
+                              for n_g in n_groups])
+    exog = rs.randn(nobs, 2) + 0.1 * groups[:, :1]
+    endog = (exog.dot([1., -0.5]) + groups.dot(rs.randn(len(n_groups))) +
+             rs.randn(nobs) * (1 + np.abs(exog[:, 1])))
+    return endog, exog, groups, rs
+
+
+class CheckAbsorbingLS(object):
+    # compare with dummy variable regression
+
+    def test_params(self):
+        res1, res2 = self.res1, self.res2
+        k = len(res2.params)
+        assert_allclose(res2.params, res1.params[:k], rtol=1e-8)
+        assert_allclose(res2.bse, res1.bse[:k], rtol=1e-8)
+        assert_allclose(res2.tvalues, res1.tvalues[:k], rtol=1e-8)
+        assert_allclose(res2.pvalues, res1.pvalues[:k], rtol=1e-7)
+        assert_allclose(res2.ssr, res1.ssr, rtol=1e-8)
+        assert_allclose(res2.llf, res1.llf, rtol=1e-10)
+        assert_allclose(res2.wresid, res1.wresid, atol=1e-8)
+        assert_equal(res2.df_resid, res1.df_resid)
+        assert_equal(res2.df_model, k)
+
+    def test_convergence(self):
+        assert_equal(self.res2.model.converged, True)
+
+    def test_summary(self):
+        self.res2.summary()
+
+
+class TestAbsorbingOne(CheckAbsorbingLS):
+
+    @classmethod
+    def setup_class(cls):
+        endog, exog, groups, _ = _simulate(500, [40], 1234)
+        exog_d = np.column_stack((exog, _dummies(groups[:, 0])))
+        cls.res1 = OLS(endog, exog_d).fit()
+        cls.res2 = AbsorbingLS(endog, exog, groups[:, 0]).fit()
+
+    def test_n_iter(self):
+        assert_equal(self.res2.model.n_iter, 1)
+        assert_equal(self.res2.model.df_absorb, 40)
+
+
+class TestAbsorbingTwo(CheckAbsorbingLS):
+
+    @classmethod
+    def setup_class(cls):
+        endog, exog, groups, _ = _simulate(2000, [60, 30], 1234)
+        exog_d = np.column_stack((exog, _dummies(groups[:, 0]),
+                                  _dummies(groups[:, 1], drop_first=True)))
+        cls.res1 = OLS(endog, exog_d).fit()
+        cls.res2 = AbsorbingLS(endog, exog, groups, tol=1e-12).fit()
+
+
+class TestAbsorbingThreeWeights(CheckAbsorbingLS):
+
+    @classmethod
+    def setup_class(cls):
+        endog, exog, groups, rs = _simulate(2000, [50, 30, 10], 4321)
+        weights = rs.uniform(0.5, 2, size=len(endog))
+        exog_d = np.column_stack((exog, _dummies(groups[:, 0]),
+                                  _dummies(groups[:, 1], drop_first=True),
+                                  _dummies(groups[:, 2], drop_first=True)))
+        cls.res1 = WLS(endog, exog_d, weights=weights).fit()
+        cls.res2 = AbsorbingLS(endog, exog, groups, weights=weights,
+                               tol=1e-12).fit()
+
+
+def test_cluster():
+    endog, exog, groups, _ = _simulate(2000, [60, 30], 987)
+    exog_d = np.column_stack((exog, _dummies(groups[:, 0]),
+                              _dummies(groups[:, 1], drop_first=True)))
+    res1 = OLS(endog, exog_d).fit(cov_type='cluster',
+                                  cov_kwds={'groups': groups[:, 0]})
+    res2 = AbsorbingLS(endog, exog, groups, tol=1e-12).fit(cov_type='cluster')
+    # the small sample correction does not count the absorbed effects
+    nobs, k_dummy = exog_d.shape
+    correction = (nobs - k_dummy) / (nobs - 2.)
+    assert_allclose(res2.cov_params(), res1.cov_params()[:2, :2] * correction,
+                    rtol=1e-7)
+    assert_equal(res2.n_groups, 60)
+
+
+def test_pandas_missing():
+    endog, exog, groups, _ = _simulate(300, [20, 10], 55)
+    exog = pd.DataFrame(exog, columns=['x1', 'x2'])
+    endog = pd.Series(endog, name='y')
+    absorb = pd.DataFrame({'store': ['s%d' % g for g in groups[:, 0]],
+                           'week': groups[:, 1]})
+    endog[5] = np.nan
+    res = AbsorbingLS(endog, exog, absorb, missing='drop').fit()
+    assert_equal(res.params.index.tolist(), ['x1', 'x2'])
+    assert_equal(res.model.nobs, 299)
+
+    keep = np.arange(300) != 5
+    res2 = AbsorbingLS(endog.values[keep], exog.values[keep],
+                       groups[keep]).fit()
+    assert_allclose(res.params.values, res2.params, rtol=1e-10)
+
+
+def test_constant():
+    endog, exog, groups, _ = _simulate(100, [10], 0)
+    assert_raises(ValueError, AbsorbingLS, endog, add_constant(exog),
+                  groups[:, 0])
+
+
+def test_absorb_demean():
+    _, exog, groups, _ = _simulate(500, [20, 7], 3)
+    x_dm, n_iter, converged = absorb_demean(exog, list(groups.T), tol=1e-12)
+    assert_equal(converged, True)
+    for group in groups.T:
+        for g in np.unique(group):
+            assert_allclose(x_dm[group == g].mean(0), 0, atol=1e-10)
+    x_dm1 = absorb_demean(exog[:, 0], list(groups.T), tol=1e-12)[0]
+    assert_allclose(x_dm1, x_dm[:, 0], rtol=1e-12)
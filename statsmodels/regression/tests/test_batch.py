@@ -0,0 +1,106 @@
+"""
+Tests for jointly fitting regressions with a common design matrix
+"""
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal, assert_raises
+import pandas as pd
+
+from statsmodels.tools.tools import add_constant
+from statsmodels.regression.linear_model import OLS, WLS, GLS
+
+
+class CheckBatch(object):
+
+    vector_attrs = ['params', 'bse', 'tvalues', 'pvalues']
+    scalar_attrs = ['ssr', 'scale', 'rsquared', 'rsquared_adj', 'fvalue',
+                    'f_pvalue', 'llf', 'aic', 'bic']
+
+    @classmethod
+    def setup_class(cls):
+        rs = np.random.RandomState(3456)
+        nobs, k_endog = 100, 4
+        cls.exog = add_constant(rs.randn(nobs, 2))
+        het = 1 + np.abs(cls.exog[:, 1:2])
+        cls.endog = (np.dot(cls.exog, rs.randn(3, k_endog)) +
+                     het * rs.randn(nobs, k_endog))
+        cls.weights = rs.uniform(0.5, 2, size=nobs)
+        cls.res_batch = cls.model_class(cls.endog, cls.exog,
+                                        **cls.model_kwds()).fit_many(
+                                            cov_type=cls.cov_type)
+
+    def test_columns(self):
+        res_batch = self.res_batch
+        for i in range(self.endog.shape[1]):
+            res = self.model_class(self.endog[:, i], self.exog,
+                                   **self.model_kwds()).fit(
+                                       cov_type=self.cov_type)
+            for attr in self.vector_attrs:
+                assert_allclose(getattr(res_batch, attr)[:, i],
+                                getattr(res, attr), rtol=1e-10,
+                                err_msg=attr)
+            for attr in self.scalar_attrs:
+                assert_allclose(getattr(res_batch, attr)[i],
+                                getattr(res, attr), rtol=1e-10,
+                                err_msg=attr)
+            assert_allclose(res_batch.cov_params()[i], res.cov_params(),
+                            rtol=1e-10)
+            ci = res.conf_int()
+            assert_allclose(res_batch.conf_int()[0][:, i], ci[:, 0],
+                            rtol=1e-10)
+            assert_allclose(res_batch.conf_int()[1][:, i], ci[:, 1],
+                            rtol=1e-10)
+            assert_allclose(res_batch.resid[:, i], res.resid, rtol=1e-10)
+
+    def test_get_results(self):
+        res = self.res_batch.get_results(1)
+        assert_allclose(res.params, self.res_batch.params[:, 1], rtol=1e-12)
+        assert_allclose(res.bse, self.res_batch.bse[:, 1], rtol=1e-12)
+
+
+class TestBatchOLS(CheckBatch):
+    model_class = OLS
+    cov_type = 'nonrobust'
+
+    @classmethod
+    def model_kwds(cls):
+        return {}
+
+
+class TestBatchOLSHC3(TestBatchOLS):
+    cov_type = 'HC3'
+
+
+class TestBatchWLSHC1(CheckBatch):
+    model_class = WLS
+    cov_type = 'HC1'
+
+    @classmethod
+    def model_kwds(cls):
+        return {'weights': cls.weights}
+
+
+class TestBatchGLSHC2(CheckBatch):
+    model_class = GLS
+    cov_type = 'HC2'
+
+    @classmethod
+    def model_kwds(cls):
+        return {'sigma': 1. / cls.weights}
+
+
+def test_pandas():
+    rs = np.random.RandomState(0)
+    exog = pd.DataFrame(add_constant(rs.randn(50, 2)),
+                        columns=['const', 'x1', 'x2'])
+    endog = pd.DataFrame(rs.randn(50, 3), columns=['a', 'b', 'c'])
+    res = OLS(endog, exog).fit_many()
+    assert_equal(res.params.index.tolist(), ['const', 'x1', 'x2'])
+    assert_equal(res.params.columns.tolist(), ['a', 'b', 'c'])
+    assert_equal(res.rsquared.index.tolist(), ['a', 'b', 'c'])
+    assert_equal(res.get_results(2).model.endog_names, 'c')
+
+
+def test_1d_endog():
+    rs = np.random.RandomState(0)
+    exog = add_constant(rs.randn(50, 2))
+    assert_raises(ValueError, OLS(rs.randn(50), exog).fit_many)
@@ -2,8 +2,10 @@ import warnings
 import numpy as np
 import pandas as pd
 from statsmodels.regression.mixed_linear_model import MixedLM, MixedLMParams
+from statsmodels.regression._mixedlm_sparse import (SparseLikelihood,
+                                                    _SparseGroup)
 from numpy.testing import (assert_almost_equal, assert_equal, assert_allclose,
-                           dec, assert_)
+                           assert_raises, dec, assert_)
 from . import lme_r_results
 from statsmodels.base import _penalties as penalties
 from numpy.testing import dec
@@ -361,6 +363,129 @@ class TestMixedLM(object):
         assert_allclose(result.params, result2.params)
         assert_allclose(result.bse, result2.bse)
 
+    def test_engine_sparse(self):
+        # compare the cross-product engine with the loop over groups
+        np.random.seed(3821)
+        n_grp = 60
+        groups = np.repeat(np.arange(n_grp), np.random.randint(2, 8, n_grp))
+        n = len(groups)
+        exog = np.random.normal(size=(n, 3))
+        exog_re = np.random.normal(size=(n, 2))
+        exog_re[:, 0] = 1
+        endog = (exog.sum(1) + (np.random.normal(size=(n_grp, 2))[groups] *
+                                exog_re).sum(1) + np.random.normal(size=n))
+        vc = {"a": {}, "b": {}}
+        for i in range(n_grp):
+            ix = np.flatnonzero(groups == i)
+            vc["a"][i] = np.random.normal(size=(len(ix), 2))
+            vc["b"][i] = (np.random.randint(0, 3, len(ix))[:, None] ==
+                          np.arange(3)).astype(np.float64)
+            endog[ix] += np.dot(vc["a"][i], np.random.normal(size=2))
+            endog[ix] += np.dot(vc["b"][i], np.random.normal(size=3))
+
+        for use_sqrt in False, True:
+            model = MixedLM(endog, exog, groups, exog_re, exog_vc=vc,
+                            use_sqrt=use_sqrt)
+            model.cov_pen = None
+            model._freepat = None
+            # max_dense=0 factorizes all groups as sparse matrices
+            engines = [SparseLikelihood(model),
+                       SparseLikelihood(model, max_dense=0)]
+            for reml in False, True:
+                model.reml = reml
+                for k in range(3):
+                    cov_re = np.random.normal(size=(2, 2))
+                    cov_re = np.dot(cov_re.T, cov_re)
+                    vcomp = np.random.normal(size=2) ** 2
+                    params = MixedLMParams.from_components(
+                        np.random.normal(size=3), cov_re=cov_re,
+                        vcomp=vcomp)
+                    for profile_fe in False, True:
+                        model._engine = None
+                        llf = model.loglike(params.copy(), profile_fe)
+                        score = model.score(params.copy(), profile_fe)
+                        for engine in engines:
+                            model._engine = engine
+                            assert_allclose(
+                                model.loglike(params.copy(), profile_fe),
+                                llf, rtol=1e-10)
+                            assert_allclose(
+                                model.score(params.copy(), profile_fe),
+                                score, rtol=1e-8, atol=1e-10)
+                    model._engine = None
+                    hess = model.hessian(params.copy())
+                    scores = model._score_groups(params.fe_params, cov_re,
+                                                 vcomp, 1.5)
+                    for engine in engines:
+                        model._engine = engine
+                        assert_allclose(model.hessian(params.copy()), hess,
+                                        rtol=1e-8, atol=1e-10)
+                    model._engine = engines[0]
+                    # the engine orders the groups by random effects layout
+                    scores2 = model._score_groups(params.fe_params, cov_re,
+                                                  vcomp, 1.5)
+                    assert_allclose(np.sort(scores2, 0), np.sort(scores, 0),
+                                    rtol=1e-8, atol=1e-10)
+            model._engine = None
+
+        result = model.fit()
+        result2 = model.fit(engine='sparse')
+        assert_allclose(result2.params, result.params, rtol=1e-5)
+        assert_allclose(result2.bse, result.bse, rtol=1e-4)
+        assert_allclose(result2.llf, result.llf, rtol=1e-10)
+
+        assert_raises(ValueError, model.fit, engine='dense')
+
+    def test_engine_sparse_crossed(self):
+        # crossed variance components in a single group
+        np.random.seed(4423)
+        n = 600
+        a = np.random.randint(0, 40, n)
+        b = np.random.randint(0, 30, n)
+        exog = np.column_stack((np.ones(n), np.random.normal(size=n)))
+        endog = (exog.sum(1) + np.random.normal(size=40)[a] +
+                 0.5 * np.random.normal(size=30)[b] +
+                 np.random.normal(size=n))
+        vc = {"a": {0: (a[:, None] == np.arange(40)).astype(np.float64)},
+              "b": {0: (b[:, None] == np.arange(30)).astype(np.float64)}}
+        model = MixedLM(endog, exog, np.zeros(n), exog_vc=vc)
+        # factorize the single group as sparse matrix
+        model._sparse_engine = SparseLikelihood(model, max_dense=20)
+        assert_(isinstance(model._sparse_engine.blocks[0], _SparseGroup))
+        for reml in False, True:
+            result = model.fit(reml=reml)
+            result2 = model.fit(reml=reml, engine='sparse')
+            assert_allclose(result2.params, result.params, rtol=1e-5)
+            assert_allclose(result2.llf, result.llf, rtol=1e-10)
+            assert_allclose(result2.vcomp, result.vcomp, rtol=1e-5)
+            assert_allclose(result2.bse, result.bse, rtol=1e-4)
+
+    def test_cov_type(self):
+        np.random.seed(8234)
+        n_grp = 400
+        groups = np.repeat(np.arange(n_grp), 4)
+        n = len(groups)
+        exog = np.column_stack((np.ones(n), np.random.normal(size=n)))
+        endog = (exog.sum(1) + (np.random.normal(size=(n_grp, 2))[groups] *
+                                exog).sum(1) + np.random.normal(size=n))
+        model = MixedLM(endog, exog, groups, exog_re=exog)
+
+        result = model.fit(reml=False)
+        assert_equal(result.cov_type, 'oim')
+        for engine in 'loop', 'sparse':
+            result2 = model.fit(reml=False, engine=engine, cov_type='opg')
+            assert_equal(result2.cov_type, 'opg')
+            assert_allclose(result2.params, result.params, rtol=1e-5)
+            # outer product of the scores and Hessian agree for a
+            # correctly specified model
+            assert_allclose(result2.bse, result.bse, rtol=0.1)
+
+            result3 = model.fit(reml=False, engine=engine, cov_type='none')
+            assert_allclose(result3.params, result.params, rtol=1e-5)
+            assert_(np.isnan(result3.bse).all())
+
+        assert_raises(ValueError, model.fit, cov_type='robust')
+
     def test_pastes_vcomp(self):
         # pastes data from lme4
         #
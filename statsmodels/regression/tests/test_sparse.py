@@ -0,0 +1,121 @@
+"""
+Tests for linear regression with a scipy.sparse design matrix
+"""
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal, assert_raises
+from scipy import sparse
+
+from statsmodels.tools.grouputils import dummy_sparse
+from statsmodels.regression.linear_model import OLS, WLS
+
+
+def _sparse_design(nobs, n_groups, seed):
+    rs = np.random.RandomState(seed)
+    groups = rs.randint(0, n_groups, size=nobs)
+    exog = sparse.hstack([dummy_sparse(groups),
+                          sparse.csr_matrix(rs.randn(nobs, 2))]).tocsr()
+    return exog, rs
+
+
+class CheckSparseLS(object):
+
+    attributes = ['params', 'bse', 'tvalues', 'pvalues', 'rsquared',
+                  'rsquared_adj', 'fvalue', 'f_pvalue', 'llf', 'aic', 'bic',
+                  'ssr', 'scale', 'df_model', 'df_resid', 'k_constant']
+
+    @classmethod
+    def setup_class(cls):
+        exog, rs = _sparse_design(1000, 30, 2468)
+        exog_dense = exog.toarray()
+        endog = (exog_dense.dot(rs.randn(exog.shape[1])) +
+                 rs.randn(exog.shape[0]) * (1 + np.abs(exog_dense[:, -1])))
+        kwds = cls.model_kwds(rs, exog.shape[0])
+        cls.res1 = cls.model_class(endog, exog_dense, **kwds).fit(
+            cov_type=cls.cov_type)
+        cls.res2 = cls.model_class(endog, exog, **kwds).fit(
+            cov_type=cls.cov_type)
+
+    @classmethod
+    def model_kwds(cls, rs, nobs):
+        return {}
+
+    def test_attributes(self):
+        res1, res2 = self.res1, self.res2
+        for attr in self.attributes:
+            assert_allclose(getattr(res2, attr), getattr(res1, attr),
+                            rtol=1e-8, err_msg=attr)
+        assert_allclose(res2.cov_params(), res1.cov_params(), rtol=1e-8,
+                        atol=1e-14)
+        assert_allclose(res2.resid, res1.resid, rtol=1e-8, atol=1e-10)
+
+    def test_sparse_exog(self):
+        assert_equal(sparse.issparse(self.res2.model.exog), True)
+        assert_equal(self.res2.model.pinv_wexog, None)
+
+    def test_predict(self):
+        exog = self.res2.model.exog[:5]
+        assert_allclose(self.res2.predict(exog),
+                        self.res1.predict(exog.toarray()), rtol=1e-8)
+
+    def test_summary(self):
+        self.res2.summary()
+
+
+class TestSparseOLS(CheckSparseLS):
+    model_class = OLS
+    cov_type = 'nonrobust'
+
+
+class TestSparseOLSHC3(CheckSparseLS):
+    model_class = OLS
+    cov_type = 'HC3'
+
+
+class TestSparseWLSHC1(CheckSparseLS):
+    model_class = WLS
+    cov_type = 'HC1'
+
+    @classmethod
+    def model_kwds(cls, rs, nobs):
+        return {'weights': rs.uniform(0.5, 2, size=nobs)}
+
+
+def test_lsqr():
+    exog, rs = _sparse_design(500, 10, 0)
+    endog = exog.dot(rs.randn(exog.shape[1])) + rs.randn(exog.shape[0])
+    res1 = OLS(endog, exog.toarray()).fit()
+    res2 = OLS(endog, exog).fit(method='lsqr')
+    assert_allclose(res2.params, res1.params, rtol=1e-7)
+    assert_allclose(res2.ssr, res1.ssr, rtol=1e-7)
+    # the normalized covariance is only computed for the standard errors
+    assert_equal(hasattr(res2.model, 'normalized_cov_params'), False)
+    assert_allclose(res2.bse, res1.bse, rtol=1e-7)
+    assert_allclose(res2.model.normalized_cov_params,
+                    res1.normalized_cov_params, rtol=1e-7, atol=1e-14)
+
+
+def test_implicit_constant():
+    exog, rs = _sparse_design(200, 5, 0)
+    endog = rs.randn(200)
+    # full set of dummies
+    assert_equal(OLS(endog, exog).k_constant, 1)
+    # two sets of dummies
+    groups = rs.randint(0, 3, size=200)
+    exog2 = sparse.hstack([exog, dummy_sparse(groups)]).tocsr()
+    assert_equal(OLS(endog, exog2).k_constant, 1)
+    # dummies without a reference level
+    exog3 = exog[:, 1:]
+    assert_equal(OLS(endog, exog3).k_constant, 0)
+    # constant spanned by non-indicator columns
+    x = rs.randn(200)
+    exog4 = sparse.csr_matrix(np.column_stack((x + 1, x, rs.randn(200))))
+    assert_equal(OLS(endog, exog4).k_constant, 1)
+    for ex in [exog, exog2, exog3, exog4]:
+        assert_equal(OLS(endog, ex).k_constant,
+                     OLS(endog, ex.toarray()).k_constant)
+
+
+def test_sparse_missing():
+    exog, rs = _sparse_design(50, 5, 0)
+    endog = rs.randn(50)
+    assert_raises(NotImplementedError, OLS, endog, exog, missing='drop')
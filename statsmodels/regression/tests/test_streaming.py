@@ -0,0 +1,126 @@
+"""
+Tests for least squares fitted from data chunks
+"""
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal, assert_raises
+import pandas as pd
+
+from statsmodels.tools.tools import add_constant
+from statsmodels.regression.linear_model import OLS, WLS
+from statsmodels.regression.streaming import StreamingLS
+
+
+def _chunks(size, *arrays):
+    nobs = len(arrays[0])
+    for start in range(0, nobs, size):
+        yield tuple(arr[start:start + size] for arr in arrays)
+
+
+class CheckStreamingLS(object):
+
+    attributes = ['params', 'bse', 'tvalues', 'pvalues', 'rsquared',
+                  'rsquared_adj', 'fvalue', 'f_pvalue', 'llf', 'aic', 'bic',
+                  'ssr', 'ess', 'scale', 'centered_tss', 'uncentered_tss',
+                  'condition_number', 'df_model', 'df_resid', 'nobs']
+
+    def test_attributes(self):
+        res1, res2 = self.res1, self.res2
+        for attr in self.attributes:
+            assert_allclose(getattr(res2, attr), getattr(res1, attr),
+                            rtol=1e-9, err_msg=attr)
+        assert_allclose(res2.conf_int(), res1.conf_int(), rtol=1e-9)
+        assert_allclose(res2.cov_params(), res1.cov_params(), rtol=1e-9)
+        assert_equal(res2.k_constant, res1.k_constant)
+
+    def test_no_resid(self):
+        for attr in ['resid', 'wresid', 'fittedvalues', 'resid_pearson']:
+            assert_raises(AttributeError, getattr, self.res2, attr)
+            assert not hasattr(self.res2, attr)
+        assert_raises(NotImplementedError, self.res2.get_prediction)
+
+    def test_summary(self):
+        self.res2.summary()
+
+
+class TestStreamingOLS(CheckStreamingLS):
+
+    @classmethod
+    def setup_class(cls):
+        rs = np.random.RandomState(9876)
+        nobs = 500
+        exog = add_constant(rs.randn(nobs, 3))
+        endog = exog.sum(1) + rs.randn(nobs)
+        cls.res1 = OLS(endog, exog).fit()
+        cls.res2 = OLS.fit_chunks(_chunks(77, endog, exog))
+
+
+class TestStreamingOLSHC1(CheckStreamingLS):
+
+    @classmethod
+    def setup_class(cls):
+        rs = np.random.RandomState(9876)
+        nobs = 500
+        exog = add_constant(rs.randn(nobs, 3))
+        endog = exog.sum(1) + rs.randn(nobs) * (1 + np.abs(exog[:, 1]))
+        cls.res1 = OLS(endog, exog).fit(cov_type='HC1')
+        cls.res2 = OLS.fit_chunks(_chunks(77, endog, exog), cov_type='HC1')
+
+    def test_hc0(self):
+        assert_allclose(self.res2.cov_HC0, self.res1.cov_HC0, rtol=1e-9)
+
+
+class TestStreamingWLSHC0(CheckStreamingLS):
+
+    @classmethod
+    def setup_class(cls):
+        rs = np.random.RandomState(9876)
+        nobs = 500
+        exog = add_constant(rs.randn(nobs, 2), prepend=False)
+        endog = exog.sum(1) + rs.randn(nobs)
+        weights = rs.uniform(0.5, 2, size=nobs)
+        cls.res1 = WLS(endog, exog, weights=weights).fit(cov_type='HC0')
+        cls.res2 = WLS.fit_chunks(_chunks(100, endog, exog, weights),
+                                  cov_type='HC0')
+
+
+class TestStreamingPandasMerge(CheckStreamingLS):
+    # accumulators on separate shards are merged
+
+    @classmethod
+    def setup_class(cls):
+        rs = np.random.RandomState(9876)
+        nobs = 300
+        exog = pd.DataFrame(add_constant(rs.randn(nobs, 2)),
+                            columns=['const', 'x1', 'x2'])
+        endog = pd.Series(exog.sum(1) + rs.randn(nobs), name='y')
+        cls.res1 = OLS(endog, exog).fit()
+
+        acc1 = StreamingLS().partial_fit(endog[:120], exog[:120])
+        acc2 = StreamingLS()
+        for chunk in _chunks(50, endog[120:], exog[120:]):
+            acc2.partial_fit(*chunk)
+        cls.res2 = acc1.merge(acc2).fit()
+
+    def test_names(self):
+        assert_equal(self.res2.model.exog_names, ['const', 'x1', 'x2'])
+        assert_equal(self.res2.model.endog_names, 'y')
+        assert_equal(self.res2.params.index.tolist(), ['const', 'x1', 'x2'])
+
+
+def test_missing_drop():
+    rs = np.random.RandomState(0)
+    exog = add_constant(rs.randn(100, 2))
+    endog = exog.sum(1) + rs.randn(100)
+    endog[[3, 50]] = np.nan
+    res1 = OLS(endog, exog, missing='drop').fit()
+    res2 = OLS.fit_chunks(_chunks(30, endog, exog), missing='drop')
+    assert_allclose(res2.params, res1.params, rtol=1e-10)
+    assert_equal(res2.nobs, 98)
+
+
+def test_hc_requires_moments():
+    rs = np.random.RandomState(0)
+    exog = add_constant(rs.randn(20, 2))
+    acc = StreamingLS().partial_fit(exog.sum(1), exog)
+    assert_raises(ValueError, acc.fit, cov_type='HC1')
+    assert_raises(ValueError, acc.fit, cov_type='HC3')
@@ -104,8 +104,10 @@ Statistics 90, no. 3 (2008): 414–427.
 from statsmodels.compat.python import range
 import pandas as pd
 import numpy as np
+from scipy import sparse
 
 from statsmodels.tools.grouputils import Group
+from statsmodels.tools import _sparse
 from statsmodels.stats.moment_helpers import se_cov
 
 __all__ = ['cov_cluster', 'cov_cluster_2groups', 'cov_hac', 'cov_nw_panel',
@@ -251,7 +253,11 @@ def _get_sandwich_arrays(results, cov_type=''):
             # assumes that freq_weights are incorporated in score_obs or equivalent
             # assumes xu/score_obs is 2D
             # temporary asarray
-            xu /= np.sqrt(np.asarray(results.model.freq_weights)[:, None])
+            fw_sqrt = np.sqrt(np.asarray(results.model.freq_weights))
+            if _sparse.issparse(xu):
+                xu = _sparse.scale_rows(xu, 1. / fw_sqrt)
+            else:
+                xu /= fw_sqrt[:, None]
 
     else:
         raise ValueError('need either tuple of (jac, hessian_inv) or results' +
@@ -422,6 +428,8 @@ def S_white_simple(x):
     this is just dot(X.T, X)
 
     '''
+    if _sparse.issparse(x):
+        return _sparse.xtwx(x)
     if x.ndim == 1:
         x = x[:,None]
 
@@ -448,6 +456,12 @@ def group_sums(x, group):
     if np.max(group) > 2 * x.shape[0]:
         group = pd.factorize(group)[0]
 
+    if _sparse.issparse(x):
+        # sparse group indicator times x
+        indicator = sparse.csr_matrix((np.ones(len(group)),
+                                       (group, np.arange(len(group)))))
+        return indicator.dot(x).T
+
     return np.array([np.bincount(group, weights=x[:, col])
                             for col in range(x.shape[1])])
 
@@ -0,0 +1,216 @@
+"""
+Helper functions for models with a scipy.sparse design matrix.
+
+The functions accept both dense ndarrays and scipy.sparse matrices for the
+design matrix and return dense ndarrays for all results that have the
+dimension of the parameters, so that the results classes can be used
+unchanged.
+"""
+import numpy as np
+from scipy import sparse
+
+from statsmodels.compat.numpy import np_matrix_rank
+
+
+def issparse(x):
+    """True if x is a scipy.sparse matrix"""
+    return sparse.issparse(x)
+
+
+def asformat_exog(exog):
+    """
+    Convert a sparse design matrix to a format that supports row slicing.
+
+    CSR and CSC matrices are returned unchanged, all other sparse formats
+    are converted to CSR.
+    """
+    if exog.format not in ('csr', 'csc'):
+        exog = exog.tocsr()
+    return exog.astype(np.float64)
+
+
+def dot(exog, params):
+    """
+    Matrix product of a dense or sparse exog with a dense array.
+    """
+    if sparse.issparse(exog):
+        return exog.dot(params)
+    return np.dot(exog, params)
+
+
+def scale_rows(exog, scale):
+    """
+    Multiply each row of exog by the corresponding element of scale.
+
+    This is ``scale[:, None] * exog`` for dense exog.
+    """
+    if sparse.issparse(exog):
+        return sparse.diags(scale, 0).dot(exog).asformat(exog.format)
+    return scale[:, None] * exog
+
+
+def xtwx(exog, weights=None):
+    """
+    Weighted cross-product ``exog.T * diag(weights) * exog`` as dense array
+    """
+    if sparse.issparse(exog):
+        wexog = exog if weights is None else scale_rows(exog, weights)
+        return exog.T.dot(wexog).toarray()
+    if weights is None:
+        return np.dot(exog.T, exog)
+    return np.dot(exog.T * weights, exog)
+
+
+def col_ptp(exog):
+    """
+    Range (maximum - minimum) of each column of a dense or sparse exog.
+    """
+    if sparse.issparse(exog):
+        return (exog.max(0).toarray() - exog.min(0).toarray()).ravel()
+    return exog.ptp(axis=0)
+
+
+def col_mean(exog):
+    """
+    Mean of each column of a dense or sparse exog as 1-d array.
+    """
+    return np.asarray(exog.mean(0)).ravel()
+
+
+def _rank_cutoff(eigvals, shape, rcond=None):
+    """
+    Number of eigenvalues of a cross-product above the cutoff for the rank
+
+    eigvals are the eigenvalues of ``exog.T * exog`` in decreasing order and
+    shape is the shape of exog.
+    """
+    if rcond is None:
+        rcond = max(shape) * np.finfo(np.float64).eps
+    return int((eigvals > rcond * eigvals[0]).sum())
+
+
+def pinv_normal(exog, rcond=None):
+    """
+    Pseudoinverse of the cross-product of exog from the normal equations.
+
+    Parameters
+    ----------
+    exog : ndarray or sparse matrix
+        The (whitened) design matrix.
+    rcond : float, optional
+        Cutoff for small eigenvalues of ``exog.T * exog``, relative to the
+        largest eigenvalue. The default is ``max(exog.shape) * eps``.
+
+    Returns
+    -------
+    normalized_cov_params : ndarray
+        The pseudoinverse of ``exog.T * exog``.
+    singular_values : ndarray
+        Singular values of exog in decreasing order.
+    rank : int
+        The number of eigenvalues above the cutoff.
+
+    Notes
+    -----
+    The design matrix is never converted to a dense array. Using the normal
+    equations squares the condition number compared to the pinv or qr
+    solvers of dense models. For this reason the cutoff for the rank is
+    applied to the eigenvalues of the cross-product, which corresponds to a
+    relative cutoff of ``sqrt(rcond)`` for the singular values of exog.
+
+    The eigendecomposition of the k x k cross-product is the expensive part,
+    models should compute it once and keep all three results.
+    """
+    xtx = xtwx(exog)
+    eigvals, eigvecs = np.linalg.eigh(xtx)
+    eigvals = eigvals[::-1]
+    eigvecs = eigvecs[:, ::-1]
+    rank = _rank_cutoff(eigvals, exog.shape, rcond)
+    inv_eig = np.zeros_like(eigvals)
+    inv_eig[:rank] = 1. / eigvals[:rank]
+    normalized_cov_params = np.dot(eigvecs * inv_eig, eigvecs.T)
+    singular_values = np.sqrt(np.clip(eigvals, 0, np.inf))
+    return normalized_cov_params, singular_values, rank
+
+
+def singular_values_normal(exog, rcond=None):
+    """
+    Singular values and rank of exog from the normal equations.
+
+    This uses only the eigenvalues of ``exog.T * exog``, which are much
+    cheaper to compute than the pseudoinverse in `pinv_normal`.
+
+    Returns
+    -------
+    singular_values : ndarray
+        Singular values of exog in decreasing order.
+    rank : int
+        The number of eigenvalues above the cutoff, see `pinv_normal`.
+    """
+    eigvals = np.linalg.eigvalsh(xtwx(exog))[::-1]
+    rank = _rank_cutoff(eigvals, exog.shape, rcond)
+    return np.sqrt(np.clip(eigvals, 0, np.inf)), rank
+
+
+def matrix_rank(exog):
+    """
+    Rank of a dense or sparse design matrix.
+    """
+    if sparse.issparse(exog):
+        return singular_values_normal(exog)[1]
+    return np_matrix_rank(exog)
+
+
+def implicit_constant(exog):
+    """
+    True if a constant is in the column space of a sparse exog.
+
+    If the indicator columns of exog, i.e. the columns with only 0 and 1
+    entries, add up to the same positive value in every row, as for a full
+    set of dummy variables, then the constant is found without a rank
+    computation. Otherwise the rank of the cross-product of exog is compared
+    with the rank after augmenting exog by a constant column, both from the
+    same sparse product.
+    """
+    nobs, k_vars = exog.shape
+    nnz = exog.getnnz(axis=0)
+    n_ones = np.asarray((exog == 1).sum(0)).ravel()
+    dummy = (nnz > 0) & (nnz == n_ones)
+    if dummy.any():
+        row_sums = exog.dot(dummy.astype(np.float64))
+        if row_sums[0] > 0 and (row_sums == row_sums[0]).all():
+            return True
+
+    xtx = xtwx(exog)
+    col_sums = np.asarray(exog.sum(0)).ravel()
+    augm = np.empty((k_vars + 1, k_vars + 1))
+    augm[0, 0] = nobs
+    augm[0, 1:] = augm[1:, 0] = col_sums
+    augm[1:, 1:] = xtx
+    rank_orig = _rank_cutoff(np.linalg.eigvalsh(xtx)[::-1], exog.shape)
+    rank_augm = _rank_cutoff(np.linalg.eigvalsh(augm)[::-1],
+                             (nobs, k_vars + 1))
+    return rank_orig == rank_augm
+
+
+def leverage(exog, normalized_cov_params):
+    """
+    Diagonal of the hat matrix ``exog * normalized_cov_params * exog.T``
+
+    The hat matrix itself, which is nobs x nobs, is not formed.
+    """
+    if sparse.issparse(exog):
+        xc = exog.dot(normalized_cov_params)
+        return np.asarray(exog.multiply(xc).sum(1)).ravel()
+    return (np.dot(exog, normalized_cov_params) * exog).sum(1)
+
+
+def sandwich_hc(exog, normalized_cov_params, het_scale):
+    """
+    Heteroscedasticity robust sandwich covariance for a linear model
+
+    Returns ``B * exog.T * diag(het_scale) * exog * B`` where ``B`` is
+    normalized_cov_params.
+    """
+    meat = xtwx(exog, het_scale)
+    return np.dot(normalized_cov_params, np.dot(meat, normalized_cov_params))
@@ -96,6 +96,11 @@ def _is_using_ndarray(endog, exog):
             (isinstance(exog, np.ndarray) or exog is None))
 
 
+def _is_using_sparse(endog, exog):
+    from scipy import sparse
+    return isinstance(endog, np.ndarray) and sparse.issparse(exog)
+
+
 def _is_using_pandas(endog, exog):
     # TODO: Remove WidePanel when finished with it
     klasses = (pd.Series, pd.DataFrame, pd.WidePanel, pd.Panel)
@@ -177,7 +177,7 @@ def dummy_sparse(groups):
 
     indptr = np.arange(len(groups)+1)
     data = np.ones(len(groups), dtype=np.int8)
-    indi = sparse.csr_matrix((data, g, indptr))
+    indi = sparse.csr_matrix((data, groups, indptr))
 
     return indi
 
@@ -367,7 +367,9 @@ class Grouping(object):
     @property
     def labels(self):
         # this was index_int, but that's not a very good name...
-        if hasattr(self.index, 'labels'):
+        if hasattr(self.index, 'codes'):  # MultiIndex, pandas >= 0.24
+            return self.index.codes
+        elif hasattr(self.index, 'labels'):
             return self.index.labels
         else:  # pandas version issue here
             # Compat code for the labels -> codes change in pandas 0.15
@@ -61,6 +61,10 @@ class MarkovAutoregression(markov_regression.MarkovRegression):
         Whether or not there is regime-specific heteroskedasticity, i.e.
         whether or not the error term has a switching variance. Default is
         False.
+    conserve_memory : boolean, optional
+        Whether to evaluate the loglikelihood and its derivatives with the
+        memory conserving Hamilton filter. The EM iterations, `filter` and
+        `smooth` are not affected. Default is False.
 
     Notes
     -----
@@ -98,7 +102,8 @@ class MarkovAutoregression(markov_regression.MarkovRegression):
     def __init__(self, endog, k_regimes, order, trend='c', exog=None,
                  exog_tvtp=None, switching_ar=True, switching_trend=True,
                  switching_exog=False, switching_variance=False,
-                 dates=None, freq=None, missing='none'):
+                 dates=None, freq=None, missing='none',
+                 conserve_memory=False):
 
         # Properties
         self.switching_ar = switching_ar
@@ -115,7 +120,7 @@ class MarkovAutoregression(markov_regression.MarkovRegression):
             exog_tvtp=exog_tvtp, switching_trend=switching_trend,
             switching_exog=switching_exog,
             switching_variance=switching_variance, dates=dates, freq=freq,
-            missing=missing)
+            missing=missing, conserve_memory=conserve_memory)
 
         # Sanity checks
         if self.nobs <= self.order:
@@ -237,6 +242,29 @@ class MarkovAutoregression(markov_regression.MarkovRegression):
 
         return conditional_likelihoods
 
+    def _conditional_moments(self, params):
+        """
+        Compute the moments of the likelihoods conditional on the current
+        period's regime and the last `self.order` regimes.
+        """
+        params = np.array(params, ndmin=1)
+        dtype = np.promote_types(np.float64, params.dtype)
+
+        # x_t beta^{(S_t)}, including the presample periods
+        mean = np.zeros((self.k_regimes, self.nobs + self.order), dtype=dtype)
+        if self._k_exog > 0:
+            for i in range(self.k_regimes):
+                coeffs = params[self.parameters[i, 'exog']]
+                mean[i] = np.dot(self.orig_exog, coeffs)
+
+        ar_coefficients = np.zeros((self.k_regimes, self.order), dtype=dtype)
+        for i in range(self.k_regimes):
+            ar_coefficients[i] = params[self.parameters[i, 'autoregressive']]
+
+        variance = (np.ones(self.k_regimes) *
+                    params[self.parameters['variance']])
+        return self.orig_endog, mean, ar_coefficients, variance
+
     def filter(self, *args, **kwargs):
         kwargs.setdefault('results_class', MarkovAutoregressionResults)
         kwargs.setdefault('results_wrapper_class',
@@ -54,6 +54,10 @@ class MarkovRegression(markov_switching.MarkovSwitching):
         Whether or not there is regime-specific heteroskedasticity, i.e.
         whether or not the error term has a switching variance. Default is
         False.
+    conserve_memory : boolean, optional
+        Whether to evaluate the loglikelihood and its derivatives with the
+        memory conserving Hamilton filter. The EM iterations, `filter` and
+        `smooth` are not affected. Default is False.
 
     Notes
     -----
@@ -86,7 +90,7 @@ class MarkovRegression(markov_switching.MarkovSwitching):
     def __init__(self, endog, k_regimes, trend='c', exog=None, order=0,
                  exog_tvtp=None, switching_trend=True, switching_exog=True,
                  switching_variance=False, dates=None, freq=None,
-                 missing='none'):
+                 missing='none', conserve_memory=False):
 
         # Properties
         self.trend = trend
@@ -119,7 +123,8 @@ class MarkovRegression(markov_switching.MarkovSwitching):
         # Initialize the base model
         super(MarkovRegression, self).__init__(
             endog, k_regimes, order=order, exog_tvtp=exog_tvtp, exog=exog,
-            dates=dates, freq=freq, missing=missing)
+            dates=dates, freq=freq, missing=missing,
+            conserve_memory=conserve_memory)
 
         # Switching options
         if self.switching_trend is True or self.switching_trend is False:
@@ -191,6 +196,18 @@ class MarkovRegression(markov_switching.MarkovSwitching):
 
         return conditional_likelihoods
 
+    def _conditional_moments(self, params):
+        """
+        Compute the moments of the likelihoods conditional on the current
+        period's regime
+        """
+        params = np.array(params, ndmin=1)
+        mean = self.predict_conditional(params)[:, 0, :]
+        ar_coefficients = np.zeros((self.k_regimes, 0), dtype=mean.dtype)
+        variance = (np.ones(self.k_regimes) *
+                    params[self.parameters['variance']])
+        return self.endog, mean, ar_coefficients, variance
+
     def filter(self, *args, **kwargs):
         kwargs.setdefault('results_class', MarkovRegressionResults)
         kwargs.setdefault('results_wrapper_class',
@@ -22,12 +22,15 @@ from statsmodels.tools.decorators import cache_readonly, resettable_cache
 from statsmodels.tools.eval_measures import aic, bic, hqic
 from statsmodels.tools.tools import pinv_extended
 from statsmodels.tools.sm_exceptions import EstimationWarning
+from statsmodels.tools.parallel import parallel_func
 import statsmodels.base.wrapper as wrap
 
 
 from statsmodels.tsa.statespace.tools import find_best_blas_type
 from statsmodels.tsa.regime_switching._hamilton_filter import (
-    shamilton_filter, dhamilton_filter, chamilton_filter, zhamilton_filter)
+    shamilton_filter, dhamilton_filter, chamilton_filter, zhamilton_filter,
+    shamilton_filter_log, dhamilton_filter_log, chamilton_filter_log,
+    zhamilton_filter_log)
 from statsmodels.tsa.regime_switching._kim_smoother import (
     skim_smoother, dkim_smoother, ckim_smoother, zkim_smoother)
 
@@ -36,6 +39,11 @@ prefix_hamilton_filter_map = {
     'c': chamilton_filter, 'z': zhamilton_filter
 }
 
+prefix_hamilton_filter_log_map = {
+    's': shamilton_filter_log, 'd': dhamilton_filter_log,
+    'c': chamilton_filter_log, 'z': zhamilton_filter_log
+}
+
 prefix_kim_smoother_map = {
     's': skim_smoother, 'd': dkim_smoother,
     'c': ckim_smoother, 'z': zkim_smoother
@@ -226,6 +234,21 @@ def py_hamilton_filter(initial_probabilities, regime_transition,
             joint_likelihoods, filtered_joint_probabilities[..., 1:])
 
 
+def _initial_joint_probabilities(initial_probabilities, regime_transition,
+                                 order):
+    # Pr[S_{-1}, ..., S_{-r-1}], shaped (k_regimes,) * (order + 1)
+    k_regimes = len(initial_probabilities)
+    tmp = np.copy(initial_probabilities)
+    shape = (k_regimes, k_regimes)
+    transition_t = 0
+    for i in range(order):
+        if regime_transition.shape[-1] > 1:
+            transition_t = i
+        tmp = np.reshape(regime_transition[..., transition_t],
+                         shape + (1,) * i) * tmp
+    return tmp
+
+
 def cy_hamilton_filter(initial_probabilities, regime_transition,
                        conditional_likelihoods):
     """
@@ -285,15 +308,8 @@ def cy_hamilton_filter(initial_probabilities, regime_transition,
 
     # Initial probabilities
     filtered_marginal_probabilities[:, 0] = initial_probabilities
-    tmp = np.copy(initial_probabilities)
-    shape = (k_regimes, k_regimes)
-    transition_t = 0
-    for i in range(order):
-        if regime_transition.shape[-1] > 1:
-            transition_t = i
-        tmp = np.reshape(regime_transition[..., transition_t],
-                         shape + (1,) * i) * tmp
-    filtered_joint_probabilities[..., 0] = tmp
+    filtered_joint_probabilities[..., 0] = _initial_joint_probabilities(
+        initial_probabilities, regime_transition, order)
 
     # Get appropriate subset of transition matrix
     if regime_transition.shape[-1] > 1:
@@ -320,6 +336,94 @@ def cy_hamilton_filter(initial_probabilities, regime_transition,
             joint_likelihoods, filtered_joint_probabilities[..., 1:])
 
 
+def cy_hamilton_filter_log(initial_probabilities, regime_transition, endog,
+                           mean, ar_coefficients, variance, order=1):
+    """
+    Hamilton filter using Cython inner loop, with Gaussian conditional
+    loglikelihoods computed in the inner loop
+
+    Parameters
+    ----------
+    initial_probabilities : array
+        Array of initial probabilities, shaped (k_regimes,).
+    regime_transition : array
+        Matrix of regime transition probabilities, shaped either
+        (k_regimes, k_regimes, 1) or if there are time-varying transition
+        probabilities (k_regimes, k_regimes, nobs + order).
+    endog : array
+        Array of observations, shaped (k_ar + nobs,), where the first `k_ar`
+        observations are presample values.
+    mean : array
+        Array of the mean of the observations conditional on each regime,
+        shaped (k_regimes, k_ar + nobs).
+    ar_coefficients : array
+        Array of autoregressive coefficients conditional on each regime,
+        shaped (k_regimes, k_ar). The autoregression is in deviations of the
+        observations from their (regime-dependent) means.
+    variance : array
+        Array of the variance of the observations conditional on each regime,
+        shaped (k_regimes,).
+    order : int, optional
+        The number of previous regimes on which the likelihoods depend. Must
+        be at least one and at least `k_ar`. Default is one.
+
+    Returns
+    -------
+    filtered_marginal_probabilities : array
+        Array containing Pr[S_t=s_t | Y_t] - the probability of being in each
+        regime conditional on time t information. Shaped (k_regimes, nobs).
+    joint_loglikelihoods : array
+        Array of loglikelihoods condition on time t information, shaped
+        (nobs,).
+
+    Notes
+    -----
+    Unlike `cy_hamilton_filter`, the conditional likelihoods and the joint
+    probabilities of the current and previous `order` regimes are not stored
+    for every period, so that memory use does not grow with
+    `k_regimes**(order + 1) * nobs`. The conditional loglikelihoods in each
+    period are scaled by their maximum value before exponentiation, which
+    prevents the filter from breaking down if all of the conditional
+    likelihoods underflow (for example, due to an outlier).
+    """
+    # Dimensions
+    k_regimes = len(initial_probabilities)
+    k_ar = ar_coefficients.shape[1]
+    nobs = endog.shape[0] - k_ar
+    if order < max(k_ar, 1):
+        raise ValueError('Order of the filter must be at least one and at'
+                         ' least the number of autoregressive coefficients.')
+
+    # Get appropriate subset of transition matrix
+    initial_joint_probabilities = _initial_joint_probabilities(
+        initial_probabilities, regime_transition, order)
+    if regime_transition.shape[-1] > 1:
+        regime_transition = regime_transition[..., order:]
+
+    # Run Cython filter iterations
+    prefix, dtype, _ = find_best_blas_type((
+        regime_transition, initial_joint_probabilities, endog, mean,
+        ar_coefficients, variance))
+
+    # Storage
+    # Pr[S_t = s_t | Y_t]
+    filtered_marginal_probabilities = np.zeros((k_regimes, nobs), dtype=dtype)
+    # log f(y_t | Y_{t-1})
+    joint_loglikelihoods = np.zeros((nobs,), dtype=dtype)
+
+    func = prefix_hamilton_filter_log_map[prefix]
+    func(nobs, k_regimes, order,
+         np.asarray(regime_transition, dtype=dtype),
+         np.asarray(initial_joint_probabilities, dtype=dtype).ravel(),
+         np.asarray(endog, dtype=dtype),
+         np.asarray(mean, dtype=dtype),
+         np.asarray(ar_coefficients, dtype=dtype),
+         np.asarray(variance, dtype=dtype),
+         joint_loglikelihoods, filtered_marginal_probabilities)
+
+    return filtered_marginal_probabilities, joint_loglikelihoods
+
+
 def py_kim_smoother(regime_transition, predicted_joint_probabilities,
                     filtered_joint_probabilities):
     """
@@ -473,6 +577,27 @@ def cy_kim_smoother(regime_transition, predicted_joint_probabilities,
     return smoothed_joint_probabilities, smoothed_marginal_probabilities
 
 
+def _start_params_search_rep(model, params, em_iter):
+    """
+    Apply EM iterations to a random permutation of the start parameters
+
+    Returns the loglikelihood and the (transformed) parameters, or -inf and
+    None if the EM iterations failed. Used by
+    `MarkovSwitching._start_params_search`, and defined at the module level so
+    that it can be evaluated in separate processes.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+
+        try:
+            params = model._fit_em(params, transformed=False,
+                                   maxiter=em_iter, return_params=True)
+            return model.loglike(params), params
+        except (np.linalg.LinAlgError, ValueError, ArithmeticError):
+            # Singular or invalid parameters in a random permutation
+            return -np.inf, None
+
+
 class MarkovSwitchingParams(object):
     """
     Class to hold parameters in Markov switching models
@@ -649,12 +774,30 @@ class MarkovSwitching(tsbase.TimeSeriesModel):
         time-varying transition probabilities (TVTP). TVTP is only used if this
         variable is provided. If an intercept is desired, a column of ones must
         be explicitly included in this array.
+    conserve_memory : boolean, optional
+        Whether to evaluate the loglikelihood and its derivatives with the
+        memory conserving Hamilton filter. The EM iterations, `filter` and
+        `smooth` are not affected. Default is False.
 
     Notes
     -----
     This model is new and API stability is not guaranteed, although changes
     will be made in a backwards compatible way if possible.
 
+    If `conserve_memory` is True, the loglikelihood is
+    evaluated with a Hamilton filter that computes the conditional
+    likelihoods as they are needed rather than storing them for every
+    combination of the current and previous `order` regimes in every period,
+    so that memory use does not grow with `k_regimes**(order + 1) * nobs`.
+    This only affects the loglikelihood and its derivatives, as evaluated by
+    the numerical optimizer in `fit`. The EM iterations of `fit` (`em_iter`)
+    and of the random search for start parameters (`search_reps`), the
+    `filter` and `smooth` methods, and so the results returned by `fit`,
+    always use the full arrays. For a memory conserving estimation use
+    `fit` with `em_iter=0`, `search_reps=0` and `return_params=True`. It
+    requires subclasses to implement `_conditional_moments`, which is the
+    case for `MarkovRegression` and `MarkovAutoregression`.
+
     References
     ----------
     Kim, Chang-Jin, and Charles R. Nelson. 1999.
@@ -665,7 +808,7 @@ class MarkovSwitching(tsbase.TimeSeriesModel):
     """
 
     def __init__(self, endog, k_regimes, order=0, exog_tvtp=None, exog=None,
-                 dates=None, freq=None, missing='none'):
+                 dates=None, freq=None, missing='none', conserve_memory=False):
 
         # Properties
         self.k_regimes = k_regimes
@@ -706,6 +849,10 @@ class MarkovSwitching(tsbase.TimeSeriesModel):
         self._initialization = 'steady-state'
         self._initial_probabilities = None
 
+        # Whether or not to evaluate the loglikelihood with the memory
+        # conserving filter
+        self.conserve_memory = conserve_memory
+
     @property
     def k_params(self):
         """
@@ -930,6 +1077,34 @@ class MarkovSwitching(tsbase.TimeSeriesModel):
         """
         raise NotImplementedError
 
+    def _conditional_moments(self, params):
+        """
+        Compute the moments of the Gaussian likelihoods conditional on the
+        current period's regime (and the last self.order periods' regimes if
+        self.order > 0).
+
+        Returns a tuple (endog, mean, ar_coefficients, variance) as described
+        in `cy_hamilton_filter_log`. Must be implemented in subclasses to
+        use the `conserve_memory` option.
+        """
+        raise NotImplementedError
+
+    def _filter_log(self, params, regime_transition=None):
+        # Get the regime transition matrix if not provided
+        if regime_transition is None:
+            regime_transition = self.regime_transition_matrix(params)
+        # Get the initial probabilities
+        initial_probabilities = self.initial_probabilities(
+            params, regime_transition)
+
+        # Apply the filter
+        endog, mean, ar_coefficients, variance = (
+            self._conditional_moments(params))
+        return cy_hamilton_filter_log(initial_probabilities,
+                                      regime_transition, endog, mean,
+                                      ar_coefficients, variance,
+                                      order=max(self.order, 1))
+
     def _filter(self, params, regime_transition=None):
         # Get the regime transition matrix if not provided
         if regime_transition is None:
@@ -1115,12 +1290,21 @@ class MarkovSwitching(tsbase.TimeSeriesModel):
             function.
         transformed : boolean, optional
             Whether or not `params` is already transformed. Default is True.
+
+        Notes
+        -----
+        If the model was created with `conserve_memory=True`, the
+        loglikelihood is computed with the memory conserving Hamilton filter
+        (see `cy_hamilton_filter_log`).
         """
         params = np.array(params, ndmin=1)
 
         if not transformed:
             params = self.transform_params(params)
 
+        if self.conserve_memory:
+            return self._filter_log(params)[1]
+
         results = self._filter(params)
 
         return np.log(results[5])
@@ -1191,7 +1375,7 @@ class MarkovSwitching(tsbase.TimeSeriesModel):
     def fit(self, start_params=None, transformed=True, cov_type='approx',
             cov_kwds=None, method='bfgs', maxiter=100, full_output=1, disp=0,
             callback=None, return_params=False, em_iter=5, search_reps=0,
-            search_iter=5, search_scale=1., **kwargs):
+            search_iter=5, search_scale=1., search_n_jobs=1, **kwargs):
         """
         Fits the model by maximum likelihood via Hamilton filter.
 
@@ -1252,6 +1436,10 @@ class MarkovSwitching(tsbase.TimeSeriesModel):
             search parameter repetitions.
         search_scale : float or array, optional.
             Scale of variates for random start parameter search.
+        search_n_jobs : int, optional
+            Number of processes used to evaluate the search parameter
+            repetitions in parallel (requires joblib). If -1, all available
+            CPUs are used. Default is 1.
         **kwargs
             Additional keyword arguments to pass to the optimizer.
 
@@ -1272,7 +1460,7 @@ class MarkovSwitching(tsbase.TimeSeriesModel):
             start_params = self._start_params_search(
                 search_reps, start_params=start_params,
                 transformed=transformed, em_iter=search_iter,
-                scale=search_scale)
+                scale=search_scale, n_jobs=search_n_jobs)
             transformed = True
 
         # Get better start params through EM algorithm
@@ -1463,7 +1651,7 @@ class MarkovSwitching(tsbase.TimeSeriesModel):
         return regime_transition
 
     def _start_params_search(self, reps, start_params=None, transformed=True,
-                             em_iter=5, scale=1.):
+                             em_iter=5, scale=1., n_jobs=1):
         """
         Search for starting parameters as random permutations of a vector
 
@@ -1483,12 +1671,19 @@ class MarkovSwitching(tsbase.TimeSeriesModel):
             Scale of variates for random start parameter search. Can be given
             as an array of length equal to the number of parameters or as a
             single scalar.
+        n_jobs : int, optional
+            Number of processes used to evaluate the random permutations in
+            parallel (requires joblib). If -1, all available CPUs are used.
+            Default is 1.
 
         Notes
         -----
         This is a private method for finding good starting parameters for MLE
         by scoring, where the defaults have been set heuristically.
 
+        The random variates are all drawn before any of the permutations are
+        evaluated, so that the result does not depend on `n_jobs`.
+
         """
         if start_params is None:
             start_params = self.start_params
@@ -1514,23 +1709,20 @@ class MarkovSwitching(tsbase.TimeSeriesModel):
         for i in range(self.k_params):
             variates[:, i] = scale[i] * np.random.uniform(-0.5, 0.5, size=reps)
 
+        if n_jobs == 1:
+            parallel, func = list, _start_params_search_rep
+        else:
+            parallel, func, n_jobs = parallel_func(
+                _start_params_search_rep, n_jobs=n_jobs, verbose=0)
+        proposed = parallel(func(self, start_params + variates[i], em_iter)
+                            for i in range(reps))
+
         llf = self.loglike(start_params, transformed=False)
         params = start_params
-        for i in range(reps):
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-
-                try:
-                    proposed_params = self._fit_em(
-                        start_params + variates[i], transformed=False,
-                        maxiter=em_iter, return_params=True)
-                    proposed_llf = self.loglike(proposed_params)
-
-                    if proposed_llf > llf:
-                        llf = proposed_llf
-                        params = self.untransform_params(proposed_params)
-                except:
-                    pass
+        for proposed_llf, proposed_params in proposed:
+            if proposed_llf > llf:
+                llf = proposed_llf
+                params = self.untransform_params(proposed_params)
 
         # Return transformed parameters
         return self.transform_params(params)
@@ -215,6 +215,7 @@ class MarkovAutoregression(object):
     @classmethod
     def setup_class(cls, true, endog, atol=1e-5, rtol=1e-7, **kwargs):
         cls.model = markov_autoregression.MarkovAutoregression(endog, **kwargs)
+        cls.model_args = (endog, kwargs)
         cls.true = true
         cls.result = cls.model.smooth(cls.true['params'])
         cls.atol = atol
@@ -238,6 +239,14 @@ class MarkovAutoregression(object):
         assert_allclose(res_em.llf, self.true['llf_fit_em'], atol=self.atol,
                         rtol=self.rtol)
 
+    def test_conserve_memory(self):
+        # Test the memory conserving filter against the full filter
+        endog, kwargs = self.model_args
+        mod = markov_autoregression.MarkovAutoregression(
+            endog, conserve_memory=True, **kwargs)
+        llf_obs = mod.loglikeobs(self.true['params'])
+        assert_allclose(llf_obs, self.result.llf_obs)
+
 
 hamilton_ar2_short_filtered_joint_probabilities = np.array([[[[
             4.99506987e-02,   6.44048275e-04,   6.22227140e-05,
@@ -888,3 +897,27 @@ class TestFilardoPandas(MarkovAutoregression):
         assert_allclose(self.result.expected_durations,
                         self.mar_filardo[['duration0', 'duration1']].iloc[5:],
                         rtol=1e-5, atol=1e-7)
+
+
+def test_conserve_memory_underflow():
+    # The conditional likelihoods of every regime underflow at the outlier,
+    # which the memory conserving filter handles by scaling
+    endog = np.array(rgnp)
+    endog[50] = 1e3
+    mod = markov_autoregression.MarkovAutoregression(
+        endog, k_regimes=2, order=1, switching_ar=False)
+    params = np.r_[0.9, 0.5, 0.5, 1.0, 1.0, 0.3]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        llf_obs = mod.loglikeobs(params)
+    assert not np.isfinite(llf_obs[49])
+
+    mod = markov_autoregression.MarkovAutoregression(
+        endog, k_regimes=2, order=1, switching_ar=False, conserve_memory=True)
+    llf_obs = mod.loglikeobs(params)
+    assert np.all(np.isfinite(llf_obs))
+
+    # The loglikelihood is a weighted average of the conditional likelihoods
+    conditional_llf = (-0.5 * mod._resid(params)[..., 49]**2 -
+                       0.5 * np.log(2 * np.pi))
+    assert np.min(conditional_llf) <= llf_obs[49] <= np.max(conditional_llf)
@@ -410,6 +410,7 @@ class MarkovRegression(object):
     @classmethod
     def setup_class(cls, true, endog, atol=1e-5, rtol=1e-7, **kwargs):
         cls.model = markov_regression.MarkovRegression(endog, **kwargs)
+        cls.model_args = (endog, kwargs)
         cls.true = true
         cls.result = cls.model.smooth(cls.true['params'])
         cls.atol = atol
@@ -436,6 +437,14 @@ class MarkovRegression(object):
         assert_allclose(res_em.llf, self.true['llf_fit_em'], atol=self.atol,
                         rtol=self.rtol)
 
+    def test_conserve_memory(self):
+        # Test the memory conserving filter against the full filter
+        endog, kwargs = self.model_args
+        mod = markov_regression.MarkovRegression(
+            endog, conserve_memory=True, **kwargs)
+        llf_obs = mod.loglikeobs(self.true['params'])
+        assert_allclose(llf_obs, self.result.llf_obs)
+
 
 fedfunds_const_filtered_joint_probabilities = np.array([[[
            9.81875427e-01,   9.99977639e-01,   9.99982269e-01,
@@ -1091,6 +1100,17 @@ class TestFedFundsConstL1Exog3(MarkovRegression):
         np.random.seed(1234)
         super(TestFedFundsConstL1Exog3, self).test_fit(**kwargs)
 
+    def test_start_params_search_n_jobs(self):
+        # The random search does not depend on the number of processes
+        np.random.seed(1234)
+        desired = self.model._start_params_search(5)
+        np.random.seed(1234)
+        with warnings.catch_warnings():
+            # joblib may not be available
+            warnings.simplefilter("ignore")
+            actual = self.model._start_params_search(5, n_jobs=2)
+        assert_allclose(actual, desired)
+
 
 class TestAreturnsConstL1Variance(MarkovRegression):
     # Results from Stata, see http://www.stata.com/manuals14/tsmswitch.pdf
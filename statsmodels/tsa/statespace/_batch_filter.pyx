@@ -0,0 +1,551 @@
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: cdivision=False
+"""
+State Space Models - Batched univariate Kalman filter
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+
+# Typical imports
+cimport numpy as np
+cimport cython
+import numpy as np
+
+np.import_array()
+
+from statsmodels.src.math cimport *
+
+# ### Batched Kalman filter
+#
+# Runs the conventional Kalman filter for a stack of independent state space
+# models with a univariate observation and time-invariant system matrices
+# (except for the intercepts). The models are filtered one after the other,
+# so that the (small) matrices of a model stay in the cache for all periods.
+#
+# The products with the transition matrix only visit its nonzero elements,
+# which are collected by row for each model before its recursions start. For
+# the companion form transition matrices of ARIMA models this reduces the
+# cost of the covariance recursion from O(m^3) to O(m^2) per period.
+#
+# Once the predicted state covariance matrix of a model has converged, and
+# there are no missing observations in the remaining periods, the covariance
+# recursion is skipped and the forecast error variance and the Kalman gain
+# are held fixed.
+
+cpdef int sbatch_filter(np.float32_t [:, ::1] endog,
+                                 np.uint8_t [:, ::1] missing,
+                                 np.float32_t [:, ::1] design,
+                                 np.float32_t [:, ::1] obs_intercept,
+                                 np.float32_t [::1] obs_cov,
+                                 np.float32_t [:, :, ::1] transition,
+                                 np.float32_t [:, :, ::1] state_intercept,
+                                 np.float32_t [:, :, ::1] selected_state_cov,
+                                 np.float32_t [:, ::1] state,
+                                 np.float32_t [:, :, ::1] state_cov,
+                                 np.float32_t [:, ::1] loglikelihood,
+                                 np.float32_t [:, ::1] forecasts,
+                                 np.float32_t [:, ::1] forecasts_error_cov,
+                                 np.float64_t tolerance) except *:
+    """
+    sbatch_filter(endog, missing, design, obs_intercept, obs_cov, transition, state_intercept, selected_state_cov, state, state_cov, loglikelihood, forecasts, forecasts_error_cov, tolerance)
+
+    `state` and `state_cov` hold the initial state mean and covariance on
+    entry and the one-step ahead prediction for period nobs + 1 on exit.
+    """
+    cdef:
+        int n_series = endog.shape[0]
+        int nobs = endog.shape[1]
+        int k_states = transition.shape[1]
+        int i, t, j, k, l, n, last_missing, converged
+        int [::1] row_start, columns
+        np.float32_t f, log_f, error, forecast, value, delta
+        np.float32_t [::1] pz, gain, state_tmp
+        np.float32_t [:, ::1] cov_tmp, cov_filtered
+        np.float32_t log_2pi = dlog(2 * NPY_PI)
+
+    pz = np.zeros(k_states, dtype=np.float32)
+    gain = np.zeros(k_states, dtype=np.float32)
+    state_tmp = np.zeros(k_states, dtype=np.float32)
+    cov_tmp = np.zeros((k_states, k_states), dtype=np.float32)
+    cov_filtered = np.zeros((k_states, k_states), dtype=np.float32)
+    row_start = np.zeros(k_states + 1, dtype=np.intc)
+    columns = np.zeros(k_states**2, dtype=np.intc)
+
+    for i in range(n_series):
+        # the steady state is only used after the last missing observation
+        last_missing = -1
+        for t in range(nobs):
+            if missing[i, t]:
+                last_missing = t
+        # nonzero elements of the transition matrix
+        n = 0
+        for j in range(k_states):
+            row_start[j] = n
+            for k in range(k_states):
+                if not transition[i, j, k] == 0:
+                    columns[n] = k
+                    n = n + 1
+        row_start[k_states] = n
+
+        converged = 0
+        f = 1
+        log_f = 0
+
+        for t in range(nobs):
+            # P Z' and F = Z P Z' + H
+            if not converged:
+                f = obs_cov[i]
+                for j in range(k_states):
+                    value = 0
+                    for k in range(k_states):
+                        value = value + state_cov[i, j, k] * design[i, k]
+                    pz[j] = value
+                    f = f + design[i, j] * value
+                if not missing[i, t]:
+                    for j in range(k_states):
+                        gain[j] = pz[j] / f
+                    log_f = dlog(f)
+
+            forecast = obs_intercept[i, t]
+            for j in range(k_states):
+                forecast = forecast + design[i, j] * state[i, j]
+            forecasts[i, t] = forecast
+            forecasts_error_cov[i, t] = f
+
+            # filtered state and log-likelihood
+            if not missing[i, t]:
+                error = endog[i, t] - forecast
+                for j in range(k_states):
+                    state[i, j] = state[i, j] + gain[j] * error
+                loglikelihood[i, t] = -0.5 * (log_2pi + log_f +
+                                              error * error / f)
+
+            # predicted state T a + c
+            for j in range(k_states):
+                value = state_intercept[i, j, t]
+                for n in range(row_start[j], row_start[j + 1]):
+                    k = columns[n]
+                    value = value + transition[i, j, k] * state[i, k]
+                state_tmp[j] = value
+            for j in range(k_states):
+                state[i, j] = state_tmp[j]
+
+            # predicted state covariance T (P - K P Z') T' + R Q R'
+            if not converged:
+                for j in range(k_states):
+                    for k in range(k_states):
+                        cov_filtered[j, k] = state_cov[i, j, k]
+                        if not missing[i, t]:
+                            cov_filtered[j, k] = (cov_filtered[j, k] -
+                                                  gain[j] * pz[k])
+                for j in range(k_states):
+                    for k in range(k_states):
+                        value = 0
+                        for n in range(row_start[j], row_start[j + 1]):
+                            l = columns[n]
+                            value = (value +
+                                     transition[i, j, l] * cov_filtered[l, k])
+                        cov_tmp[j, k] = value
+                delta = 0
+                for j in range(k_states):
+                    for k in range(k_states):
+                        value = selected_state_cov[i, j, k]
+                        for n in range(row_start[k], row_start[k + 1]):
+                            l = columns[n]
+                            value = value + cov_tmp[j, l] * transition[i, k, l]
+                        delta = delta + ((value - state_cov[i, j, k]) *
+                                         (value - state_cov[i, j, k]))
+                        state_cov[i, j, k] = value
+                converged = (t > last_missing and
+                             dabs(delta) < tolerance)
+
+    return 0
+
+cpdef int dbatch_filter(np.float64_t [:, ::1] endog,
+                                 np.uint8_t [:, ::1] missing,
+                                 np.float64_t [:, ::1] design,
+                                 np.float64_t [:, ::1] obs_intercept,
+                                 np.float64_t [::1] obs_cov,
+                                 np.float64_t [:, :, ::1] transition,
+                                 np.float64_t [:, :, ::1] state_intercept,
+                                 np.float64_t [:, :, ::1] selected_state_cov,
+                                 np.float64_t [:, ::1] state,
+                                 np.float64_t [:, :, ::1] state_cov,
+                                 np.float64_t [:, ::1] loglikelihood,
+                                 np.float64_t [:, ::1] forecasts,
+                                 np.float64_t [:, ::1] forecasts_error_cov,
+                                 np.float64_t tolerance) except *:
+    """
+    dbatch_filter(endog, missing, design, obs_intercept, obs_cov, transition, state_intercept, selected_state_cov, state, state_cov, loglikelihood, forecasts, forecasts_error_cov, tolerance)
+
+    `state` and `state_cov` hold the initial state mean and covariance on
+    entry and the one-step ahead prediction for period nobs + 1 on exit.
+    """
+    cdef:
+        int n_series = endog.shape[0]
+        int nobs = endog.shape[1]
+        int k_states = transition.shape[1]
+        int i, t, j, k, l, n, last_missing, converged
+        int [::1] row_start, columns
+        np.float64_t f, log_f, error, forecast, value, delta
+        np.float64_t [::1] pz, gain, state_tmp
+        np.float64_t [:, ::1] cov_tmp, cov_filtered
+        np.float64_t log_2pi = dlog(2 * NPY_PI)
+
+    pz = np.zeros(k_states, dtype=float)
+    gain = np.zeros(k_states, dtype=float)
+    state_tmp = np.zeros(k_states, dtype=float)
+    cov_tmp = np.zeros((k_states, k_states), dtype=float)
+    cov_filtered = np.zeros((k_states, k_states), dtype=float)
+    row_start = np.zeros(k_states + 1, dtype=np.intc)
+    columns = np.zeros(k_states**2, dtype=np.intc)
+
+    for i in range(n_series):
+        # the steady state is only used after the last missing observation
+        last_missing = -1
+        for t in range(nobs):
+            if missing[i, t]:
+                last_missing = t
+        # nonzero elements of the transition matrix
+        n = 0
+        for j in range(k_states):
+            row_start[j] = n
+            for k in range(k_states):
+                if not transition[i, j, k] == 0:
+                    columns[n] = k
+                    n = n + 1
+        row_start[k_states] = n
+
+        converged = 0
+        f = 1
+        log_f = 0
+
+        for t in range(nobs):
+            # P Z' and F = Z P Z' + H
+            if not converged:
+                f = obs_cov[i]
+                for j in range(k_states):
+                    value = 0
+                    for k in range(k_states):
+                        value = value + state_cov[i, j, k] * design[i, k]
+                    pz[j] = value
+                    f = f + design[i, j] * value
+                if not missing[i, t]:
+                    for j in range(k_states):
+                        gain[j] = pz[j] / f
+                    log_f = dlog(f)
+
+            forecast = obs_intercept[i, t]
+            for j in range(k_states):
+                forecast = forecast + design[i, j] * state[i, j]
+            forecasts[i, t] = forecast
+            forecasts_error_cov[i, t] = f
+
+            # filtered state and log-likelihood
+            if not missing[i, t]:
+                error = endog[i, t] - forecast
+                for j in range(k_states):
+                    state[i, j] = state[i, j] + gain[j] * error
+                loglikelihood[i, t] = -0.5 * (log_2pi + log_f +
+                                              error * error / f)
+
+            # predicted state T a + c
+            for j in range(k_states):
+                value = state_intercept[i, j, t]
+                for n in range(row_start[j], row_start[j + 1]):
+                    k = columns[n]
+                    value = value + transition[i, j, k] * state[i, k]
+                state_tmp[j] = value
+            for j in range(k_states):
+                state[i, j] = state_tmp[j]
+
+            # predicted state covariance T (P - K P Z') T' + R Q R'
+            if not converged:
+                for j in range(k_states):
+                    for k in range(k_states):
+                        cov_filtered[j, k] = state_cov[i, j, k]
+                        if not missing[i, t]:
+                            cov_filtered[j, k] = (cov_filtered[j, k] -
+                                                  gain[j] * pz[k])
+                for j in range(k_states):
+                    for k in range(k_states):
+                        value = 0
+                        for n in range(row_start[j], row_start[j + 1]):
+                            l = columns[n]
+                            value = (value +
+                                     transition[i, j, l] * cov_filtered[l, k])
+                        cov_tmp[j, k] = value
+                delta = 0
+                for j in range(k_states):
+                    for k in range(k_states):
+                        value = selected_state_cov[i, j, k]
+                        for n in range(row_start[k], row_start[k + 1]):
+                            l = columns[n]
+                            value = value + cov_tmp[j, l] * transition[i, k, l]
+                        delta = delta + ((value - state_cov[i, j, k]) *
+                                         (value - state_cov[i, j, k]))
+                        state_cov[i, j, k] = value
+                converged = (t > last_missing and
+                             dabs(delta) < tolerance)
+
+    return 0
+
+cpdef int cbatch_filter(np.complex64_t [:, ::1] endog,
+                                 np.uint8_t [:, ::1] missing,
+                                 np.complex64_t [:, ::1] design,
+                                 np.complex64_t [:, ::1] obs_intercept,
+                                 np.complex64_t [::1] obs_cov,
+                                 np.complex64_t [:, :, ::1] transition,
+                                 np.complex64_t [:, :, ::1] state_intercept,
+                                 np.complex64_t [:, :, ::1] selected_state_cov,
+                                 np.complex64_t [:, ::1] state,
+                                 np.complex64_t [:, :, ::1] state_cov,
+                                 np.complex64_t [:, ::1] loglikelihood,
+                                 np.complex64_t [:, ::1] forecasts,
+                                 np.complex64_t [:, ::1] forecasts_error_cov,
+                                 np.float64_t tolerance) except *:
+    """
+    cbatch_filter(endog, missing, design, obs_intercept, obs_cov, transition, state_intercept, selected_state_cov, state, state_cov, loglikelihood, forecasts, forecasts_error_cov, tolerance)
+
+    `state` and `state_cov` hold the initial state mean and covariance on
+    entry and the one-step ahead prediction for period nobs + 1 on exit.
+    """
+    cdef:
+        int n_series = endog.shape[0]
+        int nobs = endog.shape[1]
+        int k_states = transition.shape[1]
+        int i, t, j, k, l, n, last_missing, converged
+        int [::1] row_start, columns
+        np.complex64_t f, log_f, error, forecast, value, delta
+        np.complex64_t [::1] pz, gain, state_tmp
+        np.complex64_t [:, ::1] cov_tmp, cov_filtered
+        np.complex64_t log_2pi = dlog(2 * NPY_PI)
+
+    pz = np.zeros(k_states, dtype=np.complex64)
+    gain = np.zeros(k_states, dtype=np.complex64)
+    state_tmp = np.zeros(k_states, dtype=np.complex64)
+    cov_tmp = np.zeros((k_states, k_states), dtype=np.complex64)
+    cov_filtered = np.zeros((k_states, k_states), dtype=np.complex64)
+    row_start = np.zeros(k_states + 1, dtype=np.intc)
+    columns = np.zeros(k_states**2, dtype=np.intc)
+
+    for i in range(n_series):
+        # the steady state is only used after the last missing observation
+        last_missing = -1
+        for t in range(nobs):
+            if missing[i, t]:
+                last_missing = t
+        # nonzero elements of the transition matrix
+        n = 0
+        for j in range(k_states):
+            row_start[j] = n
+            for k in range(k_states):
+                if not transition[i, j, k] == 0:
+                    columns[n] = k
+                    n = n + 1
+        row_start[k_states] = n
+
+        converged = 0
+        f = 1
+        log_f = 0
+
+        for t in range(nobs):
+            # P Z' and F = Z P Z' + H
+            if not converged:
+                f = obs_cov[i]
+                for j in range(k_states):
+                    value = 0
+                    for k in range(k_states):
+                        value = value + state_cov[i, j, k] * design[i, k]
+                    pz[j] = value
+                    f = f + design[i, j] * value
+                if not missing[i, t]:
+                    for j in range(k_states):
+                        gain[j] = pz[j] / f
+                    log_f = zlog(f)
+
+            forecast = obs_intercept[i, t]
+            for j in range(k_states):
+                forecast = forecast + design[i, j] * state[i, j]
+            forecasts[i, t] = forecast
+            forecasts_error_cov[i, t] = f
+
+            # filtered state and log-likelihood
+            if not missing[i, t]:
+                error = endog[i, t] - forecast
+                for j in range(k_states):
+                    state[i, j] = state[i, j] + gain[j] * error
+                loglikelihood[i, t] = -0.5 * (log_2pi + log_f +
+                                              error * error / f)
+
+            # predicted state T a + c
+            for j in range(k_states):
+                value = state_intercept[i, j, t]
+                for n in range(row_start[j], row_start[j + 1]):
+                    k = columns[n]
+                    value = value + transition[i, j, k] * state[i, k]
+                state_tmp[j] = value
+            for j in range(k_states):
+                state[i, j] = state_tmp[j]
+
+            # predicted state covariance T (P - K P Z') T' + R Q R'
+            if not converged:
+                for j in range(k_states):
+                    for k in range(k_states):
+                        cov_filtered[j, k] = state_cov[i, j, k]
+                        if not missing[i, t]:
+                            cov_filtered[j, k] = (cov_filtered[j, k] -
+                                                  gain[j] * pz[k])
+                for j in range(k_states):
+                    for k in range(k_states):
+                        value = 0
+                        for n in range(row_start[j], row_start[j + 1]):
+                            l = columns[n]
+                            value = (value +
+                                     transition[i, j, l] * cov_filtered[l, k])
+                        cov_tmp[j, k] = value
+                delta = 0
+                for j in range(k_states):
+                    for k in range(k_states):
+                        value = selected_state_cov[i, j, k]
+                        for n in range(row_start[k], row_start[k + 1]):
+                            l = columns[n]
+                            value = value + cov_tmp[j, l] * transition[i, k, l]
+                        delta = delta + ((value - state_cov[i, j, k]) *
+                                         (value - state_cov[i, j, k]))
+                        state_cov[i, j, k] = value
+                converged = (t > last_missing and
+                             zabs(delta) < tolerance)
+
+    return 0
+
+cpdef int zbatch_filter(np.complex128_t [:, ::1] endog,
+                                 np.uint8_t [:, ::1] missing,
+                                 np.complex128_t [:, ::1] design,
+                                 np.complex128_t [:, ::1] obs_intercept,
+                                 np.complex128_t [::1] obs_cov,
+                                 np.complex128_t [:, :, ::1] transition,
+                                 np.complex128_t [:, :, ::1] state_intercept,
+                                 np.complex128_t [:, :, ::1] selected_state_cov,
+                                 np.complex128_t [:, ::1] state,
+                                 np.complex128_t [:, :, ::1] state_cov,
+                                 np.complex128_t [:, ::1] loglikelihood,
+                                 np.complex128_t [:, ::1] forecasts,
+                                 np.complex128_t [:, ::1] forecasts_error_cov,
+                                 np.float64_t tolerance) except *:
+    """
+    zbatch_filter(endog, missing, design, obs_intercept, obs_cov, transition, state_intercept, selected_state_cov, state, state_cov, loglikelihood, forecasts, forecasts_error_cov, tolerance)
+
+    `state` and `state_cov` hold the initial state mean and covariance on
+    entry and the one-step ahead prediction for period nobs + 1 on exit.
+    """
+    cdef:
+        int n_series = endog.shape[0]
+        int nobs = endog.shape[1]
+        int k_states = transition.shape[1]
+        int i, t, j, k, l, n, last_missing, converged
+        int [::1] row_start, columns
+        np.complex128_t f, log_f, error, forecast, value, delta
+        np.complex128_t [::1] pz, gain, state_tmp
+        np.complex128_t [:, ::1] cov_tmp, cov_filtered
+        np.complex128_t log_2pi = dlog(2 * NPY_PI)
+
+    pz = np.zeros(k_states, dtype=complex)
+    gain = np.zeros(k_states, dtype=complex)
+    state_tmp = np.zeros(k_states, dtype=complex)
+    cov_tmp = np.zeros((k_states, k_states), dtype=complex)
+    cov_filtered = np.zeros((k_states, k_states), dtype=complex)
+    row_start = np.zeros(k_states + 1, dtype=np.intc)
+    columns = np.zeros(k_states**2, dtype=np.intc)
+
+    for i in range(n_series):
+        # the steady state is only used after the last missing observation
+        last_missing = -1
+        for t in range(nobs):
+            if missing[i, t]:
+                last_missing = t
+        # nonzero elements of the transition matrix
+        n = 0
+        for j in range(k_states):
+            row_start[j] = n
+            for k in range(k_states):
+                if not transition[i, j, k] == 0:
+                    columns[n] = k
+                    n = n + 1
+        row_start[k_states] = n
+
+        converged = 0
+        f = 1
+        log_f = 0
+
+        for t in range(nobs):
+            # P Z' and F = Z P Z' + H
+            if not converged:
+                f = obs_cov[i]
+                for j in range(k_states):
+                    value = 0
+                    for k in range(k_states):
+                        value = value + state_cov[i, j, k] * design[i, k]
+                    pz[j] = value
+                    f = f + design[i, j] * value
+                if not missing[i, t]:
+                    for j in range(k_states):
+                        gain[j] = pz[j] / f
+                    log_f = zlog(f)
+
+            forecast = obs_intercept[i, t]
+            for j in range(k_states):
+                forecast = forecast + design[i, j] * state[i, j]
+            forecasts[i, t] = forecast
+            forecasts_error_cov[i, t] = f
+
+            # filtered state and log-likelihood
+            if not missing[i, t]:
+                error = endog[i, t] - forecast
+                for j in range(k_states):
+                    state[i, j] = state[i, j] + gain[j] * error
+                loglikelihood[i, t] = -0.5 * (log_2pi + log_f +
+                                              error * error / f)
+
+            # predicted state T a + c
+            for j in range(k_states):
+                value = state_intercept[i, j, t]
+                for n in range(row_start[j], row_start[j + 1]):
+                    k = columns[n]
+                    value = value + transition[i, j, k] * state[i, k]
+                state_tmp[j] = value
+            for j in range(k_states):
+                state[i, j] = state_tmp[j]
+
+            # predicted state covariance T (P - K P Z') T' + R Q R'
+            if not converged:
+                for j in range(k_states):
+                    for k in range(k_states):
+                        cov_filtered[j, k] = state_cov[i, j, k]
+                        if not missing[i, t]:
+                            cov_filtered[j, k] = (cov_filtered[j, k] -
+                                                  gain[j] * pz[k])
+                for j in range(k_states):
+                    for k in range(k_states):
+                        value = 0
+                        for n in range(row_start[j], row_start[j + 1]):
+                            l = columns[n]
+                            value = (value +
+                                     transition[i, j, l] * cov_filtered[l, k])
+                        cov_tmp[j, k] = value
+                delta = 0
+                for j in range(k_states):
+                    for k in range(k_states):
+                        value = selected_state_cov[i, j, k]
+                        for n in range(row_start[k], row_start[k + 1]):
+                            l = columns[n]
+                            value = value + cov_tmp[j, l] * transition[i, k, l]
+                        delta = delta + ((value - state_cov[i, j, k]) *
+                                         (value - state_cov[i, j, k]))
+                        state_cov[i, j, k] = value
+                converged = (t > last_missing and
+                             zabs(delta) < tolerance)
+
+    return 0
@@ -0,0 +1,37 @@
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: cdivision=False
+"""
+State Space Models - Chandrasekhar recursions declarations
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+
+cimport numpy as np
+from statsmodels.tsa.statespace._representation cimport (
+    sStatespace, dStatespace, cStatespace, zStatespace
+)
+from statsmodels.tsa.statespace._kalman_filter cimport (
+    sKalmanFilter, dKalmanFilter, cKalmanFilter, zKalmanFilter
+)
+
+# Single precision
+cdef int sfactorize_increment_chandrasekhar(sKalmanFilter kfilter, sStatespace model)
+cdef int sadvance_increment_chandrasekhar(sKalmanFilter kfilter, sStatespace model)
+cdef int supdating_chandrasekhar(sKalmanFilter kfilter, sStatespace model)
+cdef int sprediction_chandrasekhar(sKalmanFilter kfilter, sStatespace model)
+
+# Double precision
+cdef int dfactorize_increment_chandrasekhar(dKalmanFilter kfilter, dStatespace model)
+cdef int dadvance_increment_chandrasekhar(dKalmanFilter kfilter, dStatespace model)
+cdef int dupdating_chandrasekhar(dKalmanFilter kfilter, dStatespace model)
+cdef int dprediction_chandrasekhar(dKalmanFilter kfilter, dStatespace model)
+
+# Single precision complex
+cdef int cupdating_chandrasekhar(cKalmanFilter kfilter, cStatespace model)
+cdef int cprediction_chandrasekhar(cKalmanFilter kfilter, cStatespace model)
+
+# Double precision complex
+cdef int zupdating_chandrasekhar(zKalmanFilter kfilter, zStatespace model)
+cdef int zprediction_chandrasekhar(zKalmanFilter kfilter, zStatespace model)
@@ -0,0 +1,579 @@
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: cdivision=False
+"""
+State Space Models - Chandrasekhar recursions
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+
+# Typical imports
+cimport numpy as np
+from statsmodels.src.math cimport *
+cimport scipy.linalg.cython_blas as blas
+cimport scipy.linalg.cython_lapack as lapack
+
+from statsmodels.tsa.statespace._filters._conventional cimport (
+    supdating_conventional, sprediction_conventional,
+    dupdating_conventional, dprediction_conventional,
+    cupdating_conventional, cprediction_conventional,
+    zupdating_conventional, zprediction_conventional
+)
+
+# ### Chandrasekhar recursions
+#
+# See Morf, Sidhu and Kailath (1974) and Herbst (2015)
+#
+# In a time-invariant model, the increments of the predicted state covariance
+# matrix $\Delta P_t = P_{t+1} - P_t$ are typically of low rank (e.g. for a
+# stationary initialization the rank is at most $p$, the number of observed
+# variables), and they can be propagated in factored form
+# $\Delta P_t = W_t M_t W_t'$ with $W_t$ of dimension $(m \times r)$ and $M_t$
+# of dimension $(r \times r)$:
+#
+# $$
+# \begin{aligned}
+# P_{t+1} & = P_t + W_t M_t W_t' \\
+# F_{t+1} & = F_t + Z W_t M_t W_t' Z' \\
+# W_{t+1} & = (T - K_t Z) W_t \\
+# M_{t+1} & = M_t - M_t W_t' Z' F_{t+1}^{-1} Z W_t M_t
+# \end{aligned}
+# $$
+#
+# where $K_t = T P_t Z' F_t^{-1}$ is the Kalman gain. This replaces the
+# $O(m^3)$ Riccati recursion $P_{t+1} = T P_{t|t} T' + R Q R'$ with
+# operations that are $O(m^2 r)$. The updating step is also rearranged so
+# that $P_{t|t}$ and $K_t$ are computed from $P_t Z' F_t^{-1}$ in $O(m^2 p)$
+# operations, so that no step of the filter is cubic in the state dimension.
+#
+# The increments are initialized (and re-initialized, e.g. after periods
+# with missing observations, for which the recursions do not hold) by a
+# conventional prediction step, after which $\Delta P_t$ is factorized with a
+# symmetric eigendecomposition, discarding eigenvalues that are zero up to
+# the precision of $P_{t+1}$. The rank of the factorization then determines
+# the cost of the subsequent recursions. The conventional recursions are
+# used in the burn-in periods of the loglikelihood, in which the approximate
+# diffuse part of an initialization is being resolved; afterwards the rank is
+# usually smallest (and the recursions most accurate) with the exact diffuse
+# initialization. After each step $W_t$ is re-normalized by a QR
+# decomposition $W_t = Q R$, setting $W_t = Q$ and $M_t = R M_t R'$, so that
+# the factors do not grow without bound.
+#
+# The `chandrasekhar_t` attribute of the filter object records the period
+# for which the factors $W_t, M_t$ are held, and is reset when the filter
+# does not continue from the previous period.
+#
+# Complex-step differentiation requires the recursions to be analytic
+# functions of the parameters, which the eigendecomposition is not, so the
+# complex-valued filters use the conventional recursions.
+cdef int sfactorize_increment_chandrasekhar(sKalmanFilter kfilter, sStatespace model):
+    """
+    Factorize $\Delta P_t = P_{t+1} - P_t = W_t M_t W_t'$
+
+    Returns zero if the factorization was successful.
+    """
+    cdef:
+        int inc = 1, i, j, info, rank = 0
+        np.float32_t gamma = -1.0
+        np.float32_t value, tol = 0
+
+    # $\\# = P_{t+1} - P_t$
+    blas.scopy(&kfilter.k_states2, kfilter._predicted_state_cov, &inc, kfilter._chandrasekhar_work, &inc)
+    blas.saxpy(&kfilter.k_states2, &gamma, kfilter._input_state_cov, &inc, kfilter._chandrasekhar_work, &inc)
+
+    # $\\# = U \Lambda U'$, with the eigenvectors overwriting $\\#$
+    lapack.ssyev("V", "U", &model._k_states, kfilter._chandrasekhar_work, &kfilter.k_states,
+                       kfilter._chandrasekhar_eig, &kfilter._chandrasekhar_eig[kfilter.k_states],
+                       &kfilter.lchandrasekhar_work, &info)
+    if not info == 0:
+        return info
+
+    # Eigenvalues that are small relative to the scale of $P_{t+1}$ are
+    # rounding error
+    for i in range(model._k_states):
+        value = kfilter._chandrasekhar_eig[i]
+        if value < 0:
+            value = -value
+        if value > tol:
+            tol = value
+        value = kfilter._predicted_state_cov[i + i*kfilter.k_states]
+        if value > tol:
+            tol = value
+    tol = model._k_states * 1.1920929e-07 * tol
+
+    # $W_t$ holds the retained eigenvectors and $M_t$ the (diagonal matrix
+    # of) associated eigenvalues
+    for i in range(model._k_states):
+        value = kfilter._chandrasekhar_eig[i]
+        if value > tol or value < -tol:
+            blas.scopy(&model._k_states, &kfilter._chandrasekhar_work[i*kfilter.k_states], &inc,
+                                                 &kfilter._chandrasekhar_W[rank*kfilter.k_states], &inc)
+            rank = rank + 1
+            for j in range(rank):
+                kfilter._chandrasekhar_M[j + (rank-1)*kfilter.k_states] = 0
+                kfilter._chandrasekhar_M[(rank-1) + j*kfilter.k_states] = 0
+            kfilter._chandrasekhar_M[(rank-1) + (rank-1)*kfilter.k_states] = value
+    kfilter.chandrasekhar_rank = rank
+
+    return 0
+
+cdef int sadvance_increment_chandrasekhar(sKalmanFilter kfilter, sStatespace model):
+    """
+    Compute $W_{t+1}, M_{t+1}$ from $W_t, M_t$
+
+    Returns zero if the recursion was successful.
+    """
+    cdef:
+        int inc = 1, info, n
+        int rank = kfilter.chandrasekhar_rank
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+        np.float32_t gamma = -1.0
+
+    if rank == 0:
+        return 0
+
+    # $\\#_{ZW} = Z W_t$
+    # $(p \times r) = (p \times m) (m \times r)$
+    blas.sgemm("N", "N", &model._k_endog, &rank, &model._k_states,
+          &alpha, model._design, &model._k_endog,
+                  kfilter._chandrasekhar_W, &kfilter.k_states,
+          &beta, kfilter._chandrasekhar_ZW, &kfilter.k_endog)
+
+    # $\\#_G = Z W_t M_t$
+    # $(p \times r) = (p \times r) (r \times r)$
+    blas.sgemm("N", "N", &model._k_endog, &rank, &rank,
+          &alpha, kfilter._chandrasekhar_ZW, &kfilter.k_endog,
+                  kfilter._chandrasekhar_M, &kfilter.k_states,
+          &beta, kfilter._chandrasekhar_G, &kfilter.k_endog)
+
+    # $F_{t+1} = F_t + \\#_G \\#_{ZW}'$
+    # $(p \times p) = (p \times p) + (p \times r) (p \times r)'$
+    blas.scopy(&kfilter.k_endog2, kfilter._forecast_error_cov, &inc, kfilter._chandrasekhar_F, &inc)
+    blas.sgemm("N", "T", &model._k_endog, &model._k_endog, &rank,
+          &alpha, kfilter._chandrasekhar_G, &kfilter.k_endog,
+                  kfilter._chandrasekhar_ZW, &kfilter.k_endog,
+          &alpha, kfilter._chandrasekhar_F, &kfilter.k_endog)
+
+    # `work` array used here, dimension $(m \times r)$
+    # $\\# = T W_t - K_t \\#_{ZW}$
+    # $(m \times r) = (m \times m) (m \times r) - (m \times p) (p \times r)$
+    blas.sgemm("N", "N", &model._k_states, &rank, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._chandrasekhar_W, &kfilter.k_states,
+          &beta, kfilter._chandrasekhar_work, &kfilter.k_states)
+    blas.sgemm("N", "N", &model._k_states, &rank, &model._k_endog,
+          &gamma, kfilter._kalman_gain, &kfilter.k_states,
+                  kfilter._chandrasekhar_ZW, &kfilter.k_endog,
+          &alpha, kfilter._chandrasekhar_work, &kfilter.k_states)
+
+    # $\\#_{ZW} = F_{t+1}^{-1} \\#_G$
+    # $(p \times r) = (p \times p) (p \times r)$
+    n = kfilter.k_endog * rank
+    blas.scopy(&n, kfilter._chandrasekhar_G, &inc, kfilter._chandrasekhar_ZW, &inc)
+    lapack.sposv("U", &model._k_endog, &rank,
+                       kfilter._chandrasekhar_F, &kfilter.k_endog,
+                       kfilter._chandrasekhar_ZW, &kfilter.k_endog, &info)
+    if not info == 0:
+        return info
+
+    # $\tilde M = M_t - \\#_G' \\#_{ZW}$
+    # $(r \times r) = (r \times r) - (p \times r)' (p \times r)$
+    blas.sgemm("T", "N", &rank, &rank, &model._k_endog,
+          &gamma, kfilter._chandrasekhar_G, &kfilter.k_endog,
+                  kfilter._chandrasekhar_ZW, &kfilter.k_endog,
+          &alpha, kfilter._chandrasekhar_M, &kfilter.k_states)
+
+    # The factorization of the increment is only unique up to
+    # $W M W' = (W A) (A^{-1} M A^{-1}') (W A)'$, and left to itself the
+    # scale of $W_t$ typically decays while that of $M_t$ grows, so that the
+    # increments are formed from large, cancelling terms. The factors are
+    # re-normalized using the QR decomposition $\\# = Q R$, so that
+    # $W_{t+1} = Q$ has orthonormal columns and $M_{t+1} = R \tilde M R'$
+    lapack.sgeqrf(&model._k_states, &rank, kfilter._chandrasekhar_work, &kfilter.k_states,
+                        kfilter._chandrasekhar_eig, &kfilter._chandrasekhar_eig[kfilter.k_states],
+                        &kfilter.lchandrasekhar_work, &info)
+    if not info == 0:
+        return info
+    blas.strmm("L", "U", "N", "N", &rank, &rank,
+          &alpha, kfilter._chandrasekhar_work, &kfilter.k_states,
+                  kfilter._chandrasekhar_M, &kfilter.k_states)
+    blas.strmm("R", "U", "T", "N", &rank, &rank,
+          &alpha, kfilter._chandrasekhar_work, &kfilter.k_states,
+                  kfilter._chandrasekhar_M, &kfilter.k_states)
+    lapack.sorgqr(&model._k_states, &rank, &rank, kfilter._chandrasekhar_work, &kfilter.k_states,
+                        kfilter._chandrasekhar_eig, &kfilter._chandrasekhar_eig[kfilter.k_states],
+                        &kfilter.lchandrasekhar_work, &info)
+    if not info == 0:
+        return info
+    n = kfilter.k_states * rank
+    blas.scopy(&n, kfilter._chandrasekhar_work, &inc, kfilter._chandrasekhar_W, &inc)
+
+    return 0
+
+cdef int supdating_chandrasekhar(sKalmanFilter kfilter, sStatespace model):
+    # Constants
+    cdef:
+        int inc = 1
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+        np.float32_t gamma = -1.0
+
+    if kfilter.converged:
+        return supdating_conventional(kfilter, model)
+
+    # #### Filtered state for time t
+    # $a_{t|t} = a_t + P_t Z_t' F_t^{-1} v_t$
+    # $a_{t|t} = 1.0 * \\#_1 \\#_2 + 1.0 a_t$
+    blas.scopy(&kfilter.k_states, kfilter._input_state, &inc, kfilter._filtered_state, &inc)
+    blas.sgemv("N", &model._k_states, &model._k_endog,
+          &alpha, kfilter._tmp1, &kfilter.k_states,
+                  kfilter._tmp2, &inc,
+          &alpha, kfilter._filtered_state, &inc)
+
+    # `tmp0` array used here, dimension $(m \times p)$
+    # $\\#_0 = P_t Z_t' F_t^{-1} = P_t \\#_3'$
+    # $(m \times p) = (m \times m) (p \times m)'$
+    blas.sgemm("N", "T", &model._k_states, &model._k_endog, &model._k_states,
+          &alpha, kfilter._input_state_cov, &kfilter.k_states,
+                  kfilter._tmp3, &kfilter.k_endog,
+          &beta, kfilter._tmp0, &kfilter.k_states)
+
+    # #### Filtered state covariance for time t
+    # $P_{t|t} = P_t - P_t Z_t' F_t^{-1} Z_t P_t$
+    # $P_{t|t} = P_t - \\#_1 \\#_0'$
+    # $(m \times m) = (m \times m) - (m \times p) (m \times p)'$
+    blas.scopy(&kfilter.k_states2, kfilter._input_state_cov, &inc, kfilter._filtered_state_cov, &inc)
+    blas.sgemm("N", "T", &model._k_states, &model._k_states, &model._k_endog,
+          &gamma, kfilter._tmp1, &kfilter.k_states,
+                  kfilter._tmp0, &kfilter.k_states,
+          &alpha, kfilter._filtered_state_cov, &kfilter.k_states)
+
+    # #### Kalman gain for time t
+    # $K_t = T_t P_t Z_t' F_t^{-1} = T_t \\#_0$
+    # $(m \times p) = (m \times m) (m \times p)$
+    blas.sgemm("N", "N", &model._k_states, &model._k_endog, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._tmp0, &kfilter.k_states,
+          &beta, kfilter._kalman_gain, &kfilter.k_states)
+
+    return 0
+
+cdef int sprediction_chandrasekhar(sKalmanFilter kfilter, sStatespace model):
+    # Constants
+    cdef:
+        int inc = 1
+        int rank = kfilter.chandrasekhar_rank
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+
+    # The recursions do not hold across periods with missing observations,
+    # and are not used in the burn-in periods of the loglikelihood
+    if kfilter.converged or model._nmissing > 0 or kfilter.t < kfilter.loglikelihood_burn:
+        kfilter.chandrasekhar_t = -1
+        return sprediction_conventional(kfilter, model)
+
+    # #### Initialize the increments
+    # $\Delta P_t = P_{t+1} - P_t$, with $P_{t+1}$ from the conventional
+    # prediction step
+    if not kfilter.chandrasekhar_t == kfilter.t:
+        sprediction_conventional(kfilter, model)
+        kfilter.chandrasekhar_t = -1
+        if sfactorize_increment_chandrasekhar(kfilter, model) == 0:
+            if sadvance_increment_chandrasekhar(kfilter, model) == 0:
+                kfilter.chandrasekhar_t = kfilter.t + 1
+        return 0
+
+    # #### Predicted state for time t+1
+    # $a_{t+1} = T_t a_{t|t} + c_t$
+    blas.scopy(&model._k_states, model._state_intercept, &inc, kfilter._predicted_state, &inc)
+    blas.sgemv("N", &model._k_states, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._filtered_state, &inc,
+          &alpha, kfilter._predicted_state, &inc)
+
+    # #### Predicted state covariance matrix for time t+1
+    # $P_{t+1} = P_t + W_t M_t W_t'$
+    blas.scopy(&kfilter.k_states2, kfilter._input_state_cov, &inc, kfilter._predicted_state_cov, &inc)
+    if rank > 0:
+        # $\\# = W_t M_t$
+        # $(m \times r) = (m \times r) (r \times r)$
+        blas.sgemm("N", "N", &model._k_states, &rank, &rank,
+              &alpha, kfilter._chandrasekhar_W, &kfilter.k_states,
+                      kfilter._chandrasekhar_M, &kfilter.k_states,
+              &beta, kfilter._chandrasekhar_work, &kfilter.k_states)
+        # $P_{t+1} = P_t + \\# W_t'$
+        # $(m \times m) = (m \times m) + (m \times r) (m \times r)'$
+        blas.sgemm("N", "T", &model._k_states, &model._k_states, &rank,
+              &alpha, kfilter._chandrasekhar_work, &kfilter.k_states,
+                      kfilter._chandrasekhar_W, &kfilter.k_states,
+              &alpha, kfilter._predicted_state_cov, &kfilter.k_states)
+
+    # #### Increments for time t+1
+    if sadvance_increment_chandrasekhar(kfilter, model) == 0:
+        kfilter.chandrasekhar_t = kfilter.t + 1
+    else:
+        kfilter.chandrasekhar_t = -1
+
+    return 0
+cdef int dfactorize_increment_chandrasekhar(dKalmanFilter kfilter, dStatespace model):
+    """
+    Factorize $\Delta P_t = P_{t+1} - P_t = W_t M_t W_t'$
+
+    Returns zero if the factorization was successful.
+    """
+    cdef:
+        int inc = 1, i, j, info, rank = 0
+        np.float64_t gamma = -1.0
+        np.float64_t value, tol = 0
+
+    # $\\# = P_{t+1} - P_t$
+    blas.dcopy(&kfilter.k_states2, kfilter._predicted_state_cov, &inc, kfilter._chandrasekhar_work, &inc)
+    blas.daxpy(&kfilter.k_states2, &gamma, kfilter._input_state_cov, &inc, kfilter._chandrasekhar_work, &inc)
+
+    # $\\# = U \Lambda U'$, with the eigenvectors overwriting $\\#$
+    lapack.dsyev("V", "U", &model._k_states, kfilter._chandrasekhar_work, &kfilter.k_states,
+                       kfilter._chandrasekhar_eig, &kfilter._chandrasekhar_eig[kfilter.k_states],
+                       &kfilter.lchandrasekhar_work, &info)
+    if not info == 0:
+        return info
+
+    # Eigenvalues that are small relative to the scale of $P_{t+1}$ are
+    # rounding error
+    for i in range(model._k_states):
+        value = kfilter._chandrasekhar_eig[i]
+        if value < 0:
+            value = -value
+        if value > tol:
+            tol = value
+        value = kfilter._predicted_state_cov[i + i*kfilter.k_states]
+        if value > tol:
+            tol = value
+    tol = model._k_states * 2.220446049250313e-16 * tol
+
+    # $W_t$ holds the retained eigenvectors and $M_t$ the (diagonal matrix
+    # of) associated eigenvalues
+    for i in range(model._k_states):
+        value = kfilter._chandrasekhar_eig[i]
+        if value > tol or value < -tol:
+            blas.dcopy(&model._k_states, &kfilter._chandrasekhar_work[i*kfilter.k_states], &inc,
+                                                 &kfilter._chandrasekhar_W[rank*kfilter.k_states], &inc)
+            rank = rank + 1
+            for j in range(rank):
+                kfilter._chandrasekhar_M[j + (rank-1)*kfilter.k_states] = 0
+                kfilter._chandrasekhar_M[(rank-1) + j*kfilter.k_states] = 0
+            kfilter._chandrasekhar_M[(rank-1) + (rank-1)*kfilter.k_states] = value
+    kfilter.chandrasekhar_rank = rank
+
+    return 0
+
+cdef int dadvance_increment_chandrasekhar(dKalmanFilter kfilter, dStatespace model):
+    """
+    Compute $W_{t+1}, M_{t+1}$ from $W_t, M_t$
+
+    Returns zero if the recursion was successful.
+    """
+    cdef:
+        int inc = 1, info, n
+        int rank = kfilter.chandrasekhar_rank
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+        np.float64_t gamma = -1.0
+
+    if rank == 0:
+        return 0
+
+    # $\\#_{ZW} = Z W_t$
+    # $(p \times r) = (p \times m) (m \times r)$
+    blas.dgemm("N", "N", &model._k_endog, &rank, &model._k_states,
+          &alpha, model._design, &model._k_endog,
+                  kfilter._chandrasekhar_W, &kfilter.k_states,
+          &beta, kfilter._chandrasekhar_ZW, &kfilter.k_endog)
+
+    # $\\#_G = Z W_t M_t$
+    # $(p \times r) = (p \times r) (r \times r)$
+    blas.dgemm("N", "N", &model._k_endog, &rank, &rank,
+          &alpha, kfilter._chandrasekhar_ZW, &kfilter.k_endog,
+                  kfilter._chandrasekhar_M, &kfilter.k_states,
+          &beta, kfilter._chandrasekhar_G, &kfilter.k_endog)
+
+    # $F_{t+1} = F_t + \\#_G \\#_{ZW}'$
+    # $(p \times p) = (p \times p) + (p \times r) (p \times r)'$
+    blas.dcopy(&kfilter.k_endog2, kfilter._forecast_error_cov, &inc, kfilter._chandrasekhar_F, &inc)
+    blas.dgemm("N", "T", &model._k_endog, &model._k_endog, &rank,
+          &alpha, kfilter._chandrasekhar_G, &kfilter.k_endog,
+                  kfilter._chandrasekhar_ZW, &kfilter.k_endog,
+          &alpha, kfilter._chandrasekhar_F, &kfilter.k_endog)
+
+    # `work` array used here, dimension $(m \times r)$
+    # $\\# = T W_t - K_t \\#_{ZW}$
+    # $(m \times r) = (m \times m) (m \times r) - (m \times p) (p \times r)$
+    blas.dgemm("N", "N", &model._k_states, &rank, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._chandrasekhar_W, &kfilter.k_states,
+          &beta, kfilter._chandrasekhar_work, &kfilter.k_states)
+    blas.dgemm("N", "N", &model._k_states, &rank, &model._k_endog,
+          &gamma, kfilter._kalman_gain, &kfilter.k_states,
+                  kfilter._chandrasekhar_ZW, &kfilter.k_endog,
+          &alpha, kfilter._chandrasekhar_work, &kfilter.k_states)
+
+    # $\\#_{ZW} = F_{t+1}^{-1} \\#_G$
+    # $(p \times r) = (p \times p) (p \times r)$
+    n = kfilter.k_endog * rank
+    blas.dcopy(&n, kfilter._chandrasekhar_G, &inc, kfilter._chandrasekhar_ZW, &inc)
+    lapack.dposv("U", &model._k_endog, &rank,
+                       kfilter._chandrasekhar_F, &kfilter.k_endog,
+                       kfilter._chandrasekhar_ZW, &kfilter.k_endog, &info)
+    if not info == 0:
+        return info
+
+    # $\tilde M = M_t - \\#_G' \\#_{ZW}$
+    # $(r \times r) = (r \times r) - (p \times r)' (p \times r)$
+    blas.dgemm("T", "N", &rank, &rank, &model._k_endog,
+          &gamma, kfilter._chandrasekhar_G, &kfilter.k_endog,
+                  kfilter._chandrasekhar_ZW, &kfilter.k_endog,
+          &alpha, kfilter._chandrasekhar_M, &kfilter.k_states)
+
+    # The factorization of the increment is only unique up to
+    # $W M W' = (W A) (A^{-1} M A^{-1}') (W A)'$, and left to itself the
+    # scale of $W_t$ typically decays while that of $M_t$ grows, so that the
+    # increments are formed from large, cancelling terms. The factors are
+    # re-normalized using the QR decomposition $\\# = Q R$, so that
+    # $W_{t+1} = Q$ has orthonormal columns and $M_{t+1} = R \tilde M R'$
+    lapack.dgeqrf(&model._k_states, &rank, kfilter._chandrasekhar_work, &kfilter.k_states,
+                        kfilter._chandrasekhar_eig, &kfilter._chandrasekhar_eig[kfilter.k_states],
+                        &kfilter.lchandrasekhar_work, &info)
+    if not info == 0:
+        return info
+    blas.dtrmm("L", "U", "N", "N", &rank, &rank,
+          &alpha, kfilter._chandrasekhar_work, &kfilter.k_states,
+                  kfilter._chandrasekhar_M, &kfilter.k_states)
+    blas.dtrmm("R", "U", "T", "N", &rank, &rank,
+          &alpha, kfilter._chandrasekhar_work, &kfilter.k_states,
+                  kfilter._chandrasekhar_M, &kfilter.k_states)
+    lapack.dorgqr(&model._k_states, &rank, &rank, kfilter._chandrasekhar_work, &kfilter.k_states,
+                        kfilter._chandrasekhar_eig, &kfilter._chandrasekhar_eig[kfilter.k_states],
+                        &kfilter.lchandrasekhar_work, &info)
+    if not info == 0:
+        return info
+    n = kfilter.k_states * rank
+    blas.dcopy(&n, kfilter._chandrasekhar_work, &inc, kfilter._chandrasekhar_W, &inc)
+
+    return 0
+
+cdef int dupdating_chandrasekhar(dKalmanFilter kfilter, dStatespace model):
+    # Constants
+    cdef:
+        int inc = 1
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+        np.float64_t gamma = -1.0
+
+    if kfilter.converged:
+        return dupdating_conventional(kfilter, model)
+
+    # #### Filtered state for time t
+    # $a_{t|t} = a_t + P_t Z_t' F_t^{-1} v_t$
+    # $a_{t|t} = 1.0 * \\#_1 \\#_2 + 1.0 a_t$
+    blas.dcopy(&kfilter.k_states, kfilter._input_state, &inc, kfilter._filtered_state, &inc)
+    blas.dgemv("N", &model._k_states, &model._k_endog,
+          &alpha, kfilter._tmp1, &kfilter.k_states,
+                  kfilter._tmp2, &inc,
+          &alpha, kfilter._filtered_state, &inc)
+
+    # `tmp0` array used here, dimension $(m \times p)$
+    # $\\#_0 = P_t Z_t' F_t^{-1} = P_t \\#_3'$
+    # $(m \times p) = (m \times m) (p \times m)'$
+    blas.dgemm("N", "T", &model._k_states, &model._k_endog, &model._k_states,
+          &alpha, kfilter._input_state_cov, &kfilter.k_states,
+                  kfilter._tmp3, &kfilter.k_endog,
+          &beta, kfilter._tmp0, &kfilter.k_states)
+
+    # #### Filtered state covariance for time t
+    # $P_{t|t} = P_t - P_t Z_t' F_t^{-1} Z_t P_t$
+    # $P_{t|t} = P_t - \\#_1 \\#_0'$
+    # $(m \times m) = (m \times m) - (m \times p) (m \times p)'$
+    blas.dcopy(&kfilter.k_states2, kfilter._input_state_cov, &inc, kfilter._filtered_state_cov, &inc)
+    blas.dgemm("N", "T", &model._k_states, &model._k_states, &model._k_endog,
+          &gamma, kfilter._tmp1, &kfilter.k_states,
+                  kfilter._tmp0, &kfilter.k_states,
+          &alpha, kfilter._filtered_state_cov, &kfilter.k_states)
+
+    # #### Kalman gain for time t
+    # $K_t = T_t P_t Z_t' F_t^{-1} = T_t \\#_0$
+    # $(m \times p) = (m \times m) (m \times p)$
+    blas.dgemm("N", "N", &model._k_states, &model._k_endog, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._tmp0, &kfilter.k_states,
+          &beta, kfilter._kalman_gain, &kfilter.k_states)
+
+    return 0
+
+cdef int dprediction_chandrasekhar(dKalmanFilter kfilter, dStatespace model):
+    # Constants
+    cdef:
+        int inc = 1
+        int rank = kfilter.chandrasekhar_rank
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+
+    # The recursions do not hold across periods with missing observations,
+    # and are not used in the burn-in periods of the loglikelihood
+    if kfilter.converged or model._nmissing > 0 or kfilter.t < kfilter.loglikelihood_burn:
+        kfilter.chandrasekhar_t = -1
+        return dprediction_conventional(kfilter, model)
+
+    # #### Initialize the increments
+    # $\Delta P_t = P_{t+1} - P_t$, with $P_{t+1}$ from the conventional
+    # prediction step
+    if not kfilter.chandrasekhar_t == kfilter.t:
+        dprediction_conventional(kfilter, model)
+        kfilter.chandrasekhar_t = -1
+        if dfactorize_increment_chandrasekhar(kfilter, model) == 0:
+            if dadvance_increment_chandrasekhar(kfilter, model) == 0:
+                kfilter.chandrasekhar_t = kfilter.t + 1
+        return 0
+
+    # #### Predicted state for time t+1
+    # $a_{t+1} = T_t a_{t|t} + c_t$
+    blas.dcopy(&model._k_states, model._state_intercept, &inc, kfilter._predicted_state, &inc)
+    blas.dgemv("N", &model._k_states, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._filtered_state, &inc,
+          &alpha, kfilter._predicted_state, &inc)
+
+    # #### Predicted state covariance matrix for time t+1
+    # $P_{t+1} = P_t + W_t M_t W_t'$
+    blas.dcopy(&kfilter.k_states2, kfilter._input_state_cov, &inc, kfilter._predicted_state_cov, &inc)
+    if rank > 0:
+        # $\\# = W_t M_t$
+        # $(m \times r) = (m \times r) (r \times r)$
+        blas.dgemm("N", "N", &model._k_states, &rank, &rank,
+              &alpha, kfilter._chandrasekhar_W, &kfilter.k_states,
+                      kfilter._chandrasekhar_M, &kfilter.k_states,
+              &beta, kfilter._chandrasekhar_work, &kfilter.k_states)
+        # $P_{t+1} = P_t + \\# W_t'$
+        # $(m \times m) = (m \times m) + (m \times r) (m \times r)'$
+        blas.dgemm("N", "T", &model._k_states, &model._k_states, &rank,
+              &alpha, kfilter._chandrasekhar_work, &kfilter.k_states,
+                      kfilter._chandrasekhar_W, &kfilter.k_states,
+              &alpha, kfilter._predicted_state_cov, &kfilter.k_states)
+
+    # #### Increments for time t+1
+    if dadvance_increment_chandrasekhar(kfilter, model) == 0:
+        kfilter.chandrasekhar_t = kfilter.t + 1
+    else:
+        kfilter.chandrasekhar_t = -1
+
+    return 0
+cdef int cupdating_chandrasekhar(cKalmanFilter kfilter, cStatespace model):
+    return cupdating_conventional(kfilter, model)
+
+cdef int cprediction_chandrasekhar(cKalmanFilter kfilter, cStatespace model):
+    return cprediction_conventional(kfilter, model)
+cdef int zupdating_chandrasekhar(zKalmanFilter kfilter, zStatespace model):
+    return zupdating_conventional(kfilter, model)
+
+cdef int zprediction_chandrasekhar(zKalmanFilter kfilter, zStatespace model):
+    return zprediction_conventional(kfilter, model)
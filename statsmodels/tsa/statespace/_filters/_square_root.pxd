@@ -0,0 +1,45 @@
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: cdivision=False
+"""
+State Space Models - Square-root Kalman Filter declarations
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+
+cimport numpy as np
+from statsmodels.tsa.statespace._representation cimport (
+    sStatespace, dStatespace, cStatespace, zStatespace
+)
+from statsmodels.tsa.statespace._kalman_filter cimport (
+    sKalmanFilter, dKalmanFilter, cKalmanFilter, zKalmanFilter
+)
+
+# Single precision
+cdef int scholesky_factor_psd(int n, np.float32_t * a, int lda, np.float32_t * u, int ldu)
+cdef int scrossproduct_upper(int n, np.float32_t * u, int ldu, np.float32_t * a, int lda)
+cdef int supdating_missing_square_root(sKalmanFilter kfilter, sStatespace model)
+cdef int sforecast_square_root(sKalmanFilter kfilter, sStatespace model)
+cdef int supdating_square_root(sKalmanFilter kfilter, sStatespace model)
+cdef int sprediction_square_root(sKalmanFilter kfilter, sStatespace model)
+
+# Double precision
+cdef int dcholesky_factor_psd(int n, np.float64_t * a, int lda, np.float64_t * u, int ldu)
+cdef int dcrossproduct_upper(int n, np.float64_t * u, int ldu, np.float64_t * a, int lda)
+cdef int dupdating_missing_square_root(dKalmanFilter kfilter, dStatespace model)
+cdef int dforecast_square_root(dKalmanFilter kfilter, dStatespace model)
+cdef int dupdating_square_root(dKalmanFilter kfilter, dStatespace model)
+cdef int dprediction_square_root(dKalmanFilter kfilter, dStatespace model)
+
+# Single precision complex
+cdef int cupdating_missing_square_root(cKalmanFilter kfilter, cStatespace model)
+cdef int cforecast_square_root(cKalmanFilter kfilter, cStatespace model)
+cdef int cupdating_square_root(cKalmanFilter kfilter, cStatespace model)
+cdef int cprediction_square_root(cKalmanFilter kfilter, cStatespace model)
+
+# Double precision complex
+cdef int zupdating_missing_square_root(zKalmanFilter kfilter, zStatespace model)
+cdef int zforecast_square_root(zKalmanFilter kfilter, zStatespace model)
+cdef int zupdating_square_root(zKalmanFilter kfilter, zStatespace model)
+cdef int zprediction_square_root(zKalmanFilter kfilter, zStatespace model)
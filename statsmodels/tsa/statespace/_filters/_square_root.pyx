@@ -0,0 +1,635 @@
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: cdivision=False
+"""
+State Space Models - Square-root Kalman filter
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+
+# Typical imports
+cimport numpy as np
+from libc.math cimport sqrt
+from statsmodels.src.math cimport *
+cimport scipy.linalg.cython_blas as blas
+cimport scipy.linalg.cython_lapack as lapack
+
+from statsmodels.tsa.statespace._kalman_filter cimport TIMING_INIT_PREDICTED
+from statsmodels.tsa.statespace._filters._conventional cimport (
+    sforecast_conventional, supdating_conventional, sprediction_conventional,
+    supdating_missing_conventional,
+    dforecast_conventional, dupdating_conventional, dprediction_conventional,
+    dupdating_missing_conventional,
+    cforecast_conventional, cupdating_conventional, cprediction_conventional,
+    cupdating_missing_conventional,
+    zforecast_conventional, zupdating_conventional, zprediction_conventional,
+    zupdating_missing_conventional
+)
+
+# ### Square-root Kalman filter
+#
+# See Durbin and Koopman (2012) Chapter 6.3 and Anderson and Moore (1979)
+# Chapter 6.5
+#
+# The covariance matrices are propagated in terms of factors
+# $P_t = \bar P_t' \bar P_t$ and $P_{t|t} = \bar P_{t|t}' \bar P_{t|t}$,
+# which are updated by triangularizing (using the QR decomposition) the
+# transposed pre-arrays
+#
+# $$
+# \begin{bmatrix} \bar H_t & 0 \\ \bar P_t Z_t' & \bar P_t \end{bmatrix}
+# \qquad \text{and} \qquad
+# \begin{bmatrix} \bar P_{t|t} T_t' \\ \bar Q_t R_t' \end{bmatrix}
+# $$
+#
+# where $H_t = \bar H_t' \bar H_t$ and $Q_t = \bar Q_t' \bar Q_t$. The
+# resulting covariance matrices are positive semi-definite by construction,
+# which avoids the loss of symmetry and definiteness that the subtraction in
+# the conventional updating step can produce in long runs or in low
+# precision. The full covariance matrices are still formed and stored at each
+# period, so that the output of the filter (and so the smoothers) are the
+# same as for the conventional filter.
+#
+# The factors of the current period are held in the `*_state_cov_sqrt`
+# arrays of the filter object, and `sqrt_predicted_t` and `sqrt_filtered_t`
+# record the periods they correspond to. If the filter did not continue from
+# the previous period (for example because it was started, or the previous
+# iterations were skipped after steady-state convergence) the factors are
+# re-computed from the stored covariance matrices.
+#
+# Complex-step differentiation requires the recursions to be analytic
+# functions of the parameters, which the (conjugating) QR decomposition is
+# not, so the complex-valued filters use the conventional recursions.
+cdef int scholesky_factor_psd(int n, np.float32_t * a, int lda, np.float32_t * u, int ldu):
+    """
+    Upper triangular factor $U$ of a positive semi-definite matrix $A = U'U$
+
+    Pivots that are not positive (relative to the largest diagonal element of
+    `a`) are set to zero along with the remainder of the row, so that
+    singular matrices (e.g. with zero variances) can be factorized.
+
+    Only the upper triangle of `a` is referenced.
+    """
+    cdef:
+        int i, j, k
+        np.float32_t value, pivot
+        np.float32_t tol = 0
+
+    for j in range(n):
+        if a[j + j*lda] > tol:
+            tol = a[j + j*lda]
+    tol = n * 1.1920929e-07 * tol
+
+    for j in range(n):
+        value = a[j + j*lda]
+        for k in range(j):
+            value = value - u[k + j*ldu] * u[k + j*ldu]
+
+        if value > tol:
+            pivot = sqrt(value)
+            u[j + j*ldu] = pivot
+            for i in range(j + 1, n):
+                value = a[j + i*lda]
+                for k in range(j):
+                    value = value - u[k + j*ldu] * u[k + i*ldu]
+                u[j + i*ldu] = value / pivot
+        else:
+            for i in range(j, n):
+                u[j + i*ldu] = 0
+
+        for i in range(j + 1, n):
+            u[i + j*ldu] = 0
+
+    return 0
+
+cdef int scrossproduct_upper(int n, np.float32_t * u, int ldu, np.float32_t * a, int lda):
+    """
+    Form the symmetric matrix $A = U'U$ from an $(n \\times n)$ factor $U$
+    """
+    cdef:
+        int i, j
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+
+    blas.ssyrk("U", "T", &n, &n,
+          &alpha, u, &ldu,
+          &beta, a, &lda)
+    for i in range(n): # columns
+        for j in range(i + 1, n): # rows
+            a[j + i*lda] = a[i + j*lda]
+
+    return 0
+
+cdef int sforecast_square_root(sKalmanFilter kfilter, sStatespace model):
+    # Constants
+    cdef:
+        int inc = 1, i, j
+        int p = model._k_endog
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+        np.float32_t gamma = -1.0
+        np.float32_t * pre_array
+
+    # If converged, the conventional recursions just copy the steady-state
+    # covariance matrices
+    if kfilter.converged:
+        return sforecast_conventional(kfilter, model)
+
+    # #### Factor of the predicted state covariance matrix for time t
+    # $P_t = \bar P_t' \bar P_t$
+    if not kfilter.sqrt_predicted_t == kfilter.t:
+        scholesky_factor_psd(model._k_states, kfilter._input_state_cov, kfilter.k_states,
+                                   kfilter._predicted_state_cov_sqrt, kfilter.k_states)
+        kfilter.sqrt_predicted_t = kfilter.t
+
+    # #### Forecast for time t
+    # `forecast` $= Z_t a_t + d_t$
+    blas.scopy(&model._k_endog, model._obs_intercept, &inc, kfilter._forecast, &inc)
+    blas.sgemv("N", &model._k_endog, &model._k_states,
+          &alpha, model._design, &model._k_endog,
+                  kfilter._input_state, &inc,
+          &alpha, kfilter._forecast, &inc)
+
+    # #### Forecast error for time t
+    # `forecast_error` $\equiv v_t = y_t -$ `forecast`
+    blas.scopy(&model._k_endog, model._obs, &inc, kfilter._forecast_error, &inc)
+    blas.saxpy(&model._k_endog, &gamma, kfilter._forecast, &inc, kfilter._forecast_error, &inc)
+
+    # Lower-left block of the measurement pre-array
+    # $\\# = \bar P_t Z_t'$
+    # $(m \times p) = (m \times m) (p \times m)'$
+    pre_array = &kfilter._sqrt_work[p]
+    blas.sgemm("N", "T", &model._k_states, &model._k_endog, &model._k_states,
+          &alpha, kfilter._predicted_state_cov_sqrt, &kfilter.k_states,
+                  model._design, &model._k_endog,
+          &beta, pre_array, &kfilter.ldsqrt)
+
+    # *Intermediate calculation* (used in the updating step)
+    # $\\#_1 = P_t Z_t' = \bar P_t' \\#$
+    # $(m \times p) = (m \times m)' (m \times p)$
+    blas.sgemm("T", "N", &model._k_states, &model._k_endog, &model._k_states,
+          &alpha, kfilter._predicted_state_cov_sqrt, &kfilter.k_states,
+                  pre_array, &kfilter.ldsqrt,
+          &beta, kfilter._tmp1, &kfilter.k_states)
+
+    # #### Forecast error covariance matrix for time t
+    # $F_t \equiv (\bar P_t Z_t')' (\bar P_t Z_t') + H_t$
+    for i in range(model._k_endog): # columns
+        for j in range(model._k_endog): # rows
+            kfilter._forecast_error_cov[j + i*kfilter.k_endog] = model._obs_cov[j + i*model._k_endog]
+    blas.ssyrk("U", "T", &model._k_endog, &model._k_states,
+          &alpha, pre_array, &kfilter.ldsqrt,
+          &alpha, kfilter._forecast_error_cov, &kfilter.k_endog)
+    for i in range(model._k_endog): # columns
+        for j in range(i + 1, model._k_endog): # rows
+            kfilter._forecast_error_cov[j + i*kfilter.k_endog] = kfilter._forecast_error_cov[i + j*kfilter.k_endog]
+
+    return 0
+
+cdef int supdating_square_root(sKalmanFilter kfilter, sStatespace model):
+    # Constants
+    cdef:
+        int inc = 1, i, j, info
+        int p = model._k_endog
+        int n = model._k_endog + model._k_states
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+
+    if kfilter.converged:
+        return supdating_conventional(kfilter, model)
+
+    # #### Filtered state for time t
+    # $a_{t|t} = a_t + P_t Z_t' F_t^{-1} v_t$
+    # $a_{t|t} = 1.0 * \\#_1 \\#_2 + 1.0 a_t$
+    blas.scopy(&kfilter.k_states, kfilter._input_state, &inc, kfilter._filtered_state, &inc)
+    blas.sgemv("N", &model._k_states, &model._k_endog,
+          &alpha, kfilter._tmp1, &kfilter.k_states,
+                  kfilter._tmp2, &inc,
+          &alpha, kfilter._filtered_state, &inc)
+
+    # #### Filtered state covariance for time t
+    # Complete the measurement pre-array (the lower-left block was set in
+    # the forecasting step)
+    scholesky_factor_psd(model._k_endog, model._obs_cov, model._k_endog,
+                               kfilter._sqrt_work, kfilter.ldsqrt)
+    for i in range(p, n): # columns
+        for j in range(p): # rows
+            kfilter._sqrt_work[j + i*kfilter.ldsqrt] = 0
+        for j in range(p, n): # rows
+            kfilter._sqrt_work[j + i*kfilter.ldsqrt] = kfilter._predicted_state_cov_sqrt[(j - p) + (i - p)*kfilter.k_states]
+
+    # Triangularize: the lower-right block of the triangular factor is
+    # $\bar P_{t|t}$ (and the upper-left block is a factor of $F_t$)
+    lapack.sgeqrf(&n, &n, kfilter._sqrt_work, &kfilter.ldsqrt,
+                        kfilter._sqrt_tau, &kfilter._sqrt_tau[kfilter.ldsqrt],
+                        &kfilter.lsqrt_work, &info)
+    for i in range(model._k_states): # columns
+        for j in range(i + 1): # rows
+            kfilter._filtered_state_cov_sqrt[j + i*kfilter.k_states] = kfilter._sqrt_work[(p + j) + (p + i)*kfilter.ldsqrt]
+        for j in range(i + 1, model._k_states): # rows
+            kfilter._filtered_state_cov_sqrt[j + i*kfilter.k_states] = 0
+    kfilter.sqrt_filtered_t = kfilter.t
+
+    # $P_{t|t} = \bar P_{t|t}' \bar P_{t|t}$
+    scrossproduct_upper(model._k_states, kfilter._filtered_state_cov_sqrt, kfilter.k_states,
+                              kfilter._filtered_state_cov, kfilter.k_states)
+
+    # #### Kalman gain for time t
+    # $K_t = T_t P_t Z_t' F_t^{-1}$
+    #
+    # `tmp00` array used here, dimension $(m \times m)$
+    # $\\#_{00} = 1.0 * T_t P_t$
+    # $(m \times m) = (m \times m) (m \times m)$
+    blas.sgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._input_state_cov, &kfilter.k_states,
+          &beta, kfilter._tmp00, &kfilter.k_states)
+
+    # K_t = 1.0 * \\#_{00} \\#_3'
+    # $(m \times p) = (m \times m) (m \times p)$
+    blas.sgemm("N", "T", &model._k_states, &model._k_endog, &model._k_states,
+          &alpha, kfilter._tmp00, &kfilter.k_states,
+                  kfilter._tmp3, &kfilter.k_endog,
+          &beta, kfilter._kalman_gain, &kfilter.k_states)
+
+    return 0
+
+cdef int supdating_missing_square_root(sKalmanFilter kfilter, sStatespace model):
+    cdef int inc = 1
+
+    # $a_{t|t} = a_t$ and $P_{t|t} = P_t$, so that also
+    # $\bar P_{t|t} = \bar P_t$
+    supdating_missing_conventional(kfilter, model)
+    if kfilter.sqrt_predicted_t == kfilter.t:
+        blas.scopy(&kfilter.k_states2, kfilter._predicted_state_cov_sqrt, &inc,
+                                             kfilter._filtered_state_cov_sqrt, &inc)
+        kfilter.sqrt_filtered_t = kfilter.t
+
+    return 0
+
+cdef int sprediction_square_root(sKalmanFilter kfilter, sStatespace model):
+    # Constants
+    cdef:
+        int inc = 1, i, j, info, period
+        int m = model._k_states
+        int n = model._k_states + model._k_posdef
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+
+    if kfilter.converged:
+        return sprediction_conventional(kfilter, model)
+
+    # #### Predicted state for time t+1
+    # $a_{t+1} = T_t a_{t|t} + c_t$
+    blas.scopy(&model._k_states, model._state_intercept, &inc, kfilter._predicted_state, &inc)
+    blas.sgemv("N", &model._k_states, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._filtered_state, &inc,
+          &alpha, kfilter._predicted_state, &inc)
+
+    # #### Factor of the filtered state covariance matrix
+    # With the alternate timing, the prediction step (except for the last
+    # one) comes before the updating step, and uses $P_{t-1|t-1}$.
+    if kfilter.filter_timing == TIMING_INIT_PREDICTED or kfilter.sqrt_filtered_t == kfilter.t:
+        period = kfilter.t
+    else:
+        period = kfilter.t - 1
+    if period < 0 or not kfilter.sqrt_filtered_t == period:
+        scholesky_factor_psd(model._k_states, kfilter._filtered_state_cov, kfilter.k_states,
+                                   kfilter._filtered_state_cov_sqrt, kfilter.k_states)
+        kfilter.sqrt_filtered_t = period
+
+    # #### Predicted state covariance matrix for time t+1
+    # Time update pre-array
+    # $\\# = \bar P_{t|t} T_t'$
+    # $(m \times m) = (m \times m) (m \times m)'$
+    blas.sgemm("N", "T", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, kfilter._filtered_state_cov_sqrt, &kfilter.k_states,
+                  model._transition, &model._k_states,
+          &beta, kfilter._sqrt_work, &kfilter.ldsqrt)
+
+    # $\bar Q_t$ is held in the (otherwise unused) columns to the right of
+    # the pre-array
+    # $\\# = \bar Q_t R_t'$
+    # $(r \times m) = (r \times r) (m \times r)'$
+    scholesky_factor_psd(model._k_posdef, model._state_cov, model._k_posdef,
+                               &kfilter._sqrt_work[m + m*kfilter.ldsqrt], kfilter.ldsqrt)
+    blas.sgemm("N", "T", &model._k_posdef, &model._k_states, &model._k_posdef,
+          &alpha, &kfilter._sqrt_work[m + m*kfilter.ldsqrt], &kfilter.ldsqrt,
+                  model._selection, &model._k_states,
+          &beta, &kfilter._sqrt_work[m], &kfilter.ldsqrt)
+
+    # Triangularize: the triangular factor is $\bar P_{t+1}$
+    lapack.sgeqrf(&n, &m, kfilter._sqrt_work, &kfilter.ldsqrt,
+                        kfilter._sqrt_tau, &kfilter._sqrt_tau[kfilter.ldsqrt],
+                        &kfilter.lsqrt_work, &info)
+    for i in range(model._k_states): # columns
+        for j in range(i + 1): # rows
+            kfilter._predicted_state_cov_sqrt[j + i*kfilter.k_states] = kfilter._sqrt_work[j + i*kfilter.ldsqrt]
+        for j in range(i + 1, model._k_states): # rows
+            kfilter._predicted_state_cov_sqrt[j + i*kfilter.k_states] = 0
+    kfilter.sqrt_predicted_t = period + 1
+
+    # $P_{t+1} = \bar P_{t+1}' \bar P_{t+1}$
+    scrossproduct_upper(model._k_states, kfilter._predicted_state_cov_sqrt, kfilter.k_states,
+                              kfilter._predicted_state_cov, kfilter.k_states)
+
+    return 0
+cdef int dcholesky_factor_psd(int n, np.float64_t * a, int lda, np.float64_t * u, int ldu):
+    """
+    Upper triangular factor $U$ of a positive semi-definite matrix $A = U'U$
+
+    Pivots that are not positive (relative to the largest diagonal element of
+    `a`) are set to zero along with the remainder of the row, so that
+    singular matrices (e.g. with zero variances) can be factorized.
+
+    Only the upper triangle of `a` is referenced.
+    """
+    cdef:
+        int i, j, k
+        np.float64_t value, pivot
+        np.float64_t tol = 0
+
+    for j in range(n):
+        if a[j + j*lda] > tol:
+            tol = a[j + j*lda]
+    tol = n * 2.220446049250313e-16 * tol
+
+    for j in range(n):
+        value = a[j + j*lda]
+        for k in range(j):
+            value = value - u[k + j*ldu] * u[k + j*ldu]
+
+        if value > tol:
+            pivot = sqrt(value)
+            u[j + j*ldu] = pivot
+            for i in range(j + 1, n):
+                value = a[j + i*lda]
+                for k in range(j):
+                    value = value - u[k + j*ldu] * u[k + i*ldu]
+                u[j + i*ldu] = value / pivot
+        else:
+            for i in range(j, n):
+                u[j + i*ldu] = 0
+
+        for i in range(j + 1, n):
+            u[i + j*ldu] = 0
+
+    return 0
+
+cdef int dcrossproduct_upper(int n, np.float64_t * u, int ldu, np.float64_t * a, int lda):
+    """
+    Form the symmetric matrix $A = U'U$ from an $(n \\times n)$ factor $U$
+    """
+    cdef:
+        int i, j
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+
+    blas.dsyrk("U", "T", &n, &n,
+          &alpha, u, &ldu,
+          &beta, a, &lda)
+    for i in range(n): # columns
+        for j in range(i + 1, n): # rows
+            a[j + i*lda] = a[i + j*lda]
+
+    return 0
+
+cdef int dforecast_square_root(dKalmanFilter kfilter, dStatespace model):
+    # Constants
+    cdef:
+        int inc = 1, i, j
+        int p = model._k_endog
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+        np.float64_t gamma = -1.0
+        np.float64_t * pre_array
+
+    # If converged, the conventional recursions just copy the steady-state
+    # covariance matrices
+    if kfilter.converged:
+        return dforecast_conventional(kfilter, model)
+
+    # #### Factor of the predicted state covariance matrix for time t
+    # $P_t = \bar P_t' \bar P_t$
+    if not kfilter.sqrt_predicted_t == kfilter.t:
+        dcholesky_factor_psd(model._k_states, kfilter._input_state_cov, kfilter.k_states,
+                                   kfilter._predicted_state_cov_sqrt, kfilter.k_states)
+        kfilter.sqrt_predicted_t = kfilter.t
+
+    # #### Forecast for time t
+    # `forecast` $= Z_t a_t + d_t$
+    blas.dcopy(&model._k_endog, model._obs_intercept, &inc, kfilter._forecast, &inc)
+    blas.dgemv("N", &model._k_endog, &model._k_states,
+          &alpha, model._design, &model._k_endog,
+                  kfilter._input_state, &inc,
+          &alpha, kfilter._forecast, &inc)
+
+    # #### Forecast error for time t
+    # `forecast_error` $\equiv v_t = y_t -$ `forecast`
+    blas.dcopy(&model._k_endog, model._obs, &inc, kfilter._forecast_error, &inc)
+    blas.daxpy(&model._k_endog, &gamma, kfilter._forecast, &inc, kfilter._forecast_error, &inc)
+
+    # Lower-left block of the measurement pre-array
+    # $\\# = \bar P_t Z_t'$
+    # $(m \times p) = (m \times m) (p \times m)'$
+    pre_array = &kfilter._sqrt_work[p]
+    blas.dgemm("N", "T", &model._k_states, &model._k_endog, &model._k_states,
+          &alpha, kfilter._predicted_state_cov_sqrt, &kfilter.k_states,
+                  model._design, &model._k_endog,
+          &beta, pre_array, &kfilter.ldsqrt)
+
+    # *Intermediate calculation* (used in the updating step)
+    # $\\#_1 = P_t Z_t' = \bar P_t' \\#$
+    # $(m \times p) = (m \times m)' (m \times p)$
+    blas.dgemm("T", "N", &model._k_states, &model._k_endog, &model._k_states,
+          &alpha, kfilter._predicted_state_cov_sqrt, &kfilter.k_states,
+                  pre_array, &kfilter.ldsqrt,
+          &beta, kfilter._tmp1, &kfilter.k_states)
+
+    # #### Forecast error covariance matrix for time t
+    # $F_t \equiv (\bar P_t Z_t')' (\bar P_t Z_t') + H_t$
+    for i in range(model._k_endog): # columns
+        for j in range(model._k_endog): # rows
+            kfilter._forecast_error_cov[j + i*kfilter.k_endog] = model._obs_cov[j + i*model._k_endog]
+    blas.dsyrk("U", "T", &model._k_endog, &model._k_states,
+          &alpha, pre_array, &kfilter.ldsqrt,
+          &alpha, kfilter._forecast_error_cov, &kfilter.k_endog)
+    for i in range(model._k_endog): # columns
+        for j in range(i + 1, model._k_endog): # rows
+            kfilter._forecast_error_cov[j + i*kfilter.k_endog] = kfilter._forecast_error_cov[i + j*kfilter.k_endog]
+
+    return 0
+
+cdef int dupdating_square_root(dKalmanFilter kfilter, dStatespace model):
+    # Constants
+    cdef:
+        int inc = 1, i, j, info
+        int p = model._k_endog
+        int n = model._k_endog + model._k_states
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+
+    if kfilter.converged:
+        return dupdating_conventional(kfilter, model)
+
+    # #### Filtered state for time t
+    # $a_{t|t} = a_t + P_t Z_t' F_t^{-1} v_t$
+    # $a_{t|t} = 1.0 * \\#_1 \\#_2 + 1.0 a_t$
+    blas.dcopy(&kfilter.k_states, kfilter._input_state, &inc, kfilter._filtered_state, &inc)
+    blas.dgemv("N", &model._k_states, &model._k_endog,
+          &alpha, kfilter._tmp1, &kfilter.k_states,
+                  kfilter._tmp2, &inc,
+          &alpha, kfilter._filtered_state, &inc)
+
+    # #### Filtered state covariance for time t
+    # Complete the measurement pre-array (the lower-left block was set in
+    # the forecasting step)
+    dcholesky_factor_psd(model._k_endog, model._obs_cov, model._k_endog,
+                               kfilter._sqrt_work, kfilter.ldsqrt)
+    for i in range(p, n): # columns
+        for j in range(p): # rows
+            kfilter._sqrt_work[j + i*kfilter.ldsqrt] = 0
+        for j in range(p, n): # rows
+            kfilter._sqrt_work[j + i*kfilter.ldsqrt] = kfilter._predicted_state_cov_sqrt[(j - p) + (i - p)*kfilter.k_states]
+
+    # Triangularize: the lower-right block of the triangular factor is
+    # $\bar P_{t|t}$ (and the upper-left block is a factor of $F_t$)
+    lapack.dgeqrf(&n, &n, kfilter._sqrt_work, &kfilter.ldsqrt,
+                        kfilter._sqrt_tau, &kfilter._sqrt_tau[kfilter.ldsqrt],
+                        &kfilter.lsqrt_work, &info)
+    for i in range(model._k_states): # columns
+        for j in range(i + 1): # rows
+            kfilter._filtered_state_cov_sqrt[j + i*kfilter.k_states] = kfilter._sqrt_work[(p + j) + (p + i)*kfilter.ldsqrt]
+        for j in range(i + 1, model._k_states): # rows
+            kfilter._filtered_state_cov_sqrt[j + i*kfilter.k_states] = 0
+    kfilter.sqrt_filtered_t = kfilter.t
+
+    # $P_{t|t} = \bar P_{t|t}' \bar P_{t|t}$
+    dcrossproduct_upper(model._k_states, kfilter._filtered_state_cov_sqrt, kfilter.k_states,
+                              kfilter._filtered_state_cov, kfilter.k_states)
+
+    # #### Kalman gain for time t
+    # $K_t = T_t P_t Z_t' F_t^{-1}$
+    #
+    # `tmp00` array used here, dimension $(m \times m)$
+    # $\\#_{00} = 1.0 * T_t P_t$
+    # $(m \times m) = (m \times m) (m \times m)$
+    blas.dgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._input_state_cov, &kfilter.k_states,
+          &beta, kfilter._tmp00, &kfilter.k_states)
+
+    # K_t = 1.0 * \\#_{00} \\#_3'
+    # $(m \times p) = (m \times m) (m \times p)$
+    blas.dgemm("N", "T", &model._k_states, &model._k_endog, &model._k_states,
+          &alpha, kfilter._tmp00, &kfilter.k_states,
+                  kfilter._tmp3, &kfilter.k_endog,
+          &beta, kfilter._kalman_gain, &kfilter.k_states)
+
+    return 0
+
+cdef int dupdating_missing_square_root(dKalmanFilter kfilter, dStatespace model):
+    cdef int inc = 1
+
+    # $a_{t|t} = a_t$ and $P_{t|t} = P_t$, so that also
+    # $\bar P_{t|t} = \bar P_t$
+    dupdating_missing_conventional(kfilter, model)
+    if kfilter.sqrt_predicted_t == kfilter.t:
+        blas.dcopy(&kfilter.k_states2, kfilter._predicted_state_cov_sqrt, &inc,
+                                             kfilter._filtered_state_cov_sqrt, &inc)
+        kfilter.sqrt_filtered_t = kfilter.t
+
+    return 0
+
+cdef int dprediction_square_root(dKalmanFilter kfilter, dStatespace model):
+    # Constants
+    cdef:
+        int inc = 1, i, j, info, period
+        int m = model._k_states
+        int n = model._k_states + model._k_posdef
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+
+    if kfilter.converged:
+        return dprediction_conventional(kfilter, model)
+
+    # #### Predicted state for time t+1
+    # $a_{t+1} = T_t a_{t|t} + c_t$
+    blas.dcopy(&model._k_states, model._state_intercept, &inc, kfilter._predicted_state, &inc)
+    blas.dgemv("N", &model._k_states, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._filtered_state, &inc,
+          &alpha, kfilter._predicted_state, &inc)
+
+    # #### Factor of the filtered state covariance matrix
+    # With the alternate timing, the prediction step (except for the last
+    # one) comes before the updating step, and uses $P_{t-1|t-1}$.
+    if kfilter.filter_timing == TIMING_INIT_PREDICTED or kfilter.sqrt_filtered_t == kfilter.t:
+        period = kfilter.t
+    else:
+        period = kfilter.t - 1
+    if period < 0 or not kfilter.sqrt_filtered_t == period:
+        dcholesky_factor_psd(model._k_states, kfilter._filtered_state_cov, kfilter.k_states,
+                                   kfilter._filtered_state_cov_sqrt, kfilter.k_states)
+        kfilter.sqrt_filtered_t = period
+
+    # #### Predicted state covariance matrix for time t+1
+    # Time update pre-array
+    # $\\# = \bar P_{t|t} T_t'$
+    # $(m \times m) = (m \times m) (m \times m)'$
+    blas.dgemm("N", "T", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, kfilter._filtered_state_cov_sqrt, &kfilter.k_states,
+                  model._transition, &model._k_states,
+          &beta, kfilter._sqrt_work, &kfilter.ldsqrt)
+
+    # $\bar Q_t$ is held in the (otherwise unused) columns to the right of
+    # the pre-array
+    # $\\# = \bar Q_t R_t'$
+    # $(r \times m) = (r \times r) (m \times r)'$
+    dcholesky_factor_psd(model._k_posdef, model._state_cov, model._k_posdef,
+                               &kfilter._sqrt_work[m + m*kfilter.ldsqrt], kfilter.ldsqrt)
+    blas.dgemm("N", "T", &model._k_posdef, &model._k_states, &model._k_posdef,
+          &alpha, &kfilter._sqrt_work[m + m*kfilter.ldsqrt], &kfilter.ldsqrt,
+                  model._selection, &model._k_states,
+          &beta, &kfilter._sqrt_work[m], &kfilter.ldsqrt)
+
+    # Triangularize: the triangular factor is $\bar P_{t+1}$
+    lapack.dgeqrf(&n, &m, kfilter._sqrt_work, &kfilter.ldsqrt,
+                        kfilter._sqrt_tau, &kfilter._sqrt_tau[kfilter.ldsqrt],
+                        &kfilter.lsqrt_work, &info)
+    for i in range(model._k_states): # columns
+        for j in range(i + 1): # rows
+            kfilter._predicted_state_cov_sqrt[j + i*kfilter.k_states] = kfilter._sqrt_work[j + i*kfilter.ldsqrt]
+        for j in range(i + 1, model._k_states): # rows
+            kfilter._predicted_state_cov_sqrt[j + i*kfilter.k_states] = 0
+    kfilter.sqrt_predicted_t = period + 1
+
+    # $P_{t+1} = \bar P_{t+1}' \bar P_{t+1}$
+    dcrossproduct_upper(model._k_states, kfilter._predicted_state_cov_sqrt, kfilter.k_states,
+                              kfilter._predicted_state_cov, kfilter.k_states)
+
+    return 0
+cdef int cforecast_square_root(cKalmanFilter kfilter, cStatespace model):
+    return cforecast_conventional(kfilter, model)
+
+cdef int cupdating_square_root(cKalmanFilter kfilter, cStatespace model):
+    return cupdating_conventional(kfilter, model)
+
+cdef int cupdating_missing_square_root(cKalmanFilter kfilter, cStatespace model):
+    return cupdating_missing_conventional(kfilter, model)
+
+cdef int cprediction_square_root(cKalmanFilter kfilter, cStatespace model):
+    return cprediction_conventional(kfilter, model)
+cdef int zforecast_square_root(zKalmanFilter kfilter, zStatespace model):
+    return zforecast_conventional(kfilter, model)
+
+cdef int zupdating_square_root(zKalmanFilter kfilter, zStatespace model):
+    return zupdating_conventional(kfilter, model)
+
+cdef int zupdating_missing_square_root(zKalmanFilter kfilter, zStatespace model):
+    return zupdating_missing_conventional(kfilter, model)
+
+cdef int zprediction_square_root(zKalmanFilter kfilter, zStatespace model):
+    return zprediction_conventional(kfilter, model)
@@ -29,6 +29,8 @@ cdef void stemp_arrays(sKalmanFilter kfilter, sStatespace model, int i, np.float
 cdef void sfiltered_state(sKalmanFilter kfilter, sStatespace model, int i, np.float32_t forecast_error_cov_inv)
 cdef void sfiltered_state_cov(sKalmanFilter kfilter, sStatespace model, int i, np.float32_t forecast_error_cov_inv)
 cdef void sloglikelihood(sKalmanFilter kfilter, sStatespace model, int i, np.float32_t forecast_error_cov, np.float32_t forecast_error_cov_inv)
+cdef void spredicted_state(sKalmanFilter kfilter, sStatespace model)
+cdef void spredicted_state_cov(sKalmanFilter kfilter, sStatespace model)
 
 # Double precision
 cdef int dforecast_univariate(dKalmanFilter kfilter, dStatespace model)
@@ -43,6 +45,8 @@ cdef void dtemp_arrays(dKalmanFilter kfilter, dStatespace model, int i, np.float
 cdef void dfiltered_state(dKalmanFilter kfilter, dStatespace model, int i, np.float64_t forecast_error_cov_inv)
 cdef void dfiltered_state_cov(dKalmanFilter kfilter, dStatespace model, int i, np.float64_t forecast_error_cov_inv)
 cdef void dloglikelihood(dKalmanFilter kfilter, dStatespace model, int i, np.float64_t forecast_error_cov, np.float64_t forecast_error_cov_inv)
+cdef void dpredicted_state(dKalmanFilter kfilter, dStatespace model)
+cdef void dpredicted_state_cov(dKalmanFilter kfilter, dStatespace model)
 
 # Single precision complex
 cdef int cforecast_univariate(cKalmanFilter kfilter, cStatespace model)
@@ -57,6 +61,8 @@ cdef void ctemp_arrays(cKalmanFilter kfilter, cStatespace model, int i, np.compl
 cdef void cfiltered_state(cKalmanFilter kfilter, cStatespace model, int i, np.complex64_t forecast_error_cov_inv)
 cdef void cfiltered_state_cov(cKalmanFilter kfilter, cStatespace model, int i, np.complex64_t forecast_error_cov_inv)
 cdef void cloglikelihood(cKalmanFilter kfilter, cStatespace model, int i, np.complex64_t forecast_error_cov, np.complex64_t forecast_error_cov_inv)
+cdef void cpredicted_state(cKalmanFilter kfilter, cStatespace model)
+cdef void cpredicted_state_cov(cKalmanFilter kfilter, cStatespace model)
 
 # Double precision complex
 cdef int zforecast_univariate(zKalmanFilter kfilter, zStatespace model)
@@ -70,4 +76,6 @@ cdef np.complex128_t zforecast_error_cov(zKalmanFilter kfilter, zStatespace mode
 cdef void ztemp_arrays(zKalmanFilter kfilter, zStatespace model, int i, np.complex128_t forecast_error_cov_inv)
 cdef void zfiltered_state(zKalmanFilter kfilter, zStatespace model, int i, np.complex128_t forecast_error_cov_inv)
 cdef void zfiltered_state_cov(zKalmanFilter kfilter, zStatespace model, int i, np.complex128_t forecast_error_cov_inv)
-cdef void zloglikelihood(zKalmanFilter kfilter, zStatespace model, int i, np.complex128_t forecast_error_cov, np.complex128_t forecast_error_cov_inv)
\ No newline at end of file
+cdef void zloglikelihood(zKalmanFilter kfilter, zStatespace model, int i, np.complex128_t forecast_error_cov, np.complex128_t forecast_error_cov_inv)
+cdef void zpredicted_state(zKalmanFilter kfilter, zStatespace model)
+cdef void zpredicted_state_cov(zKalmanFilter kfilter, zStatespace model)
@@ -0,0 +1,1009 @@
+#cython: profile=False
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: cdivision=False
+"""
+State Space Models - Exact diffuse univariate Kalman filter
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+
+# Typical imports
+cimport numpy as np
+import numpy as np
+from statsmodels.src.math cimport *
+from libc.math cimport NAN
+cimport scipy.linalg.cython_blas as blas
+
+from statsmodels.tsa.statespace._kalman_filter cimport (
+    MEMORY_NO_LIKELIHOOD, MEMORY_NO_STD_FORECAST)
+
+from statsmodels.tsa.statespace._filters._univariate cimport (
+    sforecast_error, sforecast_error_cov, stemp_arrays, sfiltered_state,
+    sfiltered_state_cov, sloglikelihood, spredicted_state, spredicted_state_cov,
+    dforecast_error, dforecast_error_cov, dtemp_arrays, dfiltered_state,
+    dfiltered_state_cov, dloglikelihood, dpredicted_state, dpredicted_state_cov,
+    cforecast_error, cforecast_error_cov, ctemp_arrays, cfiltered_state,
+    cfiltered_state_cov, cloglikelihood, cpredicted_state, cpredicted_state_cov,
+    zforecast_error, zforecast_error_cov, ztemp_arrays, zfiltered_state,
+    zfiltered_state_cov, zloglikelihood, zpredicted_state, zpredicted_state_cov
+)
+
+# ### Exact diffuse univariate Kalman filter
+#
+# The initial state covariance matrix is $P_1 = \kappa P_{\infty,1} + P_{*,1}$
+# with $\kappa \to \infty$. During the diffuse periods the filter tracks both
+# $P_{*,t}$ (held in the usual `*_state_cov` arrays) and $P_{\infty,t}$ (held
+# in the `*_diffuse_state_cov` arrays), and each element of the observation
+# vector is processed in turn. For element $i$ with
+# $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$, $M_{*,t,i} = P_{*,t,i} Z_{t,i}'$,
+# $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$ and
+# $F_{*,t,i} = Z_{t,i} M_{*,t,i} + \sigma_{t,i}^2$:
+#
+# If $F_{\infty,t,i} > 0$, with $K_{t,i}^{(0)} = M_{\infty,t,i} / F_{\infty,t,i}$,
+#
+# $$
+# \begin{aligned}
+# a_{t,i+1} & = a_{t,i} + K_{t,i}^{(0)} v_{t,i} \\
+# P_{*,t,i+1} & = P_{*,t,i} + K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{*,t,i} -
+#     K_{t,i}^{(0)} M_{*,t,i}' - M_{*,t,i} K_{t,i}^{(0)'} \\
+# P_{\infty,t,i+1} & = P_{\infty,t,i} - K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{\infty,t,i} \\
+# \end{aligned}
+# $$
+#
+# and otherwise the usual univariate recursions apply with $F_{*,t,i}$,
+# leaving $P_{\infty,t,i+1} = P_{\infty,t,i}$. The diffuse periods end when
+# $P_{\infty,t}$ vanishes, after which the filter continues with the method
+# given by `filter_method`.
+#
+# In the diffuse periods, the following are stored for use by the smoother:
+# `forecast_error_cov` holds $F_{*,t,i}$, `forecast_error_diffuse_cov` holds
+# $F_{\infty,t,i}$ (set to zero when it is treated as zero), `tmp1` holds
+# $M_{*,t,i}$ and `kalman_gain` holds the gain applied to the state,
+# $K_{t,i}^{(0)}$ or $K_{*,t,i} = M_{*,t,i} / F_{*,t,i}$. The other temporary
+# arrays are scaled by $F_{\infty,t,i}^{-1}$ when $F_{\infty,t,i} > 0$.
+#
+# See Durbin and Koopman (2012) Chapters 5.2 and 6.4 and Koopman and
+# Durbin (2000).
+
+cdef int sforecast_univariate_diffuse(sKalmanFilter kfilter, sStatespace model):
+
+    # Constants
+    cdef:
+        int i, j, k
+        int inc = 1
+        int store_loglikelihood
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+        np.float32_t gamma = -1.0
+        np.float32_t forecast_error_cov
+        np.float32_t forecast_error_cov_inv
+        np.float32_t forecast_error_diffuse_cov
+        np.float32_t forecast_error_diffuse_cov_inv
+        np.float32_t scalar
+
+    store_loglikelihood = (
+        not kfilter.conserve_memory & MEMORY_NO_LIKELIHOOD or
+        kfilter.t >= kfilter.loglikelihood_burn)
+
+    # Initialize the filtered states
+    blas.scopy(&kfilter.k_states, kfilter._input_state, &inc,
+                                           kfilter._filtered_state, &inc)
+    blas.scopy(&kfilter.k_states2, kfilter._input_state_cov, &inc,
+                                            kfilter._filtered_state_cov, &inc)
+    blas.scopy(&kfilter.k_states2, kfilter._input_diffuse_state_cov, &inc,
+                                            kfilter._filtered_diffuse_state_cov, &inc)
+
+    # Iterate over the observations at time t
+    for i in range(model._k_endog):
+
+        # #### Forecast error for time t
+        # `forecast_error` $\equiv v_{t,i} = y_{t,i} - Z_{t,i} a_{t,i} - d_{t,i}$
+        sforecast_error(kfilter, model, i)
+
+        # #### Forecast error covariance matrices for time t
+        # $M_{*,t,i} = P_{*,t,i} Z_{t,i}'$ is stored in `tmp1`
+        # $F_{*,t,i} = Z_{t,i} M_{*,t,i} + H_{t,i}$
+        forecast_error_cov = sforecast_error_cov(kfilter, model, i)
+        # $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$ (held in `kalman_gain`)
+        # $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$
+        forecast_error_diffuse_cov = sforecast_error_diffuse_cov(kfilter, model, i)
+
+        if dabs(forecast_error_diffuse_cov) > kfilter.tolerance_diffuse:
+            kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog] = forecast_error_diffuse_cov
+            forecast_error_diffuse_cov_inv = 1.0 / forecast_error_diffuse_cov
+
+            # The standardized forecast error is not defined
+            if not (kfilter.conserve_memory & MEMORY_NO_STD_FORECAST > 0):
+                kfilter._standardized_forecast_error[i] = NAN
+
+            # Save temporary array data
+            stemp_arrays(kfilter, model, i, forecast_error_diffuse_cov_inv)
+
+            # $K_{t,i}^{(0)} = M_{\infty,t,i} / F_{\infty,t,i}$
+            blas.sscal(&model._k_states, &forecast_error_diffuse_cov_inv,
+                                &kfilter._kalman_gain[i*kfilter.k_states], &inc)
+
+            # $a_{t,i+1} = a_{t,i} + K_{t,i}^{(0)} v_{t,i}$
+            blas.saxpy(&model._k_states, &kfilter._forecast_error[i],
+                                &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                                kfilter._filtered_state, &inc)
+
+            # $P_{*,t,i+1} = P_{*,t,i} + K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{*,t,i} -
+            #     K_{t,i}^{(0)} M_{*,t,i}' - M_{*,t,i} K_{t,i}^{(0)'}$
+            blas.sger(&model._k_states, &model._k_states,
+                &forecast_error_cov, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                                     &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+            blas.sger(&model._k_states, &model._k_states,
+                &gamma, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                        &kfilter._tmp1[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+            blas.sger(&model._k_states, &model._k_states,
+                &gamma, &kfilter._tmp1[i*kfilter.k_states], &inc,
+                        &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+
+            # $P_{\infty,t,i+1} = P_{\infty,t,i} - K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{\infty,t,i}$
+            scalar = -forecast_error_diffuse_cov
+            blas.sger(&model._k_states, &model._k_states,
+                &scalar, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                         &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_diffuse_state_cov, &kfilter.k_states)
+
+            # #### Loglikelihood
+            # The diffuse loglikelihood only includes $\log F_{\infty,t,i}$
+            if store_loglikelihood:
+                kfilter._loglikelihood[0] = (
+                    kfilter._loglikelihood[0] -
+                    0.5 * dlog(2 * NPY_PI * forecast_error_diffuse_cov))
+        else:
+            kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog] = 0
+
+            # If $F_{\infty,t,i} = 0$, then also $M_{\infty,t,i} = 0$ and the
+            # usual univariate recursions apply (in the case of a non-zero
+            # variance)
+            if not forecast_error_cov == 0:
+                forecast_error_cov_inv = 1.0 / forecast_error_cov
+                if not (kfilter.conserve_memory & MEMORY_NO_STD_FORECAST > 0):
+                    kfilter._standardized_forecast_error[i] = (
+                        kfilter._forecast_error[i] * forecast_error_cov_inv**0.5)
+
+                stemp_arrays(kfilter, model, i, forecast_error_cov_inv)
+                sfiltered_state(kfilter, model, i, forecast_error_cov_inv)
+                sfiltered_state_cov(kfilter, model, i, forecast_error_cov_inv)
+                if store_loglikelihood:
+                    sloglikelihood(kfilter, model, i, forecast_error_cov, forecast_error_cov_inv)
+            else:
+                for j in range(model._k_states):
+                    kfilter._kalman_gain[j + i*kfilter.k_states] = 0
+
+    # Make final filtered_state_cov symmetric (the univariate recursions only
+    # update the lower triangle) and fill in the upper triangle of the
+    # filtered diffuse state covariance matrix
+    for j in range(model._k_states):      # columns
+        for k in range(j + 1, model._k_states):  # rows (lower triangle)
+            kfilter._filtered_state_cov[j + k*kfilter.k_states] = kfilter._filtered_state_cov[k + j*kfilter.k_states]
+            kfilter._filtered_diffuse_state_cov[j + k*kfilter.k_states] = kfilter._filtered_diffuse_state_cov[k + j*kfilter.k_states]
+
+    return 0
+
+cdef np.float32_t sforecast_error_diffuse_cov(sKalmanFilter kfilter, sStatespace model, int i):
+    cdef:
+        int inc = 1
+        np.float32_t alpha = 1
+        np.float32_t beta = 0
+
+    # $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$
+    # $(m \times 1) = (m \times m) (1 \times m)'$
+    blas.sgemv("N", &model._k_states, &model._k_states,
+          &alpha, kfilter._filtered_diffuse_state_cov, &kfilter.k_states,
+                  &model._design[i], &model._k_endog,
+          &beta, &kfilter._kalman_gain[i*kfilter.k_states], &inc)
+
+    # $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$
+    # Note: zdot and cdot are broken, so have to use gemv for those
+    return blas.sdot(&model._k_states, &model._design[i], &model._k_endog,
+                                                &kfilter._kalman_gain[i*kfilter.k_states], &inc)
+
+cdef int supdating_univariate_diffuse(sKalmanFilter kfilter, sStatespace model):
+    # the updating step was performed in the forecast_univariate_diffuse step
+    return 0
+
+cdef int supdating_missing_univariate_diffuse(sKalmanFilter kfilter, sStatespace model):
+    cdef int inc = 1
+
+    # $a_{t|t} = a_t, P_{*,t|t} = P_{*,t}, P_{\infty,t|t} = P_{\infty,t}$
+    blas.scopy(&kfilter.k_states, kfilter._input_state, &inc,
+                                           kfilter._filtered_state, &inc)
+    blas.scopy(&kfilter.k_states2, kfilter._input_state_cov, &inc,
+                                            kfilter._filtered_state_cov, &inc)
+    blas.scopy(&kfilter.k_states2, kfilter._input_diffuse_state_cov, &inc,
+                                            kfilter._filtered_diffuse_state_cov, &inc)
+
+    return 0
+
+cdef np.float32_t sloglikelihood_univariate_diffuse(sKalmanFilter kfilter, sStatespace model, np.float32_t determinant):
+    # the loglikelihood was computed in the forecast_univariate_diffuse step
+    return 0
+
+cdef int sprediction_univariate_diffuse(sKalmanFilter kfilter, sStatespace model):
+    # Constants
+    cdef:
+        int inc = 1
+        int j, k
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+        np.float32_t value
+        np.float64_t max_abs = 0
+
+    # #### Predicted state for time t+1
+    # $a_{t+1} = T_t a_{t,n} + c_t$
+    spredicted_state(kfilter, model)
+
+    # #### Predicted state covariance matrices for time t+1
+    # $P_{*,t+1} = T_t P_{*,t,n} T_t' + Q_t^*$
+    spredicted_state_cov(kfilter, model)
+
+    # $P_{\infty,t+1} = T_t P_{\infty,t,n} T_t'$
+    blas.sgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._filtered_diffuse_state_cov, &kfilter.k_states,
+          &beta, kfilter._tmp0, &kfilter.k_states)
+    blas.sgemm("N", "T", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, kfilter._tmp0, &kfilter.k_states,
+                  model._transition, &model._k_states,
+          &beta, kfilter._predicted_diffuse_state_cov, &kfilter.k_states)
+
+    # Enforce symmetry and check whether the diffuse part has vanished
+    for j in range(model._k_states):      # columns
+        for k in range(j, model._k_states):  # rows
+            value = 0.5 * (
+                kfilter._predicted_diffuse_state_cov[k + j*kfilter.k_states] +
+                kfilter._predicted_diffuse_state_cov[j + k*kfilter.k_states])
+            kfilter._predicted_diffuse_state_cov[k + j*kfilter.k_states] = value
+            kfilter._predicted_diffuse_state_cov[j + k*kfilter.k_states] = value
+            if dabs(value) > max_abs:
+                max_abs = dabs(value)
+
+    # The diffuse periods end when $P_{\infty,t+1} = 0$
+    if max_abs <= kfilter.tolerance_diffuse:
+        kfilter.nobs_diffuse = kfilter.t + 1
+
+    return 0
+
+# ### Exact diffuse univariate Kalman filter
+#
+# The initial state covariance matrix is $P_1 = \kappa P_{\infty,1} + P_{*,1}$
+# with $\kappa \to \infty$. During the diffuse periods the filter tracks both
+# $P_{*,t}$ (held in the usual `*_state_cov` arrays) and $P_{\infty,t}$ (held
+# in the `*_diffuse_state_cov` arrays), and each element of the observation
+# vector is processed in turn. For element $i$ with
+# $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$, $M_{*,t,i} = P_{*,t,i} Z_{t,i}'$,
+# $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$ and
+# $F_{*,t,i} = Z_{t,i} M_{*,t,i} + \sigma_{t,i}^2$:
+#
+# If $F_{\infty,t,i} > 0$, with $K_{t,i}^{(0)} = M_{\infty,t,i} / F_{\infty,t,i}$,
+#
+# $$
+# \begin{aligned}
+# a_{t,i+1} & = a_{t,i} + K_{t,i}^{(0)} v_{t,i} \\
+# P_{*,t,i+1} & = P_{*,t,i} + K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{*,t,i} -
+#     K_{t,i}^{(0)} M_{*,t,i}' - M_{*,t,i} K_{t,i}^{(0)'} \\
+# P_{\infty,t,i+1} & = P_{\infty,t,i} - K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{\infty,t,i} \\
+# \end{aligned}
+# $$
+#
+# and otherwise the usual univariate recursions apply with $F_{*,t,i}$,
+# leaving $P_{\infty,t,i+1} = P_{\infty,t,i}$. The diffuse periods end when
+# $P_{\infty,t}$ vanishes, after which the filter continues with the method
+# given by `filter_method`.
+#
+# In the diffuse periods, the following are stored for use by the smoother:
+# `forecast_error_cov` holds $F_{*,t,i}$, `forecast_error_diffuse_cov` holds
+# $F_{\infty,t,i}$ (set to zero when it is treated as zero), `tmp1` holds
+# $M_{*,t,i}$ and `kalman_gain` holds the gain applied to the state,
+# $K_{t,i}^{(0)}$ or $K_{*,t,i} = M_{*,t,i} / F_{*,t,i}$. The other temporary
+# arrays are scaled by $F_{\infty,t,i}^{-1}$ when $F_{\infty,t,i} > 0$.
+#
+# See Durbin and Koopman (2012) Chapters 5.2 and 6.4 and Koopman and
+# Durbin (2000).
+
+cdef int dforecast_univariate_diffuse(dKalmanFilter kfilter, dStatespace model):
+
+    # Constants
+    cdef:
+        int i, j, k
+        int inc = 1
+        int store_loglikelihood
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+        np.float64_t gamma = -1.0
+        np.float64_t forecast_error_cov
+        np.float64_t forecast_error_cov_inv
+        np.float64_t forecast_error_diffuse_cov
+        np.float64_t forecast_error_diffuse_cov_inv
+        np.float64_t scalar
+
+    store_loglikelihood = (
+        not kfilter.conserve_memory & MEMORY_NO_LIKELIHOOD or
+        kfilter.t >= kfilter.loglikelihood_burn)
+
+    # Initialize the filtered states
+    blas.dcopy(&kfilter.k_states, kfilter._input_state, &inc,
+                                           kfilter._filtered_state, &inc)
+    blas.dcopy(&kfilter.k_states2, kfilter._input_state_cov, &inc,
+                                            kfilter._filtered_state_cov, &inc)
+    blas.dcopy(&kfilter.k_states2, kfilter._input_diffuse_state_cov, &inc,
+                                            kfilter._filtered_diffuse_state_cov, &inc)
+
+    # Iterate over the observations at time t
+    for i in range(model._k_endog):
+
+        # #### Forecast error for time t
+        # `forecast_error` $\equiv v_{t,i} = y_{t,i} - Z_{t,i} a_{t,i} - d_{t,i}$
+        dforecast_error(kfilter, model, i)
+
+        # #### Forecast error covariance matrices for time t
+        # $M_{*,t,i} = P_{*,t,i} Z_{t,i}'$ is stored in `tmp1`
+        # $F_{*,t,i} = Z_{t,i} M_{*,t,i} + H_{t,i}$
+        forecast_error_cov = dforecast_error_cov(kfilter, model, i)
+        # $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$ (held in `kalman_gain`)
+        # $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$
+        forecast_error_diffuse_cov = dforecast_error_diffuse_cov(kfilter, model, i)
+
+        if dabs(forecast_error_diffuse_cov) > kfilter.tolerance_diffuse:
+            kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog] = forecast_error_diffuse_cov
+            forecast_error_diffuse_cov_inv = 1.0 / forecast_error_diffuse_cov
+
+            # The standardized forecast error is not defined
+            if not (kfilter.conserve_memory & MEMORY_NO_STD_FORECAST > 0):
+                kfilter._standardized_forecast_error[i] = NAN
+
+            # Save temporary array data
+            dtemp_arrays(kfilter, model, i, forecast_error_diffuse_cov_inv)
+
+            # $K_{t,i}^{(0)} = M_{\infty,t,i} / F_{\infty,t,i}$
+            blas.dscal(&model._k_states, &forecast_error_diffuse_cov_inv,
+                                &kfilter._kalman_gain[i*kfilter.k_states], &inc)
+
+            # $a_{t,i+1} = a_{t,i} + K_{t,i}^{(0)} v_{t,i}$
+            blas.daxpy(&model._k_states, &kfilter._forecast_error[i],
+                                &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                                kfilter._filtered_state, &inc)
+
+            # $P_{*,t,i+1} = P_{*,t,i} + K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{*,t,i} -
+            #     K_{t,i}^{(0)} M_{*,t,i}' - M_{*,t,i} K_{t,i}^{(0)'}$
+            blas.dger(&model._k_states, &model._k_states,
+                &forecast_error_cov, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                                     &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+            blas.dger(&model._k_states, &model._k_states,
+                &gamma, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                        &kfilter._tmp1[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+            blas.dger(&model._k_states, &model._k_states,
+                &gamma, &kfilter._tmp1[i*kfilter.k_states], &inc,
+                        &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+
+            # $P_{\infty,t,i+1} = P_{\infty,t,i} - K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{\infty,t,i}$
+            scalar = -forecast_error_diffuse_cov
+            blas.dger(&model._k_states, &model._k_states,
+                &scalar, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                         &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_diffuse_state_cov, &kfilter.k_states)
+
+            # #### Loglikelihood
+            # The diffuse loglikelihood only includes $\log F_{\infty,t,i}$
+            if store_loglikelihood:
+                kfilter._loglikelihood[0] = (
+                    kfilter._loglikelihood[0] -
+                    0.5 * dlog(2 * NPY_PI * forecast_error_diffuse_cov))
+        else:
+            kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog] = 0
+
+            # If $F_{\infty,t,i} = 0$, then also $M_{\infty,t,i} = 0$ and the
+            # usual univariate recursions apply (in the case of a non-zero
+            # variance)
+            if not forecast_error_cov == 0:
+                forecast_error_cov_inv = 1.0 / forecast_error_cov
+                if not (kfilter.conserve_memory & MEMORY_NO_STD_FORECAST > 0):
+                    kfilter._standardized_forecast_error[i] = (
+                        kfilter._forecast_error[i] * forecast_error_cov_inv**0.5)
+
+                dtemp_arrays(kfilter, model, i, forecast_error_cov_inv)
+                dfiltered_state(kfilter, model, i, forecast_error_cov_inv)
+                dfiltered_state_cov(kfilter, model, i, forecast_error_cov_inv)
+                if store_loglikelihood:
+                    dloglikelihood(kfilter, model, i, forecast_error_cov, forecast_error_cov_inv)
+            else:
+                for j in range(model._k_states):
+                    kfilter._kalman_gain[j + i*kfilter.k_states] = 0
+
+    # Make final filtered_state_cov symmetric (the univariate recursions only
+    # update the lower triangle) and fill in the upper triangle of the
+    # filtered diffuse state covariance matrix
+    for j in range(model._k_states):      # columns
+        for k in range(j + 1, model._k_states):  # rows (lower triangle)
+            kfilter._filtered_state_cov[j + k*kfilter.k_states] = kfilter._filtered_state_cov[k + j*kfilter.k_states]
+            kfilter._filtered_diffuse_state_cov[j + k*kfilter.k_states] = kfilter._filtered_diffuse_state_cov[k + j*kfilter.k_states]
+
+    return 0
+
+cdef np.float64_t dforecast_error_diffuse_cov(dKalmanFilter kfilter, dStatespace model, int i):
+    cdef:
+        int inc = 1
+        np.float64_t alpha = 1
+        np.float64_t beta = 0
+
+    # $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$
+    # $(m \times 1) = (m \times m) (1 \times m)'$
+    blas.dgemv("N", &model._k_states, &model._k_states,
+          &alpha, kfilter._filtered_diffuse_state_cov, &kfilter.k_states,
+                  &model._design[i], &model._k_endog,
+          &beta, &kfilter._kalman_gain[i*kfilter.k_states], &inc)
+
+    # $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$
+    # Note: zdot and cdot are broken, so have to use gemv for those
+    return blas.ddot(&model._k_states, &model._design[i], &model._k_endog,
+                                                &kfilter._kalman_gain[i*kfilter.k_states], &inc)
+
+cdef int dupdating_univariate_diffuse(dKalmanFilter kfilter, dStatespace model):
+    # the updating step was performed in the forecast_univariate_diffuse step
+    return 0
+
+cdef int dupdating_missing_univariate_diffuse(dKalmanFilter kfilter, dStatespace model):
+    cdef int inc = 1
+
+    # $a_{t|t} = a_t, P_{*,t|t} = P_{*,t}, P_{\infty,t|t} = P_{\infty,t}$
+    blas.dcopy(&kfilter.k_states, kfilter._input_state, &inc,
+                                           kfilter._filtered_state, &inc)
+    blas.dcopy(&kfilter.k_states2, kfilter._input_state_cov, &inc,
+                                            kfilter._filtered_state_cov, &inc)
+    blas.dcopy(&kfilter.k_states2, kfilter._input_diffuse_state_cov, &inc,
+                                            kfilter._filtered_diffuse_state_cov, &inc)
+
+    return 0
+
+cdef np.float64_t dloglikelihood_univariate_diffuse(dKalmanFilter kfilter, dStatespace model, np.float64_t determinant):
+    # the loglikelihood was computed in the forecast_univariate_diffuse step
+    return 0
+
+cdef int dprediction_univariate_diffuse(dKalmanFilter kfilter, dStatespace model):
+    # Constants
+    cdef:
+        int inc = 1
+        int j, k
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+        np.float64_t value
+        np.float64_t max_abs = 0
+
+    # #### Predicted state for time t+1
+    # $a_{t+1} = T_t a_{t,n} + c_t$
+    dpredicted_state(kfilter, model)
+
+    # #### Predicted state covariance matrices for time t+1
+    # $P_{*,t+1} = T_t P_{*,t,n} T_t' + Q_t^*$
+    dpredicted_state_cov(kfilter, model)
+
+    # $P_{\infty,t+1} = T_t P_{\infty,t,n} T_t'$
+    blas.dgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._filtered_diffuse_state_cov, &kfilter.k_states,
+          &beta, kfilter._tmp0, &kfilter.k_states)
+    blas.dgemm("N", "T", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, kfilter._tmp0, &kfilter.k_states,
+                  model._transition, &model._k_states,
+          &beta, kfilter._predicted_diffuse_state_cov, &kfilter.k_states)
+
+    # Enforce symmetry and check whether the diffuse part has vanished
+    for j in range(model._k_states):      # columns
+        for k in range(j, model._k_states):  # rows
+            value = 0.5 * (
+                kfilter._predicted_diffuse_state_cov[k + j*kfilter.k_states] +
+                kfilter._predicted_diffuse_state_cov[j + k*kfilter.k_states])
+            kfilter._predicted_diffuse_state_cov[k + j*kfilter.k_states] = value
+            kfilter._predicted_diffuse_state_cov[j + k*kfilter.k_states] = value
+            if dabs(value) > max_abs:
+                max_abs = dabs(value)
+
+    # The diffuse periods end when $P_{\infty,t+1} = 0$
+    if max_abs <= kfilter.tolerance_diffuse:
+        kfilter.nobs_diffuse = kfilter.t + 1
+
+    return 0
+
+# ### Exact diffuse univariate Kalman filter
+#
+# The initial state covariance matrix is $P_1 = \kappa P_{\infty,1} + P_{*,1}$
+# with $\kappa \to \infty$. During the diffuse periods the filter tracks both
+# $P_{*,t}$ (held in the usual `*_state_cov` arrays) and $P_{\infty,t}$ (held
+# in the `*_diffuse_state_cov` arrays), and each element of the observation
+# vector is processed in turn. For element $i$ with
+# $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$, $M_{*,t,i} = P_{*,t,i} Z_{t,i}'$,
+# $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$ and
+# $F_{*,t,i} = Z_{t,i} M_{*,t,i} + \sigma_{t,i}^2$:
+#
+# If $F_{\infty,t,i} > 0$, with $K_{t,i}^{(0)} = M_{\infty,t,i} / F_{\infty,t,i}$,
+#
+# $$
+# \begin{aligned}
+# a_{t,i+1} & = a_{t,i} + K_{t,i}^{(0)} v_{t,i} \\
+# P_{*,t,i+1} & = P_{*,t,i} + K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{*,t,i} -
+#     K_{t,i}^{(0)} M_{*,t,i}' - M_{*,t,i} K_{t,i}^{(0)'} \\
+# P_{\infty,t,i+1} & = P_{\infty,t,i} - K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{\infty,t,i} \\
+# \end{aligned}
+# $$
+#
+# and otherwise the usual univariate recursions apply with $F_{*,t,i}$,
+# leaving $P_{\infty,t,i+1} = P_{\infty,t,i}$. The diffuse periods end when
+# $P_{\infty,t}$ vanishes, after which the filter continues with the method
+# given by `filter_method`.
+#
+# In the diffuse periods, the following are stored for use by the smoother:
+# `forecast_error_cov` holds $F_{*,t,i}$, `forecast_error_diffuse_cov` holds
+# $F_{\infty,t,i}$ (set to zero when it is treated as zero), `tmp1` holds
+# $M_{*,t,i}$ and `kalman_gain` holds the gain applied to the state,
+# $K_{t,i}^{(0)}$ or $K_{*,t,i} = M_{*,t,i} / F_{*,t,i}$. The other temporary
+# arrays are scaled by $F_{\infty,t,i}^{-1}$ when $F_{\infty,t,i} > 0$.
+#
+# See Durbin and Koopman (2012) Chapters 5.2 and 6.4 and Koopman and
+# Durbin (2000).
+
+cdef int cforecast_univariate_diffuse(cKalmanFilter kfilter, cStatespace model):
+
+    # Constants
+    cdef:
+        int i, j, k
+        int inc = 1
+        int store_loglikelihood
+        np.complex64_t alpha = 1.0
+        np.complex64_t beta = 0.0
+        np.complex64_t gamma = -1.0
+        np.complex64_t forecast_error_cov
+        np.complex64_t forecast_error_cov_inv
+        np.complex64_t forecast_error_diffuse_cov
+        np.complex64_t forecast_error_diffuse_cov_inv
+        np.complex64_t scalar
+
+    store_loglikelihood = (
+        not kfilter.conserve_memory & MEMORY_NO_LIKELIHOOD or
+        kfilter.t >= kfilter.loglikelihood_burn)
+
+    # Initialize the filtered states
+    blas.ccopy(&kfilter.k_states, kfilter._input_state, &inc,
+                                           kfilter._filtered_state, &inc)
+    blas.ccopy(&kfilter.k_states2, kfilter._input_state_cov, &inc,
+                                            kfilter._filtered_state_cov, &inc)
+    blas.ccopy(&kfilter.k_states2, kfilter._input_diffuse_state_cov, &inc,
+                                            kfilter._filtered_diffuse_state_cov, &inc)
+
+    # Iterate over the observations at time t
+    for i in range(model._k_endog):
+
+        # #### Forecast error for time t
+        # `forecast_error` $\equiv v_{t,i} = y_{t,i} - Z_{t,i} a_{t,i} - d_{t,i}$
+        cforecast_error(kfilter, model, i)
+
+        # #### Forecast error covariance matrices for time t
+        # $M_{*,t,i} = P_{*,t,i} Z_{t,i}'$ is stored in `tmp1`
+        # $F_{*,t,i} = Z_{t,i} M_{*,t,i} + H_{t,i}$
+        forecast_error_cov = cforecast_error_cov(kfilter, model, i)
+        # $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$ (held in `kalman_gain`)
+        # $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$
+        forecast_error_diffuse_cov = cforecast_error_diffuse_cov(kfilter, model, i)
+
+        if zabs(forecast_error_diffuse_cov) > kfilter.tolerance_diffuse:
+            kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog] = forecast_error_diffuse_cov
+            forecast_error_diffuse_cov_inv = 1.0 / forecast_error_diffuse_cov
+
+            # The standardized forecast error is not defined
+            if not (kfilter.conserve_memory & MEMORY_NO_STD_FORECAST > 0):
+                kfilter._standardized_forecast_error[i] = NAN
+
+            # Save temporary array data
+            ctemp_arrays(kfilter, model, i, forecast_error_diffuse_cov_inv)
+
+            # $K_{t,i}^{(0)} = M_{\infty,t,i} / F_{\infty,t,i}$
+            blas.cscal(&model._k_states, &forecast_error_diffuse_cov_inv,
+                                &kfilter._kalman_gain[i*kfilter.k_states], &inc)
+
+            # $a_{t,i+1} = a_{t,i} + K_{t,i}^{(0)} v_{t,i}$
+            blas.caxpy(&model._k_states, &kfilter._forecast_error[i],
+                                &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                                kfilter._filtered_state, &inc)
+
+            # $P_{*,t,i+1} = P_{*,t,i} + K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{*,t,i} -
+            #     K_{t,i}^{(0)} M_{*,t,i}' - M_{*,t,i} K_{t,i}^{(0)'}$
+            blas.cgeru(&model._k_states, &model._k_states,
+                &forecast_error_cov, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                                     &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+            blas.cgeru(&model._k_states, &model._k_states,
+                &gamma, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                        &kfilter._tmp1[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+            blas.cgeru(&model._k_states, &model._k_states,
+                &gamma, &kfilter._tmp1[i*kfilter.k_states], &inc,
+                        &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+
+            # $P_{\infty,t,i+1} = P_{\infty,t,i} - K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{\infty,t,i}$
+            scalar = -forecast_error_diffuse_cov
+            blas.cgeru(&model._k_states, &model._k_states,
+                &scalar, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                         &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_diffuse_state_cov, &kfilter.k_states)
+
+            # #### Loglikelihood
+            # The diffuse loglikelihood only includes $\log F_{\infty,t,i}$
+            if store_loglikelihood:
+                kfilter._loglikelihood[0] = (
+                    kfilter._loglikelihood[0] -
+                    0.5 * zlog(2 * NPY_PI * forecast_error_diffuse_cov))
+        else:
+            kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog] = 0
+
+            # If $F_{\infty,t,i} = 0$, then also $M_{\infty,t,i} = 0$ and the
+            # usual univariate recursions apply (in the case of a non-zero
+            # variance)
+            if not forecast_error_cov == 0:
+                forecast_error_cov_inv = 1.0 / forecast_error_cov
+                if not (kfilter.conserve_memory & MEMORY_NO_STD_FORECAST > 0):
+                    kfilter._standardized_forecast_error[i] = (
+                        kfilter._forecast_error[i] * forecast_error_cov_inv**0.5)
+
+                ctemp_arrays(kfilter, model, i, forecast_error_cov_inv)
+                cfiltered_state(kfilter, model, i, forecast_error_cov_inv)
+                cfiltered_state_cov(kfilter, model, i, forecast_error_cov_inv)
+                if store_loglikelihood:
+                    cloglikelihood(kfilter, model, i, forecast_error_cov, forecast_error_cov_inv)
+            else:
+                for j in range(model._k_states):
+                    kfilter._kalman_gain[j + i*kfilter.k_states] = 0
+
+    # Make final filtered_state_cov symmetric (the univariate recursions only
+    # update the lower triangle) and fill in the upper triangle of the
+    # filtered diffuse state covariance matrix
+    for j in range(model._k_states):      # columns
+        for k in range(j + 1, model._k_states):  # rows (lower triangle)
+            kfilter._filtered_state_cov[j + k*kfilter.k_states] = kfilter._filtered_state_cov[k + j*kfilter.k_states]
+            kfilter._filtered_diffuse_state_cov[j + k*kfilter.k_states] = kfilter._filtered_diffuse_state_cov[k + j*kfilter.k_states]
+
+    return 0
+
+cdef np.complex64_t cforecast_error_diffuse_cov(cKalmanFilter kfilter, cStatespace model, int i):
+    cdef:
+        int inc = 1
+        np.complex64_t alpha = 1
+        np.complex64_t beta = 0
+
+    # $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$
+    # $(m \times 1) = (m \times m) (1 \times m)'$
+    blas.cgemv("N", &model._k_states, &model._k_states,
+          &alpha, kfilter._filtered_diffuse_state_cov, &kfilter.k_states,
+                  &model._design[i], &model._k_endog,
+          &beta, &kfilter._kalman_gain[i*kfilter.k_states], &inc)
+
+    # $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$
+    # Note: zdot and cdot are broken, so have to use gemv for those
+    blas.cgemv("N", &inc, &model._k_states,
+                   &alpha, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                           &model._design[i], &model._k_endog,
+                   &beta, kfilter._tmp0, &inc)
+    return kfilter._tmp0[0]
+
+cdef int cupdating_univariate_diffuse(cKalmanFilter kfilter, cStatespace model):
+    # the updating step was performed in the forecast_univariate_diffuse step
+    return 0
+
+cdef int cupdating_missing_univariate_diffuse(cKalmanFilter kfilter, cStatespace model):
+    cdef int inc = 1
+
+    # $a_{t|t} = a_t, P_{*,t|t} = P_{*,t}, P_{\infty,t|t} = P_{\infty,t}$
+    blas.ccopy(&kfilter.k_states, kfilter._input_state, &inc,
+                                           kfilter._filtered_state, &inc)
+    blas.ccopy(&kfilter.k_states2, kfilter._input_state_cov, &inc,
+                                            kfilter._filtered_state_cov, &inc)
+    blas.ccopy(&kfilter.k_states2, kfilter._input_diffuse_state_cov, &inc,
+                                            kfilter._filtered_diffuse_state_cov, &inc)
+
+    return 0
+
+cdef np.complex64_t cloglikelihood_univariate_diffuse(cKalmanFilter kfilter, cStatespace model, np.complex64_t determinant):
+    # the loglikelihood was computed in the forecast_univariate_diffuse step
+    return 0
+
+cdef int cprediction_univariate_diffuse(cKalmanFilter kfilter, cStatespace model):
+    # Constants
+    cdef:
+        int inc = 1
+        int j, k
+        np.complex64_t alpha = 1.0
+        np.complex64_t beta = 0.0
+        np.complex64_t value
+        np.float64_t max_abs = 0
+
+    # #### Predicted state for time t+1
+    # $a_{t+1} = T_t a_{t,n} + c_t$
+    cpredicted_state(kfilter, model)
+
+    # #### Predicted state covariance matrices for time t+1
+    # $P_{*,t+1} = T_t P_{*,t,n} T_t' + Q_t^*$
+    cpredicted_state_cov(kfilter, model)
+
+    # $P_{\infty,t+1} = T_t P_{\infty,t,n} T_t'$
+    blas.cgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._filtered_diffuse_state_cov, &kfilter.k_states,
+          &beta, kfilter._tmp0, &kfilter.k_states)
+    blas.cgemm("N", "T", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, kfilter._tmp0, &kfilter.k_states,
+                  model._transition, &model._k_states,
+          &beta, kfilter._predicted_diffuse_state_cov, &kfilter.k_states)
+
+    # Enforce symmetry and check whether the diffuse part has vanished
+    for j in range(model._k_states):      # columns
+        for k in range(j, model._k_states):  # rows
+            value = 0.5 * (
+                kfilter._predicted_diffuse_state_cov[k + j*kfilter.k_states] +
+                kfilter._predicted_diffuse_state_cov[j + k*kfilter.k_states])
+            kfilter._predicted_diffuse_state_cov[k + j*kfilter.k_states] = value
+            kfilter._predicted_diffuse_state_cov[j + k*kfilter.k_states] = value
+            if zabs(value) > max_abs:
+                max_abs = zabs(value)
+
+    # The diffuse periods end when $P_{\infty,t+1} = 0$
+    if max_abs <= kfilter.tolerance_diffuse:
+        kfilter.nobs_diffuse = kfilter.t + 1
+
+    return 0
+
+# ### Exact diffuse univariate Kalman filter
+#
+# The initial state covariance matrix is $P_1 = \kappa P_{\infty,1} + P_{*,1}$
+# with $\kappa \to \infty$. During the diffuse periods the filter tracks both
+# $P_{*,t}$ (held in the usual `*_state_cov` arrays) and $P_{\infty,t}$ (held
+# in the `*_diffuse_state_cov` arrays), and each element of the observation
+# vector is processed in turn. For element $i$ with
+# $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$, $M_{*,t,i} = P_{*,t,i} Z_{t,i}'$,
+# $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$ and
+# $F_{*,t,i} = Z_{t,i} M_{*,t,i} + \sigma_{t,i}^2$:
+#
+# If $F_{\infty,t,i} > 0$, with $K_{t,i}^{(0)} = M_{\infty,t,i} / F_{\infty,t,i}$,
+#
+# $$
+# \begin{aligned}
+# a_{t,i+1} & = a_{t,i} + K_{t,i}^{(0)} v_{t,i} \\
+# P_{*,t,i+1} & = P_{*,t,i} + K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{*,t,i} -
+#     K_{t,i}^{(0)} M_{*,t,i}' - M_{*,t,i} K_{t,i}^{(0)'} \\
+# P_{\infty,t,i+1} & = P_{\infty,t,i} - K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{\infty,t,i} \\
+# \end{aligned}
+# $$
+#
+# and otherwise the usual univariate recursions apply with $F_{*,t,i}$,
+# leaving $P_{\infty,t,i+1} = P_{\infty,t,i}$. The diffuse periods end when
+# $P_{\infty,t}$ vanishes, after which the filter continues with the method
+# given by `filter_method`.
+#
+# In the diffuse periods, the following are stored for use by the smoother:
+# `forecast_error_cov` holds $F_{*,t,i}$, `forecast_error_diffuse_cov` holds
+# $F_{\infty,t,i}$ (set to zero when it is treated as zero), `tmp1` holds
+# $M_{*,t,i}$ and `kalman_gain` holds the gain applied to the state,
+# $K_{t,i}^{(0)}$ or $K_{*,t,i} = M_{*,t,i} / F_{*,t,i}$. The other temporary
+# arrays are scaled by $F_{\infty,t,i}^{-1}$ when $F_{\infty,t,i} > 0$.
+#
+# See Durbin and Koopman (2012) Chapters 5.2 and 6.4 and Koopman and
+# Durbin (2000).
+
+cdef int zforecast_univariate_diffuse(zKalmanFilter kfilter, zStatespace model):
+
+    # Constants
+    cdef:
+        int i, j, k
+        int inc = 1
+        int store_loglikelihood
+        np.complex128_t alpha = 1.0
+        np.complex128_t beta = 0.0
+        np.complex128_t gamma = -1.0
+        np.complex128_t forecast_error_cov
+        np.complex128_t forecast_error_cov_inv
+        np.complex128_t forecast_error_diffuse_cov
+        np.complex128_t forecast_error_diffuse_cov_inv
+        np.complex128_t scalar
+
+    store_loglikelihood = (
+        not kfilter.conserve_memory & MEMORY_NO_LIKELIHOOD or
+        kfilter.t >= kfilter.loglikelihood_burn)
+
+    # Initialize the filtered states
+    blas.zcopy(&kfilter.k_states, kfilter._input_state, &inc,
+                                           kfilter._filtered_state, &inc)
+    blas.zcopy(&kfilter.k_states2, kfilter._input_state_cov, &inc,
+                                            kfilter._filtered_state_cov, &inc)
+    blas.zcopy(&kfilter.k_states2, kfilter._input_diffuse_state_cov, &inc,
+                                            kfilter._filtered_diffuse_state_cov, &inc)
+
+    # Iterate over the observations at time t
+    for i in range(model._k_endog):
+
+        # #### Forecast error for time t
+        # `forecast_error` $\equiv v_{t,i} = y_{t,i} - Z_{t,i} a_{t,i} - d_{t,i}$
+        zforecast_error(kfilter, model, i)
+
+        # #### Forecast error covariance matrices for time t
+        # $M_{*,t,i} = P_{*,t,i} Z_{t,i}'$ is stored in `tmp1`
+        # $F_{*,t,i} = Z_{t,i} M_{*,t,i} + H_{t,i}$
+        forecast_error_cov = zforecast_error_cov(kfilter, model, i)
+        # $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$ (held in `kalman_gain`)
+        # $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$
+        forecast_error_diffuse_cov = zforecast_error_diffuse_cov(kfilter, model, i)
+
+        if zabs(forecast_error_diffuse_cov) > kfilter.tolerance_diffuse:
+            kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog] = forecast_error_diffuse_cov
+            forecast_error_diffuse_cov_inv = 1.0 / forecast_error_diffuse_cov
+
+            # The standardized forecast error is not defined
+            if not (kfilter.conserve_memory & MEMORY_NO_STD_FORECAST > 0):
+                kfilter._standardized_forecast_error[i] = NAN
+
+            # Save temporary array data
+            ztemp_arrays(kfilter, model, i, forecast_error_diffuse_cov_inv)
+
+            # $K_{t,i}^{(0)} = M_{\infty,t,i} / F_{\infty,t,i}$
+            blas.zscal(&model._k_states, &forecast_error_diffuse_cov_inv,
+                                &kfilter._kalman_gain[i*kfilter.k_states], &inc)
+
+            # $a_{t,i+1} = a_{t,i} + K_{t,i}^{(0)} v_{t,i}$
+            blas.zaxpy(&model._k_states, &kfilter._forecast_error[i],
+                                &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                                kfilter._filtered_state, &inc)
+
+            # $P_{*,t,i+1} = P_{*,t,i} + K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{*,t,i} -
+            #     K_{t,i}^{(0)} M_{*,t,i}' - M_{*,t,i} K_{t,i}^{(0)'}$
+            blas.zgeru(&model._k_states, &model._k_states,
+                &forecast_error_cov, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                                     &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+            blas.zgeru(&model._k_states, &model._k_states,
+                &gamma, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                        &kfilter._tmp1[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+            blas.zgeru(&model._k_states, &model._k_states,
+                &gamma, &kfilter._tmp1[i*kfilter.k_states], &inc,
+                        &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_state_cov, &kfilter.k_states)
+
+            # $P_{\infty,t,i+1} = P_{\infty,t,i} - K_{t,i}^{(0)} K_{t,i}^{(0)'} F_{\infty,t,i}$
+            scalar = -forecast_error_diffuse_cov
+            blas.zgeru(&model._k_states, &model._k_states,
+                &scalar, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                         &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                kfilter._filtered_diffuse_state_cov, &kfilter.k_states)
+
+            # #### Loglikelihood
+            # The diffuse loglikelihood only includes $\log F_{\infty,t,i}$
+            if store_loglikelihood:
+                kfilter._loglikelihood[0] = (
+                    kfilter._loglikelihood[0] -
+                    0.5 * zlog(2 * NPY_PI * forecast_error_diffuse_cov))
+        else:
+            kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog] = 0
+
+            # If $F_{\infty,t,i} = 0$, then also $M_{\infty,t,i} = 0$ and the
+            # usual univariate recursions apply (in the case of a non-zero
+            # variance)
+            if not forecast_error_cov == 0:
+                forecast_error_cov_inv = 1.0 / forecast_error_cov
+                if not (kfilter.conserve_memory & MEMORY_NO_STD_FORECAST > 0):
+                    kfilter._standardized_forecast_error[i] = (
+                        kfilter._forecast_error[i] * forecast_error_cov_inv**0.5)
+
+                ztemp_arrays(kfilter, model, i, forecast_error_cov_inv)
+                zfiltered_state(kfilter, model, i, forecast_error_cov_inv)
+                zfiltered_state_cov(kfilter, model, i, forecast_error_cov_inv)
+                if store_loglikelihood:
+                    zloglikelihood(kfilter, model, i, forecast_error_cov, forecast_error_cov_inv)
+            else:
+                for j in range(model._k_states):
+                    kfilter._kalman_gain[j + i*kfilter.k_states] = 0
+
+    # Make final filtered_state_cov symmetric (the univariate recursions only
+    # update the lower triangle) and fill in the upper triangle of the
+    # filtered diffuse state covariance matrix
+    for j in range(model._k_states):      # columns
+        for k in range(j + 1, model._k_states):  # rows (lower triangle)
+            kfilter._filtered_state_cov[j + k*kfilter.k_states] = kfilter._filtered_state_cov[k + j*kfilter.k_states]
+            kfilter._filtered_diffuse_state_cov[j + k*kfilter.k_states] = kfilter._filtered_diffuse_state_cov[k + j*kfilter.k_states]
+
+    return 0
+
+cdef np.complex128_t zforecast_error_diffuse_cov(zKalmanFilter kfilter, zStatespace model, int i):
+    cdef:
+        int inc = 1
+        np.complex128_t alpha = 1
+        np.complex128_t beta = 0
+
+    # $M_{\infty,t,i} = P_{\infty,t,i} Z_{t,i}'$
+    # $(m \times 1) = (m \times m) (1 \times m)'$
+    blas.zgemv("N", &model._k_states, &model._k_states,
+          &alpha, kfilter._filtered_diffuse_state_cov, &kfilter.k_states,
+                  &model._design[i], &model._k_endog,
+          &beta, &kfilter._kalman_gain[i*kfilter.k_states], &inc)
+
+    # $F_{\infty,t,i} = Z_{t,i} M_{\infty,t,i}$
+    # Note: zdot and cdot are broken, so have to use gemv for those
+    blas.zgemv("N", &inc, &model._k_states,
+                   &alpha, &kfilter._kalman_gain[i*kfilter.k_states], &inc,
+                           &model._design[i], &model._k_endog,
+                   &beta, kfilter._tmp0, &inc)
+    return kfilter._tmp0[0]
+
+cdef int zupdating_univariate_diffuse(zKalmanFilter kfilter, zStatespace model):
+    # the updating step was performed in the forecast_univariate_diffuse step
+    return 0
+
+cdef int zupdating_missing_univariate_diffuse(zKalmanFilter kfilter, zStatespace model):
+    cdef int inc = 1
+
+    # $a_{t|t} = a_t, P_{*,t|t} = P_{*,t}, P_{\infty,t|t} = P_{\infty,t}$
+    blas.zcopy(&kfilter.k_states, kfilter._input_state, &inc,
+                                           kfilter._filtered_state, &inc)
+    blas.zcopy(&kfilter.k_states2, kfilter._input_state_cov, &inc,
+                                            kfilter._filtered_state_cov, &inc)
+    blas.zcopy(&kfilter.k_states2, kfilter._input_diffuse_state_cov, &inc,
+                                            kfilter._filtered_diffuse_state_cov, &inc)
+
+    return 0
+
+cdef np.complex128_t zloglikelihood_univariate_diffuse(zKalmanFilter kfilter, zStatespace model, np.complex128_t determinant):
+    # the loglikelihood was computed in the forecast_univariate_diffuse step
+    return 0
+
+cdef int zprediction_univariate_diffuse(zKalmanFilter kfilter, zStatespace model):
+    # Constants
+    cdef:
+        int inc = 1
+        int j, k
+        np.complex128_t alpha = 1.0
+        np.complex128_t beta = 0.0
+        np.complex128_t value
+        np.float64_t max_abs = 0
+
+    # #### Predicted state for time t+1
+    # $a_{t+1} = T_t a_{t,n} + c_t$
+    zpredicted_state(kfilter, model)
+
+    # #### Predicted state covariance matrices for time t+1
+    # $P_{*,t+1} = T_t P_{*,t,n} T_t' + Q_t^*$
+    zpredicted_state_cov(kfilter, model)
+
+    # $P_{\infty,t+1} = T_t P_{\infty,t,n} T_t'$
+    blas.zgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, model._transition, &model._k_states,
+                  kfilter._filtered_diffuse_state_cov, &kfilter.k_states,
+          &beta, kfilter._tmp0, &kfilter.k_states)
+    blas.zgemm("N", "T", &model._k_states, &model._k_states, &model._k_states,
+          &alpha, kfilter._tmp0, &kfilter.k_states,
+                  model._transition, &model._k_states,
+          &beta, kfilter._predicted_diffuse_state_cov, &kfilter.k_states)
+
+    # Enforce symmetry and check whether the diffuse part has vanished
+    for j in range(model._k_states):      # columns
+        for k in range(j, model._k_states):  # rows
+            value = 0.5 * (
+                kfilter._predicted_diffuse_state_cov[k + j*kfilter.k_states] +
+                kfilter._predicted_diffuse_state_cov[j + k*kfilter.k_states])
+            kfilter._predicted_diffuse_state_cov[k + j*kfilter.k_states] = value
+            kfilter._predicted_diffuse_state_cov[j + k*kfilter.k_states] = value
+            if zabs(value) > max_abs:
+                max_abs = zabs(value)
+
+    # The diffuse periods end when $P_{\infty,t+1} = 0$
+    if max_abs <= kfilter.tolerance_diffuse:
+        kfilter.nobs_diffuse = kfilter.t + 1
+
+    return 0
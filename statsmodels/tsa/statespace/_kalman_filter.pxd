@@ -19,7 +19,8 @@ cdef int FILTER_UNIVARIATE       # ibid., Chapter 6.4
 cdef int FILTER_COLLAPSED        # ibid., Chapter 6.5
 cdef int FILTER_EXTENDED         # ibid., Chapter 10.2
 cdef int FILTER_UNSCENTED        # ibid., Chapter 10.3
-cdef int SMOOTHER_CLASSICAL      # ibid., Chapter 4.6.1
+cdef int FILTER_CHANDRASEKHAR    # Morf, Sidhu and Kailath (1974)
+cdef int SMOOTHER_CLASSICAL      # Durbin and Koopman (2012), Chapter 4.6.1
 cdef int SMOOTHER_ALTERNATIVE    # 
 
 # ### Inversion methods
@@ -96,6 +97,23 @@ cdef class sKalmanFilter(object):
     cdef readonly np.float32_t [::1,:] tmp2
     cdef readonly np.float32_t [::1,:,:] tmp1, tmp3, tmp4
 
+    # ### Square-root filter arrays
+    cdef readonly np.float32_t [::1,:] predicted_state_cov_sqrt, filtered_state_cov_sqrt
+    cdef readonly np.float32_t [::1,:] sqrt_work
+    cdef readonly np.float32_t [:] sqrt_tau
+    cdef readonly int sqrt_predicted_t, sqrt_filtered_t
+
+    # ### Chandrasekhar recursion arrays
+    cdef readonly np.float32_t [::1,:] chandrasekhar_W, chandrasekhar_M, chandrasekhar_work
+    cdef readonly np.float32_t [::1,:] chandrasekhar_ZW, chandrasekhar_G, chandrasekhar_F
+    cdef readonly np.float32_t [:] chandrasekhar_eig
+    cdef readonly int chandrasekhar_t, chandrasekhar_rank
+
+    # ### Exact diffuse filter arrays
+    cdef readonly np.float32_t [::1,:,:] predicted_diffuse_state_cov, filtered_diffuse_state_cov, forecast_error_diffuse_cov
+    cdef readonly int nobs_diffuse
+    cdef public np.float64_t tolerance_diffuse
+
     cdef readonly np.float32_t determinant
 
     # ### Pointers to current-iteration arrays
@@ -142,6 +160,24 @@ cdef class sKalmanFilter(object):
     cdef np.float32_t * _tmp3
     cdef np.float32_t * _tmp4
 
+    cdef np.float32_t * _predicted_state_cov_sqrt
+    cdef np.float32_t * _filtered_state_cov_sqrt
+    cdef np.float32_t * _sqrt_work
+    cdef np.float32_t * _sqrt_tau
+
+    cdef np.float32_t * _chandrasekhar_W
+    cdef np.float32_t * _chandrasekhar_M
+    cdef np.float32_t * _chandrasekhar_work
+    cdef np.float32_t * _chandrasekhar_ZW
+    cdef np.float32_t * _chandrasekhar_G
+    cdef np.float32_t * _chandrasekhar_F
+    cdef np.float32_t * _chandrasekhar_eig
+
+    cdef np.float32_t * _input_diffuse_state_cov
+    cdef np.float32_t * _predicted_diffuse_state_cov
+    cdef np.float32_t * _filtered_diffuse_state_cov
+    cdef np.float32_t * _forecast_error_diffuse_cov
+
     # ### Pointers to current-iteration Kalman filtering functions
     cdef int (*forecasting)(
         sKalmanFilter, sStatespace
@@ -161,7 +197,7 @@ cdef class sKalmanFilter(object):
 
     # ### Define some constants
     cdef readonly int k_endog, k_states, k_posdef, k_endog2, k_states2, k_posdef2, k_endogstates, k_statesposdef
-    cdef readonly int ldwork
+    cdef readonly int ldwork, ldsqrt, lsqrt_work, lchandrasekhar_work
     
     cdef allocate_arrays(self)
     cdef void set_dimensions(self)
@@ -176,6 +212,9 @@ cdef class sKalmanFilter(object):
     cdef void check_convergence(self)
     cdef void migrate_storage(self)
     cdef void _reinitialize_pointers(self) except *
+    cdef void _reinitialize_square_root_pointers(self) except *
+    cdef void _reinitialize_chandrasekhar_pointers(self) except *
+    cdef void allocate_diffuse_arrays(self)
 
     cdef void _forecasting(self)
     cdef np.float32_t _inversion(self)
@@ -222,6 +261,23 @@ cdef class dKalmanFilter(object):
     cdef readonly np.float64_t [::1,:] tmp2
     cdef readonly np.float64_t [::1,:,:] tmp1, tmp3, tmp4
 
+    # ### Square-root filter arrays
+    cdef readonly np.float64_t [::1,:] predicted_state_cov_sqrt, filtered_state_cov_sqrt
+    cdef readonly np.float64_t [::1,:] sqrt_work
+    cdef readonly np.float64_t [:] sqrt_tau
+    cdef readonly int sqrt_predicted_t, sqrt_filtered_t
+
+    # ### Chandrasekhar recursion arrays
+    cdef readonly np.float64_t [::1,:] chandrasekhar_W, chandrasekhar_M, chandrasekhar_work
+    cdef readonly np.float64_t [::1,:] chandrasekhar_ZW, chandrasekhar_G, chandrasekhar_F
+    cdef readonly np.float64_t [:] chandrasekhar_eig
+    cdef readonly int chandrasekhar_t, chandrasekhar_rank
+
+    # ### Exact diffuse filter arrays
+    cdef readonly np.float64_t [::1,:,:] predicted_diffuse_state_cov, filtered_diffuse_state_cov, forecast_error_diffuse_cov
+    cdef readonly int nobs_diffuse
+    cdef public np.float64_t tolerance_diffuse
+
     cdef readonly np.float64_t determinant
 
     # ### Pointers to current-iteration arrays
@@ -268,6 +324,24 @@ cdef class dKalmanFilter(object):
     cdef np.float64_t * _tmp3
     cdef np.float64_t * _tmp4
 
+    cdef np.float64_t * _predicted_state_cov_sqrt
+    cdef np.float64_t * _filtered_state_cov_sqrt
+    cdef np.float64_t * _sqrt_work
+    cdef np.float64_t * _sqrt_tau
+
+    cdef np.float64_t * _chandrasekhar_W
+    cdef np.float64_t * _chandrasekhar_M
+    cdef np.float64_t * _chandrasekhar_work
+    cdef np.float64_t * _chandrasekhar_ZW
+    cdef np.float64_t * _chandrasekhar_G
+    cdef np.float64_t * _chandrasekhar_F
+    cdef np.float64_t * _chandrasekhar_eig
+
+    cdef np.float64_t * _input_diffuse_state_cov
+    cdef np.float64_t * _predicted_diffuse_state_cov
+    cdef np.float64_t * _filtered_diffuse_state_cov
+    cdef np.float64_t * _forecast_error_diffuse_cov
+
     # ### Pointers to current-iteration Kalman filtering functions
     cdef int (*forecasting)(
         dKalmanFilter, dStatespace
@@ -287,7 +361,7 @@ cdef class dKalmanFilter(object):
 
     # ### Define some constants
     cdef readonly int k_endog, k_states, k_posdef, k_endog2, k_states2, k_posdef2, k_endogstates, k_statesposdef
-    cdef readonly int ldwork
+    cdef readonly int ldwork, ldsqrt, lsqrt_work, lchandrasekhar_work
     
     cdef allocate_arrays(self)
     cdef void set_dimensions(self)
@@ -302,6 +376,9 @@ cdef class dKalmanFilter(object):
     cdef void check_convergence(self)
     cdef void migrate_storage(self)
     cdef void _reinitialize_pointers(self) except *
+    cdef void _reinitialize_square_root_pointers(self) except *
+    cdef void _reinitialize_chandrasekhar_pointers(self) except *
+    cdef void allocate_diffuse_arrays(self)
 
     cdef void _forecasting(self)
     cdef np.float64_t _inversion(self)
@@ -348,6 +425,23 @@ cdef class cKalmanFilter(object):
     cdef readonly np.complex64_t [::1,:] tmp2
     cdef readonly np.complex64_t [::1,:,:] tmp1, tmp3, tmp4
 
+    # ### Square-root filter arrays
+    cdef readonly np.complex64_t [::1,:] predicted_state_cov_sqrt, filtered_state_cov_sqrt
+    cdef readonly np.complex64_t [::1,:] sqrt_work
+    cdef readonly np.complex64_t [:] sqrt_tau
+    cdef readonly int sqrt_predicted_t, sqrt_filtered_t
+
+    # ### Chandrasekhar recursion arrays
+    cdef readonly np.complex64_t [::1,:] chandrasekhar_W, chandrasekhar_M, chandrasekhar_work
+    cdef readonly np.complex64_t [::1,:] chandrasekhar_ZW, chandrasekhar_G, chandrasekhar_F
+    cdef readonly np.complex64_t [:] chandrasekhar_eig
+    cdef readonly int chandrasekhar_t, chandrasekhar_rank
+
+    # ### Exact diffuse filter arrays
+    cdef readonly np.complex64_t [::1,:,:] predicted_diffuse_state_cov, filtered_diffuse_state_cov, forecast_error_diffuse_cov
+    cdef readonly int nobs_diffuse
+    cdef public np.float64_t tolerance_diffuse
+
     cdef readonly np.complex64_t determinant
 
     # ### Pointers to current-iteration arrays
@@ -394,6 +488,24 @@ cdef class cKalmanFilter(object):
     cdef np.complex64_t * _tmp3
     cdef np.complex64_t * _tmp4
 
+    cdef np.complex64_t * _predicted_state_cov_sqrt
+    cdef np.complex64_t * _filtered_state_cov_sqrt
+    cdef np.complex64_t * _sqrt_work
+    cdef np.complex64_t * _sqrt_tau
+
+    cdef np.complex64_t * _chandrasekhar_W
+    cdef np.complex64_t * _chandrasekhar_M
+    cdef np.complex64_t * _chandrasekhar_work
+    cdef np.complex64_t * _chandrasekhar_ZW
+    cdef np.complex64_t * _chandrasekhar_G
+    cdef np.complex64_t * _chandrasekhar_F
+    cdef np.complex64_t * _chandrasekhar_eig
+
+    cdef np.complex64_t * _input_diffuse_state_cov
+    cdef np.complex64_t * _predicted_diffuse_state_cov
+    cdef np.complex64_t * _filtered_diffuse_state_cov
+    cdef np.complex64_t * _forecast_error_diffuse_cov
+
     # ### Pointers to current-iteration Kalman filtering functions
     cdef int (*forecasting)(
         cKalmanFilter, cStatespace
@@ -413,7 +525,7 @@ cdef class cKalmanFilter(object):
 
     # ### Define some constants
     cdef readonly int k_endog, k_states, k_posdef, k_endog2, k_states2, k_posdef2, k_endogstates, k_statesposdef
-    cdef readonly int ldwork
+    cdef readonly int ldwork, ldsqrt, lsqrt_work, lchandrasekhar_work
     
     cdef allocate_arrays(self)
     cdef void set_dimensions(self)
@@ -428,6 +540,9 @@ cdef class cKalmanFilter(object):
     cdef void check_convergence(self)
     cdef void migrate_storage(self)
     cdef void _reinitialize_pointers(self) except *
+    cdef void _reinitialize_square_root_pointers(self) except *
+    cdef void _reinitialize_chandrasekhar_pointers(self) except *
+    cdef void allocate_diffuse_arrays(self)
 
     cdef void _forecasting(self)
     cdef np.complex64_t _inversion(self)
@@ -474,6 +589,23 @@ cdef class zKalmanFilter(object):
     cdef readonly np.complex128_t [::1,:] tmp2
     cdef readonly np.complex128_t [::1,:,:] tmp1, tmp3, tmp4
 
+    # ### Square-root filter arrays
+    cdef readonly np.complex128_t [::1,:] predicted_state_cov_sqrt, filtered_state_cov_sqrt
+    cdef readonly np.complex128_t [::1,:] sqrt_work
+    cdef readonly np.complex128_t [:] sqrt_tau
+    cdef readonly int sqrt_predicted_t, sqrt_filtered_t
+
+    # ### Chandrasekhar recursion arrays
+    cdef readonly np.complex128_t [::1,:] chandrasekhar_W, chandrasekhar_M, chandrasekhar_work
+    cdef readonly np.complex128_t [::1,:] chandrasekhar_ZW, chandrasekhar_G, chandrasekhar_F
+    cdef readonly np.complex128_t [:] chandrasekhar_eig
+    cdef readonly int chandrasekhar_t, chandrasekhar_rank
+
+    # ### Exact diffuse filter arrays
+    cdef readonly np.complex128_t [::1,:,:] predicted_diffuse_state_cov, filtered_diffuse_state_cov, forecast_error_diffuse_cov
+    cdef readonly int nobs_diffuse
+    cdef public np.float64_t tolerance_diffuse
+
     cdef readonly np.complex128_t determinant
 
     # ### Pointers to current-iteration arrays
@@ -520,6 +652,24 @@ cdef class zKalmanFilter(object):
     cdef np.complex128_t * _tmp3
     cdef np.complex128_t * _tmp4
 
+    cdef np.complex128_t * _predicted_state_cov_sqrt
+    cdef np.complex128_t * _filtered_state_cov_sqrt
+    cdef np.complex128_t * _sqrt_work
+    cdef np.complex128_t * _sqrt_tau
+
+    cdef np.complex128_t * _chandrasekhar_W
+    cdef np.complex128_t * _chandrasekhar_M
+    cdef np.complex128_t * _chandrasekhar_work
+    cdef np.complex128_t * _chandrasekhar_ZW
+    cdef np.complex128_t * _chandrasekhar_G
+    cdef np.complex128_t * _chandrasekhar_F
+    cdef np.complex128_t * _chandrasekhar_eig
+
+    cdef np.complex128_t * _input_diffuse_state_cov
+    cdef np.complex128_t * _predicted_diffuse_state_cov
+    cdef np.complex128_t * _filtered_diffuse_state_cov
+    cdef np.complex128_t * _forecast_error_diffuse_cov
+
     # ### Pointers to current-iteration Kalman filtering functions
     cdef int (*forecasting)(
         zKalmanFilter, zStatespace
@@ -539,7 +689,7 @@ cdef class zKalmanFilter(object):
 
     # ### Define some constants
     cdef readonly int k_endog, k_states, k_posdef, k_endog2, k_states2, k_posdef2, k_endogstates, k_statesposdef
-    cdef readonly int ldwork
+    cdef readonly int ldwork, ldsqrt, lsqrt_work, lchandrasekhar_work
     
     cdef allocate_arrays(self)
     cdef void set_dimensions(self)
@@ -554,6 +704,9 @@ cdef class zKalmanFilter(object):
     cdef void check_convergence(self)
     cdef void migrate_storage(self)
     cdef void _reinitialize_pointers(self) except *
+    cdef void _reinitialize_square_root_pointers(self) except *
+    cdef void _reinitialize_chandrasekhar_pointers(self) except *
+    cdef void allocate_diffuse_arrays(self)
 
     cdef void _forecasting(self)
     cdef np.complex128_t _inversion(self)
@@ -61,6 +61,11 @@ cdef class sKalmanSmoother(object):
 
     cdef readonly np.float32_t [::1,:] tmpL, tmpL2, tmp0, tmp00, tmp000
 
+    # Exact diffuse smoother arrays
+    cdef readonly np.float32_t [::1,:] scaled_smoothed_diffuse_estimator
+    cdef readonly np.float32_t [::1,:,:] scaled_smoothed_diffuse1_estimator_cov, scaled_smoothed_diffuse2_estimator_cov
+    cdef readonly np.float32_t [::1,:,:] tmp_diffuse
+
     # Statespace
     # cdef np.float32_t * _design
     # cdef np.float32_t * _obs_cov
@@ -92,6 +97,13 @@ cdef class sKalmanSmoother(object):
     cdef np.float32_t * _smoothed_measurement_disturbance_cov
     cdef np.float32_t * _smoothed_state_disturbance_cov
 
+    cdef np.float32_t * _input_scaled_smoothed_diffuse_estimator
+    cdef np.float32_t * _input_scaled_smoothed_diffuse1_estimator_cov
+    cdef np.float32_t * _input_scaled_smoothed_diffuse2_estimator_cov
+    cdef np.float32_t * _scaled_smoothed_diffuse_estimator
+    cdef np.float32_t * _scaled_smoothed_diffuse1_estimator_cov
+    cdef np.float32_t * _scaled_smoothed_diffuse2_estimator_cov
+
     cdef np.float32_t * _smoothed_state_autocov
     cdef np.float32_t * _tmp_autocov
 
@@ -119,6 +131,7 @@ cdef class sKalmanSmoother(object):
     # cdef readonly int k_endog, k_states, k_posdef, k_endog2, k_states2, k_posdef2, k_endogstates, k_statesposdef
 
     cdef allocate_arrays(self)
+    cdef void allocate_diffuse_arrays(self)
     cdef int check_filter_method_changed(self)
     cdef int reset_filter_method(self, int force_reset=*)
     cpdef set_smoother_output(self, int smoother_output, int force_reset=*)
@@ -162,6 +175,11 @@ cdef class dKalmanSmoother(object):
 
     cdef readonly np.float64_t [::1,:] tmpL, tmpL2, tmp0, tmp00, tmp000
 
+    # Exact diffuse smoother arrays
+    cdef readonly np.float64_t [::1,:] scaled_smoothed_diffuse_estimator
+    cdef readonly np.float64_t [::1,:,:] scaled_smoothed_diffuse1_estimator_cov, scaled_smoothed_diffuse2_estimator_cov
+    cdef readonly np.float64_t [::1,:,:] tmp_diffuse
+
     # Statespace
     # cdef np.float64_t * _design
     # cdef np.float64_t * _obs_cov
@@ -193,6 +211,13 @@ cdef class dKalmanSmoother(object):
     cdef np.float64_t * _smoothed_measurement_disturbance_cov
     cdef np.float64_t * _smoothed_state_disturbance_cov
 
+    cdef np.float64_t * _input_scaled_smoothed_diffuse_estimator
+    cdef np.float64_t * _input_scaled_smoothed_diffuse1_estimator_cov
+    cdef np.float64_t * _input_scaled_smoothed_diffuse2_estimator_cov
+    cdef np.float64_t * _scaled_smoothed_diffuse_estimator
+    cdef np.float64_t * _scaled_smoothed_diffuse1_estimator_cov
+    cdef np.float64_t * _scaled_smoothed_diffuse2_estimator_cov
+
     cdef np.float64_t * _smoothed_state_autocov
     cdef np.float64_t * _tmp_autocov
 
@@ -220,6 +245,7 @@ cdef class dKalmanSmoother(object):
     # cdef readonly int k_endog, k_states, k_posdef, k_endog2, k_states2, k_posdef2, k_endogstates, k_statesposdef
 
     cdef allocate_arrays(self)
+    cdef void allocate_diffuse_arrays(self)
     cdef int check_filter_method_changed(self)
     cdef int reset_filter_method(self, int force_reset=*)
     cpdef set_smoother_output(self, int smoother_output, int force_reset=*)
@@ -263,6 +289,11 @@ cdef class cKalmanSmoother(object):
 
     cdef readonly np.complex64_t [::1,:] tmpL, tmpL2, tmp0, tmp00, tmp000
 
+    # Exact diffuse smoother arrays
+    cdef readonly np.complex64_t [::1,:] scaled_smoothed_diffuse_estimator
+    cdef readonly np.complex64_t [::1,:,:] scaled_smoothed_diffuse1_estimator_cov, scaled_smoothed_diffuse2_estimator_cov
+    cdef readonly np.complex64_t [::1,:,:] tmp_diffuse
+
     # Statespace
     # cdef np.complex64_t * _design
     # cdef np.complex64_t * _obs_cov
@@ -294,6 +325,13 @@ cdef class cKalmanSmoother(object):
     cdef np.complex64_t * _smoothed_measurement_disturbance_cov
     cdef np.complex64_t * _smoothed_state_disturbance_cov
 
+    cdef np.complex64_t * _input_scaled_smoothed_diffuse_estimator
+    cdef np.complex64_t * _input_scaled_smoothed_diffuse1_estimator_cov
+    cdef np.complex64_t * _input_scaled_smoothed_diffuse2_estimator_cov
+    cdef np.complex64_t * _scaled_smoothed_diffuse_estimator
+    cdef np.complex64_t * _scaled_smoothed_diffuse1_estimator_cov
+    cdef np.complex64_t * _scaled_smoothed_diffuse2_estimator_cov
+
     cdef np.complex64_t * _smoothed_state_autocov
     cdef np.complex64_t * _tmp_autocov
 
@@ -321,6 +359,7 @@ cdef class cKalmanSmoother(object):
     # cdef readonly int k_endog, k_states, k_posdef, k_endog2, k_states2, k_posdef2, k_endogstates, k_statesposdef
 
     cdef allocate_arrays(self)
+    cdef void allocate_diffuse_arrays(self)
     cdef int check_filter_method_changed(self)
     cdef int reset_filter_method(self, int force_reset=*)
     cpdef set_smoother_output(self, int smoother_output, int force_reset=*)
@@ -364,6 +403,11 @@ cdef class zKalmanSmoother(object):
 
     cdef readonly np.complex128_t [::1,:] tmpL, tmpL2, tmp0, tmp00, tmp000
 
+    # Exact diffuse smoother arrays
+    cdef readonly np.complex128_t [::1,:] scaled_smoothed_diffuse_estimator
+    cdef readonly np.complex128_t [::1,:,:] scaled_smoothed_diffuse1_estimator_cov, scaled_smoothed_diffuse2_estimator_cov
+    cdef readonly np.complex128_t [::1,:,:] tmp_diffuse
+
     # Statespace
     # cdef np.complex128_t * _design
     # cdef np.complex128_t * _obs_cov
@@ -395,6 +439,13 @@ cdef class zKalmanSmoother(object):
     cdef np.complex128_t * _smoothed_measurement_disturbance_cov
     cdef np.complex128_t * _smoothed_state_disturbance_cov
 
+    cdef np.complex128_t * _input_scaled_smoothed_diffuse_estimator
+    cdef np.complex128_t * _input_scaled_smoothed_diffuse1_estimator_cov
+    cdef np.complex128_t * _input_scaled_smoothed_diffuse2_estimator_cov
+    cdef np.complex128_t * _scaled_smoothed_diffuse_estimator
+    cdef np.complex128_t * _scaled_smoothed_diffuse1_estimator_cov
+    cdef np.complex128_t * _scaled_smoothed_diffuse2_estimator_cov
+
     cdef np.complex128_t * _smoothed_state_autocov
     cdef np.complex128_t * _tmp_autocov
 
@@ -422,6 +473,7 @@ cdef class zKalmanSmoother(object):
     # cdef readonly int k_endog, k_states, k_posdef, k_endog2, k_states2, k_posdef2, k_endogstates, k_statesposdef
     
     cdef allocate_arrays(self)
+    cdef void allocate_diffuse_arrays(self)
     cdef int check_filter_method_changed(self)
     cdef int reset_filter_method(self, int force_reset=*)
     cpdef set_smoother_output(self, int smoother_output, int force_reset=*)
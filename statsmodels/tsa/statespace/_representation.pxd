@@ -18,6 +18,7 @@ cdef class sStatespace(object):
     cdef readonly np.float32_t [::1,:] obs, obs_intercept, state_intercept
     cdef readonly np.float32_t [:] initial_state
     cdef readonly np.float32_t [::1,:] initial_state_cov
+    cdef readonly np.float32_t [::1,:] initial_diffuse_state_cov
     cdef readonly np.float32_t [::1,:,:] design, obs_cov, transition, selection, state_cov, selected_state_cov
 
     cdef readonly int [::1,:] missing
@@ -27,6 +28,7 @@ cdef class sStatespace(object):
     # Flags
     cdef readonly int time_invariant
     cdef readonly int initialized
+    cdef readonly int initialized_diffuse
     cdef public int diagonal_obs_cov
     cdef public int subset_design
     cdef public int companion_transition
@@ -65,14 +67,21 @@ cdef class sStatespace(object):
     cdef np.float32_t * _selected_state_cov
     cdef np.float32_t * _initial_state
     cdef np.float32_t * _initial_state_cov
+    cdef np.float32_t * _initial_diffuse_state_cov
 
     # Current location
     cdef int t
     cdef int _k_endog, _k_states, _k_posdef, _k_endog2, _k_states2, _k_posdef2, _k_endogstates, _k_statesposdef
     cdef int _nmissing
 
+    # Compact time-varying entries
+    cdef readonly int k_entries
+    cdef readonly int [:] entries_matrix, entries_row, entries_col, entries_flags
+    cdef readonly np.float32_t [::1,:] entries_values
+
     # Functions
     cpdef seek(self, unsigned int t, unsigned int transform_diagonalize, unsigned int transform_generalized_collapse)
+    cdef void patch(self, unsigned int t)
 
     cdef void set_dimensions(self, unsigned int k_endog, unsigned int k_states, unsigned int k_posdef)
     cdef void select_state_cov(self, unsigned int t)
@@ -91,6 +100,7 @@ cdef class dStatespace(object):
     cdef readonly np.float64_t [::1,:] obs, obs_intercept, state_intercept
     cdef readonly np.float64_t [:] initial_state
     cdef readonly np.float64_t [::1,:] initial_state_cov
+    cdef readonly np.float64_t [::1,:] initial_diffuse_state_cov
     cdef readonly np.float64_t [::1,:,:] design, obs_cov, transition, selection, state_cov, selected_state_cov
 
     cdef readonly int [::1,:] missing
@@ -100,6 +110,7 @@ cdef class dStatespace(object):
     # Flags
     cdef readonly int time_invariant
     cdef readonly int initialized
+    cdef readonly int initialized_diffuse
     cdef public int diagonal_obs_cov
     cdef public int subset_design
     cdef public int companion_transition
@@ -138,14 +149,21 @@ cdef class dStatespace(object):
     cdef np.float64_t * _selected_state_cov
     cdef np.float64_t * _initial_state
     cdef np.float64_t * _initial_state_cov
+    cdef np.float64_t * _initial_diffuse_state_cov
 
     # Current location
     cdef int t
     cdef int _k_endog, _k_states, _k_posdef, _k_endog2, _k_states2, _k_posdef2, _k_endogstates, _k_statesposdef
     cdef int _nmissing
 
+    # Compact time-varying entries
+    cdef readonly int k_entries
+    cdef readonly int [:] entries_matrix, entries_row, entries_col, entries_flags
+    cdef readonly np.float64_t [::1,:] entries_values
+
     # Functions
     cpdef seek(self, unsigned int t, unsigned int transform_diagonalize, unsigned int transform_generalized_collapse)
+    cdef void patch(self, unsigned int t)
 
     cdef void set_dimensions(self, unsigned int k_endog, unsigned int k_states, unsigned int k_posdef)
     cdef void select_state_cov(self, unsigned int t)
@@ -164,6 +182,7 @@ cdef class cStatespace(object):
     cdef readonly np.complex64_t [::1,:] obs, obs_intercept, state_intercept
     cdef readonly np.complex64_t [:] initial_state
     cdef readonly np.complex64_t [::1,:] initial_state_cov
+    cdef readonly np.complex64_t [::1,:] initial_diffuse_state_cov
     cdef readonly np.complex64_t [::1,:,:] design, obs_cov, transition, selection, state_cov, selected_state_cov
 
     cdef readonly int [::1,:] missing
@@ -173,6 +192,7 @@ cdef class cStatespace(object):
     # Flags
     cdef readonly int time_invariant
     cdef readonly int initialized
+    cdef readonly int initialized_diffuse
     cdef public int diagonal_obs_cov
     cdef public int subset_design
     cdef public int companion_transition
@@ -211,14 +231,21 @@ cdef class cStatespace(object):
     cdef np.complex64_t * _selected_state_cov
     cdef np.complex64_t * _initial_state
     cdef np.complex64_t * _initial_state_cov
+    cdef np.complex64_t * _initial_diffuse_state_cov
 
     # Current location
     cdef int t
     cdef int _k_endog, _k_states, _k_posdef, _k_endog2, _k_states2, _k_posdef2, _k_endogstates, _k_statesposdef
     cdef int _nmissing
 
+    # Compact time-varying entries
+    cdef readonly int k_entries
+    cdef readonly int [:] entries_matrix, entries_row, entries_col, entries_flags
+    cdef readonly np.complex64_t [::1,:] entries_values
+
     # Functions
     cpdef seek(self, unsigned int t, unsigned int transform_diagonalize, unsigned int transform_generalized_collapse)
+    cdef void patch(self, unsigned int t)
 
     cdef void set_dimensions(self, unsigned int k_endog, unsigned int k_states, unsigned int k_posdef)
     cdef void select_state_cov(self, unsigned int t)
@@ -237,6 +264,7 @@ cdef class zStatespace(object):
     cdef readonly np.complex128_t [::1,:] obs, obs_intercept, state_intercept
     cdef readonly np.complex128_t [:] initial_state
     cdef readonly np.complex128_t [::1,:] initial_state_cov
+    cdef readonly np.complex128_t [::1,:] initial_diffuse_state_cov
     cdef readonly np.complex128_t [::1,:,:] design, obs_cov, transition, selection, state_cov, selected_state_cov
 
     cdef readonly int [::1,:] missing
@@ -246,6 +274,7 @@ cdef class zStatespace(object):
     # Flags
     cdef readonly int time_invariant
     cdef readonly int initialized
+    cdef readonly int initialized_diffuse
     cdef public int diagonal_obs_cov
     cdef public int subset_design
     cdef public int companion_transition
@@ -284,14 +313,21 @@ cdef class zStatespace(object):
     cdef np.complex128_t * _selected_state_cov
     cdef np.complex128_t * _initial_state
     cdef np.complex128_t * _initial_state_cov
+    cdef np.complex128_t * _initial_diffuse_state_cov
 
     # Current location
     cdef int t
     cdef int _k_endog, _k_states, _k_posdef, _k_endog2, _k_states2, _k_posdef2, _k_endogstates, _k_statesposdef
     cdef int _nmissing
 
+    # Compact time-varying entries
+    cdef readonly int k_entries
+    cdef readonly int [:] entries_matrix, entries_row, entries_col, entries_flags
+    cdef readonly np.complex128_t [::1,:] entries_values
+
     # Functions
     cpdef seek(self, unsigned int t, unsigned int transform_diagonalize, unsigned int transform_generalized_collapse)
+    cdef void patch(self, unsigned int t)
 
     cdef void set_dimensions(self, unsigned int k_endog, unsigned int k_states, unsigned int k_posdef)
     cdef void select_state_cov(self, unsigned int t)
@@ -0,0 +1,52 @@
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: cdivision=False
+"""
+State Space Models - Exact diffuse univariate Kalman smoother declarations
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+
+cimport numpy as np
+from statsmodels.tsa.statespace._representation cimport (
+    sStatespace, dStatespace, cStatespace, zStatespace
+)
+from statsmodels.tsa.statespace._kalman_filter cimport (
+    sKalmanFilter, dKalmanFilter, cKalmanFilter, zKalmanFilter
+)
+from statsmodels.tsa.statespace._kalman_smoother cimport (
+    sKalmanSmoother, dKalmanSmoother, cKalmanSmoother, zKalmanSmoother
+)
+
+# Single precision
+cdef int ssmoothed_estimators_measurement_univariate_diffuse(sKalmanSmoother smoother, sKalmanFilter kfilter, sStatespace model) except *
+cdef int ssmoothed_estimators_time_univariate_diffuse(sKalmanSmoother smoother, sKalmanFilter kfilter, sStatespace model)
+cdef int ssmoothed_state_univariate_diffuse(sKalmanSmoother smoother, sKalmanFilter kfilter, sStatespace model)
+cdef int ssmoothed_disturbances_univariate_diffuse(sKalmanSmoother smoother, sKalmanFilter kfilter, sStatespace model)
+cdef void sproduct(sStatespace model, sKalmanFilter kfilter, np.float32_t * a, np.float32_t * b, np.float32_t * c)
+cdef void stransition_quadratic(sKalmanSmoother smoother, sKalmanFilter kfilter, sStatespace model, np.float32_t * a, np.float32_t * b)
+
+# Double precision
+cdef int dsmoothed_estimators_measurement_univariate_diffuse(dKalmanSmoother smoother, dKalmanFilter kfilter, dStatespace model) except *
+cdef int dsmoothed_estimators_time_univariate_diffuse(dKalmanSmoother smoother, dKalmanFilter kfilter, dStatespace model)
+cdef int dsmoothed_state_univariate_diffuse(dKalmanSmoother smoother, dKalmanFilter kfilter, dStatespace model)
+cdef int dsmoothed_disturbances_univariate_diffuse(dKalmanSmoother smoother, dKalmanFilter kfilter, dStatespace model)
+cdef void dproduct(dStatespace model, dKalmanFilter kfilter, np.float64_t * a, np.float64_t * b, np.float64_t * c)
+cdef void dtransition_quadratic(dKalmanSmoother smoother, dKalmanFilter kfilter, dStatespace model, np.float64_t * a, np.float64_t * b)
+
+# Single precision complex
+cdef int csmoothed_estimators_measurement_univariate_diffuse(cKalmanSmoother smoother, cKalmanFilter kfilter, cStatespace model) except *
+cdef int csmoothed_estimators_time_univariate_diffuse(cKalmanSmoother smoother, cKalmanFilter kfilter, cStatespace model)
+cdef int csmoothed_state_univariate_diffuse(cKalmanSmoother smoother, cKalmanFilter kfilter, cStatespace model)
+cdef int csmoothed_disturbances_univariate_diffuse(cKalmanSmoother smoother, cKalmanFilter kfilter, cStatespace model)
+cdef void cproduct(cStatespace model, cKalmanFilter kfilter, np.complex64_t * a, np.complex64_t * b, np.complex64_t * c)
+cdef void ctransition_quadratic(cKalmanSmoother smoother, cKalmanFilter kfilter, cStatespace model, np.complex64_t * a, np.complex64_t * b)
+
+# Double precision complex
+cdef int zsmoothed_estimators_measurement_univariate_diffuse(zKalmanSmoother smoother, zKalmanFilter kfilter, zStatespace model) except *
+cdef int zsmoothed_estimators_time_univariate_diffuse(zKalmanSmoother smoother, zKalmanFilter kfilter, zStatespace model)
+cdef int zsmoothed_state_univariate_diffuse(zKalmanSmoother smoother, zKalmanFilter kfilter, zStatespace model)
+cdef int zsmoothed_disturbances_univariate_diffuse(zKalmanSmoother smoother, zKalmanFilter kfilter, zStatespace model)
+cdef void zproduct(zStatespace model, zKalmanFilter kfilter, np.complex128_t * a, np.complex128_t * b, np.complex128_t * c)
+cdef void ztransition_quadratic(zKalmanSmoother smoother, zKalmanFilter kfilter, zStatespace model, np.complex128_t * a, np.complex128_t * b)
@@ -0,0 +1,1753 @@
+#cython: profile=False
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: cdivision=False
+"""
+State Space Models - Exact diffuse univariate Kalman smoother
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+
+# Typical imports
+import numpy as np
+cimport numpy as np
+from statsmodels.src.math cimport *
+cimport scipy.linalg.cython_blas as blas
+
+from statsmodels.tsa.statespace._kalman_smoother cimport (
+    SMOOTHER_STATE, SMOOTHER_STATE_COV, SMOOTHER_STATE_AUTOCOV,
+    SMOOTHER_DISTURBANCE, SMOOTHER_DISTURBANCE_COV
+)
+
+# ### Exact diffuse univariate Kalman smoother
+#
+# In the diffuse periods, the scaled smoothed estimator and its covariance
+# matrix are expanded in powers of $\kappa^{-1}$ as $r_{t,i} = r_{t,i}^{(0)} +
+# \kappa^{-1} r_{t,i}^{(1)}$ and $N_{t,i} = N_{t,i}^{(0)} + \kappa^{-1}
+# N_{t,i}^{(1)} + \kappa^{-2} N_{t,i}^{(2)}$. The usual `scaled_smoothed_*`
+# arrays hold the $(0)$ terms and the `scaled_smoothed_diffuse*` arrays hold
+# the $(1)$ and $(2)$ terms.
+#
+# If $F_{\infty,t,i} > 0$, with $L_{t,i}^{(0)} = I - K_{t,i}^{(0)} Z_{t,i}$,
+# $L_{t,i}^{(1)} = -K_{t,i}^{(1)} Z_{t,i}$ and
+# $K_{t,i}^{(1)} = (M_{*,t,i} - K_{t,i}^{(0)} F_{*,t,i}) / F_{\infty,t,i}$:
+#
+# $$
+# \begin{aligned}
+# r_{t,i-1}^{(0)} & = L_{t,i}^{(0)'} r_{t,i}^{(0)} \\
+# r_{t,i-1}^{(1)} & = Z_{t,i}' v_{t,i} / F_{\infty,t,i} +
+#     L_{t,i}^{(0)'} r_{t,i}^{(1)} + L_{t,i}^{(1)'} r_{t,i}^{(0)} \\
+# N_{t,i-1}^{(0)} & = L_{t,i}^{(0)'} N_{t,i}^{(0)} L_{t,i}^{(0)} \\
+# N_{t,i-1}^{(1)} & = Z_{t,i}' Z_{t,i} / F_{\infty,t,i} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(1)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(0)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(0)} L_{t,i}^{(1)} \\
+# N_{t,i-1}^{(2)} & = - Z_{t,i}' Z_{t,i} F_{*,t,i} / F_{\infty,t,i}^2 +
+#     L_{t,i}^{(0)'} N_{t,i}^{(2)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(1)} L_{t,i}^{(1)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(1)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(0)} L_{t,i}^{(1)} \\
+# \end{aligned}
+# $$
+#
+# and otherwise, with $L_{t,i} = I - K_{*,t,i} Z_{t,i}$, the $(0)$ terms
+# follow the usual univariate recursions while the $(1)$ and $(2)$ terms are
+# premultiplied by $L_{t,i}'$ (and postmultiplied by $L_{t,i}$).
+#
+# Then
+#
+# $$
+# \begin{aligned}
+# \hat \alpha_t & = a_t + P_{*,t} r_{t-1}^{(0)} + P_{\infty,t} r_{t-1}^{(1)} \\
+# V_t & = P_{*,t} - P_{*,t} N_{t-1}^{(0)} P_{*,t} -
+#     (P_{\infty,t} N_{t-1}^{(1)} P_{*,t})' - P_{\infty,t} N_{t-1}^{(1)} P_{*,t} -
+#     P_{\infty,t} N_{t-1}^{(2)} P_{\infty,t} \\
+# \end{aligned}
+# $$
+#
+# Since the other smoothers differ in whether the time step
+# $r_{t-1,p} = T_{t-1}' r_{t,0}$ is performed at the end of the iteration for
+# period $t$ or at the beginning of the iteration for period $t-1$, the
+# diffuse smoother always performs it at the beginning, so that the time
+# step function is a no-op.
+#
+# See Durbin and Koopman (2012) Chapters 5.3 and 6.4 and Koopman and
+# Durbin (2000).
+
+cdef int ssmoothed_estimators_measurement_univariate_diffuse(sKalmanSmoother smoother, sKalmanFilter kfilter, sStatespace model) except *:
+    cdef:
+        int i, j, t = smoother.t, inc = 1
+        int compute_r, compute_N
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+        np.float32_t gamma = -1.0
+        np.float32_t scalar
+        np.float32_t forecast_error_cov
+        np.float32_t forecast_error_diffuse_cov
+        np.float32_t * _kalman_gain
+        np.float32_t * _L0 = &smoother.tmp_diffuse[0, 0, 0]
+        np.float32_t * _L1 = &smoother.tmp_diffuse[0, 0, 1]
+        np.float32_t * _X = &smoother.tmp_diffuse[0, 0, 2]
+        np.float32_t * _Y = &smoother.tmp_diffuse[0, 0, 3]
+        np.float32_t * _W0 = &smoother.tmp_diffuse[0, 0, 4]
+        np.float32_t * _W1 = &smoother.tmp_diffuse[0, 0, 5]
+        np.float32_t * _S = &smoother.tmp_diffuse[0, 0, 6]
+        np.float32_t * _r0 = smoother._scaled_smoothed_estimator
+        np.float32_t * _r1 = smoother._scaled_smoothed_diffuse_estimator
+        np.float32_t * _N0 = smoother._scaled_smoothed_estimator_cov
+        np.float32_t * _N1 = smoother._scaled_smoothed_diffuse1_estimator_cov
+        np.float32_t * _N2 = smoother._scaled_smoothed_diffuse2_estimator_cov
+
+    compute_r = smoother.smoother_output & (SMOOTHER_STATE | SMOOTHER_DISTURBANCE)
+    compute_N = smoother.smoother_output & (SMOOTHER_STATE_COV | SMOOTHER_DISTURBANCE_COV)
+
+    # Clear the input arrays at the end of the sample and at the end of the
+    # diffuse periods, in case we're re-running the smoother
+    if t == model.nobs - 1:
+        smoother.scaled_smoothed_estimator[:, t+1] = 0
+        smoother.scaled_smoothed_estimator_cov[:, :, t+1] = 0
+    if t == kfilter.nobs_diffuse - 1:
+        smoother.scaled_smoothed_diffuse_estimator[:, t+1] = 0
+        smoother.scaled_smoothed_diffuse1_estimator_cov[:, :, t+1] = 0
+        smoother.scaled_smoothed_diffuse2_estimator_cov[:, :, t+1] = 0
+
+    # Time step
+    # $r_{t,p}^{(k)} = T_t' r_{t+1,0}^{(k)}$
+    # $N_{t,p}^{(k)} = T_t' N_{t+1,0}^{(k)} T_t$
+    if compute_r:
+        blas.sgemv("T", &model._k_states, &model._k_states,
+                  &alpha, model._transition, &model._k_states,
+                          smoother._input_scaled_smoothed_estimator, &inc,
+                  &beta, _r0, &inc)
+        blas.sgemv("T", &model._k_states, &model._k_states,
+                  &alpha, model._transition, &model._k_states,
+                          smoother._input_scaled_smoothed_diffuse_estimator, &inc,
+                  &beta, _r1, &inc)
+    if compute_N:
+        stransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_estimator_cov, _N0)
+        stransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_diffuse1_estimator_cov, _N1)
+        stransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_diffuse2_estimator_cov, _N2)
+
+    # Iterate over the observations at time t
+    for i in range(model._k_endog-1,-1,-1):
+        forecast_error_cov = kfilter._forecast_error_cov[i + i*kfilter.k_endog]
+        forecast_error_diffuse_cov = kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog]
+        _kalman_gain = &kfilter._kalman_gain[i*kfilter.k_states]
+
+        # Nothing to do for observations with zero variance
+        if forecast_error_diffuse_cov == 0 and forecast_error_cov == 0:
+            if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+                smoother._smoothed_measurement_disturbance[i] = 0
+            if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = 0
+            continue
+
+        # Store $K_{t,i}' r_{t,i}^{(0)}$ and $K_{t,i}' N_{t,i}^{(0)} K_{t,i}$
+        # for the smoothed measurement disturbances (see the univariate
+        # smoother)
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+            smoother._smoothed_measurement_disturbance[i] = (
+                blas.sdot(&model._k_states, _kalman_gain, &inc, _r0, &inc))
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+            blas.sgemv("N", &model._k_states, &model._k_states,
+                                     &alpha, _N0, &kfilter.k_states,
+                                             _kalman_gain, &inc,
+                                     &beta, smoother._tmp00, &inc)
+            smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = (
+                blas.sdot(&model._k_states, _kalman_gain, &inc, smoother._tmp00, &inc))
+
+        # $L_{t,i}^{(0)} = I - K_{t,i}^{(0)} Z_{t,i}$ (or $L_{t,i} = I - K_{*,t,i} Z_{t,i}$)
+        for j in range(kfilter.k_states2):
+            _L0[j] = 0
+        blas.sger(&model._k_states, &model._k_states,
+                  &gamma, _kalman_gain, &inc,
+                          &model._design[i], &model._k_endog,
+                  _L0, &kfilter.k_states)
+        for j in range(model._k_states):
+            _L0[j + j*kfilter.k_states] = _L0[j + j*kfilter.k_states] + 1
+
+        if not forecast_error_diffuse_cov == 0:
+            # $L_{t,i}^{(1)} = -(M_{*,t,i} - K_{t,i}^{(0)} F_{*,t,i}) Z_{t,i} / F_{\infty,t,i}$
+            for j in range(kfilter.k_states2):
+                _L1[j] = 0
+            scalar = -1.0 / forecast_error_diffuse_cov
+            blas.sger(&model._k_states, &model._k_states,
+                      &scalar, &kfilter._tmp1[i*kfilter.k_states], &inc,
+                               &model._design[i], &model._k_endog,
+                      _L1, &kfilter.k_states)
+            scalar = forecast_error_cov / forecast_error_diffuse_cov
+            blas.sger(&model._k_states, &model._k_states,
+                      &scalar, _kalman_gain, &inc,
+                               &model._design[i], &model._k_endog,
+                      _L1, &kfilter.k_states)
+
+            if compute_r:
+                # $r_{t,i-1}^{(1)} = Z_{t,i}' v_{t,i} / F_{\infty,t,i} +
+                #     L_{t,i}^{(0)'} r_{t,i}^{(1)} + L_{t,i}^{(1)'} r_{t,i}^{(0)}$
+                blas.sgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r1, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.sgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _r0, &inc,
+                          &alpha, smoother._tmp000, &inc)
+                blas.saxpy(&model._k_states, &kfilter._tmp2[i], &model._design[i], &model._k_endog,
+                                                                         smoother._tmp000, &inc)
+                blas.scopy(&model._k_states, smoother._tmp000, &inc, _r1, &inc)
+                # $r_{t,i-1}^{(0)} = L_{t,i}^{(0)'} r_{t,i}^{(0)}$
+                blas.sgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r0, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.scopy(&model._k_states, smoother._tmp000, &inc, _r0, &inc)
+
+            if compute_N:
+                # $X = N^{(0)} L^{(0)}$, $Y = N^{(1)} L^{(0)}$,
+                # $W_0 = N^{(0)} L^{(1)}$, $W_1 = N^{(1)} L^{(1)}$
+                sproduct(model, kfilter, _N0, _L0, _X)
+                sproduct(model, kfilter, _N1, _L0, _Y)
+                sproduct(model, kfilter, _N0, _L1, _W0)
+                sproduct(model, kfilter, _N1, _L1, _W1)
+                # $S = N^{(2)} L^{(0)} + W_1$
+                sproduct(model, kfilter, _N2, _L0, _S)
+                blas.saxpy(&kfilter.k_states2, &alpha, _W1, &inc, _S, &inc)
+                # $Y = N^{(1)} L^{(0)} + N^{(0)} L^{(1)}$
+                blas.saxpy(&kfilter.k_states2, &alpha, _W0, &inc, _Y, &inc)
+
+                # $N_{t,i-1}^{(2)} = L^{(0)'} S + L^{(1)'} Y - Z' Z F_* / F_\infty^2$
+                blas.sgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _S, &kfilter.k_states,
+                          &beta, _N2, &kfilter.k_states)
+                blas.sgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _Y, &kfilter.k_states,
+                          &alpha, _N2, &kfilter.k_states)
+                scalar = -forecast_error_cov / forecast_error_diffuse_cov
+                blas.sger(&model._k_states, &model._k_states,
+                    &scalar, &model._design[i], &model._k_endog,
+                             &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N2, &kfilter.k_states)
+
+                # $N_{t,i-1}^{(1)} = L^{(0)'} Y + L^{(1)'} X + Z' Z / F_\infty$
+                blas.sgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _Y, &kfilter.k_states,
+                          &beta, _N1, &kfilter.k_states)
+                blas.sgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &alpha, _N1, &kfilter.k_states)
+                blas.sger(&model._k_states, &model._k_states,
+                    &alpha, &model._design[i], &model._k_endog,
+                            &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N1, &kfilter.k_states)
+
+                # $N_{t,i-1}^{(0)} = L^{(0)'} X$
+                blas.sgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N0, &kfilter.k_states)
+        else:
+            if compute_r:
+                # $r_{t,i-1}^{(0)} = Z_{t,i}' v_{t,i} / F_{*,t,i} + L_{t,i}' r_{t,i}^{(0)}$
+                blas.sgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r0, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.saxpy(&model._k_states, &kfilter._tmp2[i], &model._design[i], &model._k_endog,
+                                                                         smoother._tmp000, &inc)
+                blas.scopy(&model._k_states, smoother._tmp000, &inc, _r0, &inc)
+                # $r_{t,i-1}^{(1)} = L_{t,i}' r_{t,i}^{(1)}$
+                blas.sgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r1, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.scopy(&model._k_states, smoother._tmp000, &inc, _r1, &inc)
+
+            if compute_N:
+                # $N_{t,i-1}^{(0)} = Z_{t,i}' Z_{t,i} / F_{*,t,i} + L_{t,i}' N_{t,i}^{(0)} L_{t,i}$
+                # $N_{t,i-1}^{(k)} = L_{t,i}' N_{t,i}^{(k)} L_{t,i}, \quad k = 1,2$
+                sproduct(model, kfilter, _N0, _L0, _X)
+                blas.sgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N0, &kfilter.k_states)
+                blas.sger(&model._k_states, &model._k_states,
+                    &alpha, &model._design[i], &model._k_endog,
+                            &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N0, &kfilter.k_states)
+                sproduct(model, kfilter, _N1, _L0, _X)
+                blas.sgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N1, &kfilter.k_states)
+                sproduct(model, kfilter, _N2, _L0, _X)
+                blas.sgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N2, &kfilter.k_states)
+
+    return 0
+
+cdef void sproduct(sStatespace model, sKalmanFilter kfilter,
+                            np.float32_t * a, np.float32_t * b, np.float32_t * c):
+    cdef:
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+    # $C = A B$
+    blas.sgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, a, &kfilter.k_states,
+                      b, &kfilter.k_states,
+              &beta, c, &kfilter.k_states)
+
+cdef void stransition_quadratic(sKalmanSmoother smoother, sKalmanFilter kfilter, sStatespace model,
+                                         np.float32_t * a, np.float32_t * b):
+    cdef:
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+    # $B = T_t' A T_t$
+    blas.sgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, model._transition, &model._k_states,
+                      a, &kfilter.k_states,
+              &beta, smoother._tmp0, &kfilter.k_states)
+    blas.sgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, smoother._tmp0, &kfilter.k_states,
+                      model._transition, &model._k_states,
+              &beta, b, &kfilter.k_states)
+
+cdef int ssmoothed_estimators_time_univariate_diffuse(sKalmanSmoother smoother, sKalmanFilter kfilter, sStatespace model):
+    # the time step was performed at the beginning of the
+    # smoothed_estimators_measurement_univariate_diffuse step
+    return 0
+
+cdef int ssmoothed_state_univariate_diffuse(sKalmanSmoother smoother, sKalmanFilter kfilter, sStatespace model):
+    cdef int i, j
+    cdef:
+        int inc = 1
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+        np.float32_t gamma = -1.0
+        np.float32_t * _predicted_state_cov = &kfilter.predicted_state_cov[0, 0, smoother.t]
+        np.float32_t * _predicted_diffuse_state_cov = &kfilter.predicted_diffuse_state_cov[0, 0, smoother.t]
+        np.float32_t * _X = &smoother.tmp_diffuse[0, 0, 2]
+        np.float32_t * _Y = &smoother.tmp_diffuse[0, 0, 3]
+
+    # Smoothed state
+    if smoother.smoother_output & SMOOTHER_STATE:
+        # $\hat \alpha_t = a_t + P_{*,t} r_{t-1}^{(0)} + P_{\infty,t} r_{t-1}^{(1)}$
+        blas.scopy(&kfilter.k_states, &kfilter.predicted_state[0, smoother.t], &inc, smoother._smoothed_state, &inc)
+        blas.sgemv("N", &model._k_states, &model._k_states,
+                  &alpha, _predicted_state_cov, &kfilter.k_states,
+                          smoother._scaled_smoothed_estimator, &inc,
+                  &alpha, smoother._smoothed_state, &inc)
+        blas.sgemv("N", &model._k_states, &model._k_states,
+                  &alpha, _predicted_diffuse_state_cov, &kfilter.k_states,
+                          smoother._scaled_smoothed_diffuse_estimator, &inc,
+                  &alpha, smoother._smoothed_state, &inc)
+
+    # Smoothed state covariance
+    if smoother.smoother_output & SMOOTHER_STATE_COV:
+        # $V_t = P_{*,t} - P_{*,t} N_{t-1}^{(0)} P_{*,t}$
+        blas.scopy(&kfilter.k_states2, _predicted_state_cov, &inc, smoother._smoothed_state_cov, &inc)
+        sproduct(model, kfilter, smoother._scaled_smoothed_estimator_cov, _predicted_state_cov, _X)
+        blas.sgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+                  &gamma, _predicted_state_cov, &kfilter.k_states,
+                          _X, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_cov, &kfilter.k_states)
+        # $- P_{\infty,t} N_{t-1}^{(2)} P_{\infty,t}$
+        sproduct(model, kfilter, smoother._scaled_smoothed_diffuse2_estimator_cov, _predicted_diffuse_state_cov, _X)
+        blas.sgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+                  &gamma, _predicted_diffuse_state_cov, &kfilter.k_states,
+                          _X, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_cov, &kfilter.k_states)
+        # $- P_{\infty,t} N_{t-1}^{(1)} P_{*,t} - (P_{\infty,t} N_{t-1}^{(1)} P_{*,t})'$
+        sproduct(model, kfilter, smoother._scaled_smoothed_diffuse1_estimator_cov, _predicted_state_cov, _X)
+        sproduct(model, kfilter, _predicted_diffuse_state_cov, _X, _Y)
+        for i in range(model._k_states):      # columns
+            for j in range(model._k_states):  # rows
+                smoother._smoothed_state_cov[j + i*kfilter.k_states] = (
+                    smoother._smoothed_state_cov[j + i*kfilter.k_states] -
+                    _Y[j + i*kfilter.k_states] - _Y[i + j*kfilter.k_states])
+
+    return 0
+
+cdef int ssmoothed_disturbances_univariate_diffuse(sKalmanSmoother smoother, sKalmanFilter kfilter, sStatespace model):
+    # Note: this only differs from the univariate version in the
+    # definition of the smoothed measurement disturbance and cov for elements
+    # with $F_{\infty,t,i} > 0$, in which case
+    # $\hat \varepsilon_{t,i} = - \sigma_{t,i}^2 K_{t,i}^{(0)'} r_{t,i}^{(0)}$ and
+    # $Var(\varepsilon_{t,i} | Y_n) = \sigma_{t,i}^2 - \sigma_{t,i}^4 K_{t,i}^{(0)'} N_{t,i}^{(0)} K_{t,i}^{(0)}$
+    cdef int i
+    cdef:
+        int inc = 1
+        np.float32_t alpha = 1.0
+        np.float32_t beta = 0.0
+        np.float32_t gamma = -1.0
+        np.float32_t obs_cov
+        np.float32_t forecast_error_cov
+        np.float32_t forecast_error_diffuse_cov
+
+    # $\\#_0 = R_t Q_t$
+    # $(m \times r) = (m \times r) (r \times r)$
+    blas.sgemm("N", "N", &model._k_states, &model._k_posdef, &model._k_posdef,
+              &alpha, model._selection, &model._k_states,
+                      model._state_cov, &model._k_posdef,
+              &beta, smoother._tmp0, &kfilter.k_states)
+
+    for i in range(model._k_endog):
+        obs_cov = model._obs_cov[i + i*model._k_endog]
+        forecast_error_cov = kfilter._forecast_error_cov[i + i*kfilter.k_endog]
+        forecast_error_diffuse_cov = kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog]
+
+        # Note: K_{t,i}' r_{t,i} and K_{t,i}' N_{t,i} K_{t,i} were stored in
+        # the measurement step
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+            if not forecast_error_diffuse_cov == 0:
+                smoother._smoothed_measurement_disturbance[i] = (
+                    -obs_cov * smoother._smoothed_measurement_disturbance[i])
+            elif not forecast_error_cov == 0:
+                smoother._smoothed_measurement_disturbance[i] = (
+                    kfilter._tmp4[i + i*kfilter.k_endog] * (
+                        kfilter._forecast_error[i] -
+                        forecast_error_cov * smoother._smoothed_measurement_disturbance[i]))
+
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+            if not forecast_error_diffuse_cov == 0:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov - (
+                    obs_cov**2 * smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog])
+            elif not forecast_error_cov == 0:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov - (
+                    (kfilter._tmp4[i + i*kfilter.k_endog]**2) * (
+                        forecast_error_cov +
+                        forecast_error_cov**2 * smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog]))
+            else:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov
+
+    if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+        # Smoothed state disturbance
+        # $\hat \eta_t = \\#_0' r_t^{(0)}$
+        # $(r \times 1) = (r \times m) (m \times 1)$
+        blas.sgemv("T", &model._k_states, &model._k_posdef,
+                      &alpha, smoother._tmp0, &kfilter.k_states,
+                              smoother._input_scaled_smoothed_estimator, &inc,
+                      &beta, smoother._smoothed_state_disturbance, &inc)
+
+    if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+        # Smoothed state disturbance covariance matrix
+        # $Var(\eta_t | Y_n) = Q_t - \\#_0' N_t^{(0)} \\#_0$
+        # $(r \times r) = (r \times r) - (r \times m) (m \times m) (m \times r)$
+        blas.sgemm("N", "N", &model._k_states, &model._k_posdef, &model._k_states,
+                  &alpha, smoother._input_scaled_smoothed_estimator_cov, &kfilter.k_states,
+                          smoother._tmp0, &kfilter.k_states,
+                  &beta, smoother._tmpL, &kfilter.k_states)
+        blas.scopy(&model._k_posdef2, model._state_cov, &inc, smoother._smoothed_state_disturbance_cov, &inc)
+        blas.sgemm("T", "N", &kfilter.k_posdef, &kfilter.k_posdef, &kfilter.k_states,
+                  &gamma, smoother._tmp0, &kfilter.k_states,
+                          smoother._tmpL, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_disturbance_cov, &kfilter.k_posdef)
+
+    return 0
+
+# ### Exact diffuse univariate Kalman smoother
+#
+# In the diffuse periods, the scaled smoothed estimator and its covariance
+# matrix are expanded in powers of $\kappa^{-1}$ as $r_{t,i} = r_{t,i}^{(0)} +
+# \kappa^{-1} r_{t,i}^{(1)}$ and $N_{t,i} = N_{t,i}^{(0)} + \kappa^{-1}
+# N_{t,i}^{(1)} + \kappa^{-2} N_{t,i}^{(2)}$. The usual `scaled_smoothed_*`
+# arrays hold the $(0)$ terms and the `scaled_smoothed_diffuse*` arrays hold
+# the $(1)$ and $(2)$ terms.
+#
+# If $F_{\infty,t,i} > 0$, with $L_{t,i}^{(0)} = I - K_{t,i}^{(0)} Z_{t,i}$,
+# $L_{t,i}^{(1)} = -K_{t,i}^{(1)} Z_{t,i}$ and
+# $K_{t,i}^{(1)} = (M_{*,t,i} - K_{t,i}^{(0)} F_{*,t,i}) / F_{\infty,t,i}$:
+#
+# $$
+# \begin{aligned}
+# r_{t,i-1}^{(0)} & = L_{t,i}^{(0)'} r_{t,i}^{(0)} \\
+# r_{t,i-1}^{(1)} & = Z_{t,i}' v_{t,i} / F_{\infty,t,i} +
+#     L_{t,i}^{(0)'} r_{t,i}^{(1)} + L_{t,i}^{(1)'} r_{t,i}^{(0)} \\
+# N_{t,i-1}^{(0)} & = L_{t,i}^{(0)'} N_{t,i}^{(0)} L_{t,i}^{(0)} \\
+# N_{t,i-1}^{(1)} & = Z_{t,i}' Z_{t,i} / F_{\infty,t,i} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(1)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(0)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(0)} L_{t,i}^{(1)} \\
+# N_{t,i-1}^{(2)} & = - Z_{t,i}' Z_{t,i} F_{*,t,i} / F_{\infty,t,i}^2 +
+#     L_{t,i}^{(0)'} N_{t,i}^{(2)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(1)} L_{t,i}^{(1)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(1)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(0)} L_{t,i}^{(1)} \\
+# \end{aligned}
+# $$
+#
+# and otherwise, with $L_{t,i} = I - K_{*,t,i} Z_{t,i}$, the $(0)$ terms
+# follow the usual univariate recursions while the $(1)$ and $(2)$ terms are
+# premultiplied by $L_{t,i}'$ (and postmultiplied by $L_{t,i}$).
+#
+# Then
+#
+# $$
+# \begin{aligned}
+# \hat \alpha_t & = a_t + P_{*,t} r_{t-1}^{(0)} + P_{\infty,t} r_{t-1}^{(1)} \\
+# V_t & = P_{*,t} - P_{*,t} N_{t-1}^{(0)} P_{*,t} -
+#     (P_{\infty,t} N_{t-1}^{(1)} P_{*,t})' - P_{\infty,t} N_{t-1}^{(1)} P_{*,t} -
+#     P_{\infty,t} N_{t-1}^{(2)} P_{\infty,t} \\
+# \end{aligned}
+# $$
+#
+# Since the other smoothers differ in whether the time step
+# $r_{t-1,p} = T_{t-1}' r_{t,0}$ is performed at the end of the iteration for
+# period $t$ or at the beginning of the iteration for period $t-1$, the
+# diffuse smoother always performs it at the beginning, so that the time
+# step function is a no-op.
+#
+# See Durbin and Koopman (2012) Chapters 5.3 and 6.4 and Koopman and
+# Durbin (2000).
+
+cdef int dsmoothed_estimators_measurement_univariate_diffuse(dKalmanSmoother smoother, dKalmanFilter kfilter, dStatespace model) except *:
+    cdef:
+        int i, j, t = smoother.t, inc = 1
+        int compute_r, compute_N
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+        np.float64_t gamma = -1.0
+        np.float64_t scalar
+        np.float64_t forecast_error_cov
+        np.float64_t forecast_error_diffuse_cov
+        np.float64_t * _kalman_gain
+        np.float64_t * _L0 = &smoother.tmp_diffuse[0, 0, 0]
+        np.float64_t * _L1 = &smoother.tmp_diffuse[0, 0, 1]
+        np.float64_t * _X = &smoother.tmp_diffuse[0, 0, 2]
+        np.float64_t * _Y = &smoother.tmp_diffuse[0, 0, 3]
+        np.float64_t * _W0 = &smoother.tmp_diffuse[0, 0, 4]
+        np.float64_t * _W1 = &smoother.tmp_diffuse[0, 0, 5]
+        np.float64_t * _S = &smoother.tmp_diffuse[0, 0, 6]
+        np.float64_t * _r0 = smoother._scaled_smoothed_estimator
+        np.float64_t * _r1 = smoother._scaled_smoothed_diffuse_estimator
+        np.float64_t * _N0 = smoother._scaled_smoothed_estimator_cov
+        np.float64_t * _N1 = smoother._scaled_smoothed_diffuse1_estimator_cov
+        np.float64_t * _N2 = smoother._scaled_smoothed_diffuse2_estimator_cov
+
+    compute_r = smoother.smoother_output & (SMOOTHER_STATE | SMOOTHER_DISTURBANCE)
+    compute_N = smoother.smoother_output & (SMOOTHER_STATE_COV | SMOOTHER_DISTURBANCE_COV)
+
+    # Clear the input arrays at the end of the sample and at the end of the
+    # diffuse periods, in case we're re-running the smoother
+    if t == model.nobs - 1:
+        smoother.scaled_smoothed_estimator[:, t+1] = 0
+        smoother.scaled_smoothed_estimator_cov[:, :, t+1] = 0
+    if t == kfilter.nobs_diffuse - 1:
+        smoother.scaled_smoothed_diffuse_estimator[:, t+1] = 0
+        smoother.scaled_smoothed_diffuse1_estimator_cov[:, :, t+1] = 0
+        smoother.scaled_smoothed_diffuse2_estimator_cov[:, :, t+1] = 0
+
+    # Time step
+    # $r_{t,p}^{(k)} = T_t' r_{t+1,0}^{(k)}$
+    # $N_{t,p}^{(k)} = T_t' N_{t+1,0}^{(k)} T_t$
+    if compute_r:
+        blas.dgemv("T", &model._k_states, &model._k_states,
+                  &alpha, model._transition, &model._k_states,
+                          smoother._input_scaled_smoothed_estimator, &inc,
+                  &beta, _r0, &inc)
+        blas.dgemv("T", &model._k_states, &model._k_states,
+                  &alpha, model._transition, &model._k_states,
+                          smoother._input_scaled_smoothed_diffuse_estimator, &inc,
+                  &beta, _r1, &inc)
+    if compute_N:
+        dtransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_estimator_cov, _N0)
+        dtransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_diffuse1_estimator_cov, _N1)
+        dtransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_diffuse2_estimator_cov, _N2)
+
+    # Iterate over the observations at time t
+    for i in range(model._k_endog-1,-1,-1):
+        forecast_error_cov = kfilter._forecast_error_cov[i + i*kfilter.k_endog]
+        forecast_error_diffuse_cov = kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog]
+        _kalman_gain = &kfilter._kalman_gain[i*kfilter.k_states]
+
+        # Nothing to do for observations with zero variance
+        if forecast_error_diffuse_cov == 0 and forecast_error_cov == 0:
+            if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+                smoother._smoothed_measurement_disturbance[i] = 0
+            if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = 0
+            continue
+
+        # Store $K_{t,i}' r_{t,i}^{(0)}$ and $K_{t,i}' N_{t,i}^{(0)} K_{t,i}$
+        # for the smoothed measurement disturbances (see the univariate
+        # smoother)
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+            smoother._smoothed_measurement_disturbance[i] = (
+                blas.ddot(&model._k_states, _kalman_gain, &inc, _r0, &inc))
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+            blas.dgemv("N", &model._k_states, &model._k_states,
+                                     &alpha, _N0, &kfilter.k_states,
+                                             _kalman_gain, &inc,
+                                     &beta, smoother._tmp00, &inc)
+            smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = (
+                blas.ddot(&model._k_states, _kalman_gain, &inc, smoother._tmp00, &inc))
+
+        # $L_{t,i}^{(0)} = I - K_{t,i}^{(0)} Z_{t,i}$ (or $L_{t,i} = I - K_{*,t,i} Z_{t,i}$)
+        for j in range(kfilter.k_states2):
+            _L0[j] = 0
+        blas.dger(&model._k_states, &model._k_states,
+                  &gamma, _kalman_gain, &inc,
+                          &model._design[i], &model._k_endog,
+                  _L0, &kfilter.k_states)
+        for j in range(model._k_states):
+            _L0[j + j*kfilter.k_states] = _L0[j + j*kfilter.k_states] + 1
+
+        if not forecast_error_diffuse_cov == 0:
+            # $L_{t,i}^{(1)} = -(M_{*,t,i} - K_{t,i}^{(0)} F_{*,t,i}) Z_{t,i} / F_{\infty,t,i}$
+            for j in range(kfilter.k_states2):
+                _L1[j] = 0
+            scalar = -1.0 / forecast_error_diffuse_cov
+            blas.dger(&model._k_states, &model._k_states,
+                      &scalar, &kfilter._tmp1[i*kfilter.k_states], &inc,
+                               &model._design[i], &model._k_endog,
+                      _L1, &kfilter.k_states)
+            scalar = forecast_error_cov / forecast_error_diffuse_cov
+            blas.dger(&model._k_states, &model._k_states,
+                      &scalar, _kalman_gain, &inc,
+                               &model._design[i], &model._k_endog,
+                      _L1, &kfilter.k_states)
+
+            if compute_r:
+                # $r_{t,i-1}^{(1)} = Z_{t,i}' v_{t,i} / F_{\infty,t,i} +
+                #     L_{t,i}^{(0)'} r_{t,i}^{(1)} + L_{t,i}^{(1)'} r_{t,i}^{(0)}$
+                blas.dgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r1, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.dgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _r0, &inc,
+                          &alpha, smoother._tmp000, &inc)
+                blas.daxpy(&model._k_states, &kfilter._tmp2[i], &model._design[i], &model._k_endog,
+                                                                         smoother._tmp000, &inc)
+                blas.dcopy(&model._k_states, smoother._tmp000, &inc, _r1, &inc)
+                # $r_{t,i-1}^{(0)} = L_{t,i}^{(0)'} r_{t,i}^{(0)}$
+                blas.dgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r0, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.dcopy(&model._k_states, smoother._tmp000, &inc, _r0, &inc)
+
+            if compute_N:
+                # $X = N^{(0)} L^{(0)}$, $Y = N^{(1)} L^{(0)}$,
+                # $W_0 = N^{(0)} L^{(1)}$, $W_1 = N^{(1)} L^{(1)}$
+                dproduct(model, kfilter, _N0, _L0, _X)
+                dproduct(model, kfilter, _N1, _L0, _Y)
+                dproduct(model, kfilter, _N0, _L1, _W0)
+                dproduct(model, kfilter, _N1, _L1, _W1)
+                # $S = N^{(2)} L^{(0)} + W_1$
+                dproduct(model, kfilter, _N2, _L0, _S)
+                blas.daxpy(&kfilter.k_states2, &alpha, _W1, &inc, _S, &inc)
+                # $Y = N^{(1)} L^{(0)} + N^{(0)} L^{(1)}$
+                blas.daxpy(&kfilter.k_states2, &alpha, _W0, &inc, _Y, &inc)
+
+                # $N_{t,i-1}^{(2)} = L^{(0)'} S + L^{(1)'} Y - Z' Z F_* / F_\infty^2$
+                blas.dgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _S, &kfilter.k_states,
+                          &beta, _N2, &kfilter.k_states)
+                blas.dgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _Y, &kfilter.k_states,
+                          &alpha, _N2, &kfilter.k_states)
+                scalar = -forecast_error_cov / forecast_error_diffuse_cov
+                blas.dger(&model._k_states, &model._k_states,
+                    &scalar, &model._design[i], &model._k_endog,
+                             &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N2, &kfilter.k_states)
+
+                # $N_{t,i-1}^{(1)} = L^{(0)'} Y + L^{(1)'} X + Z' Z / F_\infty$
+                blas.dgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _Y, &kfilter.k_states,
+                          &beta, _N1, &kfilter.k_states)
+                blas.dgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &alpha, _N1, &kfilter.k_states)
+                blas.dger(&model._k_states, &model._k_states,
+                    &alpha, &model._design[i], &model._k_endog,
+                            &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N1, &kfilter.k_states)
+
+                # $N_{t,i-1}^{(0)} = L^{(0)'} X$
+                blas.dgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N0, &kfilter.k_states)
+        else:
+            if compute_r:
+                # $r_{t,i-1}^{(0)} = Z_{t,i}' v_{t,i} / F_{*,t,i} + L_{t,i}' r_{t,i}^{(0)}$
+                blas.dgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r0, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.daxpy(&model._k_states, &kfilter._tmp2[i], &model._design[i], &model._k_endog,
+                                                                         smoother._tmp000, &inc)
+                blas.dcopy(&model._k_states, smoother._tmp000, &inc, _r0, &inc)
+                # $r_{t,i-1}^{(1)} = L_{t,i}' r_{t,i}^{(1)}$
+                blas.dgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r1, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.dcopy(&model._k_states, smoother._tmp000, &inc, _r1, &inc)
+
+            if compute_N:
+                # $N_{t,i-1}^{(0)} = Z_{t,i}' Z_{t,i} / F_{*,t,i} + L_{t,i}' N_{t,i}^{(0)} L_{t,i}$
+                # $N_{t,i-1}^{(k)} = L_{t,i}' N_{t,i}^{(k)} L_{t,i}, \quad k = 1,2$
+                dproduct(model, kfilter, _N0, _L0, _X)
+                blas.dgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N0, &kfilter.k_states)
+                blas.dger(&model._k_states, &model._k_states,
+                    &alpha, &model._design[i], &model._k_endog,
+                            &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N0, &kfilter.k_states)
+                dproduct(model, kfilter, _N1, _L0, _X)
+                blas.dgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N1, &kfilter.k_states)
+                dproduct(model, kfilter, _N2, _L0, _X)
+                blas.dgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N2, &kfilter.k_states)
+
+    return 0
+
+cdef void dproduct(dStatespace model, dKalmanFilter kfilter,
+                            np.float64_t * a, np.float64_t * b, np.float64_t * c):
+    cdef:
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+    # $C = A B$
+    blas.dgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, a, &kfilter.k_states,
+                      b, &kfilter.k_states,
+              &beta, c, &kfilter.k_states)
+
+cdef void dtransition_quadratic(dKalmanSmoother smoother, dKalmanFilter kfilter, dStatespace model,
+                                         np.float64_t * a, np.float64_t * b):
+    cdef:
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+    # $B = T_t' A T_t$
+    blas.dgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, model._transition, &model._k_states,
+                      a, &kfilter.k_states,
+              &beta, smoother._tmp0, &kfilter.k_states)
+    blas.dgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, smoother._tmp0, &kfilter.k_states,
+                      model._transition, &model._k_states,
+              &beta, b, &kfilter.k_states)
+
+cdef int dsmoothed_estimators_time_univariate_diffuse(dKalmanSmoother smoother, dKalmanFilter kfilter, dStatespace model):
+    # the time step was performed at the beginning of the
+    # smoothed_estimators_measurement_univariate_diffuse step
+    return 0
+
+cdef int dsmoothed_state_univariate_diffuse(dKalmanSmoother smoother, dKalmanFilter kfilter, dStatespace model):
+    cdef int i, j
+    cdef:
+        int inc = 1
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+        np.float64_t gamma = -1.0
+        np.float64_t * _predicted_state_cov = &kfilter.predicted_state_cov[0, 0, smoother.t]
+        np.float64_t * _predicted_diffuse_state_cov = &kfilter.predicted_diffuse_state_cov[0, 0, smoother.t]
+        np.float64_t * _X = &smoother.tmp_diffuse[0, 0, 2]
+        np.float64_t * _Y = &smoother.tmp_diffuse[0, 0, 3]
+
+    # Smoothed state
+    if smoother.smoother_output & SMOOTHER_STATE:
+        # $\hat \alpha_t = a_t + P_{*,t} r_{t-1}^{(0)} + P_{\infty,t} r_{t-1}^{(1)}$
+        blas.dcopy(&kfilter.k_states, &kfilter.predicted_state[0, smoother.t], &inc, smoother._smoothed_state, &inc)
+        blas.dgemv("N", &model._k_states, &model._k_states,
+                  &alpha, _predicted_state_cov, &kfilter.k_states,
+                          smoother._scaled_smoothed_estimator, &inc,
+                  &alpha, smoother._smoothed_state, &inc)
+        blas.dgemv("N", &model._k_states, &model._k_states,
+                  &alpha, _predicted_diffuse_state_cov, &kfilter.k_states,
+                          smoother._scaled_smoothed_diffuse_estimator, &inc,
+                  &alpha, smoother._smoothed_state, &inc)
+
+    # Smoothed state covariance
+    if smoother.smoother_output & SMOOTHER_STATE_COV:
+        # $V_t = P_{*,t} - P_{*,t} N_{t-1}^{(0)} P_{*,t}$
+        blas.dcopy(&kfilter.k_states2, _predicted_state_cov, &inc, smoother._smoothed_state_cov, &inc)
+        dproduct(model, kfilter, smoother._scaled_smoothed_estimator_cov, _predicted_state_cov, _X)
+        blas.dgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+                  &gamma, _predicted_state_cov, &kfilter.k_states,
+                          _X, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_cov, &kfilter.k_states)
+        # $- P_{\infty,t} N_{t-1}^{(2)} P_{\infty,t}$
+        dproduct(model, kfilter, smoother._scaled_smoothed_diffuse2_estimator_cov, _predicted_diffuse_state_cov, _X)
+        blas.dgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+                  &gamma, _predicted_diffuse_state_cov, &kfilter.k_states,
+                          _X, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_cov, &kfilter.k_states)
+        # $- P_{\infty,t} N_{t-1}^{(1)} P_{*,t} - (P_{\infty,t} N_{t-1}^{(1)} P_{*,t})'$
+        dproduct(model, kfilter, smoother._scaled_smoothed_diffuse1_estimator_cov, _predicted_state_cov, _X)
+        dproduct(model, kfilter, _predicted_diffuse_state_cov, _X, _Y)
+        for i in range(model._k_states):      # columns
+            for j in range(model._k_states):  # rows
+                smoother._smoothed_state_cov[j + i*kfilter.k_states] = (
+                    smoother._smoothed_state_cov[j + i*kfilter.k_states] -
+                    _Y[j + i*kfilter.k_states] - _Y[i + j*kfilter.k_states])
+
+    return 0
+
+cdef int dsmoothed_disturbances_univariate_diffuse(dKalmanSmoother smoother, dKalmanFilter kfilter, dStatespace model):
+    # Note: this only differs from the univariate version in the
+    # definition of the smoothed measurement disturbance and cov for elements
+    # with $F_{\infty,t,i} > 0$, in which case
+    # $\hat \varepsilon_{t,i} = - \sigma_{t,i}^2 K_{t,i}^{(0)'} r_{t,i}^{(0)}$ and
+    # $Var(\varepsilon_{t,i} | Y_n) = \sigma_{t,i}^2 - \sigma_{t,i}^4 K_{t,i}^{(0)'} N_{t,i}^{(0)} K_{t,i}^{(0)}$
+    cdef int i
+    cdef:
+        int inc = 1
+        np.float64_t alpha = 1.0
+        np.float64_t beta = 0.0
+        np.float64_t gamma = -1.0
+        np.float64_t obs_cov
+        np.float64_t forecast_error_cov
+        np.float64_t forecast_error_diffuse_cov
+
+    # $\\#_0 = R_t Q_t$
+    # $(m \times r) = (m \times r) (r \times r)$
+    blas.dgemm("N", "N", &model._k_states, &model._k_posdef, &model._k_posdef,
+              &alpha, model._selection, &model._k_states,
+                      model._state_cov, &model._k_posdef,
+              &beta, smoother._tmp0, &kfilter.k_states)
+
+    for i in range(model._k_endog):
+        obs_cov = model._obs_cov[i + i*model._k_endog]
+        forecast_error_cov = kfilter._forecast_error_cov[i + i*kfilter.k_endog]
+        forecast_error_diffuse_cov = kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog]
+
+        # Note: K_{t,i}' r_{t,i} and K_{t,i}' N_{t,i} K_{t,i} were stored in
+        # the measurement step
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+            if not forecast_error_diffuse_cov == 0:
+                smoother._smoothed_measurement_disturbance[i] = (
+                    -obs_cov * smoother._smoothed_measurement_disturbance[i])
+            elif not forecast_error_cov == 0:
+                smoother._smoothed_measurement_disturbance[i] = (
+                    kfilter._tmp4[i + i*kfilter.k_endog] * (
+                        kfilter._forecast_error[i] -
+                        forecast_error_cov * smoother._smoothed_measurement_disturbance[i]))
+
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+            if not forecast_error_diffuse_cov == 0:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov - (
+                    obs_cov**2 * smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog])
+            elif not forecast_error_cov == 0:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov - (
+                    (kfilter._tmp4[i + i*kfilter.k_endog]**2) * (
+                        forecast_error_cov +
+                        forecast_error_cov**2 * smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog]))
+            else:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov
+
+    if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+        # Smoothed state disturbance
+        # $\hat \eta_t = \\#_0' r_t^{(0)}$
+        # $(r \times 1) = (r \times m) (m \times 1)$
+        blas.dgemv("T", &model._k_states, &model._k_posdef,
+                      &alpha, smoother._tmp0, &kfilter.k_states,
+                              smoother._input_scaled_smoothed_estimator, &inc,
+                      &beta, smoother._smoothed_state_disturbance, &inc)
+
+    if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+        # Smoothed state disturbance covariance matrix
+        # $Var(\eta_t | Y_n) = Q_t - \\#_0' N_t^{(0)} \\#_0$
+        # $(r \times r) = (r \times r) - (r \times m) (m \times m) (m \times r)$
+        blas.dgemm("N", "N", &model._k_states, &model._k_posdef, &model._k_states,
+                  &alpha, smoother._input_scaled_smoothed_estimator_cov, &kfilter.k_states,
+                          smoother._tmp0, &kfilter.k_states,
+                  &beta, smoother._tmpL, &kfilter.k_states)
+        blas.dcopy(&model._k_posdef2, model._state_cov, &inc, smoother._smoothed_state_disturbance_cov, &inc)
+        blas.dgemm("T", "N", &kfilter.k_posdef, &kfilter.k_posdef, &kfilter.k_states,
+                  &gamma, smoother._tmp0, &kfilter.k_states,
+                          smoother._tmpL, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_disturbance_cov, &kfilter.k_posdef)
+
+    return 0
+
+# ### Exact diffuse univariate Kalman smoother
+#
+# In the diffuse periods, the scaled smoothed estimator and its covariance
+# matrix are expanded in powers of $\kappa^{-1}$ as $r_{t,i} = r_{t,i}^{(0)} +
+# \kappa^{-1} r_{t,i}^{(1)}$ and $N_{t,i} = N_{t,i}^{(0)} + \kappa^{-1}
+# N_{t,i}^{(1)} + \kappa^{-2} N_{t,i}^{(2)}$. The usual `scaled_smoothed_*`
+# arrays hold the $(0)$ terms and the `scaled_smoothed_diffuse*` arrays hold
+# the $(1)$ and $(2)$ terms.
+#
+# If $F_{\infty,t,i} > 0$, with $L_{t,i}^{(0)} = I - K_{t,i}^{(0)} Z_{t,i}$,
+# $L_{t,i}^{(1)} = -K_{t,i}^{(1)} Z_{t,i}$ and
+# $K_{t,i}^{(1)} = (M_{*,t,i} - K_{t,i}^{(0)} F_{*,t,i}) / F_{\infty,t,i}$:
+#
+# $$
+# \begin{aligned}
+# r_{t,i-1}^{(0)} & = L_{t,i}^{(0)'} r_{t,i}^{(0)} \\
+# r_{t,i-1}^{(1)} & = Z_{t,i}' v_{t,i} / F_{\infty,t,i} +
+#     L_{t,i}^{(0)'} r_{t,i}^{(1)} + L_{t,i}^{(1)'} r_{t,i}^{(0)} \\
+# N_{t,i-1}^{(0)} & = L_{t,i}^{(0)'} N_{t,i}^{(0)} L_{t,i}^{(0)} \\
+# N_{t,i-1}^{(1)} & = Z_{t,i}' Z_{t,i} / F_{\infty,t,i} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(1)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(0)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(0)} L_{t,i}^{(1)} \\
+# N_{t,i-1}^{(2)} & = - Z_{t,i}' Z_{t,i} F_{*,t,i} / F_{\infty,t,i}^2 +
+#     L_{t,i}^{(0)'} N_{t,i}^{(2)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(1)} L_{t,i}^{(1)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(1)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(0)} L_{t,i}^{(1)} \\
+# \end{aligned}
+# $$
+#
+# and otherwise, with $L_{t,i} = I - K_{*,t,i} Z_{t,i}$, the $(0)$ terms
+# follow the usual univariate recursions while the $(1)$ and $(2)$ terms are
+# premultiplied by $L_{t,i}'$ (and postmultiplied by $L_{t,i}$).
+#
+# Then
+#
+# $$
+# \begin{aligned}
+# \hat \alpha_t & = a_t + P_{*,t} r_{t-1}^{(0)} + P_{\infty,t} r_{t-1}^{(1)} \\
+# V_t & = P_{*,t} - P_{*,t} N_{t-1}^{(0)} P_{*,t} -
+#     (P_{\infty,t} N_{t-1}^{(1)} P_{*,t})' - P_{\infty,t} N_{t-1}^{(1)} P_{*,t} -
+#     P_{\infty,t} N_{t-1}^{(2)} P_{\infty,t} \\
+# \end{aligned}
+# $$
+#
+# Since the other smoothers differ in whether the time step
+# $r_{t-1,p} = T_{t-1}' r_{t,0}$ is performed at the end of the iteration for
+# period $t$ or at the beginning of the iteration for period $t-1$, the
+# diffuse smoother always performs it at the beginning, so that the time
+# step function is a no-op.
+#
+# See Durbin and Koopman (2012) Chapters 5.3 and 6.4 and Koopman and
+# Durbin (2000).
+
+cdef int csmoothed_estimators_measurement_univariate_diffuse(cKalmanSmoother smoother, cKalmanFilter kfilter, cStatespace model) except *:
+    cdef:
+        int i, j, t = smoother.t, inc = 1
+        int compute_r, compute_N
+        np.complex64_t alpha = 1.0
+        np.complex64_t beta = 0.0
+        np.complex64_t gamma = -1.0
+        np.complex64_t scalar
+        np.complex64_t forecast_error_cov
+        np.complex64_t forecast_error_diffuse_cov
+        np.complex64_t * _kalman_gain
+        np.complex64_t * _L0 = &smoother.tmp_diffuse[0, 0, 0]
+        np.complex64_t * _L1 = &smoother.tmp_diffuse[0, 0, 1]
+        np.complex64_t * _X = &smoother.tmp_diffuse[0, 0, 2]
+        np.complex64_t * _Y = &smoother.tmp_diffuse[0, 0, 3]
+        np.complex64_t * _W0 = &smoother.tmp_diffuse[0, 0, 4]
+        np.complex64_t * _W1 = &smoother.tmp_diffuse[0, 0, 5]
+        np.complex64_t * _S = &smoother.tmp_diffuse[0, 0, 6]
+        np.complex64_t * _r0 = smoother._scaled_smoothed_estimator
+        np.complex64_t * _r1 = smoother._scaled_smoothed_diffuse_estimator
+        np.complex64_t * _N0 = smoother._scaled_smoothed_estimator_cov
+        np.complex64_t * _N1 = smoother._scaled_smoothed_diffuse1_estimator_cov
+        np.complex64_t * _N2 = smoother._scaled_smoothed_diffuse2_estimator_cov
+
+    compute_r = smoother.smoother_output & (SMOOTHER_STATE | SMOOTHER_DISTURBANCE)
+    compute_N = smoother.smoother_output & (SMOOTHER_STATE_COV | SMOOTHER_DISTURBANCE_COV)
+
+    # Clear the input arrays at the end of the sample and at the end of the
+    # diffuse periods, in case we're re-running the smoother
+    if t == model.nobs - 1:
+        smoother.scaled_smoothed_estimator[:, t+1] = 0
+        smoother.scaled_smoothed_estimator_cov[:, :, t+1] = 0
+    if t == kfilter.nobs_diffuse - 1:
+        smoother.scaled_smoothed_diffuse_estimator[:, t+1] = 0
+        smoother.scaled_smoothed_diffuse1_estimator_cov[:, :, t+1] = 0
+        smoother.scaled_smoothed_diffuse2_estimator_cov[:, :, t+1] = 0
+
+    # Time step
+    # $r_{t,p}^{(k)} = T_t' r_{t+1,0}^{(k)}$
+    # $N_{t,p}^{(k)} = T_t' N_{t+1,0}^{(k)} T_t$
+    if compute_r:
+        blas.cgemv("T", &model._k_states, &model._k_states,
+                  &alpha, model._transition, &model._k_states,
+                          smoother._input_scaled_smoothed_estimator, &inc,
+                  &beta, _r0, &inc)
+        blas.cgemv("T", &model._k_states, &model._k_states,
+                  &alpha, model._transition, &model._k_states,
+                          smoother._input_scaled_smoothed_diffuse_estimator, &inc,
+                  &beta, _r1, &inc)
+    if compute_N:
+        ctransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_estimator_cov, _N0)
+        ctransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_diffuse1_estimator_cov, _N1)
+        ctransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_diffuse2_estimator_cov, _N2)
+
+    # Iterate over the observations at time t
+    for i in range(model._k_endog-1,-1,-1):
+        forecast_error_cov = kfilter._forecast_error_cov[i + i*kfilter.k_endog]
+        forecast_error_diffuse_cov = kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog]
+        _kalman_gain = &kfilter._kalman_gain[i*kfilter.k_states]
+
+        # Nothing to do for observations with zero variance
+        if forecast_error_diffuse_cov == 0 and forecast_error_cov == 0:
+            if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+                smoother._smoothed_measurement_disturbance[i] = 0
+            if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = 0
+            continue
+
+        # Store $K_{t,i}' r_{t,i}^{(0)}$ and $K_{t,i}' N_{t,i}^{(0)} K_{t,i}$
+        # for the smoothed measurement disturbances (see the univariate
+        # smoother)
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+            blas.cgemv("N", &inc, &model._k_states,
+                           &alpha, _r0, &inc,
+                                   _kalman_gain, &inc,
+                           &beta, &smoother._smoothed_measurement_disturbance[i], &inc)
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+            blas.cgemv("N", &model._k_states, &model._k_states,
+                                     &alpha, _N0, &kfilter.k_states,
+                                             _kalman_gain, &inc,
+                                     &beta, smoother._tmp00, &inc)
+            blas.cgemv("N", &inc, &model._k_states,
+                           &alpha, smoother._tmp00, &inc,
+                                   _kalman_gain, &inc,
+                           &beta, &smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog], &inc)
+
+        # $L_{t,i}^{(0)} = I - K_{t,i}^{(0)} Z_{t,i}$ (or $L_{t,i} = I - K_{*,t,i} Z_{t,i}$)
+        for j in range(kfilter.k_states2):
+            _L0[j] = 0
+        blas.cgeru(&model._k_states, &model._k_states,
+                  &gamma, _kalman_gain, &inc,
+                          &model._design[i], &model._k_endog,
+                  _L0, &kfilter.k_states)
+        for j in range(model._k_states):
+            _L0[j + j*kfilter.k_states] = _L0[j + j*kfilter.k_states] + 1
+
+        if not forecast_error_diffuse_cov == 0:
+            # $L_{t,i}^{(1)} = -(M_{*,t,i} - K_{t,i}^{(0)} F_{*,t,i}) Z_{t,i} / F_{\infty,t,i}$
+            for j in range(kfilter.k_states2):
+                _L1[j] = 0
+            scalar = -1.0 / forecast_error_diffuse_cov
+            blas.cgeru(&model._k_states, &model._k_states,
+                      &scalar, &kfilter._tmp1[i*kfilter.k_states], &inc,
+                               &model._design[i], &model._k_endog,
+                      _L1, &kfilter.k_states)
+            scalar = forecast_error_cov / forecast_error_diffuse_cov
+            blas.cgeru(&model._k_states, &model._k_states,
+                      &scalar, _kalman_gain, &inc,
+                               &model._design[i], &model._k_endog,
+                      _L1, &kfilter.k_states)
+
+            if compute_r:
+                # $r_{t,i-1}^{(1)} = Z_{t,i}' v_{t,i} / F_{\infty,t,i} +
+                #     L_{t,i}^{(0)'} r_{t,i}^{(1)} + L_{t,i}^{(1)'} r_{t,i}^{(0)}$
+                blas.cgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r1, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.cgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _r0, &inc,
+                          &alpha, smoother._tmp000, &inc)
+                blas.caxpy(&model._k_states, &kfilter._tmp2[i], &model._design[i], &model._k_endog,
+                                                                         smoother._tmp000, &inc)
+                blas.ccopy(&model._k_states, smoother._tmp000, &inc, _r1, &inc)
+                # $r_{t,i-1}^{(0)} = L_{t,i}^{(0)'} r_{t,i}^{(0)}$
+                blas.cgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r0, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.ccopy(&model._k_states, smoother._tmp000, &inc, _r0, &inc)
+
+            if compute_N:
+                # $X = N^{(0)} L^{(0)}$, $Y = N^{(1)} L^{(0)}$,
+                # $W_0 = N^{(0)} L^{(1)}$, $W_1 = N^{(1)} L^{(1)}$
+                cproduct(model, kfilter, _N0, _L0, _X)
+                cproduct(model, kfilter, _N1, _L0, _Y)
+                cproduct(model, kfilter, _N0, _L1, _W0)
+                cproduct(model, kfilter, _N1, _L1, _W1)
+                # $S = N^{(2)} L^{(0)} + W_1$
+                cproduct(model, kfilter, _N2, _L0, _S)
+                blas.caxpy(&kfilter.k_states2, &alpha, _W1, &inc, _S, &inc)
+                # $Y = N^{(1)} L^{(0)} + N^{(0)} L^{(1)}$
+                blas.caxpy(&kfilter.k_states2, &alpha, _W0, &inc, _Y, &inc)
+
+                # $N_{t,i-1}^{(2)} = L^{(0)'} S + L^{(1)'} Y - Z' Z F_* / F_\infty^2$
+                blas.cgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _S, &kfilter.k_states,
+                          &beta, _N2, &kfilter.k_states)
+                blas.cgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _Y, &kfilter.k_states,
+                          &alpha, _N2, &kfilter.k_states)
+                scalar = -forecast_error_cov / forecast_error_diffuse_cov
+                blas.cgeru(&model._k_states, &model._k_states,
+                    &scalar, &model._design[i], &model._k_endog,
+                             &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N2, &kfilter.k_states)
+
+                # $N_{t,i-1}^{(1)} = L^{(0)'} Y + L^{(1)'} X + Z' Z / F_\infty$
+                blas.cgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _Y, &kfilter.k_states,
+                          &beta, _N1, &kfilter.k_states)
+                blas.cgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &alpha, _N1, &kfilter.k_states)
+                blas.cgeru(&model._k_states, &model._k_states,
+                    &alpha, &model._design[i], &model._k_endog,
+                            &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N1, &kfilter.k_states)
+
+                # $N_{t,i-1}^{(0)} = L^{(0)'} X$
+                blas.cgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N0, &kfilter.k_states)
+        else:
+            if compute_r:
+                # $r_{t,i-1}^{(0)} = Z_{t,i}' v_{t,i} / F_{*,t,i} + L_{t,i}' r_{t,i}^{(0)}$
+                blas.cgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r0, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.caxpy(&model._k_states, &kfilter._tmp2[i], &model._design[i], &model._k_endog,
+                                                                         smoother._tmp000, &inc)
+                blas.ccopy(&model._k_states, smoother._tmp000, &inc, _r0, &inc)
+                # $r_{t,i-1}^{(1)} = L_{t,i}' r_{t,i}^{(1)}$
+                blas.cgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r1, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.ccopy(&model._k_states, smoother._tmp000, &inc, _r1, &inc)
+
+            if compute_N:
+                # $N_{t,i-1}^{(0)} = Z_{t,i}' Z_{t,i} / F_{*,t,i} + L_{t,i}' N_{t,i}^{(0)} L_{t,i}$
+                # $N_{t,i-1}^{(k)} = L_{t,i}' N_{t,i}^{(k)} L_{t,i}, \quad k = 1,2$
+                cproduct(model, kfilter, _N0, _L0, _X)
+                blas.cgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N0, &kfilter.k_states)
+                blas.cgeru(&model._k_states, &model._k_states,
+                    &alpha, &model._design[i], &model._k_endog,
+                            &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N0, &kfilter.k_states)
+                cproduct(model, kfilter, _N1, _L0, _X)
+                blas.cgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N1, &kfilter.k_states)
+                cproduct(model, kfilter, _N2, _L0, _X)
+                blas.cgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N2, &kfilter.k_states)
+
+    return 0
+
+cdef void cproduct(cStatespace model, cKalmanFilter kfilter,
+                            np.complex64_t * a, np.complex64_t * b, np.complex64_t * c):
+    cdef:
+        np.complex64_t alpha = 1.0
+        np.complex64_t beta = 0.0
+    # $C = A B$
+    blas.cgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, a, &kfilter.k_states,
+                      b, &kfilter.k_states,
+              &beta, c, &kfilter.k_states)
+
+cdef void ctransition_quadratic(cKalmanSmoother smoother, cKalmanFilter kfilter, cStatespace model,
+                                         np.complex64_t * a, np.complex64_t * b):
+    cdef:
+        np.complex64_t alpha = 1.0
+        np.complex64_t beta = 0.0
+    # $B = T_t' A T_t$
+    blas.cgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, model._transition, &model._k_states,
+                      a, &kfilter.k_states,
+              &beta, smoother._tmp0, &kfilter.k_states)
+    blas.cgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, smoother._tmp0, &kfilter.k_states,
+                      model._transition, &model._k_states,
+              &beta, b, &kfilter.k_states)
+
+cdef int csmoothed_estimators_time_univariate_diffuse(cKalmanSmoother smoother, cKalmanFilter kfilter, cStatespace model):
+    # the time step was performed at the beginning of the
+    # smoothed_estimators_measurement_univariate_diffuse step
+    return 0
+
+cdef int csmoothed_state_univariate_diffuse(cKalmanSmoother smoother, cKalmanFilter kfilter, cStatespace model):
+    cdef int i, j
+    cdef:
+        int inc = 1
+        np.complex64_t alpha = 1.0
+        np.complex64_t beta = 0.0
+        np.complex64_t gamma = -1.0
+        np.complex64_t * _predicted_state_cov = &kfilter.predicted_state_cov[0, 0, smoother.t]
+        np.complex64_t * _predicted_diffuse_state_cov = &kfilter.predicted_diffuse_state_cov[0, 0, smoother.t]
+        np.complex64_t * _X = &smoother.tmp_diffuse[0, 0, 2]
+        np.complex64_t * _Y = &smoother.tmp_diffuse[0, 0, 3]
+
+    # Smoothed state
+    if smoother.smoother_output & SMOOTHER_STATE:
+        # $\hat \alpha_t = a_t + P_{*,t} r_{t-1}^{(0)} + P_{\infty,t} r_{t-1}^{(1)}$
+        blas.ccopy(&kfilter.k_states, &kfilter.predicted_state[0, smoother.t], &inc, smoother._smoothed_state, &inc)
+        blas.cgemv("N", &model._k_states, &model._k_states,
+                  &alpha, _predicted_state_cov, &kfilter.k_states,
+                          smoother._scaled_smoothed_estimator, &inc,
+                  &alpha, smoother._smoothed_state, &inc)
+        blas.cgemv("N", &model._k_states, &model._k_states,
+                  &alpha, _predicted_diffuse_state_cov, &kfilter.k_states,
+                          smoother._scaled_smoothed_diffuse_estimator, &inc,
+                  &alpha, smoother._smoothed_state, &inc)
+
+    # Smoothed state covariance
+    if smoother.smoother_output & SMOOTHER_STATE_COV:
+        # $V_t = P_{*,t} - P_{*,t} N_{t-1}^{(0)} P_{*,t}$
+        blas.ccopy(&kfilter.k_states2, _predicted_state_cov, &inc, smoother._smoothed_state_cov, &inc)
+        cproduct(model, kfilter, smoother._scaled_smoothed_estimator_cov, _predicted_state_cov, _X)
+        blas.cgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+                  &gamma, _predicted_state_cov, &kfilter.k_states,
+                          _X, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_cov, &kfilter.k_states)
+        # $- P_{\infty,t} N_{t-1}^{(2)} P_{\infty,t}$
+        cproduct(model, kfilter, smoother._scaled_smoothed_diffuse2_estimator_cov, _predicted_diffuse_state_cov, _X)
+        blas.cgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+                  &gamma, _predicted_diffuse_state_cov, &kfilter.k_states,
+                          _X, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_cov, &kfilter.k_states)
+        # $- P_{\infty,t} N_{t-1}^{(1)} P_{*,t} - (P_{\infty,t} N_{t-1}^{(1)} P_{*,t})'$
+        cproduct(model, kfilter, smoother._scaled_smoothed_diffuse1_estimator_cov, _predicted_state_cov, _X)
+        cproduct(model, kfilter, _predicted_diffuse_state_cov, _X, _Y)
+        for i in range(model._k_states):      # columns
+            for j in range(model._k_states):  # rows
+                smoother._smoothed_state_cov[j + i*kfilter.k_states] = (
+                    smoother._smoothed_state_cov[j + i*kfilter.k_states] -
+                    _Y[j + i*kfilter.k_states] - _Y[i + j*kfilter.k_states])
+
+    return 0
+
+cdef int csmoothed_disturbances_univariate_diffuse(cKalmanSmoother smoother, cKalmanFilter kfilter, cStatespace model):
+    # Note: this only differs from the univariate version in the
+    # definition of the smoothed measurement disturbance and cov for elements
+    # with $F_{\infty,t,i} > 0$, in which case
+    # $\hat \varepsilon_{t,i} = - \sigma_{t,i}^2 K_{t,i}^{(0)'} r_{t,i}^{(0)}$ and
+    # $Var(\varepsilon_{t,i} | Y_n) = \sigma_{t,i}^2 - \sigma_{t,i}^4 K_{t,i}^{(0)'} N_{t,i}^{(0)} K_{t,i}^{(0)}$
+    cdef int i
+    cdef:
+        int inc = 1
+        np.complex64_t alpha = 1.0
+        np.complex64_t beta = 0.0
+        np.complex64_t gamma = -1.0
+        np.complex64_t obs_cov
+        np.complex64_t forecast_error_cov
+        np.complex64_t forecast_error_diffuse_cov
+
+    # $\\#_0 = R_t Q_t$
+    # $(m \times r) = (m \times r) (r \times r)$
+    blas.cgemm("N", "N", &model._k_states, &model._k_posdef, &model._k_posdef,
+              &alpha, model._selection, &model._k_states,
+                      model._state_cov, &model._k_posdef,
+              &beta, smoother._tmp0, &kfilter.k_states)
+
+    for i in range(model._k_endog):
+        obs_cov = model._obs_cov[i + i*model._k_endog]
+        forecast_error_cov = kfilter._forecast_error_cov[i + i*kfilter.k_endog]
+        forecast_error_diffuse_cov = kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog]
+
+        # Note: K_{t,i}' r_{t,i} and K_{t,i}' N_{t,i} K_{t,i} were stored in
+        # the measurement step
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+            if not forecast_error_diffuse_cov == 0:
+                smoother._smoothed_measurement_disturbance[i] = (
+                    -obs_cov * smoother._smoothed_measurement_disturbance[i])
+            elif not forecast_error_cov == 0:
+                smoother._smoothed_measurement_disturbance[i] = (
+                    kfilter._tmp4[i + i*kfilter.k_endog] * (
+                        kfilter._forecast_error[i] -
+                        forecast_error_cov * smoother._smoothed_measurement_disturbance[i]))
+
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+            if not forecast_error_diffuse_cov == 0:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov - (
+                    obs_cov**2 * smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog])
+            elif not forecast_error_cov == 0:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov - (
+                    (kfilter._tmp4[i + i*kfilter.k_endog]**2) * (
+                        forecast_error_cov +
+                        forecast_error_cov**2 * smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog]))
+            else:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov
+
+    if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+        # Smoothed state disturbance
+        # $\hat \eta_t = \\#_0' r_t^{(0)}$
+        # $(r \times 1) = (r \times m) (m \times 1)$
+        blas.cgemv("T", &model._k_states, &model._k_posdef,
+                      &alpha, smoother._tmp0, &kfilter.k_states,
+                              smoother._input_scaled_smoothed_estimator, &inc,
+                      &beta, smoother._smoothed_state_disturbance, &inc)
+
+    if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+        # Smoothed state disturbance covariance matrix
+        # $Var(\eta_t | Y_n) = Q_t - \\#_0' N_t^{(0)} \\#_0$
+        # $(r \times r) = (r \times r) - (r \times m) (m \times m) (m \times r)$
+        blas.cgemm("N", "N", &model._k_states, &model._k_posdef, &model._k_states,
+                  &alpha, smoother._input_scaled_smoothed_estimator_cov, &kfilter.k_states,
+                          smoother._tmp0, &kfilter.k_states,
+                  &beta, smoother._tmpL, &kfilter.k_states)
+        blas.ccopy(&model._k_posdef2, model._state_cov, &inc, smoother._smoothed_state_disturbance_cov, &inc)
+        blas.cgemm("T", "N", &kfilter.k_posdef, &kfilter.k_posdef, &kfilter.k_states,
+                  &gamma, smoother._tmp0, &kfilter.k_states,
+                          smoother._tmpL, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_disturbance_cov, &kfilter.k_posdef)
+
+    return 0
+
+# ### Exact diffuse univariate Kalman smoother
+#
+# In the diffuse periods, the scaled smoothed estimator and its covariance
+# matrix are expanded in powers of $\kappa^{-1}$ as $r_{t,i} = r_{t,i}^{(0)} +
+# \kappa^{-1} r_{t,i}^{(1)}$ and $N_{t,i} = N_{t,i}^{(0)} + \kappa^{-1}
+# N_{t,i}^{(1)} + \kappa^{-2} N_{t,i}^{(2)}$. The usual `scaled_smoothed_*`
+# arrays hold the $(0)$ terms and the `scaled_smoothed_diffuse*` arrays hold
+# the $(1)$ and $(2)$ terms.
+#
+# If $F_{\infty,t,i} > 0$, with $L_{t,i}^{(0)} = I - K_{t,i}^{(0)} Z_{t,i}$,
+# $L_{t,i}^{(1)} = -K_{t,i}^{(1)} Z_{t,i}$ and
+# $K_{t,i}^{(1)} = (M_{*,t,i} - K_{t,i}^{(0)} F_{*,t,i}) / F_{\infty,t,i}$:
+#
+# $$
+# \begin{aligned}
+# r_{t,i-1}^{(0)} & = L_{t,i}^{(0)'} r_{t,i}^{(0)} \\
+# r_{t,i-1}^{(1)} & = Z_{t,i}' v_{t,i} / F_{\infty,t,i} +
+#     L_{t,i}^{(0)'} r_{t,i}^{(1)} + L_{t,i}^{(1)'} r_{t,i}^{(0)} \\
+# N_{t,i-1}^{(0)} & = L_{t,i}^{(0)'} N_{t,i}^{(0)} L_{t,i}^{(0)} \\
+# N_{t,i-1}^{(1)} & = Z_{t,i}' Z_{t,i} / F_{\infty,t,i} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(1)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(0)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(0)} L_{t,i}^{(1)} \\
+# N_{t,i-1}^{(2)} & = - Z_{t,i}' Z_{t,i} F_{*,t,i} / F_{\infty,t,i}^2 +
+#     L_{t,i}^{(0)'} N_{t,i}^{(2)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(0)'} N_{t,i}^{(1)} L_{t,i}^{(1)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(1)} L_{t,i}^{(0)} +
+#     L_{t,i}^{(1)'} N_{t,i}^{(0)} L_{t,i}^{(1)} \\
+# \end{aligned}
+# $$
+#
+# and otherwise, with $L_{t,i} = I - K_{*,t,i} Z_{t,i}$, the $(0)$ terms
+# follow the usual univariate recursions while the $(1)$ and $(2)$ terms are
+# premultiplied by $L_{t,i}'$ (and postmultiplied by $L_{t,i}$).
+#
+# Then
+#
+# $$
+# \begin{aligned}
+# \hat \alpha_t & = a_t + P_{*,t} r_{t-1}^{(0)} + P_{\infty,t} r_{t-1}^{(1)} \\
+# V_t & = P_{*,t} - P_{*,t} N_{t-1}^{(0)} P_{*,t} -
+#     (P_{\infty,t} N_{t-1}^{(1)} P_{*,t})' - P_{\infty,t} N_{t-1}^{(1)} P_{*,t} -
+#     P_{\infty,t} N_{t-1}^{(2)} P_{\infty,t} \\
+# \end{aligned}
+# $$
+#
+# Since the other smoothers differ in whether the time step
+# $r_{t-1,p} = T_{t-1}' r_{t,0}$ is performed at the end of the iteration for
+# period $t$ or at the beginning of the iteration for period $t-1$, the
+# diffuse smoother always performs it at the beginning, so that the time
+# step function is a no-op.
+#
+# See Durbin and Koopman (2012) Chapters 5.3 and 6.4 and Koopman and
+# Durbin (2000).
+
+cdef int zsmoothed_estimators_measurement_univariate_diffuse(zKalmanSmoother smoother, zKalmanFilter kfilter, zStatespace model) except *:
+    cdef:
+        int i, j, t = smoother.t, inc = 1
+        int compute_r, compute_N
+        np.complex128_t alpha = 1.0
+        np.complex128_t beta = 0.0
+        np.complex128_t gamma = -1.0
+        np.complex128_t scalar
+        np.complex128_t forecast_error_cov
+        np.complex128_t forecast_error_diffuse_cov
+        np.complex128_t * _kalman_gain
+        np.complex128_t * _L0 = &smoother.tmp_diffuse[0, 0, 0]
+        np.complex128_t * _L1 = &smoother.tmp_diffuse[0, 0, 1]
+        np.complex128_t * _X = &smoother.tmp_diffuse[0, 0, 2]
+        np.complex128_t * _Y = &smoother.tmp_diffuse[0, 0, 3]
+        np.complex128_t * _W0 = &smoother.tmp_diffuse[0, 0, 4]
+        np.complex128_t * _W1 = &smoother.tmp_diffuse[0, 0, 5]
+        np.complex128_t * _S = &smoother.tmp_diffuse[0, 0, 6]
+        np.complex128_t * _r0 = smoother._scaled_smoothed_estimator
+        np.complex128_t * _r1 = smoother._scaled_smoothed_diffuse_estimator
+        np.complex128_t * _N0 = smoother._scaled_smoothed_estimator_cov
+        np.complex128_t * _N1 = smoother._scaled_smoothed_diffuse1_estimator_cov
+        np.complex128_t * _N2 = smoother._scaled_smoothed_diffuse2_estimator_cov
+
+    compute_r = smoother.smoother_output & (SMOOTHER_STATE | SMOOTHER_DISTURBANCE)
+    compute_N = smoother.smoother_output & (SMOOTHER_STATE_COV | SMOOTHER_DISTURBANCE_COV)
+
+    # Clear the input arrays at the end of the sample and at the end of the
+    # diffuse periods, in case we're re-running the smoother
+    if t == model.nobs - 1:
+        smoother.scaled_smoothed_estimator[:, t+1] = 0
+        smoother.scaled_smoothed_estimator_cov[:, :, t+1] = 0
+    if t == kfilter.nobs_diffuse - 1:
+        smoother.scaled_smoothed_diffuse_estimator[:, t+1] = 0
+        smoother.scaled_smoothed_diffuse1_estimator_cov[:, :, t+1] = 0
+        smoother.scaled_smoothed_diffuse2_estimator_cov[:, :, t+1] = 0
+
+    # Time step
+    # $r_{t,p}^{(k)} = T_t' r_{t+1,0}^{(k)}$
+    # $N_{t,p}^{(k)} = T_t' N_{t+1,0}^{(k)} T_t$
+    if compute_r:
+        blas.zgemv("T", &model._k_states, &model._k_states,
+                  &alpha, model._transition, &model._k_states,
+                          smoother._input_scaled_smoothed_estimator, &inc,
+                  &beta, _r0, &inc)
+        blas.zgemv("T", &model._k_states, &model._k_states,
+                  &alpha, model._transition, &model._k_states,
+                          smoother._input_scaled_smoothed_diffuse_estimator, &inc,
+                  &beta, _r1, &inc)
+    if compute_N:
+        ztransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_estimator_cov, _N0)
+        ztransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_diffuse1_estimator_cov, _N1)
+        ztransition_quadratic(smoother, kfilter, model, smoother._input_scaled_smoothed_diffuse2_estimator_cov, _N2)
+
+    # Iterate over the observations at time t
+    for i in range(model._k_endog-1,-1,-1):
+        forecast_error_cov = kfilter._forecast_error_cov[i + i*kfilter.k_endog]
+        forecast_error_diffuse_cov = kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog]
+        _kalman_gain = &kfilter._kalman_gain[i*kfilter.k_states]
+
+        # Nothing to do for observations with zero variance
+        if forecast_error_diffuse_cov == 0 and forecast_error_cov == 0:
+            if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+                smoother._smoothed_measurement_disturbance[i] = 0
+            if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = 0
+            continue
+
+        # Store $K_{t,i}' r_{t,i}^{(0)}$ and $K_{t,i}' N_{t,i}^{(0)} K_{t,i}$
+        # for the smoothed measurement disturbances (see the univariate
+        # smoother)
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+            blas.zgemv("N", &inc, &model._k_states,
+                           &alpha, _r0, &inc,
+                                   _kalman_gain, &inc,
+                           &beta, &smoother._smoothed_measurement_disturbance[i], &inc)
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+            blas.zgemv("N", &model._k_states, &model._k_states,
+                                     &alpha, _N0, &kfilter.k_states,
+                                             _kalman_gain, &inc,
+                                     &beta, smoother._tmp00, &inc)
+            blas.zgemv("N", &inc, &model._k_states,
+                           &alpha, smoother._tmp00, &inc,
+                                   _kalman_gain, &inc,
+                           &beta, &smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog], &inc)
+
+        # $L_{t,i}^{(0)} = I - K_{t,i}^{(0)} Z_{t,i}$ (or $L_{t,i} = I - K_{*,t,i} Z_{t,i}$)
+        for j in range(kfilter.k_states2):
+            _L0[j] = 0
+        blas.zgeru(&model._k_states, &model._k_states,
+                  &gamma, _kalman_gain, &inc,
+                          &model._design[i], &model._k_endog,
+                  _L0, &kfilter.k_states)
+        for j in range(model._k_states):
+            _L0[j + j*kfilter.k_states] = _L0[j + j*kfilter.k_states] + 1
+
+        if not forecast_error_diffuse_cov == 0:
+            # $L_{t,i}^{(1)} = -(M_{*,t,i} - K_{t,i}^{(0)} F_{*,t,i}) Z_{t,i} / F_{\infty,t,i}$
+            for j in range(kfilter.k_states2):
+                _L1[j] = 0
+            scalar = -1.0 / forecast_error_diffuse_cov
+            blas.zgeru(&model._k_states, &model._k_states,
+                      &scalar, &kfilter._tmp1[i*kfilter.k_states], &inc,
+                               &model._design[i], &model._k_endog,
+                      _L1, &kfilter.k_states)
+            scalar = forecast_error_cov / forecast_error_diffuse_cov
+            blas.zgeru(&model._k_states, &model._k_states,
+                      &scalar, _kalman_gain, &inc,
+                               &model._design[i], &model._k_endog,
+                      _L1, &kfilter.k_states)
+
+            if compute_r:
+                # $r_{t,i-1}^{(1)} = Z_{t,i}' v_{t,i} / F_{\infty,t,i} +
+                #     L_{t,i}^{(0)'} r_{t,i}^{(1)} + L_{t,i}^{(1)'} r_{t,i}^{(0)}$
+                blas.zgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r1, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.zgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _r0, &inc,
+                          &alpha, smoother._tmp000, &inc)
+                blas.zaxpy(&model._k_states, &kfilter._tmp2[i], &model._design[i], &model._k_endog,
+                                                                         smoother._tmp000, &inc)
+                blas.zcopy(&model._k_states, smoother._tmp000, &inc, _r1, &inc)
+                # $r_{t,i-1}^{(0)} = L_{t,i}^{(0)'} r_{t,i}^{(0)}$
+                blas.zgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r0, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.zcopy(&model._k_states, smoother._tmp000, &inc, _r0, &inc)
+
+            if compute_N:
+                # $X = N^{(0)} L^{(0)}$, $Y = N^{(1)} L^{(0)}$,
+                # $W_0 = N^{(0)} L^{(1)}$, $W_1 = N^{(1)} L^{(1)}$
+                zproduct(model, kfilter, _N0, _L0, _X)
+                zproduct(model, kfilter, _N1, _L0, _Y)
+                zproduct(model, kfilter, _N0, _L1, _W0)
+                zproduct(model, kfilter, _N1, _L1, _W1)
+                # $S = N^{(2)} L^{(0)} + W_1$
+                zproduct(model, kfilter, _N2, _L0, _S)
+                blas.zaxpy(&kfilter.k_states2, &alpha, _W1, &inc, _S, &inc)
+                # $Y = N^{(1)} L^{(0)} + N^{(0)} L^{(1)}$
+                blas.zaxpy(&kfilter.k_states2, &alpha, _W0, &inc, _Y, &inc)
+
+                # $N_{t,i-1}^{(2)} = L^{(0)'} S + L^{(1)'} Y - Z' Z F_* / F_\infty^2$
+                blas.zgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _S, &kfilter.k_states,
+                          &beta, _N2, &kfilter.k_states)
+                blas.zgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _Y, &kfilter.k_states,
+                          &alpha, _N2, &kfilter.k_states)
+                scalar = -forecast_error_cov / forecast_error_diffuse_cov
+                blas.zgeru(&model._k_states, &model._k_states,
+                    &scalar, &model._design[i], &model._k_endog,
+                             &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N2, &kfilter.k_states)
+
+                # $N_{t,i-1}^{(1)} = L^{(0)'} Y + L^{(1)'} X + Z' Z / F_\infty$
+                blas.zgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _Y, &kfilter.k_states,
+                          &beta, _N1, &kfilter.k_states)
+                blas.zgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L1, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &alpha, _N1, &kfilter.k_states)
+                blas.zgeru(&model._k_states, &model._k_states,
+                    &alpha, &model._design[i], &model._k_endog,
+                            &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N1, &kfilter.k_states)
+
+                # $N_{t,i-1}^{(0)} = L^{(0)'} X$
+                blas.zgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N0, &kfilter.k_states)
+        else:
+            if compute_r:
+                # $r_{t,i-1}^{(0)} = Z_{t,i}' v_{t,i} / F_{*,t,i} + L_{t,i}' r_{t,i}^{(0)}$
+                blas.zgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r0, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.zaxpy(&model._k_states, &kfilter._tmp2[i], &model._design[i], &model._k_endog,
+                                                                         smoother._tmp000, &inc)
+                blas.zcopy(&model._k_states, smoother._tmp000, &inc, _r0, &inc)
+                # $r_{t,i-1}^{(1)} = L_{t,i}' r_{t,i}^{(1)}$
+                blas.zgemv("T", &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _r1, &inc,
+                          &beta, smoother._tmp000, &inc)
+                blas.zcopy(&model._k_states, smoother._tmp000, &inc, _r1, &inc)
+
+            if compute_N:
+                # $N_{t,i-1}^{(0)} = Z_{t,i}' Z_{t,i} / F_{*,t,i} + L_{t,i}' N_{t,i}^{(0)} L_{t,i}$
+                # $N_{t,i-1}^{(k)} = L_{t,i}' N_{t,i}^{(k)} L_{t,i}, \quad k = 1,2$
+                zproduct(model, kfilter, _N0, _L0, _X)
+                blas.zgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N0, &kfilter.k_states)
+                blas.zgeru(&model._k_states, &model._k_states,
+                    &alpha, &model._design[i], &model._k_endog,
+                            &kfilter._tmp3[i], &kfilter.k_endog,
+                    _N0, &kfilter.k_states)
+                zproduct(model, kfilter, _N1, _L0, _X)
+                blas.zgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N1, &kfilter.k_states)
+                zproduct(model, kfilter, _N2, _L0, _X)
+                blas.zgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+                          &alpha, _L0, &kfilter.k_states,
+                                  _X, &kfilter.k_states,
+                          &beta, _N2, &kfilter.k_states)
+
+    return 0
+
+cdef void zproduct(zStatespace model, zKalmanFilter kfilter,
+                            np.complex128_t * a, np.complex128_t * b, np.complex128_t * c):
+    cdef:
+        np.complex128_t alpha = 1.0
+        np.complex128_t beta = 0.0
+    # $C = A B$
+    blas.zgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, a, &kfilter.k_states,
+                      b, &kfilter.k_states,
+              &beta, c, &kfilter.k_states)
+
+cdef void ztransition_quadratic(zKalmanSmoother smoother, zKalmanFilter kfilter, zStatespace model,
+                                         np.complex128_t * a, np.complex128_t * b):
+    cdef:
+        np.complex128_t alpha = 1.0
+        np.complex128_t beta = 0.0
+    # $B = T_t' A T_t$
+    blas.zgemm("T", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, model._transition, &model._k_states,
+                      a, &kfilter.k_states,
+              &beta, smoother._tmp0, &kfilter.k_states)
+    blas.zgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+              &alpha, smoother._tmp0, &kfilter.k_states,
+                      model._transition, &model._k_states,
+              &beta, b, &kfilter.k_states)
+
+cdef int zsmoothed_estimators_time_univariate_diffuse(zKalmanSmoother smoother, zKalmanFilter kfilter, zStatespace model):
+    # the time step was performed at the beginning of the
+    # smoothed_estimators_measurement_univariate_diffuse step
+    return 0
+
+cdef int zsmoothed_state_univariate_diffuse(zKalmanSmoother smoother, zKalmanFilter kfilter, zStatespace model):
+    cdef int i, j
+    cdef:
+        int inc = 1
+        np.complex128_t alpha = 1.0
+        np.complex128_t beta = 0.0
+        np.complex128_t gamma = -1.0
+        np.complex128_t * _predicted_state_cov = &kfilter.predicted_state_cov[0, 0, smoother.t]
+        np.complex128_t * _predicted_diffuse_state_cov = &kfilter.predicted_diffuse_state_cov[0, 0, smoother.t]
+        np.complex128_t * _X = &smoother.tmp_diffuse[0, 0, 2]
+        np.complex128_t * _Y = &smoother.tmp_diffuse[0, 0, 3]
+
+    # Smoothed state
+    if smoother.smoother_output & SMOOTHER_STATE:
+        # $\hat \alpha_t = a_t + P_{*,t} r_{t-1}^{(0)} + P_{\infty,t} r_{t-1}^{(1)}$
+        blas.zcopy(&kfilter.k_states, &kfilter.predicted_state[0, smoother.t], &inc, smoother._smoothed_state, &inc)
+        blas.zgemv("N", &model._k_states, &model._k_states,
+                  &alpha, _predicted_state_cov, &kfilter.k_states,
+                          smoother._scaled_smoothed_estimator, &inc,
+                  &alpha, smoother._smoothed_state, &inc)
+        blas.zgemv("N", &model._k_states, &model._k_states,
+                  &alpha, _predicted_diffuse_state_cov, &kfilter.k_states,
+                          smoother._scaled_smoothed_diffuse_estimator, &inc,
+                  &alpha, smoother._smoothed_state, &inc)
+
+    # Smoothed state covariance
+    if smoother.smoother_output & SMOOTHER_STATE_COV:
+        # $V_t = P_{*,t} - P_{*,t} N_{t-1}^{(0)} P_{*,t}$
+        blas.zcopy(&kfilter.k_states2, _predicted_state_cov, &inc, smoother._smoothed_state_cov, &inc)
+        zproduct(model, kfilter, smoother._scaled_smoothed_estimator_cov, _predicted_state_cov, _X)
+        blas.zgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+                  &gamma, _predicted_state_cov, &kfilter.k_states,
+                          _X, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_cov, &kfilter.k_states)
+        # $- P_{\infty,t} N_{t-1}^{(2)} P_{\infty,t}$
+        zproduct(model, kfilter, smoother._scaled_smoothed_diffuse2_estimator_cov, _predicted_diffuse_state_cov, _X)
+        blas.zgemm("N", "N", &model._k_states, &model._k_states, &model._k_states,
+                  &gamma, _predicted_diffuse_state_cov, &kfilter.k_states,
+                          _X, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_cov, &kfilter.k_states)
+        # $- P_{\infty,t} N_{t-1}^{(1)} P_{*,t} - (P_{\infty,t} N_{t-1}^{(1)} P_{*,t})'$
+        zproduct(model, kfilter, smoother._scaled_smoothed_diffuse1_estimator_cov, _predicted_state_cov, _X)
+        zproduct(model, kfilter, _predicted_diffuse_state_cov, _X, _Y)
+        for i in range(model._k_states):      # columns
+            for j in range(model._k_states):  # rows
+                smoother._smoothed_state_cov[j + i*kfilter.k_states] = (
+                    smoother._smoothed_state_cov[j + i*kfilter.k_states] -
+                    _Y[j + i*kfilter.k_states] - _Y[i + j*kfilter.k_states])
+
+    return 0
+
+cdef int zsmoothed_disturbances_univariate_diffuse(zKalmanSmoother smoother, zKalmanFilter kfilter, zStatespace model):
+    # Note: this only differs from the univariate version in the
+    # definition of the smoothed measurement disturbance and cov for elements
+    # with $F_{\infty,t,i} > 0$, in which case
+    # $\hat \varepsilon_{t,i} = - \sigma_{t,i}^2 K_{t,i}^{(0)'} r_{t,i}^{(0)}$ and
+    # $Var(\varepsilon_{t,i} | Y_n) = \sigma_{t,i}^2 - \sigma_{t,i}^4 K_{t,i}^{(0)'} N_{t,i}^{(0)} K_{t,i}^{(0)}$
+    cdef int i
+    cdef:
+        int inc = 1
+        np.complex128_t alpha = 1.0
+        np.complex128_t beta = 0.0
+        np.complex128_t gamma = -1.0
+        np.complex128_t obs_cov
+        np.complex128_t forecast_error_cov
+        np.complex128_t forecast_error_diffuse_cov
+
+    # $\\#_0 = R_t Q_t$
+    # $(m \times r) = (m \times r) (r \times r)$
+    blas.zgemm("N", "N", &model._k_states, &model._k_posdef, &model._k_posdef,
+              &alpha, model._selection, &model._k_states,
+                      model._state_cov, &model._k_posdef,
+              &beta, smoother._tmp0, &kfilter.k_states)
+
+    for i in range(model._k_endog):
+        obs_cov = model._obs_cov[i + i*model._k_endog]
+        forecast_error_cov = kfilter._forecast_error_cov[i + i*kfilter.k_endog]
+        forecast_error_diffuse_cov = kfilter._forecast_error_diffuse_cov[i + i*kfilter.k_endog]
+
+        # Note: K_{t,i}' r_{t,i} and K_{t,i}' N_{t,i} K_{t,i} were stored in
+        # the measurement step
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+            if not forecast_error_diffuse_cov == 0:
+                smoother._smoothed_measurement_disturbance[i] = (
+                    -obs_cov * smoother._smoothed_measurement_disturbance[i])
+            elif not forecast_error_cov == 0:
+                smoother._smoothed_measurement_disturbance[i] = (
+                    kfilter._tmp4[i + i*kfilter.k_endog] * (
+                        kfilter._forecast_error[i] -
+                        forecast_error_cov * smoother._smoothed_measurement_disturbance[i]))
+
+        if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+            if not forecast_error_diffuse_cov == 0:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov - (
+                    obs_cov**2 * smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog])
+            elif not forecast_error_cov == 0:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov - (
+                    (kfilter._tmp4[i + i*kfilter.k_endog]**2) * (
+                        forecast_error_cov +
+                        forecast_error_cov**2 * smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog]))
+            else:
+                smoother._smoothed_measurement_disturbance_cov[i + i*kfilter.k_endog] = obs_cov
+
+    if smoother.smoother_output & SMOOTHER_DISTURBANCE:
+        # Smoothed state disturbance
+        # $\hat \eta_t = \\#_0' r_t^{(0)}$
+        # $(r \times 1) = (r \times m) (m \times 1)$
+        blas.zgemv("T", &model._k_states, &model._k_posdef,
+                      &alpha, smoother._tmp0, &kfilter.k_states,
+                              smoother._input_scaled_smoothed_estimator, &inc,
+                      &beta, smoother._smoothed_state_disturbance, &inc)
+
+    if smoother.smoother_output & SMOOTHER_DISTURBANCE_COV:
+        # Smoothed state disturbance covariance matrix
+        # $Var(\eta_t | Y_n) = Q_t - \\#_0' N_t^{(0)} \\#_0$
+        # $(r \times r) = (r \times r) - (r \times m) (m \times m) (m \times r)$
+        blas.zgemm("N", "N", &model._k_states, &model._k_posdef, &model._k_states,
+                  &alpha, smoother._input_scaled_smoothed_estimator_cov, &kfilter.k_states,
+                          smoother._tmp0, &kfilter.k_states,
+                  &beta, smoother._tmpL, &kfilter.k_states)
+        blas.zcopy(&model._k_posdef2, model._state_cov, &inc, smoother._smoothed_state_disturbance_cov, &inc)
+        blas.zgemm("T", "N", &kfilter.k_posdef, &kfilter.k_posdef, &kfilter.k_states,
+                  &gamma, smoother._tmp0, &kfilter.k_states,
+                          smoother._tmpL, &kfilter.k_states,
+                  &alpha, smoother._smoothed_state_disturbance_cov, &kfilter.k_posdef)
+
+    return 0
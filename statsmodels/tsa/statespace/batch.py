@@ -0,0 +1,813 @@
+"""
+Batched estimation of many univariate SARIMAX models
+
+Many independent series with the same model specification are filtered
+together: the system matrices of all series are stacked along a leading
+axis and a single call of the compiled kernel in `_batch_filter` runs the
+Kalman filter recursions for the whole stack. The parameters are
+estimated with a BFGS optimizer that keeps a separate inverse Hessian
+approximation and step length for each series, so that the series are
+estimated independently of each other but without creating a model
+instance for each series.
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+from __future__ import division, absolute_import, print_function
+
+import numpy as np
+
+from statsmodels.tools.tools import Bunch
+from statsmodels.tools.decorators import cache_readonly
+from statsmodels.tools.eval_measures import aic, bic
+from .sarimax import SARIMAX
+from .tools import diff, find_best_blas_type
+from . import _batch_filter
+
+prefix_batch_filter_map = {
+    's': _batch_filter.sbatch_filter, 'd': _batch_filter.dbatch_filter,
+    'c': _batch_filter.cbatch_filter, 'z': _batch_filter.zbatch_filter
+}
+
+
+def batch_filter(endog, design, obs_intercept, obs_cov, transition,
+                 state_intercept, selected_state_cov, initial_state,
+                 initial_state_cov, tolerance=1e-19):
+    """
+    Kalman filter for many univariate state space models of the same shape
+
+    Parameters
+    ----------
+    endog : ndarray
+        Observations with shape (n_series, nobs). Missing observations are
+        given as nan.
+    design : ndarray
+        Design vectors, shape (n_series, k_states) or (k_states,).
+    obs_intercept : ndarray
+        Observation intercepts, broadcastable to (n_series, nobs).
+    obs_cov : ndarray
+        Observation variances, broadcastable to (n_series,).
+    transition : ndarray
+        Transition matrices, shape (n_series, k_states, k_states).
+    state_intercept : ndarray
+        State intercepts, broadcastable to (n_series, k_states, nobs).
+    selected_state_cov : ndarray
+        The state disturbance covariance matrices ``R Q R'``, shape
+        (n_series, k_states, k_states).
+    initial_state : ndarray
+        Initial state means, shape (n_series, k_states).
+    initial_state_cov : ndarray
+        Initial state covariance matrices, shape
+        (n_series, k_states, k_states).
+    tolerance : float
+        Tolerance for the convergence of the predicted state covariance
+        matrices to their steady state, as in `KalmanFilter`.
+
+    Returns
+    -------
+    Bunch
+        With the attributes `loglikelihood`, `forecasts` and
+        `forecasts_error_cov`, each of shape (n_series, nobs), and
+        `predicted_state` and `predicted_state_cov`, the one-step ahead
+        prediction of the state for period nobs + 1.
+
+    Notes
+    -----
+    The system matrices are time-invariant, except for the intercepts. The
+    arrays can be complex, which is used to compute the score by complex
+    step differentiation. The series are filtered one after the other in
+    compiled code.
+
+    Once the predicted state covariance matrix of a series has converged,
+    and there are no missing observations in the remaining periods, the
+    covariance recursion of the series is skipped and only the state mean
+    is updated.
+    """
+    endog = np.asarray(endog)
+    n_series, nobs = endog.shape
+    k_states = transition.shape[-1]
+    prefix, dtype, _ = find_best_blas_type([
+        np.asarray(x) for x in (endog, design, obs_cov, transition,
+                                selected_state_cov, initial_state_cov)])
+
+    def as_array(x, shape):
+        return np.require(np.broadcast_to(x, shape), dtype, ['C', 'W'])
+
+    missing = np.isnan(endog)
+    state = np.array(initial_state, dtype=dtype, order='C')
+    state_cov = np.array(initial_state_cov, dtype=dtype, order='C')
+    loglikelihood = np.zeros((n_series, nobs), dtype=dtype)
+    forecasts = np.zeros((n_series, nobs), dtype=dtype)
+    forecasts_error_cov = np.zeros((n_series, nobs), dtype=dtype)
+
+    prefix_batch_filter_map[prefix](
+        as_array(np.where(missing, 0, endog), (n_series, nobs)),
+        np.require(missing, np.uint8, ['C', 'W']),
+        as_array(design, (n_series, k_states)),
+        as_array(obs_intercept, (n_series, nobs)),
+        as_array(obs_cov, (n_series,)),
+        as_array(transition, (n_series, k_states, k_states)),
+        as_array(state_intercept, (n_series, k_states, nobs)),
+        as_array(selected_state_cov, (n_series, k_states, k_states)),
+        state, state_cov, loglikelihood, forecasts, forecasts_error_cov,
+        tolerance)
+
+    return Bunch(loglikelihood=loglikelihood, forecasts=forecasts,
+                 forecasts_error_cov=forecasts_error_cov,
+                 predicted_state=state, predicted_state_cov=state_cov)
+
+
+def _solve_discrete_lyapunov(a, q, maxiter=60):
+    """
+    Solve ``P = A P A' + Q`` for stacks of stable matrices by doubling
+    """
+    p = q
+    a_power = a
+    for i in range(maxiter):
+        p = p + np.matmul(np.matmul(a_power, p), np.swapaxes(a_power, 1, 2))
+        a_power = np.matmul(a_power, a_power)
+        if np.max(np.abs(a_power.real)) < 1e-15:
+            break
+    return p
+
+
+def _constrain_stationary_univariate(unconstrained):
+    """
+    `tools.constrain_stationary_univariate` for each row of a 2-d array
+    """
+    n = unconstrained.shape[1]
+    y = np.zeros(unconstrained.shape + (n,), dtype=unconstrained.dtype)
+    r = unconstrained / ((1 + unconstrained**2)**0.5)
+    for k in range(n):
+        for i in range(k):
+            y[:, k, i] = y[:, k - 1, i] + r[:, k] * y[:, k - 1, k - i - 1]
+        y[:, k, k] = r[:, k]
+    return -y[:, n - 1, :]
+
+
+def _unconstrain_stationary_univariate(constrained):
+    """
+    `tools.unconstrain_stationary_univariate` for each row of a 2-d array
+    """
+    n = constrained.shape[1]
+    y = np.zeros(constrained.shape + (n,), dtype=constrained.dtype)
+    y[:, n - 1] = -constrained
+    for k in range(n - 1, 0, -1):
+        for i in range(k):
+            y[:, k - 1, i] = ((y[:, k, i] - y[:, k, k] * y[:, k, k - i - 1]) /
+                              (1 - y[:, k, k]**2))
+    r = np.diagonal(y, axis1=1, axis2=2)
+    return r / ((1 - r**2)**0.5)
+
+
+def _polymul(a, b):
+    """Product of the polynomials in the rows of `a` and `b`"""
+    out = np.zeros((a.shape[0], a.shape[1] + b.shape[1] - 1),
+                   dtype=np.result_type(a, b))
+    for i in range(b.shape[1]):
+        out[:, i:i + a.shape[1]] += a * b[:, i:i + 1]
+    return out
+
+
+class _SARIMAXStack(object):
+    """
+    The state space representation of a SARIMAX specification for a stack
+    of series.
+
+    Parameters
+    ----------
+    endog : ndarray
+        Observations with shape (n_series, nobs).
+    exog : ndarray or None
+        Regressors with shape (n_series, nobs, k_exog).
+    model_kwargs : dict
+        Keyword arguments for `SARIMAX`.
+
+    Notes
+    -----
+    A single `SARIMAX` instance for the first series provides the fixed
+    parts of the system matrices and the positions of the parameters.
+    """
+
+    def __init__(self, endog, exog, model_kwargs):
+        exog0 = None if exog is None else exog[0]
+        model = SARIMAX(endog[0], exog=exog0, **model_kwargs)
+        if model.hamilton_representation:
+            raise ValueError('fit_many does not support the Hamilton '
+                             'representation')
+        if model.state_regression:
+            raise ValueError('fit_many requires mle_regression=True')
+
+        if model.simple_differencing:
+            endog = diff(endog.T, model.orig_k_diff,
+                         model.orig_k_seasonal_diff,
+                         model.seasonal_periods).T
+            if exog is not None:
+                exog = diff(np.rollaxis(exog, 1), model.orig_k_diff,
+                            model.orig_k_seasonal_diff,
+                            model.seasonal_periods)
+                exog = np.rollaxis(exog, 1)
+
+        self.model = model
+        self.endog = endog
+        self.exog = exog
+        self.n_series, self.nobs = endog.shape
+        self.param_names = model.param_names
+        self.k_params = len(self.param_names)
+        self.loglikelihood_burn = model.ssm.loglikelihood_burn
+
+        ssm = model.ssm
+        self.design = np.real(ssm['design'][0])
+        self.transition = np.real(ssm['transition'])
+        self.selection = np.real(ssm['selection'])
+        self.k_states = model.k_states
+
+        if not model.enforce_stationarity:
+            self.initialization = 'diffuse'
+        elif model.k_states == model._k_order:
+            self.initialization = 'stationary'
+        else:
+            self.initialization = 'mixed'
+        self.initial_variance = ssm.initial_variance
+
+        # Positions of the parameter groups, in the order of `update`
+        sizes = [('trend', model.k_trend),
+                 ('exog', model.k_exog if model.mle_regression else 0),
+                 ('ar', model.k_ar_params), ('ma', model.k_ma_params),
+                 ('seasonal_ar', model.k_seasonal_ar_params),
+                 ('seasonal_ma', model.k_seasonal_ma_params),
+                 ('measurement_variance', int(model.measurement_error)),
+                 ('variance', int(model.state_error))]
+        self._slices = {}
+        start = 0
+        for name, size in sizes:
+            self._slices[name] = slice(start, start + size)
+            start += size
+
+    def _params(self, params, name):
+        return params[:, self._slices[name]]
+
+    def transform_params(self, unconstrained):
+        model = self.model
+        constrained = unconstrained.copy()
+        for name, enforce, sign in [
+                ('ar', model.enforce_stationarity, 1),
+                ('ma', model.enforce_invertibility, -1),
+                ('seasonal_ar', model.enforce_stationarity, 1),
+                ('seasonal_ma', model.enforce_invertibility, -1)]:
+            ix = self._slices[name]
+            if enforce and ix.stop > ix.start:
+                constrained[:, ix] = sign * _constrain_stationary_univariate(
+                    unconstrained[:, ix])
+        for name in ['measurement_variance', 'variance']:
+            ix = self._slices[name]
+            constrained[:, ix] = unconstrained[:, ix]**2
+        return constrained
+
+    def untransform_params(self, constrained):
+        model = self.model
+        unconstrained = constrained.copy()
+        for name, enforce, sign in [
+                ('ar', model.enforce_stationarity, 1),
+                ('ma', model.enforce_invertibility, -1),
+                ('seasonal_ar', model.enforce_stationarity, 1),
+                ('seasonal_ma', model.enforce_invertibility, -1)]:
+            ix = self._slices[name]
+            if enforce and ix.stop > ix.start:
+                unconstrained[:, ix] = _unconstrain_stationary_univariate(
+                    sign * constrained[:, ix])
+        for name in ['measurement_variance', 'variance']:
+            ix = self._slices[name]
+            unconstrained[:, ix] = constrained[:, ix]**0.5
+        return unconstrained
+
+    def _trend_data(self, start, end):
+        # trend data for periods start, ..., end - 1 as in SARIMAX
+        time_trend = np.arange(start + 1, end + 1)
+        powers = self.model.polynomial_trend.nonzero()[0]
+        return np.column_stack([time_trend**k for k in powers] +
+                               [np.zeros((end - start, 0))])
+
+    def _intercepts(self, params, exog, start, end):
+        # observation and state intercepts for periods start to end - 1
+        n_series = params.shape[0]
+        model = self.model
+        obs_intercept = np.zeros((n_series, end - start), dtype=params.dtype)
+        if model.mle_regression:
+            obs_intercept = np.einsum('ntk,nk->nt', exog,
+                                      self._params(params, 'exog'))
+        state_intercept = np.zeros((n_series, self.k_states, end - start),
+                                   dtype=params.dtype)
+        if model.k_trend > 0:
+            state_intercept[:, model._k_states_diff] = np.dot(
+                self._params(params, 'trend'),
+                self._trend_data(start, end).T)
+        return obs_intercept, state_intercept
+
+    def system(self, params, index=None):
+        """
+        Stacked system matrices for constrained parameters
+        """
+        model = self.model
+        n_series = params.shape[0]
+        dtype = params.dtype
+        if index is None:
+            index = slice(None)
+
+        # Reduced form lag polynomials
+        ones = np.ones((n_series, 1))
+        poly_ar = np.hstack((ones, np.zeros((n_series, model.k_ar))))
+        poly_ar = poly_ar.astype(dtype)
+        poly_ar[:, model._polynomial_ar_idx] = -self._params(params, 'ar')
+        poly_sar = np.hstack((ones, np.zeros((n_series, model.k_seasonal_ar))))
+        poly_sar = poly_sar.astype(dtype)
+        poly_sar[:, model._polynomial_seasonal_ar_idx] = -self._params(
+            params, 'seasonal_ar')
+        poly_ma = np.hstack((ones, np.zeros((n_series, model.k_ma))))
+        poly_ma = poly_ma.astype(dtype)
+        poly_ma[:, model._polynomial_ma_idx] = self._params(params, 'ma')
+        poly_sma = np.hstack((ones, np.zeros((n_series, model.k_seasonal_ma))))
+        poly_sma = poly_sma.astype(dtype)
+        poly_sma[:, model._polynomial_seasonal_ma_idx] = self._params(
+            params, 'seasonal_ma')
+        reduced_ar = -_polymul(poly_ar, poly_sar)
+        reduced_ma = _polymul(poly_ma, poly_sma)
+
+        transition = np.tile(self.transition.astype(dtype), (n_series, 1, 1))
+        if model.k_ar > 0 or model.k_seasonal_ar > 0:
+            _, rows, col = model.transition_ar_params_idx
+            transition[:, rows, col] = reduced_ar[:, 1:]
+
+        selection = np.tile(self.selection.astype(dtype), (n_series, 1, 1))
+        if model.k_ma > 0 or model.k_seasonal_ma > 0:
+            _, rows, col = model.selection_ma_params_idx
+            selection[:, rows, col] = reduced_ma[:, 1:]
+
+        variance = np.zeros(n_series, dtype=dtype)
+        if model.state_error:
+            variance = self._params(params, 'variance')[:, 0]
+        selected_state_cov = (selection[:, :, 0, None] *
+                              selection[:, None, :, 0] *
+                              variance[:, None, None])
+        obs_cov = np.zeros(n_series, dtype=dtype)
+        if model.measurement_error:
+            obs_cov = self._params(params, 'measurement_variance')[:, 0]
+
+        exog = None if self.exog is None else self.exog[index]
+        obs_intercept, state_intercept = self._intercepts(params, exog, 0,
+                                                          self.nobs)
+
+        # Initialization, see SARIMAX.initialize_state
+        k_states = self.k_states
+        initial_state = np.zeros((n_series, k_states), dtype=dtype)
+        if self.initialization == 'diffuse':
+            initial_state_cov = np.tile(
+                np.eye(k_states) * self.initial_variance, (n_series, 1, 1))
+        elif self.initialization == 'stationary':
+            if model.k_trend > 0:
+                eye = np.eye(k_states)
+                initial_state = np.linalg.solve(
+                    eye - transition, state_intercept[:, :, 0])
+            initial_state_cov = _solve_discrete_lyapunov(
+                transition, selected_state_cov)
+        else:
+            initial_state_cov = np.tile(
+                np.eye(k_states, dtype=dtype) * self.initial_variance,
+                (n_series, 1, 1))
+            start = -model._k_order
+            stationary = transition[:, start:, start:]
+            if model.k_trend > 0:
+                ix = model._k_states_diff
+                initial_mean = (state_intercept[:, ix, 0] /
+                                (1 - stationary[:, :, 0].sum(1)))
+                initial_state[:, ix] = initial_mean
+                initial_state[:, ix + 1:] = (stationary[:, 1:, 0] *
+                                             initial_mean[:, None])
+            initial_state_cov[:, start:, start:] = _solve_discrete_lyapunov(
+                stationary, selected_state_cov[:, start:, start:])
+
+        return dict(design=self.design, obs_intercept=obs_intercept,
+                    obs_cov=obs_cov, transition=transition,
+                    state_intercept=state_intercept,
+                    selected_state_cov=selected_state_cov,
+                    initial_state=initial_state,
+                    initial_state_cov=initial_state_cov)
+
+    def filter(self, params, index=None):
+        if index is None:
+            index = slice(None)
+        return batch_filter(self.endog[index], **self.system(params, index))
+
+    def loglike(self, params, index=None):
+        llf_obs = self.filter(params, index).loglikelihood
+        return llf_obs[:, self.loglikelihood_burn:].sum(1)
+
+    def start_params(self):
+        """
+        Starting parameters for all series
+
+        The trend and regression coefficients are estimated by least squares
+        on the differenced data, the autoregressive and moving average
+        parameters are zero and the variances are set to the residual
+        variance.
+        """
+        model = self.model
+        endog = self.endog
+        exog = self.exog
+        k_diff = model._k_diff
+        k_seasonal_diff = model._k_seasonal_diff
+        s = model.seasonal_periods
+        if k_diff > 0 or k_seasonal_diff > 0:
+            endog = diff(endog.T, k_diff, k_seasonal_diff, s).T
+            if exog is not None:
+                exog = np.rollaxis(diff(np.rollaxis(exog, 1), k_diff,
+                                        k_seasonal_diff, s), 1)
+        n_series, nobs = endog.shape
+
+        # fill missing values with the mean of the series
+        means = np.nanmean(endog, 1)
+        endog = np.where(np.isnan(endog), means[:, None], endog)
+
+        params = np.zeros((n_series, self.k_params))
+        regressors = np.zeros((n_series, nobs, 0))
+        if model.k_trend > 0:
+            trend = self._trend_data(self.nobs - nobs, self.nobs)
+            regressors = np.concatenate(
+                (regressors, np.tile(trend, (n_series, 1, 1))), 2)
+        if model.mle_regression:
+            regressors = np.concatenate((regressors, exog), 2)
+        resid = endog
+        if regressors.shape[2] > 0:
+            xtx = np.einsum('ntk,ntl->nkl', regressors, regressors)
+            xty = np.einsum('ntk,nt->nk', regressors, endog)
+            beta = np.einsum('nkl,nl->nk', np.linalg.pinv(xtx), xty)
+            params[:, :regressors.shape[2]] = beta
+            resid = endog - np.einsum('ntk,nk->nt', regressors, beta)
+        variance = np.var(resid, 1)
+        variance = np.where(variance > 0, variance, 1.)
+        if model.measurement_error:
+            variance = variance / 2
+            params[:, self._slices['measurement_variance']] = variance[:, None]
+        params[:, self._slices['variance']] = variance[:, None]
+        return params
+
+    def forecast(self, params, exog, steps):
+        """
+        Forecasts and their variances for all series
+        """
+        res = self.filter(params)
+        system = self.system(params)
+        obs_intercept, state_intercept = self._intercepts(
+            params, exog, self.nobs, self.nobs + steps)
+        design = system['design']
+        transition = system['transition']
+        transition_t = np.swapaxes(transition, 1, 2)
+
+        state = res.predicted_state
+        state_cov = res.predicted_state_cov
+        forecasts = np.zeros((params.shape[0], steps))
+        variances = np.zeros((params.shape[0], steps))
+        for h in range(steps):
+            forecasts[:, h] = np.dot(state, design) + obs_intercept[:, h]
+            variances[:, h] = (np.einsum('i,nij,j->n', design, state_cov,
+                                         design) + system['obs_cov'])
+            state = (np.einsum('nij,nj->ni', transition, state) +
+                     state_intercept[:, :, h])
+            state_cov = (np.matmul(np.matmul(transition, state_cov),
+                                   transition_t) +
+                         system['selected_state_cov'])
+        return forecasts, variances
+
+
+def _batch_bfgs(func, func_grad, x0, maxiter=50, gtol=1e-5, ftol=1e-10,
+                max_halvings=30):
+    """
+    BFGS with a separate inverse Hessian and line search for each row of x0
+
+    Parameters
+    ----------
+    func : callable
+        ``func(x, index)`` returns the objective for the rows `index`.
+    func_grad : callable
+        ``func_grad(x, index)`` returns the objective and its gradient.
+    x0 : ndarray
+        Starting values, one row per problem.
+
+    Returns
+    -------
+    x, fval, converged, iterations : ndarray
+    """
+    x = x0.copy()
+    n, k = x.shape
+    all_ix = np.arange(n)
+    fval, grad = func_grad(x, all_ix)
+    hess_inv = np.tile(np.eye(k), (n, 1, 1))
+    iterations = np.zeros(n, dtype=int)
+    converged = np.max(np.abs(grad), 1) < gtol
+    active = np.isfinite(fval) & ~converged
+
+    for i in range(maxiter):
+        ix = np.flatnonzero(active)
+        if len(ix) == 0:
+            break
+        g = grad[ix]
+        direction = -np.einsum('nij,nj->ni', hess_inv[ix], g)
+        slope = (g * direction).sum(1)
+        # restart from steepest descent if the direction is not downhill
+        reset = ~(slope < 0)
+        if reset.any():
+            hess_inv[ix[reset]] = np.eye(k)
+            direction[reset] = -g[reset]
+            slope[reset] = -(g[reset]**2).sum(1)
+
+        # backtracking line search for all problems at once
+        step = np.ones(len(ix))
+        x_new = x[ix].copy()
+        f_new = fval[ix].copy()
+        accepted = np.zeros(len(ix), dtype=bool)
+        todo = np.arange(len(ix))
+        for j in range(max_halvings):
+            x_try = x[ix[todo]] + step[todo, None] * direction[todo]
+            f_try = func(x_try, ix[todo])
+            ok = (np.isfinite(f_try) &
+                  (f_try <= fval[ix[todo]] + 1e-4 * step[todo] * slope[todo]))
+            x_new[todo[ok]] = x_try[ok]
+            f_new[todo[ok]] = f_try[ok]
+            accepted[todo[ok]] = True
+            todo = todo[~ok]
+            if len(todo) == 0:
+                break
+            step[todo] *= 0.5
+
+        # problems without an acceptable step are stopped
+        active[ix[~accepted]] = False
+        ix_acc = ix[accepted]
+        if len(ix_acc) == 0:
+            break
+        f_acc, g_acc = func_grad(x_new[accepted], ix_acc)
+        s = x_new[accepted] - x[ix_acc]
+        y = g_acc - grad[ix_acc]
+        sy = (s * y).sum(1)
+
+        # BFGS update of the inverse Hessian
+        upd = sy > 1e-12
+        if upd.any():
+            iu = ix_acc[upd]
+            su, yu, rho = s[upd], y[upd], 1. / sy[upd]
+            h = hess_inv[iu]
+            if i == 0:
+                h = h * (sy[upd] / (yu**2).sum(1))[:, None, None]
+            hy = np.einsum('nij,nj->ni', h, yu)
+            yhy = (yu * hy).sum(1)
+            h = (h + ((1 + rho * yhy) * rho)[:, None, None] *
+                 su[:, :, None] * su[:, None, :] -
+                 rho[:, None, None] * (hy[:, :, None] * su[:, None, :] +
+                                       su[:, :, None] * hy[:, None, :]))
+            hess_inv[iu] = h
+
+        f_change = np.abs(fval[ix_acc] - f_acc)
+        x[ix_acc] = x_new[accepted]
+        fval[ix_acc] = f_acc
+        grad[ix_acc] = g_acc
+        iterations[ix_acc] += 1
+
+        done = ((np.max(np.abs(g_acc), 1) < gtol) |
+                (f_change <= ftol * np.maximum(1, np.abs(f_acc))))
+        converged[ix_acc[done]] = True
+        active[ix_acc[done]] = False
+
+    return x, fval, converged, iterations
+
+
+class SARIMAXBatchResults(object):
+    """
+    Results of estimating the same SARIMAX specification for many series
+
+    Parameters
+    ----------
+    model_kwargs : dict
+        Keyword arguments of the `SARIMAX` specification.
+    endog : ndarray
+        Observations with shape (nobs, n_series).
+    exog : ndarray or None
+        Regressors with shape (n_series, nobs, k_exog).
+    params : ndarray
+        Estimated parameters with shape (n_series, k_params).
+    llf : ndarray
+        Log-likelihood at the estimated parameters, one value per series.
+    converged : ndarray
+        Boolean convergence flag for each series.
+    iterations : ndarray
+        Number of BFGS iterations for each series.
+    nobs_effective : int
+        Number of observations that enter the log-likelihood.
+
+    Attributes
+    ----------
+    param_names : list of str
+        Names of the parameters, as for a single `SARIMAX` model.
+    forecasts, forecasts_var : ndarray
+        Out-of-sample forecasts and their variances, shape
+        (n_series, steps), if `steps` was given to `fit_many`.
+    """
+
+    def __init__(self, model_kwargs, endog, exog, params, llf, converged,
+                 iterations, nobs_effective, param_names):
+        self.model_kwargs = model_kwargs
+        self.endog = endog
+        self.exog = exog
+        self.params = params
+        self.llf = llf
+        self.converged = converged
+        self.iterations = iterations
+        self.nobs_effective = nobs_effective
+        self.param_names = param_names
+        self.n_series, self.k_params = params.shape
+        self.forecasts = None
+        self.forecasts_var = None
+
+    @cache_readonly
+    def aic(self):
+        return aic(self.llf, self.nobs_effective, self.k_params)
+
+    @cache_readonly
+    def bic(self):
+        return bic(self.llf, self.nobs_effective, self.k_params)
+
+    def get_results(self, i, **kwargs):
+        """
+        Full results for series `i`
+
+        The `SARIMAX` model of the series is created and filtered, or
+        smoothed, at the estimated parameters.
+
+        Parameters
+        ----------
+        i : int
+            The index of the series.
+        kwargs
+            Additional keyword arguments for `SARIMAX.smooth`.
+
+        Returns
+        -------
+        SARIMAXResults
+        """
+        exog = None if self.exog is None else self.exog[i]
+        model = SARIMAX(self.endog[:, i], exog=exog, **self.model_kwargs)
+        return model.smooth(self.params[i], **kwargs)
+
+
+def fit_many(endog, exog=None, start_params=None, steps=0, exog_forecast=None,
+             maxiter=50, gtol=1e-5, chunksize=1000, **kwargs):
+    """
+    Estimate the same SARIMAX specification for many series
+
+    Parameters
+    ----------
+    endog : array_like
+        The series in the columns of an array with shape (nobs, n_series).
+        Missing values are given as nan.
+    exog : array_like, optional
+        Regressors shared by all series with shape (nobs, k_exog), or
+        different regressors for each series with shape
+        (nobs, k_exog, n_series).
+    start_params : array_like, optional
+        Starting parameters, either one set of parameters used for all
+        series or an array with shape (n_series, k_params). By default
+        starting values are computed for each series, see Notes.
+    steps : int
+        Number of out-of-sample forecasts to compute for each series.
+    exog_forecast : array_like, optional
+        Regressors for the forecast periods, with shape (steps, k_exog) or
+        (steps, k_exog, n_series). Required if the model has regressors and
+        `steps` is positive.
+    maxiter : int
+        Maximum number of BFGS iterations.
+    gtol : float
+        Convergence tolerance for the largest element of the gradient of
+        the average log-likelihood of a series.
+    chunksize : int
+        Number of series that are filtered together. Larger chunks reduce
+        the Python overhead, the memory use grows with
+        ``chunksize * k_params * k_states**2``.
+    kwargs
+        Keyword arguments for `SARIMAX`, e.g. `order`, `seasonal_order`,
+        `trend` and `measurement_error`.
+
+    Returns
+    -------
+    SARIMAXBatchResults
+
+    Notes
+    -----
+    The average log-likelihood of each series is maximized with respect to
+    the unconstrained parameters, as in `MLEModel.fit`, with a BFGS
+    optimizer that runs for all series of a chunk at once. The gradient is
+    computed by complex step differentiation, which perturbs all parameters
+    of all series in a single filter pass over a stack of
+    ``n_series * k_params`` systems.
+
+    The default starting values are least squares estimates of the trend
+    and regression coefficients on the differenced series, zero
+    autoregressive and moving average coefficients and the residual
+    variance. They differ from the conditional sum of squares estimates
+    used by `SARIMAX.start_params`, so the estimates can differ from
+    fitting each series separately if the likelihood has several local
+    maxima.
+
+    The default initialization of SARIMAX is used, models with the Hamilton
+    representation or with regression coefficients in the state vector are
+    not supported.
+
+    Examples
+    --------
+    >>> res = fit_many(y, order=(1, 0, 1), trend='c', steps=28)
+    >>> res.params.shape, res.forecasts.shape
+    ((n_series, 4), (n_series, 28))
+    """
+    endog = np.asarray(endog, dtype=np.float64)
+    if endog.ndim != 2:
+        raise ValueError('endog must be 2-d with one series in each column')
+    nobs, n_series = endog.shape
+
+    def stack_exog(x, length):
+        if x is None:
+            return None
+        x = np.asarray(x, dtype=np.float64)
+        if x.ndim == 1:
+            x = x[:, None]
+        if x.ndim == 2:
+            x = np.broadcast_to(x, (n_series,) + x.shape)
+        else:
+            x = np.rollaxis(x, 2)
+        if x.shape[:2] != (n_series, length):
+            raise ValueError('exog does not match the shape of endog')
+        return x
+
+    exog_stack = stack_exog(exog, nobs)
+    exog0 = None if exog_stack is None else exog_stack[0]
+    model = SARIMAX(endog[:, 0], exog=exog0, **kwargs)
+    if steps > 0 and model.mle_regression:
+        if exog_forecast is None:
+            raise ValueError('exog_forecast is required to forecast a model '
+                             'with regressors')
+    exog_forecast = stack_exog(exog_forecast, steps)
+
+    if start_params is not None:
+        start_params = np.asarray(start_params, dtype=np.float64)
+        start_params = np.ones((n_series, 1)) * start_params
+
+    k_params = len(model.param_names)
+    params = np.zeros((n_series, k_params))
+    llf = np.zeros(n_series)
+    converged = np.zeros(n_series, dtype=bool)
+    iterations = np.zeros(n_series, dtype=int)
+    forecasts = np.zeros((n_series, steps))
+    forecasts_var = np.zeros((n_series, steps))
+
+    epsilon = 1e-20
+    for start in range(0, n_series, chunksize):
+        chunk = slice(start, start + chunksize)
+        exog_chunk = None if exog_stack is None else exog_stack[chunk]
+        chunk_stack = _SARIMAXStack(endog[:, chunk].T, exog_chunk, kwargs)
+        n_obs = float(chunk_stack.nobs)
+
+        def func(x, index):
+            params = chunk_stack.transform_params(x)
+            return -chunk_stack.loglike(params, index) / n_obs
+
+        def func_grad(x, index):
+            # complex step: one perturbed copy of each series per parameter
+            n = x.shape[0]
+            x_cs = (np.repeat(x[:, None, :], k_params, 1) +
+                    1j * epsilon * np.eye(k_params)).reshape(-1, k_params)
+            params = chunk_stack.transform_params(x_cs)
+            llf = chunk_stack.loglike(params, np.repeat(index, k_params))
+            llf = -llf.reshape(n, k_params) / n_obs
+            return llf[:, 0].real, llf.imag / epsilon
+
+        if start_params is None:
+            x0 = chunk_stack.untransform_params(chunk_stack.start_params())
+        else:
+            x0 = chunk_stack.untransform_params(start_params[chunk])
+        x, _, conv, n_iter = _batch_bfgs(func, func_grad, x0, maxiter=maxiter,
+                                         gtol=gtol)
+
+        chunk_params = chunk_stack.transform_params(x)
+        params[chunk] = chunk_params
+        llf[chunk] = chunk_stack.loglike(chunk_params)
+        converged[chunk] = conv
+        iterations[chunk] = n_iter
+        if steps > 0:
+            exog_fc = (None if exog_forecast is None else
+                       exog_forecast[chunk])
+            forecasts[chunk], forecasts_var[chunk] = chunk_stack.forecast(
+                chunk_params, exog_fc, steps)
+
+    results = SARIMAXBatchResults(
+        kwargs, endog, exog_stack, params, llf, converged, iterations,
+        model.nobs - model.ssm.loglikelihood_burn, model.param_names)
+    if steps > 0:
+        results.forecasts = forecasts
+        results.forecasts_var = forecasts_var
+    return results
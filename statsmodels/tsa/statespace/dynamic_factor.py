@@ -225,6 +225,11 @@ class DynamicFactor(MLEModel):
         if self.k_exog > 0:
             self.ssm._time_invariant = False
 
+        # update _init_keys attached by super
+        self._init_keys += ['k_factors', 'factor_order', 'error_order',
+                            'error_var', 'error_cov_type',
+                            'enforce_stationarity'] + list(kwargs.keys())
+
         # Initialize the components
         self.parameters = OrderedDict()
         self._initialize_loadings()
@@ -437,15 +442,9 @@ class DynamicFactor(MLEModel):
         idx = idx[:, np.lexsort((idx[1], idx[0]))]
         self._idx_error_transition = np.s_['transition', idx[0], idx[1]]
 
-    def filter(self, params, **kwargs):
-        kwargs.setdefault('results_class', DynamicFactorResults)
-        kwargs.setdefault('results_wrapper_class', DynamicFactorResultsWrapper)
-        return super(DynamicFactor, self).filter(params, **kwargs)
-
-    def smooth(self, params, **kwargs):
-        kwargs.setdefault('results_class', DynamicFactorResults)
-        kwargs.setdefault('results_wrapper_class', DynamicFactorResultsWrapper)
-        return super(DynamicFactor, self).smooth(params, **kwargs)
+    @property
+    def _res_classes(self):
+        return {'fit': (DynamicFactorResults, DynamicFactorResultsWrapper)}
 
     @property
     def start_params(self):
@@ -820,6 +819,17 @@ class DynamicFactor(MLEModel):
 
         return unconstrained
 
+    def _forecast_representation(self, params, steps, exog=None,
+                                 design=None):
+        kwargs = {}
+        if exog is not None:
+            params = np.asarray(params)
+            exog_params = params[self._params_exog].reshape(
+                self.k_endog, self.k_exog).T
+            kwargs['obs_intercept'] = np.swapaxes(
+                np.dot(exog, exog_params), -1, -2)
+        return kwargs
+
     def update(self, params, transformed=True, complex_step=False):
         """
         Update the parameters of the model
@@ -24,6 +24,7 @@ FILTER_UNIVARIATE = 0x10       # ibid., Chapter 6.4
 FILTER_COLLAPSED = 0x20        # ibid., Chapter 6.5
 FILTER_EXTENDED = 0x40         # ibid., Chapter 10.2
 FILTER_UNSCENTED = 0x80        # ibid., Chapter 10.3
+FILTER_CHANDRASEKHAR = 0x100   # Morf, Sidhu and Kailath (1974)
 
 INVERT_UNIVARIATE = 0x01
 SOLVE_LU = 0x02
@@ -134,7 +135,7 @@ class KalmanFilter(Representation):
     filter_methods = [
         'filter_conventional', 'filter_exact_initial', 'filter_augmented',
         'filter_square_root', 'filter_univariate', 'filter_collapsed',
-        'filter_extended', 'filter_unscented'
+        'filter_extended', 'filter_unscented', 'filter_chandrasekhar'
     ]
 
     filter_conventional = OptionWrapper('filter_method', FILTER_CONVENTIONAL)
@@ -151,7 +152,7 @@ class KalmanFilter(Representation):
     """
     filter_square_root = OptionWrapper('filter_method', FILTER_SQUARE_ROOT)
     """
-    (bool) Flag for square-root Kalman filtering. Not implemented.
+    (bool) Flag for square-root Kalman filtering.
     """
     filter_univariate = OptionWrapper('filter_method', FILTER_UNIVARIATE)
     """
@@ -169,6 +170,11 @@ class KalmanFilter(Representation):
     """
     (bool) Flag for unscented Kalman filtering. Not implemented.
     """
+    filter_chandrasekhar = OptionWrapper('filter_method',
+                                         FILTER_CHANDRASEKHAR)
+    """
+    (bool) Flag for filtering with the Chandrasekhar recursions.
+    """
 
     inversion_methods = [
         'invert_univariate', 'solve_lu', 'invert_lu', 'solve_cholesky',
@@ -408,12 +414,31 @@ class KalmanFilter(Representation):
 
         FILTER_CONVENTIONAL = 0x01
             Conventional Kalman filter.
+        FILTER_SQUARE_ROOT = 0x08
+            Square-root Kalman filter, which propagates Cholesky factors of the
+            state covariance matrices (updated by QR decompositions) and so
+            keeps them symmetric and positive semi-definite. More robust for
+            long samples or single precision, at some additional
+            computational cost. Overrides conventional method if both are
+            specified. Complex-valued models use the conventional recursions.
         FILTER_UNIVARIATE = 0x10
             Univariate approach to Kalman filtering. Overrides conventional
-            method if both are specified.
+            and square-root methods if specified.
         FILTER_COLLAPSED = 0x20
             Collapsed approach to Kalman filtering. Will be used *in addition*
             to conventional or univariate filtering.
+        FILTER_CHANDRASEKHAR = 0x100
+            Conventional Kalman filter in which the predicted state covariance
+            matrix is updated by the (typically low-rank) factorized
+            increments $P_{t+1} - P_t$ (the Chandrasekhar recursions), which
+            reduces the cost of each period from $O(m^3)$ to roughly
+            $O(m^2 p)$ for $m$ states and $p$ observed variables. Only
+            available for models with time-invariant system matrices (other
+            than the intercepts) with the conventional (non-collapsed) filter
+            and default timing. The increments have the lowest rank (and so
+            the gains are largest) after an exact diffuse or a stationary
+            initialization. Complex-valued models use the conventional
+            recursions.
 
         Note that only the first method is available if using a Scipy version
         older than 0.16.
@@ -803,6 +828,91 @@ class KalmanFilter(Representation):
 
         return results
 
+    def filter_append(self, previous, **kwargs):
+        r"""
+        Continue the Kalman filter from the output of a shorter sample
+
+        Parameters
+        ----------
+        previous : FilterResults
+            Results from filtering the first `previous.nobs` observations of
+            the dataset currently bound to the model, with the same system
+            matrices for those periods.
+        **kwargs
+            Additional keyword arguments to pass to the Kalman filter. See
+            `KalmanFilter.filter` for more details. By default the filter
+            options of `previous` are used.
+
+        Returns
+        -------
+        results : FilterResults
+            Filter output for the full sample.
+
+        Notes
+        -----
+        The filter is only run over the new observations, starting from the
+        last predicted state and predicted state covariance matrix in
+        `previous`, and the output arrays of both runs are concatenated. The
+        cost is therefore proportional to the number of new observations.
+        """
+        nobs_previous = previous.nobs
+        nobs_new = self.nobs - nobs_previous
+        if nobs_new < 0:
+            raise ValueError('The previous results have more observations than'
+                             ' the model.')
+        if (previous.memory_no_forecast or previous.memory_no_predicted or
+                previous.memory_no_filtered or previous.memory_no_likelihood):
+            raise ValueError('Appending requires the full filter output of'
+                             ' the previous results.')
+
+        # Filter the new observations, initialized at the final prediction.
+        # The options are set on the extension rather than passed to `filter`
+        # so that its results record them.
+        extension = KalmanFilter(self.k_endog, self.k_states, self.k_posdef,
+                                 dtype=self.dtype)
+        extension.set_filter_method(
+            kwargs.pop('filter_method', previous.filter_method))
+        extension.set_inversion_method(
+            kwargs.pop('inversion_method', previous.inversion_method))
+        extension.set_stability_method(
+            kwargs.pop('stability_method', previous.stability_method))
+        extension.set_conserve_memory(
+            kwargs.pop('conserve_memory', previous.conserve_memory))
+        extension.tolerance = kwargs.pop('tolerance', previous.tolerance)
+        extension.filter_timing = TIMING_INIT_PREDICTED
+        extension.loglikelihood_burn = max(
+            0, previous.loglikelihood_burn - nobs_previous)
+        extension.bind(np.asfortranarray(self.endog[:, nobs_previous:]))
+        for name, shape in self.shapes.items():
+            if name == 'obs':
+                continue
+            mat = getattr(self, name)
+            if mat.shape[-1] > 1:
+                mat = mat[..., nobs_previous:]
+            setattr(extension, name, mat)
+        for name, (index, values) in self._time_varying_entries.items():
+            extension.set_time_varying_entries(name, index,
+                                               values[:, nobs_previous:])
+        if previous.nobs_diffuse == nobs_previous > 0:
+            # The previous sample ended in the diffuse periods
+            extension.initialize_diffuse(
+                previous.predicted_state[:, -1],
+                previous.predicted_state_cov[:, :, -1],
+                previous.predicted_diffuse_state_cov[:, :, -1])
+        else:
+            extension.initialize_known(previous.predicted_state[:, -1],
+                                       previous.predicted_state_cov[:, :, -1])
+        extension_results = extension.filter(**kwargs)
+
+        # Concatenate the output (the representation of the full sample is
+        # required for the missing data indicators)
+        self._initialize_representation()
+        results = self.results_class(self)
+        results.update_representation(self)
+        results.update_filter_append(previous, extension_results)
+
+        return results
+
     def loglike(self, **kwargs):
         r"""
         Calculate the loglikelihood associated with the statespace model.
@@ -919,7 +1029,8 @@ class KalmanFilter(Representation):
                 raise ValueError('Invalid shape of provided measurement'
                                  ' shocks. Required (%d, %d)'
                                  % (nsimulations, self.k_endog))
-        elif self.shapes['obs_cov'][-1] == 1:
+        elif (self._obs_cov.shape[-1] == 1 and
+              'obs_cov' not in self._time_varying_entries):
             measurement_shocks = np.random.multivariate_normal(
                 mean=np.zeros(self.k_endog), cov=self['obs_cov'],
                 size=nsimulations)
@@ -935,7 +1046,8 @@ class KalmanFilter(Representation):
                 raise ValueError('Invalid shape of provided state shocks.'
                                  ' Required (%d, %d).'
                                  % (nsimulations, self.k_posdef))
-        elif self.shapes['state_cov'][-1] == 1:
+        elif (self._state_cov.shape[-1] == 1 and
+              'state_cov' not in self._time_varying_entries):
             state_shocks = np.random.multivariate_normal(
                 mean=np.zeros(self.k_posdef), cov=self['state_cov'],
                 size=nsimulations)
@@ -956,17 +1068,20 @@ class KalmanFilter(Representation):
             from scipy.linalg import solve_discrete_lyapunov
             # (I - T)^{-1} c = x => (I - T) x = c
             initial_state_mean = np.linalg.solve(
-                np.eye(self.k_states) - self['transition', :, :, 0],
-                self['state_intercept', :, 0])
-            R = self['selection', :, :, 0]
-            Q = self['state_cov', :, :, 0]
+                np.eye(self.k_states) - self._matrix_at('transition', 0),
+                self._matrix_at('state_intercept', 0))
+            R = self._matrix_at('selection', 0)
+            Q = self._matrix_at('state_cov', 0)
             selected_state_cov = R.dot(Q).dot(R.T)
             initial_state_cov = solve_discrete_lyapunov(
-                self['transition', :, :, 0], selected_state_cov)
+                self._matrix_at('transition', 0), selected_state_cov)
             initial_state = np.random.multivariate_normal(
                 initial_state_mean, initial_state_cov)
         elif self.initialization == 'approximate_diffuse':
             initial_state = np.zeros(self.k_states)
+        elif self.initialization == 'diffuse':
+            initial_state = np.random.multivariate_normal(
+                self._initial_state, self._initial_state_cov)
         else:
             initial_state = np.zeros(self.k_states)
 
@@ -975,8 +1090,6 @@ class KalmanFilter(Representation):
 
     def _simulate(self, nsimulations, measurement_shocks, state_shocks,
                   initial_state):
-        time_invariant = self.time_invariant
-
         # Holding variables for the simulations
         simulated_obs = np.zeros((nsimulations, self.k_endog),
                                  dtype=self.dtype)
@@ -985,40 +1098,29 @@ class KalmanFilter(Representation):
         simulated_states[0] = initial_state
 
         # Perform iterations to create the new time series
-        obs_intercept_t = 0
-        design_t = 0
-        state_intercept_t = 0
-        transition_t = 0
-        selection_t = 0
         for t in range(nsimulations):
             # Get the current shocks (this accomodates time-varying matrices)
             if measurement_shocks is None:
                 measurement_shock = np.random.multivariate_normal(
-                    mean=np.zeros(self.k_endog), cov=self['obs_cov', :, :, t])
+                    mean=np.zeros(self.k_endog),
+                    cov=self._matrix_at('obs_cov', t))
             else:
                 measurement_shock = measurement_shocks[t]
 
             if state_shocks is None:
                 state_shock = np.random.multivariate_normal(
                     mean=np.zeros(self.k_posdef),
-                    cov=self['state_cov', :, :, t])
+                    cov=self._matrix_at('state_cov', t))
             else:
                 state_shock = state_shocks[t]
 
-            # Get current-iteration matrices
-            if not time_invariant:
-                obs_intercept_t = 0 if self.obs_intercept.shape[-1] == 1 else t
-                design_t = 0 if self.design.shape[-1] == 1 else t
-                state_intercept_t = (
-                    0 if self.state_intercept.shape[-1] == 1 else t)
-                transition_t = 0 if self.transition.shape[-1] == 1 else t
-                selection_t = 0 if self.selection.shape[-1] == 1 else t
-
-            obs_intercept = self['obs_intercept', :, obs_intercept_t]
-            design = self['design', :, :, design_t]
-            state_intercept = self['state_intercept', :, state_intercept_t]
-            transition = self['transition', :, :, transition_t]
-            selection = self['selection', :, :, selection_t]
+            # Get current-iteration matrices (including compactly stored
+            # time-varying entries)
+            obs_intercept = self._matrix_at('obs_intercept', t)
+            design = self._matrix_at('design', t)
+            state_intercept = self._matrix_at('state_intercept', t)
+            transition = self._matrix_at('transition', t)
+            selection = self._matrix_at('selection', t)
 
             # Iterate the measurement equation
             simulated_obs[t] = (
@@ -1293,6 +1395,17 @@ class FilterResults(FrozenRepresentation):
         The forecast error covariance matrices at each time period.
     llf_obs : array
         The loglikelihood values at each time period.
+    nobs_diffuse : int
+        The number of initial periods handled by the exact diffuse recursions
+        (zero unless an exact diffuse initialization was used).
+    predicted_diffuse_state_cov : array
+        The diffuse part of the predicted state covariance matrix at each
+        time period, if there were diffuse periods (otherwise None).
+    forecasts_error_diffuse_cov : array
+        The diffuse part of the forecast error variances at each time period,
+        if there were diffuse periods (otherwise None). Since the diffuse
+        periods are filtered element-by-element, only the diagonal is
+        populated.
     """
     _filter_attributes = [
         'filter_method', 'inversion_method', 'stability_method',
@@ -1302,7 +1415,8 @@ class FilterResults(FrozenRepresentation):
         'tmp1', 'tmp2', 'tmp3', 'tmp4', 'forecasts',
         'forecasts_error', 'forecasts_error_cov', 'llf_obs',
         'collapsed_forecasts', 'collapsed_forecasts_error',
-        'collapsed_forecasts_error_cov',
+        'collapsed_forecasts_error_cov', 'nobs_diffuse',
+        'predicted_diffuse_state_cov', 'forecasts_error_diffuse_cov'
     ]
 
     _filter_options = (
@@ -1445,6 +1559,16 @@ class FilterResults(FrozenRepresentation):
         )
         self.llf_obs = np.array(kalman_filter.loglikelihood, copy=True)
 
+        # Exact diffuse initialization
+        self.nobs_diffuse = kalman_filter.nobs_diffuse
+        self.predicted_diffuse_state_cov = None
+        self.forecasts_error_diffuse_cov = None
+        if self.nobs_diffuse > 0:
+            self.predicted_diffuse_state_cov = np.array(
+                kalman_filter.predicted_diffuse_state_cov, copy=True)
+            self.forecasts_error_diffuse_cov = np.array(
+                kalman_filter.forecast_error_diffuse_cov, copy=True)
+
         # If there was missing data, save the original values from the Kalman
         # filter output, since below will set the values corresponding to
         # the missing observations to nans.
@@ -1489,9 +1613,11 @@ class FilterResults(FrozenRepresentation):
         # Construct the predictions, forecasts
         if not (self.memory_no_forecast or self.memory_no_predicted):
             for t in range(self.nobs):
-                design_t = 0 if self.design.shape[2] == 1 else t
-                obs_cov_t = 0 if self.obs_cov.shape[2] == 1 else t
-                obs_intercept_t = 0 if self.obs_intercept.shape[1] == 1 else t
+                if not (self.nmissing[t] > 0 or self.filter_collapsed):
+                    continue
+                design = self._matrix_at('design', t)
+                obs_cov = self._matrix_at('obs_cov', t)
+                obs_intercept = self._matrix_at('obs_intercept', t)
 
                 # For completely missing observations, the Kalman filter will
                 # produce forecasts, but forecast errors and the forecast
@@ -1517,33 +1643,121 @@ class FilterResults(FrozenRepresentation):
                     # provided by the Kalman filter, from which the data can be
                     # retrieved if desired.
                     self.forecasts[:, t] = np.dot(
-                        self.design[:, :, design_t], self.predicted_state[:, t]
-                    ) + self.obs_intercept[:, obs_intercept_t]
+                        design, self.predicted_state[:, t]) + obs_intercept
                     self.forecasts_error[:, t] = np.nan
                     self.forecasts_error[mask, t] = (
                         self.endog[mask, t] - self.forecasts[mask, t])
                     self.forecasts_error_cov[:, :, t] = np.dot(
-                        np.dot(self.design[:, :, design_t],
-                               self.predicted_state_cov[:, :, t]),
-                        self.design[:, :, design_t].T
-                    ) + self.obs_cov[:, :, obs_cov_t]
+                        np.dot(design, self.predicted_state_cov[:, :, t]),
+                        design.T) + obs_cov
                 # In the collapsed case, everything just needs to be rebuilt
                 # for the original observed data, since the Kalman filter
                 # produced these values for the collapsed data.
                 elif self.filter_collapsed:
                     self.forecasts[:, t] = np.dot(
-                        self.design[:, :, design_t], self.predicted_state[:, t]
-                    ) + self.obs_intercept[:, obs_intercept_t]
+                        design, self.predicted_state[:, t]) + obs_intercept
 
                     self.forecasts_error[:, t] = (
                         self.endog[:, t] - self.forecasts[:, t]
                     )
 
                     self.forecasts_error_cov[:, :, t] = np.dot(
-                        np.dot(self.design[:, :, design_t],
-                               self.predicted_state_cov[:, :, t]),
-                        self.design[:, :, design_t].T
-                    ) + self.obs_cov[:, :, obs_cov_t]
+                        np.dot(design, self.predicted_state_cov[:, :, t]),
+                        design.T) + obs_cov
+
+    def update_filter_append(self, previous, extension):
+        """
+        Update the filter results from the output of two consecutive samples
+
+        Parameters
+        ----------
+        previous : FilterResults
+            Filter output for the first `previous.nobs` observations.
+        extension : FilterResults
+            Filter output for the remaining observations, initialized with the
+            final predicted state and covariance matrix of `previous`.
+
+        Notes
+        -----
+        This method is rarely required except for internal usage.
+        """
+        nobs_previous = previous.nobs
+
+        def concatenate(name, predicted=False):
+            first = getattr(previous, name, None)
+            second = getattr(extension, name, None)
+            if first is None or second is None:
+                return None
+            if predicted:
+                first = first[..., :-1]
+            if (not first.shape[-1] == nobs_previous or
+                    not second.shape[-1] == extension.nobs + predicted):
+                return None
+            return np.concatenate([first, second], axis=-1)
+
+        # State initialization and options are those of the first sample
+        self.initial_state = previous.initial_state
+        self.initial_state_cov = previous.initial_state_cov
+        self.filter_method = previous.filter_method
+        self.inversion_method = previous.inversion_method
+        self.stability_method = previous.stability_method
+        self.conserve_memory = previous.conserve_memory
+        self.filter_timing = previous.filter_timing
+        self.tolerance = previous.tolerance
+        self.loglikelihood_burn = previous.loglikelihood_burn
+
+        if previous.converged:
+            self.converged = True
+            self.period_converged = previous.period_converged
+        else:
+            self.converged = extension.converged
+            self.period_converged = (
+                nobs_previous + extension.period_converged
+                if extension.converged else extension.period_converged)
+
+        for name in ['filtered_state', 'filtered_state_cov', 'forecasts',
+                     'forecasts_error', 'forecasts_error_cov', 'llf_obs',
+                     '_standardized_forecasts_error', '_kalman_gain', 'tmp1',
+                     'tmp2', 'tmp3', 'tmp4', 'collapsed_forecasts',
+                     'collapsed_forecasts_error',
+                     'collapsed_forecasts_error_cov']:
+            setattr(self, name, concatenate(name))
+        for name in ['predicted_state', 'predicted_state_cov']:
+            setattr(self, name, concatenate(name, predicted=True))
+
+        # Exact diffuse initialization (the extension only has diffuse
+        # periods if the previous sample ended in the diffuse periods)
+        self.nobs_diffuse = previous.nobs_diffuse
+        if previous.nobs_diffuse == nobs_previous:
+            self.nobs_diffuse += extension.nobs_diffuse
+        self.predicted_diffuse_state_cov = None
+        self.forecasts_error_diffuse_cov = None
+        if self.nobs_diffuse > 0:
+            for name, predicted in [('predicted_diffuse_state_cov', True),
+                                    ('forecasts_error_diffuse_cov', False)]:
+                first = getattr(previous, name)
+                second = getattr(extension, name)
+                if predicted:
+                    first = first[..., :-1]
+                if second is None:
+                    second = np.zeros(first.shape[:-1] +
+                                      (extension.nobs + predicted,),
+                                      dtype=first.dtype)
+                setattr(self, name, np.concatenate([first, second], axis=-1))
+
+        # The original filter output for the periods with missing data
+        self.missing_forecasts = None
+        self.missing_forecasts_error = None
+        self.missing_forecasts_error_cov = None
+        if np.sum(self.nmissing) > 0:
+            for name in ['forecasts', 'forecasts_error',
+                         'forecasts_error_cov']:
+                first = getattr(previous, 'missing_' + name)
+                second = getattr(extension, 'missing_' + name)
+                setattr(self, 'missing_' + name, np.concatenate([
+                    getattr(previous, name) if first is None else first,
+                    getattr(extension, name) if second is None else second
+                ], axis=-1))
 
     @property
     def kalman_gain(self):
@@ -1560,16 +1774,16 @@ class FilterResults(FrozenRepresentation):
                 if self.nmissing[t] == self.k_endog:
                     continue
 
-                design_t = 0 if self.design.shape[2] == 1 else t
-                transition_t = 0 if self.transition.shape[2] == 1 else t
+                design = self._matrix_at('design', t)
+                transition = self._matrix_at('transition', t)
                 if self.nmissing[t] == 0:
                     self._kalman_gain[:, :, t] = np.dot(
                         np.dot(
-                            self.transition[:, :, transition_t],
+                            transition,
                             self.predicted_state_cov[:, :, t]
                         ),
                         np.dot(
-                            np.transpose(self.design[:, :, design_t]),
+                            np.transpose(design),
                             np.linalg.inv(self.forecasts_error_cov[:, :, t])
                         )
                     )
@@ -1578,11 +1792,11 @@ class FilterResults(FrozenRepresentation):
                     F = self.forecasts_error_cov[np.ix_(mask, mask, [t])]
                     self._kalman_gain[:, mask, t] = np.dot(
                         np.dot(
-                            self.transition[:, :, transition_t],
+                            transition,
                             self.predicted_state_cov[:, :, t]
                         ),
                         np.dot(
-                            np.transpose(self.design[mask, :, design_t]),
+                            np.transpose(design[mask, :]),
                             np.linalg.inv(F[:, :, 0])
                         )
                     )
@@ -1831,10 +2045,17 @@ class FilterResults(FrozenRepresentation):
             model = KalmanFilter(
                 endog, self.k_states, self.k_posdef, **model_kwargs
             )
-            model.initialize_known(
-                self.initial_state,
-                self.initial_state_cov
-            )
+            if self.initialization == 'diffuse':
+                model.initialize_diffuse(
+                    self.initial_state,
+                    self.initial_state_cov,
+                    self.initial_diffuse_state_cov
+                )
+            else:
+                model.initialize_known(
+                    self.initial_state,
+                    self.initial_state_cov
+                )
             model._initialize_filter()
             model._initialize_state()
 
@@ -1843,6 +2064,133 @@ class FilterResults(FrozenRepresentation):
         return PredictionResults(results, start, end, nstatic, ndynamic,
                                  nforecast)
 
+    def forecast_moments(self, steps=1, **kwargs):
+        r"""
+        Means and mean squared errors of out-of-sample forecasts
+
+        Parameters
+        ----------
+        steps : int, optional
+            Number of periods after the end of the sample to forecast.
+            Default is 1.
+        **kwargs
+            State space representation matrices for the forecast periods. Any
+            matrix that is time-varying in the sample must be provided, with
+            a last dimension of length `steps`; other matrices default to
+            their in-sample values. The `obs_intercept`, `state_intercept`
+            and `design` matrices may have an additional leading dimension of
+            length `n`, in which case forecasts are computed for each of
+            these `n` sets of matrices (for example for different paths of
+            future exogenous variables).
+
+        Returns
+        -------
+        forecasts : array
+            Forecasts of the observation vector, shaped (k_endog, steps), or
+            (n, k_endog, steps) if any matrix has a leading dimension.
+        forecasts_error_cov : array
+            Mean squared errors of the forecasts, shaped
+            (k_endog, k_endog, steps), or (n, k_endog, k_endog, steps) if
+            the `design` matrix has a leading dimension.
+
+        Notes
+        -----
+        The forecasts start from the predicted state and its covariance
+        matrix for the first period after the sample, and only iterate the
+        transition equation over the forecast periods. Unlike `predict`,
+        this does not apply the Kalman filter to the sample again or create
+        a results object.
+        """
+        if self.memory_no_predicted:
+            raise ValueError('Forecasting is not possible if memory'
+                             ' conservation has been used to avoid storing'
+                             ' predicted values.')
+        if self.nobs_diffuse >= self.nobs > 0:
+            raise ValueError('Cannot forecast while the initial state is'
+                             ' still diffuse.')
+        steps = int(steps)
+        if steps < 1:
+            raise ValueError('Number of forecast periods must be positive.')
+
+        # Get the matrices for the forecast periods, with a leading dimension
+        # for those that can vary across sets of forecasts
+        exception = ('Forecasting for models with time-varying %s matrix'
+                     ' requires an updated time-varying matrix for the'
+                     ' period to be forecasted.')
+        stacked = ['obs_intercept', 'state_intercept', 'design']
+        representation = {}
+        n = None
+        for name, shape in self.shapes.items():
+            if name == 'obs':
+                continue
+            if name not in kwargs:
+                mat = getattr(self, name)
+                if mat.shape[-1] > 1:
+                    raise ValueError(exception % name)
+            else:
+                mat = np.asarray(kwargs[name])
+                if mat.ndim == len(shape) - 1:
+                    mat = mat[..., None]
+                if name in stacked and mat.ndim == len(shape) + 1:
+                    if n is not None and not mat.shape[0] == n:
+                        raise ValueError('Matrices for the forecast periods'
+                                         ' have different leading'
+                                         ' dimensions.')
+                    n = mat.shape[0]
+                elif not mat.ndim == len(shape):
+                    raise ValueError('Invalid dimensions for %s matrix.'
+                                     % name)
+                core_shape = mat.shape[mat.ndim - len(shape):]
+                if not (core_shape[:-1] == shape[:-1] and
+                        core_shape[-1] in [1, steps]):
+                    raise ValueError(exception % name)
+            if name in stacked and mat.ndim == len(shape):
+                mat = mat[None, ...]
+            representation[name] = mat
+        stacked_design = representation['design'].shape[0] > 1
+
+        def at(name, t):
+            mat = representation[name]
+            return mat[..., 0 if mat.shape[-1] == 1 else t]
+
+        state = np.zeros((1 if n is None else n, self.k_states),
+                         dtype=self.predicted_state.dtype)
+        state[:] = self.predicted_state[:, -1]
+        state_cov = np.array(self.predicted_state_cov[:, :, -1])
+        forecasts = np.zeros(state.shape[:1] + (self.k_endog, steps),
+                             dtype=state.dtype)
+        forecasts_error_cov = np.zeros(
+            (representation['design'].shape[0], self.k_endog, self.k_endog,
+             steps), dtype=state.dtype)
+
+        for t in range(steps):
+            # Forecasts of the observation vector
+            design = at('design', t)
+            if stacked_design:
+                forecasts[:, :, t] = np.einsum('nij,nj->ni', design, state)
+                forecasts_error_cov[..., t] = np.einsum(
+                    'nij,jk,nlk->nil', design, state_cov, design)
+            else:
+                forecasts[:, :, t] = np.dot(state, design[0].T)
+                forecasts_error_cov[0, :, :, t] = np.dot(
+                    np.dot(design[0], state_cov), design[0].T)
+            forecasts[:, :, t] += at('obs_intercept', t)
+            forecasts_error_cov[..., t] += at('obs_cov', t)
+
+            # Predicted state and covariance matrix for the next period
+            transition = at('transition', t)
+            selection = at('selection', t)
+            state = np.dot(state, transition.T) + at('state_intercept', t)
+            state_cov = (
+                np.dot(np.dot(transition, state_cov), transition.T) +
+                np.dot(np.dot(selection, at('state_cov', t)), selection.T))
+
+        if n is None:
+            forecasts = forecasts[0]
+        if not stacked_design:
+            forecasts_error_cov = forecasts_error_cov[0]
+        return forecasts, forecasts_error_cov
+
     def _predict(self, nstatic, ndynamic, nforecast, model):
         # Note: this doesn't use self, and can either be a static method or
         #       moved outside the class altogether.
@@ -655,10 +655,19 @@ class SmootherResults(FilterResults):
                             reorder_cols=True, prefix=self.prefix)
                         # In the missing data case, we want to set the missing
                         # components equal to their unconditional distribution
-                        copy_index_matrix(
-                            self.obs_cov, matrix, self.missing,
-                            index_rows=True, index_cols=True, inplace=True,
-                            prefix=self.prefix)
+                        if 'obs_cov' in self._time_varying_entries:
+                            # (without expanding the compactly stored
+                            # time-varying entries)
+                            for t in np.where(self.nmissing > 0)[0]:
+                                ix = np.where(self.missing[:, t])[0]
+                                obs_cov = self._matrix_at('obs_cov', t)
+                                matrix[np.ix_(ix, ix, [t])] = (
+                                    obs_cov[np.ix_(ix, ix)][:, :, None])
+                        else:
+                            copy_index_matrix(
+                                self.obs_cov, matrix, self.missing,
+                                index_rows=True, index_cols=True,
+                                inplace=True, prefix=self.prefix)
                     else:
                         matrix = np.array(matrix, copy=True)
                     setattr(self, name, matrix)
@@ -696,6 +705,146 @@ class SmootherResults(FilterResults):
         self._smoothed_forecasts_error = None
         self._smoothed_forecasts_error_cov = None
 
+    def loglikelihood_gradients(self, nobs=None):
+        r"""
+        Derivatives of the loglikelihood with respect to the system matrices
+
+        Parameters
+        ----------
+        nobs : int, optional
+            If given, the derivatives of the loglikelihood of only the first
+            `nobs` observations are computed. Default is all observations.
+
+        Returns
+        -------
+        gradients : dict
+            The derivatives with respect to 'design', 'obs_intercept',
+            'obs_cov', 'transition', 'state_intercept', 'selected_state_cov'
+            (the matrix :math:`R_t Q_t R_t'`), 'initial_state' and
+            'initial_state_cov'. The derivatives with respect to the system
+            matrices have the time period as their *first* axis, so that for
+            example the derivative with respect to the design matrix is
+            shaped (nobs, k_endog, k_states).
+
+        Notes
+        -----
+        The derivatives are computed from the output of the Kalman filter
+        and the scaled smoothed estimators :math:`r_t, N_t` (Koopman and
+        Shephard, 1992, Durbin and Koopman, 2012, Chapter 7.3.3). With the
+        smoothing error :math:`u_t = F_t^{-1} v_t - K_t' r_t`,
+        :math:`D_t = F_t^{-1} + K_t' N_t K_t` and the smoothed state
+        :math:`\hat \alpha_t`, they are
+
+        .. math::
+
+            \partial \ell / \partial Z_t & = u_t \hat \alpha_t' -
+                (F_t^{-1} Z_t - K_t' N_t L_t) P_t \\
+            \partial \ell / \partial d_t & = u_t \\
+            \partial \ell / \partial H_t & = (u_t u_t' - D_t) / 2 \\
+            \partial \ell / \partial T_t & = r_t \hat \alpha_t' -
+                N_t L_t P_t \\
+            \partial \ell / \partial c_t & = r_t \\
+            \partial \ell / \partial (R_t Q_t R_t') & =
+                (r_t r_t' - N_t) / 2 \\
+
+        where :math:`K_t = T_t P_t Z_t' F_t^{-1}` and :math:`L_t = T_t - K_t
+        Z_t`, and :math:`r_{-1}, N_{-1}` give the derivatives with respect to
+        the initial state mean and covariance matrix. The expressions do not
+        involve the inverses of :math:`H_t` or :math:`R_t Q_t R_t'`, so that
+        they are valid for singular covariance matrices.
+
+        The results must contain the output of the conventional Kalman filter
+        and of the smoothed state and state covariance matrices.
+
+        References
+        ----------
+        .. [*] Koopman, S. J., and N. Shephard. 1992.
+           "Exact Score for Time Series Models in State Space Form."
+           Biometrika 79 (4): 823-26.
+        .. [*] Durbin, James, and Siem Jan Koopman. 2012.
+           Time Series Analysis by State Space Methods: Second Edition.
+           Oxford University Press.
+        """
+        if (self.filter_univariate or self.filter_collapsed or
+                self.scaled_smoothed_estimator is None or
+                self.scaled_smoothed_estimator_cov is None):
+            raise ValueError('The loglikelihood gradients require the output'
+                             ' of the conventional Kalman filter and of the'
+                             ' state smoother.')
+        full_sample = nobs is None or nobs == self.nobs
+        if nobs is None:
+            nobs = self.nobs
+
+        def time_first(name):
+            mat = np.asarray(getattr(self, name))
+            mat = np.rollaxis(mat, mat.ndim - 1)[:nobs]
+            if mat.ndim == 2:
+                mat = mat[..., None]
+            return mat
+
+        def transpose(mat):
+            return np.swapaxes(mat, -1, -2)
+
+        design = time_first('design')
+        transition = time_first('transition')
+        predicted_state = time_first('predicted_state')
+        predicted_state_cov = time_first('predicted_state_cov')
+        forecasts_error_cov = time_first('forecasts_error_cov')
+
+        # Inverse of the forecast error covariance matrix of the observed
+        # elements, with zeros in the rows and columns of missing elements
+        mask = (1 - self.missing.T[:nobs, :, None]).astype(float)
+        mask2 = mask * transpose(mask)
+        inv_forecasts_error_cov = np.linalg.inv(
+            forecasts_error_cov * mask2 + np.eye(self.k_endog) * (1 - mask))
+        inv_forecasts_error_cov *= mask2
+        forecasts_error = np.nan_to_num(time_first('forecasts_error')) * mask
+
+        gain = np.matmul(np.matmul(np.matmul(transition, predicted_state_cov),
+                                   transpose(design)),
+                         inv_forecasts_error_cov)
+        tmp = np.matmul(transpose(design), inv_forecasts_error_cov)
+        tmp_v = np.matmul(tmp, forecasts_error)
+        tmp_z = np.matmul(tmp, design)
+        L = transition - np.matmul(gain, design)
+
+        # Scaled smoothed estimators r_t, N_t, t = -1, ..., nobs - 1
+        r = np.zeros((nobs + 1, self.k_states, 1))
+        N = np.zeros((nobs + 1, self.k_states, self.k_states))
+        if full_sample:
+            r[1:] = time_first('scaled_smoothed_estimator')
+            N[1:] = time_first('scaled_smoothed_estimator_cov')
+            start = 0
+        else:
+            start = nobs - 1
+        for t in range(start, -1, -1):
+            r[t] = tmp_v[t] + np.dot(L[t].T, r[t + 1])
+            N[t] = tmp_z[t] + np.dot(np.dot(L[t].T, N[t + 1]), L[t])
+        r_prev, r, N_prev, N = r[:-1], r[1:], N[:-1], N[1:]
+
+        smoothed_state = predicted_state + np.matmul(predicted_state_cov,
+                                                     r_prev)
+        smoothing_error = (np.matmul(inv_forecasts_error_cov, forecasts_error) -
+                           np.matmul(transpose(gain), r))
+        tmp = np.matmul(transpose(gain), N)
+        D = inv_forecasts_error_cov + np.matmul(tmp, gain)
+
+        return {
+            'design': (
+                np.matmul(smoothing_error, transpose(smoothed_state)) -
+                np.matmul(np.matmul(inv_forecasts_error_cov, design) -
+                          np.matmul(tmp, L), predicted_state_cov)),
+            'obs_intercept': smoothing_error[..., 0],
+            'obs_cov': 0.5 * (np.matmul(smoothing_error,
+                                        transpose(smoothing_error)) - D),
+            'transition': (np.matmul(r, transpose(smoothed_state)) -
+                           np.matmul(np.matmul(N, L), predicted_state_cov)),
+            'state_intercept': r[..., 0],
+            'selected_state_cov': 0.5 * (np.matmul(r, transpose(r)) - N),
+            'initial_state': r_prev[0, :, 0],
+            'initial_state_cov': 0.5 * (np.outer(r_prev[0], r_prev[0]) -
+                                        N_prev[0])}
+
     def _get_smoothed_forecasts(self):
         if self._smoothed_forecasts is None:
             # Initialize empty arrays
@@ -709,25 +858,22 @@ class SmootherResults(FilterResults):
             )
 
             for t in range(self.nobs):
-                design_t = 0 if self.design.shape[2] == 1 else t
-                obs_cov_t = 0 if self.obs_cov.shape[2] == 1 else t
-                obs_intercept_t = 0 if self.obs_intercept.shape[1] == 1 else t
+                design = self._matrix_at('design', t)
+                obs_cov = self._matrix_at('obs_cov', t)
+                obs_intercept = self._matrix_at('obs_intercept', t)
 
                 mask = ~self.missing[:, t].astype(bool)
                 # We can recover forecasts
                 self._smoothed_forecasts[:, t] = np.dot(
-                    self.design[:, :, design_t], self.smoothed_state[:, t]
-                ) + self.obs_intercept[:, obs_intercept_t]
+                    design, self.smoothed_state[:, t]) + obs_intercept
                 if self.nmissing[t] > 0:
                     self._smoothed_forecasts_error[:, t] = np.nan
                 self._smoothed_forecasts_error[mask, t] = (
                     self.endog[mask, t] - self._smoothed_forecasts[mask, t]
                 )
                 self._smoothed_forecasts_error_cov[:, :, t] = np.dot(
-                    np.dot(self.design[:, :, design_t],
-                           self.smoothed_state_cov[:, :, t]),
-                    self.design[:, :, design_t].T
-                ) + self.obs_cov[:, :, obs_cov_t]
+                    np.dot(design, self.smoothed_state_cov[:, :, t]),
+                    design.T) + obs_cov
 
         return (
             self._smoothed_forecasts,
@@ -10,11 +10,13 @@ from statsmodels.compat.python import long
 
 import numpy as np
 import pandas as pd
+from scipy.linalg import solve_discrete_lyapunov
 from scipy.stats import norm
 
 from .simulation_smoother import SimulationSmoother
-from .kalman_smoother import SmootherResults
-from .kalman_filter import (INVERT_UNIVARIATE, SOLVE_LU)
+from .kalman_smoother import (SmootherResults, SMOOTHER_STATE,
+                              SMOOTHER_STATE_COV)
+from .kalman_filter import (INVERT_UNIVARIATE, SOLVE_LU, MEMORY_STORE_ALL)
 import statsmodels.tsa.base.tsa_model as tsbase
 import statsmodels.base.wrapper as wrap
 from statsmodels.tools.numdiff import (_get_epsilon, approx_hess_cs,
@@ -22,7 +24,7 @@ from statsmodels.tools.numdiff import (_get_epsilon, approx_hess_cs,
 from statsmodels.tools.decorators import cache_readonly, resettable_cache
 from statsmodels.tools.eval_measures import aic, bic, hqic
 from statsmodels.tools.tools import pinv_extended, Bunch
-from statsmodels.tools.sm_exceptions import PrecisionWarning
+from statsmodels.tools.sm_exceptions import PrecisionWarning, ValueWarning
 import statsmodels.genmod._prediction as pred
 from statsmodels.genmod.families.links import identity
 import warnings
@@ -266,6 +268,11 @@ class MLEModel(tsbase.TimeSeriesModel):
     def initialize_stationary(self):
         self.ssm.initialize_stationary()
 
+    def initialize_diffuse(self, initial_state=None, initial_state_cov=None,
+                           initial_diffuse_state_cov=None):
+        self.ssm.initialize_diffuse(initial_state, initial_state_cov,
+                                    initial_diffuse_state_cov)
+
     @property
     def initialization(self):
         return self.ssm.initialization
@@ -294,6 +301,55 @@ class MLEModel(tsbase.TimeSeriesModel):
     def tolerance(self, value):
         self.ssm.tolerance = value
 
+    @property
+    def _res_classes(self):
+        return {'fit': (MLEResults, MLEResultsWrapper)}
+
+    def clone(self, endog, exog=None, **kwargs):
+        """
+        Create a new model with the same specification and a new dataset
+
+        Parameters
+        ----------
+        endog : array_like
+            The observed time-series process :math:`y`
+        exog : array_like, optional
+            Array of exogenous regressors.
+        **kwargs
+            Keyword arguments that override the model specification.
+
+        Returns
+        -------
+        model : MLEModel
+
+        Notes
+        -----
+        The model is recreated from the keywords returned by
+        `_get_init_kwds`. Subclasses with additional constructor arguments
+        register them in `_init_keys`.
+        """
+        return self._clone_from_init_kwds(endog, exog=exog, **kwargs)
+
+    def _get_init_kwds(self):
+        # Get keywords based on model attributes
+        kwds = super(MLEModel, self)._get_init_kwds()
+
+        # State space options are attached to the representation
+        for key, value in kwds.items():
+            if value is None and hasattr(self.ssm, key):
+                kwds[key] = getattr(self.ssm, key)
+
+        return kwds
+
+    def _clone_from_init_kwds(self, endog, exog=None, **kwargs):
+        model_kwargs = self._get_init_kwds()
+        model_kwargs.update(kwargs)
+        if getattr(self, 'k_exog', 0) > 0 and exog is None:
+            raise ValueError('Cloning a model with a regression component'
+                             ' requires the `exog` argument.')
+        model_kwargs['exog'] = exog
+        return self.__class__(endog, **model_kwargs)
+
     def fit(self, start_params=None, transformed=True,
             cov_type='opg', cov_kwds=None, method='lbfgs', maxiter=50,
             full_output=1, disp=5, callback=None, return_params=False,
@@ -370,11 +426,13 @@ class MLEModel(tsbase.TimeSeriesModel):
         return_params : boolean, optional
             Whether or not to return only the array of maximizing parameters.
             Default is False.
-        optim_score : {'harvey', 'approx'} or None, optional
+        optim_score : {'harvey', 'approx', 'analytic'} or None, optional
             The method by which the score vector is calculated. 'harvey' uses
             the method from Harvey (1989), 'approx' uses either finite
             difference or complex step differentiation depending upon the
-            value of `optim_complex_step`, and None uses the built-in gradient
+            value of `optim_complex_step`, 'analytic' uses the exact score
+            computed from a single pass of the Kalman filter and smoother
+            (Koopman and Shephard, 1992), and None uses the built-in gradient
             approximation of the optimizer. Default is None. This keyword is
             only relevant if the optimization method uses the score.
         optim_complex_step : bool, optional
@@ -400,6 +458,46 @@ class MLEModel(tsbase.TimeSeriesModel):
         statsmodels.base.model.LikelihoodModel.fit
         MLEResults
         """
+        mlefit = self._fit_mle(start_params=start_params,
+                               transformed=transformed, method=method,
+                               maxiter=maxiter, full_output=full_output,
+                               disp=disp, callback=callback,
+                               optim_score=optim_score,
+                               optim_complex_step=optim_complex_step,
+                               optim_hessian=optim_hessian, flags=flags,
+                               **kwargs)
+
+        # Just return the fitted parameters if requested
+        if return_params:
+            return self.transform_params(mlefit.params)
+        # Otherwise construct the results class if desired
+        else:
+            res = self.smooth(mlefit.params, transformed=False,
+                              cov_type=cov_type, cov_kwds=cov_kwds)
+
+            res.mlefit = mlefit
+            res.mle_retvals = mlefit.mle_retvals
+            res.mle_settings = mlefit.mle_settings
+
+            return res
+
+    def _fit_mle(self, start_params=None, transformed=True, method='lbfgs',
+                 maxiter=50, full_output=1, disp=5, callback=None,
+                 optim_score=None, optim_complex_step=None,
+                 optim_hessian=None, flags=None, **kwargs):
+        """
+        Maximize the likelihood and return the optimizer output
+
+        This is the optimization step of `fit`, see `fit` for the
+        parameters. No state space results are created.
+
+        Returns
+        -------
+        mlefit : LikelihoodModelResults
+            The optimizer results, with the untransformed parameters in
+            `params` and the optimizer output in `mle_retvals` and
+            `mle_settings`.
+        """
         if start_params is None:
             start_params = self.start_params
             transformed = True
@@ -433,26 +531,62 @@ class MLEModel(tsbase.TimeSeriesModel):
         if optim_hessian is not None:
             flags['hessian_method'] = optim_hessian
         fargs = (flags,)
-        mlefit = super(MLEModel, self).fit(start_params, method=method,
-                                           fargs=fargs,
-                                           maxiter=maxiter,
-                                           full_output=full_output,
-                                           disp=disp, callback=callback,
-                                           skip_hessian=True, **kwargs)
+        return super(MLEModel, self).fit(start_params, method=method,
+                                         fargs=fargs, maxiter=maxiter,
+                                         full_output=full_output, disp=disp,
+                                         callback=callback, skip_hessian=True,
+                                         **kwargs)
+
+    def _forecast_exog(self, exog, steps):
+        # Validate out-of-sample exog for `forecast_moments`, either a
+        # (steps x k_exog) array or an (n x steps x k_exog) array for `n`
+        # sets of forecasts
+        k_exog = getattr(self, 'k_exog', 0)
+        if k_exog == 0:
+            if exog is not None:
+                warnings.warn('Exogenous array provided to predict, but'
+                              ' additional data not required. `exog`'
+                              ' argument ignored.', ValueWarning)
+            return None
+        if exog is None:
+            raise ValueError('Out-of-sample forecasting in a model with a'
+                             ' regression component requires additional'
+                             ' exogenous values via the `exog` argument.')
+        exog = np.asarray(exog)
+        if exog.ndim == 1 and k_exog == 1:
+            exog = exog[:, None]
+        if not (exog.ndim in [2, 3] and exog.shape[-2:] == (steps, k_exog)):
+            raise ValueError('Provided exogenous values are not of the'
+                             ' appropriate shape. Required %s or (n, %d, %d),'
+                             ' got %s.' % (str((steps, k_exog)), steps,
+                                           k_exog, str(exog.shape)))
+        return exog
+
+    def _forecast_representation(self, params, steps, exog=None,
+                                 design=None):
+        """
+        State space matrices for out-of-sample forecasts
 
-        # Just return the fitted parameters if requested
-        if return_params:
-            return self.transform_params(mlefit.params)
-        # Otherwise construct the results class if desired
-        else:
-            res = self.smooth(mlefit.params, transformed=False,
-                              cov_type=cov_type, cov_kwds=cov_kwds)
-
-            res.mlefit = mlefit
-            res.mle_retvals = mlefit.mle_retvals
-            res.mle_settings = mlefit.mle_settings
+        Parameters
+        ----------
+        params : array_like
+            The (transformed) parameters.
+        steps : int
+            The number of periods to forecast from the end of the sample.
+        exog : array, optional
+            The regressors for the forecast periods, validated by
+            `_forecast_exog`.
+        design : array, optional
+            The in-sample design matrix of the filter output.
 
-            return res
+        Returns
+        -------
+        kwargs : dict
+            The matrices of the forecast periods that differ from their
+            in-sample values, as arguments for
+            `FilterResults.forecast_moments`. Empty by default.
+        """
+        return {}
 
     def filter(self, params, transformed=True, complex_step=False,
                cov_type=None, cov_kwds=None, return_ssm=False,
@@ -504,9 +638,9 @@ class MLEModel(tsbase.TimeSeriesModel):
                 result_kwargs['cov_kwds'] = cov_kwds
 
             if results_class is None:
-                results_class = MLEResults
+                results_class = self._res_classes['fit'][0]
             if results_wrapper_class is None:
-                results_wrapper_class = MLEResultsWrapper
+                results_wrapper_class = self._res_classes['fit'][1]
 
             result = results_wrapper_class(
                 results_class(self, params, result, **result_kwargs)
@@ -564,9 +698,9 @@ class MLEModel(tsbase.TimeSeriesModel):
                 result_kwargs['cov_kwds'] = cov_kwds
 
             if results_class is None:
-                results_class = MLEResults
+                results_class = self._res_classes['fit'][0]
             if results_wrapper_class is None:
-                results_wrapper_class = MLEResultsWrapper
+                results_wrapper_class = self._res_classes['fit'][1]
 
             result = results_wrapper_class(
                 results_class(self, params, result, **result_kwargs)
@@ -955,6 +1089,133 @@ class MLEModel(tsbase.TimeSeriesModel):
             params, approx_complex_step=approx_complex_step, **kwargs)
         return np.sum(score_obs, axis=0)
 
+    def _score_analytic(self, params, **kwargs):
+        """
+        Score computed from the Kalman smoother
+
+        Parameters
+        ----------
+        params : array_like, optional
+            Array of parameters at which to evaluate the score.
+        **kwargs
+            Additional keyword arguments to pass to the Kalman filter. See
+            `KalmanFilter.filter` for more details.
+
+        Notes
+        -----
+        The derivatives of the loglikelihood with respect to the system
+        matrices are computed from a single pass of the Kalman filter and
+        smoother (see `SmootherResults.loglikelihood_gradients`). They are
+        combined with the derivatives of the system matrices with respect to
+        the parameters, which are computed by complex-step differentiation of
+        the `update` method and so do not require additional passes of the
+        Kalman filter.
+
+        References
+        ----------
+        .. [*] Koopman, S. J., and N. Shephard. 1992.
+           "Exact Score for Time Series Models in State Space Form."
+           Biometrika 79 (4): 823-26.
+        """
+        params = np.array(params, ndmin=1)
+        n = len(params)
+        if self.ssm.initialization == 'diffuse':
+            raise NotImplementedError('The analytic score is not available'
+                                      ' with an exact diffuse'
+                                      ' initialization.')
+
+        # Derivatives of the loglikelihood w.r.t. the system matrices
+        self.update(params, transformed=True)
+        kwargs['conserve_memory'] = MEMORY_STORE_ALL
+        res = self.ssm.smooth(
+            smoother_output=SMOOTHER_STATE | SMOOTHER_STATE_COV, **kwargs)
+        gradients = res.loglikelihood_gradients()
+        if self.ssm.loglikelihood_burn > 0:
+            burn = res.loglikelihood_gradients(
+                nobs=self.ssm.loglikelihood_burn)
+            for name in gradients:
+                if name in ['initial_state', 'initial_state_cov']:
+                    gradients[name] = gradients[name] - burn[name]
+                else:
+                    gradients[name][:self.ssm.loglikelihood_burn] -= (
+                        burn[name])
+        initialization = self.ssm.initialization
+        initial_state = res.initial_state
+        initial_state_cov = res.initial_state_cov
+
+        def time_first(mat):
+            mat = np.rollaxis(np.asarray(mat), mat.ndim - 1)
+            if mat.ndim == 2:
+                mat = mat[..., None]
+            return mat
+
+        # Time-invariant matrices apply to every period
+        summed_gradients = dict([
+            (name, gradients[name].sum(0)) for name in gradients
+            if name not in ['initial_state', 'initial_state_cov']])
+
+        def contract(name, partial):
+            gradient = gradients[name]
+            partial = partial.reshape(partial.shape[:1] + gradient.shape[1:])
+            if partial.shape[0] == 1:
+                return np.sum(summed_gradients[name] * partial[0])
+            return np.sum(gradient * partial)
+
+        # Derivatives of the system matrices w.r.t. the parameters
+        epsilon = _get_epsilon(params, 2., None, n)
+        score = np.zeros(n)
+        for i in range(n):
+            params_cs = params + 0j
+            params_cs[i] += 1j * epsilon[i]
+            self.update(params_cs, transformed=True, complex_step=True)
+
+            for name in ['design', 'obs_intercept', 'obs_cov', 'transition',
+                         'state_intercept']:
+                partial = time_first(getattr(self.ssm, name)).imag
+                score[i] += contract(name, partial / epsilon[i])
+
+            selection = time_first(self.ssm.selection)
+            selected_state_cov = np.matmul(
+                np.matmul(selection, time_first(self.ssm.state_cov)),
+                np.swapaxes(selection, -1, -2))
+            partial_selected_state_cov = selected_state_cov.imag / epsilon[i]
+            score[i] += contract('selected_state_cov',
+                                 partial_selected_state_cov)
+
+            # Derivatives of the initialization
+            if initialization == 'known':
+                score[i] += np.sum(
+                    gradients['initial_state'] *
+                    np.asarray(self.ssm._initial_state).imag / epsilon[i])
+                score[i] += np.sum(
+                    gradients['initial_state_cov'] *
+                    np.asarray(self.ssm._initial_state_cov).imag / epsilon[i])
+            elif initialization == 'stationary':
+                transition = time_first(self.ssm.transition)[0]
+                state_intercept = time_first(self.ssm.state_intercept)[0, :, 0]
+                partial_transition = transition.imag / epsilon[i]
+                transition = transition.real
+                tmp = np.dot(np.dot(partial_transition, initial_state_cov),
+                             transition.T)
+                tmp = tmp + tmp.T + partial_selected_state_cov[0]
+                if np.any(tmp):
+                    partial_initial_state_cov = solve_discrete_lyapunov(
+                        transition, tmp)
+                    score[i] += np.sum(gradients['initial_state_cov'] *
+                                       partial_initial_state_cov)
+                if np.sum(np.abs(state_intercept.real)) > 1e-9:
+                    partial_initial_state = np.linalg.solve(
+                        np.eye(self.k_states) - transition,
+                        state_intercept.imag / epsilon[i] +
+                        np.dot(partial_transition, initial_state))
+                    score[i] += np.sum(gradients['initial_state'] *
+                                       partial_initial_state)
+
+        # Reset the model to the (real) parameters
+        self.update(params, transformed=True)
+
+        return score
+
     def _score_obs_harvey(self, params, approx_complex_step=True,
                           approx_centered=False, **kwargs):
         """
@@ -1073,6 +1334,8 @@ class MLEModel(tsbase.TimeSeriesModel):
         if method == 'harvey':
             score = self._score_harvey(
                 params, approx_complex_step=approx_complex_step, **kwargs)
+        elif method == 'analytic':
+            score = self._score_analytic(params, **kwargs)
         elif method == 'approx' and approx_complex_step:
             score = self._score_complex_step(params, **kwargs)
         elif method == 'approx':
@@ -1502,6 +1765,18 @@ class MLEModel(tsbase.TimeSeriesModel):
         raise NotImplementedError
 
 
+def _append_data(data, new, name):
+    """concatenate new observations to a dataset along the time axis"""
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        if not isinstance(new, (pd.Series, pd.DataFrame)):
+            raise ValueError('`%s` must be a pandas object with the index of'
+                             ' the new observations, as is the model data.'
+                             % name)
+        return pd.concat([data, new])
+    new = np.asarray(new)
+    return np.concatenate([data, new.reshape((-1,) + data.shape[1:])])
+
+
 class MLEResults(tsbase.TimeSeriesModelResults):
     r"""
     Class to hold results from fitting a state space model.
@@ -2019,6 +2294,14 @@ class MLEResults(tsbase.TimeSeriesModelResults):
         """
         return self.filter_results.loglikelihood_burn
 
+    @cache_readonly
+    def nobs_diffuse(self):
+        """
+        (int) The number of observations handled by the exact diffuse
+        recursions (zero unless an exact diffuse initialization was used).
+        """
+        return self.filter_results.nobs_diffuse
+
     @cache_readonly
     def pvalues(self):
         """
@@ -2084,7 +2367,7 @@ class MLEResults(tsbase.TimeSeriesModelResults):
 
         if method == 'jarquebera':
             from statsmodels.stats.stattools import jarque_bera
-            d = self.loglikelihood_burn
+            d = np.maximum(self.loglikelihood_burn, self.nobs_diffuse)
             output = []
             for i in range(self.model.k_endog):
                 resid = self.filter_results.standardized_forecasts_error[i, d:]
@@ -2185,7 +2468,7 @@ class MLEResults(tsbase.TimeSeriesModelResults):
         if method == 'breakvar':
             # Store some values
             squared_resid = self.filter_results.standardized_forecasts_error**2
-            d = self.loglikelihood_burn
+            d = np.maximum(self.loglikelihood_burn, self.nobs_diffuse)
 
             test_statistics = []
             p_values = []
@@ -2300,7 +2583,7 @@ class MLEResults(tsbase.TimeSeriesModelResults):
 
         if method == 'ljungbox' or method == 'boxpierce':
             from statsmodels.stats.diagnostic import acorr_ljungbox
-            d = self.loglikelihood_burn
+            d = np.maximum(self.loglikelihood_burn, self.nobs_diffuse)
             output = []
 
             # Default lags for acorr_ljungbox is 40, but may not always have
@@ -2471,6 +2754,121 @@ class MLEResults(tsbase.TimeSeriesModelResults):
             end = steps
         return self.predict(start=self.nobs, end=end, **kwargs)
 
+    def forecast_moments(self, steps=1, exog=None, **kwargs):
+        """
+        Out-of-sample forecasts and their variances
+
+        Parameters
+        ----------
+        steps : int, optional
+            The number of periods to forecast from the end of the sample.
+            Default is 1.
+        exog : array_like, optional
+            If the model includes exogenous regressors, the values of the
+            regressors for the forecast periods, a (steps x k_exog) array, or
+            an (n x steps x k_exog) array to compute forecasts for `n`
+            different paths of the regressors at once.
+        **kwargs
+            Additional arguments may be required for forecasting beyond the
+            end of the sample. See `FilterResults.forecast_moments` for more
+            details.
+
+        Returns
+        -------
+        mean : array
+            Out-of-sample forecasts, a (steps x k_endog) array, or an
+            (n x steps x k_endog) array for `n` sets of forecasts.
+        variance : array
+            Variances of the forecast errors, of the same shape as `mean`.
+
+        Notes
+        -----
+        These are the same forecasts as `get_forecast`, but they are computed
+        directly from the predicted state at the end of the sample, without
+        applying the Kalman filter to the sample again, and are returned as
+        arrays rather than as a `PredictionResults` object.
+        """
+        if not isinstance(steps, (int, long)):
+            raise ValueError('The number of forecast periods must be an'
+                             ' integer.')
+        exog = self.model._forecast_exog(exog, steps)
+        kwargs.update(self.model._forecast_representation(
+            self.params, steps, exog, self.filter_results.design))
+        forecasts, forecasts_error_cov = (
+            self.filter_results.forecast_moments(steps, **kwargs))
+        mean = np.swapaxes(forecasts, -1, -2)
+        variance = np.diagonal(forecasts_error_cov, axis1=-3, axis2=-2)
+        variance = np.array(np.broadcast_arrays(mean, variance)[1])
+        return mean, variance
+
+    def append(self, endog, exog=None, cov_type='none', cov_kwds=None,
+               **kwargs):
+        """
+        Append new observations to the sample and update the filter output
+
+        Parameters
+        ----------
+        endog : array_like
+            New observations of the time-series process, following the last
+            observation of the current sample. If the model data is a pandas
+            object, then `endog` must be a pandas object with the index of
+            the new periods.
+        exog : array_like, optional
+            New observations of the exogenous regressors. Required if the
+            model has a regression component.
+        cov_type : str, optional
+            See `MLEResults.fit` for a description of covariance matrix types
+            for results object. Default is 'none', since the covariance
+            matrix estimators require filtering the full sample again.
+        cov_kwds : dict or None, optional
+            See `MLEResults.get_robustcov_results` for a description required
+            keywords for alternative covariance estimators
+        **kwargs
+            Additional keyword arguments to pass to the Kalman filter. See
+            `KalmanFilter.filter` for more details.
+
+        Returns
+        -------
+        results : MLEResults
+            Results for the full sample at the same parameters, with the
+            log-likelihood, filter output and forecasts updated for the new
+            observations.
+
+        Notes
+        -----
+        The Kalman filter is resumed from the last predicted state and
+        predicted state covariance matrix, so that only the new observations
+        are filtered and the cost does not depend on the length of the
+        existing sample. The parameters are not re-estimated.
+
+        The model must support `clone`, and the results must contain the
+        full filter output (i.e. they cannot have been created with memory
+        conservation options). The returned results contain filter output
+        only; smoothed estimates require calling `smooth` on the new model.
+
+        Examples
+        --------
+        >>> res = mod.fit()
+        >>> res = res.append(new_obs)
+        >>> res.forecast(5)
+        """
+        orig_exog = self.model.data.orig_exog
+        if exog is not None and orig_exog is None:
+            raise ValueError('The model has no exogenous regressors.')
+        endog = _append_data(self.model.data.orig_endog, endog, 'endog')
+        if exog is not None:
+            exog = _append_data(orig_exog, exog, 'exog')
+
+        model = self.model.clone(endog, exog=exog)
+        model.update(self.params, transformed=True)
+        model.data.param_names = model.param_names
+        filter_results = model.ssm.filter_append(self.filter_results, **kwargs)
+
+        results_class, results_wrapper_class = model._res_classes['fit']
+        return results_wrapper_class(
+            results_class(model, self.params, filter_results,
+                          cov_type=cov_type, cov_kwds=cov_kwds))
+
     def simulate(self, nsimulations, measurement_shocks=None,
                  state_shocks=None, initial_state=None):
         r"""
@@ -2598,14 +2996,15 @@ class MLEResults(tsbase.TimeSeriesModelResults):
         from statsmodels.graphics.utils import _import_mpl, create_mpl_fig
         _import_mpl()
         fig = create_mpl_fig(fig, figsize)
-        # Eliminate residuals associated with burned likelihoods
-        d = self.loglikelihood_burn
+        # Eliminate residuals associated with burned likelihoods or diffuse
+        # periods
+        d = np.maximum(self.loglikelihood_burn, self.nobs_diffuse)
         resid = self.filter_results.standardized_forecasts_error[variable, d:]
 
         # Top-left: residuals vs time
         ax = fig.add_subplot(221)
         if hasattr(self.data, 'dates') and self.data.dates is not None:
-            x = self.data.dates[self.loglikelihood_burn:]._mpl_repr()
+            x = self.data.dates[d:]._mpl_repr()
         else:
             x = np.arange(len(resid))
         ax.plot(x, resid)
@@ -0,0 +1,404 @@
+"""
+Parallel-in-time Kalman filter and smoother
+
+The filtering and smoothing distributions of a linear Gaussian state space
+model are computed as prefix sums of associative operators over per-period
+elements, following Sarkka and Garcia-Fernandez (2021). A prefix sum over
+`nobs` elements can be computed in a number of steps that is logarithmic in
+`nobs`, and each step is a batched matrix operation over many periods.
+
+The sample is split into blocks. The prefix sums within each block are
+computed independently (in a pool of threads if requested), the block totals
+are combined and then applied to the elements of the subsequent blocks.
+
+References
+----------
+.. [*] Sarkka, Simo, and Angel F. Garcia-Fernandez. 2021.
+   "Temporal Parallelization of Bayesian Smoothers."
+   IEEE Transactions on Automatic Control 66 (1): 299-306.
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+from __future__ import division, absolute_import, print_function
+
+import numpy as np
+
+from statsmodels.tools.tools import Bunch
+from statsmodels.tsa.statespace.representation import FrozenRepresentation
+
+
+def _t(x):
+    return np.swapaxes(x, -1, -2)
+
+
+def _sym(x):
+    return (x + _t(x)) / 2
+
+
+def _time_first(mat, nobs):
+    """system matrix with time as the leading axis, length `nobs` or 1"""
+    mat = np.asarray(mat)
+    mat = np.rollaxis(mat, mat.ndim - 1)
+    if mat.ndim == 2:
+        mat = mat[..., None]
+    if mat.shape[0] > 1:
+        mat = mat[:nobs]
+    return mat
+
+
+def _filter_op(first, second):
+    """
+    Combine the filtering elements of two consecutive segments
+    """
+    A1, b1, C1, eta1, J1 = first
+    A2, b2, C2, eta2, J2 = second
+    k = A1.shape[-1]
+    eye = np.eye(k)
+
+    # (I + C1 J2)^{-1} applied to [A1, b1 + C1 eta2, C1]
+    tmp = np.linalg.solve(eye + np.matmul(C1, J2), np.concatenate(
+        [A1, b1 + np.matmul(C1, eta2), C1], axis=-1))
+    A = np.matmul(A2, tmp[..., :k])
+    b = np.matmul(A2, tmp[..., k:k + 1]) + b2
+    C = _sym(np.matmul(np.matmul(A2, tmp[..., k + 1:]), _t(A2)) + C2)
+
+    # (I + J2 C1)^{-1} applied to [eta2 - J2 b1, J2 A1]
+    tmp = np.linalg.solve(eye + np.matmul(J2, C1), np.concatenate(
+        [eta2 - np.matmul(J2, b1), np.matmul(J2, A1)], axis=-1))
+    A1t = _t(A1)
+    eta = np.matmul(A1t, tmp[..., :1]) + eta1
+    J = _sym(np.matmul(A1t, tmp[..., 1:]) + J1)
+
+    return A, b, C, eta, J
+
+
+def _smoother_op(later, earlier):
+    """
+    Combine the smoothing elements of two consecutive segments
+
+    The scan runs backwards in time, so that the first argument holds the
+    accumulated elements of the later periods.
+    """
+    E2, g2, L2 = later
+    E1, g1, L1 = earlier
+    E = np.matmul(E1, E2)
+    g = np.matmul(E1, g2) + g1
+    L = _sym(np.matmul(np.matmul(E1, L2), _t(E1)) + L1)
+    return E, g, L
+
+
+def _scan(op, elems):
+    """
+    Inclusive prefix sum of an associative operator
+
+    Pairs of neighboring elements are combined, the prefix sums of the
+    pairs are computed recursively and the remaining prefix sums are filled
+    in from those, so that the total work is linear and the depth is
+    logarithmic in the number of elements.
+    """
+    n = elems[0].shape[0]
+    if n < 2:
+        return elems
+
+    paired = op([e[0:n - 1:2] for e in elems], [e[1:n:2] for e in elems])
+    odd = _scan(op, paired)
+    n_even = (n - 1) // 2
+    even = op([e[:n_even] for e in odd], [e[2:n:2] for e in elems])
+
+    out = []
+    for e, e_odd, e_even in zip(elems, odd, even):
+        res = np.empty_like(e)
+        res[0] = e[0]
+        res[1::2] = e_odd
+        res[2::2] = e_even
+        out.append(res)
+    return out
+
+
+def _blocked_scan(op, elems, n_blocks=1, n_jobs=1):
+    """
+    Inclusive prefix sum computed separately within blocks of periods
+    """
+    nobs = elems[0].shape[0]
+    n_blocks = max(1, min(n_blocks, nobs))
+    bounds = np.linspace(0, nobs, n_blocks + 1).astype(int)
+    blocks = [[e[bounds[i]:bounds[i + 1]] for e in elems]
+              for i in range(n_blocks)]
+
+    if n_jobs == -1:
+        import multiprocessing
+        n_jobs = multiprocessing.cpu_count()
+    if n_jobs > 1 and n_blocks > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(n_jobs, n_blocks))
+        _map = pool.map
+    else:
+        pool = None
+        _map = map
+
+    try:
+        blocks = list(_map(lambda block: _scan(op, block), blocks))
+        if n_blocks == 1:
+            return blocks[0]
+
+        # combine the block totals and apply the total of all preceding
+        # blocks to the prefix sums within each block
+        totals = _scan(op, [np.concatenate([block[i][-1:] for block in blocks])
+                            for i in range(len(elems))])
+
+        def apply_total(i):
+            if i == 0:
+                return blocks[0]
+            n = blocks[i][0].shape[0]
+            return op([np.broadcast_to(e[i - 1:i], (n,) + e.shape[1:])
+                       for e in totals], blocks[i])
+
+        blocks = list(_map(apply_total, range(n_blocks)))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return [np.concatenate([block[i] for block in blocks])
+            for i in range(len(elems))]
+
+
+def _get_system(ssm):
+    """system matrices with time as leading axis and the initial state"""
+    nobs = ssm.nobs
+    prefix = ssm.prefix
+    ssm._initialize_representation(prefix)
+    ssm._initialize_state(prefix)
+    statespace = ssm._statespaces[prefix]
+    initial_state = np.array(statespace.initial_state, copy=True)
+    initial_state_cov = np.array(statespace.initial_state_cov, copy=True)
+
+    # (this expands compactly stored time-varying entries)
+    frozen = FrozenRepresentation(ssm)
+
+    selection = _time_first(frozen.selection, nobs)
+    state_cov = _time_first(frozen.state_cov, nobs)
+    selected_state_cov = np.matmul(np.matmul(selection, state_cov),
+                                   _t(selection))
+    return Bunch(
+        endog=np.asarray(ssm.endog).T,
+        design=_time_first(frozen.design, nobs),
+        obs_intercept=_time_first(frozen.obs_intercept, nobs),
+        obs_cov=_time_first(frozen.obs_cov, nobs),
+        transition=_time_first(frozen.transition, nobs),
+        state_intercept=_time_first(frozen.state_intercept, nobs),
+        selected_state_cov=selected_state_cov,
+        initial_state=initial_state, initial_state_cov=initial_state_cov)
+
+
+def _mask_missing(endog, design, obs_intercept, obs_cov):
+    """
+    Replace missing observations with uninformative ones
+
+    The rows of the design matrix and observation intercept for missing
+    observations are set to zero and the observation covariance matrix to
+    the identity in the missing rows and columns, so that the missing
+    elements do not contain information about the state.
+    """
+    nobs, k_endog = endog.shape
+    missing = np.isnan(endog)
+    if not missing.any():
+        return endog[..., None], design, obs_intercept, obs_cov, missing
+    mask = (~missing)[..., None].astype(float)
+    endog = np.where(missing, 0, endog)[..., None]
+    design = design * mask
+    obs_intercept = obs_intercept * mask
+    obs_cov = obs_cov * mask * _t(mask)
+    idx = np.arange(k_endog)
+    obs_cov[:, idx, idx] += missing
+    return endog, design, obs_intercept, obs_cov, missing
+
+
+def parallel_filter(ssm, n_blocks=1, n_jobs=1):
+    """
+    Kalman filter computed as a parallel prefix sum over time
+
+    Parameters
+    ----------
+    ssm : KalmanFilter
+        The state space representation with bound data and updated system
+        matrices, for example the `ssm` attribute of a model after calling
+        `update(params)`.
+    n_blocks : int, optional
+        Number of blocks into which the sample is split. Default is 1.
+    n_jobs : int, optional
+        Number of threads used to process the blocks. If -1, then one
+        thread per CPU is used. Default is 1.
+
+    Returns
+    -------
+    Bunch
+        With attributes `llf`, `llf_obs`, `filtered_state`,
+        `filtered_state_cov`, `predicted_state`, `predicted_state_cov`,
+        `forecasts`, `forecasts_error` and `forecasts_error_cov`, shaped as
+        in `FilterResults`.
+
+    Notes
+    -----
+    The results are equal to those of `KalmanFilter.filter` up to numerical
+    precision. The number of sequential steps is logarithmic in the number
+    of observations, but the total number of operations is a constant
+    multiple of those of the sequential filter; the parallel filter is
+    therefore only faster for long series with blocks processed on several
+    cores.
+
+    Each period requires the inverse of the forecast error covariance
+    matrix conditional on the previous state, :math:`Z_t R_{t-1} Q_{t-1}
+    R_{t-1}' Z_t' + H_t`, which must be nonsingular.
+
+    Examples
+    --------
+    >>> mod.update(params)
+    >>> res = parallel_filter(mod.ssm, n_blocks=4, n_jobs=4)
+    >>> res.llf
+    """
+    system = _get_system(ssm)
+    nobs, k_states = ssm.nobs, ssm.k_states
+    endog, design, obs_intercept, obs_cov, missing = _mask_missing(
+        system.endog, system.design, system.obs_intercept, system.obs_cov)
+    eye = np.eye(k_states)
+
+    # Transition into each period; the first period uses the initial state
+    transition = np.zeros((nobs, k_states, k_states))
+    state_intercept = np.zeros((nobs, k_states, 1))
+    selected_state_cov = np.zeros((nobs, k_states, k_states))
+    state_intercept[0, :, 0] = system.initial_state
+    selected_state_cov[0] = system.initial_state_cov
+    if nobs > 1:
+        transition[1:] = system.transition[:nobs - 1]
+        state_intercept[1:] = system.state_intercept[:nobs - 1]
+        selected_state_cov[1:] = system.selected_state_cov[:nobs - 1]
+
+    # Filtering elements
+    design_t = _t(design)
+    forecast_cov = _sym(np.matmul(np.matmul(design, selected_state_cov),
+                                  design_t) + obs_cov)
+    design_transition = np.matmul(design, transition)
+    error = endog - np.matmul(design, state_intercept) - obs_intercept
+    tmp = np.linalg.solve(forecast_cov, np.concatenate(
+        [np.matmul(design, selected_state_cov), design_transition, error],
+        axis=-1))
+    gain = _t(tmp[..., :k_states])
+    tmp2 = eye - np.matmul(gain, design)
+    elems = [
+        np.matmul(tmp2, transition),
+        state_intercept + np.matmul(gain, error),
+        _sym(np.matmul(tmp2, selected_state_cov)),
+        np.matmul(_t(design_transition), tmp[..., -1:]),
+        _sym(np.matmul(_t(design_transition), tmp[..., k_states:-1]))]
+    elems = _blocked_scan(_filter_op, elems, n_blocks, n_jobs)
+    filtered_state, filtered_state_cov = elems[1], elems[2]
+
+    # Predictions
+    predicted_state = np.zeros((nobs + 1, k_states, 1))
+    predicted_state_cov = np.zeros((nobs + 1, k_states, k_states))
+    predicted_state[0, :, 0] = system.initial_state
+    predicted_state_cov[0] = system.initial_state_cov
+    predicted_state[1:] = (np.matmul(system.transition, filtered_state) +
+                           system.state_intercept)
+    predicted_state_cov[1:] = _sym(np.matmul(
+        np.matmul(system.transition, filtered_state_cov),
+        _t(system.transition)) + system.selected_state_cov)
+
+    # Forecasts and the loglikelihood
+    forecasts = (np.matmul(system.design, predicted_state[:-1]) +
+                 system.obs_intercept)
+    forecasts_error_cov = _sym(np.matmul(
+        np.matmul(system.design, predicted_state_cov[:-1]),
+        _t(system.design)) + system.obs_cov)
+    forecasts_error = system.endog[..., None] - forecasts
+
+    error = endog - np.matmul(design, predicted_state[:-1]) - obs_intercept
+    error_cov = _sym(np.matmul(np.matmul(design, predicted_state_cov[:-1]),
+                               design_t) + obs_cov)
+    sign, logdet = np.linalg.slogdet(error_cov)
+    quad = np.matmul(_t(error), np.linalg.solve(error_cov, error))[:, 0, 0]
+    k_obs = ssm.k_endog - missing.sum(1)
+    llf_obs = -0.5 * (k_obs * np.log(2 * np.pi) + logdet + quad)
+    llf_obs[k_obs == 0] = 0
+    llf_obs[:ssm.loglikelihood_burn] = 0
+
+    return Bunch(
+        llf=np.sum(llf_obs), llf_obs=llf_obs,
+        filtered_state=filtered_state[..., 0].T,
+        filtered_state_cov=np.rollaxis(filtered_state_cov, 0, 3),
+        predicted_state=predicted_state[..., 0].T,
+        predicted_state_cov=np.rollaxis(predicted_state_cov, 0, 3),
+        forecasts=forecasts[..., 0].T,
+        forecasts_error=forecasts_error[..., 0].T,
+        forecasts_error_cov=np.rollaxis(forecasts_error_cov, 0, 3))
+
+
+def parallel_smoother(ssm, filter_output=None, n_blocks=1, n_jobs=1,
+                      rcond=1e-12):
+    """
+    Kalman smoother computed as a parallel prefix sum backwards in time
+
+    Parameters
+    ----------
+    ssm : KalmanFilter
+        The state space representation with bound data and updated system
+        matrices.
+    filter_output : Bunch, optional
+        The output of `parallel_filter` for `ssm`. If not given, then the
+        filter is run first with the same blocks.
+    n_blocks : int, optional
+        Number of blocks into which the sample is split. Default is 1.
+    n_jobs : int, optional
+        Number of threads used to process the blocks. If -1, then one
+        thread per CPU is used. Default is 1.
+    rcond : float, optional
+        Cutoff for small singular values in the pseudo-inverse of the
+        predicted state covariance matrices. Default is 1e-12.
+
+    Returns
+    -------
+    Bunch
+        The filter output with the additional attributes `smoothed_state`
+        and `smoothed_state_cov`, shaped as in `SmootherResults`.
+
+    Notes
+    -----
+    This is the Rauch-Tung-Striebel form of the smoother, which uses the
+    (pseudo-)inverse of the predicted state covariance matrices. If they
+    are singular or nearly so, as in ARMA models without measurement error
+    or during the first periods after an approximate diffuse initialization,
+    then the results are less accurate than those of the disturbance
+    smoother used by `KalmanSmoother`.
+    """
+    if filter_output is None:
+        filter_output = parallel_filter(ssm, n_blocks, n_jobs)
+    system = _get_system(ssm)
+    nobs, k_states = ssm.nobs, ssm.k_states
+
+    filtered_state = filter_output.filtered_state.T[..., None]
+    filtered_state_cov = np.rollaxis(filter_output.filtered_state_cov, 2)
+    predicted_state = filter_output.predicted_state.T[1:, :, None]
+    predicted_state_cov = np.rollaxis(filter_output.predicted_state_cov,
+                                      2)[1:]
+
+    # Smoothing elements: E_t = P_{t|t} T_t' P_{t+1}^{-1}
+    transition = np.broadcast_to(system.transition,
+                                 (nobs, k_states, k_states))
+    tmp = np.matmul(transition, filtered_state_cov)
+    gain = np.matmul(_t(tmp), np.linalg.pinv(predicted_state_cov, rcond))
+    gain[-1] = 0
+    elems = [
+        gain,
+        filtered_state - np.matmul(gain, predicted_state),
+        _sym(filtered_state_cov - np.matmul(gain, tmp))]
+
+    elems = [e[::-1] for e in elems]
+    elems = _blocked_scan(_smoother_op, elems, n_blocks, n_jobs)
+    smoothed_state, smoothed_state_cov = elems[1][::-1], elems[2][::-1]
+
+    out = Bunch(**filter_output)
+    out.smoothed_state = smoothed_state[..., 0].T
+    out.smoothed_state_cov = np.rollaxis(smoothed_state_cov, 0, 3)
+    return out
@@ -87,6 +87,54 @@ class MatrixWrapper(object):
         return value
 
 
+def _matrix_at(self, name, t):
+    # The system matrix `name` in period `t`, including compactly stored
+    # time-varying entries, without expanding the whole matrix
+    matrix = getattr(self, '_' + name)
+    matrix_t = matrix[..., 0 if matrix.shape[-1] == 1 else t]
+    if name in self._time_varying_entries:
+        (rows, cols), values = self._time_varying_entries[name]
+        matrix_t = matrix_t.copy()
+        if matrix_t.ndim == 2:
+            matrix_t[rows, cols] = values[:, t]
+        else:
+            matrix_t[rows] = values[:, t]
+    return matrix_t
+
+
+class FrozenMatrixWrapper(object):
+    def __init__(self, attribute):
+        self.attribute = attribute
+        self._attribute = '_' + attribute
+
+    def __get__(self, obj, objtype):
+        if obj is None:
+            return self
+        # (raising AttributeError falls back to a subclass' __getattr__)
+        try:
+            matrix = obj.__dict__[self._attribute]
+        except KeyError:
+            raise AttributeError(self.attribute)
+        entries = getattr(obj, '_time_varying_entries', None)
+        # Expand compactly stored time-varying entries on first access
+        if entries and self.attribute in entries:
+            (rows, cols), values = entries.pop(self.attribute)
+            matrix = np.asfortranarray(np.repeat(matrix, values.shape[1],
+                                                 axis=-1))
+            if matrix.ndim == 3:
+                matrix[rows, cols, :] = values
+            else:
+                matrix[rows, :] = values
+            setattr(obj, self._attribute, matrix)
+        return matrix
+
+    def __set__(self, obj, value):
+        setattr(obj, self._attribute, value)
+        entries = getattr(obj, '_time_varying_entries', None)
+        if entries:
+            entries.pop(self.attribute, None)
+
+
 class Representation(object):
     r"""
     State space representation of a time series process
@@ -105,14 +153,17 @@ class Representation(object):
     initial_variance : float, optional
         Initial variance used when approximate diffuse initialization is
         specified. Default is 1e6.
-    initialization : {'approximate_diffuse','stationary','known'}, optional
+    initialization : {'approximate_diffuse','stationary','known','diffuse'}, optional
         Initialization method for the initial state.
     initial_state : array_like, optional
-        If known initialization is used, the mean of the initial state's
-        distribution.
+        If known or exact diffuse initialization is used, the mean of the
+        initial state's distribution.
     initial_state_cov : array_like, optional
-        If known initialization is used, the covariance matrix of the initial
-        state's distribution.
+        If known or exact diffuse initialization is used, the covariance
+        matrix of the (non-diffuse part of the) initial state's distribution.
+    initial_diffuse_state_cov : array_like, optional
+        If exact diffuse initialization is used, the matrix describing the
+        diffuse part of the initial state's distribution.
     nobs : integer, optional
         If an endogenous vector is not given (i.e. `k_endog` is an integer),
         the number of observations can optionally be specified. If not
@@ -208,6 +259,10 @@ class Representation(object):
     example, :math:`Z_t = Z_{t+1} ~ \forall ~ t`), its last dimension may
     be of size :math:`1` rather than size `nobs`.
 
+    If only a few entries of a matrix vary over time, the matrix can instead
+    be stored compactly as a time-invariant matrix along with the values of
+    the time-varying entries; see `set_time_varying_entries`.
+
     References
     ----------
     .. [1] Durbin, James, and Siem Jan Koopman. 2012.
@@ -326,12 +381,18 @@ class Representation(object):
         self.initialization = kwargs.get('initialization', None)
         self._initial_state = None
         self._initial_state_cov = None
+        self._initial_diffuse_state_cov = None
         self._initial_variance = None
 
         if self.initialization == 'approximate_diffuse':
             self.initialize_approximate_diffuse()
         elif self.initialization == 'stationary':
             self.initialize_stationary()
+        elif self.initialization == 'diffuse':
+            self.initialize_diffuse(
+                kwargs.get('initial_state', None),
+                kwargs.get('initial_state_cov', None),
+                kwargs.get('initial_diffuse_state_cov', None))
         elif self.initialization == 'known':
             if 'initial_state' not in kwargs:
                 raise ValueError('Initial state must be provided when "known"'
@@ -351,6 +412,9 @@ class Representation(object):
         # Setup the underlying statespace object storage
         self._statespaces = {}
 
+        # Compactly stored time-varying entries
+        self._time_varying_entries = {}
+
         # Caches
         self._time_invariant = None
 
@@ -442,7 +506,8 @@ class Representation(object):
             self._design, self._obs_intercept, self._obs_cov,
             self._transition, self._state_intercept, self._selection,
             self._state_cov
-        )
+        ) + tuple([values for _, values in
+                   self._time_varying_entries.values()])
         if self.endog is not None:
             arrays = (self.endog,) + arrays
         return find_best_blas_type(arrays)[0]
@@ -465,7 +530,8 @@ class Representation(object):
                 self._design.shape[2] == self._obs_intercept.shape[1] ==
                 self._obs_cov.shape[2] == self._transition.shape[2] ==
                 self._state_intercept.shape[1] == self._selection.shape[2] ==
-                self._state_cov.shape[2]
+                self._state_cov.shape[2] and
+                len(self._time_varying_entries) == 0
             )
         else:
             return self._time_invariant
@@ -567,6 +633,73 @@ class Representation(object):
         if hasattr(self, 'shapes'):
             self.shapes['obs'] = self.endog.shape
 
+    def set_time_varying_entries(self, name, index, values):
+        """
+        Set compactly stored time-varying entries of a system matrix
+
+        Parameters
+        ----------
+        name : str
+            The name of the system matrix, which must be time-invariant.
+        index : tuple of array_like or array_like
+            The location of the time-varying entries: for a matrix, a tuple
+            `(rows, cols)` of integer arrays; for a vector, an integer array
+            of rows.
+        values : array_like or None
+            The values of the time-varying entries in each period, shaped
+            (k_entries, nobs). If None, removes the time-varying entries of
+            the system matrix.
+
+        Notes
+        -----
+        If only a few entries of a system matrix vary over time (for example
+        the design matrix in a regression with time-varying coefficients), the
+        matrix can be stored as a time-invariant matrix, set as usual, along
+        with the values of the time-varying entries in each period. These are
+        written into the time-invariant matrix at each period of the Kalman
+        filter and smoother, so that the memory required grows with the number
+        of time-varying entries rather than with the size of the matrix.
+
+        The filter and smoother results also keep the compact form, and only
+        expand a system matrix to its full time-varying form when it is
+        accessed.
+        """
+        if name not in self.shapes or name == 'obs':
+            raise IndexError('"%s" is an invalid state space matrix name'
+                             % name)
+        if values is None:
+            self._time_varying_entries.pop(name, None)
+            return
+
+        matrix = getattr(self, '_' + name)
+        if not matrix.shape[-1] == 1:
+            raise ValueError('Cannot set time-varying entries of the'
+                             ' time-varying %s matrix.' % name)
+        if matrix.ndim == 3:
+            if not (isinstance(index, tuple) and len(index) == 2):
+                raise ValueError('The time-varying entries of the %s matrix'
+                                 ' must be given as a tuple of rows and'
+                                 ' columns.' % name)
+            rows, cols = index
+        else:
+            rows, cols = index, 0
+        rows, cols = np.broadcast_arrays(np.array(rows, dtype=int, ndmin=1),
+                                         np.array(cols, dtype=int, ndmin=1))
+        values = np.array(values, ndmin=2)
+        if not values.shape == (len(rows), self.nobs):
+            raise ValueError('Invalid dimensions for time-varying entries of'
+                             ' the %s matrix. Requires shape (%d, %d), got %s'
+                             % (name, len(rows), self.nobs,
+                                str(values.shape)))
+        if (np.any(rows < 0) or np.any(rows >= matrix.shape[0]) or
+                np.any(cols < 0) or np.any(cols >= matrix.shape[1])):
+            raise ValueError('Time-varying entries out of bounds for the %s'
+                             ' matrix.' % name)
+
+        self._time_varying_entries[name] = ((rows, cols), values)
+
+    _matrix_at = _matrix_at
+
     def initialize_known(self, initial_state, initial_state_cov):
         """
         Initialize the statespace model with known distribution for initial
@@ -626,6 +759,75 @@ class Representation(object):
         """
         self.initialization = 'stationary'
 
+    def initialize_diffuse(self, initial_state=None, initial_state_cov=None,
+                           initial_diffuse_state_cov=None):
+        """
+        Initialize the statespace model with an exact diffuse initialization.
+
+        The initial state is distributed with mean `initial_state` and
+        covariance matrix `initial_state_cov + kappa * initial_diffuse_state_cov`
+        where `kappa` is allowed to go to infinity. The Kalman filter and
+        smoother use the exact diffuse recursions of Durbin and Koopman (2012)
+        until the diffuse part of the predicted state covariance matrix
+        vanishes, after which the usual recursions are used.
+
+        Parameters
+        ----------
+        initial_state : array_like, optional
+            Mean of the initial state vector. Default is zeros.
+        initial_state_cov : array_like, optional
+            Covariance matrix of the non-diffuse part of the initial state
+            vector. Default is zeros.
+        initial_diffuse_state_cov : array_like, optional
+            Matrix describing the diffuse part of the initial state vector.
+            Default is the identity matrix, so that all states are diffuse.
+
+        Notes
+        -----
+        Unlike approximate diffuse initialization, the likelihood computed
+        with an exact diffuse initialization does not depend on an arbitrary
+        large initial variance, so that no observations need to be burned
+        when evaluating the likelihood.
+
+        The diffuse periods are always handled using univariate filtering and
+        smoothing, so the collapsed filtering method and the classical and
+        alternative smoothing methods are not available in that case.
+
+        References
+        ----------
+        .. [1] Durbin, James, and Siem Jan Koopman. 2012.
+           Time Series Analysis by State Space Methods: Second Edition.
+           Oxford University Press.
+        """
+        if initial_state is None:
+            initial_state = np.zeros(self.k_states)
+        if initial_state_cov is None:
+            initial_state_cov = np.zeros((self.k_states, self.k_states))
+        if initial_diffuse_state_cov is None:
+            initial_diffuse_state_cov = np.eye(self.k_states)
+        initial_state = np.asarray(initial_state, order="F")
+        initial_state_cov = np.asarray(initial_state_cov, order="F")
+        initial_diffuse_state_cov = np.asarray(initial_diffuse_state_cov,
+                                               order="F")
+
+        if not initial_state.shape == (self.k_states,):
+            raise ValueError('Invalid dimensions for initial state vector.'
+                             ' Requires shape (%d,), got %s' %
+                             (self.k_states, str(initial_state.shape)))
+        for name, value in [('initial covariance', initial_state_cov),
+                            ('initial diffuse covariance',
+                             initial_diffuse_state_cov)]:
+            if not value.shape == (self.k_states, self.k_states):
+                raise ValueError('Invalid dimensions for %s'
+                                 ' matrix. Requires shape (%d,%d), got %s' %
+                                 (name, self.k_states, self.k_states,
+                                  str(value.shape)))
+
+        self._initial_state = initial_state
+        self._initial_state_cov = initial_state_cov
+        self._initial_diffuse_state_cov = initial_diffuse_state_cov
+        self.initialization = 'diffuse'
+
     def _initialize_representation(self, prefix=None):
         if prefix is None:
             prefix = self.prefix
@@ -664,6 +866,8 @@ class Representation(object):
         if prefix in self._statespaces:
             ss = self._statespaces[prefix]
             create = (
+                not (getattr(ss, 'k_entries', 0) > 0) ==
+                (len(self._time_varying_entries) > 0) or
                 not ss.obs.shape[1] == self.endog.shape[1] or
                 not ss.design.shape[2] == self.design.shape[2] or
                 not ss.obs_intercept.shape[1] == self.obs_intercept.shape[1] or
@@ -695,8 +899,34 @@ class Representation(object):
                 self._representations[prefix]['state_cov']
             )
 
+        # Compactly stored time-varying entries
+        if self._time_varying_entries and self._compatibility_mode:
+            raise NotImplementedError('Time-varying entries are not'
+                                      ' available in compatibility mode.')
+        elif self._time_varying_entries:
+            self._set_time_varying_entries(prefix)
+
         return prefix, dtype, create
 
+    def _set_time_varying_entries(self, prefix):
+        # The system matrices are identified by their position in this list
+        names = ['design', 'obs_intercept', 'obs_cov', 'transition',
+                 'state_intercept', 'selection', 'state_cov']
+        dtype = tools.prefix_dtype_map[prefix]
+        matrices, rows, cols, values = [], [], [], []
+        for i, name in enumerate(names):
+            if name in self._time_varying_entries:
+                index, entries = self._time_varying_entries[name]
+                matrices.append(np.repeat(i, len(index[0])))
+                rows.append(index[0])
+                cols.append(index[1])
+                values.append(entries)
+        self._statespaces[prefix].set_time_varying_entries(
+            np.concatenate(matrices).astype(np.int32),
+            np.concatenate(rows).astype(np.int32),
+            np.concatenate(cols).astype(np.int32),
+            np.asfortranarray(np.concatenate(values).astype(dtype)))
+
     def _initialize_state(self, prefix=None, complex_step=False):
         if prefix is None:
             prefix = self.prefix
@@ -714,6 +944,13 @@ class Representation(object):
             )
         elif self.initialization == 'stationary':
             self._statespaces[prefix].initialize_stationary(complex_step)
+        elif self.initialization == 'diffuse':
+            self._statespaces[prefix].initialize_diffuse(
+                self._initial_state.astype(dtype),
+                np.asfortranarray(self._initial_state_cov.astype(dtype)),
+                np.asfortranarray(
+                    self._initial_diffuse_state_cov.astype(dtype))
+            )
         else:
             raise RuntimeError('Statespace model not initialized.')
 
@@ -781,16 +1018,31 @@ class FrozenRepresentation(object):
         The state vector used to initialize the Kalamn filter.
     initial_state_cov : array_like
         The state covariance matrix used to initialize the Kalamn filter.
+    initial_diffuse_state_cov : array_like
+        The diffuse part of the state covariance matrix used to initialize the
+        Kalman filter, if the exact diffuse initialization was used (otherwise
+        None).
     """
     _model_attributes = [
         'model', 'prefix', 'dtype', 'nobs', 'k_endog', 'k_states',
         'k_posdef', 'time_invariant', 'endog', 'design', 'obs_intercept',
         'obs_cov', 'transition', 'state_intercept', 'selection',
         'state_cov', 'missing', 'nmissing', 'shapes', 'initialization',
-        'initial_state', 'initial_state_cov', 'initial_variance'
+        'initial_state', 'initial_state_cov', 'initial_variance',
+        'initial_diffuse_state_cov'
     ]
     _attributes = _model_attributes
 
+    design = FrozenMatrixWrapper('design')
+    obs_intercept = FrozenMatrixWrapper('obs_intercept')
+    obs_cov = FrozenMatrixWrapper('obs_cov')
+    transition = FrozenMatrixWrapper('transition')
+    state_intercept = FrozenMatrixWrapper('state_intercept')
+    selection = FrozenMatrixWrapper('selection')
+    state_cov = FrozenMatrixWrapper('state_cov')
+
+    _matrix_at = _matrix_at
+
     def __init__(self, model):
         # Initialize all attributes to None
         for name in self._attributes:
@@ -825,6 +1077,13 @@ class FrozenRepresentation(object):
         self.selection = model._selection.copy()
         self.state_cov = model._state_cov.copy()
 
+        # Keep compactly stored time-varying entries, which are only expanded
+        # when the system matrix is accessed
+        self._time_varying_entries = dict([
+            (name, (index, values.copy()))
+            for name, (index, values) in model._time_varying_entries.items()
+        ])
+
         self.missing = np.array(model._statespaces[self.prefix].missing,
                                 copy=True)
         self.nmissing = np.array(model._statespaces[self.prefix].nmissing,
@@ -835,7 +1094,10 @@ class FrozenRepresentation(object):
         for name in self.shapes.keys():
             if name == 'obs':
                 continue
-            self.shapes[name] = getattr(self, name).shape
+            shape = getattr(self, '_' + name).shape
+            if name in self._time_varying_entries:
+                shape = shape[:-1] + (self.nobs,)
+            self.shapes[name] = shape
         self.shapes['obs'] = self.endog.shape
 
         # Save the state space initialization
@@ -847,3 +1109,7 @@ class FrozenRepresentation(object):
                 model._statespaces[self.prefix].initial_state, copy=True)
             self.initial_state_cov = np.array(
                 model._statespaces[self.prefix].initial_state_cov, copy=True)
+            if model.initialization == 'diffuse':
+                self.initial_diffuse_state_cov = np.array(
+                    model._statespaces[self.prefix].initial_diffuse_state_cov,
+                    copy=True)
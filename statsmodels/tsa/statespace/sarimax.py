@@ -91,6 +91,12 @@ class SARIMAX(MLEModel):
     hamilton_representation : boolean, optional
         Whether or not to use the Hamilton representation of an ARMA process
         (if True) or the Harvey representation (if False). Default is False.
+    use_exact_diffuse : boolean, optional
+        Whether or not to use the exact diffuse initialization for the
+        non-stationary components of the state vector (the differencing and
+        state regression components). If False, the approximate diffuse
+        initialization is used and the first observations are burned when
+        computing the loglikelihood. Default is False.
     **kwargs
         Keyword arguments may be used to provide default values for state space
         matrices or for Kalman filtering options. See `Representation`, and
@@ -128,6 +134,9 @@ class SARIMAX(MLEModel):
         component of the model.
     hamilton_representation : boolean
         Whether or not to use the Hamilton representation of an ARMA process.
+    use_exact_diffuse : boolean
+        Whether or not to use the exact diffuse initialization for the
+        non-stationary components of the state vector.
     trend : str{'n','c','t','ct'} or iterable
         Parameter controlling the deterministic
         trend polynomial :math:`A(t)`. See the class
@@ -282,7 +291,8 @@ class SARIMAX(MLEModel):
                  measurement_error=False, time_varying_regression=False,
                  mle_regression=True, simple_differencing=False,
                  enforce_stationarity=True, enforce_invertibility=True,
-                 hamilton_representation=False, **kwargs):
+                 hamilton_representation=False, use_exact_diffuse=False,
+                 **kwargs):
 
         # Model parameters
         self.seasonal_periods = seasonal_order[3]
@@ -293,6 +303,7 @@ class SARIMAX(MLEModel):
         self.enforce_stationarity = enforce_stationarity
         self.enforce_invertibility = enforce_invertibility
         self.hamilton_representation = hamilton_representation
+        self.use_exact_diffuse = use_exact_diffuse
 
         # Save given orders
         self.order = order
@@ -503,8 +514,9 @@ class SARIMAX(MLEModel):
         self.k_posdef = k_posdef
 
         # By default, do not calculate likelihood while it is controlled by
-        # diffuse initial conditions.
-        kwargs.setdefault('loglikelihood_burn', k_diffuse_states)
+        # (approximate) diffuse initial conditions.
+        kwargs.setdefault('loglikelihood_burn',
+                          0 if self.use_exact_diffuse else k_diffuse_states)
 
         # Initialize the statespace
         super(SARIMAX, self).__init__(
@@ -535,17 +547,8 @@ class SARIMAX(MLEModel):
                             'measurement_error', 'time_varying_regression',
                             'mle_regression', 'simple_differencing',
                             'enforce_stationarity', 'enforce_invertibility',
-                            'hamilton_representation'] + list(kwargs.keys())
-        # TODO: I think the kwargs or not attached, need to recover from ???
-
-    def _get_init_kwds(self):
-        kwds = super(SARIMAX, self)._get_init_kwds()
-
-        for key, value in kwds.items():
-            if value is None and hasattr(self.ssm, key):
-                kwds[key] = getattr(self.ssm, key)
-
-        return kwds
+                            'hamilton_representation',
+                            'use_exact_diffuse'] + list(kwargs.keys())
 
     def prepare_data(self):
         endog, exog = super(SARIMAX, self).prepare_data()
@@ -674,6 +677,13 @@ class SARIMAX(MLEModel):
         KalmanFilter.initialize_stationary.__doc__
     )
 
+    def initialize_diffuse(self, initial_state=None, initial_state_cov=None,
+                           initial_diffuse_state_cov=None):
+        self._manual_initialization = True
+        self.ssm.initialize_diffuse(initial_state, initial_state_cov,
+                                    initial_diffuse_state_cov)
+    initialize_diffuse.__doc__ = KalmanFilter.initialize_diffuse.__doc__
+
     def initialize_state(self, variance=None, complex_step=False):
         """
         Initialize state and state covariance arrays in preparation for the
@@ -688,7 +698,8 @@ class SARIMAX(MLEModel):
         Notes
         -----
         Initializes the ARMA component of the state space to the typical
-        stationary values and the other components as approximate diffuse.
+        stationary values and the other components as approximate diffuse
+        (or as exact diffuse, if `use_exact_diffuse` is True).
 
         Can be overridden be calling one of the other initialization methods
         before fitting the model.
@@ -700,7 +711,10 @@ class SARIMAX(MLEModel):
         # If we're not enforcing stationarity, then we can't initialize a
         # stationary component
         if not self.enforce_stationarity:
-            self.initialize_approximate_diffuse(variance)
+            if self.use_exact_diffuse:
+                self.initialize_diffuse()
+            else:
+                self.initialize_approximate_diffuse(variance)
             return
 
         # Otherwise, create the initial state and state covariance matrix
@@ -712,7 +726,11 @@ class SARIMAX(MLEModel):
 
         dtype = self.ssm.transition.dtype
         initial_state = np.zeros(self.k_states, dtype=dtype)
-        initial_state_cov = np.eye(self.k_states, dtype=dtype) * variance
+        initial_diffuse_state_cov = np.eye(self.k_states, dtype=dtype)
+        if self.use_exact_diffuse:
+            initial_state_cov = np.zeros_like(initial_diffuse_state_cov)
+        else:
+            initial_state_cov = initial_diffuse_state_cov * variance
 
         # Get the offsets (from the bottom or bottom right of the vector /
         # matrix) for the stationary component.
@@ -752,8 +770,13 @@ class SARIMAX(MLEModel):
 
             initial_state_cov[start:end, start:end] = (
                 initial_state_cov_stationary)
+            initial_diffuse_state_cov[start:end, start:end] = 0
 
-        self.ssm.initialize_known(initial_state, initial_state_cov)
+        if self.use_exact_diffuse:
+            self.ssm.initialize_diffuse(initial_state, initial_state_cov,
+                                        initial_diffuse_state_cov)
+        else:
+            self.ssm.initialize_known(initial_state, initial_state_cov)
 
     @property
     def initial_design(self):
@@ -884,15 +907,9 @@ class SARIMAX(MLEModel):
                 selection[-i, -i] = 1
         return selection
 
-    def filter(self, params, **kwargs):
-        kwargs.setdefault('results_class', SARIMAXResults)
-        kwargs.setdefault('results_wrapper_class', SARIMAXResultsWrapper)
-        return super(SARIMAX, self).filter(params, **kwargs)
-
-    def smooth(self, params, **kwargs):
-        kwargs.setdefault('results_class', SARIMAXResults)
-        kwargs.setdefault('results_wrapper_class', SARIMAXResultsWrapper)
-        return super(SARIMAX, self).smooth(params, **kwargs)
+    @property
+    def _res_classes(self):
+        return {'fit': (SARIMAXResults, SARIMAXResultsWrapper)}
 
     @staticmethod
     def _conditional_sum_squares(endog, k_ar, polynomial_ar, k_ma,
@@ -1502,6 +1519,48 @@ class SARIMAX(MLEModel):
 
         return unconstrained
 
+    def _forecast_representation(self, params, steps, exog=None,
+                                 design=None):
+        params = np.asarray(params)
+        shape = () if exog is None else exog.shape[:-2]
+        kwargs = {}
+
+        # Trend and regression components of the intercepts
+        obs_intercept = np.zeros(shape + (1, steps), dtype=params.dtype)
+        state_intercept = np.zeros((self.k_states, steps), dtype=params.dtype)
+        if self.k_trend > 0:
+            time_trend = np.arange(self.nobs + 1, self.nobs + steps + 1)
+            trend_data = np.zeros((steps, self.k_trend))
+            i = 0
+            for k in self.polynomial_trend.nonzero()[0]:
+                trend_data[:, i] = time_trend**k
+                i += 1
+            data = np.dot(trend_data, params[:self.k_trend])
+            if not self.hamilton_representation:
+                state_intercept[self._k_states_diff] = data
+            else:
+                reduced_polynomial_ar = self.polynomial_ar
+                if self.k_seasonal_ar > 0:
+                    reduced_polynomial_ar = np.polymul(
+                        self.polynomial_ar, self.polynomial_seasonal_ar)
+                obs_intercept += data / np.sum(reduced_polynomial_ar)
+        if self.mle_regression:
+            params_exog = params[self.k_trend:self.k_trend + self.k_exog]
+            obs_intercept[..., 0, :] += np.dot(exog, params_exog)
+        if self.k_trend > 0 or self.mle_regression:
+            kwargs['obs_intercept'] = obs_intercept
+            kwargs['state_intercept'] = state_intercept
+
+        # Regression coefficients in the state vector
+        if self.state_regression and self.k_exog > 0:
+            design_fcast = np.zeros(shape + (1, self.k_states, steps),
+                                    dtype=params.dtype)
+            design_fcast[:] = design[:, :, -1:]
+            design_fcast[..., 0, -self.k_exog:, :] = np.swapaxes(exog, -1, -2)
+            kwargs['design'] = design_fcast
+
+        return kwargs
+
     def update(self, params, transformed=True, complex_step=False):
         """
         Update the parameters of the model
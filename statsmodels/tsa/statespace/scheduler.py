@@ -0,0 +1,274 @@
+"""
+Estimation of many state space models in a pool of worker processes
+
+The series are sent to the workers in chunks together with the model
+specification. Each worker creates and fits the models of its chunk and
+returns only the estimated parameters, the log-likelihood, the convergence
+status and the forecasts of each series, so that neither models nor results
+instances are pickled.
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+from __future__ import division, absolute_import, print_function
+
+import signal
+import time
+import warnings
+
+import numpy as np
+
+from .sarimax import SARIMAX
+
+
+class _FitTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise _FitTimeout()
+
+
+def _fit_series(task, model_class, fit_kwargs, steps, timeout):
+    """
+    Fit the model of a single series and return a compact record
+    """
+    index, endog, exog, model_kwargs, start_params, exog_forecast = task
+    record = {'index': index, 'params': None, 'llf': np.nan,
+              'converged': False, 'forecasts': None, 'error': None}
+
+    # the timeout uses an interval timer, which is only available on
+    # Unix and in the main thread of a process
+    use_timer = timeout is not None and hasattr(signal, 'setitimer')
+    if use_timer:
+        try:
+            handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        except ValueError:
+            use_timer = False
+        else:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    start_time = time.time()
+    try:
+        with warnings.catch_warnings():
+            # the convergence status is taken from the optimizer output, so
+            # that warning filters of the caller cannot change the record
+            warnings.simplefilter('ignore')
+            kwargs = dict(model_kwargs)
+            if exog is not None:
+                kwargs['exog'] = exog
+            model = model_class(endog, **kwargs)
+            fit_kwds = dict(fit_kwargs)
+            fit_kwds.setdefault('disp', False)
+            for key in ['cov_type', 'cov_kwds', 'return_params']:
+                fit_kwds.pop(key, None)
+            fit_kwds['warn_convergence'] = False
+            # only the optimizer output, without a results instance
+            mlefit = model._fit_mle(start_params=start_params, **fit_kwds)
+            params = model.transform_params(mlefit.params)
+            retvals = getattr(mlefit, 'mle_retvals', None)
+            if retvals is not None:
+                record['converged'] = bool(retvals.get('converged', False))
+            filter_results = model.filter(params, return_ssm=True)
+            record['params'] = params
+            record['llf'] = filter_results.llf_obs[
+                filter_results.loglikelihood_burn:].sum()
+            if steps > 0:
+                exog_forecast = model._forecast_exog(exog_forecast, steps)
+                fcast_kwargs = model._forecast_representation(
+                    params, steps, exog_forecast, filter_results.design)
+                forecasts = filter_results.forecast_moments(
+                    steps, **fcast_kwargs)[0]
+                record['forecasts'] = np.squeeze(forecasts.T)
+    except _FitTimeout:
+        record['error'] = 'timeout after %g seconds' % timeout
+    except Exception as exc:
+        record['error'] = '%s: %s' % (type(exc).__name__, exc)
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, handler)
+    record['elapsed'] = time.time() - start_time
+    return record
+
+
+def _fit_chunk(args):
+    tasks, model_class, fit_kwargs, steps, timeout = args
+    return [_fit_series(task, model_class, fit_kwargs, steps, timeout)
+            for task in tasks]
+
+
+def _as_list(x, n_series, name, allow_shared=False):
+    """per series values, a single value is repeated for all series"""
+    if x is None:
+        return [None] * n_series
+    if allow_shared and (isinstance(x, dict) or np.ndim(x) <= 1 and
+                         not isinstance(x, (list, tuple))):
+        return [x] * n_series
+    if len(x) != n_series:
+        raise ValueError('%s must have one entry for each series' % name)
+    return list(x)
+
+
+def iter_fit(endog, model_class=SARIMAX, model_kwargs=None, fit_kwargs=None,
+             exog=None, start_params=None, steps=0, exog_forecast=None,
+             n_jobs=1, chunksize=50, timeout=None):
+    """
+    Fit a state space model to each of many series, yielding the results
+    as they are computed.
+
+    See `fit_parallel` for a description of the parameters.
+
+    Yields
+    ------
+    record : dict
+        The results of one series with keys 'index', 'params', 'llf',
+        'converged', 'forecasts', 'error' and 'elapsed'. If n_jobs is
+        larger than one, then the records are yielded in the order in which
+        the chunks are completed.
+    """
+    if isinstance(endog, np.ndarray) and endog.ndim == 2:
+        endog = list(endog.T)
+    n_series = len(endog)
+    model_kwargs = _as_list({} if model_kwargs is None else model_kwargs,
+                            n_series, 'model_kwargs', allow_shared=True)
+    exog = _as_list(exog, n_series, 'exog')
+    start_params = _as_list(start_params, n_series, 'start_params',
+                            allow_shared=True)
+    exog_forecast = _as_list(exog_forecast, n_series, 'exog_forecast')
+    fit_kwargs = {} if fit_kwargs is None else fit_kwargs
+
+    tasks = list(zip(range(n_series), endog, exog, model_kwargs,
+                     start_params, exog_forecast))
+    chunks = [(tasks[i:i + chunksize], model_class, fit_kwargs, steps,
+               timeout) for i in range(0, n_series, chunksize)]
+
+    if n_jobs == -1:
+        import multiprocessing
+        n_jobs = multiprocessing.cpu_count()
+
+    if n_jobs == 1:
+        for chunk in chunks:
+            for record in _fit_chunk(chunk):
+                yield record
+    else:
+        import multiprocessing
+        pool = multiprocessing.Pool(n_jobs)
+        try:
+            for records in pool.imap_unordered(_fit_chunk, chunks):
+                for record in records:
+                    yield record
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+def fit_parallel(endog, model_class=SARIMAX, model_kwargs=None,
+                 fit_kwargs=None, exog=None, start_params=None, steps=0,
+                 exog_forecast=None, n_jobs=1, chunksize=50, timeout=None):
+    """
+    Fit a state space model to each of many series in a process pool
+
+    Parameters
+    ----------
+    endog : list of array_like or ndarray
+        The series, either as a list or as the columns of a 2-d array. The
+        series can have different lengths if given as a list.
+    model_class : MLEModel subclass
+        The model class, `SARIMAX` by default.
+    model_kwargs : dict or list of dict, optional
+        Keyword arguments for the model, the same for all series or a list
+        with the specification for each series.
+    fit_kwargs : dict, optional
+        Keyword arguments for `MLEModel.fit`, e.g. `method` and `maxiter`.
+    exog : list of array_like, optional
+        The regressors of each series.
+    start_params : array_like or list, optional
+        Starting parameters, either one array used for all series or a
+        list with one entry per series. Entries that are None use the
+        default starting parameters of the model. The `params` of a previous
+        run can be used to warm start the estimation.
+    steps : int
+        Number of out-of-sample forecasts for each series.
+    exog_forecast : list of array_like, optional
+        The regressors of each series for the forecast periods.
+    n_jobs : int
+        Number of worker processes. If 1, then the models are fit in the
+        current process, if -1, then one process per CPU is used.
+    chunksize : int
+        Number of series sent to a worker at once.
+    timeout : float, optional
+        Maximum time in seconds for fitting a single series. Fits that
+        exceed it are stopped and recorded as failed. The timeout requires
+        `signal.setitimer` and is ignored on platforms without it.
+
+    Returns
+    -------
+    ParallelFitResults
+
+    Notes
+    -----
+    Failures do not stop the estimation of the other series: the exception
+    message is stored in `errors` and the parameters, log-likelihood and
+    forecasts of the series are nan.
+
+    Examples
+    --------
+    >>> res = fit_parallel(series, model_kwargs={'order': (1, 0, 1)},
+    ...                    steps=28, n_jobs=-1)
+    >>> res2 = fit_parallel(series_new, model_kwargs={'order': (1, 0, 1)},
+    ...                     start_params=res.params, n_jobs=-1)
+    """
+    records = iter_fit(endog, model_class=model_class,
+                       model_kwargs=model_kwargs, fit_kwargs=fit_kwargs,
+                       exog=exog, start_params=start_params, steps=steps,
+                       exog_forecast=exog_forecast, n_jobs=n_jobs,
+                       chunksize=chunksize, timeout=timeout)
+    records = sorted(records, key=lambda record: record['index'])
+    return ParallelFitResults(records, steps)
+
+
+class ParallelFitResults(object):
+    """
+    Compact results of fitting a state space model to many series
+
+    Parameters
+    ----------
+    records : list of dict
+        The records returned by `iter_fit`, in the order of the series.
+    steps : int
+        Number of forecasts.
+
+    Attributes
+    ----------
+    params : list of ndarray
+        Estimated parameters of each series, None if the fit failed.
+    llf : ndarray
+        Log-likelihood of each series.
+    converged : ndarray
+        Whether the optimizer converged for each series.
+    forecasts : ndarray
+        Forecasts with shape (n_series, steps).
+    errors : list
+        Error message for each series, None if the fit succeeded.
+    elapsed : ndarray
+        Time in seconds used for each series.
+    """
+
+    def __init__(self, records, steps=0):
+        self.n_series = len(records)
+        self.params = [record['params'] for record in records]
+        self.llf = np.array([record['llf'] for record in records])
+        self.converged = np.array([record['converged'] for record in records])
+        self.errors = [record['error'] for record in records]
+        self.elapsed = np.array([record['elapsed'] for record in records])
+        self.forecasts = np.nan * np.ones((self.n_series, steps))
+        for i, record in enumerate(records):
+            if record['forecasts'] is not None:
+                self.forecasts[i] = record['forecasts']
+
+    @property
+    def failed(self):
+        """Indices of the series for which the fit failed"""
+        return np.array([i for i, error in enumerate(self.errors)
+                         if error is not None], dtype=int)
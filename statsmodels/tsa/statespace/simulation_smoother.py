@@ -7,7 +7,8 @@ License: Simplified-BSD
 from __future__ import division, absolute_import, print_function
 
 import numpy as np
-from .kalman_smoother import KalmanSmoother
+from .kalman_smoother import (
+    KalmanSmoother, SMOOTHER_STATE, SMOOTHER_DISTURBANCE)
 from . import tools
 
 SIMULATION_STATE = 0x01
@@ -17,6 +18,23 @@ SIMULATION_ALL = (
 )
 
 
+def _cholesky(matrix):
+    # Lower Cholesky factor of a covariance matrix; singular (positive
+    # semi-definite) matrices fall back to a symmetric square root
+    if matrix.shape[0] == 1:
+        return matrix**0.5
+    try:
+        return np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        eigvals, eigvecs = np.linalg.eigh(matrix)
+        return eigvecs * np.maximum(eigvals, 0)**0.5
+
+
+def _matrix_at(matrix, t):
+    # Get the system matrix (or vector) for period t
+    return matrix[..., t if matrix.shape[-1] > 1 else 0]
+
+
 class SimulationSmoother(KalmanSmoother):
     r"""
     State space representation of a time series process, with Kalman filter
@@ -531,7 +549,8 @@ class SimulationSmoothResults(object):
         return self._simulated_state_disturbance
 
     def simulate(self, simulation_output=-1, disturbance_variates=None,
-                 initial_state_variates=None):
+                 initial_state_variates=None, n_draws=None,
+                 mean_correction=None):
         r"""
         Perform simulation smoothing
 
@@ -552,6 +571,37 @@ class SimulationSmoothResults(object):
             Random values to use as initial state variates. Usually only
             specified if results are to be replicated (e.g. to enforce a seed)
             or for testing. If not specified, random variates are drawn.
+        n_draws : int, optional
+            Number of draws to perform in a single call. If specified, the
+            `generated_*` and `simulated_*` attributes gain a leading
+            dimension of length `n_draws`, and `disturbance_variates` and
+            `initial_state_variates`, if given, must be shaped
+            (n_draws, n_variates). Default is to perform a single draw.
+        mean_correction : boolean, optional
+            Whether to use the mean correction of Durbin and Koopman (2002)
+            to compute the draws when `n_draws` is specified. If True, the
+            Kalman filter and smoother are only applied to the data once, and
+            all of the draws then reuse its gains and covariance matrices, so
+            that each draw only requires the mean recursions, vectorized over
+            draws. If False, the simulation smoother is applied to each draw
+            in turn. Not available for the exact diffuse initialization or
+            for the alternative timing of the initial state. Default is to
+            use the mean correction whenever it is available.
+
+        Notes
+        -----
+        When `n_draws` is specified, the draws are written into arrays
+        allocated once for all draws: `simulated_state` is shaped
+        (n_draws, k_states, nobs), `simulated_measurement_disturbance` is
+        shaped (n_draws, k_endog, nobs) and `simulated_state_disturbance` is
+        shaped (n_draws, k_posdef, nobs).
+
+        References
+        ----------
+        .. [1] Durbin, James, and Siem Jan Koopman. 2002.
+           "A Simple and Efficient Simulation Smoother for
+           State Space Time Series Analysis."
+           Biometrika 89 (3): 603-15.
         """
         # Clear any previous output
         self._generated_measurement_disturbance = None
@@ -563,6 +613,14 @@ class SimulationSmoothResults(object):
         self._simulated_measurement_disturbance = None
         self._simulated_state_disturbance = None
 
+        if n_draws is not None:
+            return self._simulate_draws(
+                int(n_draws), simulation_output, disturbance_variates,
+                initial_state_variates, mean_correction)
+        elif mean_correction is not None:
+            raise ValueError('The mean correction is only available when the'
+                             ' number of draws is specified.')
+
         # Re-initialize the _statespace representation
         self.model._initialize_representation(prefix=self.prefix)
 
@@ -591,3 +649,285 @@ class SimulationSmoothResults(object):
         # Note: simulation_output=-1 corresponds to whatever was setup when
         # the simulation smoother was constructed
         self._simulation_smoother.simulate(simulation_output)
+
+    def _simulate_draws(self, n_draws, simulation_output,
+                        disturbance_variates, initial_state_variates,
+                        mean_correction):
+        nobs = self.model.nobs
+        k_endog = self.model.k_endog
+        k_states = self.model.k_states
+        k_posdef = self.model.k_posdef
+        n_disturbance_variates = nobs * (k_endog + k_posdef)
+
+        if n_draws < 1:
+            raise ValueError('Number of draws must be positive.')
+        if simulation_output == -1:
+            simulation_output = self.simulation_output
+
+        # Draw all of the (independent) random variates at once
+        if disturbance_variates is None:
+            disturbance_variates = np.random.normal(
+                size=(n_draws, n_disturbance_variates))
+        if initial_state_variates is None:
+            initial_state_variates = np.random.normal(
+                size=(n_draws, k_states))
+        # Note: these are copies, which are transformed in-place into the
+        # generated disturbances
+        disturbance_variates = np.array(disturbance_variates,
+                                        dtype=self.dtype, ndmin=2)
+        initial_state_variates = np.array(initial_state_variates,
+                                          dtype=self.dtype, ndmin=2)
+        if not disturbance_variates.shape == (n_draws,
+                                              n_disturbance_variates):
+            raise ValueError('Invalid shape of disturbance variates. Requires'
+                             ' shape (%d, %d), got %s'
+                             % (n_draws, n_disturbance_variates,
+                                str(disturbance_variates.shape)))
+        if not initial_state_variates.shape == (n_draws, k_states):
+            raise ValueError('Invalid shape of initial state variates.'
+                             ' Requires shape (%d, %d), got %s'
+                             % (n_draws, k_states,
+                                str(initial_state_variates.shape)))
+
+        # Allocate the output for all draws
+        self._generated_obs = np.zeros((n_draws, k_endog, nobs),
+                                       dtype=self.dtype)
+        self._generated_state = np.zeros((n_draws, k_states, nobs + 1),
+                                         dtype=self.dtype)
+        self._simulated_state = np.zeros((n_draws, k_states, nobs),
+                                         dtype=self.dtype)
+        self._simulated_measurement_disturbance = np.zeros(
+            (n_draws, k_endog, nobs), dtype=self.dtype)
+        self._simulated_state_disturbance = np.zeros(
+            (n_draws, k_posdef, nobs), dtype=self.dtype)
+
+        if mean_correction is None:
+            mean_correction = not (self.model.initialization == 'diffuse' or
+                                   self.model.timing_init_filtered)
+        if mean_correction:
+            self._simulate_mean_correction(
+                simulation_output, disturbance_variates,
+                initial_state_variates)
+        else:
+            self.model._initialize_representation(prefix=self.prefix)
+            self.model._initialize_state(prefix=self.prefix)
+
+            simulation_smoother = self._simulation_smoother
+            for i in range(n_draws):
+                simulation_smoother.set_disturbance_variates(
+                    disturbance_variates[i])
+                simulation_smoother.set_initial_state_variates(
+                    initial_state_variates[i])
+                simulation_smoother.simulate(simulation_output)
+
+                self._generated_obs[i] = simulation_smoother.generated_obs
+                self._generated_state[i] = simulation_smoother.generated_state
+                if simulation_output & SIMULATION_STATE:
+                    self._simulated_state[i] = (
+                        simulation_smoother.simulated_state)
+                if simulation_output & SIMULATION_DISTURBANCE:
+                    self._simulated_measurement_disturbance[i] = (
+                        simulation_smoother.simulated_measurement_disturbance)
+                    self._simulated_state_disturbance[i] = (
+                        simulation_smoother.simulated_state_disturbance)
+
+        end = nobs * k_endog
+        self._generated_measurement_disturbance = (
+            disturbance_variates[:, :end].reshape(n_draws, nobs, k_endog))
+        self._generated_state_disturbance = (
+            disturbance_variates[:, end:].reshape(n_draws, nobs, k_posdef))
+
+    def _mean_correction_gains(self, results):
+        # Inverse forecast error covariance matrices and Kalman gains of the
+        # observed elements in each period. These do not depend on the data,
+        # so they are taken from the filter applied to y and shared by all
+        # draws. The univariate and collapsed filters do not store them for
+        # the observation vector, so they are then built from the predicted
+        # state covariance matrices.
+        nobs = results.nobs
+        missing = results.missing.astype(bool)
+        design = results.design
+        transition = results.transition
+        predicted_state_cov = results.predicted_state_cov
+        stored = not (results.filter_univariate or results.filter_collapsed)
+
+        if stored:
+            forecasts_error_cov = results.forecasts_error_cov
+        else:
+            obs_cov = results.obs_cov
+            forecasts_error_cov = np.zeros(
+                (self.model.k_endog, self.model.k_endog, nobs),
+                dtype=self.dtype)
+            for t in range(nobs):
+                design_t = _matrix_at(design, t)
+                forecasts_error_cov[:, :, t] = (
+                    np.dot(np.dot(design_t, predicted_state_cov[:, :, t]),
+                           design_t.T) + _matrix_at(obs_cov, t))
+
+        # Invert the matrices of all fully observed periods at once
+        full = results.nmissing == 0
+        inverse = np.zeros(forecasts_error_cov.shape[::-1], dtype=self.dtype)
+        if np.any(full):
+            inverse[full] = np.linalg.inv(
+                np.transpose(forecasts_error_cov[:, :, full], (2, 0, 1)))
+
+        gains = []
+        for t in range(nobs):
+            observed = ~missing[:, t]
+            if full[t]:
+                inverse_forecast_error_cov = inverse[t]
+            else:
+                inverse_forecast_error_cov = forecasts_error_cov[
+                    np.ix_(observed, observed, [t])][:, :, 0]
+                if np.any(observed):
+                    inverse_forecast_error_cov = np.linalg.inv(
+                        inverse_forecast_error_cov)
+            if stored:
+                kalman_gain = results.kalman_gain[:, observed, t]
+            else:
+                kalman_gain = np.dot(
+                    np.dot(np.dot(_matrix_at(transition, t),
+                                  predicted_state_cov[:, :, t]),
+                           _matrix_at(design, t)[observed].T),
+                    inverse_forecast_error_cov)
+            gains.append((inverse_forecast_error_cov, kalman_gain))
+        return gains
+
+    def _simulate_mean_correction(self, simulation_output,
+                                  disturbance_variates,
+                                  initial_state_variates):
+        # Durbin and Koopman (2002): a draw from p(alpha | y) is
+        # alpha_hat(y) + alpha^+ - alpha_hat(y^+), where alpha_hat is the
+        # smoothed state. The smoother applied to y^+ only requires the mean
+        # recursions, since the Kalman gains and covariance matrices do not
+        # depend on the data, so these are taken from a single pass of the
+        # filter on y and are shared across all draws.
+        if self.model.initialization == 'diffuse':
+            raise NotImplementedError('The mean correction is not available'
+                                      ' for the exact diffuse'
+                                      ' initialization.')
+        if self.model.timing_init_filtered:
+            raise NotImplementedError('The mean correction is not available'
+                                      ' for the alternative timing of the'
+                                      ' initial state.')
+
+        n_draws = disturbance_variates.shape[0]
+        nobs = self.model.nobs
+        k_endog = self.model.k_endog
+        k_states = self.model.k_states
+        k_posdef = self.model.k_posdef
+
+        results = self.model.smooth(
+            smoother_output=SMOOTHER_STATE | SMOOTHER_DISTURBANCE,
+            conserve_memory=0)
+        missing = results.missing.astype(bool)
+        design = results.design
+        obs_intercept = results.obs_intercept
+        obs_cov = results.obs_cov
+        transition = results.transition
+        state_intercept = results.state_intercept
+        selection = results.selection
+        state_cov = results.state_cov
+
+        # 1. Generate y^+ and alpha^+ for all draws, initially with zero mean
+        end = nobs * k_endog
+        measurement_disturbance = (
+            disturbance_variates[:, :end].reshape(n_draws, nobs, k_endog))
+        state_disturbance = (
+            disturbance_variates[:, end:].reshape(n_draws, nobs, k_posdef))
+        generated_obs = self._generated_obs
+        generated_state = self._generated_state
+        generated_state[:, :, 0] = np.dot(
+            initial_state_variates, _cholesky(results.initial_state_cov).T)
+
+        mean_obs = np.zeros((k_endog, nobs), dtype=self.dtype)
+        mean_state = np.zeros((k_states, nobs + 1), dtype=self.dtype)
+        mean_state[:, 0] = results.initial_state
+        for t in range(nobs):
+            if t == 0 or obs_cov.shape[-1] > 1:
+                obs_cov_factor = _cholesky(_matrix_at(obs_cov, t))
+            if t == 0 or state_cov.shape[-1] > 1:
+                state_cov_factor = _cholesky(_matrix_at(state_cov, t))
+            measurement_disturbance[:, t] = np.dot(
+                measurement_disturbance[:, t], obs_cov_factor.T)
+            state_disturbance[:, t] = np.dot(
+                state_disturbance[:, t], state_cov_factor.T)
+
+            design_t = _matrix_at(design, t)
+            transition_t = _matrix_at(transition, t)
+            generated_obs[:, :, t] = (
+                np.dot(generated_state[:, :, t], design_t.T) +
+                measurement_disturbance[:, t])
+            generated_state[:, :, t + 1] = (
+                np.dot(generated_state[:, :, t], transition_t.T) +
+                np.dot(state_disturbance[:, t],
+                       _matrix_at(selection, t).T))
+
+            mean_obs[:, t] = (_matrix_at(obs_intercept, t) +
+                              np.dot(design_t, mean_state[:, t]))
+            mean_state[:, t + 1] = (_matrix_at(state_intercept, t) +
+                                    np.dot(transition_t, mean_state[:, t]))
+
+        if simulation_output:
+            # 2. Forward recursion: Kalman filter mean for y^+, using the
+            #    gains from the filter applied to y
+            predicted_state = np.zeros((n_draws, k_states, nobs),
+                                       dtype=self.dtype)
+            forecasts_error = []
+            gains = self._mean_correction_gains(results)
+            state = np.zeros((n_draws, k_states), dtype=self.dtype)
+            for t in range(nobs):
+                predicted_state[:, :, t] = state
+                observed = ~missing[:, t]
+                design_t = _matrix_at(design, t)[observed]
+                kalman_gain = gains[t][1]
+                forecast_error = (generated_obs[:, observed, t] -
+                                  np.dot(state, design_t.T))
+                state = (np.dot(state, _matrix_at(transition, t).T) +
+                         np.dot(forecast_error, kalman_gain.T))
+                forecasts_error.append(forecast_error)
+
+            # 3. Backward recursion: smoothed state and disturbances for y^+,
+            #    and the draws from their conditional distributions
+            scaled_smoothed_estimator = np.zeros((n_draws, k_states),
+                                                 dtype=self.dtype)
+            for t in range(nobs - 1, -1, -1):
+                observed = ~missing[:, t]
+                inverse_forecast_error_cov, kalman_gain = gains[t]
+                smoothing_error = (
+                    np.dot(forecasts_error[t], inverse_forecast_error_cov) -
+                    np.dot(scaled_smoothed_estimator, kalman_gain))
+
+                # Note: as in the Kalman smoother, the smoothed measurement
+                # disturbance is zero for missing observations
+                self._simulated_measurement_disturbance[:, :, t] = (
+                    measurement_disturbance[:, t])
+                self._simulated_measurement_disturbance[:, observed, t] -= (
+                    np.dot(smoothing_error,
+                           _matrix_at(obs_cov, t)[np.ix_(observed,
+                                                         observed)]))
+                self._simulated_state_disturbance[:, :, t] = (
+                    state_disturbance[:, t] -
+                    np.dot(np.dot(scaled_smoothed_estimator,
+                                  _matrix_at(selection, t)),
+                           _matrix_at(state_cov, t)))
+
+                scaled_smoothed_estimator = (
+                    np.dot(smoothing_error,
+                           _matrix_at(design, t)[observed]) +
+                    np.dot(scaled_smoothed_estimator,
+                           _matrix_at(transition, t)))
+                self._simulated_state[:, :, t] = (
+                    generated_state[:, :, t] - predicted_state[:, :, t] -
+                    np.dot(scaled_smoothed_estimator,
+                           results.predicted_state_cov[:, :, t]))
+
+            self._simulated_state += results.smoothed_state
+            self._simulated_measurement_disturbance += (
+                results.smoothed_measurement_disturbance)
+            self._simulated_state_disturbance += (
+                results.smoothed_state_disturbance)
+
+        # 4. Add the mean to the generated series
+        generated_obs += mean_obs
+        generated_state += mean_state
@@ -89,6 +89,12 @@ class UnobservedComponents(MLEModel):
         allow the cyclical component to be between 1.5 and 12 years; depending
         on the frequency of the endogenous variable, this will imply different
         specific bounds.
+    use_exact_diffuse : bool, optional
+        Whether or not to use the exact diffuse initialization for the
+        non-stationary components (all components other than the
+        autoregressive component). If False, the approximate diffuse
+        initialization is used and the first observations are burned when
+        computing the loglikelihood. Default is False.
 
     Notes
     -----
@@ -305,7 +311,7 @@ class UnobservedComponents(MLEModel):
                  stochastic_level=False, stochastic_trend=False,
                  stochastic_seasonal=True, stochastic_cycle=False,
                  damped_cycle=False, cycle_period_bounds=None,
-                 mle_regression=True,
+                 mle_regression=True, use_exact_diffuse=False,
                  **kwargs):
 
         # Model options
@@ -325,6 +331,7 @@ class UnobservedComponents(MLEModel):
 
         self.damped_cycle = damped_cycle
         self.mle_regression = mle_regression
+        self.use_exact_diffuse = use_exact_diffuse
 
         # Check for string trend/level specification
         self.trend_specification = None
@@ -476,8 +483,9 @@ class UnobservedComponents(MLEModel):
 
         # We can still estimate the model with just the irregular component,
         # just need to have one state that does nothing.
-        loglikelihood_burn = kwargs.get('loglikelihood_burn',
-                                        k_states - self.ar_order)
+        loglikelihood_burn = kwargs.get(
+            'loglikelihood_burn',
+            0 if self.use_exact_diffuse else k_states - self.ar_order)
         if k_states == 0:
             if not self.irregular:
                 raise ValueError('Model has no components specified.')
@@ -527,8 +535,8 @@ class UnobservedComponents(MLEModel):
                             'stochastic_level', 'stochastic_trend',
                             'stochastic_seasonal', 'stochastic_cycle',
                             'damped_cycle', 'cycle_period_bounds',
-                            'mle_regression'] + list(kwargs.keys())
-        # TODO: I think the kwargs or not attached, need to recover from ???
+                            'mle_regression', 'use_exact_diffuse'] + list(
+                                kwargs.keys())
 
     def _get_init_kwds(self):
         # Get keywords based on model attributes
@@ -538,10 +546,6 @@ class UnobservedComponents(MLEModel):
         kwds['seasonal'] = self.seasonal_periods
         kwds['autoregressive'] = self.ar_order
 
-        for key, value in kwds.items():
-            if value is None and hasattr(self.ssm, key):
-                kwds[key] = getattr(self.ssm, key)
-
         return kwds
 
     def setup(self):
@@ -646,12 +650,15 @@ class UnobservedComponents(MLEModel):
 
     def initialize_state(self):
         # Initialize the AR component as stationary, the rest as approximately
-        # diffuse
+        # (or exactly) diffuse
         initial_state = np.zeros(self.k_states)
-        initial_state_cov = (
-            np.eye(self.k_states, dtype=self.ssm.transition.dtype) *
-            self.ssm.initial_variance
-        )
+        initial_diffuse_state_cov = np.eye(self.k_states,
+                                           dtype=self.ssm.transition.dtype)
+        if self.use_exact_diffuse:
+            initial_state_cov = np.zeros_like(initial_diffuse_state_cov)
+        else:
+            initial_state_cov = (
+                initial_diffuse_state_cov * self.ssm.initial_variance)
 
         if self.autoregressive:
 
@@ -681,20 +688,18 @@ class UnobservedComponents(MLEModel):
             initial_state_cov[start:end, start:end] = (
                 initial_state_cov_stationary
             )
+            initial_diffuse_state_cov[start:end, start:end] = 0
 
-        self.ssm.initialize_known(initial_state, initial_state_cov)
-
-    def filter(self, params, **kwargs):
-        kwargs.setdefault('results_class', UnobservedComponentsResults)
-        kwargs.setdefault('results_wrapper_class',
-                          UnobservedComponentsResultsWrapper)
-        return super(UnobservedComponents, self).filter(params, **kwargs)
+        if self.use_exact_diffuse:
+            self.ssm.initialize_diffuse(initial_state, initial_state_cov,
+                                        initial_diffuse_state_cov)
+        else:
+            self.ssm.initialize_known(initial_state, initial_state_cov)
 
-    def smooth(self, params, **kwargs):
-        kwargs.setdefault('results_class', UnobservedComponentsResults)
-        kwargs.setdefault('results_wrapper_class',
-                          UnobservedComponentsResultsWrapper)
-        return super(UnobservedComponents, self).smooth(params, **kwargs)
+    @property
+    def _res_classes(self):
+        return {'fit': (UnobservedComponentsResults,
+                        UnobservedComponentsResultsWrapper)}
 
     @property
     def start_params(self):
@@ -913,6 +918,26 @@ class UnobservedComponents(MLEModel):
 
         return unconstrained
 
+    def _forecast_representation(self, params, steps, exog=None,
+                                 design=None):
+        kwargs = {}
+        if exog is not None:
+            params = np.asarray(params)
+            if self.mle_regression:
+                # The regression coefficients are the last parameters
+                kwargs['obs_intercept'] = np.dot(
+                    exog, params[-self.k_exog:])[..., None, :]
+            else:
+                # The regression coefficients are the last states
+                design_fcast = np.zeros(
+                    exog.shape[:-2] + (1, self.k_states, steps),
+                    dtype=params.dtype)
+                design_fcast[:] = design[:, :, -1:]
+                design_fcast[..., 0, -self.k_exog:, :] = np.swapaxes(
+                    exog, -1, -2)
+                kwargs['design'] = design_fcast
+        return kwargs
+
     def update(self, params, **kwargs):
         params = super(UnobservedComponents, self).update(params, **kwargs)
 
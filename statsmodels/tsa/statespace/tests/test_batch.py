@@ -0,0 +1,125 @@
+"""
+Tests for batched estimation of SARIMAX models
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+from __future__ import division, absolute_import, print_function
+
+import warnings
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal, assert_raises
+
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from statsmodels.tsa.statespace import batch
+
+
+def _simulate(nobs, n_series, seed):
+    rs = np.random.RandomState(seed)
+    eps = rs.normal(size=(nobs + 50, n_series))
+    endog = np.zeros_like(eps)
+    for t in range(1, nobs + 50):
+        endog[t] = 0.6 * endog[t - 1] + eps[t] + 0.3 * eps[t - 1]
+    return endog[50:] + 2, rs
+
+
+def test_loglike():
+    # compare the stacked filter with SARIMAX at random parameters
+    endog, rs = _simulate(80, 4, 1234)
+    endog[5, 1] = np.nan
+    exog = rs.normal(size=(80, 2))
+    specs = [dict(order=(1, 0, 1), trend='c'),
+             dict(order=(2, 1, 1)),
+             dict(order=(1, 0, 0), seasonal_order=(1, 1, 1, 4), trend='c'),
+             dict(order=(1, 0, 1), measurement_error=True),
+             dict(order=(1, 0, 0), enforce_stationarity=False),
+             dict(order=(1, 1, 1), simple_differencing=True),
+             dict(order=([1, 0, 1], 0, 0), trend='ct'),
+             dict(order=(1, 0, 0), exog=exog)]
+    for spec in specs:
+        exog_i = spec.pop('exog', None)
+        exog_stack = (None if exog_i is None else
+                      np.repeat(exog_i[None], endog.shape[1], 0))
+        stack = batch._SARIMAXStack(endog.T, exog_stack, spec)
+        unconstrained = (stack.untransform_params(stack.start_params()) +
+                         0.3 * rs.normal(size=(4, stack.k_params)))
+        params = stack.transform_params(unconstrained)
+        llf = stack.loglike(params)
+        for i in range(endog.shape[1]):
+            mod = SARIMAX(endog[:, i], exog=exog_i, **spec)
+            assert_allclose(params[i], mod.transform_params(unconstrained[i]),
+                            rtol=1e-10)
+            assert_allclose(stack.untransform_params(params)[i],
+                            mod.untransform_params(params[i]), rtol=1e-8)
+            assert_allclose(llf[i], mod.loglike(params[i]), rtol=1e-9)
+
+
+def test_fit_many():
+    endog, rs = _simulate(120, 6, 4321)
+    exog = rs.normal(size=(120, 1, 6))
+    endog += 0.5 * exog[:, 0]
+    exog_fc = rs.normal(size=(5, 1, 6))
+    res = batch.fit_many(endog, exog=exog, order=(1, 0, 1), steps=5,
+                         exog_forecast=exog_fc, chunksize=4)
+    assert_equal(res.params.shape, (6, 4))
+    assert_equal(res.forecasts.shape, (6, 5))
+    assert_equal(res.converged, True)
+    assert_equal(res.param_names, ['x1', 'ar.L1', 'ma.L1', 'sigma2'])
+
+    for i in range(6):
+        mod = SARIMAX(endog[:, i], exog=exog[:, :, i], order=(1, 0, 1))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            res_i = mod.fit(disp=False)
+        assert_allclose(res.llf[i], res_i.llf, rtol=1e-6)
+        assert_allclose(res.params[i], res_i.params, rtol=1e-2, atol=1e-3)
+
+        # forecasts at the batch estimates
+        res_i = res.get_results(i)
+        assert_allclose(res_i.llf, res.llf[i], rtol=1e-10)
+        assert_allclose(res.aic[i], res_i.aic, rtol=1e-10)
+        assert_allclose(res.bic[i], res_i.bic, rtol=1e-10)
+        fcast = res_i.get_forecast(5, exog=exog_fc[:, :, i])
+        assert_allclose(res.forecasts[i], fcast.predicted_mean, rtol=1e-8)
+        assert_allclose(res.forecasts_var[i], fcast.var_pred_mean,
+                        rtol=1e-8)
+
+
+def test_fit_many_shared_exog():
+    # regressors shared by all series match the same regressors given for
+    # each series
+    endog, rs = _simulate(100, 3, 99)
+    exog = rs.normal(size=(100, 1))
+    spec = dict(order=(1, 1, 0), simple_differencing=True)
+    res = batch.fit_many(endog, exog=exog, **spec)
+    res2 = batch.fit_many(endog, exog=np.repeat(exog[:, :, None], 3, 2),
+                          **spec)
+    assert_allclose(res.params, res2.params)
+    assert_allclose(res.llf, res2.llf)
+
+    mod = SARIMAX(endog[:, 0], exog=exog, **spec)
+    assert_equal(res.param_names, mod.param_names)
+    assert_equal(res.nobs_effective,
+                 mod.nobs - mod.ssm.loglikelihood_burn)
+    assert_allclose(res.get_results(1).llf, res.llf[1], rtol=1e-10)
+
+
+def test_fit_many_start_params():
+    endog, _ = _simulate(100, 3, 5)
+    res = batch.fit_many(endog, order=(1, 0, 0), trend='c')
+    res2 = batch.fit_many(endog, order=(1, 0, 0), trend='c',
+                          start_params=[2., 0.5, 1.])
+    assert_allclose(res2.params, res.params, rtol=1e-3)
+    assert_allclose(res2.llf, res.llf, rtol=1e-8)
+
+
+def test_fit_many_invalid():
+    endog, _ = _simulate(50, 2, 0)
+    assert_raises(ValueError, batch.fit_many, endog[:, 0])
+    assert_raises(ValueError, batch.fit_many, endog, order=(1, 0, 0),
+                  hamilton_representation=True)
+    assert_raises(ValueError, batch.fit_many, endog, exog=np.ones((50, 1)),
+                  mle_regression=False)
+    assert_raises(ValueError, batch.fit_many, endog, exog=np.ones((50, 1)),
+                  steps=2)
@@ -0,0 +1,191 @@
+"""
+Tests for the Chandrasekhar recursions
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+from __future__ import division, absolute_import, print_function
+
+import numpy as np
+
+from statsmodels.tsa.statespace import sarimax, varmax
+from statsmodels.tsa.statespace.mlemodel import MLEModel
+from statsmodels.tsa.statespace.kalman_filter import (
+    MEMORY_CONSERVE, MEMORY_NO_LIKELIHOOD)
+from statsmodels.tsa.statespace.tools import compatibility_mode
+from numpy.testing import assert_equal, assert_allclose, assert_raises
+from nose.exc import SkipTest
+
+if compatibility_mode:
+    raise SkipTest('Chandrasekhar recursions not available.')
+
+
+class Chandrasekhar(object):
+    """
+    Compare the Chandrasekhar recursions and the conventional Kalman filter
+    (and smoothers)
+    """
+    rtol = 1e-7
+    atol = 1e-8
+
+    @classmethod
+    def setup_class(cls, mod, params, **kwargs):
+        cls.model = mod
+        cls.results_a = cls.model.smooth(params, **kwargs)
+        cls.model.ssm.filter_chandrasekhar = True
+        cls.results_b = cls.model.smooth(params, **kwargs)
+        cls.model.ssm.filter_chandrasekhar = False
+
+    def test_using_chandrasekhar(self):
+        assert not self.results_a.filter_results.filter_chandrasekhar
+        assert self.results_b.filter_results.filter_chandrasekhar
+
+    def test_loglike(self):
+        assert_allclose(self.results_b.llf_obs, self.results_a.llf_obs,
+                        rtol=self.rtol, atol=self.atol)
+
+    def test_filtered(self):
+        for name in ['filtered_state', 'filtered_state_cov',
+                     'predicted_state', 'predicted_state_cov', 'forecasts',
+                     'forecasts_error_cov']:
+            assert_allclose(getattr(self.results_b, name),
+                            getattr(self.results_a, name),
+                            rtol=self.rtol, atol=self.atol)
+        assert_allclose(self.results_b.filter_results.kalman_gain,
+                        self.results_a.filter_results.kalman_gain,
+                        rtol=self.rtol, atol=self.atol)
+
+    def test_smoothed(self):
+        for name in ['smoothed_state', 'smoothed_state_cov',
+                     'smoothed_measurement_disturbance']:
+            assert_allclose(getattr(self.results_b, name),
+                            getattr(self.results_a, name),
+                            rtol=self.rtol, atol=self.atol)
+
+
+def _sarimax_endog(nobs=200, missing=True):
+    rs = np.random.RandomState(1234)
+    endog = np.cumsum(rs.normal(size=nobs)) * 0.1 + rs.normal(size=nobs)
+    if missing:
+        endog[[10, 11, 50]] = np.nan
+    return endog
+
+
+class TestSARIMAX(Chandrasekhar):
+    @classmethod
+    def setup_class(cls, *args, **kwargs):
+        mod = sarimax.SARIMAX(_sarimax_endog(missing=False), order=(2, 0, 1),
+                              trend='c')
+        super(TestSARIMAX, cls).setup_class(mod, [0.1, 0.5, 0.1, 0.3, 1.2])
+
+    def test_rank(self):
+        # With a stationary initialization the increments have rank one
+        self.model.ssm.filter_chandrasekhar = True
+        self.model.loglike([0.1, 0.5, 0.1, 0.3, 1.2])
+        self.model.ssm.filter_chandrasekhar = False
+        assert_equal(self.model.ssm._kalman_filter.chandrasekhar_rank, 1)
+
+
+class TestSARIMAXSeasonal(Chandrasekhar):
+    # The approximate diffuse initialization of the differenced states is
+    # large relative to the covariances of the stationary states
+    atol = 1e-6
+
+    @classmethod
+    def setup_class(cls, *args, **kwargs):
+        mod = sarimax.SARIMAX(_sarimax_endog(missing=False), order=(2, 1, 1),
+                              seasonal_order=(1, 1, 1, 12))
+        super(TestSARIMAXSeasonal, cls).setup_class(
+            mod, [0.5, 0.1, 0.3, 0.2, 0.4, 1.2])
+
+
+class TestSARIMAXSeasonalExactDiffuse(Chandrasekhar):
+    @classmethod
+    def setup_class(cls, *args, **kwargs):
+        mod = sarimax.SARIMAX(_sarimax_endog(missing=False), order=(2, 1, 1),
+                              seasonal_order=(1, 1, 1, 12),
+                              use_exact_diffuse=True)
+        super(TestSARIMAXSeasonalExactDiffuse, cls).setup_class(
+            mod, [0.5, 0.1, 0.3, 0.2, 0.4, 1.2])
+
+    def test_rank(self):
+        # After the diffuse periods the increments have rank one
+        self.model.ssm.filter_chandrasekhar = True
+        self.model.loglike([0.5, 0.1, 0.3, 0.2, 0.4, 1.2])
+        self.model.ssm.filter_chandrasekhar = False
+        assert_equal(self.model.ssm._kalman_filter.chandrasekhar_rank, 1)
+
+
+class TestSARIMAXSeasonalMissing(Chandrasekhar):
+    @classmethod
+    def setup_class(cls, *args, **kwargs):
+        mod = sarimax.SARIMAX(_sarimax_endog(), order=(2, 1, 1),
+                              seasonal_order=(1, 1, 1, 12),
+                              measurement_error=True, use_exact_diffuse=True)
+        super(TestSARIMAXSeasonalMissing, cls).setup_class(
+            mod, [0.5, 0.1, 0.3, 0.2, 0.4, 0.1, 1.2])
+
+
+class TestVARMAXMissing(Chandrasekhar):
+    @classmethod
+    def setup_class(cls, *args, **kwargs):
+        rs = np.random.RandomState(1234)
+        endog = rs.normal(size=(120, 2))
+        endog[5, 0] = np.nan
+        endog[[20, 21]] = np.nan
+        mod = varmax.VARMAX(endog, order=(1, 1), trend='c')
+        super(TestVARMAXMissing, cls).setup_class(mod, mod.start_params)
+
+
+def test_conserve_memory():
+    mod = sarimax.SARIMAX(_sarimax_endog(), order=(2, 0, 1),
+                          seasonal_order=(1, 0, 0, 4))
+    params = [0.5, 0.1, 0.3, 0.2, 1.2]
+    desired = mod.loglike(params)
+
+    mod.ssm.filter_chandrasekhar = True
+    mod.ssm.set_conserve_memory(MEMORY_CONSERVE & ~MEMORY_NO_LIKELIHOOD)
+    assert_allclose(mod.loglike(params), desired)
+
+
+def test_fit():
+    mod = sarimax.SARIMAX(_sarimax_endog(), order=(1, 1, 1),
+                          seasonal_order=(0, 1, 1, 12), use_exact_diffuse=True)
+    res_a = mod.fit(disp=False)
+    mod.ssm.filter_chandrasekhar = True
+    res_b = mod.fit(disp=False)
+    assert_allclose(res_b.llf, res_a.llf)
+    assert_allclose(res_b.params, res_a.params, atol=1e-4)
+
+
+def test_invalid():
+    endog = _sarimax_endog()
+    mod = sarimax.SARIMAX(endog, order=(1, 0, 0))
+    mod.ssm.filter_chandrasekhar = True
+
+    mod.ssm.filter_univariate = True
+    assert_raises(NotImplementedError, mod.loglike, [0.5, 1.])
+    mod.ssm.filter_univariate = False
+
+    mod.ssm.timing_init_filtered = True
+    assert_raises(NotImplementedError, mod.loglike, [0.5, 1.])
+    mod.ssm.timing_init_filtered = False
+
+    # Time-varying system matrices (other than the intercepts)
+    def model(design, obs_intercept):
+        mod = MLEModel(endog, k_states=1)
+        mod.ssm.filter_chandrasekhar = True
+        mod['design'] = design
+        mod['obs_intercept'] = obs_intercept
+        mod['obs_cov'] = np.eye(1)
+        mod['transition'] = np.eye(1) * 0.5
+        mod['selection'] = np.eye(1)
+        mod['state_cov'] = np.eye(1)
+        mod.initialize_stationary()
+        return mod
+
+    mod = model(np.ones((1, 1, len(endog))), np.zeros(1))
+    assert_raises(NotImplementedError, mod.loglike, [])
+
+    mod = model(np.eye(1), np.ones((1, len(endog))))
+    assert_allclose(mod.loglike([]), mod.loglike([], filter_method=1))
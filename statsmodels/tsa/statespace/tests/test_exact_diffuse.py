@@ -0,0 +1,214 @@
+"""
+Tests for the exact diffuse initialization
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+from __future__ import division, absolute_import, print_function
+
+import numpy as np
+
+from statsmodels.tsa.statespace import sarimax, structural
+from statsmodels.tsa.statespace.mlemodel import MLEModel
+from statsmodels.tsa.statespace.kalman_filter import (
+    MEMORY_CONSERVE, MEMORY_NO_LIKELIHOOD)
+from statsmodels.tsa.statespace.kalman_smoother import SMOOTH_ALTERNATIVE
+from statsmodels.tsa.statespace.tools import compatibility_mode
+from numpy.testing import assert_equal, assert_allclose, assert_raises
+from nose.exc import SkipTest
+
+if compatibility_mode:
+    raise SkipTest('Exact diffuse initialization not available.')
+
+
+def _endog(nobs=100):
+    rs = np.random.RandomState(1234)
+    endog = np.cumsum(rs.normal(size=nobs)) + rs.normal(size=nobs)
+    endog[[2, 20]] = np.nan
+    return endog
+
+
+class ExactDiffuse(object):
+    """
+    Compare the exact diffuse and approximate diffuse initializations
+
+    After the diffuse periods, the filter output only differs by the
+    approximation error of the approximate diffuse initialization.
+    """
+    atol = 1e-4
+
+    @classmethod
+    def setup_class(cls, mod_exact, mod_approx, params):
+        cls.model = mod_exact
+        cls.params = params
+        cls.results_a = mod_approx.smooth(params)
+        cls.results_b = mod_exact.smooth(params)
+        cls.d = cls.results_b.nobs_diffuse
+
+    def test_nobs_diffuse(self):
+        assert_equal(self.results_a.nobs_diffuse, 0)
+        assert self.d > 0
+
+    def test_loglike(self):
+        assert_allclose(self.results_b.llf_obs[self.d:],
+                        self.results_a.llf_obs[self.d:], atol=self.atol)
+
+    def test_filtered(self):
+        for name in ['filtered_state', 'filtered_state_cov']:
+            assert_allclose(getattr(self.results_b, name)[..., self.d:],
+                            getattr(self.results_a, name)[..., self.d:],
+                            atol=self.atol)
+
+    def test_smoothed(self):
+        for name in ['smoothed_state', 'smoothed_state_cov',
+                     'smoothed_state_disturbance',
+                     'smoothed_state_disturbance_cov',
+                     'smoothed_measurement_disturbance']:
+            assert_allclose(getattr(self.results_b, name),
+                            getattr(self.results_a, name), atol=self.atol)
+
+    def test_univariate(self):
+        # The usual univariate recursions are used after the diffuse periods
+        self.model.ssm.filter_univariate = True
+        res = self.model.smooth(self.params)
+        self.model.ssm.filter_univariate = False
+        assert_allclose(res.llf_obs, self.results_b.llf_obs)
+        for name in ['smoothed_state', 'smoothed_state_cov']:
+            assert_allclose(getattr(res, name),
+                            getattr(self.results_b, name), atol=1e-8)
+
+    def test_append(self):
+        k = self.d - 1
+        mod = self.model.clone(self.model.endog[:k, 0])
+        res = mod.filter(self.params).append(self.model.endog[k:, 0])
+        assert_equal(res.nobs_diffuse, self.d)
+        assert_allclose(res.llf_obs, self.results_b.llf_obs)
+        assert_allclose(res.filtered_state, self.results_b.filtered_state,
+                        atol=1e-8)
+
+
+class TestSARIMAX(ExactDiffuse):
+    @classmethod
+    def setup_class(cls):
+        kwargs = dict(order=(1, 1, 0), seasonal_order=(0, 1, 1, 4))
+        mod_exact = sarimax.SARIMAX(_endog(), use_exact_diffuse=True,
+                                    **kwargs)
+        mod_approx = sarimax.SARIMAX(_endog(), **kwargs)
+        super(TestSARIMAX, cls).setup_class(mod_exact, mod_approx,
+                                            [0.5, 0.2, 1.])
+
+    def test_nobs_diffuse(self):
+        super(TestSARIMAX, self).test_nobs_diffuse()
+        assert_equal(self.model.loglikelihood_burn, 0)
+        # The missing observation extends the diffuse periods
+        assert_equal(self.d, 7)
+
+    def test_conserve_memory(self):
+        desired = self.model.loglike(self.params)
+        actual = self.model.loglike(
+            self.params,
+            conserve_memory=MEMORY_CONSERVE & ~MEMORY_NO_LIKELIHOOD)
+        assert_allclose(actual, desired)
+
+    def test_score(self):
+        # Complex-step derivatives also use the exact diffuse recursions
+        assert_allclose(self.model.score(self.params),
+                        self.model.score(self.params,
+                                         approx_complex_step=False),
+                        rtol=1e-5)
+
+    def test_predict(self):
+        assert_allclose(self.results_b.predict(start=90, end=110),
+                        self.results_a.predict(start=90, end=110))
+
+    def test_fit(self):
+        res = self.model.fit(disp=False)
+        res_approx = sarimax.SARIMAX(
+            _endog(), order=(1, 1, 0), seasonal_order=(0, 1, 1, 4)).fit(
+            disp=False)
+        assert_allclose(res.params, res_approx.params, atol=1e-3)
+        assert (res.mle_retvals['fcalls'] <=
+                res_approx.mle_retvals['fcalls'])
+
+
+class TestUnobservedComponents(ExactDiffuse):
+    @classmethod
+    def setup_class(cls):
+        kwargs = dict(level='lltrend', autoregressive=1)
+        mod_exact = structural.UnobservedComponents(
+            _endog(), use_exact_diffuse=True, **kwargs)
+        mod_approx = structural.UnobservedComponents(_endog(), **kwargs)
+        super(TestUnobservedComponents, cls).setup_class(
+            mod_exact, mod_approx, [1., 0.5, 0.1, 0.2, 0.5])
+
+    def test_nobs_diffuse(self):
+        super(TestUnobservedComponents, self).test_nobs_diffuse()
+        assert_equal(self.d, 2)
+        assert_equal(self.results_b.loglikelihood_burn, 0)
+        assert_equal(self.results_a.loglikelihood_burn, 2)
+
+
+class TestBivariate(ExactDiffuse):
+    atol = 1e-6
+
+    @classmethod
+    def setup_class(cls):
+        rs = np.random.RandomState(1234)
+        endog = np.c_[_endog(), _endog() + rs.normal(size=100)]
+        endog[0, 0] = np.nan
+        endog[10] = np.nan
+
+        def model(**kwargs):
+            mod = MLEModel(endog, k_states=2, **kwargs)
+            mod['design'] = np.array([[1., 0], [1, 1]])
+            mod['obs_cov'] = np.diag([1., 0.5])
+            mod['transition'] = np.array([[1., 1], [0, 1]])
+            mod['selection'] = np.eye(2)
+            mod['state_cov'] = np.diag([0.5, 0.1])
+            return mod
+
+        mod_exact = model(initialization='diffuse')
+        mod_approx = model(initialization='approximate_diffuse',
+                           initial_variance=1e9)
+        super(TestBivariate, cls).setup_class(mod_exact, mod_approx, [])
+
+    def test_nobs_diffuse(self):
+        super(TestBivariate, self).test_nobs_diffuse()
+        assert_equal(self.d, 2)
+
+    def test_append(self):
+        # MLEModel does not support cloning
+        pass
+
+    def test_smoothed(self):
+        super(TestBivariate, self).test_smoothed()
+        # Only the diagonal of the smoothed measurement disturbance covariance
+        # matrices are available in the univariate diffuse periods
+        actual = self.results_b.smoothed_measurement_disturbance_cov
+        desired = self.results_a.smoothed_measurement_disturbance_cov
+        assert_allclose(actual[0, 0], desired[0, 0], atol=self.atol)
+        assert_allclose(actual[1, 1], desired[1, 1], atol=self.atol)
+        assert_allclose(actual[..., self.d:], desired[..., self.d:],
+                        atol=self.atol)
+
+
+def test_initialize_diffuse():
+    mod = MLEModel(_endog(), k_states=2)
+    mod.initialize_diffuse()
+    assert_equal(mod.initialization, 'diffuse')
+    assert_allclose(mod.ssm._initial_diffuse_state_cov, np.eye(2))
+    assert_allclose(mod.ssm._initial_state_cov, np.zeros((2, 2)))
+
+    assert_raises(ValueError, mod.initialize_diffuse, np.zeros(3))
+    assert_raises(ValueError, mod.initialize_diffuse, None, np.eye(3))
+    assert_raises(ValueError, mod.initialize_diffuse, None, None, np.eye(3))
+
+
+def test_invalid_methods():
+    mod = sarimax.SARIMAX(_endog(), order=(1, 1, 0), use_exact_diffuse=True)
+    mod.ssm.timing_init_filtered = True
+    assert_raises(NotImplementedError, mod.loglike, [0.5, 1.])
+    mod.ssm.timing_init_filtered = False
+
+    mod.ssm.smooth_method = SMOOTH_ALTERNATIVE
+    assert_raises(NotImplementedError, mod.smooth, [0.5, 1.])
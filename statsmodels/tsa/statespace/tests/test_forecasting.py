@@ -0,0 +1,179 @@
+"""
+Tests for forecasting from the end of the sample
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+from __future__ import division, absolute_import, print_function
+
+import warnings
+
+import numpy as np
+
+from statsmodels.tsa.statespace import (
+    sarimax, structural, varmax, dynamic_factor)
+from statsmodels.tsa.statespace.kalman_filter import MEMORY_NO_PREDICTED
+from statsmodels.tools.sm_exceptions import ValueWarning
+from numpy.testing import assert_equal, assert_allclose, assert_raises
+
+
+def _endog(nobs=100, k_endog=1, missing=True):
+    rs = np.random.RandomState(1234)
+    endog = np.cumsum(rs.normal(size=(nobs, k_endog)), axis=0) * 0.1
+    endog += rs.normal(size=(nobs, k_endog))
+    if missing:
+        endog[[5, 20]] = np.nan
+    return endog.squeeze()
+
+
+def _exog(nobs=100, k_exog=2, seed=4321):
+    rs = np.random.RandomState(seed)
+    return rs.normal(size=(nobs, k_exog))
+
+
+class ForecastMoments(object):
+    """
+    Compare forecasts computed from the end of the sample to `get_forecast`
+    """
+    steps = 10
+
+    @classmethod
+    def setup_class(cls, mod, params, exog=None):
+        cls.results = mod.smooth(params)
+        cls.exog = exog
+        cls.prediction = cls.results.get_forecast(cls.steps, exog=exog)
+
+    def test_forecast(self):
+        mean, variance = self.results.forecast_moments(self.steps,
+                                                       exog=self.exog)
+        desired = np.asarray(self.prediction.predicted_mean)
+        assert_allclose(mean, desired.reshape(mean.shape))
+        desired = np.diagonal(
+            self.prediction.prediction_results.forecasts_error_cov)
+        assert_allclose(variance, desired.reshape(variance.shape))
+
+    def test_stacked_exog(self):
+        if self.exog is None:
+            return
+        exog = np.array([self.exog, self.exog * 2, self.exog - 1])
+        mean, variance = self.results.forecast_moments(self.steps, exog=exog)
+        assert_equal(mean.shape[:2], (3, self.steps))
+        assert_equal(variance.shape, mean.shape)
+        for i in range(3):
+            desired = self.results.forecast_moments(self.steps, exog=exog[i])
+            assert_allclose(mean[i], desired[0])
+            assert_allclose(variance[i], desired[1])
+
+
+class TestSARIMAX(ForecastMoments):
+    @classmethod
+    def setup_class(cls):
+        mod = sarimax.SARIMAX(_endog(), order=(1, 1, 1), trend='ct',
+                              exog=_exog())
+        super(TestSARIMAX, cls).setup_class(
+            mod, [0.1, 0.01, 0.5, -0.2, 0.5, 0.2, 1.2],
+            exog=_exog(cls.steps, seed=1))
+
+
+class TestSARIMAXHamilton(ForecastMoments):
+    @classmethod
+    def setup_class(cls):
+        mod = sarimax.SARIMAX(_endog(), order=(2, 0, 0), trend='c',
+                              seasonal_order=(1, 0, 0, 4),
+                              exog=_exog(k_exog=1),
+                              hamilton_representation=True)
+        super(TestSARIMAXHamilton, cls).setup_class(
+            mod, [0.5, 0.3, 0.5, 0.1, 0.2, 1.], exog=_exog(cls.steps, 1))
+
+
+class TestSARIMAXStateRegression(ForecastMoments):
+    @classmethod
+    def setup_class(cls):
+        mod = sarimax.SARIMAX(_endog(), order=(1, 0, 0), exog=_exog(),
+                              mle_regression=False)
+        super(TestSARIMAXStateRegression, cls).setup_class(
+            mod, [0.5, 1.], exog=_exog(cls.steps, seed=1))
+
+    def test_stacked_exog(self):
+        # The forecast variances depend on the regressors
+        super(TestSARIMAXStateRegression, self).test_stacked_exog()
+        exog = np.array([self.exog, self.exog * 2])
+        _, variance = self.results.forecast_moments(self.steps, exog=exog)
+        assert not np.allclose(variance[0], variance[1])
+
+
+class TestSARIMAXNoExog(ForecastMoments):
+    @classmethod
+    def setup_class(cls):
+        mod = sarimax.SARIMAX(_endog(), order=(1, 0, 1),
+                              seasonal_order=(0, 1, 1, 4))
+        super(TestSARIMAXNoExog, cls).setup_class(mod, [0.5, 0.2, 0.3, 1.])
+
+
+class TestUnobservedComponents(ForecastMoments):
+    @classmethod
+    def setup_class(cls):
+        mod = structural.UnobservedComponents(
+            _endog(), 'llevel', autoregressive=1, exog=_exog())
+        super(TestUnobservedComponents, cls).setup_class(
+            mod, [1., 0.1, 0.5, 0.5, 1., -0.5], exog=_exog(cls.steps, seed=1))
+
+
+class TestUnobservedComponentsStateRegression(ForecastMoments):
+    @classmethod
+    def setup_class(cls):
+        mod = structural.UnobservedComponents(
+            _endog(), 'llevel', exog=_exog(), mle_regression=False)
+        super(TestUnobservedComponentsStateRegression, cls).setup_class(
+            mod, [1., 0.1], exog=_exog(cls.steps, seed=1))
+
+
+class TestVARMAX(ForecastMoments):
+    @classmethod
+    def setup_class(cls):
+        mod = varmax.VARMAX(_endog(k_endog=2), order=(1, 0), trend='c',
+                            exog=_exog(k_exog=1))
+        super(TestVARMAX, cls).setup_class(
+            mod, mod.start_params, exog=_exog(cls.steps, 1, seed=1))
+
+
+class TestDynamicFactor(ForecastMoments):
+    @classmethod
+    def setup_class(cls):
+        mod = dynamic_factor.DynamicFactor(
+            _endog(k_endog=2, missing=False), k_factors=1, factor_order=1,
+            exog=_exog())
+        super(TestDynamicFactor, cls).setup_class(
+            mod, mod.start_params, exog=_exog(cls.steps, seed=1))
+
+
+def test_invalid():
+    mod = sarimax.SARIMAX(_endog(), order=(1, 0, 0), exog=_exog())
+    res = mod.filter([0.5, 0.2, 0.1, 1.])
+    assert_raises(ValueError, res.forecast_moments, 2)
+    assert_raises(ValueError, res.forecast_moments, 2, exog=np.zeros((3, 2)))
+    assert_raises(ValueError, res.forecast_moments, 0, exog=np.zeros((0, 2)))
+
+    mod = sarimax.SARIMAX(_endog(missing=False), order=(1, 0, 0))
+    res = mod.filter([0.5, 1.])
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        res.forecast_moments(2, exog=np.zeros((2, 1)))
+        assert_equal(w[0].category, ValueWarning)
+
+    mod.ssm.set_conserve_memory(MEMORY_NO_PREDICTED)
+    res = mod.filter([0.5, 1.])
+    assert_raises(ValueError, res.forecast_moments, 2)
+    mod.ssm.set_conserve_memory(0)
+
+    # Matrices for the forecast periods
+    res = mod.filter([0.5, 1.])
+    assert_raises(ValueError, res.filter_results.forecast_moments, 2,
+                  obs_intercept=np.zeros((1, 3)))
+    assert_raises(ValueError, res.filter_results.forecast_moments, 2,
+                  obs_intercept=np.zeros((2, 1, 2)),
+                  state_intercept=np.zeros((3, 1, 2)))
+    forecasts, forecasts_error_cov = res.filter_results.forecast_moments(
+        2, obs_intercept=np.ones((2, 1, 2)))
+    assert_equal(forecasts.shape, (2, 1, 2))
+    assert_equal(forecasts_error_cov.shape, (1, 1, 2))
@@ -12,10 +12,11 @@ import os
 import re
 
 import warnings
-from statsmodels.tsa.statespace import (sarimax, varmax, kalman_filter,
-                                        kalman_smoother)
+from statsmodels.tsa.statespace import (sarimax, varmax, dynamic_factor,
+                                        kalman_filter, kalman_smoother)
 from statsmodels.tsa.statespace.mlemodel import MLEModel, MLEResultsWrapper
 from statsmodels.tsa.statespace.tools import compatibility_mode
+from statsmodels import datasets
 from statsmodels.datasets import nile
 from numpy.testing import assert_almost_equal, assert_equal, assert_allclose, assert_raises
 from nose.exc import SkipTest
@@ -910,3 +911,143 @@ def test_lutkepohl_information_criteria():
     bic = res.info_criteria('bic') - 6 * np.log(res.nobs_effective)
     assert_allclose(aic, true['estat_aic'])
     assert_allclose(bic, true['estat_bic'])
+
+
+def check_append(mod, mod_full, endog_new, exog_new=None):
+    res = mod.filter(mod.start_params)
+    res_append = res.append(endog_new, exog=exog_new)
+    res_full = mod_full.filter(mod.start_params)
+
+    assert_equal(res_append.nobs, res_full.nobs)
+    assert_allclose(res_append.llf, res_full.llf)
+    assert_allclose(res_append.llf_obs, res_full.llf_obs)
+    for name in ['filtered_state', 'filtered_state_cov', 'predicted_state',
+                 'predicted_state_cov', 'forecasts', 'forecasts_error_cov',
+                 'standardized_forecasts_error']:
+        assert_allclose(getattr(res_append, name), getattr(res_full, name),
+                        atol=1e-12)
+    assert_allclose(res_append.resid, res_full.resid, atol=1e-12)
+    exog_fcast = None if exog_new is None else exog_new[:3]
+    assert_allclose(res_append.forecast(3, exog=exog_fcast),
+                    res_full.forecast(3, exog=exog_fcast))
+    return res_append
+
+
+def test_append():
+    macrodata = datasets.macrodata.load_pandas().data
+    endog = np.log(macrodata['realgdp'].values)
+    exog = np.log(macrodata['realcons'].values)[:, None]
+    endog[20] = np.nan
+
+    # ARIMA with a time trend, which depends on the sample position
+    mod = sarimax.SARIMAX(endog[:150], order=(1, 1, 1), trend='t')
+    mod_full = sarimax.SARIMAX(endog, order=(1, 1, 1), trend='t')
+    res = check_append(mod, mod_full, endog[150:])
+    assert_equal(res.cov_type, 'none')
+
+    # Simple differencing and exogenous regressors
+    kwargs = dict(order=(1, 1, 0), simple_differencing=True)
+    mod = sarimax.SARIMAX(endog[:150], exog=exog[:150], **kwargs)
+    mod_full = sarimax.SARIMAX(endog, exog=exog, **kwargs)
+    check_append(mod, mod_full, endog[150:], exog[150:])
+    assert_raises(ValueError, mod.filter(mod.start_params).append,
+                  endog[150:])
+
+    # Pandas data
+    endog = pd.Series(endog, index=pd.date_range(start='1959-01-01',
+                                                 periods=len(endog), freq='QS'))
+    mod = sarimax.SARIMAX(endog[:150], order=(1, 1, 0))
+    mod_full = sarimax.SARIMAX(endog, order=(1, 1, 0))
+    res = check_append(mod, mod_full, endog[150:])
+    assert_equal(res.forecast(1).index[0], pd.Timestamp('2009-10-01'))
+    assert_raises(ValueError, mod.filter(mod.start_params).append,
+                  endog[150:].values)
+
+
+
+def test_append_multivariate():
+    macrodata = datasets.macrodata.load_pandas().data
+    endog = np.log(macrodata[['realgdp', 'realcons', 'realinv']]).diff()
+    endog = endog.values[1:] * 100
+    exog = np.arange(len(endog))[:, None] / 100.
+
+    # Dynamic factor model with autocorrelated errors
+    kwargs = dict(k_factors=1, factor_order=1, error_order=1,
+                  error_cov_type='scalar')
+    mod = dynamic_factor.DynamicFactor(endog[:150], **kwargs)
+    mod_full = dynamic_factor.DynamicFactor(endog, **kwargs)
+    check_append(mod, mod_full, endog[150:])
+
+    # The clone keeps the specification, up to overridden keywords
+    mod_clone = mod.clone(endog, error_order=0)
+    assert_equal(mod_clone.nobs, len(endog))
+    assert_equal(mod_clone.error_order, 0)
+    for key in ['k_factors', 'factor_order', 'error_cov_type',
+                'enforce_stationarity']:
+        assert_equal(getattr(mod_clone, key), getattr(mod, key))
+    assert_equal(mod_clone.ssm.initialization, mod.ssm.initialization)
+
+    # VAR with missing data, exogenous regressors and measurement error
+    endog[20, 1] = np.nan
+    kwargs = dict(order=(1, 0), trend='nc', measurement_error=True,
+                  error_cov_type='diagonal')
+    mod = varmax.VARMAX(endog[:150], exog=exog[:150], **kwargs)
+    mod_full = varmax.VARMAX(endog, exog=exog, **kwargs)
+    check_append(mod, mod_full, endog[150:], exog[150:])
+    assert_raises(ValueError, mod.filter(mod.start_params).append,
+                  endog[150:])
+
+def check_score_analytic(mod, params, rtol=1e-6):
+    params = np.array(params, dtype=float)
+    desired = mod.score(params)
+    actual = mod.score(params, method='analytic')
+    assert_allclose(actual, desired, rtol=rtol, atol=1e-6)
+    # The model must be left at the given parameters
+    assert_allclose(mod.loglike(params), mod.ssm.loglike())
+    # Untransformed parameters
+    unconstrained = mod.untransform_params(params)
+    assert_allclose(
+        mod.score(unconstrained, transformed=False, method='analytic'),
+        mod.score(unconstrained, transformed=False), rtol=rtol, atol=1e-6)
+
+
+def test_score_analytic():
+    from statsmodels.tsa.statespace import structural, dynamic_factor
+    macrodata = datasets.macrodata.load_pandas().data
+    endog = np.diff(np.log(macrodata['realgdp'].values)) * 100
+    endog[20] = np.nan
+
+    # Stationary initialization with an intercept
+    mod = sarimax.SARIMAX(endog, order=(2, 0, 1), trend='c')
+    check_score_analytic(mod, [0.5, 0.3, 0.1, 0.3, 1.2])
+
+    # Time-varying state intercept and measurement error
+    mod = sarimax.SARIMAX(endog, order=(1, 0, 1), trend='ct',
+                          measurement_error=True)
+    check_score_analytic(mod, [0.3, 0.01, 0.5, 0.3, 0.2, 1.2])
+
+    # Known initialization and loglikelihood burn
+    mod = sarimax.SARIMAX(np.cumsum(endog[21:]), order=(1, 1, 1),
+                          seasonal_order=(1, 0, 0, 4))
+    check_score_analytic(mod, [0.3, 0.2, 0.1, 1.2])
+
+    # Approximate diffuse initialization and loglikelihood burn
+    mod = structural.UnobservedComponents(endog, 'lltrend')
+    check_score_analytic(mod, [1., 0.5, 0.1])
+
+    # Multivariate models with (partially) missing observations
+    endog = np.log(macrodata[['realgdp', 'realcons']].values)
+    endog = np.diff(endog, axis=0) * 100
+    mod = dynamic_factor.DynamicFactor(endog, k_factors=1, factor_order=2)
+    check_score_analytic(mod, mod.start_params)
+    endog[5, 0] = np.nan
+    endog[20] = np.nan
+    mod = varmax.VARMAX(endog, order=(1, 0), measurement_error=True)
+    check_score_analytic(mod, mod.start_params)
+
+    # Estimation
+    mod = sarimax.SARIMAX(endog[:, 0], order=(1, 0, 1), trend='c')
+    res_analytic = mod.fit(optim_score='analytic', disp=False)
+    res_approx = mod.fit(optim_score='approx', disp=False)
+    assert_allclose(res_analytic.params, res_approx.params, rtol=1e-4)
+    assert_allclose(res_analytic.llf, res_approx.llf, rtol=1e-8)
@@ -0,0 +1,69 @@
+"""
+Tests for the parallel-in-time Kalman filter and smoother
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+from __future__ import division, absolute_import, print_function
+
+import numpy as np
+from numpy.testing import assert_allclose
+
+from statsmodels.tsa.statespace import sarimax, structural, varmax, parallel
+
+
+def check_parallel(mod, params, n_burn=0, atol=1e-7):
+    mod.update(params)
+    res = mod.smooth(params)
+    for n_blocks, n_jobs in [(1, 1), (3, 1), (4, 2)]:
+        out = parallel.parallel_smoother(mod.ssm, n_blocks=n_blocks,
+                                         n_jobs=n_jobs)
+        assert_allclose(out.llf, res.llf, rtol=1e-10)
+        assert_allclose(out.llf_obs, res.llf_obs, atol=1e-8)
+        for name in ['filtered_state', 'filtered_state_cov',
+                     'predicted_state', 'predicted_state_cov', 'forecasts',
+                     'forecasts_error_cov']:
+            assert_allclose(getattr(out, name), getattr(res, name),
+                            atol=atol)
+        for name in ['smoothed_state', 'smoothed_state_cov']:
+            assert_allclose(getattr(out, name)[..., n_burn:],
+                            getattr(res, name)[..., n_burn:], atol=atol)
+
+
+def test_sarimax():
+    rs = np.random.RandomState(1234)
+    endog = rs.normal(size=200)
+    endog[[10, 11, 50]] = np.nan
+    # time trend: time-varying state intercept
+    mod = sarimax.SARIMAX(endog, order=(2, 0, 1), trend='ct',
+                          measurement_error=True)
+    check_parallel(mod, [0.1, 0.01, 0.5, 0.1, 0.3, 0.2, 1.2])
+
+    # without measurement error the predicted state covariance matrices
+    # become singular, which reduces the precision of the smoother
+    mod = sarimax.SARIMAX(endog, order=(2, 0, 1))
+    mod.update([0.5, 0.1, 0.3, 1.2])
+    res = mod.smooth([0.5, 0.1, 0.3, 1.2])
+    out = parallel.parallel_smoother(mod.ssm, n_blocks=2)
+    assert_allclose(out.llf, res.llf, rtol=1e-10)
+    assert_allclose(out.smoothed_state, res.smoothed_state, atol=1e-5)
+    assert_allclose(out.smoothed_state_cov, res.smoothed_state_cov,
+                    atol=1e-4)
+
+
+def test_unobserved_components():
+    rs = np.random.RandomState(1234)
+    endog = rs.normal(size=150).cumsum()
+    mod = structural.UnobservedComponents(endog, 'lltrend')
+    # the approximate diffuse initialization affects the precision of the
+    # smoothed covariance matrices of the first periods
+    check_parallel(mod, [1., 0.5, 0.1], n_burn=5, atol=1e-6)
+
+
+def test_varmax_missing():
+    rs = np.random.RandomState(1234)
+    endog = rs.normal(size=(120, 2))
+    endog[5, 0] = np.nan
+    endog[[20, 21]] = np.nan
+    mod = varmax.VARMAX(endog, order=(1, 0), measurement_error=True)
+    check_parallel(mod, mod.start_params)
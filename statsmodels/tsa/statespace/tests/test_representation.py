@@ -1285,3 +1285,142 @@ def test_missing():
     llf_inject_na = mod.loglikeobs()
 
     assert_allclose(llf_inject_na, llf)
+
+
+def check_time_varying_entries(mod_compact, mod_dense):
+    res_compact = mod_compact.smooth()
+    res_dense = mod_dense.smooth()
+    # The results keep the compact form, without a dense nobs axis
+    for name in mod_compact._time_varying_entries:
+        assert_equal(res_compact.__dict__['_' + name].shape[-1], 1)
+        assert_equal(res_compact.shapes[name], res_dense.shapes[name])
+    for name in ['llf_obs', 'filtered_state', 'filtered_state_cov',
+                 'forecasts', 'forecasts_error_cov', 'smoothed_state',
+                 'smoothed_state_cov', 'smoothed_measurement_disturbance',
+                 'smoothed_state_disturbance',
+                 'smoothed_measurement_disturbance_cov', 'smoothed_forecasts',
+                 'kalman_gain']:
+        assert_allclose(getattr(res_compact, name), getattr(res_dense, name),
+                        atol=1e-12)
+    # The matrices are expanded when they are accessed
+    for name in mod_dense.shapes.keys():
+        if name == 'obs':
+            continue
+        assert_allclose(getattr(res_compact, name),
+                        getattr(res_dense, name))
+    return res_compact
+
+
+def test_time_varying_entries():
+    from statsmodels.tsa.statespace.simulation_smoother import (
+        SimulationSmoother)
+    np.random.seed(1234)
+    nobs, k_exog = 100, 3
+    exog = np.random.normal(size=(nobs, k_exog))
+    endog = exog.dot([1., -0.5, 0.2]) + np.random.normal(size=nobs)
+    endog[[5, 6, 50]] = np.nan
+
+    # Regression with time-varying coefficients
+    def regression(compact):
+        mod = SimulationSmoother(k_endog=1, k_states=k_exog)
+        mod.bind(endog[:, None].copy())
+        mod['transition'] = np.eye(k_exog)
+        mod['selection'] = np.eye(k_exog)
+        mod['state_cov'] = np.eye(k_exog) * 0.01
+        mod['obs_cov'] = [[0.5]]
+        if compact:
+            mod.set_time_varying_entries(
+                'design', ([0] * k_exog, np.arange(k_exog)), exog.T)
+        else:
+            mod['design'] = exog.T[None, :, :]
+        mod.initialize_approximate_diffuse(1e3)
+        return mod
+
+    mod_compact = regression(True)
+    mod_dense = regression(False)
+    assert_equal(mod_compact.time_invariant, False)
+    assert_equal(mod_compact['design'].shape, (1, k_exog))
+    check_time_varying_entries(mod_compact, mod_dense)
+
+    # Univariate filtering
+    mod_compact.filter_univariate = True
+    mod_dense.filter_univariate = True
+    check_time_varying_entries(mod_compact, mod_dense)
+
+    # Simulation smoother
+    variates = np.random.normal(size=nobs * (1 + k_exog))
+    initial_variates = np.random.normal(size=k_exog)
+    sim_compact = mod_compact.simulation_smoother()
+    sim_dense = mod_dense.simulation_smoother()
+    sim_compact.simulate(disturbance_variates=variates,
+                         initial_state_variates=initial_variates)
+    sim_dense.simulate(disturbance_variates=variates,
+                       initial_state_variates=initial_variates)
+    assert_allclose(sim_compact.simulated_state, sim_dense.simulated_state)
+    measurement_shocks = np.random.normal(size=(nobs, 1))
+    state_shocks = np.random.normal(size=(nobs, k_exog))
+    initial_state = np.random.normal(size=k_exog)
+    sim_compact = mod_compact.simulate(nobs, measurement_shocks,
+                                       state_shocks, initial_state)
+    sim_dense = mod_dense.simulate(nobs, measurement_shocks, state_shocks,
+                                   initial_state)
+    assert_allclose(sim_compact[0], sim_dense[0])
+    assert_allclose(sim_compact[1], sim_dense[1])
+
+    # Time-varying state intercept and observation variance with a
+    # stationary initialization, which uses the first period values
+    def ar1(compact, cls=KalmanFilter):
+        mod = cls(k_endog=1, k_states=1)
+        mod.bind(endog[:, None].copy())
+        mod['design'] = [[1.]]
+        mod['transition'] = [[0.5]]
+        mod['selection'] = [[1.]]
+        mod['state_cov'] = [[1.]]
+        if compact:
+            mod.set_time_varying_entries('state_intercept', [0], exog[:, :1].T)
+            mod.set_time_varying_entries('obs_cov', ([0], [0]),
+                                         1 + exog[:, 1:2].T**2)
+        else:
+            mod['state_intercept'] = exog[:, :1].T
+            mod['obs_cov'] = (1 + exog[:, 1:2].T**2)[None]
+        mod.initialize_stationary()
+        return mod
+    res_compact = ar1(True).filter()
+    res_dense = ar1(False).filter()
+    assert_allclose(res_compact.llf_obs, res_dense.llf_obs)
+    assert_allclose(res_compact.filtered_state, res_dense.filtered_state)
+
+    # Smoothing with missing data and a compact observation variance
+    from statsmodels.tsa.statespace.kalman_smoother import KalmanSmoother
+    check_time_varying_entries(ar1(True, KalmanSmoother),
+                               ar1(False, KalmanSmoother))
+
+    # Simulation, drawing the shocks with the time-varying variance
+    np.random.seed(1234)
+    sim_compact = ar1(True).simulate(20)
+    np.random.seed(1234)
+    sim_dense = ar1(False).simulate(20)
+    assert_allclose(sim_compact[0], sim_dense[0])
+    assert_allclose(sim_compact[1], sim_dense[1])
+
+    # Removing the entries
+    mod = ar1(True)
+    mod.filter()
+    mod.set_time_varying_entries('state_intercept', None, None)
+    mod.set_time_varying_entries('obs_cov', None, None)
+    assert_equal(mod.time_invariant, True)
+    mod_desired = ar1(False)
+    mod_desired['state_intercept'] = [0.]
+    mod_desired['obs_cov'] = [[0.]]
+    assert_allclose(mod.filter().llf_obs, mod_desired.filter().llf_obs)
+
+    # Invalid entries
+    mod = ar1(False)
+    assert_raises(ValueError, mod.set_time_varying_entries, 'state_intercept',
+                  [0], exog[:, 0])
+    assert_raises(ValueError, mod.set_time_varying_entries, 'transition',
+                  ([0], [1]), exog[:, :1].T)
+    assert_raises(ValueError, mod.set_time_varying_entries, 'design',
+                  [0], exog[:, :1].T)
+    assert_raises(IndexError, mod.set_time_varying_entries, 'obs',
+                  [0], exog[:, :1].T)
@@ -0,0 +1,102 @@
+"""
+Tests for fitting many state space models in a process pool
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+from __future__ import division, absolute_import, print_function
+
+import warnings
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal, assert_
+
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from statsmodels.tsa.statespace import scheduler
+
+
+def _series(seed):
+    rs = np.random.RandomState(seed)
+    endog = rs.normal(size=(100, 5)).cumsum(0) * 0.1 + rs.normal(size=(100, 5))
+    series = list(endog.T)
+    series[2] = series[2][:60]
+    # too short for the starting parameters
+    series[3] = np.array([1., 2.])
+    return series
+
+
+def test_fit_parallel():
+    series = _series(1234)
+    spec = {'order': (1, 0, 1)}
+    for n_jobs in [1, 2]:
+        res = scheduler.fit_parallel(series, model_kwargs=spec, steps=3,
+                                     n_jobs=n_jobs, chunksize=2)
+        assert_equal(res.failed, [3])
+        assert_(res.errors[3].startswith('ValueError'))
+        assert_(np.isnan(res.llf[3]))
+        assert_(np.isnan(res.forecasts[3]).all())
+
+        for i in [0, 1, 2, 4]:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                res_i = SARIMAX(series[i], **spec).fit(disp=False)
+            assert_allclose(res.params[i], res_i.params, rtol=1e-10)
+            assert_allclose(res.llf[i], res_i.llf, rtol=1e-10)
+            assert_allclose(res.forecasts[i], res_i.forecast(3), rtol=1e-10)
+            assert_equal(res.converged[i],
+                         res_i.mle_retvals['converged'])
+
+
+def test_specs_warm_start():
+    series = _series(4321)[:3]
+    specs = [{'order': (1, 0, 0)}, {'order': (0, 0, 1)},
+             {'order': (1, 0, 0), 'trend': 'c'}]
+    res = scheduler.fit_parallel(series, model_kwargs=specs)
+    assert_equal([len(params) for params in res.params], [2, 2, 3])
+
+    # warm start at the estimates
+    records = list(scheduler.iter_fit(series, model_kwargs=specs,
+                                      start_params=res.params))
+    assert_equal([record['index'] for record in records], [0, 1, 2])
+    assert_allclose(np.array([record['llf'] for record in records]),
+                    res.llf, rtol=1e-8)
+
+
+def test_timeout():
+    if not hasattr(scheduler.signal, 'setitimer'):
+        return
+    series = _series(0)[:2]
+    res = scheduler.fit_parallel(series, model_kwargs={'order': (2, 0, 2)},
+                                 timeout=1e-4)
+    assert_equal(res.failed, [0, 1])
+    assert_(res.errors[0].startswith('timeout'))
+
+
+def test_converged_warning_filters():
+    # the convergence status does not depend on the warning filters
+    series = _series(1234)[:2]
+    spec = {'order': (1, 0, 1)}
+    for action in ['ignore', 'error', 'always']:
+        with warnings.catch_warnings():
+            warnings.simplefilter(action)
+            res = scheduler.fit_parallel(series, model_kwargs=spec,
+                                         fit_kwargs={'maxiter': 1})
+        assert_equal(res.failed, [])
+        assert_equal(res.converged, [False, False])
+
+
+def test_forecast_exog():
+    series = _series(1234)[:2]
+    rs = np.random.RandomState(0)
+    exog = [rs.normal(size=(len(endog), 1)) for endog in series]
+    exog_forecast = [rs.normal(size=(3, 1)) for endog in series]
+    spec = {'order': (1, 0, 0), 'trend': 'c'}
+    res = scheduler.fit_parallel(series, model_kwargs=spec, exog=exog,
+                                 steps=3, exog_forecast=exog_forecast)
+    for i in range(2):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            res_i = SARIMAX(series[i], exog=exog[i], **spec).fit(disp=False)
+        assert_allclose(res.params[i], res_i.params, rtol=1e-10)
+        assert_allclose(res.forecasts[i],
+                        res_i.forecast(3, exog=exog_forecast[i]), rtol=1e-10)
@@ -623,3 +623,148 @@ def test_simulation_smoothing_obs_intercept():
     sim.simulate(disturbance_variates=np.zeros(mod.nobs * 2),
                  initial_state_variates=np.zeros(1))
     assert_equal(sim.simulated_state[0], 0)
+
+
+def _simulation_draws_model(endog):
+    mod = mlemodel.MLEModel(endog, k_states=2, k_posdef=2)
+    mod['design'] = np.array([[1., 0.5], [0.2, 1.]])
+    mod['obs_intercept'] = np.array([1., -0.5])
+    mod['obs_cov'] = np.array([[0.5, 0.1], [0.1, 0.8]])
+    mod['transition'] = np.array([[0.5, 0.2], [0.1, 0.4]])
+    mod['state_intercept'] = np.array([0.3, 0.1])
+    mod['selection'] = np.eye(2)
+    mod['state_cov'] = np.array([[1., 0.2], [0.2, 0.5]])
+    mod.initialize_stationary()
+    return mod
+
+
+def test_simulate_n_draws():
+    # Batched draws without the mean correction are identical to one draw at
+    # a time
+    nobs = 20
+    n_draws = 3
+    rs = np.random.RandomState(1234)
+    endog = rs.normal(size=(nobs, 2))
+    endog[5, 0] = np.nan
+    endog[10] = np.nan
+    missing = np.isnan(endog.T)
+
+    mod = _simulation_draws_model(endog)
+    sim = mod.simulation_smoother()
+    disturbance_variates = rs.normal(size=(n_draws, nobs * 4))
+    initial_state_variates = rs.normal(size=(n_draws, 2))
+    sim.simulate(n_draws=n_draws, disturbance_variates=disturbance_variates,
+                 initial_state_variates=initial_state_variates,
+                 mean_correction=False)
+    assert_equal(sim.simulated_state.shape, (n_draws, 2, nobs))
+    assert_equal(sim.generated_state.shape, (n_draws, 2, nobs + 1))
+    assert_equal(sim.generated_measurement_disturbance.shape,
+                 (n_draws, nobs, 2))
+    actual = dict([(name, getattr(sim, name)) for name in [
+        'generated_measurement_disturbance', 'generated_state_disturbance',
+        'generated_obs', 'generated_state', 'simulated_state',
+        'simulated_measurement_disturbance', 'simulated_state_disturbance']])
+
+    for i in range(n_draws):
+        sim.simulate(disturbance_variates=disturbance_variates[i],
+                     initial_state_variates=initial_state_variates[i])
+        for name, value in actual.items():
+            desired = getattr(sim, name)
+            # The simulated measurement disturbance is not defined for
+            # missing observations
+            if name == 'simulated_measurement_disturbance':
+                assert_allclose(value[i][~missing], desired[~missing])
+            else:
+                assert_allclose(value[i], desired)
+
+    # Invalid variates
+    assert_raises(ValueError, sim.simulate, n_draws=2,
+                  disturbance_variates=disturbance_variates)
+    assert_raises(ValueError, sim.simulate, n_draws=n_draws,
+                  initial_state_variates=np.zeros((n_draws, 3)))
+    assert_raises(ValueError, sim.simulate, mean_correction=True)
+
+
+def test_simulate_mean_correction():
+    # With the mean correction, a draw is the smoothed state given the data,
+    # plus the generated state, less the smoothed state given the generated
+    # observations (Durbin and Koopman, 2002)
+    nobs = 20
+    n_draws = 3
+    rs = np.random.RandomState(1234)
+    endog = rs.normal(size=(nobs, 2))
+    endog[5, 0] = np.nan
+    endog[10] = np.nan
+    missing = np.isnan(endog.T)
+
+    mod = _simulation_draws_model(endog)
+    res = mod.smooth([])
+    sim = mod.simulation_smoother()
+    disturbance_variates = rs.normal(size=(n_draws, nobs * 4))
+    initial_state_variates = rs.normal(size=(n_draws, 2))
+    sim.simulate(n_draws=n_draws, disturbance_variates=disturbance_variates,
+                 initial_state_variates=initial_state_variates,
+                 mean_correction=True)
+    actual = dict([(name, getattr(sim, name)) for name in [
+        'generated_measurement_disturbance', 'generated_state_disturbance',
+        'generated_obs', 'generated_state', 'simulated_state',
+        'simulated_measurement_disturbance', 'simulated_state_disturbance']])
+
+    for i in range(n_draws):
+        generated_obs = actual['generated_obs'][i].T.copy()
+        generated_obs[missing.T] = np.nan
+        res_plus = _simulation_draws_model(generated_obs).smooth([])
+
+        desired = (res.smoothed_state + actual['generated_state'][i][:, :-1] -
+                   res_plus.smoothed_state)
+        assert_allclose(actual['simulated_state'][i], desired)
+        desired = (res.smoothed_measurement_disturbance +
+                   actual['generated_measurement_disturbance'][i].T -
+                   res_plus.smoothed_measurement_disturbance)
+        assert_allclose(actual['simulated_measurement_disturbance'][i],
+                        desired)
+        desired = (res.smoothed_state_disturbance +
+                   actual['generated_state_disturbance'][i].T -
+                   res_plus.smoothed_state_disturbance)
+        assert_allclose(actual['simulated_state_disturbance'][i], desired)
+
+        # The generated series do not depend on the method
+        sim.simulate(disturbance_variates=disturbance_variates[i],
+                     initial_state_variates=initial_state_variates[i])
+        for name in ['generated_measurement_disturbance',
+                     'generated_state_disturbance', 'generated_obs',
+                     'generated_state']:
+            assert_allclose(actual[name][i], getattr(sim, name))
+
+    # Not available for the exact diffuse initialization
+    # The mean correction is the default
+    names = ['simulated_state', 'simulated_measurement_disturbance',
+             'simulated_state_disturbance']
+    sim.simulate(n_draws=n_draws, disturbance_variates=disturbance_variates,
+                 initial_state_variates=initial_state_variates)
+    for name in names:
+        assert_allclose(getattr(sim, name), actual[name])
+
+    # The univariate filter does not store the gains for the observation
+    # vector, which are then built from the predicted state covariances
+    # (the univariate filter requires a zero observation intercept here, and
+    # its smoothed measurement disturbances are in a transformed basis)
+    mod['obs_intercept'] = np.zeros(2)
+    names = ['simulated_state', 'simulated_state_disturbance']
+    draws = []
+    for filter_univariate in [False, True]:
+        mod.ssm.filter_univariate = filter_univariate
+        sim.simulate(n_draws=n_draws,
+                     disturbance_variates=disturbance_variates,
+                     initial_state_variates=initial_state_variates)
+        draws.append([getattr(sim, name).copy() for name in names])
+    for desired, value in zip(*draws):
+        assert_allclose(value, desired, atol=1e-8)
+    mod.ssm.filter_univariate = False
+
+    mod.ssm.initialize_diffuse()
+    assert_raises(NotImplementedError, sim.simulate, n_draws=n_draws,
+                  mean_correction=True)
+    # By default the draws are then performed one at a time
+    sim.simulate(n_draws=n_draws)
+    assert_equal(sim.simulated_state.shape, (n_draws, 2, nobs))
@@ -0,0 +1,184 @@
+"""
+Tests for the square-root Kalman filter
+
+Author: statsmodels developers
+License: Simplified-BSD
+"""
+from __future__ import division, absolute_import, print_function
+
+import numpy as np
+import pandas as pd
+
+from statsmodels.tsa.statespace import sarimax, varmax
+from statsmodels.tsa.statespace.mlemodel import MLEModel
+from statsmodels.tsa.statespace import _representation, _kalman_filter
+from statsmodels.tsa.statespace.kalman_filter import (
+    FILTER_CONVENTIONAL, FILTER_SQUARE_ROOT,
+    MEMORY_CONSERVE, MEMORY_NO_LIKELIHOOD)
+from statsmodels.tsa.statespace.tools import compatibility_mode
+from statsmodels.tsa.statespace.tests.results import results_kalman_filter
+from numpy.testing import assert_allclose
+from nose.exc import SkipTest
+
+if compatibility_mode:
+    raise SkipTest('Square-root filter not available.')
+
+
+class SquareRoot(object):
+    """
+    Compare the square-root and conventional Kalman filters (and smoothers)
+    """
+    atol = 1e-8
+
+    @classmethod
+    def setup_class(cls, mod, params, alternate_timing=False, **kwargs):
+        cls.model = mod
+        if alternate_timing:
+            cls.model.ssm.timing_init_filtered = True
+
+        cls.results_a = cls.model.smooth(params, **kwargs)
+        cls.model.ssm.filter_square_root = True
+        cls.results_b = cls.model.smooth(params, **kwargs)
+        cls.model.ssm.filter_square_root = False
+
+    def test_using_square_root(self):
+        assert not self.results_a.filter_results.filter_square_root
+        assert self.results_b.filter_results.filter_square_root
+
+    def test_loglike(self):
+        assert_allclose(self.results_b.llf_obs, self.results_a.llf_obs,
+                        atol=self.atol)
+
+    def test_filtered(self):
+        for name in ['filtered_state', 'filtered_state_cov',
+                     'predicted_state', 'predicted_state_cov', 'forecasts',
+                     'forecasts_error_cov']:
+            assert_allclose(getattr(self.results_b, name),
+                            getattr(self.results_a, name), atol=self.atol)
+        assert_allclose(self.results_b.filter_results.kalman_gain,
+                        self.results_a.filter_results.kalman_gain,
+                        atol=self.atol)
+
+    def test_smoothed(self):
+        for name in ['smoothed_state', 'smoothed_state_cov',
+                     'smoothed_measurement_disturbance']:
+            assert_allclose(getattr(self.results_b, name),
+                            getattr(self.results_a, name), atol=self.atol)
+
+
+def _sarimax_endog():
+    rs = np.random.RandomState(1234)
+    endog = rs.normal(size=200)
+    endog[[10, 11, 50]] = np.nan
+    return endog
+
+
+class TestSARIMAXMissing(SquareRoot):
+    @classmethod
+    def setup_class(cls, *args, **kwargs):
+        mod = sarimax.SARIMAX(_sarimax_endog(), order=(2, 0, 1), trend='ct',
+                              measurement_error=True)
+        super(TestSARIMAXMissing, cls).setup_class(
+            mod, [0.1, 0.01, 0.5, 0.1, 0.3, 0.2, 1.2], *args, **kwargs)
+
+
+class TestSARIMAXAlternateTiming(SquareRoot):
+    # Without measurement error the state covariance matrices are singular
+    @classmethod
+    def setup_class(cls, *args, **kwargs):
+        mod = sarimax.SARIMAX(_sarimax_endog(), order=(2, 0, 1))
+        super(TestSARIMAXAlternateTiming, cls).setup_class(
+            mod, [0.5, 0.1, 0.3, 1.2], alternate_timing=True)
+
+
+class TestVARMAXMissing(SquareRoot):
+    @classmethod
+    def setup_class(cls, *args, **kwargs):
+        rs = np.random.RandomState(1234)
+        endog = rs.normal(size=(120, 2))
+        endog[5, 0] = np.nan
+        endog[[20, 21]] = np.nan
+        mod = varmax.VARMAX(endog, order=(1, 0), measurement_error=True)
+        super(TestVARMAXMissing, cls).setup_class(mod, mod.start_params)
+
+
+class TestTrivariateCollapsed(SquareRoot):
+    @classmethod
+    def setup_class(cls, *args, **kwargs):
+        rs = np.random.RandomState(1234)
+        mod = MLEModel(rs.normal(size=(120, 3)), k_states=2)
+        mod.ssm.filter_collapsed = True
+        mod['selection'] = np.eye(2)
+        mod['design'] = np.array([[0.5, 0.2],
+                                  [0, 0.8],
+                                  [1, -0.5]])
+        mod['transition'] = np.array([[0.4, 0.5],
+                                      [1, 0]])
+        mod['obs_cov'] = np.diag([0.2, 1.1, 0.5])
+        mod['state_cov'] = np.diag([2., 1])
+        mod.ssm.initialize_approximate_diffuse()
+        super(TestTrivariateCollapsed, cls).setup_class(mod, [])
+
+    def test_using_square_root(self):
+        super(TestTrivariateCollapsed, self).test_using_square_root()
+        assert self.results_b.filter_results.filter_collapsed
+
+
+def test_conserve_memory():
+    mod = sarimax.SARIMAX(_sarimax_endog(), order=(2, 0, 1),
+                          measurement_error=True)
+    params = [0.5, 0.1, 0.3, 1.2, 0.5]
+    desired = mod.loglike(params)
+
+    mod.ssm.filter_square_root = True
+    mod.ssm.set_conserve_memory(MEMORY_CONSERVE & ~MEMORY_NO_LIKELIHOOD)
+    assert_allclose(mod.loglike(params), desired)
+
+
+def test_complex_step():
+    # Complex-valued filters use the conventional recursions, so complex-step
+    # derivatives are unchanged
+    mod = sarimax.SARIMAX(_sarimax_endog(), order=(1, 0, 0))
+    desired = mod.score([0.5, 1.])
+    mod.ssm.filter_square_root = True
+    assert_allclose(mod.score([0.5, 1.]), desired)
+
+
+def test_clark1987_single():
+    # The conventional filter in single precision only matches the
+    # loglikelihood to about 3 significant digits for this model; the
+    # square-root filter is close to the double precision results
+    true = results_kalman_filter.uc_uni
+    true_states = pd.DataFrame(true['states'])
+    start = true['start']
+
+    dtype = np.float32
+    (sigma_v, sigma_e, sigma_w, phi_1, phi_2) = true['parameters']
+    obs = np.array(np.log(true['data']), ndmin=2, dtype=dtype, order='F')
+    design = np.asfortranarray(np.array([[1, 1, 0, 0]], dtype=dtype)[..., None])
+    transition = np.zeros((4, 4, 1), dtype=dtype, order='F')
+    transition[([0, 0, 1, 1, 2, 3], [0, 3, 1, 2, 1, 3], [0] * 6)] = [
+        1, 1, phi_1, phi_2, 1, 1]
+    state_cov = np.asfortranarray(
+        np.diag([sigma_v**2, sigma_e**2, 0, sigma_w**2])[..., None],
+        dtype=dtype)
+    initial_state_cov = np.asfortranarray(
+        np.dot(np.dot(transition[..., 0], np.eye(4) * 100),
+               transition[..., 0].T), dtype=dtype)
+
+    model = _representation.sStatespace(
+        obs, design, np.zeros((1, 1), dtype=dtype, order='F'),
+        np.zeros((1, 1, 1), dtype=dtype, order='F'), transition,
+        np.zeros((4, 1), dtype=dtype, order='F'),
+        np.asfortranarray(np.eye(4, dtype=dtype)[..., None]), state_cov)
+    model.initialize_known(np.zeros(4, dtype=dtype), initial_state_cov)
+    kfilter = _kalman_filter.sKalmanFilter(
+        model, filter_method=FILTER_CONVENTIONAL | FILTER_SQUARE_ROOT)
+    kfilter()
+
+    assert_allclose(np.sum(kfilter.loglikelihood[start:]), true['loglike'],
+                    rtol=1e-6)
+    filtered_state = np.array(kfilter.filtered_state)
+    for i, j in [(0, 0), (1, 1), (3, 2)]:
+        assert_allclose(filtered_state[i][start:], true_states.iloc[:, j],
+                        atol=1e-4)
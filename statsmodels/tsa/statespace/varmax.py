@@ -199,6 +199,11 @@ class VARMAX(MLEModel):
         if self.k_exog > 0 or self.k_trend > 1:
             self.ssm._time_invariant = False
 
+        # update _init_keys attached by super
+        self._init_keys += ['order', 'trend', 'error_cov_type',
+                            'measurement_error', 'enforce_stationarity',
+                            'enforce_invertibility'] + list(kwargs.keys())
+
         # Initialize the parameters
         self.parameters = OrderedDict()
         self.parameters['trend'] = self.k_endog * self.k_trend
@@ -284,15 +289,9 @@ class VARMAX(MLEModel):
         self._params_state_cov, offset = _slice('state_cov', offset)
         self._params_obs_cov, offset = _slice('obs_cov', offset)
 
-    def filter(self, params, **kwargs):
-        kwargs.setdefault('results_class', VARMAXResults)
-        kwargs.setdefault('results_wrapper_class', VARMAXResultsWrapper)
-        return super(VARMAX, self).filter(params, **kwargs)
-
-    def smooth(self, params, **kwargs):
-        kwargs.setdefault('results_class', VARMAXResults)
-        kwargs.setdefault('results_wrapper_class', VARMAXResultsWrapper)
-        return super(VARMAX, self).smooth(params, **kwargs)
+    @property
+    def _res_classes(self):
+        return {'fit': (VARMAXResults, VARMAXResultsWrapper)}
 
     @property
     def start_params(self):
@@ -625,6 +624,24 @@ class VARMAX(MLEModel):
 
         return unconstrained
 
+    def _forecast_representation(self, params, steps, exog=None,
+                                 design=None):
+        kwargs = {}
+        if exog is not None:
+            params = np.asarray(params)
+            exog_params = params[self._params_regression].reshape(
+                self.k_endog, self.k_exog).T
+            intercept = np.dot(exog, exog_params)
+            if self.trend == 'c':
+                intercept += params[self._params_trend]
+            state_intercept = np.zeros(
+                exog.shape[:-2] + (self.k_states, steps),
+                dtype=intercept.dtype)
+            state_intercept[..., :self.k_endog, :] = np.swapaxes(
+                intercept, -1, -2)
+            kwargs['state_intercept'] = state_intercept
+        return kwargs
+
     def update(self, params, **kwargs):
         params = super(VARMAX, self).update(params, **kwargs)
 
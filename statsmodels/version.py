@@ -0,0 +1,10 @@
+
+# THIS FILE IS GENERATED FROM SETUP.PY
+short_version = '0.8.0'
+version = '0.8.0'
+full_version = '0.8.0.dev0+dbbe6d3'
+git_revision = 'dbbe6d35eb344a5ad4771d6d91f28da8ecd5c610'
+release = False
+
+if not release:
+    version = full_version
\ No newline at end of file